@@ -12,7 +12,9 @@ from dataclasses import dataclass, asdict
 from datetime import datetime
 import json
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 # Import our real components
 import sys
@@ -63,6 +65,342 @@ class SimulationResult:
     false_positives: int
     simulation_time: float
 
+# Pattern parameter ranges, in the order genes are stored
+PATTERN_PARAMETERS = {
+    'grid': {
+        'spacing': (10, 100),  # meters
+        'angle': (0, 90),  # degrees
+        'overlap': (0, 0.5)  # percentage
+    },
+    'spiral': {
+        'radius_step': (5, 50),  # meters
+        'angle_step': (5, 45),  # degrees
+        'max_radius': (100, 1000)  # meters
+    },
+    'sector': {
+        'sector_count': (4, 16),  # number of sectors
+        'sector_angle': (10, 90),  # degrees
+        'search_radius': (50, 500)  # meters
+    },
+    'lawnmower': {
+        'strip_width': (10, 100),  # meters
+        'turn_radius': (5, 50),  # meters
+        'overlap': (0, 0.3)  # percentage
+    },
+    'adaptive': {
+        'exploration_rate': (0.1, 0.9),  # balance between exploration and exploitation
+        'adaptation_threshold': (0.1, 0.5),  # when to adapt
+        'learning_rate': (0.01, 0.1)  # how fast to adapt
+    }
+}
+PATTERN_TYPES = list(PATTERN_PARAMETERS.keys())
+
+# Flight model used by the analytic fitness function
+SENSOR_SWATH_M = 60.0
+CRUISE_SPEED_MS = 5.0
+CRUISE_POWER_W = 180.0
+
+class PatternFitnessModel:
+    """
+    Vectorized analytic fitness for whole populations
+
+    Estimates coverage, success, energy and time from pattern geometry in
+    closed form and combines them with the same weights as
+    RealGeneticSearchOptimizer.evaluate_fitness. Instances are picklable so
+    islands can be evolved in worker processes.
+    """
+
+    def __init__(self, environment: SearchEnvironment):
+        self.environment = environment
+
+    def __call__(self, codes: np.ndarray, genes: np.ndarray) -> np.ndarray:
+        env = self.environment
+        radius = math.sqrt(env.search_area_size / math.pi) * 1000
+        area = math.pi * radius ** 2
+        a, b, c = genes[:, 0], genes[:, 1], genes[:, 2]
+
+        footprint = np.ones(len(codes))
+        density = np.ones(len(codes))
+        track = np.zeros(len(codes))
+
+        grid = codes == 0
+        density[grid] = np.minimum(1.0, SENSOR_SWATH_M / a[grid])
+        track[grid] = area / a[grid] * (1 + c[grid])
+
+        spiral = codes == 1
+        reach = np.minimum(c[spiral], radius)
+        footprint[spiral] = (reach / radius) ** 2
+        density[spiral] = np.minimum(1.0, SENSOR_SWATH_M / a[spiral]) * np.cos(np.radians(b[spiral]) / 2)
+        track[spiral] = math.pi * reach ** 2 / a[spiral]
+
+        sector = codes == 2
+        reach = np.minimum(c[sector], radius)
+        footprint[sector] = np.minimum(1.0, np.round(a[sector]) * b[sector] / 360) * (reach / radius) ** 2
+        track[sector] = np.round(a[sector]) * b[sector] / 10 * reach
+
+        lawnmower = codes == 3
+        density[lawnmower] = np.minimum(1.0, SENSOR_SWATH_M * (1 + c[lawnmower]) / a[lawnmower])
+        track[lawnmower] = area / a[lawnmower] + (2 * radius / a[lawnmower]) * math.pi * b[lawnmower]
+
+        # Adaptive flies the default spiral and tunes density on the fly
+        adaptive = codes == 4
+        reach = min(500.0, radius)
+        footprint[adaptive] = (reach / radius) ** 2
+        density[adaptive] = 0.85 + 0.15 * a[adaptive]
+        track[adaptive] = math.pi * reach ** 2 / 25 * (1 + 0.2 * b[adaptive])
+
+        time_s = track / CRUISE_SPEED_MS / env.num_drones
+        budget_s = env.mission_duration * 3600
+        completion = np.minimum(1.0, budget_s / np.maximum(time_s, 1e-9))
+        coverage = footprint * density * completion
+
+        visibility = min(1.0, env.weather_conditions.get('visibility', 10000) / 10000)
+        wind = float(np.clip(1 - env.weather_conditions.get('wind_speed', 0) / 30, 0.3, 1.0))
+        success = coverage * visibility * wind
+
+        energy_wh = np.minimum(time_s, budget_s) * env.num_drones * CRUISE_POWER_W / 3600
+        energy_score = np.clip(1.0 - energy_wh / (env.num_drones * 100), 0.0, 1.0)
+        time_score = np.clip(1.0 - time_s / budget_s, 0.0, 1.0)
+
+        return coverage * 0.3 + success * 0.4 + energy_score * 0.2 + time_score * 0.1
+
+
+def analytic_pattern_fitness(pattern: SearchPattern, environment: SearchEnvironment) -> float:
+    """Scalar form of PatternFitnessModel, e.g. for ProcessPoolFitness"""
+    code = PATTERN_TYPES.index(pattern.pattern_type)
+    names = PATTERN_PARAMETERS[pattern.pattern_type]
+    genes = np.array([[pattern.parameters[name] for name in names]], dtype=np.float64)
+    return float(PatternFitnessModel(environment)(np.array([code]), genes)[0])
+
+
+def _evaluate_pattern(args) -> float:
+    objective, pattern_type, parameters, environment = args
+    return objective(SearchPattern(pattern_type=pattern_type, parameters=parameters), environment)
+
+
+class ProcessPoolFitness:
+    """
+    Population fitness for objectives that cannot be vectorized
+
+    Fans a picklable per-individual objective ``objective(pattern, environment)``
+    out over a process pool.
+    """
+
+    def __init__(self, objective, environment: SearchEnvironment, max_workers: Optional[int] = None,
+                 chunksize: int = 8):
+        self.objective = objective
+        self.environment = environment
+        self.chunksize = chunksize
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def __call__(self, codes: np.ndarray, genes: np.ndarray) -> np.ndarray:
+        jobs = [
+            (self.objective, PATTERN_TYPES[code], _genes_to_parameters(code, row), self.environment)
+            for code, row in zip(codes.tolist(), genes)
+        ]
+        return np.fromiter(self.executor.map(_evaluate_pattern, jobs, chunksize=self.chunksize),
+                           dtype=np.float64, count=len(jobs))
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def _genes_to_parameters(code: int, row: np.ndarray) -> Dict[str, float]:
+    parameters = {}
+    for value, (name, (min_val, max_val)) in zip(row.tolist(), PATTERN_PARAMETERS[PATTERN_TYPES[code]].items()):
+        parameters[name] = int(round(value)) if isinstance(min_val, int) and isinstance(max_val, int) else value
+    return parameters
+
+
+@dataclass
+class GeneticOperators:
+    """Array-based selection, crossover and mutation over (pattern code, genes) populations"""
+    crossover_rate: float = 0.8
+    mutation_rate: float = 0.1
+    elite_size: int = 5
+    tournament_size: int = 3
+
+    def __post_init__(self):
+        ranges = [list(PATTERN_PARAMETERS[t].values()) for t in PATTERN_TYPES]
+        self.low = np.array([[r[0] for r in row] for row in ranges], dtype=np.float64)
+        self.high = np.array([[r[1] for r in row] for row in ranges], dtype=np.float64)
+        self.is_int = np.array([[isinstance(r[0], int) and isinstance(r[1], int) for r in row] for row in ranges])
+
+    def _random_genes(self, rng: np.random.Generator, codes: np.ndarray) -> np.ndarray:
+        genes = self.low[codes] + rng.random((len(codes), self.low.shape[1])) * (self.high - self.low)[codes]
+        return np.where(self.is_int[codes], np.round(genes), genes)
+
+    def random_population(self, rng: np.random.Generator, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        codes = rng.integers(0, len(PATTERN_TYPES), size)
+        return codes, self._random_genes(rng, codes)
+
+    def next_generation(self, rng: np.random.Generator, codes: np.ndarray, genes: np.ndarray,
+                        fitness: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """Elites (fitness kept) followed by unevaluated children; returns elite count too"""
+        size = len(codes)
+        elite = np.argsort(-fitness, kind="stable")[:self.elite_size]
+        children = size - len(elite)
+
+        # Tournament selection for both parents of every child
+        contenders = rng.integers(0, size, (2, children, self.tournament_size))
+        winners = fitness[contenders].argmax(axis=2)
+        parent1, parent2 = np.take_along_axis(contenders, winners[..., None], axis=2)[..., 0]
+
+        # Uniform crossover, only between parents of the same pattern type
+        child_codes = codes[parent1].copy()
+        cross = (rng.random(children) < self.crossover_rate) & (codes[parent1] == codes[parent2])
+        swap = cross[:, None] & (rng.random(genes[parent1].shape) < 0.5)
+        child_genes = np.where(swap, genes[parent2], genes[parent1])
+
+        # Mutation: resample ~30% of parameters, occasionally switch pattern type
+        mutate = rng.random(children) < self.mutation_rate
+        resample = mutate[:, None] & (rng.random(child_genes.shape) < 0.3)
+        child_genes = np.where(resample, self._random_genes(rng, child_codes), child_genes)
+        switch = mutate & (rng.random(children) < 0.1)
+        if switch.any():
+            child_codes[switch] = rng.integers(0, len(PATTERN_TYPES), int(switch.sum()))
+            child_genes[switch] = self._random_genes(rng, child_codes[switch])
+
+        return (np.concatenate([codes[elite], child_codes]),
+                np.concatenate([genes[elite], child_genes]),
+                fitness[elite], len(elite))
+
+
+def _evolve_island(codes, genes, fitness, rng_state, generations, operators, fitness_fn):
+    """Run one island for a number of generations; module-level so it can run in a worker"""
+    rng = np.random.default_rng()
+    rng.bit_generator.state = rng_state
+    best = []
+    for _ in range(generations):
+        codes, genes, elite_fitness, elite_count = operators.next_generation(rng, codes, genes, fitness)
+        fitness = np.concatenate([elite_fitness, fitness_fn(codes[elite_count:], genes[elite_count:])])
+        best.append(float(fitness.max()))
+    return codes, genes, fitness, rng.bit_generator.state, best
+
+
+class FitnessEvaluator:
+    """
+    Memoized, surrogate-screened fitness evaluation
+    
+    Rollouts are cached under a hash of the quantized genome and the
+    environment, so identical or near-identical patterns are simulated once.
+    After ``min_training_samples`` rollouts a ridge-regression surrogate,
+    trained online on every completed rollout, ranks new candidates and only
+    the top ``screen_fraction`` get full physics rollouts; the rest keep the
+    predicted fitness.
+    """
+    
+    METRIC_FIELDS = ('fitness_score', 'coverage_efficiency', 'energy_efficiency',
+                     'time_efficiency', 'success_rate', 'simulation_results')
+    
+    def __init__(self, rollout, cache_size: int = 10000, resolution: float = 0.01,
+                 screen_fraction: float = 0.3, min_training_samples: int = 30, ridge: float = 1e-3):
+        self.rollout = rollout
+        self.cache_size = cache_size
+        self.resolution = resolution
+        self.screen_fraction = screen_fraction
+        self.min_training_samples = min_training_samples
+        self.ridge = ridge
+        self.operators = GeneticOperators()
+        
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._features: List[np.ndarray] = []
+        self._targets: List[float] = []
+        self._weights: Optional[np.ndarray] = None
+        self._fitted_samples = 0
+        
+        self.hits = 0
+        self.rollouts = 0
+        self.screened = 0
+    
+    def _normalized_genes(self, pattern: SearchPattern) -> Tuple[int, np.ndarray]:
+        code = PATTERN_TYPES.index(pattern.pattern_type)
+        values = np.array([pattern.parameters[name] for name in PATTERN_PARAMETERS[pattern.pattern_type]],
+                          dtype=np.float64)
+        return code, (values - self.operators.low[code]) / (self.operators.high[code] - self.operators.low[code])
+    
+    def genome_key(self, pattern: SearchPattern, environment_key: str) -> str:
+        """Hash of pattern type, genes quantized to ``resolution`` of their range, and environment"""
+        code, genes = self._normalized_genes(pattern)
+        quantized = tuple(np.round(genes / self.resolution).astype(int).tolist())
+        return hashlib.blake2b(repr((code, quantized, environment_key)).encode(), digest_size=16).hexdigest()
+    
+    def _feature_matrix(self, patterns: List[SearchPattern], environment: SearchEnvironment) -> np.ndarray:
+        rows = [self._normalized_genes(pattern) for pattern in patterns]
+        codes = np.array([code for code, _ in rows])
+        genes = np.array([genes for _, genes in rows])
+        raw = self.operators.low[codes] + genes * (self.operators.high - self.operators.low)[codes]
+        analytic = PatternFitnessModel(environment)(codes, raw)
+        one_hot = np.eye(len(PATTERN_TYPES))[codes]
+        return np.column_stack([one_hot, genes, genes ** 2, analytic, np.ones(len(patterns))])
+    
+    def _fit_surrogate(self):
+        if len(self._targets) < self.min_training_samples or len(self._targets) == self._fitted_samples:
+            return
+        X = np.array(self._features)
+        y = np.array(self._targets)
+        self._weights = np.linalg.solve(X.T @ X + self.ridge * np.eye(X.shape[1]), X.T @ y)
+        self._fitted_samples = len(y)
+    
+    def _store(self, key: str, pattern: SearchPattern):
+        self.cache[key] = {field: getattr(pattern, field) for field in self.METRIC_FIELDS}
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+    
+    def _apply(self, key: str, pattern: SearchPattern):
+        self.cache.move_to_end(key)
+        for field, value in self.cache[key].items():
+            setattr(pattern, field, value)
+    
+    async def evaluate_population(self, patterns: List[SearchPattern], environment: SearchEnvironment) -> List[float]:
+        """Score patterns in place from the cache, the surrogate, or a full rollout"""
+        environment_key = json.dumps(asdict(environment), sort_keys=True)
+        pending: Dict[str, List[SearchPattern]] = {}
+        for pattern in patterns:
+            key = self.genome_key(pattern, environment_key)
+            if key in self.cache:
+                self._apply(key, pattern)
+                self.hits += 1
+            else:
+                pending.setdefault(key, []).append(pattern)
+        
+        keys = list(pending)
+        self._fit_surrogate()
+        if self._weights is not None and len(keys) > 1:
+            predicted = self._feature_matrix([pending[key][0] for key in keys], environment) @ self._weights
+            order = np.argsort(-predicted)
+            full_count = max(1, math.ceil(len(keys) * self.screen_fraction))
+            for i in order[full_count:]:
+                for pattern in pending[keys[i]]:
+                    pattern.fitness_score = float(np.clip(predicted[i], 1e-6, 1.0))
+                    pattern.simulation_results = {'surrogate': True}
+                    self.screened += 1
+            keys = [keys[i] for i in order[:full_count]]
+        
+        for key in keys:
+            representative, *duplicates = pending[key]
+            fitness = await self.rollout(representative, environment)
+            self.rollouts += 1
+            self._store(key, representative)
+            self._features.append(self._feature_matrix([representative], environment)[0])
+            self._targets.append(fitness)
+            for pattern in duplicates:
+                self._apply(key, pattern)
+                self.hits += 1
+        
+        return [pattern.fitness_score for pattern in patterns]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cache_entries": len(self.cache),
+            "cache_hits": self.hits,
+            "rollouts": self.rollouts,
+            "surrogate_screened": self.screened,
+            "surrogate_samples": self._fitted_samples,
+        }
+
+
 class RealGeneticSearchOptimizer:
     """
     REAL genetic algorithm for optimizing SAR search patterns
@@ -77,39 +415,19 @@ class RealGeneticSearchOptimizer:
         self.elite_size = 5
         
         # Pattern parameter ranges
-        self.pattern_parameters = {
-            'grid': {
-                'spacing': (10, 100),  # meters
-                'angle': (0, 90),  # degrees
-                'overlap': (0, 0.5)  # percentage
-            },
-            'spiral': {
-                'radius_step': (5, 50),  # meters
-                'angle_step': (5, 45),  # degrees
-                'max_radius': (100, 1000)  # meters
-            },
-            'sector': {
-                'sector_count': (4, 16),  # number of sectors
-                'sector_angle': (10, 90),  # degrees
-                'search_radius': (50, 500)  # meters
-            },
-            'lawnmower': {
-                'strip_width': (10, 100),  # meters
-                'turn_radius': (5, 50),  # meters
-                'overlap': (0, 0.3)  # percentage
-            },
-            'adaptive': {
-                'exploration_rate': (0.1, 0.9),  # balance between exploration and exploitation
-                'adaptation_threshold': (0.1, 0.5),  # when to adapt
-                'learning_rate': (0.01, 0.1)  # how fast to adapt
-            }
-        }
+        self.pattern_parameters = PATTERN_PARAMETERS
         
         # Initialize real components
         self.ml_models = RealMLModels()
         self.database = None  # Will be initialized in initialize()
         self.simulator_pool = []
         
+        # Rollouts fly the whole mission in simulated time, in at most this many
+        # steps and no finer than rollout_dt seconds
+        self.simulation_step_budget = 500
+        self.rollout_dt = 1.0
+        self.fitness_evaluator = FitnessEvaluator(self._simulate_fitness)
+        
         # Performance tracking
         self.best_patterns = []
         self.fitness_history = []
@@ -177,6 +495,8 @@ class RealGeneticSearchOptimizer:
         """
         Evaluate fitness using REAL simulation and ML models
         
+        Repeated (or near-identical) genomes are served from the fitness cache.
+        
         Args:
             pattern: Search pattern to evaluate
             environment: Environmental conditions
@@ -184,6 +504,10 @@ class RealGeneticSearchOptimizer:
         Returns:
             Fitness score (0-1)
         """
+        return (await self.fitness_evaluator.evaluate_population([pattern], environment))[0]
+    
+    async def _simulate_fitness(self, pattern: SearchPattern, environment: SearchEnvironment) -> float:
+        """Full simulation rollout for one pattern"""
         try:
             # Run real simulation
             simulation_result = await self.run_simulation(pattern, environment)
@@ -234,8 +558,11 @@ class RealGeneticSearchOptimizer:
         start_time = time.time()
         
         try:
-            # Get a simulator from the pool
+            # Get a simulator from the pool, starting from a clean state
+            if not self.simulator_pool:
+                self.simulator_pool.append(RealDroneSimulator("drone_000", DEFAULT_DRONE_PHYSICS))
             simulator = self.simulator_pool[self.simulation_count % len(self.simulator_pool)]
+            simulator.reset()
             
             # Set environmental conditions
             weather_condition = self._map_weather_condition(environment.weather_conditions)
@@ -254,13 +581,15 @@ class RealGeneticSearchOptimizer:
             # Generate waypoints based on pattern
             waypoints = self._generate_pattern_waypoints(pattern, environment)
             
-            # Run simulation
-            telemetry_log = await simulator.simulate_mission(waypoints, environment.mission_duration * 3600)
+            # Run simulation over the whole mission
+            duration = environment.mission_duration * 3600
+            max_steps = min(self.simulation_step_budget, max(1, math.ceil(duration / self.rollout_dt)))
+            telemetry_log = await simulator.simulate_mission(waypoints, duration, max_steps=max_steps)
             
             # Calculate results
-            total_distance = sum(t.distance_traveled for t in telemetry_log)
-            total_flight_time = max(t.flight_time for t in telemetry_log) if telemetry_log else 0
-            energy_consumed = sum(t.power_consumption for t in telemetry_log) / 3600  # Wh
+            total_distance = telemetry_log[-1].distance_traveled if telemetry_log else 0
+            total_flight_time = telemetry_log[-1].flight_time if telemetry_log else 0
+            energy_consumed = (100.0 - simulator.battery_level) / 100 * simulator.physics.battery_capacity  # Wh
             
             # Calculate coverage (simplified)
             if telemetry_log:
@@ -575,8 +904,7 @@ class RealGeneticSearchOptimizer:
             
             # Evaluate initial population
             logger.info("Evaluating initial population...")
-            for pattern in population:
-                await self.evaluate_fitness(pattern, environment)
+            await self.fitness_evaluator.evaluate_population(population, environment)
             
             # Evolution loop
             for generation in range(self.generations):
@@ -585,10 +913,10 @@ class RealGeneticSearchOptimizer:
                 # Evolve population
                 population = await self.evolve_population(population, environment)
                 
-                # Evaluate new population
-                for pattern in population:
-                    if pattern.fitness_score == 0.0:  # Only evaluate unevaluated patterns
-                        await self.evaluate_fitness(pattern, environment)
+                # Evaluate new population (only unevaluated patterns)
+                await self.fitness_evaluator.evaluate_population(
+                    [pattern for pattern in population if pattern.fitness_score == 0.0], environment
+                )
                 
                 # Track best patterns
                 best_pattern = max(population, key=lambda p: p.fitness_score)
@@ -607,6 +935,114 @@ class RealGeneticSearchOptimizer:
             logger.error(f"Optimization failed: {e}")
             raise
     
+    async def optimize_search_pattern_parallel(
+        self,
+        environment: SearchEnvironment,
+        fitness_fn=None,
+        islands: int = 4,
+        migration_interval: int = 5,
+        migration_size: int = 2,
+        patience: int = 20,
+        tolerance: float = 1e-4,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None
+    ) -> SearchPattern:
+        """
+        Island-model optimization over array-encoded populations
+        
+        Args:
+            environment: Environmental conditions for optimization
+            fitness_fn: Population fitness ``fn(codes, genes) -> fitness array``;
+                defaults to the vectorized PatternFitnessModel
+            islands: Number of independently evolving sub-populations
+            migration_interval: Generations between ring migrations
+            migration_size: Best individuals copied to the next island
+            patience: Stop after this many generations without improvement
+            tolerance: Minimum best-fitness gain that counts as improvement
+            seed: Seed for reproducible runs (independent of worker scheduling)
+            workers: Processes for evolving islands in parallel (1 = in-process)
+        
+        Returns:
+            Best search pattern found
+        """
+        return await asyncio.to_thread(
+            self._run_islands, environment, fitness_fn or PatternFitnessModel(environment), islands,
+            migration_interval, migration_size, patience, tolerance, seed, workers
+        )
+    
+    def _run_islands(self, environment, fitness_fn, islands, migration_interval, migration_size,
+                     patience, tolerance, seed, workers) -> SearchPattern:
+        operators = GeneticOperators(self.crossover_rate, self.mutation_rate, self.elite_size)
+        rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(islands)]
+        states = []
+        for rng in rngs:
+            codes, genes = operators.random_population(rng, self.population_size)
+            states.append([codes, genes, fitness_fn(codes, genes), rng.bit_generator.state])
+        
+        # A process-pool objective already uses the cores; evolve islands in-process then
+        workers = workers or min(islands, os.cpu_count() or 1)
+        executor = None
+        if workers > 1 and islands > 1 and not isinstance(fitness_fn, ProcessPoolFitness):
+            executor = ProcessPoolExecutor(max_workers=workers)
+        
+        best_fitness = max(float(state[2].max()) for state in states)
+        stale = 0
+        generation = 0
+        try:
+            while generation < self.generations and stale < patience:
+                epoch = min(migration_interval, self.generations - generation)
+                args = [(*state, epoch, operators, fitness_fn) for state in states]
+                if executor is not None:
+                    results = list(executor.map(_evolve_island, *zip(*args)))
+                else:
+                    results = [_evolve_island(*arg) for arg in args]
+                states = [list(result[:4]) for result in results]
+                
+                # Per-generation global best drives early stopping
+                for step_best in zip(*(result[4] for result in results)):
+                    generation += 1
+                    best = max(step_best)
+                    if best > best_fitness + tolerance:
+                        best_fitness, stale = best, 0
+                    else:
+                        best_fitness, stale = max(best, best_fitness), stale + 1
+                    self.fitness_history.append(best_fitness)
+                
+                self._migrate(states, migration_size)
+                logger.info(f"Generation {generation}/{self.generations}: best fitness {best_fitness:.3f}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        codes = np.concatenate([state[0] for state in states])
+        genes = np.concatenate([state[1] for state in states])
+        fitness = np.concatenate([state[2] for state in states])
+        best = int(fitness.argmax())
+        pattern = SearchPattern(
+            pattern_type=PATTERN_TYPES[int(codes[best])],
+            parameters=_genes_to_parameters(int(codes[best]), genes[best]),
+            fitness_score=float(fitness[best])
+        )
+        self.best_patterns.append(pattern)
+        self.simulation_count += generation * islands * (self.population_size - self.elite_size)
+        logger.info(f"Optimization complete after {generation} generations. Best pattern: "
+                    f"{pattern.pattern_type} with fitness {pattern.fitness_score:.3f}")
+        return pattern
+    
+    @staticmethod
+    def _migrate(states: List[list], migration_size: int):
+        """Ring migration: each island's best replace the next island's worst"""
+        if len(states) < 2 or migration_size <= 0:
+            return
+        emigrants = []
+        for codes, genes, fitness, _ in states:
+            best = np.argsort(-fitness)[:migration_size]
+            emigrants.append((codes[best], genes[best], fitness[best]))
+        for i, state in enumerate(states):
+            codes, genes, fitness = emigrants[i - 1]
+            worst = np.argsort(state[2])[:len(codes)]
+            state[0][worst], state[1][worst], state[2][worst] = codes, genes, fitness
+    
     async def health_check(self) -> Dict[str, Any]:
         """Check health of genetic optimizer"""
         return {
@@ -614,6 +1050,7 @@ class RealGeneticSearchOptimizer:
             "population_size": self.population_size,
             "generations": self.generations,
             "simulation_count": self.simulation_count,
+            "fitness_evaluation": self.fitness_evaluator.get_stats(),
             "best_patterns_count": len(self.best_patterns),
             "fitness_history": self.fitness_history[-10:] if self.fitness_history else [],
             "components": {
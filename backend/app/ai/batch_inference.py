@@ -0,0 +1,118 @@
+"""
+Micro-batched inference for SAR Mission Commander
+Coalesces concurrent single-row predictions into one model call per batch
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def encode_column(values: Sequence[Any], categories: Sequence[Any], unknown: int = 0) -> np.ndarray:
+    """Index of each value in categories (unseen values map to unknown), for a whole column at once"""
+    lookup = {category: index for index, category in enumerate(categories)}
+    return np.fromiter((lookup.get(v, unknown) for v in values), dtype=np.float64, count=len(values))
+
+
+class MicroBatcher:
+    """Collects submissions for up to max_wait_ms and hands them to predict_batch together.
+
+    predict_batch takes a list of inputs and returns one output per input. It
+    runs off the event loop: in the given executor (e.g. a process pool) or,
+    by default, in a worker thread.
+    """
+
+    def __init__(self, predict_batch: Callable[[List[Any]], Sequence[Any]], max_batch_size: int = 256,
+                 max_wait_ms: float = 5.0, executor: Optional[Executor] = None, name: str = "inference"):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.stats = {'requests': 0, 'batches': 0, 'max_batch': 0, 'batch_seconds': 0.0}
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one input and wait for its output"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def submit_many(self, items: Sequence[Any]) -> List[Any]:
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without waiting
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            inputs = [item for item, _ in batch]
+            started = time.perf_counter()
+            try:
+                if self.executor is not None:
+                    outputs = await loop.run_in_executor(self.executor, self.predict_batch, inputs)
+                else:
+                    outputs = await asyncio.to_thread(self.predict_batch, inputs)
+                if len(outputs) != len(inputs):
+                    raise ValueError(f"{self.name}: batch returned {len(outputs)} outputs for {len(inputs)} inputs")
+            except Exception as e:
+                logger.error(f"Batched {self.name} prediction failed for {len(inputs)} requests: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats['requests'] += len(inputs)
+            self.stats['batches'] += 1
+            self.stats['max_batch'] = max(self.stats['max_batch'], len(inputs))
+            self.stats['batch_seconds'] += time.perf_counter() - started
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'mean_batch': self.stats['requests'] / batches if batches else 0.0,
+        }
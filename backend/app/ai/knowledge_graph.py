@@ -3,20 +3,31 @@ Knowledge Graph System for SAR Operations
 Advanced graph-based learning and optimization for mission intelligence
 """
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Set, Iterable
 import logging
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
+from itertools import islice
+import heapq
 import json
+import os
 import uuid
 import numpy as np
-from neo4j import GraphDatabase
 import networkx as nx
 from collections import defaultdict, deque
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+try:
+    from neo4j import GraphDatabase
+    NEO4J_AVAILABLE = True
+except ImportError:
+    NEO4J_AVAILABLE = False
+    logger.warning("⚠️ neo4j driver not available. Knowledge graph runs in memory/snapshot mode.")
+
 class NodeType(Enum):
     MISSION = "mission"
     DRONE = "drone"
@@ -79,25 +90,133 @@ class GraphQuery:
     max_depth: int = 3
     min_confidence: float = 0.3
 
+# Mission attributes with secondary indexes; weather is indexed by its "condition" field
+MISSION_INDEX_KEYS = ("mission_type", "terrain_type", "search_pattern", "weather_condition")
+# Index values for a mission without the attribute, which matches any constraint on it
+# (as _matches_constraints skips absent keys), and for weather that is not a dict, which matches none
+ATTRIBUTE_MISSING = ("<missing>",)
+WEATHER_NOT_A_DICT = ("<not a dict>",)
+OPTIMIZATION_FACTOR_TYPES = ("pattern", "terrain", "mission")
+SNAPSHOT_FORMAT_VERSION = 2
+
+@dataclass
+class SuccessAggregate:
+    """Running totals for an incrementally maintained success-rate statistic"""
+    count: int = 0
+    success_total: float = 0.0
+    strength_total: float = 0.0
+    
+    def add(self, success_rate: float, strength: float = 0.0):
+        self.count += 1
+        self.success_total += success_rate
+        self.strength_total += strength
+    
+    def remove(self, success_rate: float, strength: float = 0.0):
+        self.count -= 1
+        self.success_total -= success_rate
+        self.strength_total -= strength
+    
+    @property
+    def success_rate(self) -> float:
+        return self.success_total / self.count if self.count else 0.0
+    
+    @property
+    def strength(self) -> float:
+        return self.strength_total / self.count if self.count else 0.0
+
+class _FactorRanking:
+    """Top-k ranking of factors by score using a lazily invalidated max-heap"""
+    
+    def __init__(self):
+        self._scores: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+    
+    def update(self, factor: str, score: float):
+        self._scores[factor] = score
+        heapq.heappush(self._heap, (-score, factor))
+        if len(self._heap) > 2 * len(self._scores) + 64:
+            self._heap = [(-value, key) for key, value in self._scores.items()]
+            heapq.heapify(self._heap)
+    
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        results, seen, popped = [], set(), []
+        while self._heap and len(results) < k:
+            entry = heapq.heappop(self._heap)
+            score, factor = -entry[0], entry[1]
+            if factor in seen or self._scores.get(factor) != score:
+                continue  # Stale entry superseded by a later update
+            seen.add(factor)
+            popped.append(entry)
+            results.append((factor, score))
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return results
+
 class SARKnowledgeGraph:
     """Advanced knowledge graph for SAR mission intelligence"""
     
-    def __init__(self, neo4j_uri: str = "bolt://localhost:7687", username: str = "neo4j", password: str = "password"):
+    def __init__(
+        self,
+        neo4j_uri: str = "bolt://localhost:7687",
+        username: str = "neo4j",
+        password: str = "password",
+        snapshot_path: Optional[str] = None,
+        page_size: int = 5000,
+        connect: bool = True
+    ):
         self.neo4j_uri = neo4j_uri
         self.username = username
         self.password = password
         self.driver = None
+        self.snapshot_path = snapshot_path if snapshot_path is not None else settings.KNOWLEDGE_GRAPH_SNAPSHOT_PATH
+        self.page_size = page_size
+        self.connect = connect
         
         # In-memory graph for fast queries
         self.memory_graph = nx.MultiDiGraph()
         self.node_cache = {}
         self.relationship_cache = {}
         
-        # Initialize connection
-        asyncio.create_task(self._initialize_connection())
+        # Secondary indexes: node ids by type and mission ids by key attribute
+        self.nodes_by_type: Dict[str, Set[str]] = defaultdict(set)
+        self.mission_index: Dict[str, Dict[Any, Set[str]]] = {key: defaultdict(set) for key in MISSION_INDEX_KEYS}
+        
+        # Incremental aggregates: success by mission attribute combination and
+        # influence of each pattern/terrain/mission factor on outcomes
+        self.pattern_aggregates: Dict[Tuple[Any, ...], SuccessAggregate] = defaultdict(SuccessAggregate)
+        self.factor_aggregates: Dict[str, SuccessAggregate] = defaultdict(SuccessAggregate)
+        self._factor_rankings: Dict[str, _FactorRanking] = defaultdict(_FactorRanking)
+        self._mission_contributions: Dict[str, Tuple[Tuple[Any, ...], float]] = {}
+        self._edge_contributions: Dict[str, Tuple[str, float, float]] = {}
+        
+        self._ready = asyncio.Event()
+        self._init_task: Optional[asyncio.Task] = None
+        self._load_task: Optional[asyncio.Task] = None
+        
+        # No I/O here: the first query (or ensure_ready()/initialize()) loads the
+        # snapshot and connects to Neo4j
+    
+    async def initialize(self):
+        """Load the snapshot (if any), then connect to Neo4j and page the graph in the background"""
+        try:
+            if self.snapshot_path and os.path.exists(self.snapshot_path):
+                await self.load_snapshot(self.snapshot_path)
+        finally:
+            self._ready.set()
+        
+        if self.connect:
+            await self._initialize_connection()
+    
+    async def ensure_ready(self):
+        """Start lazy initialization if needed and wait until snapshot data is queryable"""
+        if self._init_task is None:
+            self._init_task = asyncio.get_running_loop().create_task(self.initialize())
+        await self._ready.wait()
     
     async def _initialize_connection(self):
-        """Initialize Neo4j connection and load existing data"""
+        """Initialize Neo4j connection and start loading existing data"""
+        if not NEO4J_AVAILABLE:
+            return
         try:
             self.driver = GraphDatabase.driver(
                 self.neo4j_uri,
@@ -105,12 +224,10 @@ class SARKnowledgeGraph:
             )
             
             # Test connection
-            with self.driver.session() as session:
-                result = session.run("RETURN 1")
-                result.single()
+            await asyncio.to_thread(self._run_query, "RETURN 1")
             
-            # Load existing data into memory graph
-            await self._load_graph_to_memory()
+            # Page existing data into the memory graph without blocking startup
+            self._load_task = asyncio.create_task(self._load_graph_to_memory())
             
             logger.info("Knowledge graph initialized successfully")
             
@@ -119,53 +236,63 @@ class SARKnowledgeGraph:
             # Fallback to in-memory only mode
             self.driver = None
     
+    def _run_query(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run a Cypher query synchronously and materialize its records (call via to_thread)"""
+        with self.driver.session() as session:
+            return [record.data() for record in session.run(query, parameters or {})]
+    
     async def _load_graph_to_memory(self):
-        """Load Neo4j graph data into memory for fast queries"""
+        """Page Neo4j graph data into memory using keyset pagination on node id"""
         try:
             if not self.driver:
                 return
             
-            with self.driver.session() as session:
-                # Load nodes
-                node_query = """
-                MATCH (n)
-                RETURN n.id as node_id, labels(n)[0] as node_type, 
-                       properties(n) as properties, n.confidence as confidence,
-                       n.created_at as created_at, n.last_updated as last_updated,
-                       n.usage_count as usage_count, n.success_rate as success_rate
-                """
-                
-                for record in session.run(node_query):
-                    node = GraphNode(
+            node_query = """
+            MATCH (n) WHERE n.id > $after
+            RETURN n.id as node_id, coalesce(n.type, labels(n)[0]) as node_type,
+                   properties(n) as properties, n.confidence as confidence,
+                   n.created_at as created_at, n.last_updated as last_updated,
+                   n.usage_count as usage_count, n.success_rate as success_rate
+            ORDER BY n.id LIMIT $limit
+            """
+            after, node_count = "", 0
+            while True:
+                records = await asyncio.to_thread(self._run_query, node_query, {"after": after, "limit": self.page_size})
+                for record in records:
+                    properties = dict(record["properties"])
+                    if isinstance(properties.get("properties"), str):
+                        # Nodes written by _add_node store their property map as JSON
+                        properties = json.loads(properties["properties"])
+                    self._index_node(GraphNode(
                         node_id=record["node_id"],
                         node_type=NodeType(record["node_type"]),
-                        properties=dict(record["properties"]),
+                        properties=properties,
                         confidence=record["confidence"] or 0.5,
                         created_at=datetime.fromisoformat(record["created_at"]) if record["created_at"] else datetime.utcnow(),
                         last_updated=datetime.fromisoformat(record["last_updated"]) if record["last_updated"] else datetime.utcnow(),
                         usage_count=record["usage_count"] or 0,
                         success_rate=record["success_rate"] or 0.0
-                    )
-                    
-                    self.node_cache[node.node_id] = node
-                    self.memory_graph.add_node(
-                        node.node_id,
-                        node_type=node.node_type.value,
-                        **node.properties
-                    )
-                
-                # Load relationships
-                relationship_query = """
-                MATCH (s)-[r]->(t)
-                RETURN s.id as source_id, t.id as target_id, type(r) as relationship_type,
-                       r.strength as strength, r.confidence as confidence,
-                       r.evidence as evidence, r.evidence_count as evidence_count,
-                       r.created_at as created_at, r.last_verified as last_verified,
-                       r.success_rate as success_rate
-                """
-                
-                for record in session.run(relationship_query):
-                    relationship = GraphRelationship(
+                    ))
+                node_count += len(records)
+                if len(records) < self.page_size:
+                    break
+                after = records[-1]["node_id"]
+            
+            relationship_query = """
+            MATCH (s)-[r]->(t) WHERE id(r) > $after
+            RETURN id(r) as rid, s.id as source_id, t.id as target_id,
+                   coalesce(r.type, type(r)) as relationship_type,
+                   r.strength as strength, r.confidence as confidence,
+                   r.evidence as evidence, r.evidence_count as evidence_count,
+                   r.created_at as created_at, r.last_verified as last_verified,
+                   r.success_rate as success_rate
+            ORDER BY id(r) LIMIT $limit
+            """
+            after, relationship_count = -1, 0
+            while True:
+                records = await asyncio.to_thread(self._run_query, relationship_query, {"after": after, "limit": self.page_size})
+                for record in records:
+                    self._index_relationship(GraphRelationship(
                         relationship_id=f"{record['source_id']}_{record['relationship_type']}_{record['target_id']}",
                         source_node_id=record["source_id"],
                         target_node_id=record["target_id"],
@@ -177,22 +304,103 @@ class SARKnowledgeGraph:
                         created_at=datetime.fromisoformat(record["created_at"]) if record["created_at"] else datetime.utcnow(),
                         last_verified=datetime.fromisoformat(record["last_verified"]) if record["last_verified"] else datetime.utcnow(),
                         success_rate=record["success_rate"] or 0.0
-                    )
-                    
-                    self.relationship_cache[relationship.relationship_id] = relationship
-                    self.memory_graph.add_edge(
-                        relationship.source_node_id,
-                        relationship.target_node_id,
-                        relationship_type=relationship.relationship_type.value,
-                        strength=relationship.strength,
-                        confidence=relationship.confidence
-                    )
-            
-            logger.info(f"Loaded {len(self.node_cache)} nodes and {len(self.relationship_cache)} relationships into memory")
+                    ))
+                relationship_count += len(records)
+                if len(records) < self.page_size:
+                    break
+                after = records[-1]["rid"]
+            
+            logger.info(f"Loaded {node_count} nodes and {relationship_count} relationships into memory")
             
         except Exception as e:
             logger.error(f"Failed to load graph to memory: {e}")
     
+    def _index_node(self, node: GraphNode):
+        """Add or replace a node in the memory graph and keep indexes/aggregates current"""
+        previous = self.node_cache.get(node.node_id)
+        if previous is not None:
+            self.nodes_by_type[previous.node_type.value].discard(node.node_id)
+            if previous.node_type == NodeType.MISSION:
+                self._unindex_mission(previous)
+        
+        self.node_cache[node.node_id] = node
+        self.memory_graph.add_node(
+            node.node_id,
+            node_type=node.node_type.value,
+            **node.properties
+        )
+        self.nodes_by_type[node.node_type.value].add(node.node_id)
+        if node.node_type == NodeType.MISSION:
+            self._index_mission(node)
+    
+    def _mission_key(self, properties: Dict[str, Any]) -> Tuple[Any, ...]:
+        if "weather_conditions" not in properties:
+            weather_condition = ATTRIBUTE_MISSING
+        elif isinstance(properties["weather_conditions"], dict):
+            weather_condition = properties["weather_conditions"].get("condition", ATTRIBUTE_MISSING)
+        else:
+            weather_condition = WEATHER_NOT_A_DICT
+        values = (
+            properties.get("mission_type", ATTRIBUTE_MISSING),
+            properties.get("terrain_type", ATTRIBUTE_MISSING),
+            properties.get("search_pattern", ATTRIBUTE_MISSING),
+            weather_condition,
+        )
+        return tuple(
+            value if isinstance(value, (str, int, float, bool, tuple, type(None))) else str(value) for value in values
+        )
+    
+    def _index_mission(self, node: GraphNode):
+        key = self._mission_key(node.properties)
+        for attribute, value in zip(MISSION_INDEX_KEYS, key):
+            self.mission_index[attribute][value].add(node.node_id)
+        success_rate = float(node.properties.get("success_rate", 0.0) or 0.0)
+        self.pattern_aggregates[key].add(success_rate)
+        self._mission_contributions[node.node_id] = (key, success_rate)
+    
+    def _unindex_mission(self, node: GraphNode):
+        key, success_rate = self._mission_contributions.pop(node.node_id, (None, 0.0))
+        if key is None:
+            return
+        for attribute, value in zip(MISSION_INDEX_KEYS, key):
+            self.mission_index[attribute][value].discard(node.node_id)
+        self.pattern_aggregates[key].remove(success_rate)
+        if self.pattern_aggregates[key].count <= 0:
+            del self.pattern_aggregates[key]
+    
+    def _index_relationship(self, relationship: GraphRelationship):
+        """Add or replace a relationship and update outcome-influence aggregates"""
+        replaced = relationship.relationship_id in self.relationship_cache
+        self.relationship_cache[relationship.relationship_id] = relationship
+        if not replaced:
+            self.memory_graph.add_edge(
+                relationship.source_node_id,
+                relationship.target_node_id,
+                relationship_type=relationship.relationship_type.value,
+                strength=relationship.strength,
+                confidence=relationship.confidence
+            )
+        
+        # Track how strongly each pattern/terrain/mission factor drives outcome success
+        source = self.node_cache.get(relationship.source_node_id)
+        target = self.node_cache.get(relationship.target_node_id)
+        if source is None or target is None or target.node_type != NodeType.OUTCOME:
+            return
+        factor_type = source.node_type.value
+        if factor_type not in OPTIMIZATION_FACTOR_TYPES:
+            return
+        
+        aggregate = self.factor_aggregates[source.node_id]
+        previous = self._edge_contributions.get(relationship.relationship_id)
+        if previous is not None:
+            aggregate.remove(previous[1], previous[2])
+        outcome_success = float(target.properties.get("success_rate", 0.0) or 0.0)
+        aggregate.add(outcome_success, relationship.strength)
+        self._edge_contributions[relationship.relationship_id] = (source.node_id, outcome_success, relationship.strength)
+        self._factor_rankings[factor_type].update(
+            source.node_id, aggregate.strength * (1.0 - aggregate.success_rate)
+        )
+    
     async def add_mission_knowledge(
         self,
         mission_data: Dict[str, Any],
@@ -353,37 +561,31 @@ class SARKnowledgeGraph:
         """Add node to both Neo4j and memory graph"""
         try:
             # Add to memory graph
-            self.node_cache[node.node_id] = node
-            self.memory_graph.add_node(
-                node.node_id,
-                node_type=node.node_type.value,
-                **node.properties
-            )
+            self._index_node(node)
             
             # Add to Neo4j if available
             if self.driver:
-                with self.driver.session() as session:
-                    query = """
-                    MERGE (n:Node {id: $node_id})
-                    SET n.type = $node_type,
-                        n.properties = $properties,
-                        n.confidence = $confidence,
-                        n.created_at = $created_at,
-                        n.last_updated = $last_updated,
-                        n.usage_count = $usage_count,
-                        n.success_rate = $success_rate
-                    """
-                    
-                    session.run(query, {
-                        "node_id": node.node_id,
-                        "node_type": node.node_type.value,
-                        "properties": node.properties,
-                        "confidence": node.confidence,
-                        "created_at": node.created_at.isoformat(),
-                        "last_updated": node.last_updated.isoformat(),
-                        "usage_count": node.usage_count,
-                        "success_rate": node.success_rate
-                    })
+                query = """
+                MERGE (n:Node {id: $node_id})
+                SET n.type = $node_type,
+                    n.properties = $properties,
+                    n.confidence = $confidence,
+                    n.created_at = $created_at,
+                    n.last_updated = $last_updated,
+                    n.usage_count = $usage_count,
+                    n.success_rate = $success_rate
+                """
+                
+                await asyncio.to_thread(self._run_query, query, {
+                    "node_id": node.node_id,
+                    "node_type": node.node_type.value,
+                    "properties": json.dumps(node.properties, default=str),
+                    "confidence": node.confidence,
+                    "created_at": node.created_at.isoformat(),
+                    "last_updated": node.last_updated.isoformat(),
+                    "usage_count": node.usage_count,
+                    "success_rate": node.success_rate
+                })
             
         except Exception as e:
             logger.error(f"Failed to add node {node.node_id}: {e}")
@@ -392,42 +594,34 @@ class SARKnowledgeGraph:
         """Add relationship to both Neo4j and memory graph"""
         try:
             # Add to memory graph
-            self.relationship_cache[relationship.relationship_id] = relationship
-            self.memory_graph.add_edge(
-                relationship.source_node_id,
-                relationship.target_node_id,
-                relationship_type=relationship.relationship_type.value,
-                strength=relationship.strength,
-                confidence=relationship.confidence
-            )
+            self._index_relationship(relationship)
             
             # Add to Neo4j if available
             if self.driver:
-                with self.driver.session() as session:
-                    query = """
-                    MATCH (s:Node {id: $source_id}), (t:Node {id: $target_id})
-                    MERGE (s)-[r:RELATIONSHIP {type: $relationship_type}]->(t)
-                    SET r.strength = $strength,
-                        r.confidence = $confidence,
-                        r.evidence = $evidence,
-                        r.evidence_count = $evidence_count,
-                        r.created_at = $created_at,
-                        r.last_verified = $last_verified,
-                        r.success_rate = $success_rate
-                    """
-                    
-                    session.run(query, {
-                        "source_id": relationship.source_node_id,
-                        "target_id": relationship.target_node_id,
-                        "relationship_type": relationship.relationship_type.value,
-                        "strength": relationship.strength,
-                        "confidence": relationship.confidence,
-                        "evidence": relationship.evidence,
-                        "evidence_count": relationship.evidence_count,
-                        "created_at": relationship.created_at.isoformat(),
-                        "last_verified": relationship.last_verified.isoformat(),
-                        "success_rate": relationship.success_rate
-                    })
+                query = """
+                MATCH (s:Node {id: $source_id}), (t:Node {id: $target_id})
+                MERGE (s)-[r:RELATIONSHIP {type: $relationship_type}]->(t)
+                SET r.strength = $strength,
+                    r.confidence = $confidence,
+                    r.evidence = $evidence,
+                    r.evidence_count = $evidence_count,
+                    r.created_at = $created_at,
+                    r.last_verified = $last_verified,
+                    r.success_rate = $success_rate
+                """
+                
+                await asyncio.to_thread(self._run_query, query, {
+                    "source_id": relationship.source_node_id,
+                    "target_id": relationship.target_node_id,
+                    "relationship_type": relationship.relationship_type.value,
+                    "strength": relationship.strength,
+                    "confidence": relationship.confidence,
+                    "evidence": relationship.evidence,
+                    "evidence_count": relationship.evidence_count,
+                    "created_at": relationship.created_at.isoformat(),
+                    "last_verified": relationship.last_verified.isoformat(),
+                    "success_rate": relationship.success_rate
+                })
             
         except Exception as e:
             logger.error(f"Failed to add relationship {relationship.relationship_id}: {e}")
@@ -438,6 +632,7 @@ class SARKnowledgeGraph:
     ) -> List[Dict[str, Any]]:
         """Query the knowledge graph for insights"""
         try:
+            await self.ensure_ready()
             results = []
             
             # Use NetworkX for fast in-memory queries
@@ -463,36 +658,37 @@ class SARKnowledgeGraph:
     async def _find_successful_patterns(self, query: GraphQuery) -> List[Dict[str, Any]]:
         """Find successful patterns for similar conditions"""
         try:
-            results = []
+            # Success per pattern across missions matching the constraints
+            pattern_stats: Dict[Any, SuccessAggregate] = defaultdict(SuccessAggregate)
             
-            # Find missions with similar terrain/weather conditions
-            for node_id, node_data in self.memory_graph.nodes(data=True):
-                if node_data.get("node_type") == "mission":
-                    # Check if mission matches query constraints
+            aggregate_filter = self._aggregate_filter(query.constraints)
+            if aggregate_filter is not None:
+                # Constraints only touch indexed attributes: answer from the aggregates
+                for key, aggregate in self.pattern_aggregates.items():
+                    if all(key[position] in (value, ATTRIBUTE_MISSING) for position, value in aggregate_filter):
+                        stats = pattern_stats[key[2]]
+                        stats.count += aggregate.count
+                        stats.success_total += aggregate.success_total
+            else:
+                for node_id in self._candidate_missions(query.constraints):
+                    node_data = self.memory_graph.nodes[node_id]
                     if self._matches_constraints(node_data, query.constraints):
-                        # Find associated patterns and outcomes
-                        pattern_nodes = []
-                        outcome_nodes = []
-                        
-                        for neighbor in self.memory_graph.successors(node_id):
-                            neighbor_data = self.memory_graph.nodes[neighbor]
-                            if neighbor_data.get("node_type") == "pattern":
-                                pattern_nodes.append(neighbor)
-                            elif neighbor_data.get("node_type") == "outcome":
-                                outcome_nodes.append(neighbor)
-                        
-                        # Calculate pattern effectiveness
-                        for pattern_id in pattern_nodes:
-                            pattern_data = self.memory_graph.nodes[pattern_id]
-                            effectiveness = self._calculate_pattern_effectiveness(pattern_id, outcome_nodes)
-                            
-                            if effectiveness > 0.7:  # Only include highly effective patterns
-                                results.append({
-                                    "pattern_type": pattern_data.get("pattern_type"),
-                                    "effectiveness": effectiveness,
-                                    "use_cases": pattern_data.get("typical_use_cases", []),
-                                    "evidence": self._get_pattern_evidence(pattern_id)
-                                })
+                        key, success_rate = self._mission_contributions[node_id]
+                        pattern_stats[key[2]].add(success_rate)
+            
+            results = []
+            for pattern_type, stats in pattern_stats.items():
+                effectiveness = stats.success_rate
+                pattern_id = f"pattern_{pattern_type}"
+                if effectiveness > 0.7 and pattern_id in self.memory_graph:  # Only include highly effective patterns
+                    pattern_data = self.memory_graph.nodes[pattern_id]
+                    results.append({
+                        "pattern_type": pattern_data.get("pattern_type", pattern_type),
+                        "effectiveness": effectiveness,
+                        "mission_count": stats.count,
+                        "use_cases": pattern_data.get("typical_use_cases", []),
+                        "evidence": self._get_pattern_evidence(pattern_id)
+                    })
             
             # Sort by effectiveness
             results.sort(key=lambda x: x["effectiveness"], reverse=True)
@@ -502,46 +698,56 @@ class SARKnowledgeGraph:
             logger.error(f"Failed to find successful patterns: {e}")
             return []
     
+    def _aggregate_filter(self, constraints: Dict[str, Any]) -> Optional[List[Tuple[int, Any]]]:
+        """Map constraints onto mission-key positions, or None if they need a per-mission scan"""
+        positions = {key: position for position, key in enumerate(MISSION_INDEX_KEYS)}
+        key_filter = []
+        for key, value in constraints.items():
+            if key == "weather_conditions":
+                if not isinstance(value, dict) or set(value) - {"condition"}:
+                    return None
+                if "condition" in value:
+                    key_filter.append((positions["weather_condition"], value["condition"]))
+            elif key in positions and key != "weather_condition":
+                key_filter.append((positions[key], value))
+            else:
+                return None
+        return key_filter
+    
+    def _candidate_missions(self, constraints: Dict[str, Any]) -> Iterable[str]:
+        """Narrow mission ids via the attribute indexes (smallest posting list first)"""
+        postings = []
+        for key, value in constraints.items():
+            if key == "weather_conditions" and isinstance(value, dict) and "condition" in value:
+                key, value = "weather_condition", value["condition"]
+            elif key not in self.mission_index or key == "weather_condition":
+                continue
+            # Missions without the attribute match any value of it
+            index = self.mission_index[key]
+            postings.append(index.get(value, set()) | index.get(ATTRIBUTE_MISSING, set()))
+        if not postings:
+            return list(self.nodes_by_type[NodeType.MISSION.value])
+        postings.sort(key=len)
+        return list(set.intersection(*postings)) if len(postings) > 1 else list(postings[0])
+    
     async def _find_optimization_opportunities(self, query: GraphQuery) -> List[Dict[str, Any]]:
         """Find optimization opportunities based on historical data"""
         try:
             results = []
             
-            # Analyze relationships between different factors and outcomes
-            optimization_insights = defaultdict(list)
-            
-            for source_id, target_id, edge_data in self.memory_graph.edges(data=True):
-                if edge_data.get("node_type") == "outcome":
-                    # Find what influenced this outcome
-                    for predecessor in self.memory_graph.predecessors(target_id):
-                        predecessor_data = self.memory_graph.nodes[predecessor]
-                        predecessor_type = predecessor_data.get("node_type")
-                        
-                        if predecessor_type in ["pattern", "terrain", "mission"]:
-                            relationship_strength = edge_data.get("strength", 0.0)
-                            outcome_success = predecessor_data.get("success_rate", 0.0)
-                            
-                            optimization_insights[predecessor_type].append({
-                                "factor": predecessor,
-                                "strength": relationship_strength,
-                                "outcome": outcome_success,
-                                "optimization_potential": relationship_strength * (1.0 - outcome_success)
-                            })
-            
-            # Generate optimization recommendations
-            for factor_type, insights in optimization_insights.items():
-                # Sort by optimization potential
-                insights.sort(key=lambda x: x["optimization_potential"], reverse=True)
-                
-                for insight in insights[:3]:  # Top 3 for each factor type
-                    if insight["optimization_potential"] > 0.3:
+            # Factors are ranked incrementally by strength * (1 - outcome success)
+            for factor_type in OPTIMIZATION_FACTOR_TYPES:
+                for factor, potential in self._factor_rankings[factor_type].top(3):  # Top 3 for each factor type
+                    if potential > 0.3:
+                        aggregate = self.factor_aggregates[factor]
                         results.append({
                             "factor_type": factor_type,
-                            "factor": insight["factor"],
-                            "optimization_potential": insight["optimization_potential"],
-                            "current_performance": insight["outcome"],
+                            "factor": factor,
+                            "optimization_potential": potential,
+                            "current_performance": aggregate.success_rate,
+                            "evidence_count": aggregate.count,
                             "recommendation": self._generate_optimization_recommendation(
-                                factor_type, insight["factor"], insight["optimization_potential"]
+                                factor_type, factor, potential
                             )
                         })
             
@@ -561,13 +767,13 @@ class SARKnowledgeGraph:
             
             # Find similar missions
             similar_missions = []
-            for node_id, node_data in self.memory_graph.nodes(data=True):
-                if node_data.get("node_type") == "mission":
-                    similarity_score = self._calculate_mission_similarity(
-                        node_data, constraints
-                    )
-                    if similarity_score > 0.6:
-                        similar_missions.append((node_id, similarity_score, node_data))
+            for node_id in self.nodes_by_type[NodeType.MISSION.value]:
+                node_data = self.memory_graph.nodes[node_id]
+                similarity_score = self._calculate_mission_similarity(
+                    node_data, constraints
+                )
+                if similarity_score > 0.6:
+                    similar_missions.append((node_id, similarity_score, node_data))
             
             if not similar_missions:
                 return {
@@ -813,31 +1019,18 @@ class SARKnowledgeGraph:
                     return False
         return True
     
-    def _calculate_pattern_effectiveness(self, pattern_id: str, outcome_nodes: List[str]) -> float:
-        """Calculate effectiveness of a pattern based on outcomes"""
-        if not outcome_nodes:
-            return 0.0
-        
-        total_success = 0.0
-        for outcome_id in outcome_nodes:
-            outcome_data = self.memory_graph.nodes[outcome_id]
-            success_rate = outcome_data.get("success_rate", 0.0)
-            total_success += success_rate
-        
-        return total_success / len(outcome_nodes)
-    
     def _get_pattern_evidence(self, pattern_id: str) -> List[str]:
         """Get evidence supporting pattern effectiveness"""
-        evidence = []
-        pattern_data = self.memory_graph.nodes[pattern_id]
-        
-        # Find missions that used this pattern
-        for mission_id in self.memory_graph.predecessors(pattern_id):
-            mission_data = self.memory_graph.nodes[mission_id]
-            if mission_data.get("node_type") == "mission":
-                evidence.append(f"Used in mission {mission_data.get('mission_id', 'unknown')}")
-        
-        return evidence[:5]  # Limit to 5 pieces of evidence
+        # Find missions that used this pattern, stopping at 5 pieces of evidence
+        missions = (
+            self.memory_graph.nodes[mission_id]
+            for mission_id in self.memory_graph.predecessors(pattern_id)
+            if self.memory_graph.nodes[mission_id].get("node_type") == "mission"
+        )
+        return [
+            f"Used in mission {mission_data.get('mission_id', 'unknown')}"
+            for mission_data in islice(missions, 5)
+        ]
     
     def _generate_optimization_recommendation(self, factor_type: str, factor: str, potential: float) -> str:
         """Generate optimization recommendation based on factor analysis"""
@@ -956,9 +1149,9 @@ class SARKnowledgeGraph:
             }
             
             # Node type distribution
-            for node in self.node_cache.values():
-                node_type = node.node_type.value
-                stats["node_types"][node_type] = stats["node_types"].get(node_type, 0) + 1
+            stats["node_types"] = {
+                node_type: len(node_ids) for node_type, node_ids in self.nodes_by_type.items() if node_ids
+            }
             
             # Relationship type distribution
             for rel in self.relationship_cache.values():
@@ -980,6 +1173,82 @@ class SARKnowledgeGraph:
         except Exception as e:
             logger.error(f"Failed to get graph statistics: {e}")
             return {"error": str(e)}
+    
+    async def save_snapshot(self, path: Optional[str] = None) -> str:
+        """Write the in-memory graph to a snapshot file so restarts need no Neo4j"""
+        path = path or self.snapshot_path
+        if not path:
+            raise ValueError("No snapshot path configured")
+        
+        # Copy references on the loop, serialize in a worker thread
+        nodes = list(self.node_cache.values())
+        relationships = list(self.relationship_cache.values())
+        await asyncio.to_thread(self._write_snapshot, path, nodes, relationships)
+        logger.info(f"Saved knowledge graph snapshot with {len(nodes)} nodes to {path}")
+        return path
+    
+    @staticmethod
+    def _write_snapshot(path: str, nodes: List[GraphNode], relationships: List[GraphRelationship]):
+        payload = {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "saved_at": datetime.utcnow().isoformat(),
+            "nodes": [
+                (n.node_id, n.node_type.value, n.properties, n.confidence, n.created_at.isoformat(),
+                 n.last_updated.isoformat(), n.usage_count, n.success_rate)
+                for n in nodes
+            ],
+            "relationships": [
+                (r.relationship_id, r.source_node_id, r.target_node_id, r.relationship_type.value,
+                 r.strength, r.confidence, r.evidence, r.evidence_count, r.created_at.isoformat(),
+                 r.last_verified.isoformat(), r.success_rate)
+                for r in relationships
+            ],
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        # JSON rather than pickle, so loading a snapshot cannot execute code; properties
+        # that are not JSON types are stored as strings, as they are in Neo4j
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, default=str)
+        os.replace(temp_path, path)
+    
+    async def load_snapshot(self, path: Optional[str] = None) -> int:
+        """Load a snapshot written by save_snapshot into the memory graph and indexes"""
+        path = path or self.snapshot_path
+        
+        def _read():
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        
+        payload = await asyncio.to_thread(_read)
+        if payload.get("version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported knowledge graph snapshot version: {payload.get('version')}")
+        
+        # Index in chunks so a large snapshot does not starve the event loop
+        nodes = payload["nodes"]
+        for start in range(0, len(nodes), self.page_size):
+            for row in nodes[start:start + self.page_size]:
+                self._index_node(GraphNode(
+                    node_id=row[0], node_type=NodeType(row[1]), properties=row[2], confidence=row[3],
+                    created_at=datetime.fromisoformat(row[4]), last_updated=datetime.fromisoformat(row[5]),
+                    usage_count=row[6], success_rate=row[7]
+                ))
+            await asyncio.sleep(0)
+        
+        relationships = payload["relationships"]
+        for start in range(0, len(relationships), self.page_size):
+            for row in relationships[start:start + self.page_size]:
+                self._index_relationship(GraphRelationship(
+                    relationship_id=row[0], source_node_id=row[1], target_node_id=row[2],
+                    relationship_type=RelationshipType(row[3]), strength=row[4], confidence=row[5],
+                    evidence=row[6], evidence_count=row[7], created_at=datetime.fromisoformat(row[8]),
+                    last_verified=datetime.fromisoformat(row[9]), success_rate=row[10]
+                ))
+            await asyncio.sleep(0)
+        
+        logger.info(f"Loaded knowledge graph snapshot from {path}: {len(nodes)} nodes, {len(relationships)} relationships")
+        return len(nodes)
 
 # Global knowledge graph instance
 knowledge_graph = SARKnowledgeGraph()
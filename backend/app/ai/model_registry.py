@@ -0,0 +1,169 @@
+"""
+Model registry for SAR Mission Commander
+Versioned, checksummed model artifacts on local disk
+
+Layout::
+
+    <root>/<name>/<version>/artifact.joblib   fitted models, scalers, encoders
+    <root>/<name>/<version>/manifest.json     sha256, size, created_at, metadata
+    <root>/<name>/CURRENT                     active version
+
+Artifacts are written uncompressed with joblib so large NumPy arrays can
+be memory-mapped on load. Versions are published into a temporary
+directory and renamed into place, and CURRENT is replaced atomically, so
+readers never see a partial artifact and a new version can be activated
+while the old one is still serving.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FILE = "artifact.joblib"
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+
+class ModelIntegrityError(RuntimeError):
+    """Artifact on disk does not match its manifest checksum"""
+
+
+@dataclass
+class ModelManifest:
+    """Metadata stored next to each artifact version"""
+    name: str
+    version: str
+    sha256: str
+    size_bytes: int
+    created_at: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def _sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, text: str):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    """Local on-disk registry of versioned model artifacts"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _model_dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def publish(self, name: str, artifact: Any, metadata: Optional[Dict[str, Any]] = None,
+                version: Optional[str] = None, activate: bool = True) -> str:
+        """Write a new artifact version; returns the version id"""
+        model_dir = self._model_dir(name)
+        os.makedirs(model_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=model_dir, prefix=".staging_")
+        try:
+            artifact_path = os.path.join(staging, ARTIFACT_FILE)
+            joblib.dump(artifact, artifact_path)  # uncompressed so arrays can be memory-mapped
+            checksum = _sha256(artifact_path)
+            version = version or f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{checksum[:8]}"
+            manifest = ModelManifest(
+                name=name,
+                version=version,
+                sha256=checksum,
+                size_bytes=os.path.getsize(artifact_path),
+                created_at=datetime.utcnow().isoformat(),
+                metadata=metadata or {},
+            )
+            with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+                json.dump(asdict(manifest), f, indent=2, default=str)
+            os.replace(staging, os.path.join(model_dir, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"Published model {name} version {version} ({manifest.size_bytes} bytes)")
+        if activate:
+            self.activate(name, version)
+        return version
+
+    def activate(self, name: str, version: str):
+        """Point CURRENT at an existing version"""
+        if not os.path.isfile(os.path.join(self._model_dir(name), version, MANIFEST_FILE)):
+            raise KeyError(f"Unknown version {version} of model {name}")
+        _write_atomic(os.path.join(self._model_dir(name), CURRENT_FILE), version)
+        logger.info(f"Activated model {name} version {version}")
+
+    def current_version(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self._model_dir(name), CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self, name: str) -> List[str]:
+        """Published versions, oldest first"""
+        model_dir = self._model_dir(name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(
+            entry for entry in os.listdir(model_dir)
+            if os.path.isfile(os.path.join(model_dir, entry, MANIFEST_FILE))
+        )
+
+    def manifest(self, name: str, version: Optional[str] = None) -> ModelManifest:
+        version = version or self.current_version(name)
+        if version is None:
+            raise KeyError(f"No active version of model {name}")
+        with open(os.path.join(self._model_dir(name), version, MANIFEST_FILE)) as f:
+            return ModelManifest(**json.load(f))
+
+    def load(self, name: str, version: Optional[str] = None, mmap_mode: Optional[str] = "r",
+             verify: bool = True) -> Tuple[Any, ModelManifest]:
+        """Load an artifact (the active version by default), checking its checksum"""
+        manifest = self.manifest(name, version)
+        artifact_path = os.path.join(self._model_dir(name), manifest.version, ARTIFACT_FILE)
+        if verify and _sha256(artifact_path) != manifest.sha256:
+            raise ModelIntegrityError(f"Checksum mismatch for model {name} version {manifest.version}")
+        return joblib.load(artifact_path, mmap_mode=mmap_mode), manifest
+
+    def prune(self, name: str, keep: int = 3) -> List[str]:
+        """Delete old versions, always keeping the active one"""
+        current = self.current_version(name)
+        removed = []
+        for version in self.versions(name)[:-keep] if keep else self.versions(name):
+            if version != current:
+                shutil.rmtree(os.path.join(self._model_dir(name), version), ignore_errors=True)
+                removed.append(version)
+        return removed
+
+
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Registry at MODEL_REGISTRY_PATH"""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry(settings.MODEL_REGISTRY_PATH)
+    return _model_registry
@@ -3,12 +3,11 @@ Production-grade RAG (Retrieval-Augmented Generation) system for SAR operations
 Provides semantic search, knowledge retrieval, and contextual AI responses
 """
 import asyncio
+import importlib.util
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, SearchRequest
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import json
 import uuid
@@ -16,8 +15,30 @@ from dataclasses import dataclass
 from enum import Enum
 import hashlib
 
+from app.core.config import settings
+from .vector_index import (
+    LocalVectorIndex,
+    EmbeddingCache,
+    BatchedEmbeddingEncoder,
+    tokenize,
+    PointStruct as LocalPointStruct,
+)
+
 logger = logging.getLogger(__name__)
 
+try:
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, SearchRequest
+    QDRANT_AVAILABLE = True
+except ImportError:
+    QDRANT_AVAILABLE = False
+    logger.warning("⚠️ qdrant-client not available. Using the in-process vector index.")
+    PointStruct = LocalPointStruct
+
+# sentence-transformers pulls in torch; check for it here, import it only when
+# a RAG instance actually needs the default embedding model
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
 class KnowledgeType(Enum):
     MISSION_PATTERN = "mission_pattern"
     TERRAIN_KNOWLEDGE = "terrain_knowledge"
@@ -52,11 +73,37 @@ class SearchResult:
 class SARKnowledgeRAG:
     """Production-grade RAG system for SAR operations with advanced semantic search"""
     
-    def __init__(self, qdrant_host: str = "localhost", qdrant_port: int = 6333):
-        self.qdrant_client = QdrantClient(host=qdrant_host, port=qdrant_port)
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(
+        self,
+        qdrant_host: str = "localhost",
+        qdrant_port: int = 6333,
+        vector_store: Any = None,
+        embedding_model: Any = None
+    ):
+        # Any object exposing the QdrantClient create/upsert/search/get_collection
+        # subset works here; LocalVectorIndex is the embedded stand-in
+        if vector_store is not None:
+            self.qdrant_client = vector_store
+        elif QDRANT_AVAILABLE and settings.RAG_VECTOR_BACKEND == "qdrant":
+            self.qdrant_client = QdrantClient(host=qdrant_host, port=qdrant_port)
+        else:
+            self.qdrant_client = LocalVectorIndex()
+        if embedding_model is None:
+            if not SENTENCE_TRANSFORMERS_AVAILABLE:
+                raise RuntimeError("sentence-transformers is required when no embedding_model is supplied")
+            from sentence_transformers import SentenceTransformer
+            embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model = embedding_model
         self.embedding_dim = 384  # all-MiniLM-L6-v2 dimension
         
+        # Query embeddings are cached by text hash and encoded in batches off the loop
+        self.embedding_cache = EmbeddingCache(max_entries=settings.RAG_EMBEDDING_CACHE_SIZE)
+        self.encoder = BatchedEmbeddingEncoder(self.embedding_model, cache=self.embedding_cache)
+        
+        # Token sets for payloads returned by remote stores, keyed by document id
+        self._payload_tokens: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._payload_tokens_max = settings.RAG_EMBEDDING_CACHE_SIZE
+        
         # Collection names for different knowledge types
         self.collections = {
             KnowledgeType.MISSION_PATTERN: "sar_mission_patterns",
@@ -69,8 +116,13 @@ class SARKnowledgeRAG:
             KnowledgeType.REGULATORY_INFO: "sar_regulatory_info"
         }
         
-        # Initialize collections
-        asyncio.create_task(self._initialize_collections())
+        # Collections are created on first use, not from the constructor
+        self._collections_task: Optional[asyncio.Task] = None
+    
+    async def _ensure_collections(self):
+        if self._collections_task is None:
+            self._collections_task = asyncio.get_running_loop().create_task(self._initialize_collections())
+        await self._collections_task
     
     async def _initialize_collections(self):
         """Initialize all Qdrant collections with optimized configuration"""
@@ -90,7 +142,16 @@ class SARKnowledgeRAG:
     async def _create_collection(self, collection_name: str):
         """Create a Qdrant collection with production-optimized configuration"""
         try:
-            self.qdrant_client.create_collection(
+            if isinstance(self.qdrant_client, LocalVectorIndex):
+                await asyncio.to_thread(
+                    self.qdrant_client.create_collection,
+                    collection_name=collection_name,
+                    vectors_config={"size": self.embedding_dim, "distance": "Cosine"}
+                )
+                logger.info(f"Created collection: {collection_name}")
+                return
+            await asyncio.to_thread(
+                self.qdrant_client.create_collection,
                 collection_name=collection_name,
                 vectors_config=VectorParams(
                     size=self.embedding_dim,
@@ -126,6 +187,8 @@ class SARKnowledgeRAG:
     ) -> str:
         """Store mission knowledge in vector database with comprehensive metadata"""
         try:
+            await self._ensure_collections()
+            
             # Create comprehensive knowledge document
             doc_id = str(uuid.uuid4())
             timestamp = datetime.utcnow()
@@ -169,7 +232,7 @@ class SARKnowledgeRAG:
             
             # Generate embedding from comprehensive text
             embedding_text = self._generate_embedding_text(mission_data, outcomes, lessons_learned)
-            embedding = self.embedding_model.encode(embedding_text).tolist()
+            embedding = (await self.encoder.encode(embedding_text)).tolist()
             
             # Store in specific collection
             collection_name = self.collections[knowledge_type]
@@ -179,7 +242,8 @@ class SARKnowledgeRAG:
                 payload=knowledge_doc
             )
             
-            self.qdrant_client.upsert(
+            await asyncio.to_thread(
+                self.qdrant_client.upsert,
                 collection_name=collection_name,
                 points=[point]
             )
@@ -191,7 +255,8 @@ class SARKnowledgeRAG:
                 payload={**knowledge_doc, "primary_collection": collection_name}
             )
             
-            self.qdrant_client.upsert(
+            await asyncio.to_thread(
+                self.qdrant_client.upsert,
                 collection_name="sar_unified_knowledge",
                 points=[unified_point]
             )
@@ -213,30 +278,35 @@ class SARKnowledgeRAG:
     ) -> List[SearchResult]:
         """Advanced context retrieval with multi-type search and relevance scoring"""
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode(query).tolist()
+            await self._ensure_collections()
             
-            all_results = []
+            # Generate query embedding (cached, batched, off the event loop)
+            query_embedding = (await self.encoder.encode(query)).tolist()
             
-            # Search in specific collections if types specified
+            # Search in specific collections if types specified, all fanned out concurrently
             if knowledge_types:
-                for knowledge_type in knowledge_types:
-                    collection_name = self.collections[knowledge_type]
-                    results = await self._search_collection(
-                        collection_name, query_embedding, limit, similarity_threshold
+                searches = [
+                    self._search_collection(
+                        self.collections[knowledge_type], query_embedding, limit, similarity_threshold
                     )
-                    all_results.extend(results)
+                    for knowledge_type in knowledge_types
+                ]
             else:
                 # Search in unified collection for cross-type relevance
-                results = await self._search_collection(
-                    "sar_unified_knowledge", query_embedding, limit * 2, similarity_threshold
-                )
-                all_results.extend(results)
+                searches = [
+                    self._search_collection(
+                        "sar_unified_knowledge", query_embedding, limit * 2, similarity_threshold
+                    )
+                ]
+            all_results = [result for results in await asyncio.gather(*searches) for result in results]
             
             # Advanced relevance scoring and ranking
+            query_terms = tokenize(query)
             scored_results = []
             for result in all_results:
-                relevance_score = self._calculate_relevance_score(query, result.payload)
+                relevance_score = self._calculate_relevance_score(
+                    query, result.payload, query_terms=query_terms, document_terms=self._result_tokens(result)
+                )
                 explanation = self._generate_relevance_explanation(query, result.payload, result.score)
                 
                 search_result = SearchResult(
@@ -269,7 +339,8 @@ class SARKnowledgeRAG:
     ) -> List:
         """Search a specific collection with advanced filtering"""
         try:
-            search_results = self.qdrant_client.search(
+            search_results = await asyncio.to_thread(
+                self.qdrant_client.search,
                 collection_name=collection_name,
                 query_vector=query_embedding,
                 limit=limit,
@@ -477,13 +548,39 @@ class SARKnowledgeRAG:
         {lessons_learned}
         """
     
-    def _calculate_relevance_score(self, query: str, document_payload: Dict[str, Any]) -> float:
+    def _result_tokens(self, result: Any) -> FrozenSet[str]:
+        """Token set for a search hit, precomputed by the local index or cached per document"""
+        tokens = getattr(result, "tokens", None)
+        if tokens:
+            return tokens
+        
+        payload = result.payload or {}
+        key = f"{payload.get('id', result.id)}:{payload.get('updated_at', '')}"
+        tokens = self._payload_tokens.get(key)
+        if tokens is None:
+            tokens = tokenize(payload)
+            self._payload_tokens[key] = tokens
+            if len(self._payload_tokens) > self._payload_tokens_max:
+                self._payload_tokens.popitem(last=False)
+        else:
+            self._payload_tokens.move_to_end(key)
+        return tokens
+    
+    def _calculate_relevance_score(
+        self,
+        query: str,
+        document_payload: Dict[str, Any],
+        query_terms: Optional[FrozenSet[str]] = None,
+        document_terms: Optional[FrozenSet[str]] = None
+    ) -> float:
         """Calculate relevance score between query and document"""
-        query_terms = set(query.lower().split())
-        document_text = str(document_payload).lower()
+        if query_terms is None:
+            query_terms = tokenize(query)
+        if document_terms is None:
+            document_terms = tokenize(document_payload)
         
         # Term frequency scoring
-        term_matches = sum(1 for term in query_terms if term in document_text)
+        term_matches = len(query_terms & document_terms)
         term_score = term_matches / len(query_terms) if query_terms else 0.0
         
         # Semantic similarity (already calculated by Qdrant)
@@ -632,10 +729,12 @@ class SARKnowledgeRAG:
     async def get_knowledge_statistics(self) -> Dict[str, Any]:
         """Get statistics about the knowledge base"""
         try:
+            await self._ensure_collections()
+            
             stats = {}
             
             for knowledge_type, collection_name in self.collections.items():
-                collection_info = self.qdrant_client.get_collection(collection_name)
+                collection_info = await asyncio.to_thread(self.qdrant_client.get_collection, collection_name)
                 stats[knowledge_type.value] = {
                     "points_count": collection_info.points_count,
                     "indexed_vectors_count": collection_info.indexed_vectors_count,
@@ -643,12 +742,13 @@ class SARKnowledgeRAG:
                 }
             
             # Unified collection stats
-            unified_info = self.qdrant_client.get_collection("sar_unified_knowledge")
+            unified_info = await asyncio.to_thread(self.qdrant_client.get_collection, "sar_unified_knowledge")
             stats["unified"] = {
                 "points_count": unified_info.points_count,
                 "indexed_vectors_count": unified_info.indexed_vectors_count,
                 "status": unified_info.status
             }
+            stats["embedding_cache"] = self.embedding_cache.get_stats()
             
             return stats
             
@@ -656,5 +756,17 @@ class SARKnowledgeRAG:
             logger.error(f"Failed to get knowledge statistics: {e}")
             return {}
 
-# Global RAG instance
-sar_rag = SARKnowledgeRAG()
+_sar_rag: Optional[SARKnowledgeRAG] = None
+
+def get_sar_rag() -> SARKnowledgeRAG:
+    """Global RAG instance, built on first use (loads the embedding model)"""
+    global _sar_rag
+    if _sar_rag is None:
+        _sar_rag = SARKnowledgeRAG()
+    return _sar_rag
+
+def __getattr__(name):
+    # Keep `from app.ai.rag_system import sar_rag` working without building it at import
+    if name == "sar_rag":
+        return get_sar_rag()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,7 +13,12 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 import math
+import os
 import random
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Machine Learning Libraries
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, GradientBoostingClassifier, GradientBoostingRegressor
@@ -31,8 +36,43 @@ from scipy import stats
 from scipy.optimize import minimize
 import joblib
 
+from ..core.config import settings
+from .batch_inference import MicroBatcher, encode_column
+from .model_registry import ModelRegistry, get_model_registry
+
 logger = logging.getLogger(__name__)
 
+# Registry name of the bundle holding every fitted model, scaler and encoder
+MODEL_BUNDLE = "sar_mission_models"
+
+SEARCH_DENSITIES = ["low", "medium", "high"]
+SEARCH_PATTERNS = ["grid", "spiral", "sector", "lawnmower"]
+
+# Input columns of each model, in order. Training and prediction both build
+# their vectors from these lists so the two can never disagree.
+FEATURE_COLUMNS = {
+    'mission_outcome': [
+        'area_size', 'duration_hours', 'num_drones', 'target_urgency', 'time_of_day', 'season',
+        'wind_speed', 'visibility', 'temperature', 'humidity', 'battery_reserve',
+        'communication_range', 'altitude', 'speed',
+        'mission_type', 'terrain_type', 'weather_condition', 'search_density', 'search_pattern',
+    ],
+    'duration_prediction': [
+        'area_size', 'num_drones', 'target_urgency', 'wind_speed', 'visibility', 'battery_reserve',
+        'communication_range', 'altitude', 'speed',
+        'mission_type', 'terrain_type', 'weather_condition', 'search_density', 'search_pattern',
+    ],
+    'success_rate': [
+        'area_size', 'duration_hours', 'num_drones', 'target_urgency', 'wind_speed', 'visibility',
+        'temperature', 'humidity', 'battery_reserve', 'communication_range', 'altitude', 'speed',
+        'mission_type', 'terrain_type', 'weather_condition', 'search_density', 'search_pattern',
+    ],
+    'risk_assessment': [
+        'area_size', 'duration_hours', 'num_drones', 'wind_speed', 'visibility', 'temperature',
+        'humidity', 'battery_reserve', 'communication_range', 'terrain_type', 'weather_condition',
+    ],
+}
+
 class MissionType(Enum):
     """Types of SAR missions"""
     SEARCH = "search"
@@ -66,6 +106,51 @@ class MissionOutcome(Enum):
     FAILURE = "failure"
     CANCELLED = "cancelled"
 
+CATEGORICAL_VALUES = {
+    'mission_type': [m.value for m in MissionType],
+    'terrain_type': [t.value for t in TerrainType],
+    'weather_condition': [w.value for w in WeatherCondition],
+    'search_density': SEARCH_DENSITIES,
+    'search_pattern': SEARCH_PATTERNS,
+}
+
+def build_feature_vector(features: Dict[str, Any], model_name: str) -> List[float]:
+    """Numeric input vector for one model; categoricals become their index"""
+    vector = []
+    for column in FEATURE_COLUMNS[model_name]:
+        value = features[column]
+        if column in CATEGORICAL_VALUES:
+            value = CATEGORICAL_VALUES[column].index(value)
+        vector.append(value)
+    return vector
+
+def build_feature_matrix(rows: List[Dict[str, Any]], model_name: str) -> np.ndarray:
+    """Input matrix for many rows at once, column by column (same layout as build_feature_vector)"""
+    columns = []
+    for column in FEATURE_COLUMNS[model_name]:
+        values = [row[column] for row in rows]
+        if column in CATEGORICAL_VALUES:
+            columns.append(encode_column(values, CATEGORICAL_VALUES[column]))
+        else:
+            columns.append(np.asarray(values, dtype=np.float64))
+    return np.column_stack(columns)
+
+def predict_outcome_rows(models: Dict[str, Any], scalers: Dict[str, Any],
+                         rows: List[Dict[str, Any]]) -> List[Tuple[Dict[str, float], float]]:
+    """Outcome probabilities and duration for a batch: one predict call per model"""
+    model = models['mission_outcome']
+    probabilities = model.predict_proba(
+        scalers['mission_outcome'].transform(build_feature_matrix(rows, 'mission_outcome'))
+    )
+    durations = models['duration_prediction'].predict(
+        scalers['duration_prediction'].transform(build_feature_matrix(rows, 'duration_prediction'))
+    )
+    classes = [str(cls) for cls in model.classes_]
+    return [
+        (dict(zip(classes, row_probabilities.tolist())), float(duration))
+        for row_probabilities, duration in zip(probabilities, durations)
+    ]
+
 @dataclass
 class MissionFeatures:
     """Features for ML models"""
@@ -112,37 +197,119 @@ class SearchPatternOptimization:
 class RealMLModels:
     """Real machine learning models for SAR operations"""
     
-    def __init__(self):
+    def __init__(self, registry: Optional[ModelRegistry] = None, inference_workers: Optional[int] = None):
         self.models = {}
         self.scalers = {}
         self.encoders = {}
         self.is_trained = False
         self.training_data = []
+        self.training_samples = 0
         self.performance_metrics = {}
+        self.registry = registry
+        self.model_version: Optional[str] = None
+        self._init_lock = asyncio.Lock()
+        
+        # Concurrent predictions are coalesced into one model call per batch,
+        # run in worker processes when INFERENCE_PROCESS_WORKERS > 0
+        workers = settings.INFERENCE_PROCESS_WORKERS if inference_workers is None else inference_workers
+        self._inference_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) if workers > 0 else None
+        self._outcome_batcher = MicroBatcher(
+            lambda rows: predict_outcome_rows(self.models, self.scalers, rows),
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+            executor=self._inference_pool,
+            name="mission_outcome",
+        )
         
         logger.info("Initializing Real ML Models")
     
     async def initialize(self):
-        """Initialize and train ML models"""
+        """Load the active model bundle, training one in a background process if none exists"""
         try:
-            # Generate training data if none exists
-            if not self.training_data:
-                await self._generate_training_data()
-            
-            # Train all models
-            await self._train_mission_outcome_model()
-            await self._train_duration_prediction_model()
-            await self._train_success_rate_model()
-            await self._train_search_pattern_model()
-            await self._train_risk_assessment_model()
-            
-            self.is_trained = True
-            logger.info("All ML models trained successfully")
+            async with self._init_lock:
+                if self.is_trained:
+                    return
+                if self.registry is None:
+                    self.registry = get_model_registry()
+                if self.registry.current_version(MODEL_BUNDLE) is None:
+                    await self._train_in_background()
+                await self.reload_if_updated()
             
         except Exception as e:
             logger.error(f"ML model initialization failed: {e}")
             raise
     
+    async def retrain(self) -> Optional[str]:
+        """Train and publish a new bundle, then hot-swap it in; the old one serves meanwhile"""
+        if self.registry is None:
+            self.registry = get_model_registry()
+        await self._train_in_background()
+        await self.reload_if_updated()
+        return self.model_version
+    
+    async def reload_if_updated(self) -> bool:
+        """Swap in the registry's active bundle if it differs from the one being served"""
+        version = self.registry.current_version(MODEL_BUNDLE)
+        if version is None or version == self.model_version:
+            return False
+        
+        bundle, manifest = await asyncio.to_thread(self.registry.load, MODEL_BUNDLE, version)
+        # No awaits below: requests see either the old bundle or the new one
+        self.models = bundle['models']
+        self.scalers = bundle['scalers']
+        self.encoders = bundle['encoders']
+        self.performance_metrics = bundle['performance_metrics']
+        self.training_samples = bundle['training_samples']
+        self.model_version = manifest.version
+        if self._inference_pool is not None:
+            # Worker processes load this version from the registry themselves
+            self._outcome_batcher.predict_batch = partial(
+                predict_outcome_rows_from_registry, self.registry.root, manifest.version
+            )
+        self.is_trained = True
+        logger.info(f"Serving ML models version {manifest.version}")
+        return True
+    
+    async def _train_in_background(self):
+        """Run train_and_publish in a worker process so the event loop stays responsive"""
+        loop = asyncio.get_running_loop()
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                await loop.run_in_executor(pool, train_and_publish, self.registry.root)
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Background training process unavailable ({e}); training in a thread")
+            await asyncio.to_thread(train_and_publish, self.registry.root)
+    
+    async def _train_models(self):
+        """Generate training data and fit every model in this process"""
+        # Generate training data if none exists
+        if not self.training_data:
+            await self._generate_training_data()
+        
+        # Train all models
+        await self._train_mission_outcome_model()
+        await self._train_duration_prediction_model()
+        await self._train_success_rate_model()
+        await self._train_search_pattern_model()
+        await self._train_risk_assessment_model()
+        
+        self.training_samples = len(self.training_data)
+        self.is_trained = True
+        logger.info("All ML models trained successfully")
+    
+    def to_bundle(self) -> Dict[str, Any]:
+        """Everything needed to serve predictions, as stored in the registry"""
+        return {
+            'models': self.models,
+            'scalers': self.scalers,
+            'encoders': self.encoders,
+            'performance_metrics': self.performance_metrics,
+            'training_samples': self.training_samples,
+            'feature_columns': FEATURE_COLUMNS,
+        }
+    
     async def _generate_training_data(self):
         """Generate realistic training data for SAR missions"""
         logger.info("Generating training data...")
@@ -313,29 +480,7 @@ class RealMLModels:
         for data in self.training_data:
             features = data['features']
             
-            # Convert categorical features to numerical
-            feature_vector = [
-                features['area_size'],
-                features['duration_hours'],
-                features['num_drones'],
-                features['target_urgency'],
-                features['time_of_day'],
-                features['season'],
-                features['wind_speed'],
-                features['visibility'],
-                features['temperature'],
-                features['humidity'],
-                features['battery_reserve'],
-                features['communication_range'],
-                features['altitude'],
-                features['speed'],
-                # Categorical encodings
-                list(MissionType).index(MissionType(features['mission_type'])),
-                list(TerrainType).index(TerrainType(features['terrain_type'])),
-                list(WeatherCondition).index(WeatherCondition(features['weather_condition'])),
-                ["low", "medium", "high"].index(features['search_density']),
-                ["grid", "spiral", "sector", "lawnmower"].index(features['search_pattern'])
-            ]
+            feature_vector = build_feature_vector(features, 'mission_outcome')
             
             X.append(feature_vector)
             y.append(data['outcome'])
@@ -381,22 +526,7 @@ class RealMLModels:
         for data in self.training_data:
             features = data['features']
             
-            feature_vector = [
-                features['area_size'],
-                features['num_drones'],
-                features['target_urgency'],
-                features['wind_speed'],
-                features['visibility'],
-                features['battery_reserve'],
-                features['communication_range'],
-                features['altitude'],
-                features['speed'],
-                list(MissionType).index(MissionType(features['mission_type'])),
-                list(TerrainType).index(TerrainType(features['terrain_type'])),
-                list(WeatherCondition).index(WeatherCondition(features['weather_condition'])),
-                ["low", "medium", "high"].index(features['search_density']),
-                ["grid", "spiral", "sector", "lawnmower"].index(features['search_pattern'])
-            ]
+            feature_vector = build_feature_vector(features, 'duration_prediction')
             
             X.append(feature_vector)
             y.append(data['actual_duration'])
@@ -442,25 +572,7 @@ class RealMLModels:
         for data in self.training_data:
             features = data['features']
             
-            feature_vector = [
-                features['area_size'],
-                features['duration_hours'],
-                features['num_drones'],
-                features['target_urgency'],
-                features['wind_speed'],
-                features['visibility'],
-                features['temperature'],
-                features['humidity'],
-                features['battery_reserve'],
-                features['communication_range'],
-                features['altitude'],
-                features['speed'],
-                list(MissionType).index(MissionType(features['mission_type'])),
-                list(TerrainType).index(TerrainType(features['terrain_type'])),
-                list(WeatherCondition).index(WeatherCondition(features['weather_condition'])),
-                ["low", "medium", "high"].index(features['search_density']),
-                ["grid", "spiral", "sector", "lawnmower"].index(features['search_pattern'])
-            ]
+            feature_vector = build_feature_vector(features, 'success_rate')
             
             X.append(feature_vector)
             y.append(data['success_rate'])
@@ -522,19 +634,7 @@ class RealMLModels:
             # Calculate risk score based on various factors
             risk_score = self._calculate_risk_score(features)
             
-            feature_vector = [
-                features['area_size'],
-                features['duration_hours'],
-                features['num_drones'],
-                features['wind_speed'],
-                features['visibility'],
-                features['temperature'],
-                features['humidity'],
-                features['battery_reserve'],
-                features['communication_range'],
-                list(TerrainType).index(TerrainType(features['terrain_type'])),
-                list(WeatherCondition).index(WeatherCondition(features['weather_condition']))
-            ]
+            feature_vector = build_feature_vector(features, 'risk_assessment')
             
             X.append(feature_vector)
             y.append(risk_score)
@@ -613,41 +713,7 @@ class RealMLModels:
             if not self.is_trained:
                 await self.initialize()
             
-            # Prepare feature vector (14 features to match training)
-            feature_vector = np.array([[
-                features.area_size,
-                features.duration_hours,
-                features.num_drones,
-                features.target_urgency,
-                features.time_of_day,
-                features.season,
-                features.wind_speed,
-                features.visibility,
-                features.temperature,
-                features.humidity,
-                features.battery_reserve,
-                features.communication_range,
-                features.altitude,
-                features.speed
-            ]])
-            
-            # Scale features
-            scaler = self.scalers['mission_outcome']
-            feature_vector_scaled = scaler.transform(feature_vector)
-            
-            # Predict outcome probabilities
-            model = self.models['mission_outcome']
-            outcome_probs = model.predict_proba(feature_vector_scaled)[0]
-            
-            # Get class names
-            outcome_classes = model.classes_
-            outcome_probability = {cls: prob for cls, prob in zip(outcome_classes, outcome_probs)}
-            
-            # Predict duration
-            duration_model = self.models['duration_prediction']
-            duration_scaler = self.scalers['duration_prediction']
-            duration_features_scaled = duration_scaler.transform(feature_vector)
-            estimated_duration = duration_model.predict(duration_features_scaled)[0]
+            outcome_probability, estimated_duration = await self._outcome_batcher.submit(asdict(features))
             
             # Predict success rate
             success_rate = outcome_probability.get('success', 0.0) + outcome_probability.get('partial_success', 0.0) * 0.5
@@ -678,6 +744,15 @@ class RealMLModels:
                 risk_factors=["Unknown"]
             )
     
+    async def predict_mission_outcomes(self, features_list: List[MissionFeatures]) -> List[MissionPrediction]:
+        """Predict many missions; they share batched model calls"""
+        if not self.is_trained:
+            await self.initialize()
+        return list(await asyncio.gather(*(self.predict_mission_outcome(f) for f in features_list)))
+    
+    def get_inference_stats(self) -> Dict[str, Any]:
+        return self._outcome_batcher.get_stats()
+    
     def _generate_recommendations(self, features: MissionFeatures, outcome_probs: Dict[str, float], success_rate: float) -> List[str]:
         """Generate recommendations based on prediction results"""
         recommendations = []
@@ -797,7 +872,8 @@ class RealMLModels:
             "status": "healthy" if self.is_trained else "not_trained",
             "trained": self.is_trained,
             "models_available": list(self.models.keys()),
-            "training_samples": len(self.training_data),
+            "training_samples": self.training_samples,
+            "model_version": self.model_version,
             "performance_metrics": self.performance_metrics,
             "model_details": {
                 name: {
@@ -808,5 +884,32 @@ class RealMLModels:
             }
         }
 
+def train_and_publish(registry_root: str) -> str:
+    """Train a fresh bundle and publish it as the active version (runs in a worker process)"""
+    models = RealMLModels(registry=ModelRegistry(registry_root))
+    asyncio.run(models._train_models())
+    return models.registry.publish(
+        MODEL_BUNDLE,
+        models.to_bundle(),
+        metadata={
+            'training_samples': models.training_samples,
+            'performance_metrics': models.performance_metrics,
+            'trained_by_pid': os.getpid(),
+        },
+    )
+
+_worker_bundles: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+def predict_outcome_rows_from_registry(registry_root: str, version: str,
+                                       rows: List[Dict[str, Any]]) -> List[Tuple[Dict[str, float], float]]:
+    """predict_outcome_rows for an inference worker process, which caches one bundle version"""
+    key = (registry_root, version)
+    bundle = _worker_bundles.get(key)
+    if bundle is None:
+        bundle, _ = ModelRegistry(registry_root).load(MODEL_BUNDLE, version)
+        _worker_bundles.clear()
+        _worker_bundles[key] = bundle
+    return predict_outcome_rows(bundle['models'], bundle['scalers'], rows)
+
 # Global ML models instance
 real_ml_models = RealMLModels()
@@ -0,0 +1,363 @@
+"""
+In-process vector index and embedding cache for the SAR RAG system
+Provides a NumPy cosine index (HNSW via hnswlib when installed) that mirrors the
+subset of the Qdrant client API used by SARKnowledgeRAG, plus cached, batched
+query encoding that runs the embedding model off the event loop
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: Any) -> FrozenSet[str]:
+    """Lower-cased word tokens used for term-overlap relevance scoring"""
+    return frozenset(_TOKEN_PATTERN.findall(str(text).lower()))
+
+
+def text_key(text: str) -> str:
+    """Stable cache key for a piece of text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class PointStruct:
+    """Local equivalent of qdrant_client.models.PointStruct"""
+    id: str
+    vector: Sequence[float]
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ScoredPoint:
+    """Search hit compatible with qdrant_client.models.ScoredPoint"""
+    id: str
+    score: float
+    payload: Optional[Dict[str, Any]] = None
+    vector: Optional[List[float]] = None
+    tokens: FrozenSet[str] = frozenset()
+
+
+@dataclass
+class CollectionInfo:
+    """Collection statistics in the shape returned by QdrantClient.get_collection"""
+    points_count: int
+    indexed_vectors_count: int
+    status: str = "green"
+
+
+class _Collection:
+    """Row-major float32 matrix of unit vectors with payloads and token sets"""
+
+    def __init__(self, dim: int, hnsw_threshold: int, initial_capacity: int = 1024):
+        self.dim = dim
+        self.hnsw_threshold = hnsw_threshold
+        self.vectors = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self.count = 0
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.payloads: List[Dict[str, Any]] = []
+        self.tokens: List[FrozenSet[str]] = []
+        self.lock = threading.RLock()
+        self._hnsw = None
+        self._hnsw_count = 0
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]):
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim))
+        with self.lock:
+            for point_id, vector, payload in zip(ids, vectors, payloads):
+                row = self.rows.get(point_id)
+                if row is None:
+                    if self.count == self.vectors.shape[0]:
+                        grown = np.zeros((self.vectors.shape[0] * 2, self.dim), dtype=np.float32)
+                        grown[:self.count] = self.vectors[:self.count]
+                        self.vectors = grown
+                    row = self.count
+                    self.count += 1
+                    self.rows[point_id] = row
+                    self.ids.append(point_id)
+                    self.payloads.append(payload)
+                    self.tokens.append(tokenize(payload))
+                else:
+                    # Overwritten rows invalidate the graph; it is rebuilt lazily
+                    self.payloads[row] = payload
+                    self.tokens[row] = tokenize(payload)
+                    self._hnsw = None
+                self.vectors[row] = vector
+
+    def search(self, query: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (rows, scores) of the best ``limit`` matches, best first"""
+        with self.lock:
+            count = self.count
+            matrix = self.vectors[:count]
+            index = self._ensure_hnsw(count)
+        if count == 0 or limit <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        limit = min(limit, count)
+        if index is not None:
+            labels, distances = index.knn_query(query, k=limit)
+            return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+        scores = matrix @ query
+        if limit < count:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(count)
+        order = top[np.argsort(-scores[top], kind="stable")]
+        return order, scores[order]
+
+    def _ensure_hnsw(self, count: int):
+        if not HNSWLIB_AVAILABLE or count < self.hnsw_threshold:
+            return None
+        if self._hnsw is None:
+            index = hnswlib.Index(space="cosine", dim=self.dim)
+            index.init_index(max_elements=max(count * 2, 1024), ef_construction=200, M=16)
+            index.add_items(self.vectors[:count], np.arange(count))
+            index.set_ef(128)
+            self._hnsw, self._hnsw_count = index, count
+        elif self._hnsw_count < count:
+            if count > self._hnsw.get_max_elements():
+                self._hnsw.resize_index(count * 2)
+            self._hnsw.add_items(self.vectors[self._hnsw_count:count], np.arange(self._hnsw_count, count))
+            self._hnsw_count = count
+        return self._hnsw
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _vector_size(vectors_config: Any) -> int:
+    if isinstance(vectors_config, dict):
+        return int(vectors_config["size"])
+    return int(getattr(vectors_config, "size"))
+
+
+class LocalVectorIndex:
+    """Embedded cosine-similarity store usable in place of QdrantClient
+
+    Exact search is a single matrix-vector product per collection; collections
+    larger than ``hnsw_threshold`` switch to an HNSW graph when hnswlib is
+    installed. All methods are thread-safe so callers can run them in a worker
+    thread with ``asyncio.to_thread``.
+    """
+
+    def __init__(self, hnsw_threshold: int = 10000):
+        self.hnsw_threshold = hnsw_threshold
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.Lock()
+
+    def create_collection(self, collection_name: str, vectors_config: Any, **kwargs) -> bool:
+        with self._lock:
+            if collection_name in self._collections:
+                raise ValueError(f"Collection {collection_name} already exists")
+            self._collections[collection_name] = _Collection(_vector_size(vectors_config), self.hnsw_threshold)
+        return True
+
+    def delete_collection(self, collection_name: str) -> bool:
+        with self._lock:
+            return self._collections.pop(collection_name, None) is not None
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return collection_name in self._collections
+
+    def upsert(self, collection_name: str, points: Iterable[Any], **kwargs) -> None:
+        points = list(points)
+        if not points:
+            return
+        collection = self._get(collection_name)
+        collection.upsert(
+            [str(point.id) for point in points],
+            np.asarray([point.vector for point in points], dtype=np.float32),
+            [dict(point.payload or {}) for point in points],
+        )
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        **kwargs
+    ) -> List[ScoredPoint]:
+        collection = self._get(collection_name)
+        query = _normalize(np.asarray(query_vector, dtype=np.float32).reshape(collection.dim))
+        rows, scores = collection.search(query, limit)
+
+        results = []
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            if score_threshold is not None and score < score_threshold:
+                break
+            results.append(ScoredPoint(
+                id=collection.ids[row],
+                score=score,
+                payload=collection.payloads[row] if with_payload else None,
+                vector=collection.vectors[row].tolist() if with_vectors else None,
+                tokens=collection.tokens[row],
+            ))
+        return results
+
+    def get_collection(self, collection_name: str) -> CollectionInfo:
+        collection = self._get(collection_name)
+        indexed = collection._hnsw_count if collection._hnsw is not None else 0
+        return CollectionInfo(points_count=collection.count, indexed_vectors_count=indexed)
+
+    def count(self, collection_name: str) -> int:
+        return self._get(collection_name).count
+
+    def _get(self, collection_name: str) -> _Collection:
+        try:
+            return self._collections[collection_name]
+        except KeyError:
+            raise ValueError(f"Collection {collection_name} not found") from None
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of embeddings keyed by a hash of the source text"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding: np.ndarray):
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class BatchedEmbeddingEncoder:
+    """Coalesces concurrent encode requests into batched model calls
+
+    Cache hits return immediately. Misses are queued for up to
+    ``max_wait_ms`` (or until ``max_batch_size`` texts are pending), identical
+    texts share one slot, and the whole batch is encoded in a worker thread so
+    the event loop never blocks on the model.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        cache: Optional[EmbeddingCache] = None,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0
+    ):
+        self.model = model
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: Dict[str, Tuple[str, List[asyncio.Future]]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.batches_encoded = 0
+        self.texts_encoded = 0
+
+    async def encode(self, text: str) -> np.ndarray:
+        key = text_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if key in self._pending:
+            self._pending[key][1].append(future)
+        else:
+            self._pending[key] = (text, [future])
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush(loop, immediate=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop, immediate=False)
+        return await future
+
+    async def encode_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        return list(await asyncio.gather(*(self.encode(text) for text in texts)))
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, immediate: bool):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if immediate:
+            self._start_batch(loop)
+        else:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000.0, self._start_batch, loop)
+
+    def _start_batch(self, loop: asyncio.AbstractEventLoop):
+        self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            loop.create_task(self._encode_batch(batch))
+
+    async def _encode_batch(self, batch: Dict[str, Tuple[str, List[asyncio.Future]]]):
+        keys = list(batch)
+        texts = [batch[key][0] for key in keys]
+        try:
+            embeddings = await asyncio.to_thread(self._encode_sync, texts)
+        except Exception as e:
+            logger.error(f"Batched embedding failed for {len(texts)} texts: {e}")
+            for _, futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        self.batches_encoded += 1
+        self.texts_encoded += len(texts)
+        for key, embedding in zip(keys, embeddings):
+            self.cache.put(key, embedding)
+            for future in batch[key][1]:
+                if not future.done():
+                    future.set_result(embedding)
+
+    def _encode_sync(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.asarray(self.model.encode(texts), dtype=np.float32)
+        return embeddings.reshape(len(texts), -1)
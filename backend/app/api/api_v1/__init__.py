@@ -1,21 +1,11 @@
-from fastapi import APIRouter
-from .endpoints import drones, analytics, coordination, learning_system, tasks, weather, missions, discoveries, chat, video, drone_connections
-from .websocket import router as websocket_router
+"""
+API v1 package. The router table lives in api.py; importing the package
+itself loads no endpoint modules.
+"""
 
-api_router = APIRouter()
-
-# Include all routers from endpoints directory and websocket
-api_router.include_router(missions.router, prefix="/missions", tags=["missions"])
-api_router.include_router(drones.router, prefix="/drones", tags=["drones"])
-api_router.include_router(discoveries.router, prefix="/discoveries", tags=["discoveries"])
-api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
-api_router.include_router(websocket_router, prefix="/ws", tags=["websocket"])
-api_router.include_router(video.router, prefix="/video", tags=["video"])
-api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
-api_router.include_router(coordination.router, prefix="/coordination", tags=["coordination"])
-api_router.include_router(learning_system.router, prefix="/learning", tags=["learning"])
-api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
-api_router.include_router(weather.router, prefix="/weather", tags=["weather"])
-api_router.include_router(drone_connections.router, prefix="/drone-connections", tags=["drone-connections"])
-## Omit heavy endpoints in lightweight init
 
+def __getattr__(name):
+    if name == "api_router":
+        from .api import api_router
+        return api_router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
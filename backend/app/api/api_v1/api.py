@@ -1,46 +1,68 @@
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import (
-    websocket,
-    missions,
-    drones,
-    discoveries,
-    tasks,
-    computer_vision,
-    coordination,
-    adaptive_planning,
-    learning_system,
-    analytics,
-    chat,
-    video,
-    weather,
-    ai_governance,
-    test_data,
-    ai as ai_endpoints,
+
+from app.core.config import settings
+from app.core.startup_profiler import startup_profiler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    """One endpoint module mounted on the v1 router"""
+    module: str
+    prefix: str
+    tags: List[str]
+    flag: Optional[str] = None  # settings attribute that must be true to mount it
+
+
+ROUTERS: Sequence[RouterSpec] = (
+    RouterSpec("websocket", "", ["websocket"]),
+    RouterSpec("missions", "/missions", ["missions"]),
+    RouterSpec("drones", "/drones", ["drones"]),
+    RouterSpec("drone_connections", "/drone-connections", ["drone-connections"]),
+    RouterSpec("discoveries", "/discoveries", ["discoveries"]),
+    RouterSpec("tasks", "/tasks", ["tasks"]),
+    RouterSpec("computer_vision", "/vision", ["computer-vision"]),
+    RouterSpec("coordination", "/coordination", ["coordination"]),
+    RouterSpec("adaptive_planning", "/planning", ["adaptive-planning"]),
+    RouterSpec("learning_system", "/learning", ["learning"]),
+    RouterSpec("analytics", "/analytics", ["analytics"]),
+    RouterSpec("chat", "/chat", ["chat"]),
+    RouterSpec("video", "/video", ["video"]),
+    RouterSpec("weather", "/weather", ["weather"]),
+    RouterSpec("ai_governance", "/ai-governance", ["ai-governance"]),
+    RouterSpec("ai", "/ai", ["ai"], flag="AI_ENABLED"),
 )
 
-api_router = APIRouter()
-
-# Include all endpoint routers
-api_router.include_router(websocket.router, tags=["websocket"])
-api_router.include_router(missions.router, prefix="/missions", tags=["missions"])
-api_router.include_router(drones.router, prefix="/drones", tags=["drones"])
-api_router.include_router(discoveries.router, prefix="/discoveries", tags=["discoveries"])
-api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
-api_router.include_router(computer_vision.router, prefix="/vision", tags=["computer-vision"])
-api_router.include_router(coordination.router, prefix="/coordination", tags=["coordination"])
-api_router.include_router(adaptive_planning.router, prefix="/planning", tags=["adaptive-planning"])
-api_router.include_router(learning_system.router, prefix="/learning", tags=["learning"])
-api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
-api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
-api_router.include_router(video.router, prefix="/video", tags=["video"])
-api_router.include_router(weather.router, prefix="/weather", tags=["weather"])
-api_router.include_router(ai_governance.router, prefix="/ai-governance", tags=["ai-governance"])
-api_router.include_router(test_data.router, prefix="/test-data", tags=["test-data"])
-
-# Conditionally include AI endpoints
-try:
-    from app.core.config import settings
-    if settings.AI_ENABLED:
-        api_router.include_router(ai_endpoints.router, prefix="/ai", tags=["ai"])
-except Exception:
-    pass
\ No newline at end of file
+
+def router_enabled(spec: RouterSpec, config=settings) -> bool:
+    if spec.module in config.DISABLED_ROUTERS:
+        return False
+    return spec.flag is None or bool(getattr(config, spec.flag, False))
+
+
+def build_api_router(config=settings, routers: Sequence[RouterSpec] = ROUTERS) -> APIRouter:
+    """Import and mount the enabled endpoint modules; disabled ones are never imported"""
+    router = APIRouter()
+    for spec in routers:
+        if not router_enabled(spec, config):
+            logger.info(f"Router {spec.module} disabled")
+            continue
+        try:
+            module = startup_profiler.import_module(f"app.api.api_v1.endpoints.{spec.module}")
+        except ModuleNotFoundError as e:
+            # A third-party dependency is not installed: serve everything else.
+            # A missing app module or any other import error is a bug and fails startup.
+            if not e.name or e.name.split(".")[0] == "app":
+                raise
+            logger.warning(f"⚠️  Router {spec.module} unavailable: {e}")
+            continue
+        router.include_router(module.router, prefix=spec.prefix, tags=spec.tags)
+    return router
+
+
+api_router = build_api_router()
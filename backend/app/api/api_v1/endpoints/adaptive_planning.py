@@ -15,7 +15,9 @@ from app.services.adaptive_planner import (
     OptimizationConstraints, 
     DroneCapabilities,
     OptimizationStrategy,
-    OptimizationResult
+    OptimizationResult,
+    PlanChange,
+    PlanChangeType
 )
 from ....core.config import settings
 
@@ -81,6 +83,58 @@ async def optimize_mission(
         raise HTTPException(status_code=500, detail="Mission optimization failed")
 
 
+@router.post("/replan-mission")
+async def replan_mission(
+    replan_data: Dict[str, Any] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Repair a running mission plan after a drone drops out or joins, or an area changes.
+    
+    Args:
+        replan_data: Mission context, the current 'plan', the 'change'
+            ({'type': drone_lost | drone_added | priority_area | no_fly_zone, ...}),
+            optional 'completed' waypoint counts and 'drone_states' by drone ID
+        
+    Returns:
+        The plan of remaining work and what changed for each drone
+    """
+    try:
+        try:
+            change = _parse_plan_change(replan_data.get('change', {}))
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid change type. Must be one of: {[c.value for c in PlanChangeType]}"
+            )
+        
+        mission_context = await _parse_mission_context(replan_data)
+        result = await adaptive_planner.replan_mission(
+            replan_data.get('plan', {}),
+            mission_context,
+            change,
+            completed=replan_data.get('completed'),
+            drone_states=replan_data.get('drone_states')
+        )
+        if not result.success:
+            raise HTTPException(status_code=400, detail=result.message)
+        
+        return {
+            "success": True,
+            "optimized_plan": result.optimized_plan,
+            "diff": result.diff,
+            "estimated_duration": result.estimated_duration,
+            "replan_time_ms": result.replan_time_ms,
+            "mission_id": mission_context.mission_id
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Mission replanning failed: {e}")
+        raise HTTPException(status_code=500, detail="Mission replanning failed")
+
+
 @router.post("/analyze-mission-context")
 async def analyze_mission_context(
     mission_data: Dict[str, Any] = Body(...),
@@ -212,7 +266,9 @@ async def optimize_drone_assignment(
                 camera_resolution=(drone_data.get('camera_width', 1920), drone_data.get('camera_height', 1080)),
                 gimbal_stabilization=drone_data.get('gimbal_stabilization', False),
                 obstacle_avoidance=drone_data.get('obstacle_avoidance', False),
-                weather_resistance=drone_data.get('weather_resistance', 'light')
+                weather_resistance=drone_data.get('weather_resistance', 'light'),
+                home_lat=drone_data.get('home_lat'),
+                home_lng=drone_data.get('home_lng')
             )
             drone_capabilities.append(capabilities)
         
@@ -525,22 +581,9 @@ async def _parse_mission_context(mission_data: Dict[str, Any]) -> MissionContext
     )
     
     # Parse drone capabilities
-    available_drones = []
-    drones_data = mission_data.get('available_drones', [])
-    for drone_data in drones_data:
-        capabilities = DroneCapabilities(
-            drone_id=drone_data.get('drone_id', 'unknown'),
-            max_flight_time=drone_data.get('max_flight_time', 30),
-            max_altitude=drone_data.get('max_altitude', 120.0),
-            max_speed=drone_data.get('max_speed', 15.0),
-            cruise_speed=drone_data.get('cruise_speed', 10.0),
-            battery_capacity=drone_data.get('battery_capacity', 100.0),
-            camera_resolution=(drone_data.get('camera_width', 1920), drone_data.get('camera_height', 1080)),
-            gimbal_stabilization=drone_data.get('gimbal_stabilization', False),
-            obstacle_avoidance=drone_data.get('obstacle_avoidance', False),
-            weather_resistance=drone_data.get('weather_resistance', 'light')
-        )
-        available_drones.append(capabilities)
+    available_drones = [
+        _parse_drone_capabilities(drone_data) for drone_data in mission_data.get('available_drones', [])
+    ]
     
     return MissionContext(
         mission_id=mission_id,
@@ -555,6 +598,38 @@ async def _parse_mission_context(mission_data: Dict[str, Any]) -> MissionContext
     )
 
 
+def _parse_drone_capabilities(drone_data: Dict[str, Any]) -> DroneCapabilities:
+    """Parse drone data into DroneCapabilities object."""
+    return DroneCapabilities(
+        drone_id=drone_data.get('drone_id', 'unknown'),
+        max_flight_time=drone_data.get('max_flight_time', 30),
+        max_altitude=drone_data.get('max_altitude', 120.0),
+        max_speed=drone_data.get('max_speed', 15.0),
+        cruise_speed=drone_data.get('cruise_speed', 10.0),
+        battery_capacity=drone_data.get('battery_capacity', 100.0),
+        camera_resolution=(drone_data.get('camera_width', 1920), drone_data.get('camera_height', 1080)),
+        gimbal_stabilization=drone_data.get('gimbal_stabilization', False),
+        obstacle_avoidance=drone_data.get('obstacle_avoidance', False),
+        weather_resistance=drone_data.get('weather_resistance', 'light'),
+        home_lat=drone_data.get('home_lat'),
+        home_lng=drone_data.get('home_lng')
+    )
+
+
+def _parse_plan_change(change_data: Dict[str, Any]) -> PlanChange:
+    """Parse change data into PlanChange object."""
+    polygon = change_data.get('polygon')
+    return PlanChange(
+        change_type=PlanChangeType(change_data.get('type')),
+        drone_id=change_data.get('drone_id'),
+        drone=_parse_drone_capabilities(change_data['drone']) if change_data.get('drone') else None,
+        bounds=change_data.get('bounds'),
+        polygon=[tuple(point) for point in polygon] if polygon else None,
+        waypoints=change_data.get('waypoints'),
+        spacing_m=change_data.get('spacing_m')
+    )
+
+
 def _get_strategy_description(strategy: OptimizationStrategy) -> str:
     """Get description for optimization strategy."""
     descriptions = {
@@ -10,15 +10,15 @@ from sqlalchemy.orm import Session
 import json
 
 from app.core.database import get_db
-from app.ai.real_computer_vision import RealComputerVisionEngine
 from app.core.config import settings
+from app.core.lazy import LazyObject
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize real computer vision engine
-_real_cv_engine = RealComputerVisionEngine()
+# Real computer vision engine (loads YOLO/torch on the first request)
+_real_cv_engine = LazyObject("app.ai.real_computer_vision:RealComputerVisionEngine", call=True)
 
 # Compatibility wrapper to match the old API
 class ComputerVisionEngineWrapper:
@@ -2,86 +2,130 @@
 Discovery API endpoints.
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from typing import List, Dict, Any, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func
+import asyncio
 import logging
+import re
 import uuid
 import os
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_db, get_sync_db
 from app.models.discovery import Discovery, EvidenceFile
 from app.models.mission import Mission
 from app.core.config import settings
+from app.core.event_bus import event_bus, DISCOVERY_CREATED
+from app.core.query import (
+    FieldSet, QueryError, bbox_filter, cell_filter, column_field, isoformat, keyset_page, parse_bbox,
+    radius_box, radius_filter, spatial_time_key
+)
+from app.services.evidence_store import (
+    EvidenceStore, StoredObject, UploadError, UploadSession, get_evidence_store
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+DISCOVERY_FIELDS = FieldSet({
+    "id": column_field(Discovery.id),
+    "mission_id": column_field(Discovery.mission_id),
+    "drone_id": column_field(Discovery.drone_id),
+    "discovery_type": column_field(Discovery.discovery_type),
+    "description": column_field(Discovery.description),
+    "confidence": column_field(Discovery.confidence, lambda value: float(value) if value else 0.0),
+    "latitude": column_field(Discovery.latitude),
+    "longitude": column_field(Discovery.longitude),
+    "altitude": column_field(Discovery.altitude),
+    "verified": column_field(Discovery.verified),
+    "false_positive": column_field(Discovery.false_positive),
+    "priority": column_field(Discovery.priority),
+    "image_url": column_field(Discovery.image_url),
+    "video_url": column_field(Discovery.video_url),
+    "ai_analysis": column_field(Discovery.ai_analysis),
+    "discovered_at": column_field(Discovery.discovered_at, isoformat),
+    "verified_at": column_field(Discovery.verified_at, isoformat),
+}, always=[Discovery.id, Discovery.discovered_at])
+
+
 @router.get("/", response_model=List[Dict[str, Any]])
-async def get_discoveries(
+def get_discoveries(
+    response: Response,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
-    mission_id: str = None,
-    status_filter: str = None,
-    priority_filter: str = None,
-    discovery_type: str = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000),
+    mission_id: Optional[int] = None,
+    verified: Optional[bool] = None,
+    priority_filter: Optional[int] = None,
+    discovery_type: Optional[str] = None,
+    bbox: Optional[str] = Query(None, description="west,south,east,north"),
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius_m: Optional[float] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; all by default"),
+    db: Session = Depends(get_sync_db)
 ):
-    """Get all discoveries with optional filtering."""
+    """
+    Get discoveries, newest first, with optional filtering.
+    
+    Pages are keyset pages: pass the X-Next-Cursor header of one response as
+    ``cursor`` to get the next; it is absent on the last page. ``skip`` is
+    still honoured without a cursor but costs a scan of every skipped row.
+    """
     try:
-        query = db.query(Discovery)
+        names = DISCOVERY_FIELDS.resolve(fields)
+        query = db.query(*DISCOVERY_FIELDS.columns(names))
 
-        if mission_id:
-            mission = db.query(Mission).filter(Mission.id == mission_id).first()
-            if mission:
-                query = query.filter(Discovery.mission_id == mission.id)
+        if mission_id is not None:
+            query = query.filter(Discovery.mission_id == mission_id)
 
-        if status_filter:
-            query = query.filter(Discovery.status == status_filter)
+        if verified is not None:
+            query = query.filter(Discovery.verified == verified)
 
-        if priority_filter:
+        if priority_filter is not None:
             query = query.filter(Discovery.priority == priority_filter)
 
         if discovery_type:
             query = query.filter(Discovery.discovery_type == discovery_type)
 
-        discoveries = query.order_by(Discovery.detected_at.desc()).offset(skip).limit(limit).all()
-
-        return [
-            {
-                "id": discovery.id,
-                "discovery_id": discovery.discovery_id,
-                "mission_id": discovery.mission_id,
-                "location": {
-                    "lat": discovery.latitude,
-                    "lng": discovery.longitude,
-                    "alt": discovery.altitude
-                },
-                "accuracy": discovery.accuracy,
-                "discovery_type": discovery.discovery_type,
-                "confidence": discovery.confidence,
-                "detection_method": discovery.detection_method,
-                "detected_by_drone": discovery.detected_by_drone,
-                "status": discovery.status,
-                "priority": discovery.priority,
-                "requires_investigation": discovery.requires_investigation,
-                "investigation_radius": discovery.investigation_radius,
-                "assigned_drone_id": discovery.assigned_drone_id,
-                "investigated_at": discovery.investigated_at.isoformat() if discovery.investigated_at else None,
-                "investigation_notes": discovery.investigation_notes,
-                "metadata": discovery.metadata,
-                "image_urls": discovery.image_urls,
-                "video_url": discovery.video_url,
-                "detected_at": discovery.detected_at.isoformat(),
-                "confirmed_at": discovery.confirmed_at.isoformat() if discovery.confirmed_at else None,
-                "updated_at": discovery.updated_at.isoformat()
-            }
-            for discovery in discoveries
-        ]
+        cells = []  # geocell ranges of the spatial filters, for choosing the time key
+        if bbox:
+            box = parse_bbox(bbox)
+            query = query.filter(bbox_filter(Discovery.latitude, Discovery.longitude, Discovery.geocell, *box))
+            cells.append(cell_filter(Discovery.geocell, *box))
+
+        if radius_m is not None:
+            if lat is None or lng is None:
+                raise QueryError("radius_m needs lat and lng")
+            query = query.filter(radius_filter(Discovery.latitude, Discovery.longitude, Discovery.geocell,
+                                               lat, lng, radius_m))
+            cells.append(cell_filter(Discovery.geocell, *radius_box(lat, lng, radius_m)))
+
+        time_key = Discovery.discovered_at
+        if cells:
+            time_key = spatial_time_key(db, and_(*cells), Discovery.discovered_at, Discovery.id, limit)
+        if since:
+            query = query.filter(time_key >= since)
+
+        if until:
+            query = query.filter(time_key < until)
+
+        rows, next_cursor = keyset_page(query, Discovery.discovered_at, Discovery.id, cursor, limit,
+                                        offset=0 if cursor else skip, time_key=time_key)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+        serialize = DISCOVERY_FIELDS.serializer(names)
+        return [serialize(row) for row in rows]
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching discoveries: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -193,6 +237,15 @@ async def create_discovery(
         mission.discoveries_count += 1
         db.commit()
 
+        # Mission execution reacts to this instead of polling the table
+        event_bus.publish(DISCOVERY_CREATED, {
+            "id": discovery.id,
+            "discovery_type": discovery.discovery_type,
+            "confidence": discovery.confidence,
+            "latitude": discovery.latitude,
+            "longitude": discovery.longitude,
+        }, mission_id=mission.id, drone_id=discovery.detected_by_drone, source="api")
+
         logger.info(f"Created new discovery {discovery_id}")
         return {
             "message": "Discovery created successfully",
@@ -237,70 +290,224 @@ async def update_discovery(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _evidence_dict(evidence: EvidenceFile) -> Dict[str, Any]:
+    return {
+        "id": evidence.id,
+        "discovery_id": evidence.discovery_id,
+        "original_filename": evidence.original_filename,
+        "file_type": evidence.file_type,
+        "file_size": evidence.file_size,
+        "width": evidence.width,
+        "height": evidence.height,
+        "duration": evidence.duration,
+        "processed": evidence.processed,
+        "uploaded_at": isoformat(evidence.uploaded_at),
+        "content_url": f"{settings.API_V1_STR}/discoveries/evidence/{evidence.id}/content",
+        "thumbnail_url": (f"{settings.API_V1_STR}/discoveries/evidence/{evidence.id}/thumbnail"
+                          if evidence.thumbnail_path else None),
+    }
+
+
+def _get_discovery_or_404(db: Session, discovery_id: int) -> Discovery:
+    discovery = db.get(Discovery, discovery_id)
+    if not discovery:
+        raise HTTPException(status_code=404, detail="Discovery not found")
+    return discovery
+
+
+def _record_evidence(db: Session, discovery_id: int, filename: str, stored: StoredObject) -> Dict[str, Any]:
+    """Add the EvidenceFile row for a stored object and point the discovery at it"""
+    discovery = _get_discovery_or_404(db, discovery_id)
+    evidence = EvidenceFile(
+        discovery_id=discovery.id,
+        file_path=stored.path,
+        file_type=stored.content_type,
+        file_size=stored.size,
+        original_filename=filename,
+        processed=False,
+    )
+    db.add(evidence)
+    db.flush()
+    url = f"{settings.API_V1_STR}/discoveries/evidence/{evidence.id}/content"
+    if stored.content_type.startswith("image/"):
+        discovery.image_url = url
+    elif stored.content_type.startswith("video/"):
+        discovery.video_url = url
+    db.commit()
+    return {**_evidence_dict(evidence), "sha256": stored.sha256, "deduplicated": stored.deduplicated}
+
+
+def _thumbnail_done(bind, evidence_id: int):
+    """Record a finished thumbnail on its evidence row, in the thumbnail worker's thread"""
+    def on_done(path: Optional[str], info: Dict[str, float]):
+        with Session(bind=bind) as db:
+            evidence = db.get(EvidenceFile, evidence_id)
+            if evidence is None:
+                return
+            evidence.thumbnail_path = path
+            evidence.width = info.get("width", evidence.width)
+            evidence.height = info.get("height", evidence.height)
+            evidence.duration = info.get("duration", evidence.duration)
+            evidence.processed = True
+            db.commit()
+    return on_done
+
+
+async def _finish_upload(db: Session, store: EvidenceStore, discovery_id: int, filename: str,
+                         stored: StoredObject) -> Dict[str, Any]:
+    evidence = await asyncio.to_thread(_record_evidence, db, discovery_id, filename, stored)
+    store.schedule_thumbnail(stored, _thumbnail_done(db.get_bind(), evidence["id"]))
+    logger.info(f"Stored evidence {stored.sha256[:12]} ({stored.size} bytes) for discovery {discovery_id}")
+    return evidence
+
+
+def _parse_content_range(header: Optional[str], length: Optional[str]) -> Tuple[int, Optional[int]]:
+    """(start, total) from "bytes start-end/total" or "bytes start-end/*"; a missing header means byte 0"""
+    if not header:
+        return 0, None
+    match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+|\*)", header.strip())
+    if not match:
+        raise HTTPException(status_code=400, detail="Content-Range must be bytes start-end/total")
+    start, end, total = match.groups()
+    start, end = int(start), int(end)
+    if end < start or (length is not None and int(length) != end - start + 1):
+        raise HTTPException(status_code=400, detail="Content-Range does not match the body length")
+    return start, None if total == "*" else int(total)
+
+
 @router.post("/{discovery_id}/evidence")
 async def upload_evidence(
-    discovery_id: str,
+    discovery_id: int,
     file: UploadFile = File(...),
-    description: str = None,
-    is_primary: bool = False,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_sync_db),
+    store: EvidenceStore = Depends(get_evidence_store)
 ):
-    """Upload evidence file for a discovery."""
-    try:
-        discovery = db.query(Discovery).filter(Discovery.discovery_id == discovery_id).first()
-        if not discovery:
-            raise HTTPException(status_code=404, detail="Discovery not found")
+    """Upload an evidence file in one multipart request.
 
-        # Ensure upload directory exists
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-
-        # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4().hex}{file_extension}"
-        file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
-
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-
-        # Create evidence record
-        evidence = EvidenceFile(
-            discovery_id=discovery.id,
-            file_name=file.filename,
-            file_path=file_path,
-            file_type=file.content_type or "application/octet-stream",
-            file_size=len(content),
-            description=description,
-            is_primary=is_primary,
-            metadata={"original_filename": file.filename}
-        )
+    The file is streamed into the evidence store a chunk at a time; large
+    files or unreliable links should use the resumable uploads below.
+    """
+    await asyncio.to_thread(_get_discovery_or_404, db, discovery_id)
 
-        db.add(evidence)
-        db.commit()
+    async def chunks():
+        while True:
+            data = await file.read(store.chunk_size)
+            if not data:
+                return
+            yield data
 
-        # Update discovery image/video URLs
-        if file.content_type and file.content_type.startswith("image/"):
-            if not discovery.image_urls:
-                discovery.image_urls = []
-            discovery.image_urls.append(f"/uploads/{unique_filename}")
-        elif file.content_type and file.content_type.startswith("video/"):
-            discovery.video_url = f"/uploads/{unique_filename}"
+    try:
+        stored = await store.store_stream(discovery_id, file.filename, file.content_type, chunks())
+    except UploadError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    return await _finish_upload(db, store, discovery_id, file.filename, stored)
+
+
+@router.post("/{discovery_id}/evidence/uploads", status_code=status.HTTP_201_CREATED)
+async def create_evidence_upload(
+    discovery_id: int,
+    upload: Dict[str, Any],
+    db: Session = Depends(get_sync_db),
+    store: EvidenceStore = Depends(get_evidence_store)
+):
+    """Open a resumable upload: {"filename", "content_type", "size"}.
 
-        db.commit()
+    Send the bytes with PUT and a Content-Range header, in as many requests
+    as needed; GET tells how many bytes arrived, so an interrupted upload
+    carries on from there instead of starting over.
+    """
+    await asyncio.to_thread(_get_discovery_or_404, db, discovery_id)
+    try:
+        session = store.create_upload(discovery_id, upload.get("filename"), upload.get("content_type"),
+                                      upload.get("size"))
+    except UploadError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    return {"upload_id": session.upload_id, "offset": 0, "size": session.size}
 
-        logger.info(f"Uploaded evidence file for discovery {discovery_id}")
-        return {
-            "message": "Evidence file uploaded successfully",
-            "file_id": evidence.id,
-            "file_path": file_path
-        }
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error uploading evidence for discovery {discovery_id}: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+def _get_upload_or_404(store: EvidenceStore, discovery_id: int, upload_id: str) -> UploadSession:
+    session = store.get_upload(upload_id)
+    if session is None or session.discovery_id != discovery_id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+@router.get("/{discovery_id}/evidence/uploads/{upload_id}")
+async def get_evidence_upload(
+    discovery_id: int,
+    upload_id: str,
+    store: EvidenceStore = Depends(get_evidence_store)
+):
+    """How far an upload has got"""
+    session = _get_upload_or_404(store, discovery_id, upload_id)
+    return {"upload_id": upload_id, "offset": session.offset, "size": session.size}
+
+
+@router.put("/{discovery_id}/evidence/uploads/{upload_id}")
+async def append_evidence_upload(
+    discovery_id: int,
+    upload_id: str,
+    request: Request,
+    db: Session = Depends(get_sync_db),
+    store: EvidenceStore = Depends(get_evidence_store)
+):
+    """Send the next bytes of an upload.
+
+    The body goes at the start of its Content-Range, which must be the
+    upload's current offset (409 otherwise, with the offset to resume from).
+    The upload completes once it holds all the bytes announced, either at
+    creation or as the Content-Range total; without either, a request with no
+    Content-Range sends the whole file.
+    """
+    session = _get_upload_or_404(store, discovery_id, upload_id)
+    start, total = _parse_content_range(request.headers.get("content-range"), request.headers.get("content-length"))
+    if total is not None:
+        if session.size is not None and total != session.size:
+            raise HTTPException(status_code=400, detail=f"Upload size is {session.size}, not {total}")
+        session.size = total
+    try:
+        await store.append(session, start, request.stream())
+        if session.size is None and request.headers.get("content-range") is None:
+            session.size = session.offset
+        if not session.complete:
+            return {"upload_id": upload_id, "offset": session.offset, "size": session.size}
+        stored = await store.finish(session)
+    except UploadError as e:
+        if e.status == 409:
+            current = store.get_upload(upload_id)
+            raise HTTPException(status_code=409, detail=str(e),
+                                headers={"Upload-Offset": str(current.offset if current else 0)})
+        raise HTTPException(status_code=e.status, detail=str(e))
+    return await _finish_upload(db, store, discovery_id, session.filename, stored)
+
+
+@router.delete("/{discovery_id}/evidence/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_evidence_upload(
+    discovery_id: int,
+    upload_id: str,
+    store: EvidenceStore = Depends(get_evidence_store)
+):
+    _get_upload_or_404(store, discovery_id, upload_id)
+    store.abort(upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/evidence/{evidence_id}/content")
+def get_evidence_content(evidence_id: int, db: Session = Depends(get_sync_db)):
+    """The evidence file; Range requests fetch part of it, e.g. to seek in a video"""
+    evidence = db.get(EvidenceFile, evidence_id)
+    if evidence is None or not os.path.exists(evidence.file_path):
+        raise HTTPException(status_code=404, detail="Evidence not found")
+    return FileResponse(evidence.file_path, media_type=evidence.file_type, filename=evidence.original_filename,
+                        content_disposition_type="inline")
+
+
+@router.get("/evidence/{evidence_id}/thumbnail")
+def get_evidence_thumbnail(evidence_id: int, db: Session = Depends(get_sync_db)):
+    evidence = db.get(EvidenceFile, evidence_id)
+    if evidence is None or not evidence.thumbnail_path or not os.path.exists(evidence.thumbnail_path):
+        raise HTTPException(status_code=404, detail="Thumbnail not available")
+    return FileResponse(evidence.thumbnail_path, media_type="image/jpeg")
 
 
 @router.put("/{discovery_id}/investigate")
@@ -140,18 +140,16 @@ async def connect_drone(connection_request: Dict[str, Any]):
 async def disconnect_drone(drone_id: str):
     """Disconnect from a drone"""
     try:
-        # Find connection ID for drone
-        connection_id = None
-        for conn_id in drone_connection_hub.connections.keys():
-            if conn_id.startswith(drone_id):
-                connection_id = conn_id
-                break
-        
-        if not connection_id:
+        # Find every link of the drone
+        connection_ids = drone_connection_hub.get_connection_ids(drone_id)
+        
+        if not connection_ids:
             raise HTTPException(status_code=404, detail="Drone connection not found")
         
         # Disconnect drone
-        success = await drone_connection_hub.disconnect_drone(connection_id)
+        success = True
+        for connection_id in connection_ids:
+            success = await drone_connection_hub.disconnect_drone(connection_id) and success
         
         if success:
             # Unregister from registry
@@ -2,18 +2,24 @@
 Mission API endpoints.
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+from sqlalchemy import and_, func
 import logging
 import uuid
 from datetime import datetime
 
 from app.api.api_v1.dependencies import get_db
+from app.core.query import (
+    Field, FieldSet, QueryError, bbox_filter, cell_filter, column_field, isoformat, keyset_page, parse_bbox,
+    radius_box, radius_filter, spatial_time_key
+)
 from app.models.mission import Mission, MissionDrone
-from app.models.drone import Drone
 from app.services.mission_execution import mission_execution_service
+from app.services.mission_export import EXPORT_FORMATS, ExportError, database_source, stream_export
+from app.services.map_tiles import TileError, map_tile_service
 from app.services.coordination_engine import coordination_engine
 
 logger = logging.getLogger(__name__)
@@ -21,53 +27,95 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+MISSION_FIELDS = FieldSet({
+    "id": column_field(Mission.id),
+    "mission_id": column_field(Mission.mission_id),
+    "name": column_field(Mission.name),
+    "description": column_field(Mission.description),
+    "status": column_field(Mission.status),
+    "priority": column_field(Mission.priority),
+    "mission_type": column_field(Mission.mission_type),
+    "center": Field([Mission.center_lat, Mission.center_lng],
+                    lambda row: {"lat": row.center_lat, "lng": row.center_lng}),
+    "search_area": column_field(Mission.search_area),
+    "search_altitude": column_field(Mission.search_altitude),
+    "estimated_duration": column_field(Mission.estimated_duration),
+    "max_drones": column_field(Mission.max_drones),
+    "progress_percentage": column_field(Mission.progress_percentage),
+    "discoveries_count": column_field(Mission.discoveries_count),
+    "area_covered": column_field(Mission.area_covered),
+    "planned_start_time": column_field(Mission.planned_start_time, isoformat),
+    "actual_start_time": column_field(Mission.actual_start_time, isoformat),
+    "planned_end_time": column_field(Mission.planned_end_time, isoformat),
+    "actual_end_time": column_field(Mission.actual_end_time, isoformat),
+    "weather_conditions": column_field(Mission.weather_conditions),
+    "created_by": column_field(Mission.created_by),
+    "created_at": column_field(Mission.created_at, isoformat),
+    "updated_at": column_field(Mission.updated_at, isoformat),
+}, always=[Mission.id, Mission.created_at])
+
+
 @router.get("/", response_model=List[Dict[str, Any]])
 def get_missions(
+    response: Response,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
     status_filter: str = None,
+    bbox: Optional[str] = Query(None, description="west,south,east,north"),
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius_m: Optional[float] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; all by default"),
     db: Session = Depends(get_db)
 ):
-    """Get all missions with optional filtering."""
+    """
+    Get missions, newest first, with optional filtering.
+    
+    Spatial filters apply to the mission centre and time filters to its
+    creation time. Pass the X-Next-Cursor header of one response as
+    ``cursor`` to get the next page.
+    """
     try:
-        query = db.query(Mission)
+        names = MISSION_FIELDS.resolve(fields)
+        query = db.query(*MISSION_FIELDS.columns(names))
 
         if status_filter:
             query = query.filter(Mission.status == status_filter)
 
-        missions = query.order_by(Mission.created_at.desc()).offset(skip).limit(limit).all()
-
-        return [
-            {
-                "id": mission.id,
-                "mission_id": mission.mission_id,
-                "name": mission.name,
-                "description": mission.description,
-                "status": mission.status,
-                "priority": mission.priority,
-                "mission_type": mission.mission_type,
-                "center": {
-                    "lat": mission.center_lat,
-                    "lng": mission.center_lng
-                },
-                "search_area": mission.search_area,
-                "search_altitude": mission.search_altitude,
-                "estimated_duration": mission.estimated_duration,
-                "max_drones": mission.max_drones,
-                "progress_percentage": mission.progress_percentage,
-                "discoveries_count": mission.discoveries_count,
-                "area_covered": mission.area_covered,
-                "planned_start_time": mission.planned_start_time.isoformat() if mission.planned_start_time else None,
-                "actual_start_time": mission.actual_start_time.isoformat() if mission.actual_start_time else None,
-                "planned_end_time": mission.planned_end_time.isoformat() if mission.planned_end_time else None,
-                "actual_end_time": mission.actual_end_time.isoformat() if mission.actual_end_time else None,
-                "weather_conditions": mission.weather_conditions,
-                "created_by": mission.created_by,
-                "created_at": mission.created_at.isoformat(),
-                "updated_at": mission.updated_at.isoformat()
-            }
-            for mission in missions
-        ]
+        cells = []  # geocell ranges of the spatial filters, for choosing the time key
+        if bbox:
+            box = parse_bbox(bbox)
+            query = query.filter(bbox_filter(Mission.center_lat, Mission.center_lng, Mission.geocell, *box))
+            cells.append(cell_filter(Mission.geocell, *box))
+
+        if radius_m is not None:
+            if lat is None or lng is None:
+                raise QueryError("radius_m needs lat and lng")
+            query = query.filter(radius_filter(Mission.center_lat, Mission.center_lng, Mission.geocell,
+                                               lat, lng, radius_m))
+            cells.append(cell_filter(Mission.geocell, *radius_box(lat, lng, radius_m)))
+
+        time_key = Mission.created_at
+        if cells:
+            time_key = spatial_time_key(db, and_(*cells), Mission.created_at, Mission.id, limit)
+        if since:
+            query = query.filter(time_key >= since)
+
+        if until:
+            query = query.filter(time_key < until)
+
+        rows, next_cursor = keyset_page(query, Mission.created_at, Mission.id, cursor, limit,
+                                        offset=0 if cursor else skip, time_key=time_key)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+        serialize = MISSION_FIELDS.serializer(names)
+        return [serialize(row) for row in rows]
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching missions: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -80,22 +128,26 @@ def get_mission(
 ):
     """Get a specific mission by ID."""
     try:
-        mission = db.query(Mission).filter(Mission.mission_id == mission_id).first()
+        mission = (
+            db.query(Mission)
+            .options(selectinload(Mission.drone_assignments).joinedload(MissionDrone.drone))
+            .filter(Mission.mission_id == mission_id)
+            .first()
+        )
         if not mission:
             raise HTTPException(status_code=404, detail="Mission not found")
 
-        # Get assigned drones
-        mission_drones = db.query(MissionDrone).filter(MissionDrone.mission_id == mission.id).all()
-        assigned_drones = []
-        for md in mission_drones:
-            drone = db.query(Drone).filter(Drone.id == md.drone_id).first()
-            if drone:
-                assigned_drones.append({
-                    "drone_id": drone.drone_id,
-                    "assigned_area": md.assigned_area,
-                    "status": md.status,
-                    "current_waypoint": md.current_waypoint
-                })
+        # Assigned drones come with the mission, in one more query
+        assigned_drones = [
+            {
+                "drone_id": md.drone.drone_id,
+                "assigned_area": md.assigned_area,
+                "status": md.status,
+                "current_waypoint": md.current_waypoint
+            }
+            for md in mission.drone_assignments
+            if md.drone
+        ]
 
         return {
             "id": mission.id,
@@ -135,6 +187,82 @@ def get_mission(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get("/{mission_id}/export")
+def export_mission(
+    mission_id: str,
+    format: str = Query("geojson", description="geojson, csv, parquet or flatgeobuf"),
+    tolerance_m: float = Query(0.0, ge=0.0, description="Douglas-Peucker tolerance for tracks; 0 keeps every point"),
+    db: Session = Depends(get_db)
+):
+    """Stream a mission's tracks, discoveries and centre as a file.
+
+    Telemetry is read, simplified and encoded a chunk at a time while the
+    response is being sent, so memory stays flat however long the mission.
+    """
+    mission = db.query(Mission.id).filter(Mission.mission_id == mission_id).first()
+    if not mission:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    try:
+        source = database_source(sessionmaker(bind=db.get_bind(), expire_on_commit=False), mission.id)
+        body = stream_export(source, format, tolerance_m)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{mission_id}.{extension}"'
+    })
+
+
+def _tile_layer(mission_id: str, db: Session):
+    """Map tile layer key and history loader for a mission, or 404"""
+    mission = db.query(Mission.id).filter(Mission.mission_id == mission_id).first()
+    if not mission:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    session_factory = sessionmaker(bind=db.get_bind(), expire_on_commit=False)
+    map_tile_service.subscribe()
+    return str(mission.id), lambda: database_source(session_factory, mission.id)
+
+
+@router.get("/{mission_id}/tiles")
+def get_mission_tileset(mission_id: str, request: Request, db: Session = Depends(get_db)):
+    """Zoom range, bounds and URL template of a mission's map tiles."""
+    key, loader = _tile_layer(mission_id, db)
+    layer = map_tile_service.mission(key, loader)
+    return {
+        "minzoom": map_tile_service.min_zoom,
+        "maxzoom": map_tile_service.max_zoom,
+        "bounds": layer.bounds(),
+        "tiles": [str(request.url.replace(query="")) + "/{z}/{x}/{y}"],
+    }
+
+
+@router.get("/{mission_id}/tiles/{z}/{x}/{y}")
+def get_mission_tile(
+    mission_id: str,
+    z: int,
+    x: int,
+    y: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """One map tile of a mission's tracks, drone positions, discoveries and coverage.
+
+    Tiles are rendered once per change and cached; a matching If-None-Match
+    gets a 304 so dashboards polling their visible tiles only download the
+    ones that changed.
+    """
+    key, loader = _tile_layer(mission_id, db)
+    execution = mission_execution_service.active_executions.get(key)
+    try:
+        etag, body = map_tile_service.tile(key, z, x, y, loader, execution.coverage if execution else None)
+    except TileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.post("/", response_model=Dict[str, Any])
 def create_mission(
     mission_data: Dict[str, Any],
@@ -4,7 +4,8 @@ Central hub for managing all drone connections and communication protocols
 """
 import asyncio
 import logging
-from typing import Dict, List, Optional, Callable, Any
+from functools import partial
+from typing import Dict, List, Optional, Callable, Any, Sequence, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import json
@@ -43,6 +44,16 @@ except Exception:  # pragma: no cover
 
 logger = logging.getLogger(__name__)
 
+# Link order when a drone has several connections: highest bandwidth first.
+# A "priority" entry in DroneInfo.connection_params (lower wins) overrides it.
+DEFAULT_LINK_PREFERENCE = (
+    DroneConnectionType.WIFI,
+    DroneConnectionType.WEBSOCKET,
+    DroneConnectionType.MAVLINK,
+    DroneConnectionType.LORA,
+    DroneConnectionType.BLUETOOTH,
+)
+
 @dataclass
 class ConnectionMetrics:
     """Connection performance metrics"""
@@ -57,15 +68,25 @@ class ConnectionMetrics:
     last_message_time: Optional[datetime] = None
     average_latency: float = 0.0
     connection_stability: float = 1.0  # 0-1 scale
+    link_priority: int = 0  # lower is preferred
+    send_failures: int = 0
 
 class DroneConnectionHub:
     """Central hub for managing drone connections"""
     
-    def __init__(self, redis_channel: str = "missions"):
+    def __init__(self, redis_channel: str = "missions",
+                 link_preference: Sequence[DroneConnectionType] = DEFAULT_LINK_PREFERENCE):
         # Use dynamic registry getter so tests creating new instances are seen
         self.registry = get_registry()
         self.connections: Dict[str, BaseConnection] = {}
         self.connection_metrics: Dict[str, ConnectionMetrics] = {}
+        # Routing tables: drone -> its links in preference order, link -> the
+        # DroneInfo it was opened with (so a dropped backup link is reopened as itself)
+        self.drone_links: Dict[str, List[str]] = {}
+        self.connection_drones: Dict[str, DroneInfo] = {}
+        self.reconnect_delay = 5.0
+        self.link_preference = {link: rank for rank, link in enumerate(link_preference)}
+        self.failovers = 0
         self.telemetry_callbacks: List[Callable] = []
         self.status_callbacks: List[Callable] = []
         self.command_callbacks: List[Callable] = []
@@ -142,9 +163,9 @@ class DroneConnectionHub:
                 logger.error(f"Failed to create connection for drone {drone_info.drone_id}")
                 return False
             
-            # Register connection callbacks
-            connection.register_telemetry_callback(self._handle_telemetry)
-            connection.register_connection_callback(self._handle_connection_status_change)
+            # Register connection callbacks, bound to this link
+            connection.register_telemetry_callback(partial(self._handle_telemetry, connection_id=connection_id))
+            connection.register_connection_callback(partial(self._handle_link_status_change, connection_id))
             
             # Start connection
             if await connection.start():
@@ -157,8 +178,12 @@ class DroneConnectionHub:
                         connection_id=connection_id,
                         drone_id=drone_info.drone_id,
                         connection_type=drone_info.connection_type,
-                        last_message_time=datetime.utcnow()
+                        last_message_time=datetime.utcnow(),
+                        link_priority=drone_info.connection_params.get(
+                            "priority", self.link_preference.get(drone_info.connection_type, len(self.link_preference))
+                        )
                     )
+                    self._add_link(drone_info, connection_id)
                     
                     # Update drone status
                     self.registry.update_drone_status(
@@ -170,6 +195,7 @@ class DroneConnectionHub:
                     return True
                 else:
                     logger.error(f"Failed to establish connection to drone {drone_info.drone_id}")
+                    await connection.stop()
                     return False
             else:
                 logger.error(f"Failed to start connection for drone {drone_info.drone_id}")
@@ -180,7 +206,7 @@ class DroneConnectionHub:
             return False
     
     async def disconnect_drone(self, connection_id: str) -> bool:
-        """Disconnect from a drone"""
+        """Disconnect one link of a drone"""
         try:
             if connection_id not in self.connections:
                 logger.warning(f"No connection found for {connection_id}")
@@ -191,18 +217,15 @@ class DroneConnectionHub:
             # Stop and disconnect
             await connection.stop()
             
-            # Update drone status
-            metrics = self.connection_metrics.get(connection_id)
-            if metrics:
-                self.registry.update_drone_status(
-                    metrics.drone_id, 
-                    DroneStatus.DISCONNECTED
-                )
-            
-            # Remove connection and metrics
+            # Remove connection, metrics and routes
             del self.connections[connection_id]
-            if connection_id in self.connection_metrics:
-                del self.connection_metrics[connection_id]
+            self.connection_metrics.pop(connection_id, None)
+            drone_info = self._remove_link(connection_id)
+            drone_id = drone_info.drone_id if drone_info else None
+            
+            # Update drone status once its last link is gone
+            if drone_id and not self.drone_links.get(drone_id):
+                self.registry.update_drone_status(drone_id, DroneStatus.DISCONNECTED)
             
             logger.info(f"Disconnected from drone: {connection_id}")
             return True
@@ -211,27 +234,57 @@ class DroneConnectionHub:
             logger.error(f"Error disconnecting drone {connection_id}: {e}")
             return False
     
+    def _add_link(self, drone_info: DroneInfo, connection_id: str):
+        links = self.drone_links.setdefault(drone_info.drone_id, [])
+        links.append(connection_id)
+        links.sort(key=lambda link: self.connection_metrics[link].link_priority)
+        self.connection_drones[connection_id] = drone_info
+    
+    def _remove_link(self, connection_id: str) -> Optional[DroneInfo]:
+        drone_info = self.connection_drones.pop(connection_id, None)
+        links = self.drone_links.get(drone_info.drone_id) if drone_info else None
+        if links is not None:
+            links.remove(connection_id)
+            if not links:
+                del self.drone_links[drone_info.drone_id]
+        return drone_info
+    
+    def get_connection_ids(self, drone_id: str) -> List[str]:
+        """All links of a drone, preferred first"""
+        return list(self.drone_links.get(drone_id, ()))
+    
+    def _candidate_links(self, drone_id: str) -> List[Tuple[str, BaseConnection]]:
+        """Links to try for a drone: connected ones in preference order, then the rest"""
+        links = [(link, self.connections[link]) for link in self.drone_links.get(drone_id, ())]
+        connected = [entry for entry in links if entry[1].status == ConnectionStatus.CONNECTED]
+        return connected + [entry for entry in links if entry[1].status != ConnectionStatus.CONNECTED]
+    
     async def send_command(self, drone_id: str, command_type: str, 
                           parameters: Dict[str, Any], priority: int = 1) -> bool:
-        """Send command to a drone"""
+        """Send command to a drone, failing over to its other links if the preferred one fails"""
         try:
-            connection = self._get_connection_by_drone_id(drone_id)
-            if not connection:
+            candidates = self._candidate_links(drone_id)
+            if not candidates:
                 logger.warning(f"No connection found for drone {drone_id}")
                 return False
             
-            # Send command
-            success = await connection.send_command(
-                drone_id, command_type, parameters, priority
-            )
+            success = False
+            for attempt, (connection_id, connection) in enumerate(candidates):
+                metrics = self.connection_metrics.get(connection_id)
+                if await connection.send_command(drone_id, command_type, parameters, priority):
+                    success = True
+                    if attempt:
+                        self.failovers += 1
+                        logger.warning(f"Command {command_type} for drone {drone_id} failed over to {connection_id}")
+                    if metrics:
+                        metrics.messages_sent += 1
+                        metrics.last_message_time = datetime.utcnow()
+                        self._update_traffic(metrics, connection)
+                    break
+                if metrics:
+                    metrics.send_failures += 1
             
             if success:
-                # Update metrics
-                connection_id = self._get_connection_id_by_drone_id(drone_id)
-                if connection_id and connection_id in self.connection_metrics:
-                    self.connection_metrics[connection_id].messages_sent += 1
-                    self.connection_metrics[connection_id].last_message_time = datetime.utcnow()
-                
                 # Notify callbacks
                 for callback in self.command_callbacks:
                     try:
@@ -248,12 +301,12 @@ class DroneConnectionHub:
     async def request_telemetry(self, drone_id: str) -> bool:
         """Request telemetry from a drone"""
         try:
-            connection = self._get_connection_by_drone_id(drone_id)
-            if not connection:
-                logger.warning(f"No connection found for drone {drone_id}")
-                return False
+            for connection_id, connection in self._candidate_links(drone_id):
+                if await connection.send_telemetry_request(drone_id):
+                    return True
             
-            return await connection.send_telemetry_request(drone_id)
+            logger.warning(f"No working connection for drone {drone_id}")
+            return False
             
         except Exception as e:
             logger.error(f"Error requesting telemetry from drone {drone_id}: {e}")
@@ -262,27 +315,32 @@ class DroneConnectionHub:
     def get_connected_drones(self) -> List[DroneInfo]:
         """Get list of connected drones"""
         connected_drones = []
-        for connection_id, metrics in self.connection_metrics.items():
-            drone_info = self.registry.get_drone(metrics.drone_id)
+        for drone_id in self.drone_links:
+            drone_info = self.registry.get_drone(drone_id)
             if drone_info and drone_info.status == DroneStatus.CONNECTED:
                 connected_drones.append(drone_info)
         
         return connected_drones
     
     def get_connection_status(self, drone_id: str) -> Optional[Dict]:
-        """Get connection status for a drone"""
-        connection = self._get_connection_by_drone_id(drone_id)
-        if connection:
-            connection_id = self._get_connection_id_by_drone_id(drone_id)
+        """Get connection status for a drone: its active link plus all of its links"""
+        candidates = self._candidate_links(drone_id)
+        if not candidates:
+            return None
+        
+        links = {}
+        for connection_id, connection in candidates:
+            links[connection_id] = connection.get_status()
             metrics = self.connection_metrics.get(connection_id)
-            
-            status_info = connection.get_status()
             if metrics:
-                status_info["metrics"] = asdict(metrics)
-            
-            return status_info
+                self._update_traffic(metrics, connection)
+                links[connection_id]["metrics"] = asdict(metrics)
         
-        return None
+        active_id = candidates[0][0]
+        status_info = dict(links[active_id])
+        status_info["active_link"] = active_id
+        status_info["links"] = links
+        return status_info
     
     def get_all_connection_status(self) -> Dict[str, Dict]:
         """Get connection status for all drones"""
@@ -401,12 +459,16 @@ class DroneConnectionHub:
                     host=drone_info.connection_params.get("host", "192.168.1.100"),
                     port=drone_info.connection_params.get("port", 8080),
                     protocol=drone_info.connection_params.get("protocol", "tcp"),
-                    timeout=drone_info.connection_params.get("timeout", 10.0)
+                    timeout=drone_info.connection_params.get("timeout", 10.0),
+                    wire_format=drone_info.connection_params.get("wire_format", "auto")
                 )
                 return WiFiConnection(drone_info.drone_id, config)
             
             elif drone_info.connection_type == DroneConnectionType.LORA:
                 config = LoRaConnectionConfig(
+                    host="",  # radio link: no network address
+                    port=0,
+                    wire_format=drone_info.connection_params.get("wire_format", "auto"),
                     frequency=drone_info.connection_params.get("frequency", 868.1),
                     spreading_factor=drone_info.connection_params.get("spreading_factor", 7),
                     bandwidth=drone_info.connection_params.get("bandwidth", 125000),
@@ -429,7 +491,8 @@ class DroneConnectionHub:
                     host=drone_info.connection_params.get("host", "localhost"),
                     port=drone_info.connection_params.get("port", 8080),
                     protocol=drone_info.connection_params.get("protocol", "ws"),
-                    path=drone_info.connection_params.get("path", "/ws")
+                    path=drone_info.connection_params.get("path", "/ws"),
+                    wire_format=drone_info.connection_params.get("wire_format", "auto")
                 )
                 return WebSocketDroneConnection(drone_info.drone_id, config)
             
@@ -442,38 +505,44 @@ class DroneConnectionHub:
             return None
     
     def _get_connection_by_drone_id(self, drone_id: str) -> Optional[BaseConnection]:
-        """Get connection by drone ID"""
-        for connection_id, connection in self.connections.items():
-            if connection_id.startswith(drone_id):
-                return connection
-        return None
+        """Get the preferred working connection of a drone"""
+        candidates = self._candidate_links(drone_id)
+        return candidates[0][1] if candidates else None
     
     def _get_connection_id_by_drone_id(self, drone_id: str) -> Optional[str]:
-        """Get connection ID by drone ID"""
-        for connection_id in self.connections.keys():
-            if connection_id.startswith(drone_id):
-                return connection_id
-        return None
+        """Get the preferred working connection ID of a drone"""
+        candidates = self._candidate_links(drone_id)
+        return candidates[0][0] if candidates else None
     
-    async def _handle_telemetry(self, message: DroneMessage):
+    @staticmethod
+    def _update_traffic(metrics: ConnectionMetrics, connection: BaseConnection):
+        traffic = connection.get_traffic()
+        metrics.bytes_sent = traffic["bytes_sent"]
+        metrics.bytes_received = traffic["bytes_received"]
+    
+    async def _handle_telemetry(self, message: DroneMessage, connection_id: Optional[str] = None):
         """Handle incoming telemetry data"""
         try:
-            # Update metrics
-            connection_id = self._get_connection_id_by_drone_id(message.drone_id)
-            if connection_id and connection_id in self.connection_metrics:
-                metrics = self.connection_metrics[connection_id]
+            # Update metrics of the link it arrived on
+            if connection_id is None:
+                connection_id = self._get_connection_id_by_drone_id(message.drone_id)
+            metrics = self.connection_metrics.get(connection_id)
+            if metrics:
                 metrics.messages_received += 1
                 metrics.last_message_time = datetime.utcnow()
-                
-                # Estimate message size (rough approximation)
-                message_size = len(str(message.payload))
-                metrics.bytes_received += message_size
+                # Exact byte counts from the link's wire codec
+                self._update_traffic(metrics, self.connections[connection_id])
             
             # Update drone registry
             if message.message_type == "telemetry":
-                position = message.payload.get("position", {})
-                battery_level = message.payload.get("battery_level", 0.0)
-                signal_strength = message.payload.get("signal_strength", 0.0)
+                if isinstance(message, TelemetryMessage):
+                    position = message.position or {}
+                    battery_level = message.battery_level
+                    signal_strength = message.signal_strength
+                else:
+                    position = message.payload.get("position", {})
+                    battery_level = message.payload.get("battery_level", 0.0)
+                    signal_strength = message.payload.get("signal_strength", 0.0)
                 
                 self.registry.update_drone_status(
                     message.drone_id,
@@ -493,6 +562,22 @@ class DroneConnectionHub:
         except Exception as e:
             logger.error(f"Error handling telemetry: {e}")
     
+    async def _handle_link_status_change(self, connection_id: str, _reported_id: str, status: ConnectionStatus):
+        """A single link changed state; the drone is only down when none of its links is up"""
+        drone_info = self.connection_drones.get(connection_id)
+        if drone_info is None:
+            return
+        drone_id = drone_info.drone_id
+        if status != ConnectionStatus.CONNECTED:
+            backups = [link for link, connection in self._candidate_links(drone_id)
+                       if connection.status == ConnectionStatus.CONNECTED]
+            if backups:
+                self.failovers += 1
+                logger.warning(f"Link {connection_id} of drone {drone_id} is {status.value}; "
+                               f"routing via {backups[0]}")
+                return
+        await self._handle_connection_status_change(drone_id, status)
+    
     async def _handle_connection_status_change(self, drone_id: str, status: ConnectionStatus):
         """Handle connection status changes"""
         try:
@@ -514,24 +599,23 @@ class DroneConnectionHub:
         except Exception as e:
             logger.error(f"Error handling connection status change: {e}")
     
+    async def _reconnect_lost_links(self):
+        """Reopen every link that is no longer connected, as the same link type"""
+        for connection_id, connection in list(self.connections.items()):
+            if connection.status != ConnectionStatus.CONNECTED:
+                # Connection lost, attempt reconnection of this exact link
+                drone_info = self.connection_drones.get(connection_id)
+                if drone_info:
+                    logger.warning(f"Connection lost on {connection_id}, attempting reconnection")
+                    await self.disconnect_drone(connection_id)
+                    await asyncio.sleep(self.reconnect_delay)  # Wait before reconnecting
+                    await self.connect_drone(drone_info)
+    
     async def _monitor_connections(self):
         """Monitor all connections for health"""
         while self._running:
             try:
-                for connection_id, connection in list(self.connections.items()):
-                    if connection.status != ConnectionStatus.CONNECTED:
-                        # Connection lost, attempt reconnection
-                        metrics = self.connection_metrics.get(connection_id)
-                        if metrics:
-                            logger.warning(f"Connection lost for drone {metrics.drone_id}, attempting reconnection")
-                            
-                            # Get drone info for reconnection
-                            drone_info = self.registry.get_drone(metrics.drone_id)
-                            if drone_info:
-                                await self.disconnect_drone(connection_id)
-                                await asyncio.sleep(5)  # Wait before reconnecting
-                                await self.connect_drone(drone_info)
-                
+                await self._reconnect_lost_links()
                 await asyncio.sleep(10)  # Check every 10 seconds
                 
             except asyncio.CancelledError:
@@ -575,10 +659,12 @@ class DroneConnectionHub:
             "total_drones": len(self.registry.drones),
             "connected_drones": len(self.get_connected_drones()),
             "connection_types": {
-                connection_type.value: len([c for c in self.connections.values() 
-                                          if c.connection_id.endswith(connection_type.value)])
+                connection_type.value: len([m for m in self.connection_metrics.values()
+                                          if m.connection_type == connection_type])
                 for connection_type in DroneConnectionType
-            }
+            },
+            "drones_with_redundant_links": len([links for links in self.drone_links.values() if len(links) > 1]),
+            "failovers": self.failovers
         }
 
 # Global connection hub instance
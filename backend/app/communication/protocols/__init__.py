@@ -8,6 +8,7 @@ from .wifi_connection import WiFiConnection
 from .lora_connection import LoRaConnection
 from .mavlink_connection import MAVLinkConnection
 from .websocket_connection import WebSocketDroneConnection
+from .wire_codec import WireCodec
 
 __all__ = [
     'BaseConnection',
@@ -15,5 +16,6 @@ __all__ = [
     'WiFiConnection',
     'LoRaConnection',
     'MAVLinkConnection',
-    'WebSocketDroneConnection'
+    'WebSocketDroneConnection',
+    'WireCodec'
 ]
@@ -32,6 +32,8 @@ class ConnectionConfig:
     retry_delay: float = 1.0
     heartbeat_interval: float = 5.0
     buffer_size: int = 4096
+    wire_format: str = "auto"  # auto (negotiated), binary or json; see wire_codec.py
+    wire_delta: bool = True    # delta-encode telemetry against the previous frame
 
 @dataclass
 class DroneMessage:
@@ -89,8 +91,10 @@ class BaseConnection(ABC):
         self.message_handlers: Dict[str, Callable] = {}
         self.telemetry_callbacks: List[Callable] = []
         self.connection_callbacks: List[Callable] = []
+        self.message_batch_callbacks: List[Callable] = []
         self._running = False
         self._heartbeat_task = None
+        self._process_task = None
         self._message_queue = asyncio.Queue()
         self._connection_lock = asyncio.Lock()
         
@@ -114,6 +118,26 @@ class BaseConnection(ABC):
         """Receive message from drone"""
         pass
     
+    async def receive_messages(self) -> List[DroneMessage]:
+        """Wait for the next batch of received messages.
+        
+        The default polls receive_message. Connections backed by a stream or
+        a queue override this to sleep until data arrives and then return
+        everything already buffered.
+        """
+        message = await self.receive_message()
+        if message is None:
+            await asyncio.sleep(0.01)  # Small delay to prevent busy waiting
+            return []
+        return [message]
+    
+    async def _drain_message_queue(self) -> List[DroneMessage]:
+        """Wait for the first queued message, then take the rest without waiting"""
+        messages = [await self._message_queue.get()]
+        while not self._message_queue.empty():
+            messages.append(self._message_queue.get_nowait())
+        return messages
+    
     async def start(self) -> bool:
         """Start the connection service"""
         try:
@@ -123,7 +147,7 @@ class BaseConnection(ABC):
             self._heartbeat_task = asyncio.create_task(self._heartbeat_monitor())
             
             # Start message processing
-            asyncio.create_task(self._process_messages())
+            self._process_task = asyncio.create_task(self._process_messages())
             
             logger.info(f"Connection {self.connection_id} started")
             return True
@@ -145,6 +169,15 @@ class BaseConnection(ABC):
                 except asyncio.CancelledError:
                     pass
             
+            # The processing loop may be waiting for data, so cancel it too
+            if self._process_task:
+                self._process_task.cancel()
+                try:
+                    await self._process_task
+                except asyncio.CancelledError:
+                    pass
+                self._process_task = None
+            
             # Disconnect if connected
             if self.status == ConnectionStatus.CONNECTED:
                 await self.disconnect()
@@ -193,6 +226,10 @@ class BaseConnection(ABC):
         """Register callback for connection status changes"""
         self.connection_callbacks.append(callback)
     
+    def register_message_batch_callback(self, callback: Callable):
+        """Register callback receiving each batch of messages read in one wakeup"""
+        self.message_batch_callbacks.append(callback)
+    
     async def _heartbeat_monitor(self):
         """Monitor connection heartbeat"""
         while self._running:
@@ -216,11 +253,9 @@ class BaseConnection(ABC):
         """Process incoming messages"""
         while self._running:
             try:
-                message = await self.receive_message()
-                if message:
-                    await self._handle_message(message)
-                
-                await asyncio.sleep(0.01)  # Small delay to prevent busy waiting
+                messages = await self.receive_messages()
+                if messages:
+                    await self._handle_messages(messages)
                 
             except asyncio.CancelledError:
                 break
@@ -228,6 +263,17 @@ class BaseConnection(ABC):
                 logger.error(f"Message processing error for {self.connection_id}: {e}")
                 await asyncio.sleep(0.1)
     
+    async def _handle_messages(self, messages: List[DroneMessage]):
+        """Handle a batch of incoming messages"""
+        for message in messages:
+            await self._handle_message(message)
+        
+        for callback in self.message_batch_callbacks:
+            try:
+                await callback(messages)
+            except Exception as e:
+                logger.error(f"Message batch callback error: {e}")
+    
     async def _handle_message(self, message: DroneMessage):
         """Handle incoming message"""
         try:
@@ -294,6 +340,13 @@ class BaseConnection(ABC):
         
         return False
     
+    def get_traffic(self) -> Dict[str, int]:
+        """Exact bytes sent and received, as counted by the connection's wire codec"""
+        codec = getattr(self, "codec", None)
+        if codec is None:
+            return {"bytes_sent": 0, "bytes_received": 0}
+        return {"bytes_sent": codec.stats["bytes_encoded"], "bytes_received": codec.stats["bytes_decoded"]}
+    
     def get_status(self) -> Dict[str, Any]:
         """Get connection status information"""
         return {
@@ -4,10 +4,10 @@ Implements LoRa radio communication for long-range drone connections
 """
 import asyncio
 import struct
-import json
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+from dataclasses import dataclass
 import time
 
 try:
@@ -22,9 +22,11 @@ except ImportError:
     serial = None
 
 from .base_connection import BaseConnection, ConnectionConfig, DroneMessage, ConnectionStatus
+from .wire_codec import LORA_JSON, WireCodec
 
 logger = logging.getLogger(__name__)
 
+@dataclass
 class LoRaConnectionConfig(ConnectionConfig):
     """LoRa-specific connection configuration"""
     frequency: float = 868.1  # MHz
@@ -48,6 +50,10 @@ class LoRaConnection(BaseConnection):
         self._receive_buffer = b""
         self._message_queue = asyncio.Queue()
         self._receive_task = None
+        # No handshake on LoRa: in auto mode we switch to binary once the
+        # drone sends a binary frame. Frequent keyframes bound the cost of loss.
+        self.codec = WireCodec(config.wire_format, dialect=LORA_JSON,
+                               delta=config.wire_delta, keyframe_interval=5)
         
         if not LORA_AVAILABLE:
             logger.warning("LoRa libraries not available. Install RPi.GPIO, spidev, and pyserial")
@@ -196,6 +202,10 @@ class LoRaConnection(BaseConnection):
             logger.error(f"Error sending message via LoRa: {e}")
             return False
     
+    async def receive_messages(self) -> List[DroneMessage]:
+        """Wait for the receive loop and return everything it has queued"""
+        return await self._drain_message_queue()
+    
     async def receive_message(self) -> Optional[DroneMessage]:
         """Receive message via LoRa"""
         try:
@@ -258,95 +268,14 @@ class LoRaConnection(BaseConnection):
     def _serialize_message(self, message: DroneMessage) -> bytes:
         """Serialize message for LoRa transmission"""
         try:
-            # Create compact message format for LoRa
-            message_dict = {
-                "id": message.message_id,
-                "drone": message.drone_id,
-                "type": message.message_type,
-                "data": message.payload,
-                "time": int(message.timestamp.timestamp()),
-                "pri": message.priority
-            }
-            
-            # Add command-specific fields
-            if hasattr(message, 'command_type'):
-                message_dict["cmd"] = message.command_type
-            if hasattr(message, 'parameters'):
-                message_dict["params"] = message.parameters
-            
-            # Add telemetry-specific fields
-            if hasattr(message, 'position'):
-                message_dict["pos"] = message.position
-            if hasattr(message, 'battery_level'):
-                message_dict["bat"] = message.battery_level
-            if hasattr(message, 'speed'):
-                message_dict["spd"] = message.speed
-            if hasattr(message, 'heading'):
-                message_dict["hdg"] = message.heading
-            
-            # Convert to JSON and compress
-            json_data = json.dumps(message_dict, separators=(',', ':'))
-            return json_data.encode()
-            
+            return self.codec.encode(message)
         except Exception as e:
             logger.error(f"Error serializing LoRa message: {e}")
             return b""
     
     def _deserialize_message(self, data: bytes) -> Optional[DroneMessage]:
         """Deserialize received LoRa message"""
-        try:
-            # Parse JSON data
-            message_dict = json.loads(data.decode())
-            
-            # Create base message
-            message = DroneMessage(
-                message_id=message_dict["id"],
-                drone_id=message_dict["drone"],
-                message_type=message_dict["type"],
-                payload=message_dict["data"],
-                timestamp=datetime.fromtimestamp(message_dict["time"]),
-                priority=message_dict.get("pri", 1)
-            )
-            
-            # Add command-specific fields
-            if "cmd" in message_dict:
-                from .base_connection import CommandMessage
-                message = CommandMessage(
-                    message_id=message.message_id,
-                    drone_id=message.drone_id,
-                    message_type=message.message_type,
-                    payload=message.payload,
-                    timestamp=message.timestamp,
-                    priority=message.priority,
-                    response_required=False,
-                    command_type=message_dict["cmd"],
-                    parameters=message_dict.get("params", {})
-                )
-            
-            # Add telemetry-specific fields
-            if "pos" in message_dict:
-                from .base_connection import TelemetryMessage
-                message = TelemetryMessage(
-                    message_id=message.message_id,
-                    drone_id=message.drone_id,
-                    message_type=message.message_type,
-                    payload=message.payload,
-                    timestamp=message.timestamp,
-                    priority=message.priority,
-                    response_required=False,
-                    position=message_dict["pos"],
-                    battery_level=message_dict.get("bat", 0.0),
-                    speed=message_dict.get("spd", 0.0),
-                    heading=message_dict.get("hdg", 0.0),
-                    signal_strength=0.0,  # LoRa doesn't provide signal strength
-                    gps_accuracy=0.0
-                )
-            
-            return message
-            
-        except Exception as e:
-            logger.error(f"Error deserializing LoRa message: {e}")
-            return None
+        return self.codec.decode(data)
     
     def get_connection_info(self) -> Dict:
         """Get LoRa connection information"""
@@ -358,5 +287,6 @@ class LoRaConnection(BaseConnection):
             "coding_rate": self.config.coding_rate,
             "tx_power": self.config.tx_power,
             "device_path": self.config.device_path,
-            "baudrate": self.config.baudrate
+            "baudrate": self.config.baudrate,
+            "wire": self.codec.get_stats()
         }
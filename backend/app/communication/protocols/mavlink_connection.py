@@ -6,9 +6,12 @@ import asyncio
 import serial
 import socket
 import logging
-from typing import Dict, Optional, Union
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 import threading
+import time
 
 try:
     from pymavlink import mavutil
@@ -21,6 +24,20 @@ from .base_connection import BaseConnection, ConnectionConfig, DroneMessage, Con
 
 logger = logging.getLogger(__name__)
 
+# Message types handed to the event loop; everything else is dropped in the
+# reader thread. HEARTBEAT is consumed by the thread itself.
+DEFAULT_MESSAGE_TYPES = [
+    "GLOBAL_POSITION_INT", "SYS_STATUS", "ATTITUDE", "BATTERY_STATUS", "GPS_RAW_INT",
+    "COMMAND_ACK", "STATUSTEXT", "MISSION_CURRENT", "MISSION_ITEM_REACHED", "EXTENDED_SYS_STATE",
+]
+
+# Per-vehicle forwarding caps for high-rate streams (Hz)
+DEFAULT_MAX_RATE_HZ = {
+    "GLOBAL_POSITION_INT": 10.0,
+    "ATTITUDE": 10.0,
+}
+
+@dataclass
 class MAVLinkConnectionConfig(ConnectionConfig):
     """MAVLink-specific connection configuration"""
     connection_type: str = "serial"  # serial, tcp, udp
@@ -30,6 +47,9 @@ class MAVLinkConnectionConfig(ConnectionConfig):
     heartbeat_interval: float = 1.0  # MAVLink heartbeat interval
     system_id: int = 255  # Ground control system ID
     component_id: int = 190  # Ground control component ID
+    message_types: Optional[List[str]] = field(default_factory=lambda: list(DEFAULT_MESSAGE_TYPES))  # None: all
+    max_rate_hz: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MAX_RATE_HZ))
+    max_queue_size: int = 10000  # oldest messages are dropped beyond this
 
 class MAVLinkConnection(BaseConnection):
     """MAVLink-based drone connection"""
@@ -40,6 +60,19 @@ class MAVLinkConnection(BaseConnection):
         self.mav = None
         self._mavlink_thread = None
         self._message_callbacks = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader_stop = threading.Event()
+        # Reader thread -> event loop handoff: the thread appends to the
+        # inbox and schedules at most one wakeup until the loop drains it
+        self._inbox = deque(maxlen=config.max_queue_size)
+        self._inbox_ready = asyncio.Event()
+        self._wake_lock = threading.Lock()
+        self._wake_pending = False
+        self.ingest_stats = {
+            "received": 0, "bytes_received": 0, "filtered": 0, "rate_limited": 0, "forwarded": 0,
+            "dropped": 0, "wakeups": 0, "batches": 0,
+        }
+        self.bytes_sent = 0
         
         if not MAVLINK_AVAILABLE:
             logger.error("pymavlink not available. Install with: pip install pymavlink")
@@ -57,6 +90,7 @@ class MAVLinkConnection(BaseConnection):
                     return True
                 
                 self.status = ConnectionStatus.CONNECTING
+                await self._stop_reader()  # a reconnect replaces the previous link
                 
                 # Create MAVLink connection string
                 connection_string = self._build_connection_string()
@@ -75,8 +109,11 @@ class MAVLinkConnection(BaseConnection):
                     self.last_heartbeat = datetime.utcnow()
                     
                     # Start MAVLink message processing
+                    self._loop = asyncio.get_running_loop()
+                    self._reader_stop.clear()
                     self._mavlink_thread = threading.Thread(
                         target=self._process_mavlink_messages,
+                        name=f"mavlink-{self.connection_id}",
                         daemon=True
                     )
                     self._mavlink_thread.start()
@@ -107,8 +144,8 @@ class MAVLinkConnection(BaseConnection):
     async def _wait_for_heartbeat(self) -> bool:
         """Wait for MAVLink heartbeat from drone"""
         try:
-            # Wait for heartbeat message
-            heartbeat = self.mav.wait_heartbeat(timeout=self.config.timeout)
+            # Wait for heartbeat message (blocking read, so off the event loop)
+            heartbeat = await asyncio.to_thread(self.mav.wait_heartbeat, timeout=self.config.timeout)
             if heartbeat:
                 logger.info(f"Heartbeat received from system {heartbeat.get_srcSystem()}")
                 return True
@@ -119,25 +156,83 @@ class MAVLinkConnection(BaseConnection):
             return False
     
     def _process_mavlink_messages(self):
-        """Process incoming MAVLink messages in background thread"""
-        while self._running and self.mav:
+        """Background thread: read, filter, rate-limit and convert MAVLink messages"""
+        allowed = set(self.config.message_types) if self.config.message_types is not None else None
+        min_interval = {
+            message_type: 1.0 / rate
+            for message_type, rate in (self.config.max_rate_hz or {}).items() if rate > 0
+        }
+        last_forwarded: Dict[tuple, float] = {}
+        stats = self.ingest_stats
+        
+        while not self._reader_stop.is_set() and self.mav:
             try:
-                # Get next message
                 msg = self.mav.recv_match(blocking=True, timeout=1.0)
-                if msg:
-                    # Convert to our message format
-                    drone_message = self._convert_mavlink_message(msg)
-                    if drone_message:
-                        # Put message in queue for processing
-                        asyncio.run_coroutine_threadsafe(
-                            self._handle_message(drone_message),
-                            asyncio.get_event_loop()
-                        )
+                if msg is None:
+                    continue
+                stats["received"] += 1
+                stats["bytes_received"] += len(msg.get_msgbuf())
+                
+                message_type = msg.get_type()
+                if message_type == "HEARTBEAT":
+                    self.last_heartbeat = datetime.utcnow()
+                    continue
+                if message_type == "BAD_DATA" or (allowed is not None and message_type not in allowed):
+                    stats["filtered"] += 1
+                    continue
+                
+                interval = min_interval.get(message_type)
+                if interval:
+                    now = time.monotonic()
+                    key = (msg.get_srcSystem(), message_type)
+                    if now - last_forwarded.get(key, float("-inf")) < interval:
+                        stats["rate_limited"] += 1
+                        continue
+                    last_forwarded[key] = now
+                
+                drone_message = self._convert_mavlink_message(msg)
+                if drone_message:
+                    self._enqueue(drone_message)
                 
             except Exception as e:
                 logger.error(f"Error processing MAVLink message: {e}")
-                if self._running:
-                    asyncio.sleep(0.1)
+                if not self._reader_stop.is_set():
+                    time.sleep(0.1)
+    
+    async def _stop_reader(self):
+        """Stop the reader thread; it checks the stop flag at least once a second"""
+        self._reader_stop.set()
+        if self._mavlink_thread and self._mavlink_thread.is_alive():
+            await asyncio.to_thread(self._mavlink_thread.join, 2.0)
+        self._mavlink_thread = None
+    
+    def _enqueue(self, message: DroneMessage):
+        """Reader thread: queue a message and wake the event loop if it is not already due to drain"""
+        if len(self._inbox) == self._inbox.maxlen:
+            self.ingest_stats["dropped"] += 1  # the deque discards the oldest entry
+        self._inbox.append(message)
+        self.ingest_stats["forwarded"] += 1
+        
+        with self._wake_lock:
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        self.ingest_stats["wakeups"] += 1
+        try:
+            self._loop.call_soon_threadsafe(self._inbox_ready.set)
+        except RuntimeError:
+            pass  # event loop already closed
+    
+    def _drain_inbox(self) -> List[DroneMessage]:
+        """Event loop: take everything the reader thread has queued"""
+        self._inbox_ready.clear()
+        with self._wake_lock:
+            self._wake_pending = False
+        messages = []
+        inbox = self._inbox
+        while inbox:
+            messages.append(inbox.popleft())
+        return messages
     
     def _convert_mavlink_message(self, msg) -> Optional[DroneMessage]:
         """Convert MAVLink message to our standard format"""
@@ -152,7 +247,7 @@ class MAVLinkConnection(BaseConnection):
             elif message_type == "GLOBAL_POSITION_INT":
                 # Telemetry message
                 return DroneMessage(
-                    message_id=f"mav_{msg.seq}",
+                    message_id=f"mav_{msg.get_seq()}",
                     drone_id=str(msg.get_srcSystem()),
                     message_type="telemetry",
                     payload={
@@ -171,7 +266,7 @@ class MAVLinkConnection(BaseConnection):
             elif message_type == "SYS_STATUS":
                 # System status message
                 return DroneMessage(
-                    message_id=f"mav_{msg.seq}",
+                    message_id=f"mav_{msg.get_seq()}",
                     drone_id=str(msg.get_srcSystem()),
                     message_type="system_status",
                     payload={
@@ -190,7 +285,7 @@ class MAVLinkConnection(BaseConnection):
             elif message_type == "ATTITUDE":
                 # Attitude message
                 return DroneMessage(
-                    message_id=f"mav_{msg.seq}",
+                    message_id=f"mav_{msg.get_seq()}",
                     drone_id=str(msg.get_srcSystem()),
                     message_type="attitude",
                     payload={
@@ -207,7 +302,7 @@ class MAVLinkConnection(BaseConnection):
             else:
                 # Generic message
                 return DroneMessage(
-                    message_id=f"mav_{msg.seq}",
+                    message_id=f"mav_{msg.get_seq()}",
                     drone_id=str(msg.get_srcSystem()),
                     message_type=message_type.lower(),
                     payload=msg.to_dict(),
@@ -225,9 +320,7 @@ class MAVLinkConnection(BaseConnection):
                 self.status = ConnectionStatus.DISCONNECTED
                 
                 # Stop MAVLink processing
-                if self._mavlink_thread and self._mavlink_thread.is_alive():
-                    # Thread will stop when _running becomes False
-                    pass
+                await self._stop_reader()
                 
                 # Close MAVLink connection
                 if self.mav:
@@ -281,13 +374,13 @@ class MAVLinkConnection(BaseConnection):
                 return False
             
             # Send command
-            self.mav.mav.command_long_send(
+            self._write(self.mav.mav.command_long_encode(
                 self.mav.target_system,
                 self.mav.target_component,
                 command_id,
                 0,  # confirmation
                 *self._prepare_command_params(command_type, parameters)
-            )
+            ))
             
             logger.info(f"Sent MAVLink command: {command_type}")
             return True
@@ -342,11 +435,33 @@ class MAVLinkConnection(BaseConnection):
             logger.error(f"Error sending generic MAVLink message: {e}")
             return False
     
+    def _write(self, msg):
+        """Pack and send a MAVLink message, counting the bytes written"""
+        self.mav.mav.send(msg)
+        self.bytes_sent += len(msg.get_msgbuf())
+    
+    def get_traffic(self) -> Dict[str, int]:
+        """Bytes of MAVLink sent, and received as counted by the reader thread"""
+        return {"bytes_sent": self.bytes_sent, "bytes_received": self.ingest_stats["bytes_received"]}
+    
+    async def receive_messages(self) -> List[DroneMessage]:
+        """Wait for the reader thread and return everything it has queued"""
+        if self._mavlink_thread is None:
+            await asyncio.sleep(0.1)
+            return []
+        await self._inbox_ready.wait()
+        messages = self._drain_inbox()
+        if messages:
+            self.ingest_stats["batches"] += 1
+        return messages
+    
     async def receive_message(self) -> Optional[DroneMessage]:
         """Receive message via MAVLink"""
-        # MAVLink messages are processed in background thread
-        # This method is not used in MAVLink implementation
-        return None
+        # Messages are decoded by the reader thread; take the oldest queued one
+        try:
+            return self._inbox.popleft()
+        except IndexError:
+            return None
     
     def get_connection_info(self) -> Dict:
         """Get MAVLink connection information"""
@@ -359,5 +474,6 @@ class MAVLinkConnection(BaseConnection):
             "port": self.config.port if self.config.connection_type in ["tcp", "udp"] else None,
             "mavlink_version": self.config.mavlink_version,
             "system_id": self.config.system_id,
-            "component_id": self.config.component_id
+            "component_id": self.config.component_id,
+            "ingest": dict(self.ingest_stats)
         }
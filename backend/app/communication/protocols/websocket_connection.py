@@ -5,15 +5,18 @@ Implements WebSocket communication for drone connections
 import asyncio
 import json
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
+from dataclasses import dataclass
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
 from .base_connection import BaseConnection, ConnectionConfig, DroneMessage, ConnectionStatus
+from .wire_codec import WIRE_VERSION, WireCodec
 
 logger = logging.getLogger(__name__)
 
+@dataclass
 class WebSocketConnectionConfig(ConnectionConfig):
     """WebSocket-specific connection configuration"""
     protocol: str = "ws"  # ws or wss
@@ -34,6 +37,7 @@ class WebSocketDroneConnection(BaseConnection):
         self.websocket = None
         self._message_queue = asyncio.Queue()
         self._receive_task = None
+        self.codec = WireCodec(config.wire_format, delta=config.wire_delta)
     
     async def connect(self) -> bool:
         """Establish WebSocket connection to drone"""
@@ -65,7 +69,8 @@ class WebSocketDroneConnection(BaseConnection):
                     "connection_id": self.connection_id,
                     "timestamp": datetime.utcnow().isoformat(),
                     "version": "1.0",
-                    "capabilities": ["telemetry", "commands", "status"]
+                    "capabilities": ["telemetry", "commands", "status"],
+                    "codecs": self.codec.offer()
                 }
                 
                 await self.websocket.send(json.dumps(handshake))
@@ -78,6 +83,8 @@ class WebSocketDroneConnection(BaseConnection):
                 
                 response = json.loads(response_data)
                 if response.get("status") == "accepted":
+                    self.codec.reset()
+                    self.codec.accept(response.get("codec"))
                     self.status = ConnectionStatus.CONNECTED
                     self.last_heartbeat = datetime.utcnow()
                     
@@ -157,6 +164,10 @@ class WebSocketDroneConnection(BaseConnection):
             logger.error(f"Error sending message via WebSocket: {e}")
             return False
     
+    async def receive_messages(self) -> List[DroneMessage]:
+        """Wait for the receive loop and return everything it has queued"""
+        return await self._drain_message_queue()
+    
     async def receive_message(self) -> Optional[DroneMessage]:
         """Receive message via WebSocket"""
         try:
@@ -196,107 +207,14 @@ class WebSocketDroneConnection(BaseConnection):
                 logger.error(f"Error in WebSocket receive loop: {e}")
                 await asyncio.sleep(0.1)
     
-    def _serialize_message(self, message: DroneMessage) -> str:
-        """Serialize message for WebSocket transmission"""
-        message_dict = {
-            "message_id": message.message_id,
-            "drone_id": message.drone_id,
-            "message_type": message.message_type,
-            "payload": message.payload,
-            "timestamp": message.timestamp.isoformat(),
-            "priority": message.priority,
-            "response_required": message.response_required
-        }
-        
-        # Add command-specific fields
-        if hasattr(message, 'command_type'):
-            message_dict["command_type"] = message.command_type
-        if hasattr(message, 'parameters'):
-            message_dict["parameters"] = message.parameters
-        if hasattr(message, 'execution_time'):
-            message_dict["execution_time"] = message.execution_time.isoformat() if message.execution_time else None
-        
-        # Add telemetry-specific fields
-        if hasattr(message, 'position'):
-            message_dict["position"] = message.position
-        if hasattr(message, 'battery_level'):
-            message_dict["battery_level"] = message.battery_level
-        if hasattr(message, 'speed'):
-            message_dict["speed"] = message.speed
-        if hasattr(message, 'heading'):
-            message_dict["heading"] = message.heading
-        if hasattr(message, 'signal_strength'):
-            message_dict["signal_strength"] = message.signal_strength
-        if hasattr(message, 'gps_accuracy'):
-            message_dict["gps_accuracy"] = message.gps_accuracy
-        if hasattr(message, 'temperature'):
-            message_dict["temperature"] = message.temperature
-        if hasattr(message, 'humidity'):
-            message_dict["humidity"] = message.humidity
-        if hasattr(message, 'wind_speed'):
-            message_dict["wind_speed"] = message.wind_speed
-        
-        return json.dumps(message_dict)
+    def _serialize_message(self, message: DroneMessage) -> Union[str, bytes]:
+        """Serialize message for WebSocket transmission (binary or text frame)"""
+        data = self.codec.encode(message)
+        return data if data[0] == WIRE_VERSION else data.decode()
     
-    def _deserialize_message(self, data: str) -> Optional[DroneMessage]:
+    def _deserialize_message(self, data: Union[str, bytes]) -> Optional[DroneMessage]:
         """Deserialize received WebSocket message"""
-        try:
-            message_dict = json.loads(data)
-            
-            # Create base message
-            message = DroneMessage(
-                message_id=message_dict["message_id"],
-                drone_id=message_dict["drone_id"],
-                message_type=message_dict["message_type"],
-                payload=message_dict["payload"],
-                timestamp=datetime.fromisoformat(message_dict["timestamp"]),
-                priority=message_dict.get("priority", 1),
-                response_required=message_dict.get("response_required", False)
-            )
-            
-            # Add command-specific fields
-            if "command_type" in message_dict:
-                from .base_connection import CommandMessage
-                message = CommandMessage(
-                    message_id=message.message_id,
-                    drone_id=message.drone_id,
-                    message_type=message.message_type,
-                    payload=message.payload,
-                    timestamp=message.timestamp,
-                    priority=message.priority,
-                    response_required=message.response_required,
-                    command_type=message_dict["command_type"],
-                    parameters=message_dict.get("parameters", {}),
-                    execution_time=datetime.fromisoformat(message_dict["execution_time"]) if message_dict.get("execution_time") else None
-                )
-            
-            # Add telemetry-specific fields
-            if "position" in message_dict:
-                from .base_connection import TelemetryMessage
-                message = TelemetryMessage(
-                    message_id=message.message_id,
-                    drone_id=message.drone_id,
-                    message_type=message.message_type,
-                    payload=message.payload,
-                    timestamp=message.timestamp,
-                    priority=message.priority,
-                    response_required=message.response_required,
-                    position=message_dict["position"],
-                    battery_level=message_dict["battery_level"],
-                    speed=message_dict["speed"],
-                    heading=message_dict["heading"],
-                    signal_strength=message_dict["signal_strength"],
-                    gps_accuracy=message_dict["gps_accuracy"],
-                    temperature=message_dict.get("temperature"),
-                    humidity=message_dict.get("humidity"),
-                    wind_speed=message_dict.get("wind_speed")
-                )
-            
-            return message
-            
-        except Exception as e:
-            logger.error(f"Error deserializing WebSocket message: {e}")
-            return None
+        return self.codec.decode(data)
     
     def get_connection_info(self) -> Dict:
         """Get WebSocket connection information"""
@@ -309,5 +227,6 @@ class WebSocketDroneConnection(BaseConnection):
             "ping_interval": self.config.ping_interval,
             "ping_timeout": self.config.ping_timeout,
             "max_message_size": self.config.max_size,
-            "compression": self.config.compression
+            "compression": self.config.compression,
+            "wire": self.codec.get_stats()
         }
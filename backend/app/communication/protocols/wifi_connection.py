@@ -7,14 +7,65 @@ import socket
 import json
 import struct
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+from dataclasses import dataclass
 import uuid
+from collections import deque
 
 from .base_connection import BaseConnection, ConnectionConfig, DroneMessage, ConnectionStatus
+from .wire_codec import WireCodec
 
 logger = logging.getLogger(__name__)
 
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+_LENGTH_HEADER = struct.Struct('!I')
+
+class FrameReader:
+    """Splits a length-prefixed TCP stream into frames.
+    
+    Each read takes whatever the transport has buffered, so one wakeup
+    returns every complete frame that has arrived; a partial frame stays in
+    the buffer until the rest comes in.
+    """
+    
+    def __init__(self, reader: asyncio.StreamReader, max_frame_size: int = MAX_FRAME_SIZE,
+                 chunk_size: int = 256 * 1024):
+        self.reader = reader
+        self.max_frame_size = max_frame_size
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+    
+    def _split(self) -> List[bytes]:
+        frames = []
+        buffer = self._buffer
+        size = len(buffer)
+        offset = 0
+        while size - offset >= 4:
+            message_length = _LENGTH_HEADER.unpack_from(buffer, offset)[0]
+            if message_length > self.max_frame_size:
+                raise ValueError(f"Frame of {message_length} bytes exceeds {self.max_frame_size}")
+            end = offset + 4 + message_length
+            if end > size:
+                break
+            frames.append(bytes(buffer[offset + 4:end]))
+            offset = end
+        if offset:
+            del buffer[:offset]
+        return frames
+    
+    async def read_frames(self) -> List[bytes]:
+        """Wait until at least one frame is complete and return all complete frames"""
+        frames = self._split()
+        while not frames:
+            chunk = await self.reader.read(self.chunk_size)
+            if not chunk:
+                raise asyncio.IncompleteReadError(bytes(self._buffer), None)
+            self._buffer += chunk
+            frames = self._split()
+        return frames
+
+@dataclass
 class WiFiConnectionConfig(ConnectionConfig):
     """WiFi-specific connection configuration"""
     protocol: str = "tcp"  # tcp or udp
@@ -31,8 +82,14 @@ class WiFiConnection(BaseConnection):
         self.socket = None
         self.reader = None
         self.writer = None
-        self._message_buffer = b""
-        self._message_lock = asyncio.Lock()
+        self.frame_reader: Optional[FrameReader] = None
+        self._pending_frames = deque()
+        # Deltas need in-order delivery; over UDP a lost keyframe costs a few frames
+        self.codec = WireCodec(
+            config.wire_format,
+            delta=config.wire_delta,
+            keyframe_interval=20 if config.protocol.lower() == "tcp" else 5
+        )
     
     async def connect(self) -> bool:
         """Establish WiFi connection to drone"""
@@ -68,13 +125,16 @@ class WiFiConnection(BaseConnection):
                 ),
                 timeout=self.config.timeout
             )
+            self.frame_reader = FrameReader(self.reader)
+            self._pending_frames.clear()
             
             # Send connection handshake
             handshake = {
                 "type": "handshake",
                 "connection_id": self.connection_id,
                 "timestamp": datetime.utcnow().isoformat(),
-                "version": "1.0"
+                "version": "1.0",
+                "codecs": self.codec.offer()
             }
             
             await self._send_raw_data(json.dumps(handshake).encode())
@@ -84,6 +144,8 @@ class WiFiConnection(BaseConnection):
             if response_data:
                 response = json.loads(response_data.decode())
                 if response.get("status") == "accepted":
+                    self.codec.reset()
+                    self.codec.accept(response.get("codec"))
                     self.status = ConnectionStatus.CONNECTED
                     self.last_heartbeat = datetime.utcnow()
                     logger.info(f"TCP connection established to {self.config.host}:{self.config.port}")
@@ -118,7 +180,8 @@ class WiFiConnection(BaseConnection):
                 "type": "handshake",
                 "connection_id": self.connection_id,
                 "timestamp": datetime.utcnow().isoformat(),
-                "version": "1.0"
+                "version": "1.0",
+                "codecs": self.codec.offer()
             }
             
             await self._send_udp_data(json.dumps(handshake).encode())
@@ -128,6 +191,8 @@ class WiFiConnection(BaseConnection):
             if response_data:
                 response = json.loads(response_data.decode())
                 if response.get("status") == "accepted":
+                    self.codec.reset()
+                    self.codec.accept(response.get("codec"))
                     self.status = ConnectionStatus.CONNECTED
                     self.last_heartbeat = datetime.utcnow()
                     logger.info(f"UDP connection established to {self.config.host}:{self.config.port}")
@@ -154,6 +219,8 @@ class WiFiConnection(BaseConnection):
                     await self.writer.wait_closed()
                     self.writer = None
                     self.reader = None
+                    self.frame_reader = None
+                    self._pending_frames.clear()
                 
                 # Close UDP socket
                 if self.socket:
@@ -211,6 +278,30 @@ class WiFiConnection(BaseConnection):
             logger.error(f"Error receiving message via WiFi: {e}")
             return None
     
+    async def receive_messages(self) -> List[DroneMessage]:
+        """Wait for data and return every complete message received"""
+        if self.status != ConnectionStatus.CONNECTED or not (self.frame_reader or self.socket):
+            await asyncio.sleep(0.1)
+            return []
+        
+        try:
+            if self.config.protocol.lower() == "tcp":
+                raw_frames = await self._receive_tcp_frames()
+            else:
+                raw_frames = await self._receive_udp_frames()
+        except (asyncio.IncompleteReadError, OSError, ValueError) as e:
+            # Closed stream or socket, or a corrupt length header we cannot resync from
+            logger.warning(f"WiFi connection {self.connection_id} lost: {e!r}")
+            await self._handle_connection_lost()
+            return []
+        
+        messages = []
+        for raw_data in raw_frames:
+            message = self._deserialize_message(raw_data)
+            if message:
+                messages.append(message)
+        return messages
+    
     async def _send_raw_data(self, data: bytes) -> bool:
         """Send raw data via TCP"""
         try:
@@ -229,29 +320,44 @@ class WiFiConnection(BaseConnection):
             return False
     
     async def _receive_raw_data(self) -> Optional[bytes]:
-        """Receive raw data via TCP"""
+        """Receive one frame via TCP"""
         try:
-            if not self.reader:
-                return None
-            
-            # Read message length header
-            length_header = await self.reader.read(4)
-            if len(length_header) != 4:
-                return None
-            
-            message_length = struct.unpack('!I', length_header)[0]
-            
-            # Read message data
-            message_data = await self.reader.read(message_length)
-            if len(message_data) != message_length:
+            if not self.frame_reader:
                 return None
             
-            return message_data
+            if not self._pending_frames:
+                self._pending_frames.extend(await self.frame_reader.read_frames())
+            return self._pending_frames.popleft()
             
+        except asyncio.IncompleteReadError:
+            logger.warning(f"TCP stream closed by peer: {self.connection_id}")
+            return None
         except Exception as e:
             logger.error(f"Error receiving raw data: {e}")
             return None
     
+    async def _receive_tcp_frames(self) -> List[bytes]:
+        """Wait for data and return every complete frame buffered"""
+        if self._pending_frames:
+            frames = list(self._pending_frames)
+            self._pending_frames.clear()
+            return frames
+        return await self.frame_reader.read_frames()
+    
+    async def _receive_udp_frames(self) -> List[bytes]:
+        """Wait for a datagram, then take any others already queued on the socket.
+        
+        Socket errors propagate so the caller marks the link lost; swallowing
+        them would return at once and spin the receive loop.
+        """
+        data, _ = await asyncio.get_running_loop().sock_recvfrom(self.socket, self.config.buffer_size)
+        frames = [data]
+        while True:
+            try:
+                frames.append(self.socket.recv(self.config.buffer_size))
+            except (BlockingIOError, InterruptedError):
+                return frames
+    
     async def _send_udp_data(self, data: bytes) -> bool:
         """Send data via UDP"""
         try:
@@ -282,105 +388,11 @@ class WiFiConnection(BaseConnection):
     
     def _serialize_message(self, message: DroneMessage) -> bytes:
         """Serialize message for transmission"""
-        message_dict = {
-            "message_id": message.message_id,
-            "drone_id": message.drone_id,
-            "message_type": message.message_type,
-            "payload": message.payload,
-            "timestamp": message.timestamp.isoformat(),
-            "priority": message.priority,
-            "response_required": message.response_required
-        }
-        
-        # Add command-specific fields
-        if hasattr(message, 'command_type'):
-            message_dict["command_type"] = message.command_type
-        if hasattr(message, 'parameters'):
-            message_dict["parameters"] = message.parameters
-        if hasattr(message, 'execution_time'):
-            message_dict["execution_time"] = message.execution_time.isoformat() if message.execution_time else None
-        
-        # Add telemetry-specific fields
-        if hasattr(message, 'position'):
-            message_dict["position"] = message.position
-        if hasattr(message, 'battery_level'):
-            message_dict["battery_level"] = message.battery_level
-        if hasattr(message, 'speed'):
-            message_dict["speed"] = message.speed
-        if hasattr(message, 'heading'):
-            message_dict["heading"] = message.heading
-        if hasattr(message, 'signal_strength'):
-            message_dict["signal_strength"] = message.signal_strength
-        if hasattr(message, 'gps_accuracy'):
-            message_dict["gps_accuracy"] = message.gps_accuracy
-        if hasattr(message, 'temperature'):
-            message_dict["temperature"] = message.temperature
-        if hasattr(message, 'humidity'):
-            message_dict["humidity"] = message.humidity
-        if hasattr(message, 'wind_speed'):
-            message_dict["wind_speed"] = message.wind_speed
-        
-        return json.dumps(message_dict).encode()
+        return self.codec.encode(message)
     
     def _deserialize_message(self, data: bytes) -> Optional[DroneMessage]:
         """Deserialize received message"""
-        try:
-            message_dict = json.loads(data.decode())
-            
-            # Create base message
-            message = DroneMessage(
-                message_id=message_dict["message_id"],
-                drone_id=message_dict["drone_id"],
-                message_type=message_dict["message_type"],
-                payload=message_dict["payload"],
-                timestamp=datetime.fromisoformat(message_dict["timestamp"]),
-                priority=message_dict.get("priority", 1),
-                response_required=message_dict.get("response_required", False)
-            )
-            
-            # Add command-specific fields
-            if "command_type" in message_dict:
-                from .base_connection import CommandMessage
-                message = CommandMessage(
-                    message_id=message.message_id,
-                    drone_id=message.drone_id,
-                    message_type=message.message_type,
-                    payload=message.payload,
-                    timestamp=message.timestamp,
-                    priority=message.priority,
-                    response_required=message.response_required,
-                    command_type=message_dict["command_type"],
-                    parameters=message_dict.get("parameters", {}),
-                    execution_time=datetime.fromisoformat(message_dict["execution_time"]) if message_dict.get("execution_time") else None
-                )
-            
-            # Add telemetry-specific fields
-            if "position" in message_dict:
-                from .base_connection import TelemetryMessage
-                message = TelemetryMessage(
-                    message_id=message.message_id,
-                    drone_id=message.drone_id,
-                    message_type=message.message_type,
-                    payload=message.payload,
-                    timestamp=message.timestamp,
-                    priority=message.priority,
-                    response_required=message.response_required,
-                    position=message_dict["position"],
-                    battery_level=message_dict["battery_level"],
-                    speed=message_dict["speed"],
-                    heading=message_dict["heading"],
-                    signal_strength=message_dict["signal_strength"],
-                    gps_accuracy=message_dict["gps_accuracy"],
-                    temperature=message_dict.get("temperature"),
-                    humidity=message_dict.get("humidity"),
-                    wind_speed=message_dict.get("wind_speed")
-                )
-            
-            return message
-            
-        except Exception as e:
-            logger.error(f"Error deserializing message: {e}")
-            return None
+        return self.codec.decode(data)
     
     def get_connection_info(self) -> Dict:
         """Get WiFi connection information"""
@@ -390,5 +402,6 @@ class WiFiConnection(BaseConnection):
             "host": self.config.host,
             "port": self.config.port,
             "encryption_enabled": bool(self.config.encryption_key),
-            "compression_enabled": self.config.compression
+            "compression_enabled": self.config.compression,
+            "wire": self.codec.get_stats()
         }
@@ -0,0 +1,445 @@
+"""
+Wire Codec for Drone Communication
+Compact binary framing for telemetry and commands, shared by the WiFi, LoRa
+and WebSocket connections, with the legacy JSON formats as a fallback.
+
+Binary frames (all little-endian) start with a version byte:
+
+    header    B version | B kind | B flags | q timestamp (µs since epoch)
+    ids       B len + drone_id utf-8 | B len + message_id utf-8
+    [type]    B len + message_type        (flags & FLAG_TYPE)
+    body      depends on kind, see the _encode_* methods
+    [payload] H len + JSON                (flags & FLAG_PAYLOAD)
+
+JSON frames always start with "{", so a decoder accepts both formats
+without negotiation; the handshake only decides what we send.
+"""
+import json
+import logging
+import math
+import struct
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+from .base_connection import CommandMessage, DroneMessage, TelemetryMessage
+
+logger = logging.getLogger(__name__)
+
+WIRE_VERSION = 1
+BINARY_CODEC = "sarbin/1"
+JSON_CODEC = "json"
+
+# Frame kinds
+KIND_MESSAGE = 1
+KIND_TELEMETRY = 2
+KIND_TELEMETRY_DELTA = 3
+KIND_COMMAND = 4
+
+# Flag bits
+PRIORITY_MASK = 0x03
+FLAG_RESPONSE = 0x04
+FLAG_PAYLOAD = 0x08
+FLAG_TYPE = 0x10
+
+_HEADER = struct.Struct("<BBBq")
+_BYTE = struct.Struct("<B")
+_SHORT = struct.Struct("<H")
+_TIME = struct.Struct("<q")
+_DELTA = struct.Struct("<BBH")  # seq, base seq, changed-field mask
+_NO_TIME = -(2 ** 63)
+_EPOCH = datetime(1970, 1, 1)
+_JSON_START = ord("{")
+
+# Telemetry fields in wire order; lat/lon are float64, the rest float32.
+# None travels as NaN.
+TELEMETRY_FIELDS = (
+    "lat", "lon", "alt", "battery_level", "speed", "heading", "signal_strength",
+    "gps_accuracy", "temperature", "humidity", "wind_speed",
+)
+_TELEMETRY_CODES = "dd" + "f" * (len(TELEMETRY_FIELDS) - 2)
+_TELEMETRY = struct.Struct("<B" + _TELEMETRY_CODES)  # seq + all fields
+_POSITION_KEYS = frozenset(("lat", "lon", "alt"))
+
+# Well-known command types travel as one byte; 0 means an inline string.
+# Append only: the index is the wire id.
+COMMAND_TYPES = (
+    "takeoff", "land", "hover", "goto", "return_to_home", "emergency_return",
+    "emergency_land", "start_mission", "pause", "resume", "abort_mission",
+    "navigate_to_area", "adjust_altitude", "adjust_position", "update_search_area",
+    "add_search_area", "take_over_area", "investigate_discovery",
+    "search_for_lost_drone", "enable_obstacle_avoidance",
+)
+_COMMAND_IDS = {name: index + 1 for index, name in enumerate(COMMAND_TYPES)}
+
+
+class WireFormatError(ValueError):
+    """A message cannot be represented in the binary layout"""
+
+
+@dataclass(frozen=True)
+class JsonDialect:
+    """Key names and timestamp style of a legacy JSON format"""
+    keys: Dict[str, str] = field(default_factory=dict)  # field name -> wire key
+    epoch_seconds: bool = False  # integer seconds instead of ISO strings
+    include: Optional[FrozenSet[str]] = None  # fields to send (None: all)
+
+
+# What WiFi and WebSocket peers sent before the binary codec
+LEGACY_JSON = JsonDialect()
+# Shortened keys used on LoRa links
+LORA_JSON = JsonDialect(
+    keys={
+        "message_id": "id", "drone_id": "drone", "message_type": "type",
+        "payload": "data", "timestamp": "time", "priority": "pri",
+        "command_type": "cmd", "parameters": "params", "position": "pos",
+        "battery_level": "bat", "speed": "spd", "heading": "hdg",
+    },
+    epoch_seconds=True,
+    include=frozenset((
+        "message_id", "drone_id", "message_type", "payload", "timestamp", "priority",
+        "command_type", "parameters", "position", "battery_level", "speed", "heading",
+    )),
+)
+
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+_TIME_FIELDS = ("timestamp", "execution_time")
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+
+def _to_micros(value: Optional[datetime]) -> int:
+    if value is None:
+        return _NO_TIME
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> Optional[datetime]:
+    return None if value == _NO_TIME else _EPOCH + timedelta(microseconds=value)
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode()
+    if len(data) > 255:
+        raise WireFormatError(f"string too long for binary frame: {len(data)} bytes")
+    return _BYTE.pack(len(data)) + data
+
+
+def _pack_json(value: Any) -> bytes:
+    data = json.dumps(value, separators=(",", ":")).encode()
+    if len(data) > 0xFFFF:
+        raise WireFormatError(f"JSON blob too large for binary frame: {len(data)} bytes")
+    return _SHORT.pack(len(data)) + data
+
+
+class WireCodec:
+    """Encodes DroneMessages for one connection and decodes what it receives.
+
+    wire_format "auto" sends JSON until the peer accepts BINARY_CODEC in the
+    handshake or sends a binary frame itself; "binary" and "json" force one.
+    With delta=True telemetry frames only carry the fields that changed
+    since the previous frame for that drone, with a full keyframe every
+    keyframe_interval frames. Deltas whose base frame the receiver has not
+    seen (lost datagram) are dropped and counted.
+    """
+
+    def __init__(self, wire_format: str = "auto", dialect: JsonDialect = LEGACY_JSON,
+                 delta: bool = False, keyframe_interval: int = 20):
+        if wire_format not in ("auto", "binary", "json"):
+            raise ValueError(f"Unknown wire format: {wire_format}")
+        self.wire_format = wire_format
+        self.dialect = dialect
+        self.delta = delta
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.binary = wire_format == "binary"
+        self._tx_state: Dict[str, list] = {}  # drone_id -> [seq, values, frames since keyframe]
+        self._rx_state: Dict[str, list] = {}  # drone_id -> [seq, values]
+        self._delta_structs: Dict[int, struct.Struct] = {}
+        self._reverse_keys = {wire: name for name, wire in dialect.keys.items()}
+        self.stats = {
+            "frames_encoded": 0, "bytes_encoded": 0, "frames_decoded": 0, "bytes_decoded": 0,
+            "keyframes": 0, "delta_frames": 0, "json_frames": 0, "dropped_deltas": 0,
+            "decode_errors": 0,
+        }
+
+    # Negotiation
+
+    def offer(self) -> List[str]:
+        """Codec names to advertise in a handshake, preferred first"""
+        if self.wire_format == "json":
+            return [JSON_CODEC]
+        if self.wire_format == "binary":
+            return [BINARY_CODEC]
+        return [BINARY_CODEC, JSON_CODEC]
+
+    def accept(self, codec: Optional[str]):
+        """Apply the codec the peer chose in its handshake response"""
+        if self.wire_format == "auto":
+            self.binary = codec == BINARY_CODEC
+
+    def reset(self):
+        """Forget delta state, e.g. after a reconnect"""
+        self._tx_state.clear()
+        self._rx_state.clear()
+
+    # Encoding
+
+    def encode(self, message: DroneMessage) -> bytes:
+        data = None
+        if self.binary:
+            try:
+                data = self._encode_binary(message)
+            except WireFormatError as e:
+                logger.debug(f"Falling back to JSON for {message.message_id}: {e}")
+        if data is None:
+            data = self.encode_json(message)
+            self.stats["json_frames"] += 1
+        self.stats["frames_encoded"] += 1
+        self.stats["bytes_encoded"] += len(data)
+        return data
+
+    def _encode_binary(self, message) -> bytes:
+        if isinstance(message, TelemetryMessage):
+            return self._encode_telemetry(message)
+        if isinstance(message, CommandMessage):
+            return self._encode_command(message)
+        return self._encode_message(message)
+
+    def _prefix(self, kind: int, message, default_type: Optional[str], has_payload: bool) -> bytes:
+        priority = message.priority
+        if not 0 <= priority <= PRIORITY_MASK:
+            raise WireFormatError(f"priority {priority} out of range")
+        flags = priority
+        if message.response_required:
+            flags |= FLAG_RESPONSE
+        if has_payload:
+            flags |= FLAG_PAYLOAD
+        custom_type = message.message_type != default_type
+        if custom_type:
+            flags |= FLAG_TYPE
+        prefix = (_HEADER.pack(WIRE_VERSION, kind, flags, _to_micros(message.timestamp))
+                  + _pack_str(message.drone_id) + _pack_str(message.message_id))
+        return prefix + _pack_str(message.message_type) if custom_type else prefix
+
+    def _encode_message(self, message: DroneMessage) -> bytes:
+        """Generic message: the payload is the body"""
+        return self._prefix(KIND_MESSAGE, message, None, True) + _pack_json(message.payload)
+
+    def _encode_command(self, message: CommandMessage) -> bytes:
+        """Command: B command id [+ inline name] | q execution time | H len + parameters JSON"""
+        has_payload = message.payload is not None
+        command_id = _COMMAND_IDS.get(message.command_type, 0)
+        body = _BYTE.pack(command_id)
+        if not command_id:
+            body += _pack_str(message.command_type)
+        body += _TIME.pack(_to_micros(message.execution_time)) + _pack_json(message.parameters)
+        frame = self._prefix(KIND_COMMAND, message, "command", has_payload) + body
+        return frame + _pack_json(message.payload) if has_payload else frame
+
+    def _encode_telemetry(self, message: TelemetryMessage) -> bytes:
+        """Telemetry keyframe: B seq | TELEMETRY_FIELDS.
+        Delta: B seq | B base seq | H mask | changed fields only."""
+        position = message.position or {}
+        if position.keys() - _POSITION_KEYS:
+            raise WireFormatError("position has keys besides lat/lon/alt")
+        values = (
+            position.get("lat"), position.get("lon"), position.get("alt"),
+            message.battery_level, message.speed, message.heading, message.signal_strength,
+            message.gps_accuracy, message.temperature, message.humidity, message.wind_speed,
+        )
+        has_payload = message.payload is not None
+        state = self._tx_state.get(message.drone_id)
+        delta = self.delta and state is not None and state[2] < self.keyframe_interval
+        if delta:
+            base_seq, previous = state[0], state[1]
+            mask = 0
+            changed = []
+            for index, value in enumerate(values):
+                if value != previous[index]:
+                    mask |= 1 << index
+                    changed.append(math.nan if value is None else value)
+            seq = (base_seq + 1) & 0xFF
+            body = _DELTA.pack(seq, base_seq, mask) + self._delta_struct(mask).pack(*changed)
+            kind = KIND_TELEMETRY_DELTA
+        else:
+            seq = 0 if state is None else (state[0] + 1) & 0xFF
+            body = _TELEMETRY.pack(seq, *(math.nan if value is None else value for value in values))
+            kind = KIND_TELEMETRY
+        frame = self._prefix(kind, message, "telemetry", has_payload) + body
+        if has_payload:
+            frame += _pack_json(message.payload)
+
+        # Advance the sequence only once the binary frame is complete; a frame that
+        # falls back to JSON must not leave the receiver missing a base sequence
+        if delta:
+            state[0], state[1] = seq, values
+            state[2] += 1
+            self.stats["delta_frames"] += 1
+        else:
+            self._tx_state[message.drone_id] = [seq, values, 1]
+            self.stats["keyframes"] += 1
+        return frame
+
+    def _delta_struct(self, mask: int) -> struct.Struct:
+        packer = self._delta_structs.get(mask)
+        if packer is None:
+            codes = "".join(code for index, code in enumerate(_TELEMETRY_CODES) if mask & (1 << index))
+            packer = self._delta_structs[mask] = struct.Struct("<" + codes)
+        return packer
+
+    def encode_json(self, message: DroneMessage) -> bytes:
+        """Legacy JSON encoding in this codec's dialect"""
+        keys, include = self.dialect.keys, self.dialect.include
+        message_dict = {}
+        for name in _field_names(type(message)):
+            if include is not None and name not in include:
+                continue
+            value = getattr(message, name)
+            if name in _TIME_FIELDS and value is not None:
+                value = int(value.timestamp()) if self.dialect.epoch_seconds else value.isoformat()
+            message_dict[keys.get(name, name)] = value
+        return json.dumps(message_dict, separators=(",", ":")).encode()
+
+    # Decoding
+
+    def decode(self, data: Union[bytes, bytearray, memoryview, str]) -> Optional[DroneMessage]:
+        """Decode one frame, binary or JSON. Returns None for bad or unusable frames."""
+        try:
+            if not data:
+                return None
+            self.stats["bytes_decoded"] += len(data)
+            if isinstance(data, str):
+                message = self._decode_json(data)
+            else:
+                view = memoryview(data)
+                first = view[0]
+                if first == WIRE_VERSION:
+                    if self.wire_format == "auto":
+                        self.binary = True  # the peer speaks it, so answer in kind
+                    message = self._decode_binary(view)
+                elif first == _JSON_START:
+                    message = self._decode_json(bytes(view))
+                else:
+                    raise WireFormatError(f"unknown frame version {first}")
+            if message is not None:
+                self.stats["frames_decoded"] += 1
+            return message
+        except Exception as e:
+            self.stats["decode_errors"] += 1
+            logger.error(f"Error deserializing message: {e}")
+            return None
+
+    def _decode_binary(self, view: memoryview) -> Optional[DroneMessage]:
+        _, kind, flags, micros = _HEADER.unpack_from(view, 0)
+        offset = _HEADER.size
+        drone_id, offset = self._read_str(view, offset)
+        message_id, offset = self._read_str(view, offset)
+        message_type = None
+        if flags & FLAG_TYPE:
+            message_type, offset = self._read_str(view, offset)
+        common = dict(
+            message_id=message_id,
+            drone_id=drone_id,
+            timestamp=_from_micros(micros),
+            priority=flags & PRIORITY_MASK,
+            response_required=bool(flags & FLAG_RESPONSE),
+        )
+
+        if kind == KIND_MESSAGE:
+            payload, offset = self._read_json(view, offset)
+            return DroneMessage(message_type=message_type, payload=payload, **common)
+
+        if kind == KIND_COMMAND:
+            command_id = view[offset]
+            offset += 1
+            if command_id:
+                command_type = COMMAND_TYPES[command_id - 1]
+            else:
+                command_type, offset = self._read_str(view, offset)
+            (execution_micros,) = _TIME.unpack_from(view, offset)
+            parameters, offset = self._read_json(view, offset + _TIME.size)
+            payload = self._read_json(view, offset)[0] if flags & FLAG_PAYLOAD else None
+            return CommandMessage(
+                message_type=message_type or "command", payload=payload, command_type=command_type,
+                parameters=parameters, execution_time=_from_micros(execution_micros), **common,
+            )
+
+        if kind == KIND_TELEMETRY:
+            seq, *values = _TELEMETRY.unpack_from(view, offset)
+            offset += _TELEMETRY.size
+        elif kind == KIND_TELEMETRY_DELTA:
+            seq, base_seq, mask = _DELTA.unpack_from(view, offset)
+            offset += _DELTA.size
+            state = self._rx_state.get(drone_id)
+            if state is None or state[0] != base_seq:
+                self.stats["dropped_deltas"] += 1
+                return None
+            values = list(state[1])
+            packer = self._delta_struct(mask)
+            changed = iter(packer.unpack_from(view, offset))
+            offset += packer.size
+            for index in range(len(TELEMETRY_FIELDS)):
+                if mask & (1 << index):
+                    values[index] = next(changed)
+        else:
+            raise WireFormatError(f"unknown frame kind {kind}")
+
+        self._rx_state[drone_id] = [seq, values]
+        payload = self._read_json(view, offset)[0] if flags & FLAG_PAYLOAD else None
+        lat, lon, alt, battery, speed, heading, signal, gps, temperature, humidity, wind = (
+            None if value != value else value for value in values
+        )
+        position = {key: value for key, value in (("lat", lat), ("lon", lon), ("alt", alt)) if value is not None}
+        return TelemetryMessage(
+            message_type=message_type or "telemetry", payload=payload,
+            position=position or None, battery_level=battery, speed=speed, heading=heading,
+            signal_strength=signal, gps_accuracy=gps, temperature=temperature,
+            humidity=humidity, wind_speed=wind, **common,
+        )
+
+    @staticmethod
+    def _read_str(view: memoryview, offset: int) -> Tuple[str, int]:
+        length = view[offset]
+        end = offset + 1 + length
+        return str(view[offset + 1:end], "utf-8"), end
+
+    @staticmethod
+    def _read_json(view: memoryview, offset: int) -> Tuple[Any, int]:
+        (length,) = _SHORT.unpack_from(view, offset)
+        start = offset + _SHORT.size
+        return json.loads(bytes(view[start:start + length])), start + length
+
+    def _decode_json(self, data: Union[bytes, str]) -> DroneMessage:
+        raw = json.loads(data)
+        reverse = self._reverse_keys
+        message_dict = {reverse.get(key, key): value for key, value in raw.items()}
+        for name in _TIME_FIELDS:
+            value = message_dict.get(name)
+            if isinstance(value, str):
+                message_dict[name] = datetime.fromisoformat(value)
+            elif isinstance(value, (int, float)):
+                message_dict[name] = datetime.fromtimestamp(value)
+
+        if "command_type" in message_dict:
+            cls = CommandMessage
+        elif "position" in message_dict:
+            cls = TelemetryMessage
+        else:
+            cls = DroneMessage
+        known = _field_names(cls)
+        message_dict.setdefault("priority", 1)
+        return cls(**{name: value for name, value in message_dict.items() if name in known})
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "format": BINARY_CODEC if self.binary else JSON_CODEC,
+            "delta": self.delta,
+            **self.stats,
+        }
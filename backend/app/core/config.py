@@ -33,6 +33,50 @@ class Settings(BaseSettings):
     DEFAULT_MODEL: str = "llama3.2:3b"
     AI_ENABLED: bool = False
     
+    # Startup: endpoint modules never imported, and heavy subsystems warmed in
+    # the background once the server is up (names from core/lazy.py)
+    DISABLED_ROUTERS: List[str] = []
+    WARM_SUBSYSTEMS: List[str] = []
+    
+    # RAG retrieval: "qdrant" or "local" (in-process vector index)
+    RAG_VECTOR_BACKEND: str = "qdrant"
+    RAG_EMBEDDING_CACHE_SIZE: int = 10000
+    
+    # Knowledge graph snapshot loaded at startup (no Neo4j needed when present)
+    KNOWLEDGE_GRAPH_SNAPSHOT_PATH: Optional[str] = None
+    
+    # Tiled DEM store (see services/dem_tile_store.py) for terrain-following altitudes
+    DEM_STORE_PATH: Optional[str] = None
+    
+    # Airspace compliance (see services/airspace.py)
+    GEOFENCE_GEOJSON_PATH: Optional[str] = None
+    COMPLIANCE_HISTORY_SIZE: int = 100000
+    
+    # Weather field: provider credentials and the cached grid (see services/weather_service.py)
+    OPENWEATHER_API_KEY: Optional[str] = None
+    OPENWEATHER_BASE_URL: str = "http://api.openweathermap.org/data/2.5"
+    WEATHER_GRID_DEG: float = 0.05
+    WEATHER_TILE_TTL_SECONDS: int = 300
+    WEATHER_CACHE_MAX_TILES: int = 4096
+    
+    # Versioned model artifacts (see ai/model_registry.py)
+    MODEL_REGISTRY_PATH: str = "./model_registry"
+    MODEL_VERSION_CHECK_INTERVAL: float = 5.0  # seconds between reads of a model's CURRENT file
+    
+    # Micro-batched inference (see ai/batch_inference.py)
+    INFERENCE_MAX_BATCH_SIZE: int = 256
+    INFERENCE_MAX_WAIT_MS: float = 5.0
+    INFERENCE_PROCESS_WORKERS: int = 0
+    
+    # Drone command dispatch (see services/command_dispatcher.py)
+    COMMAND_DISPATCH_CONCURRENCY: int = 64
+    COMMAND_RATE_LIMIT: float = 200.0  # commands/sec across the fleet
+    COMMAND_ACK_TIMEOUT: float = 0.0  # seconds; 0 = a successful send is the ack
+    COMMAND_MAX_RETRIES: int = 3
+    COMMAND_RETRY_BACKOFF: float = 0.5  # seconds before the first retry; doubles per attempt
+    COMMAND_RETRY_BACKOFF_MAX: float = 5.0
+    COMMAND_DEFAULT_TTL: float = 30.0  # seconds before an unsent command expires
+    
     # OpenAI (fallback)
     OPENAI_API_KEY: Optional[str] = None
     
@@ -52,6 +96,43 @@ class Settings(BaseSettings):
     DEFAULT_SEARCH_ALTITUDE: int = 50
     DISCOVERY_INVESTIGATION_RADIUS: float = 25.0
     
+    # Coverage tracking (see services/coverage_grid.py)
+    COVERAGE_RESOLUTION_M: float = 1.0
+    COVERAGE_CAMERA_FOV: float = 60.0
+    
+    # Fleet routing (see services/fleet_routing.py)
+    PLANNER_ROUTING_TIME_BUDGET_S: float = 1.0
+    PLANNER_WAYPOINT_DWELL_S: float = 2.0  # imaging time per waypoint with a 1920 px wide camera
+    PLANNER_BATTERY_SWAP_S: float = 300.0
+    PLANNER_REPLAN_TIME_BUDGET_S: float = 0.05  # incremental repairs after a drone or area change
+    PLANNER_PRIORITY_SPACING_M: float = 100.0
+    
+    # Event bus (see core/event_bus.py)
+    EVENT_BUS_REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/0 to share events across processes
+    MISSION_MONITOR_INTERVAL: float = 1.0  # seconds between coverage flushes in the search loop
+    
+    # Learning features (see services/feature_store.py)
+    LEARNING_FEATURE_STORE_PATH: str = "./feature_store"
+    LEARNING_COLLECT_BATCH: int = 1000  # missions per eager-loaded page
+    
+    # Evidence storage (see services/evidence_store.py)
+    EVIDENCE_STORE_PATH: str = "./evidence"
+    EVIDENCE_CHUNK_SIZE: int = 1 << 20  # bytes buffered per upload between disk writes
+    EVIDENCE_MAX_UPLOAD_BYTES: int = 20 << 30
+    EVIDENCE_THUMBNAIL_WORKERS: int = 2  # 0 = make thumbnails in a thread
+    EVIDENCE_THUMBNAIL_SIZE: int = 320
+    EVIDENCE_UPLOAD_TTL_S: float = 24 * 3600  # unfinished uploads nobody resumes for this long are removed
+    EVIDENCE_EXPIRY_INTERVAL_S: float = 3600
+    
+    # Mission export (see services/mission_export.py)
+    EXPORT_CHUNK_ROWS: int = 50000  # telemetry rows read, simplified and encoded at a time
+    
+    # Dashboard map tiles (see services/map_tiles.py)
+    MAP_TILE_MIN_ZOOM: int = 10
+    MAP_TILE_MAX_ZOOM: int = 18
+    MAP_TILE_CACHE_SIZE: int = 4096  # rendered tiles kept across missions
+    MAP_TILE_MAX_MISSIONS: int = 8  # missions with tiles in memory
+    
     # Emergency Settings
     LOW_BATTERY_THRESHOLD: float = 20.0
     CRITICAL_BATTERY_THRESHOLD: float = 15.0
@@ -5,6 +5,7 @@ import logging
 from datetime import datetime
 from typing import AsyncGenerator
 from app.core.config import settings
+from app.core.query import ensure_geocells
 
 logger = logging.getLogger(__name__)
 
@@ -70,9 +71,10 @@ def get_sync_db():
 async def init_db():
     """Initialize database with proper error handling"""
     try:
-        # Create all tables
+        # Create all tables, adding geocells to ones from before they existed
         async with async_engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(ensure_geocells)
         
         logger.info("Database initialized successfully")
         
@@ -0,0 +1,181 @@
+"""
+In-process event bus for SAR Mission Commander
+Publish/subscribe for discovery, telemetry, drone-status and mission-state
+events, with an optional Redis bridge so several processes share events
+"""
+import asyncio
+import inspect
+import json
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, is_dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Topics
+DISCOVERY_CREATED = "discovery.created"
+TELEMETRY = "drone.telemetry"
+DRONE_STATUS = "drone.status"
+MISSION_STATE = "mission.state"
+
+ALL_TOPICS = "*"
+
+@dataclass
+class Event:
+    topic: str
+    data: Any
+    mission_id: Optional[str] = None
+    drone_id: Optional[str] = None
+    source: Optional[str] = None  # publishing component; handlers may ignore their own events
+    timestamp: float = field(default_factory=time.time)
+    event_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    origin: Optional[str] = None  # bus instance that published it; set for events from Redis
+
+    def to_json(self) -> str:
+        data = asdict(self.data) if is_dataclass(self.data) else self.data
+        return json.dumps({**asdict(self), "data": data}, default=str)
+
+    @classmethod
+    def from_json(cls, raw) -> "Event":
+        return cls(**json.loads(raw))
+
+Handler = Callable[[Event], Any]
+
+class EventBus:
+    """Delivers events to subscribers as soon as they are published.
+
+    publish() is synchronous so it can be called from any code on the event
+    loop thread. Plain-function handlers run inline; coroutine handlers are
+    scheduled as tasks. A failing handler is logged and does not affect the
+    others.
+
+    With ``redis_url`` set, events on ``redis_topics`` are also published to
+    Redis channels ``<prefix><topic>`` and events from other processes are
+    delivered locally. Events forwarded this way must carry JSON data.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None,
+                 redis_topics: Sequence[str] = (DISCOVERY_CREATED, DRONE_STATUS, MISSION_STATE),
+                 channel_prefix: str = "sar:events:"):
+        self.instance_id = uuid.uuid4().hex
+        self.redis_url = redis_url
+        self.redis_topics = set(redis_topics)
+        self.channel_prefix = channel_prefix
+        self.subscribers: Dict[str, List[Handler]] = {}
+        self.stats = {"published": 0, "delivered": 0, "handler_errors": 0, "forwarded": 0, "received_remote": 0}
+        self._tasks: set = set()
+        self._outbox: Optional[asyncio.Queue] = None
+        self._redis = None
+        self._bridge_tasks: List[asyncio.Task] = []
+
+    def subscribe(self, topic: str, handler: Handler) -> Callable[[], None]:
+        """Call handler(event) for every event on topic ("*" for all); returns an unsubscribe function"""
+        handlers = self.subscribers.setdefault(topic, [])
+        if handler not in handlers:
+            handlers.append(handler)
+        return lambda: self.unsubscribe(topic, handler)
+
+    def unsubscribe(self, topic: str, handler: Handler):
+        handlers = self.subscribers.get(topic, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, topic: str, data: Any = None, mission_id: Any = None, drone_id: Any = None,
+                source: Optional[str] = None) -> Event:
+        """Deliver an event to local subscribers and, if bridged, to other processes"""
+        event = Event(
+            topic=topic, data=data,
+            mission_id=str(mission_id) if mission_id is not None else None,
+            drone_id=str(drone_id) if drone_id is not None else None,
+            source=source,
+        )
+        self.stats["published"] += 1
+        self._deliver(event)
+        if self._outbox is not None and topic in self.redis_topics:
+            self._outbox.put_nowait(event)
+        return event
+
+    def _deliver(self, event: Event):
+        for handler in self.subscribers.get(event.topic, []) + self.subscribers.get(ALL_TOPICS, []):
+            try:
+                if inspect.iscoroutinefunction(handler):
+                    task = asyncio.get_running_loop().create_task(self._run_async(handler, event))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                else:
+                    handler(event)
+                self.stats["delivered"] += 1
+            except Exception as e:
+                self.stats["handler_errors"] += 1
+                logger.error(f"Event handler for {event.topic} failed: {e}")
+
+    async def _run_async(self, handler: Handler, event: Event):
+        try:
+            await handler(event)
+        except Exception as e:
+            self.stats["handler_errors"] += 1
+            logger.error(f"Event handler for {event.topic} failed: {e}")
+
+    async def start(self) -> bool:
+        """Connect the Redis bridge when configured; the in-process bus needs no start"""
+        if not self.redis_url or self._redis is not None:
+            return True
+        try:
+            import redis.asyncio as redis  # type: ignore
+            self._redis = redis.Redis.from_url(self.redis_url)
+            pubsub = self._redis.pubsub()
+            await pubsub.psubscribe(f"{self.channel_prefix}*")
+        except Exception as e:
+            logger.error(f"Event bus Redis bridge unavailable, staying in-process: {e}")
+            self._redis = None
+            return False
+        self._outbox = asyncio.Queue()
+        self._bridge_tasks = [
+            asyncio.create_task(self._forward()),
+            asyncio.create_task(self._receive(pubsub)),
+        ]
+        logger.info(f"Event bus bridged to Redis at {self.redis_url}")
+        return True
+
+    async def stop(self):
+        for task in self._bridge_tasks + list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._bridge_tasks, *self._tasks, return_exceptions=True)
+        self._bridge_tasks = []
+        self._outbox = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def _forward(self):
+        while True:
+            event = await self._outbox.get()
+            try:
+                event.origin = self.instance_id
+                await self._redis.publish(self.channel_prefix + event.topic, event.to_json())
+                self.stats["forwarded"] += 1
+            except Exception as e:
+                logger.error(f"Failed to forward {event.topic} event to Redis: {e}")
+
+    async def _receive(self, pubsub):
+        async for message in pubsub.listen():
+            if message.get("type") != "pmessage":
+                continue
+            try:
+                event = Event.from_json(message["data"])
+            except Exception as e:
+                logger.error(f"Dropping malformed event from Redis: {e}")
+                continue
+            if event.origin == self.instance_id:
+                continue
+            self.stats["received_remote"] += 1
+            self._deliver(event)
+
+def _create_event_bus() -> EventBus:
+    from .config import settings
+    return EventBus(redis_url=settings.EVENT_BUS_REDIS_URL)
+
+# Global event bus instance
+event_bus = _create_event_bus()
@@ -0,0 +1,105 @@
+"""
+Lazy accessors for heavy subsystems (torch, sentence-transformers, Kafka,
+Neo4j, scikit-learn...). Nothing is imported until first use or an explicit
+background warm-up after startup.
+"""
+
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyObject:
+    """Resolves "package.module:attribute" on first use and then behaves like it.
+
+    With call=True the attribute is called (e.g. a class) to build the object.
+    Attribute access is forwarded, so a module-level LazyObject can stand in
+    for an eagerly constructed singleton.
+    """
+
+    def __init__(self, target: str, call: bool = False, factory: Optional[Callable[[], Any]] = None):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_call", call)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_value", None)
+        object.__setattr__(self, "_loaded", False)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "load_seconds", None)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self) -> Any:
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                started = time.perf_counter()
+                if self._factory is not None:
+                    value = self._factory()
+                else:
+                    module_name, _, attribute = self._target.partition(":")
+                    value = importlib.import_module(module_name)
+                    if attribute:
+                        value = getattr(value, attribute)
+                    if self._call:
+                        value = value()
+                object.__setattr__(self, "_value", value)
+                object.__setattr__(self, "load_seconds", time.perf_counter() - started)
+                object.__setattr__(self, "_loaded", True)
+                logger.info(f"Loaded {self._target} in {self.load_seconds * 1000:.0f} ms")
+        return self._value
+
+    async def warm(self) -> Any:
+        """Load in a worker thread so the event loop keeps serving"""
+        return await asyncio.to_thread(self.get)
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get(), name, value)
+
+    def __repr__(self):
+        state = "loaded" if self._loaded else "not loaded"
+        return f"<LazyObject {self._target} ({state})>"
+
+
+# Heavy subsystems that can be warmed in the background after startup
+HEAVY_SUBSYSTEMS: Dict[str, LazyObject] = {
+    "ml_models": LazyObject("app.ai.real_ml_models:real_ml_models"),
+    "rag": LazyObject("app.ai.rag_system:get_sar_rag", call=True),
+    "knowledge_graph": LazyObject("app.ai.knowledge_graph:knowledge_graph"),
+    "stream_processor": LazyObject("app.services.stream_processor:stream_processor"),
+    "computer_vision": LazyObject("app.ai.real_computer_vision:real_computer_vision_engine"),
+}
+
+
+async def warm_subsystems(names: Iterable[str]) -> Dict[str, Any]:
+    """Load the named subsystems one after another off the event loop; failures are logged"""
+    results = {}
+    for name in names:
+        subsystem = HEAVY_SUBSYSTEMS.get(name)
+        if subsystem is None:
+            logger.warning(f"Unknown subsystem to warm: {name}")
+            continue
+        try:
+            await subsystem.warm()
+            results[name] = subsystem.load_seconds
+        except Exception as e:
+            logger.warning(f"Could not warm subsystem {name}: {e}")
+            results[name] = None
+    return results
+
+
+def subsystem_status() -> Dict[str, Any]:
+    return {
+        name: {"loaded": subsystem.loaded, "load_seconds": subsystem.load_seconds}
+        for name, subsystem in HEAVY_SUBSYSTEMS.items()
+    }
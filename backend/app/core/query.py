@@ -0,0 +1,313 @@
+"""
+Query layer for list endpoints in SAR Mission Commander
+Keyset cursors, bounding-box and radius filters on an indexed geocell
+column, time ranges and sparse field selection
+
+Geocells are Morton (Z-order) codes of a 2^24 x 2^24 lat/lng grid, about a
+metre per cell. Rows close together get close codes, so a viewport becomes
+a few code ranges on an ordinary B-tree index, on SQLite and Postgres alike.
+"""
+import base64
+import json
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, event, func, inspect, or_, text
+
+logger = logging.getLogger(__name__)
+
+GEOCELL_BITS = 24
+MAX_COVER_CELLS = 8  # per axis, when covering a box with cell ranges
+M_PER_DEG = 111320.0
+BACKFILL_BATCH = 10000
+
+_MASKS = (
+    (16, 0x0000FFFF0000FFFF),
+    (8, 0x00FF00FF00FF00FF),
+    (4, 0x0F0F0F0F0F0F0F0F),
+    (2, 0x3333333333333333),
+    (1, 0x5555555555555555),
+)
+
+# table name -> (latitude column, longitude column) of models with a geocell
+GEOCELL_SOURCES: Dict[str, Tuple[str, str]] = {}
+
+# Indexes keyset pages sort by, as declared on the models: name -> (table, columns)
+KEYSET_INDEXES: Dict[str, Tuple[str, str]] = {
+    "ix_discoveries_time": ("discoveries", "discovered_at, id"),
+    "ix_discoveries_mission_time": ("discoveries", "mission_id, discovered_at, id"),
+    "ix_missions_created": ("missions", "created_at, id"),
+}
+
+
+class QueryError(ValueError):
+    """A malformed cursor, filter or field list in a request"""
+
+
+# ------------------------------------------------------------------ geocells
+
+def _spread(v):
+    """Interleave zeros between the bits of v (ints or uint64 arrays)"""
+    for shift, mask in _MASKS:
+        v = (v | (v << shift)) & mask
+    return v
+
+
+def _grid(lat, lng):
+    scale = (1 << GEOCELL_BITS) - 1
+    x = np.clip(np.floor((np.asarray(lng, dtype=np.float64) + 180.0) / 360.0 * scale), 0, scale)
+    y = np.clip(np.floor((np.asarray(lat, dtype=np.float64) + 90.0) / 180.0 * scale), 0, scale)
+    return x.astype(np.uint64), y.astype(np.uint64)
+
+
+def geocells(lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+    """Geocell codes for arrays of coordinates"""
+    x, y = _grid(lats, lngs)
+    return (_spread(x) | (_spread(y) << np.uint64(1))).astype(np.int64)
+
+
+def geocell(lat: Optional[float], lng: Optional[float]) -> Optional[int]:
+    if lat is None or lng is None:
+        return None
+    return int(geocells([lat], [lng])[0])
+
+
+def cell_ranges(south: float, west: float, north: float, east: float) -> List[Tuple[int, int]]:
+    """Inclusive geocell code ranges covering a box that does not cross the antimeridian
+
+    The box is covered with cells of the finest level at which it spans at
+    most MAX_COVER_CELLS per axis; each such cell is one contiguous range of
+    codes, and adjacent ranges are merged.
+    """
+    xs, ys = _grid([south, north], [west, east])
+    (x0, x1), (y0, y1) = xs.tolist(), ys.tolist()
+    shift = 0
+    while max((x1 >> shift) - (x0 >> shift), (y1 >> shift) - (y0 >> shift)) >= MAX_COVER_CELLS:
+        shift += 1
+    span = 1 << (2 * shift)
+    starts = sorted(
+        (int(_spread(cx)) | (int(_spread(cy)) << 1)) << (2 * shift)
+        for cx in range(x0 >> shift, (x1 >> shift) + 1)
+        for cy in range(y0 >> shift, (y1 >> shift) + 1)
+    )
+    ranges = []
+    for start in starts:
+        if ranges and ranges[-1][1] + 1 == start:
+            ranges[-1][1] = start + span - 1
+        else:
+            ranges.append([start, start + span - 1])
+    return [(lo, hi) for lo, hi in ranges]
+
+
+def cell_filter(cell_col, south: float, west: float, north: float, east: float):
+    """Rows whose geocell lies in the ranges covering a box (a superset of the box)"""
+    if south > north:
+        raise QueryError("bbox south is north of its north")
+    if west > east:
+        return or_(cell_filter(cell_col, south, west, north, 180.0), cell_filter(cell_col, south, -180.0, north, east))
+    return or_(*(cell_col.between(lo, hi) for lo, hi in cell_ranges(south, west, north, east)))
+
+
+def bbox_filter(lat_col, lng_col, cell_col, south: float, west: float, north: float, east: float):
+    """Rows inside a box; west > east means the box crosses the antimeridian"""
+    if west > east:
+        return or_(bbox_filter(lat_col, lng_col, cell_col, south, west, north, 180.0),
+                   bbox_filter(lat_col, lng_col, cell_col, south, -180.0, north, east))
+    cells = cell_filter(cell_col, south, west, north, east)
+    return and_(cells, lat_col.between(south, north), lng_col.between(west, east))
+
+
+def radius_box(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of the box around a radius; west > east across the antimeridian"""
+    if radius_m <= 0:
+        raise QueryError("radius must be positive")
+    dlat = radius_m / M_PER_DEG
+    dlng = min(dlat / max(math.cos(math.radians(lat)), 1e-6), 180.0)
+    west, east = lng - dlng, lng + dlng
+    if west < -180.0:
+        west += 360.0
+    if east > 180.0:
+        east -= 360.0
+    return max(lat - dlat, -90.0), west, min(lat + dlat, 90.0), east
+
+
+def radius_filter(lat_col, lng_col, cell_col, lat: float, lng: float, radius_m: float):
+    """Rows within radius_m of a point (equirectangular distance, fine below ~100 km)"""
+    box = bbox_filter(lat_col, lng_col, cell_col, *radius_box(lat, lng, radius_m))
+    lng_scale = max(math.cos(math.radians(lat)), 1e-6)
+    dy = (lat_col - lat) * M_PER_DEG
+    dx = (lng_col - lng) * (M_PER_DEG * lng_scale)
+    return and_(box, dy * dy + dx * dx <= radius_m * radius_m)
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """"west,south,east,north" as in GeoJSON, returned as (south, west, north, east)"""
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise QueryError("bbox must be west,south,east,north")
+    return south, west, north, east
+
+
+def register_geocell(model, lat_attr: str, lng_attr: str):
+    """Keep model.geocell in step with its coordinates on every ORM insert and update"""
+    GEOCELL_SOURCES[model.__tablename__] = (lat_attr, lng_attr)
+
+    def _set_geocell(mapper, connection, target):
+        target.geocell = geocell(getattr(target, lat_attr), getattr(target, lng_attr))
+
+    event.listen(model, "before_insert", _set_geocell)
+    event.listen(model, "before_update", _set_geocell)
+
+
+def ensure_geocells(connection):
+    """Add and backfill geocell columns, and the keyset indexes, in databases created before they existed
+
+    create_all skips tables that already exist, so their new indexes are created here.
+    """
+    inspector = inspect(connection)
+    for name, (table, columns) in KEYSET_INDEXES.items():
+        if inspector.has_table(table):
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+    for table, (lat_attr, lng_attr) in GEOCELL_SOURCES.items():
+        if not inspector.has_table(table):
+            continue
+        if "geocell" not in {column["name"] for column in inspector.get_columns(table)}:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN geocell BIGINT"))
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_geocell ON {table} (geocell)"))
+            logger.info(f"Added geocell column to {table}")
+        filled = 0
+        while True:
+            rows = connection.execute(text(
+                f"SELECT id, {lat_attr}, {lng_attr} FROM {table} "
+                f"WHERE geocell IS NULL AND {lat_attr} IS NOT NULL AND {lng_attr} IS NOT NULL LIMIT {BACKFILL_BATCH}"
+            )).fetchall()
+            if not rows:
+                break
+            ids, lats, lngs = zip(*rows)
+            cells = geocells(lats, lngs).tolist()
+            connection.execute(text(f"UPDATE {table} SET geocell = :cell WHERE id = :id"),
+                               [{"cell": cell, "id": row_id} for cell, row_id in zip(cells, ids)])
+            filled += len(rows)
+        if filled:
+            logger.info(f"Backfilled {filled} geocells in {table}")
+
+
+# ------------------------------------------------------------------- keysets
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise QueryError("Invalid cursor")
+
+
+def unindexed(column):
+    """The column as an expression no index serves
+
+    Spatial queries filter and sort by time through this, so the planner
+    starts from the geocell ranges (a few thousand rows) instead of walking
+    the time index until a page of rows in the box turns up.
+    """
+    return func.coalesce(column, column)
+
+
+def spatial_time_key(db, cells, time_col, id_col, limit: int):
+    """The time key for paging a query filtered by cell_filter ``cells``: time_col or unindexed(time_col)
+
+    Walking the time index finds a page after about limit * N / C rows when C
+    of the table's N rows lie in the cell ranges; starting from the ranges
+    reads all C rows and sorts them. The ranges win while C < sqrt(limit * N),
+    so C is counted, on the geocell index alone, only up to that bound, and
+    ranges covering more of the table are paged by the time index. N is
+    taken from the largest id.
+    """
+    total = db.query(func.max(id_col)).scalar() or 0
+    bound = math.isqrt(limit * total)
+    probe = db.query(id_col).filter(cells).limit(bound + 1).subquery()
+    matched = db.query(func.count()).select_from(probe).scalar()
+    return time_col if matched > bound else unindexed(time_col)
+
+
+def keyset_page(query, time_col, id_col, cursor: Optional[str], limit: int,
+                offset: int = 0, time_key=None) -> Tuple[list, Optional[str]]:
+    """One page, newest first, and the cursor for the next page (None on the last)
+
+    The cursor is the (time, id) of the last row returned, so each page is a
+    range scan of a (time, id) index wherever it starts. ``offset`` is for
+    clients still paging by position; it scans every row it skips.
+    ``time_key`` replaces time_col in the filter and sort, e.g. unindexed().
+    Rows without a time have no place in the order and are left out.
+    """
+    key = time_col if time_key is None else time_key
+    query = query.filter(key.isnot(None))
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.filter(key <= timestamp, or_(key < timestamp, id_col < row_id))
+    rows = query.order_by(key.desc(), id_col.desc()).offset(offset or None).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(getattr(rows[-1], time_col.key), getattr(rows[-1], id_col.key))
+
+
+# ------------------------------------------------------------- sparse fields
+
+@dataclass
+class Field:
+    columns: Sequence[Any]  # model attributes the value is built from
+    value: Callable[[Any], Any]  # row -> JSON value
+
+
+def isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def column_field(column, convert: Callable[[Any], Any] = None) -> Field:
+    """A field that is one column, optionally converted"""
+    key = column.key
+    if convert is None:
+        return Field([column], lambda row: getattr(row, key))
+    return Field([column], lambda row: convert(getattr(row, key)))
+
+
+class FieldSet:
+    """Serializable fields of a resource; requests name the ones they want
+
+    Only the columns behind the requested fields are selected, and rows come
+    back as plain tuples rather than ORM objects.
+    """
+
+    def __init__(self, fields: Dict[str, Field], always: Sequence[Any] = ()):
+        self.fields = fields
+        self.always = list(always)  # columns every query needs, e.g. the keyset
+
+    def resolve(self, requested: Optional[str]) -> List[str]:
+        if not requested:
+            return list(self.fields)
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise QueryError(f"Unknown fields: {', '.join(unknown)}")
+        return names
+
+    def columns(self, names: Sequence[str]) -> List[Any]:
+        columns = {column.key: column for column in self.always}
+        for name in names:
+            for column in self.fields[name].columns:
+                columns.setdefault(column.key, column)
+        return list(columns.values())
+
+    def serializer(self, names: Sequence[str]) -> Callable[[Any], Dict[str, Any]]:
+        getters = [(name, self.fields[name].value) for name in names]
+        return lambda row: {name: value(row) for name, value in getters}
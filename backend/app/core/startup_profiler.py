@@ -0,0 +1,76 @@
+"""
+Startup profiling: per-module import time and per-lifespan-step durations
+"""
+
+import importlib
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Records how long each import and startup step takes"""
+
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.imports: List[Dict[str, Any]] = []
+        self.steps: List[Dict[str, Any]] = []
+        self.ready_at: Optional[float] = None
+
+    def import_module(self, name: str):
+        """Import a module, recording wall time and how many modules it pulled in"""
+        loaded_before = len(sys.modules)
+        started = time.perf_counter()
+        try:
+            return importlib.import_module(name)
+        finally:
+            self.imports.append({
+                "module": name,
+                "seconds": time.perf_counter() - started,
+                "new_modules": len(sys.modules) - loaded_before,
+            })
+
+    @contextmanager
+    def step(self, name: str):
+        """Time one startup step (usable around sync or awaited code)"""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            self.steps.append({"step": name, "seconds": time.perf_counter() - started, "status": status})
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "imports": sorted(self.imports, key=lambda entry: entry["seconds"], reverse=True),
+            "lifespan_steps": list(self.steps),
+            "import_seconds": sum(entry["seconds"] for entry in self.imports),
+            "lifespan_seconds": sum(entry["seconds"] for entry in self.steps),
+            "ready_after_seconds": None if self.ready_at is None else self.ready_at - self.created,
+            "modules_loaded": len(sys.modules),
+        }
+
+    def log_report(self, top: int = 10):
+        report = self.report()
+        for entry in report["imports"][:top]:
+            logger.info(f"⏱️  import {entry['module']}: {entry['seconds'] * 1000:.0f} ms "
+                        f"({entry['new_modules']} modules)")
+        for entry in report["lifespan_steps"]:
+            logger.info(f"⏱️  {entry['step']}: {entry['seconds'] * 1000:.0f} ms ({entry['status']})")
+        if report["ready_after_seconds"] is not None:
+            logger.info(f"⏱️  ready {report['ready_after_seconds']:.2f}s after app import began, "
+                        f"{report['modules_loaded']} modules loaded")
+
+
+# Global profiler for the application process
+startup_profiler = StartupProfiler()
@@ -1,7 +1,10 @@
+from app.core.startup_profiler import startup_profiler
+
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import logging
 import os
 from datetime import datetime
@@ -9,9 +12,15 @@ from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import init_db, close_db, check_db_health
-from app.api.api_v1.api import api_router
-from app.communication.drone_connection_hub import drone_connection_hub
-from app.services.real_mission_execution import real_mission_execution_engine
+from app.core.event_bus import event_bus
+from app.core.lazy import subsystem_status, warm_subsystems
+from app.services.evidence_store import get_evidence_store
+
+api_router = startup_profiler.import_module("app.api.api_v1.api").api_router
+drone_connection_hub = startup_profiler.import_module("app.communication.drone_connection_hub").drone_connection_hub
+real_mission_execution_engine = startup_profiler.import_module(
+    "app.services.real_mission_execution"
+).real_mission_execution_engine
 
 # Configure logging
 logging.basicConfig(
@@ -29,38 +38,60 @@ async def lifespan(app: FastAPI):
     
     try:
         # Initialize database
-        await init_db()
+        with startup_profiler.step("database init"):
+            await init_db()
         logger.info("✅ Database initialized")
         
         # Health check
-        if await check_db_health():
+        with startup_profiler.step("database health check"):
+            db_healthy = await check_db_health()
+        if db_healthy:
             logger.info("✅ Database health check passed")
         else:
             logger.critical("❌ Database health check failed")
             raise RuntimeError("Database not accessible")
         
+        # Event bus; bridged to Redis when EVENT_BUS_REDIS_URL is set
+        with startup_profiler.step("event bus"):
+            await event_bus.start()
+        
         # Initialize drone connection hub
-        if await drone_connection_hub.start():
+        with startup_profiler.step("drone connection hub"):
+            hub_started = await drone_connection_hub.start()
+        if hub_started:
             logger.info("✅ Drone Connection Hub started")
         else:
             logger.warning("⚠️  Drone Connection Hub failed to start")
         
         # Initialize real mission execution engine
-        if await real_mission_execution_engine.start():
+        with startup_profiler.step("mission execution engine"):
+            engine_started = await real_mission_execution_engine.start()
+        if engine_started:
             logger.info("✅ Real Mission Execution Engine started")
         else:
             logger.warning("⚠️  Real Mission Execution Engine failed to start")
         
+        # Abandoned evidence uploads are removed now and then periodically
+        with startup_profiler.step("evidence store"):
+            get_evidence_store().start_expiry(settings.EVIDENCE_UPLOAD_TTL_S, settings.EVIDENCE_EXPIRY_INTERVAL_S)
+        
+        startup_profiler.mark_ready()
+        startup_profiler.log_report()
         logger.info("🎯 SAR Drone System ready for operations")
         
     except Exception as e:
         logger.critical(f"❌ Startup failed: {e}", exc_info=True)
         raise
     
+    # Heavy subsystems load in the background instead of delaying readiness
+    warm_task = asyncio.create_task(warm_subsystems(settings.WARM_SUBSYSTEMS)) if settings.WARM_SUBSYSTEMS else None
+    
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down SAR Drone System")
+    if warm_task is not None and not warm_task.done():
+        warm_task.cancel()
     try:
         # Stop real mission execution engine
         await real_mission_execution_engine.stop()
@@ -70,6 +101,12 @@ async def lifespan(app: FastAPI):
         await drone_connection_hub.stop()
         logger.info("✅ Drone Connection Hub stopped")
         
+        await event_bus.stop()
+        
+        # Let thumbnails finish and stop the upload expiry
+        await get_evidence_store().close()
+        logger.info("✅ Evidence store closed")
+        
         # Close database connections
         await close_db()
         logger.info("✅ Database connections closed")
@@ -147,6 +184,15 @@ async def health_check():
             }
         )
 
+# Startup profile: import and lifespan timings, lazily loaded subsystems
+@app.get("/health/startup")
+async def startup_profile():
+    """Startup timing report"""
+    return {
+        **startup_profiler.report(),
+        "subsystems": subsystem_status(),
+    }
+
 # Root endpoint
 @app.get("/")
 async def root():
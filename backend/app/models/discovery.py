@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Text, DateTime, Float, Boolean, JSON, ForeignKey, Integer, Enum
+from sqlalchemy import Column, String, Text, DateTime, Float, Boolean, JSON, ForeignKey, Integer, BigInteger, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
 from ..core.database import Base
+from ..core.query import register_geocell
 
 class DiscoveryType(PyEnum):
     PERSON = "person"
@@ -24,6 +25,11 @@ class DiscoveryConfidence(PyEnum):
 class Discovery(Base):
     """Represents objects or persons of interest discovered during missions."""
     __tablename__ = "discoveries"
+    __table_args__ = (
+        # Keyset pages, newest first (see core/query.py)
+        Index("ix_discoveries_time", "discovered_at", "id"),
+        Index("ix_discoveries_mission_time", "mission_id", "discovered_at", "id"),
+    )
 
     # Primary identification
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -34,6 +40,7 @@ class Discovery(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     altitude = Column(Float)
+    geocell = Column(BigInteger, index=True)  # set from latitude/longitude on save
 
     # Detection information
     discovery_type = Column(String(100), nullable=False)
@@ -96,6 +103,9 @@ class Discovery(Base):
             return 1  # Low
 
 
+register_geocell(Discovery, "latitude", "longitude")
+
+
 class EvidenceFile(Base):
     """Stores evidence files associated with discoveries."""
     __tablename__ = "evidence_files"
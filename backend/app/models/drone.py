@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Boolean, JSON, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, Float, DateTime, Boolean, JSON, Integer, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
@@ -144,6 +144,10 @@ class Drone(Base):
 class TelemetryData(Base):
     """Real-time telemetry data from drones during missions."""
     __tablename__ = "telemetry_data"
+    __table_args__ = (
+        # Each drone's track in a mission, in time order (see services/mission_export.py)
+        Index("ix_telemetry_mission_drone_time", "mission_id", "drone_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     drone_id = Column(Integer, ForeignKey("drones.id"), nullable=False)
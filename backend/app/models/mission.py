@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Text, DateTime, Float, Boolean, JSON, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, DateTime, Float, Boolean, JSON, ForeignKey, Integer, BigInteger, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
 from ..core.database import Base
+from ..core.query import register_geocell
 
 
 class MissionStatus(Enum):
@@ -17,6 +18,9 @@ class MissionStatus(Enum):
 class Mission(Base):
     """Core mission data model representing a search and rescue operation."""
     __tablename__ = "missions"
+    __table_args__ = (
+        Index("ix_missions_created", "created_at", "id"),  # keyset pages (see core/query.py)
+    )
 
     # Primary identification
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -33,6 +37,7 @@ class Mission(Base):
     search_area = Column(JSON)  # GeoJSON polygon
     center_lat = Column(Float)
     center_lng = Column(Float)
+    geocell = Column(BigInteger, index=True)  # set from center_lat/center_lng on save
     altitude = Column(Float)
     radius = Column(Float)
 
@@ -107,6 +112,9 @@ class Mission(Base):
         }
 
 
+register_geocell(Mission, "center_lat", "center_lng")
+
+
 class MissionDrone(Base):
     """Junction table tracking drone assignments to missions."""
     __tablename__ = "mission_drone"
@@ -4,12 +4,13 @@ Model training, inference, and continuous learning
 """
 import asyncio
 import logging
-import pickle
+import time
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
+from functools import partial
 import joblib
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
@@ -26,6 +27,10 @@ from kafka import KafkaProducer, KafkaConsumer
 import json
 import redis
 
+from ..ai.batch_inference import MicroBatcher, encode_column
+from ..ai.model_registry import ModelRegistry, get_model_registry
+from ..core.config import settings
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -85,6 +90,14 @@ class MLPipeline:
         self.model_metrics: Dict[str, List[ModelMetrics]] = {}
         self.scalers: Dict[str, StandardScaler] = {}
         self.encoders: Dict[str, LabelEncoder] = {}
+        self.model_versions: Dict[str, str] = {}
+        self._active_versions: Dict[str, Tuple[Optional[str], float]] = {}
+        self._model_locks: Dict[str, asyncio.Lock] = {}
+        self.inference_batchers: Dict[str, MicroBatcher] = {}
+        
+        # Fitted models are versioned on local disk; Redis only keeps metadata
+        registry_path = self.config.get('model_registry_path')
+        self.registry = ModelRegistry(registry_path) if registry_path else get_model_registry()
         
         # Initialize MLflow
         mlflow.set_tracking_uri(self.config.get('mlflow_uri', 'http://localhost:5000'))
@@ -254,6 +267,8 @@ class MLPipeline:
     async def stop_pipeline(self):
         """Stop the ML pipeline"""
         self.running = False
+        for batcher in self.inference_batchers.values():
+            await batcher.close()
         logger.info("ML pipeline stopped")
     
     async def _train_all_models(self):
@@ -513,17 +528,6 @@ class MLPipeline:
             # Store model in memory
             self.models[model_name] = model
             
-            # Store model in Redis for fast access
-            model_key = f"model:{model_name}"
-            if config.algorithm == "neural_network":
-                # Save Keras model to bytes
-                model_bytes = model.to_json().encode()
-                self.redis_client.set(f"{model_key}:json", model_bytes, ex=86400)  # 24 hours
-            else:
-                # Serialize sklearn/XGBoost models
-                model_bytes = pickle.dumps(model)
-                self.redis_client.set(f"{model_key}:pickle", model_bytes, ex=86400)
-            
             # Store model metadata
             metadata = {
                 "version": config.version,
@@ -532,6 +536,20 @@ class MLPipeline:
                 "accuracy": metrics.accuracy,
                 "trained_at": datetime.utcnow().isoformat()
             }
+            
+            model_key = f"model:{model_name}"
+            if config.algorithm == "neural_network":
+                # Save Keras model to bytes
+                model_bytes = model.to_json().encode()
+                self.redis_client.set(f"{model_key}:json", model_bytes, ex=86400)  # 24 hours
+            else:
+                # Publish sklearn/XGBoost models (with their scaler) as a new registry version
+                artifact = {"model": model, "scaler": self.scalers.get(f"{model_name}_scaler")}
+                version = await asyncio.to_thread(self.registry.publish, model_name, artifact, metadata)
+                self.model_versions[model_name] = version
+                self._active_versions[model_name] = (version, time.monotonic())
+                metadata["registry_version"] = version
+            
             self.redis_client.set(f"{model_key}:metadata", json.dumps(metadata), ex=86400)
             
             # Log to MLflow
@@ -585,31 +603,35 @@ class MLPipeline:
                 # Poll for inference requests
                 message_batch = self.kafka_consumer.poll(timeout_ms=1000)
                 
-                for topic_partition, messages in message_batch.items():
-                    for message in messages:
-                        request = PredictionRequest(**message.value)
-                        await self._process_inference_request(request)
+                # Requests for the same model coalesce into one batched predict call
+                requests = [
+                    PredictionRequest(**message.value)
+                    for messages in message_batch.values()
+                    for message in messages
+                ]
+                # Each model in the batch is loaded (or its version checked) once, not per request
+                names = list(dict.fromkeys(request.model_name for request in requests))
+                loaded = await asyncio.gather(*(self._load_model_for_inference(name) for name in names))
+                models = dict(zip(names, loaded))
+                await asyncio.gather(*(
+                    self._process_inference_request(request, models[request.model_name]) for request in requests
+                ))
                 
             except Exception as e:
                 logger.error(f"Error in inference processor: {e}")
                 await asyncio.sleep(5)
     
-    async def _process_inference_request(self, request: PredictionRequest):
-        """Process single inference request"""
+    async def _process_inference_request(self, request: PredictionRequest, model: Optional[Any]):
+        """Process one inference request through the model's micro-batcher, with the model its batch loaded"""
         try:
             start_time = time.time()
             
-            # Load model
-            model = await self._load_model_for_inference(request.model_name)
             if model is None:
                 logger.error(f"Model not found for inference: {request.model_name}")
                 return
             
-            # Prepare features
-            features = await self._prepare_inference_features(request.features, request.model_name)
-            
-            # Make prediction
-            prediction = model.predict(features.reshape(1, -1))
+            # Make prediction (batched with concurrent requests for this model)
+            prediction = await self._get_inference_batcher(request.model_name).submit(request.features)
             
             # Calculate confidence (simplified)
             confidence = 0.8  # This would be calculated based on model output
@@ -619,9 +641,9 @@ class MLPipeline:
             # Create result
             result = PredictionResult(
                 request_id=request.request_id,
-                prediction=prediction[0] if len(prediction.shape) > 0 else prediction,
+                prediction=prediction,
                 confidence=confidence,
-                model_version="1.0",
+                model_version=self.model_versions.get(request.model_name, "1.0"),
                 processing_time=processing_time
             )
             
@@ -630,7 +652,7 @@ class MLPipeline:
                 'ml_inference_results',
                 {
                     "request_id": result.request_id,
-                    "prediction": float(result.prediction),
+                    "prediction": result.prediction if isinstance(result.prediction, list) else float(result.prediction),
                     "confidence": result.confidence,
                     "model_version": result.model_version,
                     "processing_time": result.processing_time,
@@ -641,62 +663,104 @@ class MLPipeline:
         except Exception as e:
             logger.error(f"Error processing inference request {request.request_id}: {e}")
     
+    def _get_inference_batcher(self, model_name: str) -> MicroBatcher:
+        batcher = self.inference_batchers.get(model_name)
+        if batcher is None:
+            batcher = MicroBatcher(
+                partial(self._predict_rows, model_name),
+                max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+                max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+                name=model_name,
+            )
+            self.inference_batchers[model_name] = batcher
+        return batcher
+    
+    def _predict_rows(self, model_name: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        """One predict call for a batch of feature dicts; each row's full output, a scalar for single-output models"""
+        model = self.models[model_name]
+        prediction = np.asarray(model.predict(self._prepare_inference_matrix(rows, model_name)))
+        prediction = prediction.reshape(len(rows), -1)
+        if prediction.shape[1] == 1:
+            prediction = prediction[:, 0]
+        return prediction.tolist()
+    
     async def _load_model_for_inference(self, model_name: str) -> Optional[Any]:
         """Load model for inference"""
-        # Check if model is in memory
-        if model_name in self.models:
+        config = self.model_configs.get(model_name)
+        if config is not None and config.algorithm == "neural_network":
+            if model_name in self.models:
+                return self.models[model_name]
+            model_json = self.redis_client.get(f"model:{model_name}:json")
+            if model_json:
+                model = keras.models.model_from_json(model_json.decode())
+                # Note: In production, you'd also need to load weights
+                self.models[model_name] = model
+                return model
+            return None
+        
+        # Serve from memory unless the registry has activated a newer version
+        version = self._active_version(model_name)
+        if model_name in self.models and version in (None, self.model_versions.get(model_name)):
             return self.models[model_name]
+        if version is None:
+            return None
         
-        # Try to load from Redis
-        model_key = f"model:{model_name}"
-        try:
-            config = self.model_configs[model_name]
+        # One load per model at a time; callers that waited re-check before loading again
+        lock = self._model_locks.setdefault(model_name, asyncio.Lock())
+        async with lock:
+            if model_name in self.models and self.model_versions.get(model_name) == version:
+                return self.models[model_name]
+            try:
+                artifact, manifest = await asyncio.to_thread(self.registry.load, model_name, version)
+            except Exception as e:
+                logger.error(f"Error loading model {model_name} from registry: {e}")
+                return self.models.get(model_name)
             
-            if config.algorithm == "neural_network":
-                model_json = self.redis_client.get(f"{model_key}:json")
-                if model_json:
-                    model = keras.models.model_from_json(model_json.decode())
-                    # Note: In production, you'd also need to load weights
-                    return model
-            else:
-                model_bytes = self.redis_client.get(f"{model_key}:pickle")
-                if model_bytes:
-                    return pickle.loads(model_bytes)
-        except Exception as e:
-            logger.error(f"Error loading model from Redis: {e}")
-        
-        return None
+            self.models[model_name] = artifact["model"]
+            if artifact.get("scaler") is not None:
+                self.scalers[f"{model_name}_scaler"] = artifact["scaler"]
+            self.model_versions[model_name] = manifest.version
+            logger.info(f"Loaded model {model_name} version {manifest.version} from registry")
+            return self.models[model_name]
+    
+    def _active_version(self, model_name: str) -> Optional[str]:
+        """The registry's active version, re-read from CURRENT at most every MODEL_VERSION_CHECK_INTERVAL"""
+        now = time.monotonic()
+        cached = self._active_versions.get(model_name)
+        if cached is None or now - cached[1] >= settings.MODEL_VERSION_CHECK_INTERVAL:
+            cached = (self.registry.current_version(model_name), now)
+            self._active_versions[model_name] = cached
+        return cached[0]
     
     async def _prepare_inference_features(self, features: Dict[str, Any], model_name: str) -> np.ndarray:
         """Prepare features for inference"""
+        return self._prepare_inference_matrix([features], model_name)[0]
+    
+    def _prepare_inference_matrix(self, rows: List[Dict[str, Any]], model_name: str) -> np.ndarray:
+        """Feature matrix for a batch, encoded and scaled column-wise"""
         config = self.model_configs[model_name]
         
-        # Convert to array
-        feature_array = []
+        columns = []
         for feature in config.features:
-            value = features.get(feature, 0)
+            values = [row.get(feature, 0) for row in rows]
             
-            # Handle categorical encoding
+            # Handle categorical encoding (unseen categories become 0)
             if feature in self.encoders:
-                try:
-                    value = self.encoders[feature].transform([value])[0]
-                except ValueError:
-                    # Handle unseen categories
-                    value = 0
-            elif isinstance(value, str):
+                columns.append(encode_column(values, self.encoders[feature].classes_))
+            else:
                 # Simple string to numeric conversion
-                value = hash(value) % 1000
-            
-            feature_array.append(value)
+                columns.append(np.asarray(
+                    [hash(v) % 1000 if isinstance(v, str) else v for v in values], dtype=np.float64
+                ))
         
-        feature_array = np.array(feature_array)
+        feature_matrix = np.column_stack(columns)
         
         # Apply scaling
         scaler_key = f"{model_name}_scaler"
         if scaler_key in self.scalers:
-            feature_array = self.scalers[scaler_key].transform(feature_array.reshape(1, -1)).flatten()
+            feature_matrix = self.scalers[scaler_key].transform(feature_matrix)
         
-        return feature_array
+        return feature_matrix
     
     async def _model_monitor(self):
         """Monitor model performance"""
@@ -4,7 +4,15 @@ Services Package
 This package contains all business logic services for the SAR drone system.
 """
 
-from .mission_planner import MissionPlanner
-from .conversational_mission_planner import ConversationalMissionPlanner
+__all__ = ['MissionPlanner', 'ConversationalMissionPlanner']
 
-__all__ = ['MissionPlanner', 'ConversationalMissionPlanner']
\ No newline at end of file
+
+def __getattr__(name):
+    # Resolved on first access so importing one service doesn't load the others
+    if name == 'MissionPlanner':
+        from .mission_planner import MissionPlanner
+        return MissionPlanner
+    if name == 'ConversationalMissionPlanner':
+        from .conversational_mission_planner import ConversationalMissionPlanner
+        return ConversationalMissionPlanner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -6,9 +6,11 @@ to real-time conditions, drone performance, and mission outcomes.
 """
 
 import asyncio
+import dataclasses
 import logging
 import math
 import json
+import time
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
@@ -20,11 +22,26 @@ from ..core.database import SessionLocal
 from ..models import Mission, Drone, Discovery, MissionDrone
 from .weather_service import weather_service
 from .coordination_engine import CoordinationEngine, DroneState, MissionState
+from .dem_tile_store import DEMTileStore, get_dem_store
+from .fleet_routing import FleetRouter, RoutingDrone, DroneRoute
+from .airspace import Geofence, GeofenceIndex, bounds_to_polygon
+from .coverage_grid import METERS_PER_DEGREE
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+def _path_length_m(waypoints: List[Dict]) -> float:
+    """Length of the path through the waypoints in order, on a local flat projection"""
+    if len(waypoints) < 2:
+        return 0.0
+    lats = np.fromiter((wp['lat'] for wp in waypoints), dtype=np.float64, count=len(waypoints))
+    lngs = np.fromiter((wp['lng'] for wp in waypoints), dtype=np.float64, count=len(waypoints))
+    dy = np.diff(lats) * METERS_PER_DEGREE
+    dx = np.diff(lngs) * METERS_PER_DEGREE * math.cos(math.radians(lats.mean()))
+    return float(np.hypot(dx, dy).sum())
+
+
 class OptimizationStrategy(Enum):
     """Optimization strategies for mission planning."""
     TIME_EFFICIENT = "time_efficient"  # Minimize mission duration
@@ -67,6 +84,8 @@ class DroneCapabilities:
     gimbal_stabilization: bool
     obstacle_avoidance: bool
     weather_resistance: str  # light, moderate, severe
+    home_lat: Optional[float] = None  # launch and battery swap point
+    home_lng: Optional[float] = None
 
 
 @dataclass
@@ -97,6 +116,37 @@ class OptimizationResult:
     alternative_plans: List[Dict] = field(default_factory=list)
 
 
+class PlanChangeType(Enum):
+    """Events that call for replanning a mission in flight."""
+    DRONE_LOST = "drone_lost"
+    DRONE_ADDED = "drone_added"
+    PRIORITY_AREA = "priority_area"
+    NO_FLY_ZONE = "no_fly_zone"
+
+
+@dataclass
+class PlanChange:
+    """A change to a running mission plan."""
+    change_type: PlanChangeType
+    drone_id: Optional[str] = None  # the drone lost
+    drone: Optional[DroneCapabilities] = None  # the drone added
+    bounds: Optional[Dict[str, float]] = None  # north/south/east/west of the area or zone
+    polygon: Optional[List[Tuple[float, float]]] = None  # (lat, lng) ring, instead of bounds for a zone
+    waypoints: Optional[List[Dict]] = None  # priority waypoints, instead of a grid over bounds
+    spacing_m: Optional[float] = None  # grid spacing over a priority area
+
+
+@dataclass
+class ReplanResult:
+    """Result of an incremental replan."""
+    success: bool
+    optimized_plan: Dict
+    diff: Dict
+    estimated_duration: int
+    replan_time_ms: float
+    message: str = ""
+
+
 class AdaptivePlanner:
     """
     Advanced adaptive planning system for SAR missions.
@@ -109,8 +159,9 @@ class AdaptivePlanner:
     - Historical performance data
     """
 
-    def __init__(self):
+    def __init__(self, dem_store: Optional[DEMTileStore] = None):
         self.coordination_engine = CoordinationEngine()
+        self.dem_store = dem_store
         self.optimization_history: List[Dict] = []
         self.performance_models: Dict[str, Any] = {}
         self.learning_enabled = True
@@ -352,6 +403,12 @@ class AdaptivePlanner:
         # Generate waypoints
         waypoints = await self._generate_waypoints(context, search_pattern, optimal_altitude)
         
+        # Follow terrain where a DEM is available
+        self._apply_terrain_following(context, waypoints)
+        
+        # Warm the weather grid along the planned route
+        weather_service.schedule_prefetch(waypoints)
+        
         # Assign drones to areas
         drone_assignments = await self._assign_drones_to_areas(
             context.available_drones, waypoints, context
@@ -418,6 +475,29 @@ class AdaptivePlanner:
             min(base_altitude, context.constraints.max_altitude)
         )
 
+    def _apply_terrain_following(self, context: MissionContext, waypoints: List[Dict]) -> None:
+        """Annotate waypoints with DEM ground elevation and raise AGL altitude over rough relief."""
+        dem = self.dem_store if self.dem_store is not None else get_dem_store()
+        if dem is None or not waypoints:
+            return
+        
+        lats = np.fromiter((wp['lat'] for wp in waypoints), dtype=np.float64, count=len(waypoints))
+        lngs = np.fromiter((wp['lng'] for wp in waypoints), dtype=np.float64, count=len(waypoints))
+        samples = dem.sample_bands(lats, lngs, bands=('elevation', 'roughness'))
+        known = ~np.isnan(samples['elevation'])
+        if not known.any():
+            return
+        
+        # Local relief (m) eats into clearance, so climb by half of it
+        altitudes = np.fromiter((wp['altitude'] for wp in waypoints), dtype=np.float64, count=len(waypoints))
+        relief = np.nan_to_num(samples['roughness'])
+        altitudes = np.clip(altitudes + relief / 2, context.constraints.min_altitude, context.constraints.max_altitude)
+        for i in np.flatnonzero(known):
+            waypoint = waypoints[i]
+            waypoint['altitude'] = float(altitudes[i])
+            waypoint['terrain_elevation_m'] = float(samples['elevation'][i])
+            waypoint['altitude_msl'] = float(samples['elevation'][i] + altitudes[i])
+
     async def _generate_waypoints(
         self,
         context: MissionContext,
@@ -571,57 +651,302 @@ class AdaptivePlanner:
         waypoints: List[Dict],
         context: MissionContext
     ) -> List[Dict]:
-        """Assign drones to search areas."""
+        """
+        Route drones over the waypoints so the last drone finishes as early as possible.
+        
+        Each drone starts from its home position (the waypoints' centre when
+        unknown), flies at cruise speed, spends longer at each waypoint with a
+        lower-resolution camera and returns to base for a fresh battery
+        whenever the next waypoint would eat into the reserve. Those legs
+        appear as 'return_to_base' waypoints.
+        """
         assignments = []
         
         if not drones or not waypoints:
             return assignments
         
-        # Calculate area per drone
-        waypoints_per_drone = len(waypoints) // len(drones)
-        remainder = len(waypoints) % len(drones)
+        router = FleetRouter.from_waypoints(waypoints)
+        home = (router.lat0, router.lng0)
+        routing_drones = [self._routing_drone(drone, context, home) for drone in drones]
+        result = await asyncio.to_thread(router.solve, routing_drones, settings.PLANNER_ROUTING_TIME_BUDGET_S)
+        if result.unassigned.size:
+            logger.warning(f"{result.unassigned.size} waypoints are beyond the range of every drone and were left out")
+        
+        for drone, routing_drone, route in zip(drones, routing_drones, result.routes):
+            assignments.append(self._route_assignment(drone, routing_drone, route, waypoints, context))
+        
+        return assignments
+
+    def _route_assignment(
+        self,
+        drone: DroneCapabilities,
+        routing_drone: RoutingDrone,
+        route: DroneRoute,
+        waypoints: List[Dict],
+        context: MissionContext
+    ) -> Dict:
+        """Assignment entry for a drone's route, with a return-to-base leg between sorties."""
+        drone_waypoints = []
+        for i, sortie in enumerate(route.sorties):
+            if i > 0:
+                drone_waypoints.append({
+                    'lat': routing_drone.lat,
+                    'lng': routing_drone.lng,
+                    'altitude': waypoints[sortie[0]]['altitude'],
+                    'type': 'return_to_base'
+                })
+            drone_waypoints.extend(waypoints[j] for j in sortie)
+        
+        # The heaviest sortie, as a share of a full battery
+        battery_usage = max(route.sortie_times_s, default=0.0) / (drone.max_flight_time * 60) * 100
+        return {
+            'drone_id': drone.drone_id,
+            'assigned_waypoints': drone_waypoints,
+            'estimated_duration': int(route.duration_s / 60),
+            'battery_usage': min(battery_usage, 100.0),
+            'sorties': len(route.sorties),
+            'distance_m': route.distance_m,
+            'home_lat': routing_drone.lat,
+            'home_lng': routing_drone.lng,
+            'priority': self._calculate_drone_priority(drone, context)
+        }
+
+    def _routing_drone(
+        self,
+        drone: DroneCapabilities,
+        context: MissionContext,
+        home: Tuple[float, float]
+    ) -> RoutingDrone:
+        """Speed, endurance and per-waypoint time of a drone for the fleet router."""
+        reserve = context.constraints.min_battery_reserve / 100
+        flight_time_s = drone.max_flight_time * 60
+        sensor_quality = min(1.0, max(0.5, drone.camera_resolution[0] / 1920))
+        return RoutingDrone(
+            drone_id=drone.drone_id,
+            lat=drone.home_lat if drone.home_lat is not None else home[0],
+            lng=drone.home_lng if drone.home_lng is not None else home[1],
+            speed_mps=drone.cruise_speed,
+            endurance_s=flight_time_s * (1 - reserve),
+            first_endurance_s=flight_time_s * max(0.0, drone.battery_capacity / 100 - reserve),
+            dwell_s=settings.PLANNER_WAYPOINT_DWELL_S / sensor_quality,
+            turnaround_s=settings.PLANNER_BATTERY_SWAP_S
+        )
+
+    async def replan_mission(
+        self,
+        plan: Dict[str, Any],
+        context: MissionContext,
+        change: PlanChange,
+        completed: Optional[Dict[str, int]] = None,
+        drone_states: Optional[Dict[str, Dict[str, float]]] = None
+    ) -> ReplanResult:
+        """
+        Repair a running plan after a change instead of optimizing it again.
+        
+        Args:
+            plan: The plan being flown, with its drone_assignments
+            context: Mission context; its drones cover every drone in the plan
+            change: What changed
+            completed: Search waypoints each drone has already flown, by drone ID
+            drone_states: Current 'lat', 'lng' and 'battery' (percent) of drones in the air
+            
+        Returns:
+            ReplanResult with the plan of remaining work and a per-drone diff.
+            Only drones near the change get new routes; the assignments in the
+            returned plan hold what is left to fly, so progress counts restart.
+        """
+        started = time.perf_counter()
+        completed = completed or {}
+        drone_states = drone_states or {}
+        capabilities = {drone.drone_id: drone for drone in context.available_drones}
+        if change.drone is not None:
+            capabilities[change.drone.drone_id] = change.drone
         
-        start_idx = 0
-        for i, drone in enumerate(drones):
-            # Assign waypoints to drone
-            end_idx = start_idx + waypoints_per_drone
-            if i < remainder:
-                end_idx += 1
+        try:
+            # What each drone still has to fly, as one waypoint list the router can index
+            waypoints: List[Dict] = []
+            owners: List[str] = []
+            homes: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+            for assignment in plan.get('drone_assignments', []):
+                drone_id = assignment['drone_id']
+                if drone_id not in capabilities:
+                    raise ValueError(f"Drone {drone_id} is not in the mission context")
+                search = [wp for wp in assignment['assigned_waypoints'] if wp.get('type') != 'return_to_base']
+                remaining = search[completed.get(drone_id, 0):]
+                waypoints.extend(remaining)
+                owners.extend([drone_id] * len(remaining))
+                homes[drone_id] = (assignment.get('home_lat'), assignment.get('home_lng'))
+            drone_ids = list(homes)
+            owner_array = np.array(owners, dtype=object)
             
-            drone_waypoints = waypoints[start_idx:end_idx]
+            pending_ids: List[int] = []
+            priority_ids: List[int] = []
+            keep = np.ones(len(waypoints), dtype=bool)
+            added_drones: List[str] = []
+            removed_drones: List[str] = []
+            changed_ids: List[str] = []
             
-            assignments.append({
-                'drone_id': drone.drone_id,
-                'assigned_waypoints': drone_waypoints,
-                'estimated_duration': self._estimate_drone_duration(drone, drone_waypoints),
-                'battery_usage': self._estimate_battery_usage(drone, drone_waypoints),
-                'priority': self._calculate_drone_priority(drone, context)
-            })
+            if change.change_type == PlanChangeType.DRONE_LOST:
+                if change.drone_id not in homes:
+                    raise ValueError(f"Drone {change.drone_id} is not in the plan")
+                drone_ids.remove(change.drone_id)
+                removed_drones.append(change.drone_id)
+                pending_ids = np.flatnonzero(owner_array == change.drone_id).tolist()
+            elif change.change_type == PlanChangeType.DRONE_ADDED:
+                if change.drone is None:
+                    raise ValueError("A drone_added change needs the drone's capabilities")
+                if change.drone.drone_id in homes:
+                    raise ValueError(f"Drone {change.drone.drone_id} is already in the plan")
+                drone_ids.append(change.drone.drone_id)
+                homes[change.drone.drone_id] = (change.drone.home_lat, change.drone.home_lng)
+                added_drones.append(change.drone.drone_id)
+            elif change.change_type == PlanChangeType.PRIORITY_AREA:
+                new_waypoints = change.waypoints or self._priority_area_waypoints(plan, change)
+                pending_ids = priority_ids = list(range(len(waypoints), len(waypoints) + len(new_waypoints)))
+                waypoints.extend(new_waypoints)
+                owners.extend([None] * len(new_waypoints))
+                keep = np.ones(len(waypoints), dtype=bool)
+            elif change.change_type == PlanChangeType.NO_FLY_ZONE:
+                polygon = change.polygon or (bounds_to_polygon(change.bounds) if change.bounds else None)
+                if not polygon:
+                    raise ValueError("A no_fly_zone change needs a polygon or bounds")
+                zone = GeofenceIndex([Geofence("replan", "No-fly zone", list(polygon))])
+                lats = np.fromiter((wp['lat'] for wp in waypoints), dtype=np.float64, count=len(waypoints))
+                lngs = np.fromiter((wp['lng'] for wp in waypoints), dtype=np.float64, count=len(waypoints))
+                inside = zone.query_points(lats, lngs)[0]
+                keep[inside] = False
+                changed_ids = sorted({owners[i] for i in inside})
             
-            start_idx = end_idx
-        
-        return assignments
+            # The router only sees waypoints that are still to be flown
+            kept = np.flatnonzero(keep)
+            index = np.full(len(waypoints), -1, dtype=np.int64)
+            index[kept] = np.arange(len(kept))
+            router_waypoints = [waypoints[i] for i in kept]
+            router = FleetRouter.from_waypoints(router_waypoints)
+            fallback = (router.lat0, router.lng0)
+            
+            drones = [capabilities[drone_id] for drone_id in drone_ids]
+            routing_drones = []
+            for drone in drones:
+                home = homes[drone.drone_id]
+                state = drone_states.get(drone.drone_id, {})
+                if state.get('battery') is not None:
+                    drone = dataclasses.replace(drone, battery_capacity=state['battery'])
+                routing_drone = self._routing_drone(
+                    drone, context, home if home[0] is not None and home[1] is not None else fallback
+                )
+                routing_drones.append(dataclasses.replace(
+                    routing_drone, start_lat=state.get('lat'), start_lng=state.get('lng')
+                ))
+            
+            old_routes = {drone_id: [] for drone_id in drone_ids}
+            for i in kept:
+                if owners[i] in old_routes:
+                    old_routes[owners[i]].append(index[i])
+            result = await asyncio.to_thread(
+                router.repair,
+                routing_drones,
+                [old_routes[drone_id] for drone_id in drone_ids],
+                index[pending_ids],
+                index[priority_ids],
+                [drone_ids.index(drone_id) for drone_id in changed_ids if drone_id in old_routes],
+                settings.PLANNER_REPLAN_TIME_BUDGET_S
+            )
+            
+            # Per-drone diff against what each drone was going to fly
+            dropped = np.flatnonzero(~keep)
+            dropped_by_drone: Dict[str, List[Dict]] = {}
+            for i in dropped:
+                dropped_by_drone.setdefault(owners[i], []).append(waypoints[i])
+            changed_drones = {}
+            assignments = []
+            for drone, routing_drone, route in zip(drones, routing_drones, result.routes):
+                new_route = route.order.tolist()
+                old_route = old_routes[drone.drone_id]
+                dropped_here = dropped_by_drone.get(drone.drone_id, [])
+                if (new_route != old_route or dropped_here) and drone.drone_id not in added_drones:
+                    old_set, new_set = set(old_route), set(new_route)
+                    changed_drones[drone.drone_id] = {
+                        'added_waypoints': [router_waypoints[j] for j in new_route if j not in old_set],
+                        'removed_waypoints': dropped_here + [router_waypoints[j] for j in old_route if j not in new_set],
+                        'reordered': old_set == new_set and not dropped_here
+                    }
+                assignments.append(self._route_assignment(drone, routing_drone, route, router_waypoints, context))
+            
+            new_plan = dict(plan)
+            new_plan['waypoints'] = router_waypoints
+            new_plan['drone_assignments'] = assignments
+            new_plan['estimated_duration'] = int(result.makespan_s / 60)
+            new_plan['replanned_at'] = datetime.utcnow().isoformat()
+            diff = {
+                'change': change.change_type.value,
+                'added_drones': added_drones,
+                'removed_drones': removed_drones,
+                'changed_drones': changed_drones,
+                'unchanged_drones': [
+                    drone_id for drone_id in drone_ids
+                    if drone_id not in changed_drones and drone_id not in added_drones
+                ],
+                'new_assignments': {
+                    a['drone_id']: a['assigned_waypoints'] for a in assignments if a['drone_id'] in added_drones
+                },
+                'dropped_waypoints': [waypoints[i] for i in dropped],
+                'unassigned_waypoints': [router_waypoints[j] for j in result.unassigned],
+                'repair_window': result.stats.get('window', len(drone_ids))
+            }
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(
+                f"Replanned {context.mission_id} after {change.change_type.value} in {elapsed_ms:.1f} ms: "
+                f"{len(changed_drones)} drones changed"
+            )
+            return ReplanResult(
+                success=True,
+                optimized_plan=new_plan,
+                diff=diff,
+                estimated_duration=new_plan['estimated_duration'],
+                replan_time_ms=elapsed_ms
+            )
+            
+        except Exception as e:
+            logger.error(f"Replanning failed: {e}")
+            return ReplanResult(
+                success=False,
+                optimized_plan=plan,
+                diff={},
+                estimated_duration=plan.get('estimated_duration', 0),
+                replan_time_ms=(time.perf_counter() - started) * 1000,
+                message=f"Replanning failed: {str(e)}"
+            )
+
+    def _priority_area_waypoints(self, plan: Dict[str, Any], change: PlanChange) -> List[Dict]:
+        """Grid of search waypoints over a priority area's bounds."""
+        if not change.bounds:
+            raise ValueError("A priority_area change needs bounds or waypoints")
+        bounds = change.bounds
+        spacing = change.spacing_m or settings.PLANNER_PRIORITY_SPACING_M
+        lat_step = spacing / METERS_PER_DEGREE
+        lng_step = lat_step / max(math.cos(math.radians((bounds['north'] + bounds['south']) / 2)), 1e-6)
+        altitude = plan.get('optimal_altitude', 50.0)
+        waypoints = []
+        for lat in np.arange(bounds['south'], bounds['north'] + lat_step / 2, lat_step):
+            for lng in np.arange(bounds['west'], bounds['east'] + lng_step / 2, lng_step):
+                waypoints.append({
+                    'lat': float(lat),
+                    'lng': float(lng),
+                    'altitude': altitude,
+                    'type': 'search',
+                    'priority': True,
+                    'order': len(waypoints)
+                })
+        return waypoints
 
     def _estimate_drone_duration(self, drone: DroneCapabilities, waypoints: List[Dict]) -> int:
         """Estimate duration for drone to complete assigned waypoints."""
         if not waypoints:
             return 0
         
-        # Calculate total distance
-        total_distance = 0.0
-        for i in range(1, len(waypoints)):
-            prev_wp = waypoints[i-1]
-            curr_wp = waypoints[i]
-            
-            # Simple distance calculation
-            lat_diff = curr_wp['lat'] - prev_wp['lat']
-            lng_diff = curr_wp['lng'] - prev_wp['lng']
-            distance = math.sqrt(lat_diff**2 + lng_diff**2) * 111320  # meters
-            
-            total_distance += distance
-        
         # Calculate time based on cruise speed
-        flight_time = total_distance / drone.cruise_speed  # seconds
+        flight_time = _path_length_m(waypoints) / drone.cruise_speed  # seconds
         return int(flight_time / 60)  # minutes
 
     def _estimate_battery_usage(self, drone: DroneCapabilities, waypoints: List[Dict]) -> float:
@@ -669,17 +994,7 @@ class AdaptivePlanner:
         if not waypoints:
             return 0
         
-        # Calculate total distance
-        total_distance = 0.0
-        for i in range(1, len(waypoints)):
-            prev_wp = waypoints[i-1]
-            curr_wp = waypoints[i]
-            
-            lat_diff = curr_wp['lat'] - prev_wp['lat']
-            lng_diff = curr_wp['lng'] - prev_wp['lng']
-            distance = math.sqrt(lat_diff**2 + lng_diff**2) * 111320
-            
-            total_distance += distance
+        total_distance = _path_length_m(waypoints)
         
         # Estimate time based on average speed
         avg_speed = 10.0  # m/s
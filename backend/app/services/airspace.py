@@ -0,0 +1,274 @@
+"""
+Airspace geofence index for SAR Mission Commander
+Polygon geofences (no-fly zones, restricted airspace) and jurisdiction
+boundaries in an STR-packed R-tree with batched point and area queries
+"""
+
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import shapely
+    from shapely import STRtree
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+if not SHAPELY_AVAILABLE:
+    logger.warning("⚠️ shapely not available - using NumPy geofence index")
+
+
+@dataclass
+class Geofence:
+    """Polygon airspace volume; ``polygon`` is the exterior ring as (lat, lng) pairs"""
+    fence_id: str
+    name: str
+    polygon: List[Tuple[float, float]]
+    fence_type: str = "no_fly_zone"
+    floor_m: float = 0.0
+    ceiling_m: float = math.inf
+    properties: Dict[str, Any] = field(default_factory=dict)
+
+
+def bounds_to_polygon(bounds: Dict[str, float]) -> List[Tuple[float, float]]:
+    """Rectangle ring for a north/south/east/west bounds dict"""
+    return [
+        (bounds['south'], bounds['west']), (bounds['south'], bounds['east']),
+        (bounds['north'], bounds['east']), (bounds['north'], bounds['west']),
+    ]
+
+
+def geofences_from_geojson(data: Any, default_type: str = "no_fly_zone") -> List[Geofence]:
+    """Geofences from the Polygon / MultiPolygon features of a GeoJSON FeatureCollection
+
+    ``data`` is a parsed FeatureCollection or a path to one. Holes are ignored.
+    Feature properties ``name``, ``type``, ``floor_m`` and ``ceiling_m`` are used
+    when present; all properties are kept on the geofence.
+    """
+    if isinstance(data, str):
+        with open(data) as f:
+            data = json.load(f)
+
+    fences = []
+    for n, feature in enumerate(data.get("features", [])):
+        geometry = feature.get("geometry") or {}
+        properties = feature.get("properties") or {}
+        if geometry.get("type") == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            continue
+
+        base_id = str(properties.get("id", feature.get("id", n)))
+        ceiling = properties.get("ceiling_m")
+        for k, rings in enumerate(polygons):
+            fences.append(Geofence(
+                fence_id=base_id if len(polygons) == 1 else f"{base_id}_{k}",
+                name=properties.get("name", base_id),
+                polygon=[(point[1], point[0]) for point in rings[0]],
+                fence_type=properties.get("type", default_type),
+                floor_m=float(properties.get("floor_m", 0.0)),
+                ceiling_m=float(ceiling) if ceiling is not None else math.inf,
+                properties=properties,
+            ))
+    return fences
+
+
+def _points_in_rings(lats: np.ndarray, lngs: np.ndarray, rings: np.ndarray) -> np.ndarray:
+    """Even-odd test of point k against padded ring k; rings is (n, vertices, 2) in (lat, lng)"""
+    y1, x1 = rings[:, :-1, 0], rings[:, :-1, 1]
+    y2, x2 = rings[:, 1:, 0], rings[:, 1:, 1]
+    y, x = lats[:, None], lngs[:, None]
+    straddles = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(straddles & (x < crossing_x), axis=1) % 2 == 1
+
+
+def _segments_cross(a: np.ndarray, b: np.ndarray) -> bool:
+    """Whether any edge of ring a properly or collinearly touches any edge of ring b"""
+    p1, p2 = a[:-1, None, :], a[1:, None, :]
+    q1, q2 = b[None, :-1, :], b[None, 1:, :]
+
+    def orient(p, q, r):
+        return np.sign((q[..., 0] - p[..., 0]) * (r[..., 1] - p[..., 1]) -
+                       (q[..., 1] - p[..., 1]) * (r[..., 0] - p[..., 0]))
+
+    o1, o2 = orient(p1, p2, q1), orient(p1, p2, q2)
+    o3, o4 = orient(q1, q2, p1), orient(q1, q2, p2)
+    if np.any((o1 != o2) & (o3 != o4)):
+        return True
+    # Collinear overlaps
+    def on_segment(p, q, r):
+        return ((np.minimum(p[..., 0], q[..., 0]) <= r[..., 0]) & (r[..., 0] <= np.maximum(p[..., 0], q[..., 0])) &
+                (np.minimum(p[..., 1], q[..., 1]) <= r[..., 1]) & (r[..., 1] <= np.maximum(p[..., 1], q[..., 1])))
+    return bool(np.any((o1 == 0) & on_segment(p1, p2, q1)) or np.any((o2 == 0) & on_segment(p1, p2, q2)) or
+                np.any((o3 == 0) & on_segment(q1, q2, p1)) or np.any((o4 == 0) & on_segment(q1, q2, p2)))
+
+
+def _closed(polygon: Sequence[Tuple[float, float]]) -> np.ndarray:
+    ring = np.asarray(polygon, dtype=np.float64)
+    if not np.array_equal(ring[0], ring[-1]):
+        ring = np.vstack([ring, ring[:1]])
+    return ring
+
+
+def polygons_intersect(a: Sequence[Tuple[float, float]], b: Sequence[Tuple[float, float]]) -> bool:
+    """Whether two (lat, lng) polygons overlap or touch"""
+    if SHAPELY_AVAILABLE:
+        return bool(shapely.intersects(shapely.Polygon([(lng, lat) for lat, lng in a]),
+                                       shapely.Polygon([(lng, lat) for lat, lng in b])))
+    ring_a, ring_b = _closed(a), _closed(b)
+    if _points_in_rings(ring_a[:1, 0], ring_a[:1, 1], ring_b[None]).any():
+        return True
+    if _points_in_rings(ring_b[:1, 0], ring_b[:1, 1], ring_a[None]).any():
+        return True
+    return _segments_cross(ring_a, ring_b)
+
+
+class GeofenceIndex:
+    """
+    STR-packed R-tree over geofence polygons
+
+    Uses shapely's STRtree with vectorized predicates when available;
+    otherwise packs polygon bounds with Sort-Tile-Recursive into NumPy
+    levels and runs a padded, vectorized even-odd test on the candidates.
+    """
+
+    def __init__(self, fences: Sequence[Geofence], node_capacity: int = 16):
+        self.fences = list(fences)
+        self.node_capacity = node_capacity
+        self.floor_m = np.array([fence.floor_m for fence in self.fences], dtype=np.float64)
+        self.ceiling_m = np.array([fence.ceiling_m for fence in self.fences], dtype=np.float64)
+        self.fence_types = np.array([fence.fence_type for fence in self.fences], dtype=object)
+
+        self._tree = None
+        self._levels: List[np.ndarray] = []
+        if not self.fences:
+            return
+        if SHAPELY_AVAILABLE:
+            geometries = np.empty(len(self.fences), dtype=object)
+            geometries[:] = [shapely.Polygon([(lng, lat) for lat, lng in fence.polygon]) for fence in self.fences]
+            self._geometries = geometries
+            self._tree = STRtree(geometries, node_capacity=node_capacity)
+        else:
+            self._build_str()
+
+    def __len__(self) -> int:
+        return len(self.fences)
+
+    # ------------------------------------------------------------ NumPy STR
+
+    def _build_str(self):
+        rings = [_closed(fence.polygon) for fence in self.fences]
+        width = max(len(ring) for ring in rings)
+        # Pad with the closing vertex: zero-length edges never straddle
+        self._rings = np.stack([np.vstack([ring, np.repeat(ring[-1:], width - len(ring), axis=0)]) for ring in rings])
+        bounds = np.column_stack([self._rings[..., 0].min(axis=1), self._rings[..., 1].min(axis=1),
+                                  self._rings[..., 0].max(axis=1), self._rings[..., 1].max(axis=1)])
+
+        # Sort-Tile-Recursive: slice by centre longitude, then order by latitude
+        capacity = self.node_capacity
+        leaves = math.ceil(len(bounds) / capacity)
+        slices = max(1, math.ceil(math.sqrt(leaves)))
+        centres = (bounds[:, :2] + bounds[:, 2:]) / 2
+        by_lng = np.argsort(centres[:, 1], kind="stable")
+        slice_size = slices * capacity
+        order = np.concatenate([
+            chunk[np.argsort(centres[chunk, 0], kind="stable")]
+            for chunk in np.array_split(by_lng, math.ceil(len(by_lng) / slice_size))
+        ])
+        self._order = order
+        level = bounds[order]
+        self._levels = [level]
+        while len(level) > capacity:
+            groups = math.ceil(len(level) / capacity)
+            padded = np.full((groups * capacity, 4), np.nan)
+            padded[:len(level)] = level
+            padded = padded.reshape(groups, capacity, 4)
+            level = np.column_stack([np.nanmin(padded[..., 0], axis=1), np.nanmin(padded[..., 1], axis=1),
+                                     np.nanmax(padded[..., 2], axis=1), np.nanmax(padded[..., 3], axis=1)])
+            self._levels.append(level)
+
+    def _str_candidates(self, lats: np.ndarray, lngs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        capacity = self.node_capacity
+        top = self._levels[-1]
+        points = np.repeat(np.arange(len(lats)), len(top))
+        nodes = np.tile(np.arange(len(top)), len(lats))
+        for depth in range(len(self._levels) - 1, -1, -1):
+            box = self._levels[depth][nodes]
+            keep = ((box[:, 0] <= lats[points]) & (lats[points] <= box[:, 2]) &
+                    (box[:, 1] <= lngs[points]) & (lngs[points] <= box[:, 3]))
+            points, nodes = points[keep], nodes[keep]
+            if depth == 0:
+                break
+            children = nodes[:, None] * capacity + np.arange(capacity)
+            points = np.repeat(points, capacity)
+            nodes = children.ravel()
+            valid = nodes < len(self._levels[depth - 1])
+            points, nodes = points[valid], nodes[valid]
+        return points, self._order[nodes]
+
+    # -------------------------------------------------------------- queries
+
+    def query_points(self, lats: Sequence[float], lngs: Sequence[float],
+                     altitudes: Optional[Sequence[float]] = None,
+                     fence_type: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(point index, fence index) pairs for every point inside a fence
+
+        With ``altitudes`` only fences whose floor/ceiling band contains the
+        point's altitude count; ``fence_type`` restricts the fence kind.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        if not self.fences or len(lats) == 0:
+            return empty
+
+        if self._tree is not None:
+            pairs = self._tree.query(shapely.points(lngs, lats), predicate="intersects")
+            points, fences = pairs[0], pairs[1]
+        else:
+            points, fences = self._str_candidates(lats, lngs)
+            inside = np.zeros(len(points), dtype=bool)
+            chunk = max(1, 2_000_000 // self._rings.shape[1])
+            for start in range(0, len(points), chunk):
+                p, f = points[start:start + chunk], fences[start:start + chunk]
+                inside[start:start + chunk] = _points_in_rings(lats[p], lngs[p], self._rings[f])
+            points, fences = points[inside], fences[inside]
+
+        if altitudes is not None:
+            altitudes = np.asarray(altitudes, dtype=np.float64)
+            in_band = (self.floor_m[fences] <= altitudes[points]) & (altitudes[points] <= self.ceiling_m[fences])
+            points, fences = points[in_band], fences[in_band]
+        if fence_type is not None:
+            typed = self.fence_types[fences] == fence_type
+            points, fences = points[typed], fences[typed]
+        return points.astype(np.int64), fences.astype(np.int64)
+
+    def query_polygon(self, polygon: Sequence[Tuple[float, float]]) -> List[Geofence]:
+        """Geofences overlapping a (lat, lng) polygon"""
+        if not self.fences:
+            return []
+        if self._tree is not None:
+            area = shapely.Polygon([(lng, lat) for lat, lng in polygon])
+            hits = self._tree.query(area, predicate="intersects")
+            return [self.fences[i] for i in sorted(hits.tolist())]
+
+        ring = _closed(polygon)
+        lat_min, lng_min = ring.min(axis=0)
+        lat_max, lng_max = ring.max(axis=0)
+        leaves = self._levels[0]
+        overlapping = np.flatnonzero((leaves[:, 0] <= lat_max) & (leaves[:, 2] >= lat_min) &
+                                     (leaves[:, 1] <= lng_max) & (leaves[:, 3] >= lng_min))
+        hits = [int(self._order[i]) for i in overlapping
+                if polygons_intersect(ring, self.fences[self._order[i]].polygon)]
+        return [self.fences[i] for i in sorted(hits)]
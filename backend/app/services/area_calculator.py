@@ -4,7 +4,9 @@ Area calculation service for mission planning.
 
 import logging
 import math
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from .airspace import GeofenceIndex, bounds_to_polygon, polygons_intersect
 
 logger = logging.getLogger(__name__)
 
@@ -40,18 +42,19 @@ class AreaCalculator:
         # For estimation, assume 1km flight distance
         flight_distance_km = 1.0
 
-        # Convert altitude to km
-        altitude_km = drone_altitude / 1000
-
         # Calculate swath width in km
-        fov_radians = math.radians(camera_fov)
-        swath_width_km = 2 * altitude_km * math.tan(fov_radians / 2)
+        swath_width_km = AreaCalculator.calculate_swath_width(drone_altitude, camera_fov) / 1000
 
         # Calculate coverage area
         coverage_area_km2 = swath_width_km * flight_distance_km
 
         return coverage_area_km2
 
+    @staticmethod
+    def calculate_swath_width(drone_altitude, camera_fov: float = 60):
+        """Ground width in metres seen by a nadir camera; altitude may be an array."""
+        return 2 * drone_altitude * math.tan(math.radians(camera_fov) / 2)
+
     @staticmethod
     def calculate_optimal_drone_count(area_km2: float, drone_altitude: float, overlap_percent: float = 20) -> int:
         """Calculate optimal number of drones for area coverage."""
@@ -125,9 +128,18 @@ class AreaCalculator:
         return altitude_map.get(target_resolution, 50)
 
     @staticmethod
-    def validate_search_area(area_bounds: Dict, restrictions: List[Dict] = None) -> List[str]:
-        """Validate search area against restrictions (airspace, terrain, etc.)."""
+    def validate_search_area(area_bounds: Dict, restrictions: List[Dict] = None,
+                             geofences: Optional[GeofenceIndex] = None) -> List[str]:
+        """Validate search area against restrictions (airspace, terrain, etc.).
+
+        Restrictions may give a ``polygon`` of (lat, lng) pairs or ``bounds``;
+        the search area uses its own ``polygon`` when present. ``geofences``
+        adds every indexed no-fly / restricted polygon the area overlaps.
+        """
         warnings = []
+        area_polygon = area_bounds.get("polygon")
+        if area_polygon is None and all(key in area_bounds for key in ("north", "south", "east", "west")):
+            area_polygon = bounds_to_polygon(area_bounds)
 
         # Check for common restrictions
         if restrictions:
@@ -136,13 +148,22 @@ class AreaCalculator:
 
                 if restriction_type == "no_fly_zone":
                     # Check if area overlaps with no-fly zone
-                    if AreaCalculator._areas_overlap(area_bounds, restriction.get("bounds", {})):
+                    if restriction.get("polygon") and area_polygon:
+                        overlaps = polygons_intersect(area_polygon, restriction["polygon"])
+                    else:
+                        overlaps = AreaCalculator._areas_overlap(area_bounds, restriction.get("bounds", {}))
+                    if overlaps:
                         warnings.append(f"Search area overlaps with {restriction.get('name', 'restricted area')}")
 
                 elif restriction_type == "altitude_limit":
                     max_alt = restriction.get("max_altitude", 120)
                     warnings.append(f"Altitude restricted to {max_alt}m in this area")
 
+        if geofences is not None and area_polygon:
+            for fence in geofences.query_polygon(area_polygon):
+                if fence.fence_type in ("no_fly_zone", "restricted"):
+                    warnings.append(f"Search area overlaps with {fence.name}")
+
         # Check area size reasonableness
         area_km2 = area_bounds.get("area_km2", 0)
         if area_km2 > 100:
@@ -0,0 +1,432 @@
+"""
+Command Dispatcher for SAR Mission Commander
+Per-drone priority queues, concurrent dispatch under a fleet-wide rate cap,
+deadlines, acknowledgement tracking with retries and latency metrics
+"""
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Command lifecycle states
+QUEUED = "queued"
+SENDING = "sending"
+AWAITING_ACK = "awaiting_ack"
+ACKED = "acked"
+SUPERSEDED = "superseded"
+EXPIRED = "expired"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+@dataclass
+class CommandRecord:
+    """Dispatcher bookkeeping for one submitted command"""
+    command: Any
+    command_id: str
+    drone_id: str
+    key: Tuple[str, Any]  # (drone_id, command_type): newer commands supersede older ones
+    priority: int
+    seq: int
+    enqueued_at: float
+    deadline: float
+    state: str = QUEUED
+    attempts: int = 0
+    not_before: float = 0.0  # monotonic time a retry may be sent again
+    first_sent_at: Optional[float] = None
+    sent_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        command_type = getattr(self.command, "command_type", None)
+        return {
+            "command_id": self.command_id,
+            "drone_id": self.drone_id,
+            "command_type": getattr(command_type, "value", command_type),
+            "priority": self.priority,
+            "state": self.state,
+            "attempts": self.attempts,
+            "queue_latency_ms": _ms(self.first_sent_at, self.enqueued_at),
+            "ack_latency_ms": _ms(self.finished_at, self.sent_at) if self.state == ACKED else None,
+            "total_latency_ms": _ms(self.finished_at, self.enqueued_at),
+            "error": self.error,
+        }
+
+def _ms(end: Optional[float], start: Optional[float]) -> Optional[float]:
+    if end is None or start is None:
+        return None
+    return round((end - start) * 1000, 3)
+
+class CommandDispatcher:
+    """Dispatches drone commands concurrently, most urgent first.
+
+    Each drone has its own heap ordered by (priority, submission order) and at
+    most one routine command in flight; emergency commands (priority >=
+    emergency_priority) bypass that limit. Across drones, the drone whose
+    next command is most urgent is served first, up to `concurrency` sends at
+    once and `rate_limit` sends per second fleet-wide (emergencies are sent
+    over the cap and delay routine traffic instead). A queued command is
+    superseded by a newer one of the same type for the same drone.
+
+    `sender(command)` returns True when the command went out. With
+    ack_timeout > 0 the command then waits for acknowledge(); an ack timeout
+    or failed send is retried up to max_retries times before the deadline,
+    each retry held back for retry_backoff seconds, doubling per attempt up
+    to retry_backoff_max; the drone's later commands wait behind it.
+    With ack_timeout == 0 a successful send counts as the acknowledgement.
+    """
+
+    def __init__(
+        self,
+        sender: Callable[[Any], Awaitable[bool]],
+        concurrency: int = 64,
+        rate_limit: float = 200.0,
+        burst: Optional[int] = None,
+        ack_timeout: float = 0.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        retry_backoff_max: float = 5.0,
+        default_ttl: float = 30.0,
+        emergency_priority: int = 3,
+        history_size: int = 10000,
+    ):
+        self.sender = sender
+        self.concurrency = max(1, concurrency)
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else max(1, int(rate_limit // 10))
+        self.ack_timeout = ack_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.default_ttl = default_ttl
+        self.emergency_priority = emergency_priority
+
+        self.queues: Dict[str, List[Tuple[int, int, CommandRecord]]] = {}
+        self.records: Dict[str, CommandRecord] = {}  # live commands by ID
+        self.history: "OrderedDict[str, CommandRecord]" = OrderedDict()
+        self.history_size = history_size
+        self._latest: Dict[Tuple[str, Any], CommandRecord] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._ready: List[Tuple[int, int, str]] = []  # (-head priority, seq, drone_id)
+        self._ack_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._backoff_timers: Dict[str, asyncio.TimerHandle] = {}  # by drone_id
+        self._send_tasks: set = set()
+        self._seq = itertools.count()
+        self._work = asyncio.Event()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tokens = float(self.burst)
+        self._tokens_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+        self.queue_latencies: Deque[float] = deque(maxlen=history_size)
+        self.ack_latencies: Deque[float] = deque(maxlen=history_size)
+        self.stats = {
+            "submitted": 0,
+            "sent": 0,
+            "acked": 0,
+            "retried": 0,
+            "superseded": 0,
+            "expired": 0,
+            "failed": 0,
+            "cancelled": 0,
+        }
+
+    async def start(self):
+        """Start the dispatch loop"""
+        if self._task and not self._task.done():
+            return
+        self._work = asyncio.Event()
+        for drone_id in list(self.queues):
+            self._mark_ready(drone_id)  # re-arms backoff timers cancelled by stop()
+        if self._ready:
+            self._work.set()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop dispatching; queued commands stay queued"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._send_tasks):
+            task.cancel()
+        await asyncio.gather(*self._send_tasks, return_exceptions=True)
+        for command_id in list(self._ack_timers):
+            self._ack_timers.pop(command_id).cancel()
+        for drone_id in list(self._backoff_timers):
+            self._backoff_timers.pop(drone_id).cancel()
+
+    def submit(self, command: Any) -> str:
+        """Queue a command and return its command ID"""
+        now = time.monotonic()
+        command_id = getattr(command, "command_id", None) or uuid.uuid4().hex
+        if hasattr(command, "command_id"):
+            command.command_id = command_id
+        drone_id = command.drone_id
+        priority = getattr(command, "priority", 1)
+
+        deadline = getattr(command, "deadline", None)
+        if isinstance(deadline, datetime):
+            deadline = now + (deadline - datetime.utcnow()).total_seconds()
+        elif deadline is None:
+            deadline = now + self.default_ttl
+
+        record = CommandRecord(
+            command=command, command_id=command_id, drone_id=drone_id,
+            key=(drone_id, getattr(command, "command_type", None)), priority=priority,
+            seq=next(self._seq), enqueued_at=now, deadline=deadline,
+        )
+
+        stale = self._latest.get(record.key)
+        if stale is not None and stale.state == QUEUED:
+            self._finish(stale, SUPERSEDED)
+        self._latest[record.key] = record
+        self.records[command_id] = record
+        self.stats["submitted"] += 1
+
+        heapq.heappush(self.queues.setdefault(drone_id, []), (-priority, record.seq, record))
+        self._mark_ready(drone_id)
+        return command_id
+
+    def acknowledge(self, command_id: str, success: bool = True, error: Optional[str] = None) -> bool:
+        """Record the drone's acknowledgement of a sent command"""
+        record = self.records.get(command_id)
+        if record is None or record.state not in (SENDING, AWAITING_ACK):
+            return False
+        timer = self._ack_timers.pop(command_id, None)
+        if timer:
+            timer.cancel()
+        if success:
+            self._finish(record, ACKED)
+        else:
+            self._retry(record, error or "negative acknowledgement")
+        return True
+
+    def cancel(self, command_id: str) -> bool:
+        """Drop a command that has not been sent yet"""
+        record = self.records.get(command_id)
+        if record is None or record.state != QUEUED:
+            return False
+        self._finish(record, CANCELLED)
+        return True
+
+    def cancel_drone(self, drone_id: str) -> int:
+        """Drop every queued command for a drone; returns how many were dropped"""
+        queued = [entry[2] for entry in self.queues.get(drone_id, []) if entry[2].state == QUEUED]
+        for record in queued:
+            self._finish(record, CANCELLED)
+        return len(queued)
+
+    def get_command(self, command_id: str) -> Optional[Dict[str, Any]]:
+        """Status and latencies of a live or recently finished command"""
+        record = self.records.get(command_id) or self.history.get(command_id)
+        return record.to_dict() if record else None
+
+    def pending_commands(self, drone_id: Optional[str] = None) -> List[Any]:
+        """Queued commands in dispatch order, for one drone or the whole fleet"""
+        queues = [self.queues.get(drone_id, [])] if drone_id else self.queues.values()
+        entries = sorted(entry for queue in queues for entry in queue if entry[2].state == QUEUED)
+        return [entry[2].command for entry in entries]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Counters plus enqueue-to-send and send-to-ack latency percentiles"""
+        return {
+            **self.stats,
+            "queued": sum(1 for r in self.records.values() if r.state == QUEUED),
+            "in_flight": sum(self._in_flight.values()),
+            "queue_latency_ms": _percentiles(self.queue_latencies),
+            "ack_latency_ms": _percentiles(self.ack_latencies),
+        }
+
+    def _mark_ready(self, drone_id: str):
+        queue = self._skip_dead(drone_id)
+        if not queue:
+            return
+        priority, _, record = queue[0]
+        if self._in_flight.get(drone_id) and record.priority < self.emergency_priority:
+            return  # picked up again when the in-flight command finishes
+        wait = record.not_before - time.monotonic()
+        if wait > 0:
+            # A retry backing off: the timer marks the drone ready when it is due
+            if drone_id not in self._backoff_timers:
+                self._backoff_timers[drone_id] = asyncio.get_running_loop().call_later(
+                    wait, self._backoff_elapsed, drone_id
+                )
+            return
+        heapq.heappush(self._ready, (priority, record.seq, drone_id))
+        self._work.set()
+
+    def _skip_dead(self, drone_id: str) -> Optional[list]:
+        queue = self.queues.get(drone_id)
+        while queue and queue[0][2].state != QUEUED:
+            heapq.heappop(queue)
+        if queue == []:
+            del self.queues[drone_id]
+            return None
+        return queue
+
+    def _next_record(self) -> Optional[CommandRecord]:
+        now = time.monotonic()
+        while self._ready:
+            _, seq, drone_id = heapq.heappop(self._ready)
+            queue = self._skip_dead(drone_id)
+            if not queue or queue[0][2].seq != seq:
+                continue  # stale entry; the drone's current head has its own entry
+            record = queue[0][2]
+            if self._in_flight.get(drone_id) and record.priority < self.emergency_priority:
+                continue
+            if record.not_before > now:
+                continue  # re-marked by its backoff timer
+            heapq.heappop(queue)
+            if now > record.deadline:
+                self._finish(record, EXPIRED, "deadline passed before dispatch")
+                self._mark_ready(drone_id)
+                continue
+            record.state = SENDING
+            self._in_flight[drone_id] = self._in_flight.get(drone_id, 0) + 1
+            self._mark_ready(drone_id)  # an emergency behind it may go at once
+            return record
+        return None
+
+    async def _take_token(self):
+        if self.rate_limit <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._tokens_at) * self.rate_limit)
+            self._tokens_at = now
+            # Emergencies never wait on the cap; the debt is paid back by routine traffic
+            urgent = self._ready and -self._ready[0][0] >= self.emergency_priority
+            if self._tokens >= 1 or urgent:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate_limit)
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                while not self._ready:
+                    self._work.clear()
+                    await self._work.wait()
+                await self._take_token()
+                record = self._next_record()
+            except BaseException:
+                self._slots.release()
+                raise
+            if record is None:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._send(record))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def _send(self, record: CommandRecord):
+        try:
+            record.attempts += 1
+            record.sent_at = time.monotonic()
+            if record.first_sent_at is None:
+                record.first_sent_at = record.sent_at
+                self.queue_latencies.append(record.sent_at - record.enqueued_at)
+            self.stats["sent"] += 1
+            try:
+                sent = await self.sender(record.command)
+                error = None if sent else "send failed"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                sent, error = False, str(e)
+
+            if record.state != SENDING:
+                return  # acknowledged while the send was still completing
+            if not sent:
+                self._retry(record, error)
+            elif self.ack_timeout > 0:
+                record.state = AWAITING_ACK
+                self._ack_timers[record.command_id] = asyncio.get_running_loop().call_later(
+                    self.ack_timeout, self._ack_timed_out, record.command_id
+                )
+            else:
+                self._finish(record, ACKED)
+        finally:
+            self._slots.release()
+
+    def _ack_timed_out(self, command_id: str):
+        self._ack_timers.pop(command_id, None)
+        record = self.records.get(command_id)
+        if record is not None and record.state == AWAITING_ACK:
+            self._retry(record, "acknowledgement timed out")
+
+    def _retry(self, record: CommandRecord, error: Optional[str]):
+        record.error = error
+        if self._latest.get(record.key) is not record:
+            self._finish(record, SUPERSEDED)
+        elif record.attempts > self.max_retries:
+            self._finish(record, FAILED, error)
+        elif time.monotonic() > record.deadline:
+            self._finish(record, EXPIRED, error)
+        else:
+            backoff = min(self.retry_backoff * 2 ** (record.attempts - 1), self.retry_backoff_max)
+            if time.monotonic() + backoff > record.deadline:
+                self._finish(record, EXPIRED, error)
+                return
+            logger.warning(f"Retrying command {record.command_id} for drone {record.drone_id} "
+                           f"in {backoff:.2f}s: {error}")
+            self.stats["retried"] += 1
+            self._release(record)
+            record.state = QUEUED
+            record.not_before = time.monotonic() + backoff
+            heapq.heappush(self.queues.setdefault(record.drone_id, []), (-record.priority, record.seq, record))
+            self._mark_ready(record.drone_id)
+
+    def _backoff_elapsed(self, drone_id: str):
+        self._backoff_timers.pop(drone_id, None)
+        self._mark_ready(drone_id)
+
+    def _release(self, record: CommandRecord):
+        if record.state in (SENDING, AWAITING_ACK):
+            count = self._in_flight.get(record.drone_id, 0) - 1
+            if count > 0:
+                self._in_flight[record.drone_id] = count
+            else:
+                self._in_flight.pop(record.drone_id, None)
+
+    def _finish(self, record: CommandRecord, state: str, error: Optional[str] = None):
+        self._release(record)
+        record.state = state
+        record.finished_at = time.monotonic()
+        if error:
+            record.error = error
+        if state == ACKED:
+            self.ack_latencies.append(record.finished_at - record.sent_at)
+        elif state in (EXPIRED, FAILED):
+            logger.warning(f"Command {record.command_id} for drone {record.drone_id} {state}: {record.error}")
+        self.stats[state] += 1
+
+        self.records.pop(record.command_id, None)
+        if self._latest.get(record.key) is record:
+            del self._latest[record.key]
+        self.history[record.command_id] = record
+        if len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        self._mark_ready(record.drone_id)
+
+def _percentiles(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50": None, "p99": None, "max": None}
+    values = np.fromiter(samples, dtype=float, count=len(samples)) * 1000
+    p50, p99 = np.percentile(values, [50, 99])
+    return {"p50": round(float(p50), 3), "p99": round(float(p99), 3), "max": round(float(values.max()), 3)}
@@ -0,0 +1,452 @@
+"""
+Coverage grid for SAR Mission Commander
+Rasterizes the search polygon into lazily allocated bit tiles, stamps camera
+footprints from telemetry in vectorized batches and finds uncovered gaps
+"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from scipy import ndimage
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+from .airspace import bounds_to_polygon
+from .area_calculator import AreaCalculator
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111320.0
+MAX_CELLS_PER_CHUNK = 1 << 20
+SLICE_STAMP_CELLS = 1024  # footprints larger than this are OR-ed in per tile, not scattered
+
+
+def polygon_from_search_area(search_area: Any) -> Optional[List[Tuple[float, float]]]:
+    """(lat, lng) ring from a mission's stored search area, or None
+
+    Accepts GeoJSON Polygon geometries and Features ([lng, lat] order), bare
+    ``{"coordinates": [[[lat, lng], ...]]}`` dicts as the coordination engine
+    writes them, bounds dicts, and lists of ``{"lat", "lng"|"lon"}`` points
+    or (lat, lng) pairs.
+    """
+    if not search_area:
+        return None
+    if isinstance(search_area, dict):
+        if search_area.get("type") == "Feature":
+            return polygon_from_search_area(search_area.get("geometry"))
+        if search_area.get("type") == "Polygon":
+            ring = search_area["coordinates"][0]
+            return [(float(point[1]), float(point[0])) for point in ring]
+        if "coordinates" in search_area:
+            return polygon_from_search_area(search_area["coordinates"][0])
+        if all(key in search_area for key in ("north", "south", "east", "west")):
+            return bounds_to_polygon(search_area)
+        return None
+
+    ring = []
+    for point in search_area:
+        if isinstance(point, dict):
+            ring.append((float(point["lat"]), float(point.get("lng", point.get("lon")))))
+        else:
+            ring.append((float(point[0]), float(point[1])))
+    return ring if len(ring) >= 3 else None
+
+
+def position_coordinates(position: Optional[Dict[str, Any]],
+                         default_altitude: Optional[float] = None) -> Optional[Tuple[float, float, Optional[float]]]:
+    """(lat, lng, altitude) of a telemetry position, or None if it has no coordinates
+
+    Drones report ``lat``/``latitude``, ``lon``/``lng``/``longitude`` and
+    ``alt``/``altitude``; a missing altitude is default_altitude.
+    """
+    if not position:
+        return None
+    lat = position.get("lat", position.get("latitude"))
+    lng = position.get("lon", position.get("lng", position.get("longitude")))
+    if lat is None or lng is None:
+        return None
+    altitude = position.get("alt", position.get("altitude"))
+    return lat, lng, default_altitude if altitude is None else altitude
+
+
+def _label(mask: np.ndarray) -> Tuple[np.ndarray, int]:
+    """4-connected component labels of a boolean grid"""
+    if SCIPY_AVAILABLE:
+        return ndimage.label(mask)
+    labels = np.zeros(mask.shape, dtype=np.int32)
+    count = 0
+    for start in zip(*np.nonzero(mask)):
+        if labels[start]:
+            continue
+        count += 1
+        labels[start] = count
+        stack = [start]
+        while stack:
+            row, col = stack.pop()
+            for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if 0 <= r < mask.shape[0] and 0 <= c < mask.shape[1] and mask[r, c] and not labels[r, c]:
+                    labels[r, c] = count
+                    stack.append((r, c))
+    return labels, count
+
+
+class CoverageGrid:
+    """Occupancy grid over a search polygon at ``resolution_m`` per cell.
+
+    Cells are grouped in square tiles of about ``tile_m`` metres. A tile's
+    bits are only allocated once a footprint touches it, and tiles entirely
+    outside the polygon never are, so a 10 cm grid over tens of km² costs
+    memory only where drones have flown. Per-tile polygon and covered cell
+    counts make ``coverage_percent`` O(1) and drive ``find_gaps``.
+
+    Positions are projected onto a local equirectangular plane anchored at
+    the polygon's south-west corner, which is accurate to well under a cell
+    across a search area.
+    """
+
+    def __init__(self, polygon: Sequence[Tuple[float, float]], resolution_m: float = 1.0, tile_m: float = 25.0):
+        ring = np.asarray(polygon, dtype=np.float64)
+        if ring.ndim != 2 or len(ring) < 3:
+            raise ValueError("coverage polygon needs at least 3 (lat, lng) vertices")
+        if resolution_m <= 0:
+            raise ValueError("resolution_m must be positive")
+
+        self.polygon = [tuple(point) for point in ring]
+        self.resolution_m = float(resolution_m)
+        self.origin_lat = float(ring[:, 0].min())
+        self.origin_lng = float(ring[:, 1].min())
+        mid_lat = (ring[:, 0].min() + ring[:, 0].max()) / 2
+        self.m_per_deg_lat = METERS_PER_DEGREE
+        self.m_per_deg_lng = METERS_PER_DEGREE * math.cos(math.radians(mid_lat))
+
+        # Polygon edges in cell units
+        ys, xs = self._to_cells(ring[:, 0], ring[:, 1])
+        if not (ring[0] == ring[-1]).all():
+            ys, xs = np.append(ys, ys[0]), np.append(xs, xs[0])
+        self._edges = np.stack([xs[:-1], ys[:-1], xs[1:], ys[1:]], axis=1)
+        self.rows = max(1, int(math.ceil(ys.max())))
+        self.cols = max(1, int(math.ceil(xs.max())))
+
+        shift = int(round(math.log2(max(tile_m / self.resolution_m, 1.0))))
+        self.tile_shift = min(max(shift, 2), 9)
+        self.tile_size = 1 << self.tile_shift
+        self.tile_rows = -(-self.rows // self.tile_size)
+        self.tile_cols = -(-self.cols // self.tile_size)
+
+        self.tile_area_cells = self._count_polygon_cells()
+        self.tile_covered_cells = np.zeros_like(self.tile_area_cells)
+        self.area_cells = int(self.tile_area_cells.sum())
+        self.covered_cells = 0
+        self.samples_stamped = 0
+
+        self._slots = np.full(self.tile_rows * self.tile_cols, -1, dtype=np.int32)
+        self._covered = np.zeros((0, self.tile_size * self.tile_size), dtype=bool)
+        self._inside = np.zeros_like(self._covered)
+        self._allocated = 0
+        self._templates: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._discs: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_bounds(cls, bounds: Dict[str, float], resolution_m: float = 1.0, tile_m: float = 25.0) -> "CoverageGrid":
+        return cls(bounds_to_polygon(bounds), resolution_m, tile_m)
+
+    @property
+    def cell_area_m2(self) -> float:
+        return self.resolution_m * self.resolution_m
+
+    @property
+    def coverage_percent(self) -> float:
+        """Share of the polygon seen by at least one footprint"""
+        return 100.0 * self.covered_cells / self.area_cells if self.area_cells else 0.0
+
+    def _to_cells(self, lats, lngs) -> Tuple[np.ndarray, np.ndarray]:
+        ys = (np.asarray(lats, dtype=np.float64) - self.origin_lat) * self.m_per_deg_lat / self.resolution_m
+        xs = (np.asarray(lngs, dtype=np.float64) - self.origin_lng) * self.m_per_deg_lng / self.resolution_m
+        return ys, xs
+
+    def _to_latlng(self, ys, xs) -> Tuple[np.ndarray, np.ndarray]:
+        lats = self.origin_lat + np.asarray(ys, dtype=np.float64) * self.resolution_m / self.m_per_deg_lat
+        lngs = self.origin_lng + np.asarray(xs, dtype=np.float64) * self.resolution_m / self.m_per_deg_lng
+        return lats, lngs
+
+    def _row_spans(self, row_start: int, row_stop: int, col_offset: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Inside spans [start, stop) per cell row, in columns relative to col_offset
+
+        A cell is inside when its centre is; each edge crossing toggles at
+        column floor(x + 0.5). Rows are padded to a common number of spans
+        with empty ones.
+        """
+        x1, y1, x2, y2 = self._edges.T
+        yc = np.arange(row_start, row_stop, dtype=np.float64)[:, None] + 0.5
+        straddles = (y1 > yc) != (y2 > yc)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = x1 + (yc - y1) * (x2 - x1) / (y2 - y1)
+        columns = np.where(straddles, np.floor(crossing + 0.5) - col_offset, np.inf)
+        columns = np.sort(np.clip(columns, 0, width), axis=1)
+        if columns.shape[1] % 2:
+            columns = columns[:, :-1]
+        return columns[:, 0::2], columns[:, 1::2]
+
+    def _count_polygon_cells(self) -> np.ndarray:
+        """Polygon cells per tile, from row spans clipped at the tile column boundaries"""
+        counts = np.zeros((self.tile_rows, self.tile_cols), dtype=np.int64)
+        boundaries = np.minimum(np.arange(self.tile_cols + 1) * self.tile_size, self.cols).astype(np.float64)
+        pairs = max(1, len(self._edges) // 2)
+        chunk = max(self.tile_size, (MAX_CELLS_PER_CHUNK // (pairs * len(boundaries))) // self.tile_size * self.tile_size)
+        for row_start in range(0, self.rows, chunk):
+            row_stop = min(row_start + chunk, self.rows)
+            starts, stops = self._row_spans(row_start, row_stop, 0, self.cols)
+            # Inside cells left of each boundary, per row
+            left = (np.clip(boundaries, starts[..., None], stops[..., None]) - starts[..., None]).sum(axis=1)
+            per_row = np.diff(left, axis=1)
+            tile_row = np.arange(row_start, row_stop) >> self.tile_shift
+            np.add.at(counts, tile_row, per_row.astype(np.int64))
+        return counts
+
+    def _tile_mask(self, tile: int) -> np.ndarray:
+        tile_row, tile_col = divmod(tile, self.tile_cols)
+        size = self.tile_size
+        if self.tile_area_cells[tile_row, tile_col] == size * size:
+            return np.ones(size * size, dtype=bool)
+        row_start = tile_row * size
+        row_stop = min(row_start + size, self.rows)
+        starts, stops = self._row_spans(row_start, row_stop, tile_col * size, min(size, self.cols - tile_col * size))
+        columns = np.arange(size)
+        mask = np.zeros((size, size), dtype=bool)
+        mask[:row_stop - row_start] = ((columns >= starts[..., None]) & (columns < stops[..., None])).any(axis=1)
+        return mask.ravel()
+
+    def _allocate(self, tiles: np.ndarray):
+        new = tiles[self._slots[tiles] < 0]
+        if not len(new):
+            return
+        needed = self._allocated + len(new)
+        if needed > len(self._covered):
+            capacity = max(needed, 2 * len(self._covered), 16)
+            covered = np.zeros((capacity, self._covered.shape[1]), dtype=bool)
+            inside = np.zeros_like(covered)
+            covered[:self._allocated] = self._covered[:self._allocated]
+            inside[:self._allocated] = self._inside[:self._allocated]
+            self._covered, self._inside = covered, inside
+        for tile in new:
+            self._inside[self._allocated] = self._tile_mask(int(tile))
+            self._slots[tile] = self._allocated
+            self._allocated += 1
+
+    def _template(self, radius_cells: int) -> Tuple[np.ndarray, np.ndarray]:
+        template = self._templates.get(radius_cells)
+        if template is None:
+            offsets = np.arange(-radius_cells, radius_cells + 1)
+            dy, dx = np.meshgrid(offsets, offsets, indexing="ij")
+            disc = dy * dy + dx * dx <= radius_cells * radius_cells
+            template = self._templates[radius_cells] = (dy[disc].astype(np.int64), dx[disc].astype(np.int64))
+        return template
+
+    def _disc(self, radius_cells: int) -> np.ndarray:
+        disc = self._discs.get(radius_cells)
+        if disc is None:
+            offsets = np.arange(-radius_cells, radius_cells + 1)
+            disc = self._discs[radius_cells] = offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius_cells ** 2
+        return disc
+
+    def stamp(self, lats: Sequence[float], lngs: Sequence[float], radius_m) -> int:
+        """Mark circular footprints of ``radius_m`` (scalar or per sample); returns newly covered polygon cells"""
+        ys, xs = self._to_cells(lats, lngs)
+        radii = np.broadcast_to(np.asarray(radius_m, dtype=np.float64), ys.shape)
+        valid = np.isfinite(ys) & np.isfinite(xs) & np.isfinite(radii) & (radii >= 0)
+        ys, xs, radii = ys[valid], xs[valid], radii[valid]
+        # Drop footprints that cannot reach the grid
+        radius_cells = np.rint(radii / self.resolution_m).astype(np.int64)
+        reach = ((ys + radius_cells >= 0) & (ys - radius_cells < self.rows) &
+                 (xs + radius_cells >= 0) & (xs - radius_cells < self.cols))
+        ys, xs, radius_cells = np.floor(ys[reach]).astype(np.int64), np.floor(xs[reach]).astype(np.int64), radius_cells[reach]
+
+        before = self.covered_cells
+        for radius in np.unique(radius_cells):
+            group = radius_cells == radius
+            if (2 * radius + 1) ** 2 > SLICE_STAMP_CELLS:
+                dy = dx = None
+                step = 4096
+            else:
+                dy, dx = self._template(int(radius))
+                step = max(1, MAX_CELLS_PER_CHUNK // len(dy))
+            group_ys, group_xs = ys[group], xs[group]
+            for start in range(0, len(group_ys), step):
+                self._stamp_chunk(group_ys[start:start + step], group_xs[start:start + step], int(radius), dy, dx)
+        self.samples_stamped += int(valid.sum())
+        return self.covered_cells - before
+
+    def _stamp_chunk(self, cy: np.ndarray, cx: np.ndarray, radius: int,
+                     dy: Optional[np.ndarray], dx: Optional[np.ndarray]):
+        shift, size = self.tile_shift, self.tile_size
+
+        # Tiles under each footprint's bounding box
+        ty0 = np.clip(cy - radius, 0, self.rows - 1) >> shift
+        ty1 = np.clip(cy + radius, 0, self.rows - 1) >> shift
+        tx0 = np.clip(cx - radius, 0, self.cols - 1) >> shift
+        tx1 = np.clip(cx + radius, 0, self.cols - 1) >> shift
+        span = np.arange(int((ty1 - ty0).max(initial=0)) + 1), np.arange(int((tx1 - tx0).max(initial=0)) + 1)
+        tile_y = ty0[:, None, None] + span[0][None, :, None]
+        tile_x = tx0[:, None, None] + span[1][None, None, :]
+        in_box = (tile_y <= ty1[:, None, None]) & (tile_x <= tx1[:, None, None])
+        touched = np.unique((tile_y * self.tile_cols + tile_x)[in_box])
+        touched = touched[self.tile_area_cells.ravel()[touched] > 0]
+        if not len(touched):
+            return
+        self._allocate(touched)
+
+        if dy is None:
+            self._stamp_slices(cy, cx, radius)
+        else:
+            rows = (cy[:, None] + dy).ravel()
+            cols = (cx[:, None] + dx).ravel()
+            on_grid = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+            rows, cols = rows[on_grid], cols[on_grid]
+            slots = self._slots[(rows >> shift) * self.tile_cols + (cols >> shift)].astype(np.int64)
+            keep = slots >= 0
+            positions = slots[keep] * (size * size) + ((rows[keep] & (size - 1)) << shift) + (cols[keep] & (size - 1))
+            self._covered.reshape(-1)[positions] = True
+
+        # Recount the touched tiles instead of de-duplicating overlapping stamps
+        touched_slots = self._slots[touched]
+        counts = np.count_nonzero(self._covered[touched_slots] & self._inside[touched_slots], axis=1)
+        flat_covered = self.tile_covered_cells.reshape(-1)
+        self.covered_cells += int((counts - flat_covered[touched]).sum())
+        flat_covered[touched] = counts
+
+    def _stamp_slices(self, cy: np.ndarray, cx: np.ndarray, radius: int):
+        """OR a disc mask into each tile under each footprint, one 2-D slice per tile"""
+        disc = self._disc(radius)
+        size, shift = self.tile_size, self.tile_shift
+        covered = self._covered.reshape(-1, size, size)
+        for y, x in zip((cy - radius).tolist(), (cx - radius).tolist()):
+            row_start, row_stop = max(y, 0), min(y + 2 * radius + 1, self.rows)
+            col_start, col_stop = max(x, 0), min(x + 2 * radius + 1, self.cols)
+            for tile_row in range(row_start >> shift, ((row_stop - 1) >> shift) + 1):
+                top = max(row_start, tile_row << shift)
+                bottom = min(row_stop, (tile_row + 1) << shift)
+                for tile_col in range(col_start >> shift, ((col_stop - 1) >> shift) + 1):
+                    slot = self._slots[tile_row * self.tile_cols + tile_col]
+                    if slot < 0:
+                        continue
+                    left = max(col_start, tile_col << shift)
+                    right = min(col_stop, (tile_col + 1) << shift)
+                    covered[slot, top - (tile_row << shift):bottom - (tile_row << shift),
+                            left - (tile_col << shift):right - (tile_col << shift)] |= \
+                        disc[top - y:bottom - y, left - x:right - x]
+
+    def stamp_telemetry(self, lats: Sequence[float], lngs: Sequence[float], altitudes_m,
+                        camera_fov: float = 60) -> int:
+        """Stamp nadir camera footprints; the radius is half the swath at each altitude"""
+        altitudes = np.asarray(altitudes_m, dtype=np.float64)
+        return self.stamp(lats, lngs, AreaCalculator.calculate_swath_width(altitudes, camera_fov) / 2)
+
+    def stamp_track(self, lats: Sequence[float], lngs: Sequence[float], radius_m: float) -> int:
+        """Stamp a flown track, filling in samples so consecutive footprints overlap"""
+        ys, xs = self._to_cells(lats, lngs)
+        if len(ys) > 1:
+            spacing = max(radius_m / self.resolution_m, 1.0)
+            lengths = np.hypot(np.diff(ys), np.diff(xs))
+            steps = np.maximum(np.ceil(lengths / spacing).astype(np.int64), 1)
+            segment = np.repeat(np.arange(len(steps)), steps)
+            fraction = (np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)) / np.repeat(steps, steps)
+            ys = np.append(ys[segment] + fraction * np.diff(ys)[segment], ys[-1])
+            xs = np.append(xs[segment] + fraction * np.diff(xs)[segment], xs[-1])
+        lats, lngs = self._to_latlng(ys, xs)
+        return self.stamp(lats, lngs, radius_m)
+
+    def covered_at(self, lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+        """Whether each point's cell has been seen; points off the grid are not"""
+        ys, xs = self._to_cells(lats, lngs)
+        ys, xs = np.floor(ys).astype(np.int64), np.floor(xs).astype(np.int64)
+        result = np.zeros(ys.shape, dtype=bool)
+        on_grid = (ys >= 0) & (ys < self.rows) & (xs >= 0) & (xs < self.cols)
+        ys, xs = ys[on_grid], xs[on_grid]
+        slots = self._slots[(ys >> self.tile_shift) * self.tile_cols + (xs >> self.tile_shift)]
+        allocated = slots >= 0
+        mask = self.tile_size - 1
+        cells = (ys[allocated] & mask) * self.tile_size + (xs[allocated] & mask)
+        hits = np.zeros(len(slots), dtype=bool)
+        hits[allocated] = self._covered[slots[allocated], cells]
+        result[on_grid] = hits
+        return result
+
+    def covered_cells_in(self, bounds: Dict[str, float]) -> int:
+        """Covered cells in the grid tiles overlapping bounds (north/south/east/west)"""
+        (y0, y1), (x0, x1) = self._to_cells([bounds["south"], bounds["north"]], [bounds["west"], bounds["east"]])
+        row0 = max(int(math.floor(y0)) >> self.tile_shift, 0)
+        row1 = min(int(math.floor(y1)) >> self.tile_shift, self.tile_rows - 1)
+        col0 = max(int(math.floor(x0)) >> self.tile_shift, 0)
+        col1 = min(int(math.floor(x1)) >> self.tile_shift, self.tile_cols - 1)
+        if row0 > row1 or col0 > col1:
+            return 0
+        return int(self.tile_covered_cells[row0:row1 + 1, col0:col1 + 1].sum())
+
+    def find_gaps(self, min_uncovered_fraction: float = 0.5, min_area_m2: float = 0.0,
+                  limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Connected uncovered regions, largest first, for re-tasking drones
+
+        A tile joins a gap when at least ``min_uncovered_fraction`` of its
+        polygon cells are uncovered; gaps are 4-connected groups of tiles.
+        """
+        uncovered = self.tile_area_cells - self.tile_covered_cells
+        mask = (self.tile_area_cells > 0) & (uncovered >= min_uncovered_fraction * self.tile_area_cells)
+        labels, count = _label(mask)
+        if not count:
+            return []
+
+        flat = labels.ravel()
+        weights = uncovered.ravel().astype(np.float64)
+        tile_y, tile_x = np.divmod(np.arange(flat.size), self.tile_cols)
+        centre_y = (tile_y + 0.5) * self.tile_size
+        centre_x = (tile_x + 0.5) * self.tile_size
+        cells = np.bincount(flat, weights=weights, minlength=count + 1)
+        polygon_cells = np.bincount(flat, weights=self.tile_area_cells.ravel(), minlength=count + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_y = np.bincount(flat, weights=weights * centre_y, minlength=count + 1) / cells
+            mean_x = np.bincount(flat, weights=weights * centre_x, minlength=count + 1) / cells
+        low_y = np.full(count + 1, np.inf)
+        low_x = np.full(count + 1, np.inf)
+        high_y = np.full(count + 1, -np.inf)
+        high_x = np.full(count + 1, -np.inf)
+        np.minimum.at(low_y, flat, tile_y * self.tile_size)
+        np.minimum.at(low_x, flat, tile_x * self.tile_size)
+        np.maximum.at(high_y, flat, np.minimum((tile_y + 1) * self.tile_size, self.rows))
+        np.maximum.at(high_x, flat, np.minimum((tile_x + 1) * self.tile_size, self.cols))
+
+        centre_lat, centre_lng = self._to_latlng(mean_y, mean_x)
+        south, west = self._to_latlng(low_y, low_x)
+        north, east = self._to_latlng(high_y, high_x)
+        gaps = []
+        for label in range(1, count + 1):
+            area_m2 = cells[label] * self.cell_area_m2
+            if area_m2 < min_area_m2:
+                continue
+            gaps.append({
+                "center": {"lat": float(centre_lat[label]), "lng": float(centre_lng[label])},
+                "bounds": {"north": float(north[label]), "south": float(south[label]),
+                           "east": float(east[label]), "west": float(west[label])},
+                "uncovered_area_m2": float(area_m2),
+                "uncovered_fraction": float(cells[label] / polygon_cells[label]),
+            })
+        gaps.sort(key=lambda gap: gap["uncovered_area_m2"], reverse=True)
+        return gaps[:limit] if limit else gaps
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "resolution_m": self.resolution_m,
+            "rows": self.rows,
+            "cols": self.cols,
+            "tile_size": self.tile_size,
+            "tiles_allocated": self._allocated,
+            "memory_bytes": int(self._covered.nbytes + self._inside.nbytes),
+            "area_m2": self.area_cells * self.cell_area_m2,
+            "covered_m2": self.covered_cells * self.cell_area_m2,
+            "coverage_percent": round(self.coverage_percent, 3),
+            "samples_stamped": self.samples_stamped,
+        }
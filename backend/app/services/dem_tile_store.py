@@ -0,0 +1,421 @@
+"""
+Raster DEM tile store for terrain-aware planning
+Ingests GeoTIFF / ESRI ASCII-grid elevation models into a tiled, memory-mapped
+on-disk format with slope/roughness bands and overview pyramids, and serves
+windows and batched point samples straight from the mapped tiles
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+
+try:
+    import rasterio
+    RASTERIO_AVAILABLE = True
+except ImportError:
+    RASTERIO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BANDS = ("elevation", "slope", "roughness")
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+
+@dataclass
+class DEMLevel:
+    """One pyramid level; level 0 is full resolution"""
+    level: int
+    rows: int
+    cols: int
+    cell_size_deg: float
+    tiles_y: int
+    tiles_x: int
+
+
+@dataclass
+class DEMManifest:
+    """Georeferencing and layout of a tile store (north-up, square pixels in degrees)"""
+    origin_lat: float  # north edge
+    origin_lng: float  # west edge
+    cell_size_deg: float
+    rows: int
+    cols: int
+    tile_size: int
+    levels: List[DEMLevel]
+    version: int = FORMAT_VERSION
+
+    @property
+    def bounds(self) -> Dict[str, float]:
+        return {
+            'north': self.origin_lat,
+            'south': self.origin_lat - self.rows * self.cell_size_deg,
+            'west': self.origin_lng,
+            'east': self.origin_lng + self.cols * self.cell_size_deg,
+        }
+
+
+def _level_layout(rows: int, cols: int, cell_size_deg: float, tile_size: int, min_size: int) -> List[DEMLevel]:
+    levels = []
+    level = 0
+    while True:
+        levels.append(DEMLevel(
+            level=level, rows=rows, cols=cols, cell_size_deg=cell_size_deg,
+            tiles_y=math.ceil(rows / tile_size), tiles_x=math.ceil(cols / tile_size),
+        ))
+        if max(rows, cols) <= min_size:
+            return levels
+        rows, cols = math.ceil(rows / 2), math.ceil(cols / 2)
+        cell_size_deg *= 2
+        level += 1
+
+
+class DEMTileStore:
+    """Tiled float32 DEM with elevation/slope/roughness bands and overviews
+
+    Each tile is a ``tile_size`` x ``tile_size`` ``.npy`` file opened with
+    ``mmap_mode='r'``; the most recently used tiles stay mapped in an LRU.
+    Windows that fall inside one tile are returned as zero-copy views of the
+    mapping; windows spanning tiles are assembled into a new array.
+    """
+
+    def __init__(self, root: str, max_open_tiles: int = 256):
+        self.root = root
+        with open(os.path.join(root, MANIFEST_NAME)) as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported DEM store version: {data.get('version')}")
+        data["levels"] = [DEMLevel(**level) for level in data["levels"]]
+        self.manifest = DEMManifest(**data)
+        self.max_open_tiles = max_open_tiles
+        self._tiles: "OrderedDict[Tuple[int, str, int, int], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.tile_hits = 0
+        self.tile_misses = 0
+
+    # ------------------------------------------------------------------ layout
+
+    @staticmethod
+    def create(
+        root: str,
+        origin_lat: float,
+        origin_lng: float,
+        cell_size_deg: float,
+        rows: int,
+        cols: int,
+        tile_size: int = 512
+    ) -> "DEMTileStore":
+        """Create an empty store (all tiles NaN until written) and return it opened"""
+        os.makedirs(root, exist_ok=True)
+        manifest = DEMManifest(
+            origin_lat=origin_lat, origin_lng=origin_lng, cell_size_deg=cell_size_deg,
+            rows=rows, cols=cols, tile_size=tile_size,
+            levels=_level_layout(rows, cols, cell_size_deg, tile_size, tile_size),
+        )
+        for level in manifest.levels:
+            for band in BANDS:
+                os.makedirs(os.path.join(root, f"L{level.level}", band), exist_ok=True)
+        with open(os.path.join(root, MANIFEST_NAME), "w") as f:
+            json.dump(asdict(manifest), f, indent=2)
+        return DEMTileStore(root)
+
+    def _tile_path(self, level: int, band: str, ty: int, tx: int) -> str:
+        return os.path.join(self.root, f"L{level}", band, f"{ty}_{tx}.npy")
+
+    @property
+    def bounds(self) -> Dict[str, float]:
+        return self.manifest.bounds
+
+    def covers(self, bounds: Dict[str, float]) -> bool:
+        own = self.bounds
+        return (own['south'] <= bounds['south'] and bounds['north'] <= own['north'] and
+                own['west'] <= bounds['west'] and bounds['east'] <= own['east'])
+
+    def level_for_resolution(self, resolution_m: float, latitude: float = 0.0) -> int:
+        """Coarsest pyramid level whose pixels are no larger than ``resolution_m``"""
+        metres_per_deg = 111000 * max(math.cos(math.radians(latitude)), 0.01)
+        chosen = 0
+        for level in self.manifest.levels:
+            if level.cell_size_deg * metres_per_deg <= resolution_m:
+                chosen = level.level
+        return chosen
+
+    # ------------------------------------------------------------------- tiles
+
+    def tile(self, band: str, ty: int, tx: int, level: int = 0) -> Optional[np.ndarray]:
+        """Memory-mapped tile (read-only), or None if it was never written"""
+        key = (level, band, ty, tx)
+        with self._lock:
+            cached = self._tiles.get(key)
+            if cached is not None:
+                self._tiles.move_to_end(key)
+                self.tile_hits += 1
+                return cached
+            self.tile_misses += 1
+        path = self._tile_path(level, band, ty, tx)
+        if not os.path.exists(path):
+            return None
+        mapped = np.load(path, mmap_mode="r")
+        with self._lock:
+            self._tiles[key] = mapped
+            while len(self._tiles) > self.max_open_tiles:
+                self._tiles.popitem(last=False)
+        return mapped
+
+    def write_tile(self, band: str, ty: int, tx: int, data: np.ndarray, level: int = 0):
+        """Write one tile, padding partial edge tiles with NaN"""
+        size = self.manifest.tile_size
+        tile = np.full((size, size), np.nan, dtype=np.float32)
+        tile[:data.shape[0], :data.shape[1]] = data
+        path = self._tile_path(level, band, ty, tx)
+        temp_path = f"{path}.tmp.npy"
+        np.save(temp_path, tile)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._tiles.pop((level, band, ty, tx), None)
+
+    # ----------------------------------------------------------------- windows
+
+    def window(self, band: str, row: int, col: int, rows: int, cols: int, level: int = 0) -> np.ndarray:
+        """Pixel window; a zero-copy view when it lies within a single tile"""
+        size = self.manifest.tile_size
+        ty0, tx0 = row // size, col // size
+        ty1, tx1 = (row + rows - 1) // size, (col + cols - 1) // size
+        if ty0 == ty1 and tx0 == tx1 and row >= 0 and col >= 0:
+            tile = self.tile(band, ty0, tx0, level)
+            if tile is not None:
+                r, c = row - ty0 * size, col - tx0 * size
+                return tile[r:r + rows, c:c + cols]
+
+        out = np.full((rows, cols), np.nan, dtype=np.float32)
+        info = self.manifest.levels[level]
+        for ty in range(max(ty0, 0), min(ty1, info.tiles_y - 1) + 1):
+            for tx in range(max(tx0, 0), min(tx1, info.tiles_x - 1) + 1):
+                tile = self.tile(band, ty, tx, level)
+                if tile is None:
+                    continue
+                r0, r1 = max(row, ty * size), min(row + rows, (ty + 1) * size)
+                c0, c1 = max(col, tx * size), min(col + cols, (tx + 1) * size)
+                out[r0 - row:r1 - row, c0 - col:c1 - col] = tile[r0 - ty * size:r1 - ty * size,
+                                                                 c0 - tx * size:c1 - tx * size]
+        return out
+
+    def window_for_bounds(self, band: str, bounds: Dict[str, float], level: int = 0) -> np.ndarray:
+        info = self.manifest.levels[level]
+        row0 = int(math.floor((self.manifest.origin_lat - bounds['north']) / info.cell_size_deg))
+        row1 = int(math.ceil((self.manifest.origin_lat - bounds['south']) / info.cell_size_deg))
+        col0 = int(math.floor((bounds['west'] - self.manifest.origin_lng) / info.cell_size_deg))
+        col1 = int(math.ceil((bounds['east'] - self.manifest.origin_lng) / info.cell_size_deg))
+        return self.window(band, row0, col0, max(row1 - row0, 1), max(col1 - col0, 1), level)
+
+    # ---------------------------------------------------------------- sampling
+
+    def sample(self, lats: Sequence[float], lngs: Sequence[float], band: str = "elevation",
+               level: int = 0) -> np.ndarray:
+        """Nearest-pixel values for many points; NaN outside the raster"""
+        return self.sample_bands(lats, lngs, (band,), level)[band]
+
+    def sample_bands(self, lats: Sequence[float], lngs: Sequence[float],
+                     bands: Sequence[str] = BANDS, level: int = 0) -> Dict[str, np.ndarray]:
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        info = self.manifest.levels[level]
+        size = self.manifest.tile_size
+        rows = np.floor((self.manifest.origin_lat - lats) / info.cell_size_deg).astype(np.int64)
+        cols = np.floor((lngs - self.manifest.origin_lng) / info.cell_size_deg).astype(np.int64)
+        results = {band: np.full(lats.shape[0], np.nan, dtype=np.float32) for band in bands}
+
+        valid = np.flatnonzero((rows >= 0) & (rows < info.rows) & (cols >= 0) & (cols < info.cols))
+        if valid.size == 0:
+            return results
+
+        r, c = rows[valid], cols[valid]
+        tile_ids = (r // size) * info.tiles_x + c // size
+        lowest = int(tile_ids.min())
+        span = int(tile_ids.max()) - lowest
+        touched = np.flatnonzero(np.bincount(tile_ids - lowest)) + lowest if span < 65536 else None
+        if touched is not None and touched.size <= 16:
+            # A few tiles (typical mission area): one mask per tile beats sorting
+            groups = [(int(tile_id), np.flatnonzero(tile_ids == tile_id)) for tile_id in touched]
+        else:
+            # Visit each touched tile once, reading pixels in file order so page
+            # faults on the mapping hit the kernel's readahead
+            pixel_keys = tile_ids * (size * size) + (r % size) * size + c % size
+            order = np.argsort(pixel_keys)
+            sorted_ids = tile_ids[order]
+            starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+            ends = np.r_[starts[1:], sorted_ids.size]
+            groups = [(int(sorted_ids[a]), order[a:b]) for a, b in zip(starts, ends)]
+
+        for tile_id, positions in groups:
+            members = valid[positions]
+            ty, tx = divmod(tile_id, info.tiles_x)
+            local_rows = r[positions] - ty * size
+            local_cols = c[positions] - tx * size
+            for band in bands:
+                tile = self.tile(band, ty, tx, level)
+                if tile is not None:
+                    results[band][members] = tile[local_rows, local_cols]
+        return results
+
+    # ------------------------------------------------------------ derived data
+
+    def build_derived_bands(self, level: int = 0):
+        """Compute slope (degrees) and roughness (m) tiles from elevation"""
+        info = self.manifest.levels[level]
+        size = self.manifest.tile_size
+        metres_per_deg = 111000.0
+        mid_lat = self.manifest.origin_lat - self.manifest.rows * self.manifest.cell_size_deg / 2
+        dy = info.cell_size_deg * metres_per_deg
+        dx = info.cell_size_deg * metres_per_deg * max(math.cos(math.radians(mid_lat)), 0.01)
+        for ty in range(info.tiles_y):
+            for tx in range(info.tiles_x):
+                if self.tile("elevation", ty, tx, level) is None:
+                    continue
+                # One-pixel halo from neighbouring tiles for edge gradients
+                halo = self.window("elevation", ty * size - 1, tx * size - 1, size + 2, size + 2, level)
+                halo = np.array(halo, dtype=np.float32)
+                centre = halo[1:-1, 1:-1]
+                padded = np.where(np.isnan(halo), np.pad(centre, 1, mode="edge"), halo)
+                grad_y = (padded[2:, 1:-1] - padded[:-2, 1:-1]) / (2 * dy)
+                grad_x = (padded[1:-1, 2:] - padded[1:-1, :-2]) / (2 * dx)
+                slope = np.degrees(np.arctan(np.hypot(grad_x, grad_y)))
+                neighbours = np.stack([
+                    padded[1 + a:padded.shape[0] - 1 + a, 1 + b:padded.shape[1] - 1 + b]
+                    for a in (-1, 0, 1) for b in (-1, 0, 1)
+                ])
+                roughness = neighbours.max(axis=0) - neighbours.min(axis=0)
+                slope[np.isnan(centre)] = np.nan
+                roughness[np.isnan(centre)] = np.nan
+                self.write_tile("slope", ty, tx, slope, level)
+                self.write_tile("roughness", ty, tx, roughness, level)
+
+    def build_overviews(self):
+        """Build each pyramid level from the one below by 2x2 NaN-aware averaging"""
+        size = self.manifest.tile_size
+        for parent in self.manifest.levels[1:]:
+            child = self.manifest.levels[parent.level - 1]
+            for band in BANDS:
+                for ty in range(parent.tiles_y):
+                    for tx in range(parent.tiles_x):
+                        source = self.window(band, ty * size * 2, tx * size * 2, size * 2, size * 2, child.level)
+                        blocks = np.asarray(source).reshape(size, 2, size, 2)
+                        with np.errstate(invalid="ignore"):
+                            counts = np.sum(~np.isnan(blocks), axis=(1, 3))
+                            totals = np.nansum(blocks, axis=(1, 3))
+                            averaged = np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+                        if np.all(np.isnan(averaged)):
+                            continue
+                        self.write_tile(band, ty, tx, averaged.astype(np.float32), parent.level)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "open_tiles": len(self._tiles),
+            "max_open_tiles": self.max_open_tiles,
+            "tile_hits": self.tile_hits,
+            "tile_misses": self.tile_misses,
+        }
+
+
+# ---------------------------------------------------------------------- ingest
+
+def _ingest_row_bands(store: DEMTileStore, row_bands: Iterator[np.ndarray]) -> DEMTileStore:
+    """Write elevation tiles from successive ``tile_size``-row strips, then derive bands"""
+    size = store.manifest.tile_size
+    for ty, strip in enumerate(row_bands):
+        for tx in range(math.ceil(strip.shape[1] / size)):
+            store.write_tile("elevation", ty, tx, strip[:, tx * size:(tx + 1) * size])
+    store.build_derived_bands()
+    store.build_overviews()
+    return store
+
+
+def ingest_array(elevation: np.ndarray, root: str, origin_lat: float, origin_lng: float,
+                 cell_size_deg: float, tile_size: int = 512, nodata: Optional[float] = None) -> DEMTileStore:
+    """Ingest an in-memory elevation grid (row 0 = north edge)"""
+    elevation = np.asarray(elevation, dtype=np.float32)
+    if nodata is not None:
+        elevation = np.where(elevation == nodata, np.nan, elevation)
+    store = DEMTileStore.create(root, origin_lat, origin_lng, cell_size_deg,
+                                elevation.shape[0], elevation.shape[1], tile_size)
+    strips = (elevation[start:start + tile_size] for start in range(0, elevation.shape[0], tile_size))
+    return _ingest_row_bands(store, strips)
+
+
+def ingest_ascii_grid(path: str, root: str, tile_size: int = 512) -> DEMTileStore:
+    """Stream an ESRI ASCII grid (.asc) into a tile store one tile-row strip at a time"""
+    header = {}
+    with open(path) as f:
+        while len(header) < 6:
+            position = f.tell()
+            line = f.readline()
+            parts = line.split()
+            if not parts or not parts[0][0].isalpha():
+                f.seek(position)
+                break
+            header[parts[0].lower()] = float(parts[1])
+
+        rows, cols = int(header["nrows"]), int(header["ncols"])
+        cell_size = header["cellsize"]
+        west = header.get("xllcorner", header.get("xllcenter", 0.0) - cell_size / 2)
+        south = header.get("yllcorner", header.get("yllcenter", 0.0) - cell_size / 2)
+        nodata = header.get("nodata_value")
+        store = DEMTileStore.create(root, south + rows * cell_size, west, cell_size, rows, cols, tile_size)
+
+        def strips():
+            for start in range(0, rows, tile_size):
+                count = min(tile_size, rows - start)
+                strip = np.loadtxt(f, dtype=np.float32, max_rows=count, ndmin=2)
+                if nodata is not None:
+                    strip[strip == nodata] = np.nan
+                yield strip
+
+        return _ingest_row_bands(store, strips())
+
+
+def ingest_geotiff(path: str, root: str, tile_size: int = 512) -> DEMTileStore:
+    """Stream a north-up, geographic (EPSG:4326) GeoTIFF into a tile store"""
+    if not RASTERIO_AVAILABLE:
+        raise RuntimeError("rasterio is required for GeoTIFF ingestion")
+    from rasterio.windows import Window
+
+    with rasterio.open(path) as src:
+        transform = src.transform
+        if transform.b != 0 or transform.d != 0 or abs(transform.a) != abs(transform.e):
+            raise ValueError("Only north-up rasters with square pixels are supported")
+        store = DEMTileStore.create(root, transform.f, transform.c, transform.a,
+                                    src.height, src.width, tile_size)
+        nodata = src.nodata
+
+        def strips():
+            for start in range(0, src.height, tile_size):
+                window = Window(0, start, src.width, min(tile_size, src.height - start))
+                strip = src.read(1, window=window).astype(np.float32)
+                if nodata is not None:
+                    strip[strip == nodata] = np.nan
+                yield strip
+
+        return _ingest_row_bands(store, strips())
+
+
+_default_store: Optional[DEMTileStore] = None
+
+
+def get_dem_store() -> Optional[DEMTileStore]:
+    """Shared store from settings.DEM_STORE_PATH, or None when no DEM is configured"""
+    global _default_store
+    path = settings.DEM_STORE_PATH
+    if not path or not os.path.exists(os.path.join(path, MANIFEST_NAME)):
+        return None
+    if _default_store is None or _default_store.root != path:
+        _default_store = DEMTileStore(path)
+    return _default_store
@@ -9,10 +9,13 @@ import json
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from ..core.config import settings
+from ..core.event_bus import event_bus, DRONE_STATUS, TELEMETRY
 from ..core.database import SessionLocal
 from ..models.drone import Drone, DroneStatus
 from ..models.mission import Mission
 from ..utils.logging import get_logger
+from .command_dispatcher import CommandDispatcher
 
 logger = get_logger(__name__)
 
@@ -33,6 +36,8 @@ class DroneCommand:
     parameters: Optional[Dict] = None
     timestamp: Optional[datetime] = None
     priority: int = 1  # 1=normal, 2=high, 3=emergency
+    deadline: Optional[datetime] = None  # dropped if not sent by then
+    command_id: Optional[str] = None  # assigned when queued
 
 @dataclass
 class TelemetryData:
@@ -54,9 +59,24 @@ class DroneManager:
     def __init__(self):
         self.connected_drones: Dict[str, Dict] = {}
         self.telemetry_history: Dict[str, List[TelemetryData]] = {}
-        self.command_queue: List[DroneCommand] = []
         self.mission_assignments: Dict[str, str] = {}  # drone_id -> mission_id
+        self.dispatcher = CommandDispatcher(
+            self._execute_command,
+            concurrency=settings.COMMAND_DISPATCH_CONCURRENCY,
+            rate_limit=settings.COMMAND_RATE_LIMIT,
+            ack_timeout=settings.COMMAND_ACK_TIMEOUT,
+            max_retries=settings.COMMAND_MAX_RETRIES,
+            retry_backoff=settings.COMMAND_RETRY_BACKOFF,
+            retry_backoff_max=settings.COMMAND_RETRY_BACKOFF_MAX,
+            default_ttl=settings.COMMAND_DEFAULT_TTL,
+        )
         self._running = False
+        self._tasks: List[asyncio.Task] = []
+        
+    @property
+    def command_queue(self) -> List[DroneCommand]:
+        """Queued commands across the fleet in dispatch order"""
+        return self.dispatcher.pending_commands()
         
     async def start(self):
         """Start the drone manager service"""
@@ -64,13 +84,20 @@ class DroneManager:
         logger.info("Drone Manager service started")
         
         # Start background tasks
-        asyncio.create_task(self._process_command_queue())
-        asyncio.create_task(self._monitor_drone_health())
-        asyncio.create_task(self._cleanup_old_telemetry())
+        await self.dispatcher.start()
+        self._tasks = [
+            asyncio.create_task(self._monitor_drone_health()),
+            asyncio.create_task(self._cleanup_old_telemetry()),
+        ]
         
     async def stop(self):
         """Stop the drone manager service"""
         self._running = False
+        await self.dispatcher.stop()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
         logger.info("Drone Manager service stopped")
         
     async def register_drone(self, drone_id: str, capabilities: Dict) -> bool:
@@ -144,6 +171,8 @@ class DroneManager:
             # Store telemetry history
             self.telemetry_history[drone_id].append(telemetry)
             
+            event_bus.publish(TELEMETRY, telemetry, mission_id=self.mission_assignments.get(drone_id), drone_id=drone_id)
+                
             # Keep only last 100 telemetry entries
             if len(self.telemetry_history[drone_id]) > 100:
                 self.telemetry_history[drone_id] = self.telemetry_history[drone_id][-100:]
@@ -169,9 +198,8 @@ class DroneManager:
             if not command.timestamp:
                 command.timestamp = datetime.utcnow()
                 
-            # Add to command queue (sorted by priority)
-            self.command_queue.append(command)
-            self.command_queue.sort(key=lambda x: x.priority, reverse=True)
+            # Per-drone priority queue; replaces a queued command of the same type
+            self.dispatcher.submit(command)
             
             logger.info(f"Command {command.command_type.value} queued for drone {command.drone_id}")
             return True
@@ -180,6 +208,18 @@ class DroneManager:
             logger.error(f"Failed to queue command for drone {command.drone_id}: {e}")
             return False
     
+    def acknowledge_command(self, command_id: str, success: bool = True, error: Optional[str] = None) -> bool:
+        """Record a drone's acknowledgement of a sent command"""
+        return self.dispatcher.acknowledge(command_id, success, error)
+    
+    def get_command_status(self, command_id: str) -> Optional[Dict]:
+        """Get state, attempts and latencies of a command"""
+        return self.dispatcher.get_command(command_id)
+    
+    def get_command_metrics(self) -> Dict:
+        """Get dispatch counters and latency percentiles"""
+        return self.dispatcher.get_metrics()
+    
     async def assign_mission(self, drone_id: str, mission_id: str) -> bool:
         """Assign drone to a mission"""
         try:
@@ -195,7 +235,7 @@ class DroneManager:
                 
             self.mission_assignments[drone_id] = mission_id
             self.connected_drones[drone_id]["current_mission"] = mission_id
-            self.connected_drones[drone_id]["status"] = DroneStatus.MISSION
+            self._set_status(drone_id, DroneStatus.MISSION)
             
             logger.info(f"Drone {drone_id} assigned to mission {mission_id}")
             return True
@@ -212,8 +252,8 @@ class DroneManager:
                 del self.mission_assignments[drone_id]
                 
             if drone_id in self.connected_drones:
+                self._set_status(drone_id, DroneStatus.IDLE)
                 self.connected_drones[drone_id]["current_mission"] = None
-                self.connected_drones[drone_id]["status"] = DroneStatus.IDLE
                 
             logger.info(f"Drone {drone_id} unassigned from mission")
             return True
@@ -247,18 +287,16 @@ class DroneManager:
     async def emergency_stop_all(self) -> bool:
         """Emergency stop all drones"""
         try:
-            emergency_commands = []
             for drone_id in self.connected_drones.keys():
-                emergency_commands.append(DroneCommand(
+                # Nothing queued before the stop may run after it
+                self.dispatcher.cancel_drone(drone_id)
+                self.dispatcher.submit(DroneCommand(
                     drone_id=drone_id,
                     command_type=DroneCommandType.EMERGENCY_STOP,
-                    priority=3  # Highest priority
+                    timestamp=datetime.utcnow(),
+                    priority=3  # Highest priority, ahead of anything queued
                 ))
             
-            # Add all emergency commands to queue
-            self.command_queue.extend(emergency_commands)
-            self.command_queue.sort(key=lambda x: x.priority, reverse=True)
-            
             logger.warning("Emergency stop command sent to all drones")
             return True
             
@@ -266,24 +304,26 @@ class DroneManager:
             logger.error(f"Failed to send emergency stop to all drones: {e}")
             return False
     
-    async def _process_command_queue(self):
-        """Background task to process command queue"""
-        while self._running:
-            try:
-                if self.command_queue:
-                    command = self.command_queue.pop(0)
-                    await self._execute_command(command)
-                    
-                await asyncio.sleep(0.1)  # Process commands every 100ms
-                
-            except Exception as e:
-                logger.error(f"Error processing command queue: {e}")
-                await asyncio.sleep(1)
+    def _set_status(self, drone_id: str, status: DroneStatus):
+        """Set a drone's status and announce changes on the event bus"""
+        drone_data = self.connected_drones[drone_id]
+        previous = drone_data["status"]
+        drone_data["status"] = status
+        if status != previous:
+            event_bus.publish(
+                DRONE_STATUS,
+                {"status": status.value, "previous": previous.value},
+                mission_id=drone_data.get("current_mission"),
+                drone_id=drone_id,
+            )
     
-    async def _execute_command(self, command: DroneCommand):
-        """Execute a drone command"""
+    async def _execute_command(self, command: DroneCommand) -> bool:
+        """Execute a drone command; called by the dispatcher"""
         try:
             drone_id = command.drone_id
+            if drone_id not in self.connected_drones:
+                logger.warning(f"Dropping command {command.command_type.value} for disconnected drone {drone_id}")
+                return False
             
             # In a real implementation, this would send the command to the actual drone
             # For now, we'll simulate the command execution
@@ -291,16 +331,19 @@ class DroneManager:
             
             # Update drone status based on command
             if command.command_type == DroneCommandType.START_MISSION:
-                self.connected_drones[drone_id]["status"] = DroneStatus.MISSION
+                self._set_status(drone_id, DroneStatus.MISSION)
             elif command.command_type == DroneCommandType.RETURN_HOME:
-                self.connected_drones[drone_id]["status"] = DroneStatus.RETURNING
+                self._set_status(drone_id, DroneStatus.RETURNING)
             elif command.command_type == DroneCommandType.LAND:
-                self.connected_drones[drone_id]["status"] = DroneStatus.IDLE
+                self._set_status(drone_id, DroneStatus.IDLE)
             elif command.command_type == DroneCommandType.EMERGENCY_STOP:
-                self.connected_drones[drone_id]["status"] = DroneStatus.ERROR
+                self._set_status(drone_id, DroneStatus.ERROR)
+            
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to execute command {command.command_type.value} for drone {command.drone_id}: {e}")
+            return False
     
     async def _monitor_drone_health(self):
         """Background task to monitor drone health"""
@@ -312,7 +355,7 @@ class DroneManager:
                     last_heartbeat = drone_data.get("last_heartbeat")
                     if last_heartbeat and (current_time - last_heartbeat).seconds > 30:
                         # Drone hasn't sent heartbeat in 30 seconds
-                        drone_data["status"] = DroneStatus.ERROR
+                        self._set_status(drone_id, DroneStatus.ERROR)
                         logger.warning(f"Drone {drone_id} appears to be offline")
                 
                 await asyncio.sleep(10)  # Check every 10 seconds
@@ -0,0 +1,394 @@
+"""
+Evidence storage for SAR Mission Commander
+Streams uploads to disk in chunks off the event loop, hashing as they go,
+into content-addressed objects; uploads can be resumed from their last
+byte, and thumbnails are made in a worker pool
+
+    <root>/objects/ab/<sha256>          stored files, one per distinct content
+    <root>/uploads/<upload id>.part     bytes received so far
+    <root>/uploads/<upload id>.json     what the upload is for
+    <root>/thumbnails/<sha256>.jpg      previews of images and videos
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from ..core.config import settings
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class UploadError(Exception):
+    """An upload request that cannot be applied; status is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class UploadSession:
+    upload_id: str
+    discovery_id: int
+    filename: str
+    content_type: str
+    size: Optional[int] = None  # total bytes, when the client knows them up front
+    offset: int = 0  # bytes received so far
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def complete(self) -> bool:
+        return self.size is not None and self.offset >= self.size
+
+
+@dataclass
+class StoredObject:
+    sha256: str
+    path: str
+    size: int
+    content_type: str
+    deduplicated: bool  # the content was already stored
+
+
+def generate_thumbnail(source: str, target: str, content_type: str, size: int) -> Optional[Dict[str, float]]:
+    """Write a JPEG preview of an image or a video's first second; returns the source's dimensions
+
+    Runs in a worker process, so it takes paths and returns plain values.
+    """
+    frame = None
+    info: Dict[str, float] = {}
+    if content_type.startswith("video/"):
+        if not CV2_AVAILABLE:
+            return None
+        capture = cv2.VideoCapture(source)
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+            frames = capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+            info["duration"] = frames / fps if fps else 0.0
+            capture.set(cv2.CAP_PROP_POS_MSEC, 1000.0)
+            ok, bgr = capture.read()
+            if not ok:
+                capture.set(cv2.CAP_PROP_POS_MSEC, 0.0)
+                ok, bgr = capture.read()
+            if not ok:
+                return None
+        finally:
+            capture.release()
+        if not PIL_AVAILABLE:
+            height, width = bgr.shape[:2]
+            scale = size / max(width, height)
+            cv2.imwrite(target, cv2.resize(bgr, (max(1, int(width * scale)), max(1, int(height * scale)))))
+            info.update(width=width, height=height)
+            return info
+        frame = Image.fromarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+    elif content_type.startswith("image/"):
+        if not PIL_AVAILABLE:
+            return None
+        frame = Image.open(source)
+        frame.draft("RGB", (size, size))  # JPEGs decode straight at a reduced scale
+    else:
+        return None
+
+    info.setdefault("width", frame.width)
+    info.setdefault("height", frame.height)
+    frame = frame.convert("RGB")
+    frame.thumbnail((size, size))
+    temp_path = f"{target}.tmp"
+    frame.save(temp_path, "JPEG", quality=80)
+    os.replace(temp_path, target)
+    return info
+
+
+class EvidenceStore:
+    """Content-addressed evidence files with resumable, streamed uploads
+
+    Each upload keeps at most chunk_size bytes in memory: chunks from the
+    request are buffered up to that size, then written and hashed in a
+    worker thread while the next ones wait in the socket, so many large
+    uploads neither fill memory nor stall the event loop.
+    """
+
+    def __init__(self, root: str, chunk_size: int = 1 << 20, max_upload_bytes: int = 20 << 30,
+                 thumbnail_workers: int = 2, thumbnail_size: int = 320):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.max_upload_bytes = max_upload_bytes
+        self.thumbnail_workers = thumbnail_workers
+        self.thumbnail_size = thumbnail_size
+        self._hashers: Dict[str, "hashlib._Hash"] = {}  # running digests of open uploads
+        self._locks: Dict[str, asyncio.Lock] = {}  # uploads a request is writing to right now
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._thumbnail_tasks: set = set()
+        self._expiry_task: Optional[asyncio.Task] = None
+        self.stats = {'uploads': 0, 'bytes': 0, 'deduplicated': 0, 'resumed': 0, 'thumbnails': 0}
+        for directory in ("objects", "uploads", "thumbnails"):
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    # ------------------------------------------------------------------ paths
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    def thumbnail_path(self, sha256: str) -> str:
+        return os.path.join(self.root, "thumbnails", f"{sha256}.jpg")
+
+    def _upload_path(self, upload_id: str, suffix: str) -> str:
+        return os.path.join(self.root, "uploads", f"{upload_id}.{suffix}")
+
+    # ---------------------------------------------------------------- uploads
+
+    def create_upload(self, discovery_id: int, filename: str, content_type: Optional[str],
+                      size: Optional[int] = None) -> UploadSession:
+        if size is not None and (size < 0 or size > self.max_upload_bytes):
+            raise UploadError(f"Uploads are limited to {self.max_upload_bytes} bytes", 413)
+        session = UploadSession(uuid.uuid4().hex, discovery_id, os.path.basename(filename or "evidence"),
+                                content_type or "application/octet-stream", size)
+        open(self._upload_path(session.upload_id, "part"), "wb").close()
+        with open(self._upload_path(session.upload_id, "json"), "w") as f:
+            json.dump(asdict(session), f)
+        self._hashers[session.upload_id] = hashlib.sha256()
+        return session
+
+    def get_upload(self, upload_id: str) -> Optional[UploadSession]:
+        """An open upload, with its offset as far as bytes actually reached the disk"""
+        if not upload_id.isalnum():
+            return None
+        try:
+            with open(self._upload_path(upload_id, "json")) as f:
+                session = UploadSession(**json.load(f))
+            session.offset = os.path.getsize(self._upload_path(upload_id, "part"))
+        except (OSError, ValueError, TypeError):
+            return None
+        return session
+
+    async def append(self, session: UploadSession, start: int, chunks: AsyncIterator[bytes]) -> UploadSession:
+        """Write a request body at byte ``start`` of the upload, which must be where it left off"""
+        async with self._writing(session.upload_id):
+            return await self._append(session, start, chunks)
+
+    @asynccontextmanager
+    async def _writing(self, upload_id: str):
+        """Hold an upload for one request; expiry leaves held uploads alone"""
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        if lock.locked():
+            raise UploadError("Another request is writing to this upload", 409)
+        try:
+            async with lock:
+                yield
+        finally:
+            # A second writer is turned away rather than queued, so the lock goes with the request
+            self._locks.pop(upload_id, None)
+
+    async def _append(self, session: UploadSession, start: int, chunks: AsyncIterator[bytes]) -> UploadSession:
+        session.offset = os.path.getsize(self._upload_path(session.upload_id, "part"))
+        if start != session.offset:
+            raise UploadError(f"Upload is at byte {session.offset}, not {start}", 409)
+        hasher = self._hashers.get(session.upload_id)
+        if hasher is None:
+            # Resumed after a restart: rebuild the digest from the bytes on disk
+            hasher = await asyncio.to_thread(self._rehash, session.upload_id)
+            self._hashers[session.upload_id] = hasher
+            self.stats['resumed'] += 1
+        limit = session.size if session.size is not None else self.max_upload_bytes
+        with open(self._upload_path(session.upload_id, "part"), "ab") as f:
+            buffer = bytearray()
+            async for chunk in chunks:
+                if session.offset + len(buffer) + len(chunk) > limit:
+                    await asyncio.to_thread(self._write, f, hasher, bytes(buffer))
+                    session.offset += len(buffer)
+                    raise UploadError(f"Upload is larger than {limit} bytes", 413)
+                buffer += chunk
+                if len(buffer) >= self.chunk_size:
+                    data, buffer = bytes(buffer), bytearray()
+                    await asyncio.to_thread(self._write, f, hasher, data)
+                    session.offset += len(data)
+            if buffer:
+                await asyncio.to_thread(self._write, f, hasher, bytes(buffer))
+                session.offset += len(buffer)
+        return session
+
+    @staticmethod
+    def _write(f, hasher, data: bytes):
+        f.write(data)
+        f.flush()
+        hasher.update(data)
+
+    def _rehash(self, upload_id: str):
+        hasher = hashlib.sha256()
+        with open(self._upload_path(upload_id, "part"), "rb") as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    return hasher
+                hasher.update(data)
+
+    async def finish(self, session: UploadSession) -> StoredObject:
+        """Move a received upload into the object store; identical content is kept once"""
+        if session.size is not None and session.offset != session.size:
+            raise UploadError(f"Upload has {session.offset} of {session.size} bytes", 409)
+        async with self._writing(session.upload_id):
+            hasher = self._hashers.pop(session.upload_id, None)
+            if hasher is None:
+                hasher = await asyncio.to_thread(self._rehash, session.upload_id)
+            sha256 = hasher.hexdigest()
+            deduplicated = await asyncio.to_thread(self._commit, session.upload_id, sha256)
+        self.stats['uploads'] += 1
+        self.stats['bytes'] += session.offset
+        self.stats['deduplicated'] += int(deduplicated)
+        return StoredObject(sha256, self.object_path(sha256), session.offset, session.content_type, deduplicated)
+
+    def _commit(self, upload_id: str, sha256: str) -> bool:
+        part = self._upload_path(upload_id, "part")
+        target = self.object_path(sha256)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            os.remove(part)
+            deduplicated = True
+        else:
+            with open(part, "rb+") as f:
+                os.fsync(f.fileno())
+            os.replace(part, target)
+            deduplicated = False
+        os.remove(self._upload_path(upload_id, "json"))
+        return deduplicated
+
+    def abort(self, upload_id: str):
+        self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+        for suffix in ("part", "json"):
+            try:
+                os.remove(self._upload_path(upload_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    async def store_stream(self, discovery_id: int, filename: str, content_type: Optional[str],
+                           chunks: AsyncIterator[bytes]) -> StoredObject:
+        """Create, fill and finish an upload from one stream"""
+        session = self.create_upload(discovery_id, filename, content_type)
+        try:
+            await self.append(session, 0, chunks)
+            return await self.finish(session)
+        except BaseException:
+            self.abort(session.upload_id)
+            raise
+
+    def expire_uploads(self, max_age_s: float) -> int:
+        """Remove uploads nobody has resumed for max_age_s seconds"""
+        expired = 0
+        cutoff = time.time() - max_age_s
+        for name in os.listdir(os.path.join(self.root, "uploads")):
+            upload_id, suffix = os.path.splitext(name)
+            if upload_id in self._locks or (suffix == ".part" and os.path.exists(self._upload_path(upload_id, "json"))):
+                continue
+            try:
+                # An upload's age is its last write; a lone file was left half-created by a crash
+                last_write = os.path.getmtime(self._upload_path(upload_id, "part"))
+            except FileNotFoundError:
+                last_write = 0.0
+            if last_write < cutoff:
+                self.abort(upload_id)
+                expired += 1
+        # Digests of uploads whose files are gone (finished or removed elsewhere)
+        for upload_id in list(self._hashers):
+            if upload_id not in self._locks and not os.path.exists(self._upload_path(upload_id, "json")):
+                self._hashers.pop(upload_id, None)
+        return expired
+
+    def start_expiry(self, max_age_s: float, interval_s: float):
+        """Run expire_uploads now and then every interval_s seconds until close()"""
+        if self._expiry_task is None:
+            self._expiry_task = asyncio.get_running_loop().create_task(self._expire_periodically(max_age_s, interval_s))
+
+    async def _expire_periodically(self, max_age_s: float, interval_s: float):
+        while True:
+            try:
+                expired = await asyncio.to_thread(self.expire_uploads, max_age_s)
+                if expired:
+                    logger.info(f"Removed {expired} abandoned evidence uploads")
+            except Exception as e:
+                logger.error(f"Evidence upload expiry failed: {e}")
+            await asyncio.sleep(interval_s)
+
+    # ------------------------------------------------------------- thumbnails
+
+    def schedule_thumbnail(self, stored: StoredObject,
+                           on_done: Optional[Callable[[Optional[str], Dict[str, float]], None]] = None):
+        """Make a preview in the worker pool; on_done(thumbnail path or None, info) runs in a thread after"""
+        task = asyncio.get_running_loop().create_task(self._thumbnail(stored, on_done))
+        self._thumbnail_tasks.add(task)
+        task.add_done_callback(self._thumbnail_tasks.discard)
+        return task
+
+    async def _thumbnail(self, stored: StoredObject, on_done):
+        target = self.thumbnail_path(stored.sha256)
+        info: Dict[str, float] = {}
+        try:
+            if not os.path.exists(target):
+                args = (stored.path, target, stored.content_type, self.thumbnail_size)
+                if self.thumbnail_workers > 0:
+                    if self._pool is None:
+                        self._pool = ProcessPoolExecutor(max_workers=self.thumbnail_workers,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+                    info = await asyncio.get_running_loop().run_in_executor(self._pool, generate_thumbnail, *args)
+                else:
+                    info = await asyncio.to_thread(generate_thumbnail, *args)
+                if info is not None:
+                    self.stats['thumbnails'] += 1
+            path = target if os.path.exists(target) else None
+            if on_done:
+                await asyncio.to_thread(on_done, path, info or {})
+        except Exception as e:
+            logger.error(f"Thumbnail for {stored.sha256} failed: {e}")
+
+    async def close(self):
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            await asyncio.gather(self._expiry_task, return_exceptions=True)
+            self._expiry_task = None
+        if self._thumbnail_tasks:
+            await asyncio.gather(*self._thumbnail_tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, 'open_uploads': len(os.listdir(os.path.join(self.root, "uploads"))) // 2}
+
+
+_evidence_store: Optional[EvidenceStore] = None
+
+
+def get_evidence_store() -> EvidenceStore:
+    """The process-wide store, created on first use so importing this module touches no disk"""
+    global _evidence_store
+    if _evidence_store is None:
+        _evidence_store = EvidenceStore(
+            settings.EVIDENCE_STORE_PATH,
+            chunk_size=settings.EVIDENCE_CHUNK_SIZE,
+            max_upload_bytes=settings.EVIDENCE_MAX_UPLOAD_BYTES,
+            thumbnail_workers=settings.EVIDENCE_THUMBNAIL_WORKERS,
+            thumbnail_size=settings.EVIDENCE_THUMBNAIL_SIZE,
+        )
+    return _evidence_store
@@ -0,0 +1,291 @@
+"""
+Columnar feature store for SAR Mission Commander
+Learning features partitioned by metric: each partition is a set of
+append-only column files read back as memory-mapped slices, and the
+manifest keeps row counts and the high-watermarks collection resumes from
+
+    <root>/manifest.json                row counts, columns and watermarks
+    <root>/<metric>/features.f64        (rows, len(columns)) float64
+    <root>/<metric>/output.f64          target value per row
+    <root>/<metric>/timestamp.f64       epoch seconds the row describes
+    <root>/<metric>/mission.i64         source mission row id
+    <root>/<metric>/drone.i64           source drone row id, -1 for none
+    <root>/<metric>/valid.u1            0 once a newer row for the mission replaced it
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+KEY_COLUMNS = {
+    "output": np.float64,
+    "timestamp": np.float64,
+    "mission": np.int64,
+    "drone": np.int64,
+    "valid": np.uint8,
+}
+
+
+@dataclass
+class FeatureSlice:
+    """Rows of one partition; memory-mapped views unless replaced rows had to be skipped"""
+    columns: List[str]
+    features: np.ndarray  # (rows, len(columns))
+    outputs: np.ndarray
+    timestamps: np.ndarray
+    missions: np.ndarray
+    drones: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.outputs)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.features[:, self.columns.index(name)]
+
+
+class FeatureStore:
+    """Append-only columnar store of learning features, one partition per metric
+
+    Rows for a mission are written again whenever the mission changes; the
+    previous ones are marked invalid rather than rewritten, so appends never
+    move existing data. Row counts only advance in the manifest on commit,
+    and anything past them (an interrupted append) is truncated on open.
+    """
+
+    def __init__(self, root: str, schemas: Dict[str, Sequence[str]]):
+        self.root = root
+        self.schemas = {metric: list(columns) for metric, columns in schemas.items()}
+        self._lock = threading.RLock()
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._maps: Dict[tuple, np.ndarray] = {}
+        self._blocks: Dict[str, Dict[int, tuple]] = {}  # metric -> mission -> (first row, rows) still valid
+
+    # ---------------------------------------------------------------- manifest
+
+    def _path(self, metric: str, column: str) -> str:
+        suffix = {np.float64: "f64", np.int64: "i64", np.uint8: "u1"}[KEY_COLUMNS.get(column, np.float64)]
+        return os.path.join(self.root, metric, f"{column}.{suffix}")
+
+    def _load(self) -> Dict[str, Any]:
+        if self._manifest is not None:
+            return self._manifest
+        path = os.path.join(self.root, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+            if manifest.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported feature store version: {manifest.get('version')}")
+        else:
+            manifest = {"version": FORMAT_VERSION, "partitions": {}, "watermarks": {}}
+        for metric, columns in self.schemas.items():
+            partition = manifest["partitions"].setdefault(metric, {"columns": columns, "rows": 0, "valid_rows": 0})
+            if partition["columns"] != columns:
+                raise ValueError(f"Feature columns for {metric} changed; reset the store")
+            os.makedirs(os.path.join(self.root, metric), exist_ok=True)
+            # Drop whatever an interrupted append left past the committed rows
+            for column in ["features", *KEY_COLUMNS]:
+                file_path = self._path(metric, column)
+                width = len(columns) if column == "features" else 1
+                size = partition["rows"] * width * np.dtype(KEY_COLUMNS.get(column, np.float64)).itemsize
+                with open(file_path, "ab") as f:
+                    if f.tell() != size:
+                        f.truncate(size)
+            if partition["rows"]:
+                valid = np.fromfile(self._path(metric, "valid"), dtype=np.uint8)
+                partition["valid_rows"] = int(np.count_nonzero(valid))
+        self._manifest = manifest
+        return manifest
+
+    def _write_manifest(self):
+        path = os.path.join(self.root, MANIFEST_NAME)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(temp_path, path)
+
+    @property
+    def watermarks(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._load()["watermarks"])
+
+    def rows(self, metric: str, valid_only: bool = True) -> int:
+        with self._lock:
+            partition = self._load()["partitions"][metric]
+            return partition["valid_rows"] if valid_only else partition["rows"]
+
+    # ------------------------------------------------------------------ writes
+
+    def _map(self, metric: str, column: str, mode: str = "r") -> np.ndarray:
+        key = (metric, column, mode)
+        mapped = self._maps.get(key)
+        if mapped is None:
+            partition = self._load()["partitions"][metric]
+            rows = partition["rows"]
+            dtype = KEY_COLUMNS.get(column, np.float64)
+            shape = (rows, len(partition["columns"])) if column == "features" else (rows,)
+            if rows == 0:
+                mapped = np.zeros(shape, dtype=dtype)
+            else:
+                mapped = np.memmap(self._path(metric, column), dtype=dtype, mode=mode, shape=shape)
+            self._maps[key] = mapped
+        return mapped
+
+    def _mission_blocks(self, metric: str) -> Dict[int, tuple]:
+        """Where each mission's valid rows are; they are contiguous since a mission is written in one append"""
+        blocks = self._blocks.get(metric)
+        if blocks is None:
+            rows = np.flatnonzero(self._map(metric, "valid"))
+            missions = np.asarray(self._map(metric, "mission")[rows])
+            keys, first, counts = np.unique(missions, return_index=True, return_counts=True)
+            blocks = dict(zip(keys.tolist(), zip(rows[first].tolist(), counts.tolist())))
+            self._blocks[metric] = blocks
+        return blocks
+
+    def append(self, metric: str, features: np.ndarray, outputs: Sequence[float], timestamps: Sequence[float],
+               missions: Sequence[int], drones: Optional[Sequence[int]] = None,
+               replaces: Optional[Sequence[int]] = None):
+        """Append rows to a partition, written together for each mission; durable once committed
+
+        Earlier rows of the missions in ``replaces`` are marked invalid first,
+        so a changed mission is never counted twice even if it now has no rows.
+        """
+        with self._lock:
+            partition = self._load()["partitions"][metric]
+            features = np.asarray(features, dtype=np.float64).reshape(-1, len(partition["columns"]))
+            count = len(features)
+            missions = np.asarray(missions, dtype=np.int64)
+            blocks = self._mission_blocks(metric)
+            if replaces is not None and partition["rows"]:
+                stale = [blocks.pop(mission) for mission in replaces if mission in blocks]
+                if stale:
+                    valid = self._map(metric, "valid", "r+")
+                    for first, rows in stale:
+                        valid[first:first + rows] = 0
+                    valid.flush()
+                    partition["valid_rows"] -= sum(rows for _, rows in stale)
+            if not count:
+                return
+            keys, first, counts = np.unique(missions, return_index=True, return_counts=True)
+            blocks.update(zip(keys.tolist(), zip((first + partition["rows"]).tolist(), counts.tolist())))
+            columns = {
+                "features": features,
+                "output": np.asarray(outputs, dtype=np.float64),
+                "timestamp": np.asarray(timestamps, dtype=np.float64),
+                "mission": missions,
+                "drone": np.full(count, -1, dtype=np.int64) if drones is None else np.asarray(drones, dtype=np.int64),
+                "valid": np.ones(count, dtype=np.uint8),
+            }
+            for column, values in columns.items():
+                with open(self._path(metric, column), "ab") as f:
+                    f.write(np.ascontiguousarray(values, dtype=KEY_COLUMNS.get(column, np.float64)).tobytes())
+            partition["rows"] += count
+            partition["valid_rows"] += count
+            self._drop_maps(metric)
+
+    def commit(self, watermarks: Optional[Dict[str, Any]] = None):
+        """Publish appended rows and advance watermarks together"""
+        with self._lock:
+            manifest = self._load()
+            if watermarks:
+                manifest["watermarks"].update(watermarks)
+            self._write_manifest()
+
+    def _drop_maps(self, metric: str):
+        for key in [key for key in self._maps if key[0] == metric]:
+            del self._maps[key]
+
+    # ------------------------------------------------------------------- reads
+
+    def slice(self, metric: str, last: Optional[int] = None) -> FeatureSlice:
+        """The last ``last`` valid rows of a partition (all of them by default)
+
+        Trailing windows with no replaced rows are zero-copy views of the
+        column files; otherwise only the valid rows of the window are copied.
+        """
+        with self._lock:
+            columns = self._load()["partitions"][metric]["columns"]
+            valid = self._map(metric, "valid")
+            start = 0
+            if last is not None:
+                # Walk back until the window holds enough valid rows
+                start, need = len(valid), last
+                step = max(1024, 2 * last)
+                while start > 0 and need > 0:
+                    lo = max(0, start - step)
+                    need -= int(valid[lo:start].sum())
+                    start = lo
+                    step *= 2
+            window = slice(start, len(valid))
+            keep = np.flatnonzero(valid[window]) + start
+            if last is not None and len(keep) > last:
+                keep = keep[-last:]
+            arrays = [self._map(metric, column) for column in ("features", "output", "timestamp", "mission", "drone")]
+            if len(keep) and keep[-1] - keep[0] + 1 == len(keep):
+                rows = slice(int(keep[0]), int(keep[-1]) + 1)
+                arrays = [array[rows] for array in arrays]
+            else:
+                arrays = [array[keep] for array in arrays]
+            return FeatureSlice(columns, *arrays)
+
+    def count_since(self, metric: str, timestamp: float) -> int:
+        """Valid rows whose timestamp is at or after ``timestamp``"""
+        with self._lock:
+            if not self._load()["partitions"][metric]["rows"]:
+                return 0
+            recent = self._map(metric, "timestamp") >= timestamp
+            return int(np.count_nonzero(recent & self._map(metric, "valid").astype(bool)))
+
+    def export_parquet(self, metric: str, path: str) -> int:
+        """Write a partition's valid rows to a Parquet file; returns the row count"""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Parquet export")
+        data = self.slice(metric)
+        table = pa.table({
+            **{name: np.asarray(data.features[:, i]) for i, name in enumerate(data.columns)},
+            "output": np.asarray(data.outputs),
+            "timestamp": np.asarray(data.timestamps),
+            "mission": np.asarray(data.missions),
+            "drone": np.asarray(data.drones),
+        })
+        pq.write_table(table, path)
+        return len(data)
+
+    def reset(self):
+        """Delete every row and watermark"""
+        with self._lock:
+            self._maps.clear()
+            self._blocks.clear()
+            self._load()
+            for metric, columns in self.schemas.items():
+                for column in ["features", *KEY_COLUMNS]:
+                    with open(self._path(metric, column), "wb"):
+                        pass
+                self._manifest["partitions"][metric] = {"columns": columns, "rows": 0, "valid_rows": 0}
+            self._manifest["watermarks"] = {}
+            self._write_manifest()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            manifest = self._load()
+            return {
+                "root": self.root,
+                "partitions": {metric: {"rows": p["rows"], "valid_rows": p["valid_rows"]}
+                               for metric, p in manifest["partitions"].items()},
+                "watermarks": dict(manifest["watermarks"]),
+            }
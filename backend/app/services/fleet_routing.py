@@ -0,0 +1,550 @@
+"""
+Fleet routing for SAR Mission Commander
+Splits search waypoints among drones as a min-makespan, multi-depot routing
+problem with battery-limited sorties: a space-filling-curve tour is split by
+bisection on the makespan, then improved with 2-opt and re-splitting until
+the time budget runs out. Routes already being flown are repaired in place
+when drones drop out or join and when waypoints appear or disappear
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+from .coverage_grid import METERS_PER_DEGREE
+
+logger = logging.getLogger(__name__)
+
+HILBERT_BITS = 16
+TWO_OPT_NEIGHBOURS = 8
+SORTIE_WINDOW = 256  # waypoints evaluated at once when looking for the end of a sortie
+REPAIR_SLACK = 0.1  # how much later than the rest of the fleet a repaired window may finish before it grows
+
+
+@dataclass
+class RoutingDrone:
+    drone_id: str
+    lat: float  # launch and battery swap point
+    lng: float
+    speed_mps: float
+    endurance_s: float  # usable flight time on a full battery, reserve excluded
+    first_endurance_s: Optional[float] = None  # what is left in the battery fitted now; defaults to endurance_s
+    dwell_s: float = 0.0  # imaging time at each waypoint
+    turnaround_s: float = 0.0  # battery swap between sorties
+    start_lat: Optional[float] = None  # where a drone already in the air is now; defaults to its base
+    start_lng: Optional[float] = None
+
+
+@dataclass
+class DroneRoute:
+    drone_id: str
+    sorties: List[np.ndarray]  # waypoint indices flown on each battery, in order
+    sortie_times_s: List[float]
+    duration_s: float  # including depot legs and battery swaps
+    distance_m: float
+
+    @property
+    def order(self) -> np.ndarray:
+        return np.concatenate(self.sorties) if self.sorties else np.zeros(0, dtype=np.int64)
+
+    def to_dict(self) -> Dict:
+        return {
+            "drone_id": self.drone_id,
+            "sorties": [sortie.tolist() for sortie in self.sorties],
+            "sortie_times_s": self.sortie_times_s,
+            "duration_s": self.duration_s,
+            "distance_m": self.distance_m,
+        }
+
+
+@dataclass
+class RoutingResult:
+    routes: List[DroneRoute]  # one per drone, in the order the drones were given
+    makespan_s: float
+    construction_makespan_s: float
+    unassigned: np.ndarray  # waypoints no drone can reach and return from on one battery
+    solve_time_s: float
+    iterations: int = 0
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+def _hilbert_index(x: np.ndarray, y: np.ndarray, bits: int = HILBERT_BITS) -> np.ndarray:
+    """Position of integer grid points along a Hilbert curve"""
+    x, y = x.astype(np.int64), y.astype(np.int64)
+    d = np.zeros(len(x), dtype=np.int64)
+    side = 1 << bits
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry
+        swap_x = flip & rx
+        x = np.where(swap_x, side - 1 - x, x)
+        y = np.where(swap_x, side - 1 - y, y)
+        x, y = np.where(flip, y, x), np.where(flip, x, y)
+        s >>= 1
+    return d
+
+
+class FleetRouter:
+    """Min-makespan routes for a heterogeneous fleet over a fixed set of waypoints
+
+    Each drone starts at its own base, flies at its own speed, spends dwell_s
+    at every waypoint and goes back to base for a new battery whenever the
+    next waypoint and the flight home would not fit in what is left.
+    """
+
+    def __init__(self, lats: Sequence[float], lngs: Sequence[float]):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lngs = np.asarray(lngs, dtype=np.float64)
+        self.lat0 = float(self.lats.mean()) if len(self.lats) else 0.0
+        self.lng0 = float(self.lngs.mean()) if len(self.lngs) else 0.0
+        self._mx = METERS_PER_DEGREE * math.cos(math.radians(self.lat0))
+        self.xy = self._project(self.lats, self.lngs)
+
+    @classmethod
+    def from_waypoints(cls, waypoints: Sequence[Dict]) -> "FleetRouter":
+        n = len(waypoints)
+        return cls(np.fromiter((wp['lat'] for wp in waypoints), dtype=np.float64, count=n),
+                   np.fromiter((wp['lng'] for wp in waypoints), dtype=np.float64, count=n))
+
+    def _project(self, lats, lngs) -> np.ndarray:
+        return np.column_stack(((np.asarray(lngs) - self.lng0) * self._mx,
+                                (np.asarray(lats) - self.lat0) * METERS_PER_DEGREE))
+
+    def solve(self, drones: Sequence[RoutingDrone], time_budget_s: float = 1.0) -> RoutingResult:
+        """Construct routes, then improve them until nothing helps or the budget is spent"""
+        started = time.perf_counter()
+        deadline = started + time_budget_s
+        self._prepare(drones)
+        n = len(self.xy)
+
+        # Waypoints that no drone can fly out to, image and fly back from on a full battery
+        reachable = self._reachable(np.arange(n))
+        unassigned = np.flatnonzero(~reachable)
+        if unassigned.size and self._drones:
+            logger.warning(f"{unassigned.size} waypoints are out of round-trip range of every drone")
+        if not self._drones or unassigned.size == n:
+            routes = [DroneRoute(d.drone_id, [], [], 0.0, 0.0) for d in self._drones]
+            return RoutingResult(routes, 0.0, 0.0, unassigned, time.perf_counter() - started)
+
+        # Route first: one tour along a Hilbert curve; cluster second: split it by makespan
+        points = np.flatnonzero(reachable)
+        tour = points[np.argsort(self._curve_positions(points), kind="stable")]
+        order = self._initial_order(tour)
+        best_makespan, best_bounds = self._split(tour, order)
+        construction = best_makespan
+        best_tour, best_order = tour, order
+
+        iterations = 0
+        while time.perf_counter() < deadline and len(best_tour):
+            iterations += 1
+            improved = False
+
+            # Shorten every drone's path, then move the boundaries to rebalance
+            routes = [best_tour[i:j] for i, j in best_bounds]
+            shortened = [self._two_opt(d, route, deadline) for d, route in zip(best_order, routes)]
+            tour = np.concatenate(shortened)
+            makespan, bounds = self._split(tour, best_order, best_makespan)
+            if bounds is not None:
+                best_makespan, best_bounds, best_tour = makespan, bounds, tour
+                improved = True
+
+            # Let neighbouring drones, then the drone that finishes last, trade places along the tour
+            swaps = [(k, k + 1) for k in range(len(best_order) - 1)]
+            if not improved:
+                last = max(range(len(best_order)), key=lambda k: self._segment_time(best_order[k], best_tour, best_bounds[k]))
+                swaps += [(last, k) for k in range(len(best_order)) if abs(k - last) > 1]
+            for a, b in swaps:
+                if time.perf_counter() >= deadline:
+                    break
+                order = list(best_order)
+                order[a], order[b] = order[b], order[a]
+                makespan, bounds = self._split(best_tour, order, best_makespan)
+                if bounds is not None:
+                    best_makespan, best_bounds, best_order = makespan, bounds, order
+                    self.stats["order_swaps"] += 1
+                    improved = True
+            if not improved:
+                break
+
+        routes: List[Optional[DroneRoute]] = [None] * len(self._drones)
+        for d, (i, j) in zip(best_order, best_bounds):
+            routes[d] = self._route(d, best_tour[i:j])
+        for d in range(len(self._drones)):
+            if routes[d] is None:
+                routes[d] = DroneRoute(self._drones[d].drone_id, [], [], 0.0, 0.0)
+        return RoutingResult(
+            routes=routes,
+            makespan_s=max(route.duration_s for route in routes),
+            construction_makespan_s=construction,
+            unassigned=unassigned,
+            solve_time_s=time.perf_counter() - started,
+            iterations=iterations,
+            stats=dict(self.stats),
+        )
+
+    def repair(self, drones: Sequence[RoutingDrone], routes: Sequence[Sequence[int]],
+               pending: Sequence[int] = (), priority: Sequence[int] = (), changed: Sequence[int] = (),
+               time_budget_s: float = 0.05) -> RoutingResult:
+        """Warm-start the existing routes after the fleet or the waypoints changed
+
+        routes[d] is what drone d still has to fly, in order (empty for a new
+        drone). Pending waypoints have no drone yet: each is slotted into the
+        route of the drone flying nearest to it, or in front of it when it is
+        a priority waypoint. Only a window of drones around the ones that
+        changed (received pending waypoints, have no route, or are listed in
+        changed) is then re-split; the window grows until it finishes within
+        REPAIR_SLACK of the rest of the fleet. Drones outside it keep their routes as
+        they are.
+        """
+        started = time.perf_counter()
+        deadline = started + time_budget_s
+        self._prepare(drones)
+        self.stats.update(window=0, widenings=0)
+        routes = [np.asarray(route, dtype=np.int64) for route in routes]
+        pending = np.asarray(pending, dtype=np.int64)
+        is_priority = np.zeros(len(self.xy), dtype=bool)
+        is_priority[np.asarray(priority, dtype=np.int64)] = True
+        if not self._drones:
+            unassigned = np.concatenate([pending] + routes) if routes else pending
+            return RoutingResult([], 0.0, 0.0, unassigned, time.perf_counter() - started)
+
+        reachable = self._reachable(pending)
+        unassigned, pending = pending[~reachable], pending[reachable]
+        if unassigned.size:
+            logger.warning(f"{unassigned.size} waypoints are out of round-trip range of every drone")
+
+        # Drones in the order their routes run along the Hilbert curve; idle ones by where they are
+        routed = np.concatenate(routes)
+        points = np.union1d(routed, pending)
+        curve = np.zeros(len(self.xy), dtype=np.int64)
+        if len(points):
+            curve[points] = self._curve_positions(points)
+            anchors = [routes[d] if len(routes[d]) else points[self._nearest(points, self._starts[d:d + 1])]
+                       for d in range(len(self._drones))]
+            keys = [float(np.median(curve[anchor])) for anchor in anchors]
+        else:
+            keys = [0.0] * len(self._drones)
+        order = sorted(range(len(self._drones)), key=lambda d: keys[d])
+        changed_drones = set(changed) | {d for d in range(len(self._drones)) if not len(routes[d])}
+
+        # Slot each pending waypoint in after the nearest waypoint already on a route
+        slots = list(routes)
+        if pending.size:
+            owners = np.repeat(np.arange(len(routes)), [len(route) for route in routes])
+            ranks = np.concatenate([np.arange(len(route)) for route in routes])
+            if len(routed):
+                nearest = self._nearest(routed, self.xy[pending])
+                owner, rank = owners[nearest], ranks[nearest] + 0.5
+            else:
+                owner = self._nearest(self._starts, self.xy[pending])
+                rank = np.zeros(len(pending))
+            rank = np.where(is_priority[pending], -1.0, rank)
+            by_curve = np.argsort(curve[pending], kind="stable")
+            for d in np.unique(owner):
+                mine = by_curve[owner[by_curve] == d]
+                keys_d = np.concatenate([np.arange(len(routes[d]), dtype=np.float64), rank[mine]])
+                merged = np.concatenate([routes[d], pending[mine]])
+                slots[d] = merged[np.argsort(keys_d, kind="stable")]
+                changed_drones.add(int(d))
+
+        position = {d: k for k, d in enumerate(order)}
+        affected = sorted(position[d] for d in changed_drones)
+        if not affected:
+            result_routes = [self._route(d, slots[d]) for d in range(len(self._drones))]
+            return RoutingResult(result_routes, max(r.duration_s for r in result_routes), 0.0, unassigned,
+                                 time.perf_counter() - started)
+
+        # Re-split a window of neighbours along the tour, widening it while it is the bottleneck
+        times = [self._route_time(d, slots[d]) for d in range(len(self._drones))]
+        lo, hi = max(0, affected[0] - 1), min(len(order) - 1, affected[-1] + 1)
+        construction = math.inf
+        while True:
+            window = order[lo:hi + 1]
+            segment = np.concatenate([slots[d] for d in window])
+            segment = segment[np.argsort(curve[segment], kind="stable")]
+            current = max(times[d] for d in window)
+            try:
+                makespan, bounds = self._split(segment, window, current if math.isfinite(current) else None)
+            except RuntimeError:
+                makespan, bounds = math.inf, None
+            if bounds is not None:
+                for d, (i, j) in zip(window, bounds):
+                    route = segment[i:j]
+                    slots[d] = np.concatenate([route[is_priority[route]], route[~is_priority[route]]])
+                    times[d] = self._route_time(d, slots[d])
+                current = max(times[d] for d in window)
+            construction = current
+            outside = max((times[d] for d in order[:lo] + order[hi + 1:]), default=0.0)
+            whole = lo == 0 and hi == len(order) - 1
+            if whole or (math.isfinite(current) and (current <= outside * (1 + REPAIR_SLACK) or time.perf_counter() >= deadline)):
+                break
+            lo, hi = max(0, lo - 1), min(len(order) - 1, hi + 1)
+            self.stats["widenings"] += 1
+        self.stats["window"] = hi - lo + 1
+        if not math.isfinite(construction):
+            # Only a different order along the tour can serve the new waypoints: solve from scratch
+            logger.warning("Route repair could not place every waypoint; re-solving")
+            return self.solve(drones, max(0.0, deadline - time.perf_counter()))
+
+        # Tidy up the routes that changed; priority waypoints stay in front
+        for d in order[lo:hi + 1]:
+            if time.perf_counter() >= deadline:
+                break
+            route = slots[d]
+            if len(route) == len(routes[d]) and np.array_equal(route, routes[d]):
+                continue
+            first = int(is_priority[route].sum())
+            if first:
+                slots[d] = np.concatenate([self._two_opt(d, route[:first], deadline), route[first:]])
+            else:
+                slots[d] = self._two_opt(d, route, deadline)
+
+        result_routes = [self._route(d, slots[d]) for d in range(len(self._drones))]
+        return RoutingResult(
+            routes=result_routes,
+            makespan_s=max(route.duration_s for route in result_routes),
+            construction_makespan_s=construction,
+            unassigned=unassigned,
+            solve_time_s=time.perf_counter() - started,
+            iterations=1,
+            stats=dict(self.stats),
+        )
+
+    def _prepare(self, drones: Sequence[RoutingDrone]):
+        self._drones = list(drones)
+        self._depots = self._project([d.lat for d in self._drones], [d.lng for d in self._drones])
+        self._starts = self._project([d.lat if d.start_lat is None else d.start_lat for d in self._drones],
+                                     [d.lng if d.start_lng is None else d.start_lng for d in self._drones])
+        self._speed = np.array([d.speed_mps for d in self._drones], dtype=np.float64)
+        self._full = np.array([d.endurance_s for d in self._drones], dtype=np.float64)
+        self._first = np.array([d.endurance_s if d.first_endurance_s is None else d.first_endurance_s
+                                for d in self._drones], dtype=np.float64)
+        self._dwell = np.array([d.dwell_s for d in self._drones], dtype=np.float64)
+        self._turnaround = np.array([d.turnaround_s for d in self._drones], dtype=np.float64)
+        self.stats = {"splits": 0, "two_opt_moves": 0, "order_swaps": 0}
+
+    def _reachable(self, points: np.ndarray) -> np.ndarray:
+        """Whether some drone can fly out to each point, image it and fly back on a full battery"""
+        if not self._drones:
+            return np.zeros(len(points), dtype=bool)
+        xy = self.xy[points]
+        depot_dist = np.hypot(xy[:, 0][None, :] - self._depots[:, 0][:, None],
+                              xy[:, 1][None, :] - self._depots[:, 1][:, None])
+        return (2 * depot_dist / self._speed[:, None] + self._dwell[:, None] <= self._full[:, None]).any(axis=0)
+
+    def _nearest(self, points, query: np.ndarray) -> np.ndarray:
+        """Index into points of the point nearest each query location; points are waypoint indices or xy"""
+        xy = self.xy[points] if np.ndim(points) == 1 else points
+        if SCIPY_AVAILABLE:
+            return cKDTree(xy).query(query)[1]
+        nearest = np.empty(len(query), dtype=np.int64)
+        chunk = max(1, 4_000_000 // max(1, len(xy)))
+        for start in range(0, len(query), chunk):
+            q = query[start:start + chunk]
+            dist = np.hypot(q[:, 0][:, None] - xy[:, 0][None, :], q[:, 1][:, None] - xy[:, 1][None, :])
+            nearest[start:start + chunk] = np.argmin(dist, axis=1)
+        return nearest
+
+    def _curve_positions(self, points: np.ndarray) -> np.ndarray:
+        xy = self.xy[points]
+        lo = xy.min(axis=0)
+        span = max(float((xy.max(axis=0) - lo).max()), 1e-9)
+        grid = np.floor((xy - lo) / span * ((1 << HILBERT_BITS) - 1))
+        return _hilbert_index(grid[:, 0], grid[:, 1])
+
+    def _initial_order(self, tour: np.ndarray) -> List[int]:
+        """Drones take tour segments in the order their bases appear along the tour"""
+        if not len(tour):
+            return list(range(len(self._drones)))
+        xy = self.xy[tour]
+        positions = []
+        for depot in self._depots:
+            positions.append(int(np.argmin(np.hypot(xy[:, 0] - depot[0], xy[:, 1] - depot[1]))))
+        return sorted(range(len(self._drones)), key=lambda d: (positions[d], -self._speed[d]))
+
+    def _prefix_times(self, d: int, xy: np.ndarray, cum: np.ndarray, i: int, limit: float,
+                      sorties: Optional[List[Tuple[int, int, float]]] = None) -> np.ndarray:
+        """Time for drone d to fly tour[i:j] for j = i+1, i+2, ... until limit is passed
+
+        Sorties are cut greedily: the drone heads home when the next waypoint
+        and the flight back would not fit in its battery. Each returned time
+        includes the final flight home. (start, length, flight time) of each
+        sortie is appended to sorties when given.
+        """
+        n = len(xy)
+        depot, launch = self._depots[d], self._starts[d]
+        speed, dwell, full = self._speed[d], self._dwell[d], self._full[d]
+        endurance = self._first[d]
+        offset = 0.0
+        pieces = []
+        b = i
+        while b < n and offset <= limit:
+            window = SORTIE_WINDOW
+            while True:
+                e = min(n, b + window)
+                home = np.hypot(xy[b:e, 0] - depot[0], xy[b:e, 1] - depot[1])
+                out = math.hypot(xy[b, 0] - launch[0], xy[b, 1] - launch[1])
+                t = (out + cum[b:e] - cum[b] + home) / speed + dwell * np.arange(1, e - b + 1)
+                fits = t <= endurance
+                if e == n or not fits.all():
+                    break
+                window *= 4
+            k = len(fits) if fits.all() else int(np.argmin(fits))
+            if k == 0:
+                if endurance < full:
+                    # Not enough left for even one waypoint: go home and swap the battery first
+                    offset += math.hypot(launch[0] - depot[0], launch[1] - depot[1]) / speed + self._turnaround[d]
+                    endurance, launch = full, depot
+                    continue
+                break  # out of this drone's range; the tour must go to another drone here
+            pieces.append(offset + t[:k])
+            if sorties is not None:
+                sorties.append((b, k, float(t[k - 1])))
+            offset += t[k - 1] + self._turnaround[d]
+            endurance, launch = full, depot
+            b += k
+        return np.concatenate(pieces) if pieces else np.zeros(0)
+
+    def _split(self, tour: np.ndarray, order: Sequence[int],
+               beat: Optional[float] = None) -> Tuple[float, Optional[List[Tuple[int, int]]]]:
+        """Cut the tour into consecutive segments, one per drone in order, minimizing the makespan
+
+        With beat given, returns (inf, None) straight away unless the split
+        can do better than that makespan.
+        """
+        n = len(tour)
+        xy = self.xy[tour]
+        cum = np.zeros(n)
+        if n > 1:
+            cum[1:] = np.cumsum(np.hypot(np.diff(xy[:, 0]), np.diff(xy[:, 1])))
+
+        def attempt(limit):
+            self.stats["splits"] += 1
+            bounds, makespan, i = [], 0.0, 0
+            for d in order:
+                times = self._prefix_times(d, xy, cum, i, limit) if i < n else np.zeros(0)
+                count = int(np.searchsorted(times, limit, side="right"))
+                if count:
+                    makespan = max(makespan, float(times[count - 1]))
+                bounds.append((i, i + count))
+                i += count
+            return i >= n, makespan, bounds
+
+        # Bracket the optimum, then bisect on the makespan
+        if beat is not None:
+            ok, makespan, bounds = attempt(beat * (1 - 1e-6))
+            if not ok:
+                return math.inf, None
+            hi = makespan
+        else:
+            guess = (cum[-1] / self._speed.max() + n * self._dwell.min()) / len(order) if n else 0.0
+            hi = max(guess, 1.0)
+            for _ in range(64):
+                ok, makespan, bounds = attempt(hi)
+                if ok:
+                    break
+                hi *= 2
+            else:
+                raise RuntimeError("Tour cannot be split among the drones")
+        best = (makespan, bounds)
+        lo = 0.0
+        while hi - lo > max(1.0, 1e-3 * hi):
+            mid = (lo + hi) / 2
+            ok, makespan, bounds = attempt(mid)
+            if ok:
+                hi = makespan  # the achieved makespan, which may be below mid
+                best = (makespan, bounds)
+            else:
+                lo = mid
+        return best
+
+    def _segment_time(self, d: int, tour: np.ndarray, bounds: Tuple[int, int]) -> float:
+        i, j = bounds
+        return self._route(d, tour[i:j]).duration_s
+
+    def _route_time(self, d: int, route: np.ndarray) -> float:
+        """Duration of a route, or inf when the drone cannot fly all of it"""
+        try:
+            return self._route(d, route).duration_s
+        except RuntimeError:
+            return math.inf
+
+    def _two_opt(self, d: int, route: np.ndarray, deadline: float) -> np.ndarray:
+        """Shorten a drone's path from its base with 2-opt moves over nearest-neighbour candidates"""
+        m = len(route)
+        if m < 4 or time.perf_counter() >= deadline:
+            return route
+        pts = np.vstack([self._starts[d], self.xy[route]])  # node 0 is where the drone starts and stays first
+        k = min(TWO_OPT_NEIGHBOURS, m)
+        if SCIPY_AVAILABLE:
+            neighbours = cKDTree(pts).query(pts, k + 1)[1][:, 1:]
+        elif m <= 2000:
+            dist = np.hypot(pts[:, 0][:, None] - pts[:, 0][None, :], pts[:, 1][:, None] - pts[:, 1][None, :])
+            neighbours = np.argsort(dist, axis=1)[:, 1:k + 1]
+        else:
+            return route
+        neighbours = neighbours.tolist()
+        px, py = pts[:, 0].tolist(), pts[:, 1].tolist()
+        tour = list(range(m + 1))
+        pos = list(range(m + 1))
+        hypot = math.hypot
+
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for a in range(m - 1):
+                na, nb = tour[a], tour[a + 1]
+                d_ab = hypot(px[na] - px[nb], py[na] - py[nb])
+                for c in neighbours[na]:
+                    j = pos[c]
+                    if j <= a + 1:
+                        continue
+                    # Replace edges (a, a+1) and (j, j+1) with (a, j) and (a+1, j+1); the path end is open
+                    delta = hypot(px[na] - px[c], py[na] - py[c]) - d_ab
+                    if j < m:
+                        nd = tour[j + 1]
+                        delta += hypot(px[nb] - px[nd], py[nb] - py[nd]) - hypot(px[c] - px[nd], py[c] - py[nd])
+                    if delta < -1e-7:
+                        tour[a + 1:j + 1] = tour[a + 1:j + 1][::-1]
+                        for p in range(a + 1, j + 1):
+                            pos[tour[p]] = p
+                        self.stats["two_opt_moves"] += 1
+                        improved = True
+                        nb = tour[a + 1]
+                        d_ab = hypot(px[na] - px[nb], py[na] - py[nb])
+        return route[np.asarray(tour[1:]) - 1]
+
+    def _route(self, d: int, route: np.ndarray) -> DroneRoute:
+        """Sorties, times and distance of one drone's segment"""
+        drone = self._drones[d]
+        if not len(route):
+            return DroneRoute(drone.drone_id, [], [], 0.0, 0.0)
+        xy = self.xy[route]
+        cum = np.zeros(len(route))
+        cum[1:] = np.cumsum(np.hypot(np.diff(xy[:, 0]), np.diff(xy[:, 1])))
+        spans: List[Tuple[int, int, float]] = []
+        times = self._prefix_times(d, xy, cum, 0, math.inf, spans)
+        if len(times) < len(route):
+            raise RuntimeError(f"Drone {drone.drone_id} cannot fly its assigned waypoints")
+        distance = sum((t - self._dwell[d] * k) * self._speed[d] for _, k, t in spans)
+        return DroneRoute(
+            drone_id=drone.drone_id,
+            sorties=[route[b:b + k] for b, k, _ in spans],
+            sortie_times_s=[t for _, _, t in spans],
+            duration_s=float(times[-1]),
+            distance_m=float(distance),
+        )
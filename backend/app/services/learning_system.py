@@ -10,17 +10,18 @@ import logging
 import math
 import json
 from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
 from enum import Enum
 import numpy as np
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import func, and_, or_
 
 from ..core.database import SessionLocal
 from ..models import Mission, Drone, Discovery, MissionDrone
 from .analytics_engine import AnalyticsEngine, MissionMetrics
 from .adaptive_planner import adaptive_planner
+from .feature_store import FeatureSlice, FeatureStore
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -45,16 +46,22 @@ class PerformanceMetric(Enum):
     DRONE_COORDINATION = "drone_coordination"
 
 
-@dataclass
-class LearningDataPoint:
-    """Single data point for learning algorithms."""
-    timestamp: datetime
-    mission_id: str
-    drone_id: Optional[str]
-    metric_type: PerformanceMetric
-    input_features: Dict[str, float]
-    output_value: float
-    context: Dict[str, Any] = field(default_factory=dict)
+# Feature columns stored for each metric, in order
+FEATURE_COLUMNS = {
+    PerformanceMetric.MISSION_EFFICIENCY.value: [
+        "area_size", "drone_count", "weather_wind", "weather_visibility", "terrain_complexity", "urgency_level"
+    ],
+    PerformanceMetric.BATTERY_OPTIMIZATION.value: [
+        "flight_duration", "distance_traveled", "altitude", "weather_wind", "payload_weight", "battery_capacity"
+    ],
+    PerformanceMetric.DISCOVERY_ACCURACY.value: [
+        "drone_altitude", "weather_visibility", "time_of_day", "terrain_type", "camera_resolution",
+        "gimbal_stabilization", "discovery_type"
+    ],
+    PerformanceMetric.FLIGHT_PATH_OPTIMIZATION.value: [
+        "area_size", "terrain_complexity", "weather_wind", "drone_speed", "search_pattern", "obstacle_density"
+    ],
+}
 
 
 @dataclass
@@ -108,15 +115,17 @@ class LearningSystem:
     - Learn from mission outcomes
     """
 
-    def __init__(self):
+    def __init__(self, feature_store: Optional[FeatureStore] = None, session_factory=None):
         self.analytics_engine = AnalyticsEngine()
+        self.session_factory = session_factory or SessionLocal
         self.learning_models: Dict[str, LearningModel] = {}
-        self.learning_data: List[LearningDataPoint] = []
+        self.feature_store = feature_store or FeatureStore(settings.LEARNING_FEATURE_STORE_PATH, FEATURE_COLUMNS)
         self.performance_improvements: List[PerformanceImprovement] = []
         self.learning_enabled = True
         
         # Learning parameters
         self.min_training_data = 50
+        self.training_window = 50  # newest rows each model reads
         self.model_update_interval = timedelta(hours=24)
         self.learning_rate = 0.01
         self.exploration_rate = 0.1
@@ -207,204 +216,198 @@ class LearningSystem:
                 await asyncio.sleep(300)  # 5 minutes on error
 
     async def _collect_learning_data(self):
-        """Collect new learning data from recent missions."""
+        """Collect features for missions that are new or changed since the last cycle."""
         try:
-            with SessionLocal() as db:
-                # Get recent missions (last 24 hours)
-                recent_missions = db.query(Mission).filter(
-                    Mission.created_at >= datetime.utcnow() - timedelta(hours=24)
-                ).all()
-                
-                for mission in recent_missions:
-                    # Collect mission efficiency data
-                    await self._collect_mission_efficiency_data(mission, db)
-                    
-                    # Collect battery optimization data
-                    await self._collect_battery_optimization_data(mission, db)
-                    
-                    # Collect discovery accuracy data
-                    await self._collect_discovery_accuracy_data(mission, db)
-                    
-                    # Collect flight path optimization data
-                    await self._collect_flight_path_data(mission, db)
-                    
+            collected = await asyncio.to_thread(self._collect_since_watermarks)
+            if collected:
+                logger.info(f"Collected learning features for {collected} missions")
         except Exception as e:
             logger.error(f"Failed to collect learning data: {e}")
 
-    async def _collect_mission_efficiency_data(self, mission: Mission, db: Session):
-        """Collect mission efficiency learning data."""
-        try:
-            # Calculate mission efficiency metrics
-            duration = (mission.updated_at - mission.created_at).total_seconds() / 3600  # hours
-            area_covered = mission.area_covered or 0
-            discoveries = len(mission.discoveries) if mission.discoveries else 0
-            
-            # Input features
-            input_features = {
-                "area_size": mission.area_size or 0,
-                "drone_count": len(mission.drones) if mission.drones else 1,
-                "weather_wind": 0,  # Would come from weather service
-                "weather_visibility": 10000,  # Default
-                "terrain_complexity": self._calculate_terrain_complexity(mission),
-                "urgency_level": self._calculate_urgency_level(mission)
-            }
+    def _collect_since_watermarks(self) -> int:
+        """
+        Pull changed missions in pages and append their features to the store.
+        
+        Two high-watermarks are kept in the store: the (updated_at, id) of the
+        last mission read, and the last discovery id, since a new discovery
+        changes a mission's features without touching the mission row. Each
+        page is one query with drones and discoveries eager-loaded; the
+        watermarks advance with the rows, so an interrupted cycle resumes
+        from the last committed page.
+        """
+        store = self.feature_store
+        marks = store.watermarks
+        batch = settings.LEARNING_COLLECT_BATCH
+        collected = 0
+        
+        with self.session_factory() as db:
+            discovery_mark = marks.get("discoveries", 0)
+            discovery_high = db.query(func.max(Discovery.id)).scalar() or 0
+            mission_mark = marks.get("missions")
+            seen = set()
             
-            # Output value (efficiency score)
-            efficiency_score = self._calculate_efficiency_score(duration, area_covered, discoveries)
+            while True:
+                query = self._mission_query(db)
+                if mission_mark:
+                    updated_at = datetime.fromisoformat(mission_mark["updated_at"])
+                    query = query.filter(or_(
+                        Mission.updated_at > updated_at,
+                        and_(Mission.updated_at == updated_at, Mission.id > mission_mark["id"])
+                    ))
+                page = query.order_by(Mission.updated_at, Mission.id).limit(batch).all()
+                if not page:
+                    break
+                self._store_mission_features(page)
+                seen.update(mission.id for mission in page)
+                collected += len(page)
+                mission_mark = {"updated_at": page[-1].updated_at.isoformat(), "id": page[-1].id}
+                store.commit({"missions": mission_mark})
+                db.expunge_all()
             
-            # Create data point
-            data_point = LearningDataPoint(
-                timestamp=datetime.utcnow(),
-                mission_id=mission.mission_id,
-                drone_id=None,
-                metric_type=PerformanceMetric.MISSION_EFFICIENCY,
-                input_features=input_features,
-                output_value=efficiency_score,
-                context={"mission_type": mission.mission_type, "status": mission.status}
+            # Missions whose discoveries changed but the mission row did not
+            if discovery_high > discovery_mark:
+                touched = [
+                    mission_id for (mission_id,) in db.query(Discovery.mission_id).filter(
+                        Discovery.id > discovery_mark, Discovery.id <= discovery_high
+                    ).distinct()
+                    if mission_id not in seen
+                ]
+                for i in range(0, len(touched), batch):
+                    page = self._mission_query(db).filter(Mission.id.in_(touched[i:i + batch])).all()
+                    self._store_mission_features(page)
+                    collected += len(page)
+                    store.commit()
+                    db.expunge_all()
+                store.commit({"discoveries": discovery_high})
+        
+        return collected
+
+    def _mission_query(self, db: Session):
+        """Missions with their drones and discoveries loaded up front."""
+        return db.query(Mission).filter(Mission.updated_at.isnot(None)).options(
+            selectinload(Mission.drone_assignments).joinedload(MissionDrone.drone),
+            selectinload(Mission.discoveries)
+        )
+
+    def _store_mission_features(self, missions: List[Mission]):
+        """Append one page of missions to every partition, replacing their earlier rows."""
+        rows: Dict[str, List[Tuple[int, int, float, List[float], float]]] = {metric: [] for metric in FEATURE_COLUMNS}
+        for mission in missions:
+            timestamp = mission.updated_at.replace(tzinfo=timezone.utc).timestamp()
+            drones = [assignment.drone for assignment in mission.drone_assignments if assignment.drone]
+            for metric, metric_rows in (
+                (PerformanceMetric.MISSION_EFFICIENCY, [self._mission_efficiency_row(mission)]),
+                (PerformanceMetric.BATTERY_OPTIMIZATION, [self._battery_row(mission, d) for d in drones]),
+                (PerformanceMetric.DISCOVERY_ACCURACY, [self._discovery_row(mission, d) for d in mission.discoveries]),
+                (PerformanceMetric.FLIGHT_PATH_OPTIMIZATION, [self._flight_path_row(mission, d) for d in drones]),
+            ):
+                for drone_key, features, output in metric_rows:
+                    rows[metric.value].append((mission.id, drone_key, timestamp, features, output))
+        
+        mission_ids = [mission.id for mission in missions]
+        for metric, metric_rows in rows.items():
+            columns = len(FEATURE_COLUMNS[metric])
+            self.feature_store.append(
+                metric,
+                features=np.array([row[3] for row in metric_rows], dtype=np.float64).reshape(-1, columns),
+                outputs=[row[4] for row in metric_rows],
+                timestamps=[row[2] for row in metric_rows],
+                missions=[row[0] for row in metric_rows],
+                drones=[row[1] for row in metric_rows],
+                replaces=mission_ids
             )
-            
-            self.learning_data.append(data_point)
-            
-        except Exception as e:
-            logger.error(f"Failed to collect mission efficiency data: {e}")
 
-    async def _collect_battery_optimization_data(self, mission: Mission, db: Session):
-        """Collect battery optimization learning data."""
-        try:
-            if not mission.drones:
-                return
-                
-            for mission_drone in mission.drones:
-                drone = mission_drone.drone
-                if not drone:
-                    continue
-                
-                # Input features
-                input_features = {
-                    "flight_duration": (mission.updated_at - mission.created_at).total_seconds() / 3600,
-                    "distance_traveled": self._estimate_distance_traveled(mission),
-                    "altitude": mission.altitude or 50,
-                    "weather_wind": 0,  # Would come from weather service
-                    "payload_weight": 0,  # Would come from drone specs
-                    "battery_capacity": drone.battery_capacity or 100
-                }
-                
-                # Output value (battery efficiency)
-                battery_efficiency = self._calculate_battery_efficiency(drone, mission)
-                
-                # Create data point
-                data_point = LearningDataPoint(
-                    timestamp=datetime.utcnow(),
-                    mission_id=mission.mission_id,
-                    drone_id=drone.drone_id,
-                    metric_type=PerformanceMetric.BATTERY_OPTIMIZATION,
-                    input_features=input_features,
-                    output_value=battery_efficiency,
-                    context={"drone_model": drone.model, "mission_type": mission.mission_type}
-                )
-                
-                self.learning_data.append(data_point)
-                
-        except Exception as e:
-            logger.error(f"Failed to collect battery optimization data: {e}")
+    def _mission_efficiency_row(self, mission: Mission) -> Tuple[int, List[float], float]:
+        """Mission efficiency features and score."""
+        duration = self._mission_hours(mission)
+        area_covered = mission.area_covered or 0
+        features = [
+            self._mission_area(mission),
+            len(mission.drone_assignments) or 1,
+            0,  # weather_wind, would come from weather service
+            10000,  # weather_visibility
+            self._calculate_terrain_complexity(mission),
+            self._calculate_urgency_level(mission)
+        ]
+        return -1, features, self._calculate_efficiency_score(duration, area_covered, len(mission.discoveries))
+
+    def _battery_row(self, mission: Mission, drone: Drone) -> Tuple[int, List[float], float]:
+        """Battery optimization features and efficiency for one drone."""
+        features = [
+            self._mission_hours(mission),
+            self._estimate_distance_traveled(mission),
+            mission.altitude or 50,
+            0,  # weather_wind, would come from weather service
+            0,  # payload_weight, would come from drone specs
+            drone.battery_capacity or 100
+        ]
+        return drone.id, features, self._calculate_battery_efficiency(drone, mission)
+
+    def _discovery_row(self, mission: Mission, discovery: Discovery) -> Tuple[int, List[float], float]:
+        """Discovery accuracy features and confidence."""
+        features = [
+            mission.altitude or 50,
+            10000,  # weather_visibility
+            self._calculate_time_of_day(mission.created_at or mission.updated_at),
+            self._get_terrain_type(mission),
+            1920,  # camera_resolution
+            1,  # gimbal_stabilization
+            self._encode_discovery_type(discovery.discovery_type)
+        ]
+        return discovery.drone_id, features, float(discovery.confidence or 0.0)
+
+    def _flight_path_row(self, mission: Mission, drone: Drone) -> Tuple[int, List[float], float]:
+        """Flight path features and efficiency for one drone."""
+        features = [
+            self._mission_area(mission),
+            self._calculate_terrain_complexity(mission),
+            0,  # weather_wind, would come from weather service
+            drone.cruise_speed or 10,
+            self._encode_search_pattern(mission),
+            self._estimate_obstacle_density(mission)
+        ]
+        return drone.id, features, self._calculate_path_efficiency(mission, drone)
+
+    def _mission_hours(self, mission: Mission) -> float:
+        """Hours from creation to the last update."""
+        if not mission.created_at or not mission.updated_at:
+            return 0.0
+        return (mission.updated_at - mission.created_at).total_seconds() / 3600
 
-    async def _collect_discovery_accuracy_data(self, mission: Mission, db: Session):
-        """Collect discovery accuracy learning data."""
-        try:
-            discoveries = db.query(Discovery).filter(Discovery.mission_id == mission.id).all()
-            
-            for discovery in discoveries:
-                # Input features
-                input_features = {
-                    "drone_altitude": mission.altitude or 50,
-                    "weather_visibility": 10000,  # Default
-                    "time_of_day": self._calculate_time_of_day(mission.created_at),
-                    "terrain_type": self._get_terrain_type(mission),
-                    "camera_resolution": 1920,  # Default
-                    "gimbal_stabilization": 1,  # Boolean as int
-                    "discovery_type": self._encode_discovery_type(discovery.discovery_type)
-                }
-                
-                # Output value (confidence score)
-                confidence_score = discovery.confidence or 0.0
-                
-                # Create data point
-                data_point = LearningDataPoint(
-                    timestamp=datetime.utcnow(),
-                    mission_id=mission.mission_id,
-                    drone_id=discovery.drone_id,
-                    metric_type=PerformanceMetric.DISCOVERY_ACCURACY,
-                    input_features=input_features,
-                    output_value=confidence_score,
-                    context={"discovery_type": discovery.discovery_type, "status": discovery.status}
-                )
-                
-                self.learning_data.append(data_point)
-                
-        except Exception as e:
-            logger.error(f"Failed to collect discovery accuracy data: {e}")
+    def _mission_area(self, mission: Mission) -> float:
+        """Search area in km², from the mission radius when there is one."""
+        if mission.radius:
+            return math.pi * (mission.radius / 1000) ** 2
+        return mission.area_covered or 0.0
 
-    async def _collect_flight_path_data(self, mission: Mission, db: Session):
-        """Collect flight path optimization learning data."""
-        try:
-            if not mission.drones:
-                return
-                
-            for mission_drone in mission.drones:
-                drone = mission_drone.drone
-                if not drone:
-                    continue
-                
-                # Input features
-                input_features = {
-                    "area_size": mission.area_size or 0,
-                    "terrain_complexity": self._calculate_terrain_complexity(mission),
-                    "weather_wind": 0,  # Would come from weather service
-                    "drone_speed": drone.cruise_speed or 10,
-                    "search_pattern": self._encode_search_pattern(mission),
-                    "obstacle_density": self._estimate_obstacle_density(mission)
-                }
-                
-                # Output value (path efficiency)
-                path_efficiency = self._calculate_path_efficiency(mission, drone)
-                
-                # Create data point
-                data_point = LearningDataPoint(
-                    timestamp=datetime.utcnow(),
-                    mission_id=mission.mission_id,
-                    drone_id=drone.drone_id,
-                    metric_type=PerformanceMetric.FLIGHT_PATH_OPTIMIZATION,
-                    input_features=input_features,
-                    output_value=path_efficiency,
-                    context={"search_pattern": mission.search_pattern, "drone_model": drone.model}
-                )
-                
-                self.learning_data.append(data_point)
-                
-        except Exception as e:
-            logger.error(f"Failed to collect flight path data: {e}")
+    def _mission_terrain(self, mission: Mission) -> Optional[str]:
+        """Terrain recorded with the mission conditions, if any."""
+        return (mission.weather_conditions or {}).get("terrain_type")
 
     def _calculate_terrain_complexity(self, mission: Mission) -> float:
         """Calculate terrain complexity score."""
         # Simple implementation - would be more sophisticated in reality
-        if mission.terrain_type == "urban":
+        terrain_type = self._mission_terrain(mission)
+        if terrain_type == "urban":
             return 0.8
-        elif mission.terrain_type == "mountainous":
+        elif terrain_type == "mountainous":
             return 0.9
-        elif mission.terrain_type == "forest":
+        elif terrain_type == "forest":
             return 0.7
-        elif mission.terrain_type == "coastal":
+        elif terrain_type == "coastal":
             return 0.6
         else:
             return 0.3
 
     def _calculate_urgency_level(self, mission: Mission) -> float:
         """Calculate urgency level score."""
-        if mission.priority == "critical":
+        # Priority is stored as 1 (critical) to 5 (routine)
+        priority = mission.priority or 3
+        if priority <= 1:
             return 1.0
-        elif mission.priority == "high":
+        elif priority == 2:
             return 0.7
-        elif mission.priority == "medium":
+        elif priority == 3:
             return 0.4
         else:
             return 0.1
@@ -423,13 +426,13 @@ class LearningSystem:
     def _estimate_distance_traveled(self, mission: Mission) -> float:
         """Estimate distance traveled during mission."""
         # Simple estimation based on area size
-        area_size = mission.area_size or 1.0
+        area_size = self._mission_area(mission) or 1.0
         return math.sqrt(area_size) * 1000  # Rough estimate in meters
 
     def _calculate_battery_efficiency(self, drone: Drone, mission: Mission) -> float:
         """Calculate battery efficiency for a drone."""
         # Simple calculation - would be more sophisticated in reality
-        flight_time = (mission.updated_at - mission.created_at).total_seconds() / 3600
+        flight_time = self._mission_hours(mission)
         battery_used = 100 - (drone.battery_level or 100)
         
         if flight_time <= 0:
@@ -454,7 +457,7 @@ class LearningSystem:
             "rural": 0.3,
             "desert": 0.4
         }
-        return terrain_map.get(mission.terrain_type, 0.5)
+        return terrain_map.get(self._mission_terrain(mission), 0.5)
 
     def _encode_discovery_type(self, discovery_type: str) -> float:
         """Encode discovery type as numerical value."""
@@ -483,11 +486,12 @@ class LearningSystem:
     def _estimate_obstacle_density(self, mission: Mission) -> float:
         """Estimate obstacle density in mission area."""
         # Simple estimation based on terrain type
-        if mission.terrain_type == "urban":
+        terrain_type = self._mission_terrain(mission)
+        if terrain_type == "urban":
             return 0.9
-        elif mission.terrain_type == "forest":
+        elif terrain_type == "forest":
             return 0.7
-        elif mission.terrain_type == "mountainous":
+        elif terrain_type == "mountainous":
             return 0.8
         else:
             return 0.2
@@ -495,8 +499,8 @@ class LearningSystem:
     def _calculate_path_efficiency(self, mission: Mission, drone: Drone) -> float:
         """Calculate flight path efficiency."""
         # Simple calculation - would be more sophisticated in reality
-        area_size = mission.area_size or 1.0
-        flight_time = (mission.updated_at - mission.created_at).total_seconds() / 3600
+        area_size = self._mission_area(mission) or 1.0
+        flight_time = self._mission_hours(mission)
         
         if flight_time <= 0:
             return 0.0
@@ -515,14 +519,13 @@ class LearningSystem:
                 if datetime.utcnow() - model.last_trained < self.model_update_interval:
                     continue
                 
-                # Get relevant training data
-                training_data = [
-                    dp for dp in self.learning_data
-                    if dp.metric_type == model.metric_type
-                ]
-                
-                if len(training_data) < self.min_training_data:
+                # Only the newest rows are read, straight from the memory-mapped columns
+                data_count = self._data_count(model.metric_type)
+                if data_count < self.min_training_data:
                     continue
+                training_data = await asyncio.to_thread(
+                    self.feature_store.slice, model.metric_type.value, self.training_window
+                )
                 
                 # Update model based on algorithm
                 if model.algorithm == LearningAlgorithm.REINFORCEMENT_LEARNING:
@@ -534,14 +537,14 @@ class LearningSystem:
                 
                 # Update model metadata
                 model.last_trained = datetime.utcnow()
-                model.training_data_count = len(training_data)
+                model.training_data_count = data_count
                 
-                logger.info(f"Updated model {model_id} with {len(training_data)} data points")
+                logger.info(f"Updated model {model_id} with {data_count} data points")
                 
         except Exception as e:
             logger.error(f"Failed to update learning models: {e}")
 
-    async def _update_reinforcement_learning_model(self, model: LearningModel, training_data: List[LearningDataPoint]):
+    async def _update_reinforcement_learning_model(self, model: LearningModel, training_data: FeatureSlice):
         """Update reinforcement learning model."""
         try:
             # Simple Q-learning update
@@ -550,8 +553,7 @@ class LearningSystem:
             
             # Calculate average performance improvement
             if len(training_data) >= 10:
-                recent_data = training_data[-10:]
-                avg_performance = np.mean([dp.output_value for dp in recent_data])
+                avg_performance = float(np.mean(training_data.outputs[-10:]))
                 
                 # Update model parameters based on performance
                 if avg_performance > 0.7:
@@ -567,7 +569,7 @@ class LearningSystem:
         except Exception as e:
             logger.error(f"Failed to update reinforcement learning model: {e}")
 
-    async def _update_supervised_learning_model(self, model: LearningModel, training_data: List[LearningDataPoint]):
+    async def _update_supervised_learning_model(self, model: LearningModel, training_data: FeatureSlice):
         """Update supervised learning model."""
         try:
             # Simple linear regression update
@@ -576,13 +578,15 @@ class LearningSystem:
             
             if len(training_data) >= 20:
                 # Calculate feature weights using simple linear regression
-                X = np.array([[dp.input_features.get(f"feature_{i}", 0) for i in range(6)] for dp in training_data[-20:]])
-                y = np.array([dp.output_value for dp in training_data[-20:]])
+                X = np.asarray(training_data.features[-20:])
+                y = np.asarray(training_data.outputs[-20:])
                 
                 # Simple gradient descent update
                 if X.shape[0] > 0 and X.shape[1] > 0:
                     # Calculate predictions
-                    weights = model.model_parameters.get("weights", np.zeros(X.shape[1]))
+                    weights = np.asarray(model.model_parameters.get("weights", np.zeros(X.shape[1])), dtype=np.float64)
+                    if len(weights) != X.shape[1]:
+                        weights = np.zeros(X.shape[1])
                     predictions = np.dot(X, weights)
                     
                     # Calculate error
@@ -601,7 +605,7 @@ class LearningSystem:
         except Exception as e:
             logger.error(f"Failed to update supervised learning model: {e}")
 
-    async def _update_deep_learning_model(self, model: LearningModel, training_data: List[LearningDataPoint]):
+    async def _update_deep_learning_model(self, model: LearningModel, training_data: FeatureSlice):
         """Update deep learning model."""
         try:
             # Simple neural network update simulation
@@ -611,8 +615,7 @@ class LearningSystem:
             
             if len(training_data) >= 50:
                 # Simulate neural network training
-                recent_data = training_data[-50:]
-                avg_performance = np.mean([dp.output_value for dp in recent_data])
+                avg_performance = float(np.mean(training_data.outputs[-50:]))
                 
                 # Update model complexity based on performance
                 if avg_performance > 0.8:
@@ -639,21 +642,20 @@ class LearningSystem:
             
             for metric in PerformanceMetric:
                 # Get recent data for this metric
-                recent_data = [
-                    dp for dp in self.learning_data[-100:]  # Last 100 data points
-                    if dp.metric_type == metric
-                ]
+                if not self._data_count(metric):
+                    continue
+                recent_data = self.feature_store.slice(metric.value, last=10)
                 
                 if len(recent_data) < 10:
                     continue
                 
                 # Calculate current performance
-                current_performance = np.mean([dp.output_value for dp in recent_data[-10:]])
+                current_performance = float(np.mean(recent_data.outputs))
                 
                 # Get model prediction
                 model = self._get_model_for_metric(metric)
                 if model:
-                    predicted_performance = await self._predict_performance(model, recent_data[-1])
+                    predicted_performance = await self._predict_performance(model, recent_data.features[-1])
                     
                     # Calculate improvement potential
                     improvement = predicted_performance - current_performance
@@ -700,7 +702,7 @@ class LearningSystem:
                 return model
         return None
 
-    async def _predict_performance(self, model: LearningModel, data_point: LearningDataPoint) -> float:
+    async def _predict_performance(self, model: LearningModel, features: np.ndarray) -> float:
         """Predict performance using a learning model."""
         try:
             if model.algorithm == LearningAlgorithm.REINFORCEMENT_LEARNING:
@@ -712,7 +714,6 @@ class LearningSystem:
             elif model.algorithm == LearningAlgorithm.SUPERVISED_LEARNING:
                 # Linear regression prediction
                 weights = model.model_parameters.get("weights", [0.1, 0.1, 0.1, 0.1, 0.1, 0.1])
-                features = [data_point.input_features.get(f"feature_{i}", 0) for i in range(len(weights))]
                 prediction = sum(w * f for w, f in zip(weights, features))
                 return max(0.0, min(1.0, prediction))
                 
@@ -802,10 +803,12 @@ class LearningSystem:
             # Calculate performance trends
             performance_trends = {}
             for metric in PerformanceMetric:
-                recent_data = [dp for dp in self.learning_data[-50:] if dp.metric_type == metric]
+                if not self._data_count(metric):
+                    continue
+                recent_data = self.feature_store.slice(metric.value, last=50).outputs
                 if len(recent_data) >= 10:
-                    old_avg = np.mean([dp.output_value for dp in recent_data[:10]])
-                    new_avg = np.mean([dp.output_value for dp in recent_data[-10:]])
+                    old_avg = np.mean(recent_data[:10])
+                    new_avg = np.mean(recent_data[-10:])
                     trend = ((new_avg - old_avg) / old_avg) * 100 if old_avg > 0 else 0
                     performance_trends[metric.value] = trend
             
@@ -854,7 +857,7 @@ class LearningSystem:
                 recommendations.append(f"Model {model.model_id} hasn't been updated recently. Consider updating with new data.")
         
         # Check data quality
-        if len(self.learning_data) < 100:
+        if sum(self._data_count(metric) for metric in PerformanceMetric) < 100:
             recommendations.append("Limited training data available. Consider running more missions to improve learning.")
         
         # Check improvement opportunities
@@ -968,27 +971,37 @@ class LearningSystem:
 
     async def get_learning_data_summary(self) -> Dict[str, Any]:
         """Get summary of learning data."""
+        data_by_metric = {metric.value: self._data_count(metric) for metric in PerformanceMetric}
+        recent_data_points = self._count_recent_data_points()
         return {
-            "total_data_points": len(self.learning_data),
-            "data_by_metric": {
-                metric.value: len([dp for dp in self.learning_data if dp.metric_type == metric])
-                for metric in PerformanceMetric
-            },
-            "recent_data_points": len([dp for dp in self.learning_data if dp.timestamp >= datetime.utcnow() - timedelta(hours=24)]),
-            "data_quality_score": self._calculate_data_quality_score()
+            "total_data_points": sum(data_by_metric.values()),
+            "data_by_metric": data_by_metric,
+            "recent_data_points": recent_data_points,
+            "data_quality_score": self._calculate_data_quality_score(recent_data_points),
+            "watermarks": self.feature_store.watermarks
         }
 
-    def _calculate_data_quality_score(self) -> float:
+    def _data_count(self, metric: PerformanceMetric) -> int:
+        """Stored rows for a metric; metrics without collected features have none."""
+        return self.feature_store.rows(metric.value) if metric.value in FEATURE_COLUMNS else 0
+
+    def _count_recent_data_points(self) -> int:
+        """Rows describing missions updated in the last 24 hours."""
+        since = (datetime.utcnow() - timedelta(hours=24)).replace(tzinfo=timezone.utc).timestamp()
+        return sum(self.feature_store.count_since(metric, since) for metric in FEATURE_COLUMNS)
+
+    def _calculate_data_quality_score(self, recent_data_points: Optional[int] = None) -> float:
         """Calculate data quality score."""
-        if not self.learning_data:
+        if not any(self._data_count(metric) for metric in PerformanceMetric):
             return 0.0
         
         # Simple data quality assessment
-        recent_data = [dp for dp in self.learning_data if dp.timestamp >= datetime.utcnow() - timedelta(hours=24)]
+        if recent_data_points is None:
+            recent_data_points = self._count_recent_data_points()
         
-        if len(recent_data) < 10:
+        if recent_data_points < 10:
             return 0.3
-        elif len(recent_data) < 50:
+        elif recent_data_points < 50:
             return 0.6
         else:
             return 0.9
@@ -1006,7 +1019,7 @@ class LearningSystem:
     async def reset_learning_models(self):
         """Reset all learning models."""
         self.learning_models.clear()
-        self.learning_data.clear()
+        await asyncio.to_thread(self.feature_store.reset)
         self.performance_improvements.clear()
         self.improvement_history.clear()
         
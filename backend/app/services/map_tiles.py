@@ -0,0 +1,526 @@
+"""
+Map tiles for SAR Mission Commander dashboards
+Pre-aggregates a mission's drone tracks, discoveries and search coverage into
+Web Mercator z/x/y tiles as compact JSON, kept current as telemetry arrives
+
+Each zoom level keeps its own Douglas-Peucker simplification of every track at
+one screen pixel, built incrementally: points collect in a tail behind the
+last committed vertex and once it is TAIL_POINTS long one Douglas-Peucker
+ranking of the tail gives its vertices at every zoom, anchored on that
+vertex, so the pixel bound holds along the whole track. The
+committed segments are filed under the tiles they cross; the tail is drawn as
+it is. Discoveries are clustered on a screen grid below the deepest zoom and
+coverage is sampled from the mission's live CoverageGrid.
+
+Rendered tiles sit in an LRU cache keyed by tile and checked against a
+per-tile version that every change to the tile bumps, which doubles as the
+ETag, so a dashboard only fetches the tiles it can see and only again when
+they have changed.
+"""
+
+import itertools
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.event_bus import event_bus, Event, DISCOVERY_CREATED, TELEMETRY
+from .coverage_grid import CoverageGrid, position_coordinates
+from .mission_export import MissionSource, douglas_peucker, douglas_peucker_rank
+
+logger = logging.getLogger(__name__)
+
+TILE_PX = 256
+EXTENT = 4096  # tile coordinates run 0..EXTENT, as in vector tiles
+TAIL_POINTS = 64  # raw points behind the last vertex before they are simplified
+CLUSTER_PX = 32  # discoveries closer than this on screen share a marker below the deepest zoom
+COVERAGE_CELLS = 32  # coverage cells per tile side; one bit each
+MAX_LAT = 85.05112878
+
+
+class TileError(ValueError):
+    """A tile outside the pyramid"""
+
+
+# ------------------------------------------------------------------ projection
+
+def to_world(lats, lngs) -> Tuple[np.ndarray, np.ndarray]:
+    """Web Mercator position in [0, 1), x east and y south"""
+    lats = np.clip(np.asarray(lats, dtype=np.float64), -MAX_LAT, MAX_LAT)
+    x = (np.asarray(lngs, dtype=np.float64) + 180.0) / 360.0
+    y = 0.5 - np.log(np.tan(np.pi / 4 + np.radians(lats) / 2)) / (2 * np.pi)
+    return x, y
+
+
+def from_world(x, y) -> Tuple[np.ndarray, np.ndarray]:
+    """(lat, lng) of world positions"""
+    lats = np.degrees(2 * np.arctan(np.exp((0.5 - np.asarray(y, dtype=np.float64)) * 2 * np.pi)) - np.pi / 2)
+    return lats, np.asarray(x, dtype=np.float64) * 360.0 - 180.0
+
+
+def tile_bounds(z: int, x: int, y: int) -> Dict[str, float]:
+    (north, south), (west, east) = from_world([x / (1 << z), (x + 1) / (1 << z)], [y / (1 << z), (y + 1) / (1 << z)])
+    return {"north": float(north), "south": float(south), "east": float(east), "west": float(west)}
+
+
+def pixel_tolerance(zoom: int) -> float:
+    """One screen pixel at zoom, in world units"""
+    return 1.0 / (TILE_PX << zoom)
+
+
+def simplify_for_zoom(lats: Sequence[float], lngs: Sequence[float], zoom: int) -> np.ndarray:
+    """Mask of the track points that still matter on screen at zoom"""
+    x, y = to_world(lats, lngs)
+    return douglas_peucker(x, y, pixel_tolerance(zoom))
+
+
+def _micros(values) -> np.ndarray:
+    """Microseconds since the epoch, for datetimes or datetime64 values"""
+    if isinstance(values, datetime):
+        if values.tzinfo is not None:
+            values = values.astimezone(timezone.utc).replace(tzinfo=None)
+        values = [np.datetime64(values, "us")]
+    return np.asarray(values).astype("datetime64[us]").astype(np.int64)
+
+
+def _encode_line(x: np.ndarray, y: np.ndarray, scale: int, tx: int, ty: int) -> Optional[List[int]]:
+    """Tile coordinates as [x0, y0, dx1, dy1, ...], repeated points dropped"""
+    ix = np.rint((x * scale - tx) * EXTENT).astype(np.int64)
+    iy = np.rint((y * scale - ty) * EXTENT).astype(np.int64)
+    moved = np.ones(len(ix), dtype=bool)
+    moved[1:] = (np.diff(ix) != 0) | (np.diff(iy) != 0)
+    ix, iy = ix[moved], iy[moved]
+    if len(ix) < 2:
+        return None
+    flat = np.empty(2 * len(ix), dtype=np.int64)
+    flat[0::2] = np.diff(ix, prepend=0)
+    flat[1::2] = np.diff(iy, prepend=0)
+    return flat.tolist()
+
+
+class _Growable:
+    """Append-only numpy array with amortised growth"""
+
+    def __init__(self, dtype):
+        self._data = np.empty(16, dtype=dtype)
+        self.size = 0
+
+    def append(self, values: np.ndarray):
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            data = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    @property
+    def view(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    def __len__(self):
+        return self.size
+
+
+class DroneTrack:
+    """One drone's positions in world units and its vertices at each zoom"""
+
+    def __init__(self, drone_id: str, zooms: Sequence[int]):
+        self.drone_id = drone_id
+        self.x = _Growable(np.float64)
+        self.y = _Growable(np.float64)
+        self.last_time: Optional[int] = None
+        self.battery: Optional[float] = None
+        self.kept = {zoom: _Growable(np.int64) for zoom in zooms}  # indices into x/y, committed vertices
+        self.anchor = 0  # last committed vertex, the same at every zoom; the tail runs from here
+
+    def __len__(self):
+        return len(self.x)
+
+
+class MissionTiles:
+    """Tracks, discoveries and the per-zoom tile index of one mission"""
+
+    _generations = itertools.count(1)
+
+    def __init__(self, min_zoom: int, max_zoom: int):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.zooms = range(min_zoom, max_zoom + 1)
+        self.generation = next(self._generations)  # tells a rebuilt mission's tiles from the old ones
+        self.drones: Dict[str, DroneTrack] = {}
+        # zoom -> (tile x, tile y) -> drone -> arrays of segment numbers; segment k joins vertices k and k + 1
+        self.segments: Dict[int, Dict[Tuple[int, int], Dict[str, List[np.ndarray]]]] = {z: {} for z in self.zooms}
+        self.versions: Dict[Tuple[int, int, int], int] = {}
+        self.discoveries: List[Dict[str, Any]] = []
+        self._discovery_xy = _Growable(np.float64)  # x0, y0, x1, y1, ...
+        self.points = 0
+
+    # --------------------------------------------------------------- updates
+
+    def load(self, source: MissionSource):
+        """Add a mission's history, a chunk of telemetry at a time"""
+        for chunk in source.tracks():
+            self.add_points(chunk.drone_id, chunk.columns["latitude"], chunk.columns["longitude"],
+                            chunk.columns["timestamp"], chunk.columns["battery"])
+        for discovery in source.discoveries():
+            self.add_discovery(discovery)
+
+    def add_points(self, drone_id: str, lats, lngs, timestamps=None, battery=None) -> int:
+        """Append positions to a drone's track; points no newer than its last one are ignored"""
+        x, y = to_world(lats, lngs)
+        if timestamps is not None:
+            times = _micros(timestamps)
+            track = self.drones.get(drone_id)
+            if track is not None and track.last_time is not None:
+                fresh = times > track.last_time
+                x, y, times = x[fresh], y[fresh], times[fresh]
+                battery = None if battery is None else np.asarray(battery, dtype=np.float64)[fresh]
+        if not len(x):
+            return 0
+
+        track = self.drones.get(drone_id)
+        if track is None:
+            track = self.drones[drone_id] = DroneTrack(drone_id, self.zooms)
+        start = len(track)
+        if start:
+            # The drone's marker leaves the tile it was in
+            x_bump, y_bump = np.append(track.x.view[-1], x), np.append(track.y.view[-1], y)
+        else:
+            x_bump, y_bump = x, y
+        track.x.append(x)
+        track.y.append(y)
+        if timestamps is not None:
+            track.last_time = int(times[-1])
+        if battery is not None:
+            levels = np.asarray(battery, dtype=np.float64)
+            levels = levels[~np.isnan(levels)]
+            if len(levels):
+                track.battery = float(levels[-1])
+        self.points += len(x)
+
+        for zoom in self.zooms:
+            scale = 1 << zoom
+            self._bump(zoom, np.floor(x_bump * scale).astype(np.int64), np.floor(y_bump * scale).astype(np.int64))
+            if not start:
+                track.kept[zoom].append(np.zeros(1, dtype=np.int64))
+        if len(track) - 1 - track.anchor >= TAIL_POINTS:
+            self._commit(track)
+        return len(x)
+
+    def add_discovery(self, discovery: Dict[str, Any]) -> bool:
+        lat, lng = discovery.get("latitude"), discovery.get("longitude")
+        if lat is None or lng is None:
+            return False
+        if discovery.get("id") is not None and any(d.get("id") == discovery["id"] for d in self.discoveries):
+            return False
+        x, y = to_world([lat], [lng])
+        self._discovery_xy.append(np.array([x[0], y[0]]))
+        self.discoveries.append({"id": discovery.get("id"), "discovery_type": discovery.get("discovery_type"),
+                                 "confidence": discovery.get("confidence") or 0.0})
+        for zoom in self.zooms:
+            scale = 1 << zoom
+            self._bump(zoom, np.floor(x * scale).astype(np.int64), np.floor(y * scale).astype(np.int64))
+        return True
+
+    def _commit(self, track: DroneTrack):
+        """Simplify the tail behind the anchor at every zoom and file the new segments"""
+        anchor = track.anchor
+        rank = douglas_peucker_rank(track.x.view[anchor:], track.y.view[anchor:], pixel_tolerance(self.max_zoom))
+        for zoom in self.zooms:
+            kept = track.kept[zoom]
+            first = len(kept) - 1
+            kept.append(anchor + np.flatnonzero(rank > pixel_tolerance(zoom))[1:])
+            self._file(track, zoom, first)
+        track.anchor = len(track) - 1
+
+    def _file(self, track: DroneTrack, zoom: int, first: int):
+        """Index segments from number ``first`` on under the tiles their bounding boxes cover"""
+        kept = track.kept[zoom]
+        vertices = kept.view[first:]
+        scale = 1 << zoom
+        xs, ys = track.x.view[vertices] * scale, track.y.view[vertices] * scale
+        tx0 = np.floor(np.minimum(xs[:-1], xs[1:])).astype(np.int64)
+        tx1 = np.floor(np.maximum(xs[:-1], xs[1:])).astype(np.int64)
+        ty0 = np.floor(np.minimum(ys[:-1], ys[1:])).astype(np.int64)
+        ty1 = np.floor(np.maximum(ys[:-1], ys[1:])).astype(np.int64)
+        numbers = np.arange(first, len(kept) - 1)
+
+        # Segments crossing tile edges go under every tile of their bounding box
+        crossing = np.flatnonzero((tx0 != tx1) | (ty0 != ty1))
+        width, height = tx1[crossing] - tx0[crossing] + 1, ty1[crossing] - ty0[crossing] + 1
+        cells = width * height
+        owner = np.repeat(np.arange(len(crossing)), cells)
+        cell = np.arange(cells.sum()) - np.repeat(np.cumsum(cells) - cells, cells)
+        single = np.ones(len(numbers), dtype=bool)
+        single[crossing] = False
+        tile_x = np.concatenate((tx0[single], tx0[crossing][owner] + cell % width[owner]))
+        tile_y = np.concatenate((ty0[single], ty0[crossing][owner] + cell // width[owner]))
+        filed = np.concatenate((numbers[single], numbers[crossing][owner]))
+
+        keys = tile_x * scale + tile_y
+        order = np.lexsort((filed, keys))
+        keys, filed = keys[order], filed[order]
+        unique, starts = np.unique(keys, return_index=True)
+        index = self.segments[zoom]
+        for key, part in zip(unique.tolist(), np.split(filed, starts[1:])):
+            index.setdefault(divmod(key, scale), {}).setdefault(track.drone_id, []).append(part)
+        self._bump(zoom, *np.divmod(unique, scale))
+
+    def _bump(self, zoom: int, tile_x: np.ndarray, tile_y: np.ndarray):
+        scale = 1 << zoom
+        for key in np.unique(tile_x * scale + tile_y).tolist():
+            tile = (zoom,) + divmod(key, scale)
+            self.versions[tile] = self.versions.get(tile, 0) + 1
+
+    # ------------------------------------------------------------- rendering
+
+    def bounds(self) -> Optional[Dict[str, float]]:
+        xs = [track.x.view for track in self.drones.values()] + [self._discovery_xy.view[0::2]]
+        ys = [track.y.view for track in self.drones.values()] + [self._discovery_xy.view[1::2]]
+        x, y = np.concatenate(xs), np.concatenate(ys)
+        if not len(x):
+            return None
+        (north, south), (west, east) = from_world([x.min(), x.max()], [y.min(), y.max()])
+        return {"north": float(north), "south": float(south), "east": float(east), "west": float(west)}
+
+    def render(self, z: int, x: int, y: int, coverage: Optional[CoverageGrid] = None) -> Dict[str, Any]:
+        scale = 1 << z
+        tracks = []
+        filed = self.segments[z].get((x, y), {})
+        for drone_id, track in self.drones.items():
+            lines = []
+            parts = filed.get(drone_id)
+            if parts:
+                numbers = np.unique(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+                filed[drone_id] = [numbers]
+                vertices = track.kept[z].view
+                for run in np.split(numbers, np.flatnonzero(np.diff(numbers) != 1) + 1):
+                    chosen = vertices[run[0]:run[-1] + 2]
+                    line = _encode_line(track.x.view[chosen], track.y.view[chosen], scale, x, y)
+                    if line:
+                        lines.append(line)
+            anchor = track.anchor
+            if anchor < len(track) - 1:
+                tail_x, tail_y = track.x.view[anchor:] * scale, track.y.view[anchor:] * scale
+                if tail_x.max() >= x and tail_x.min() < x + 1 and tail_y.max() >= y and tail_y.min() < y + 1:
+                    line = _encode_line(track.x.view[anchor:], track.y.view[anchor:], scale, x, y)
+                    if line:
+                        lines.append(line)
+            if lines:
+                tracks.append({"drone_id": drone_id, "lines": lines})
+
+        positions = []
+        for drone_id, track in self.drones.items():
+            px, py = track.x.view[-1] * scale - x, track.y.view[-1] * scale - y
+            if 0 <= px < 1 and 0 <= py < 1:
+                positions.append({"drone_id": drone_id, "x": int(px * EXTENT), "y": int(py * EXTENT),
+                                  "battery": track.battery})
+
+        tile = {"z": z, "x": x, "y": y, "extent": EXTENT, "tracks": tracks, "positions": positions,
+                "discoveries": self._render_discoveries(z, x, y)}
+        if coverage is not None:
+            rows = self._render_coverage(z, x, y, coverage)
+            if rows is not None:
+                tile["coverage"] = {"size": COVERAGE_CELLS, "rows": rows}
+        return tile
+
+    def _render_discoveries(self, z: int, x: int, y: int) -> List[Dict[str, Any]]:
+        if not self.discoveries:
+            return []
+        scale = 1 << z
+        xy = self._discovery_xy.view
+        px, py = xy[0::2] * scale - x, xy[1::2] * scale - y
+        inside = np.flatnonzero((px >= 0) & (px < 1) & (py >= 0) & (py < 1))
+        if z < self.max_zoom:
+            cells = TILE_PX // CLUSTER_PX
+            keys = np.floor(py[inside] * cells).astype(np.int64) * cells + np.floor(px[inside] * cells).astype(np.int64)
+        else:
+            keys = np.arange(len(inside))
+        markers = []
+        for key in np.unique(keys):
+            members = inside[keys == key]
+            top = max(members.tolist(), key=lambda i: self.discoveries[i]["confidence"])
+            markers.append({"x": int(px[members].mean() * EXTENT), "y": int(py[members].mean() * EXTENT),
+                            "count": len(members), **self.discoveries[top]})
+        return markers
+
+    @staticmethod
+    def _render_coverage(z: int, x: int, y: int, coverage: CoverageGrid) -> Optional[List[int]]:
+        """Bit rows, north first, with bit i set when the cell i from the west edge was seen"""
+        centres = (np.arange(COVERAGE_CELLS) + 0.5) / (COVERAGE_CELLS << z)
+        world_x, world_y = np.meshgrid(x / (1 << z) + centres, y / (1 << z) + centres)
+        lats, lngs = from_world(world_x.ravel(), world_y.ravel())
+        seen = coverage.covered_at(lats, lngs).reshape(COVERAGE_CELLS, COVERAGE_CELLS)
+        if not seen.any():
+            return None
+        bits = np.left_shift(1, np.arange(COVERAGE_CELLS, dtype=np.int64))
+        return (seen * bits).sum(axis=1).tolist()
+
+    def version(self, z: int, x: int, y: int) -> int:
+        return self.versions.get((z, x, y), 0)
+
+
+def _coverage_token(z: int, x: int, y: int, coverage: Optional[CoverageGrid]) -> Optional[int]:
+    """Changes whenever the coverage under the tile does"""
+    return coverage.covered_cells_in(tile_bounds(z, x, y)) if coverage is not None else None
+
+
+class MapTileService:
+    """Tile layers for the missions dashboards are looking at, and their rendered tiles"""
+
+    def __init__(self, min_zoom: Optional[int] = None, max_zoom: Optional[int] = None,
+                 cache_size: Optional[int] = None, max_missions: Optional[int] = None):
+        self.min_zoom = settings.MAP_TILE_MIN_ZOOM if min_zoom is None else min_zoom
+        self.max_zoom = settings.MAP_TILE_MAX_ZOOM if max_zoom is None else max_zoom
+        self.cache_size = cache_size or settings.MAP_TILE_CACHE_SIZE
+        self.max_missions = max_missions or settings.MAP_TILE_MAX_MISSIONS
+        self._lock = threading.RLock()
+        self._missions: "OrderedDict[str, MissionTiles]" = OrderedDict()
+        self._loading: Dict[str, threading.Event] = {}
+        self._backlog: Dict[str, List[Tuple[str, Any]]] = {}
+        self._cache: "OrderedDict[Tuple[str, int, int, int], Tuple[Tuple, str, bytes]]" = OrderedDict()
+        self._unsubscribe: List[Callable[[], None]] = []
+        self.stats = {"hits": 0, "misses": 0, "bytes_rendered": 0, "points": 0}
+
+    def subscribe(self):
+        """Keep loaded missions current from telemetry and discovery events"""
+        if self._unsubscribe:
+            return
+        self._unsubscribe = [
+            event_bus.subscribe(TELEMETRY, self._on_telemetry),
+            event_bus.subscribe(DISCOVERY_CREATED, self._on_discovery),
+        ]
+
+    def close(self):
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+
+    def mission(self, key: str, loader: Callable[[], MissionSource]) -> MissionTiles:
+        """The mission's tiles, built from loader() the first time they are asked for
+
+        Loading runs without the lock; events for the mission meanwhile are
+        held back and applied once its history is in, older points dropped.
+        """
+        with self._lock:
+            layer = self._missions.get(key)
+            if layer is not None:
+                self._missions.move_to_end(key)
+                return layer
+            loading = self._loading.get(key)
+            owner = loading is None
+            if owner:
+                loading = self._loading[key] = threading.Event()
+                self._backlog[key] = []
+        if not owner:
+            loading.wait()
+            return self.mission(key, loader)
+
+        layer = None
+        try:
+            built = MissionTiles(self.min_zoom, self.max_zoom)
+            built.load(loader())
+            layer = built
+        finally:
+            with self._lock:
+                backlog = self._backlog.pop(key)
+                del self._loading[key]
+                if layer is not None:
+                    for kind, item in backlog:
+                        if kind == "telemetry":
+                            layer.add_points(*item)
+                        else:
+                            layer.add_discovery(item)
+                    self._missions[key] = layer
+                    while len(self._missions) > self.max_missions:
+                        evicted, _ = self._missions.popitem(last=False)
+                        logger.info(f"Dropped map tiles of mission {evicted}")
+                    self.stats["points"] = sum(m.points for m in self._missions.values())
+            loading.set()
+        logger.info(f"Loaded map tiles of mission {key}: {layer.points} points, {len(layer.drones)} drones")
+        return layer
+
+    def add_points(self, key: str, drone_id: str, lats, lngs, timestamps=None, battery=None) -> int:
+        """Append telemetry to a loaded (or loading) mission; others are read from the database later"""
+        with self._lock:
+            if key in self._backlog:
+                self._backlog[key].append(("telemetry", (drone_id, lats, lngs, timestamps, battery)))
+                return 0
+            layer = self._missions.get(key)
+            if layer is None:
+                return 0
+            added = layer.add_points(drone_id, lats, lngs, timestamps, battery)
+            self.stats["points"] += added
+            return added
+
+    def add_discovery(self, key: str, discovery: Dict[str, Any]) -> bool:
+        with self._lock:
+            if key in self._backlog:
+                self._backlog[key].append(("discovery", discovery))
+                return False
+            layer = self._missions.get(key)
+            return layer.add_discovery(discovery) if layer is not None else False
+
+    def tile(self, key: str, z: int, x: int, y: int, loader: Callable[[], MissionSource],
+             coverage: Optional[CoverageGrid] = None) -> Tuple[str, bytes]:
+        """(ETag, JSON body) of one tile, rendered only if it changed since it was cached"""
+        if not self.min_zoom <= z <= self.max_zoom:
+            raise TileError(f"zoom {z} is outside {self.min_zoom}-{self.max_zoom}")
+        if not (0 <= x < 1 << z and 0 <= y < 1 << z):
+            raise TileError(f"tile {x}/{y} does not exist at zoom {z}")
+        layer = self.mission(key, loader)
+        with self._lock:
+            version = (layer.generation, layer.version(z, x, y), _coverage_token(z, x, y, coverage))
+            cache_key = (key, z, x, y)
+            cached = self._cache.get(cache_key)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(cache_key)
+                self.stats["hits"] += 1
+                return cached[1], cached[2]
+            self.stats["misses"] += 1
+            body = json.dumps(layer.render(z, x, y, coverage), separators=(",", ":")).encode()
+            etag = '"{}-{}-{}"'.format(*(v if v is not None else "" for v in version))
+            self._cache[cache_key] = (version, etag, body)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self.stats["bytes_rendered"] += len(body)
+            return etag, body
+
+    def drop(self, key: str):
+        with self._lock:
+            self._missions.pop(key, None)
+
+    def _on_telemetry(self, event: Event):
+        if event.mission_id is None:
+            return
+        telemetry = event.data
+        point = position_coordinates(telemetry.position)
+        if point is None:
+            return
+        self.add_points(event.mission_id, telemetry.drone_id, [point[0]], [point[1]],
+                        telemetry.timestamp, [telemetry.battery_level])
+
+    def _on_discovery(self, event: Event):
+        if event.mission_id is not None:
+            self.add_discovery(event.mission_id, event.data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "missions": len(self._missions),
+                "cached_tiles": len(self._cache),
+                "cached_bytes": sum(len(entry[2]) for entry in self._cache.values()),
+                "zooms": [self.min_zoom, self.max_zoom],
+            }
+
+
+# Global map tile service instance
+map_tile_service = MapTileService()
@@ -3,17 +3,21 @@ Mission Execution Service for SAR Mission Commander
 Handles automated mission coordination and execution
 """
 import asyncio
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass, field
 import json
+import math
 
+from ..core.config import settings
 from ..core.database import SessionLocal
+from ..core.event_bus import event_bus, Event, DISCOVERY_CREATED, DRONE_STATUS, MISSION_STATE, TELEMETRY
 from ..models.mission import Mission, MissionStatus
 from ..models.drone import Drone
 from ..models.discovery import Discovery
-from ..services.drone_manager import drone_manager, DroneCommand, DroneCommandType
+from ..services.drone_manager import drone_manager, DroneCommand, DroneCommandType, TelemetryData
+from ..services.coverage_grid import CoverageGrid, polygon_from_search_area, position_coordinates
 from ..utils.logging import get_logger
 from ..utils.geometry import calculate_search_pattern, calculate_area_coverage
 
@@ -35,8 +39,19 @@ class MissionExecution:
     estimated_completion: Optional[datetime] = None
     assigned_drones: List[str] = field(default_factory=list)
     search_progress: Dict[str, float] = field(default_factory=dict)  # drone_id -> coverage_percentage
-    discoveries: List[str] = field(default_factory=list)  # discovery_ids
+    discoveries: Set[int] = field(default_factory=set)  # discovery ids
     status_updates: List[Dict] = field(default_factory=list)
+    coverage: Optional[CoverageGrid] = None  # footprints stamped from telemetry
+    search_altitude: Optional[float] = None  # for samples without an altitude
+    pending_telemetry: List[TelemetryData] = field(default_factory=list)
+    time_limit_minutes: Optional[float] = None
+    lost_drones: Set[str] = field(default_factory=set)  # assigned drones no longer searching
+    stop_requested: bool = False  # mission ended elsewhere; leave the search loop
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)  # set by events the search loop acts on
+    timeout_handle: Optional[asyncio.TimerHandle] = None
+
+SOURCE = "mission_execution"
+SEARCHING_STATUSES = {"mission", "flying"}
 
 class MissionExecutionService:
     """Manages mission execution and coordination"""
@@ -45,20 +60,24 @@ class MissionExecutionService:
         self.active_executions: Dict[str, MissionExecution] = {}
         self.execution_tasks: Dict[str, asyncio.Task] = {}
         self._running = False
+        self._unsubscribe: List[Callable[[], None]] = []
         
     async def start(self):
         """Start the mission execution service"""
         self._running = True
+        self._subscribe()
         logger.info("Mission Execution service started")
         
-        # Start background monitoring task
-        asyncio.create_task(self._monitor_executions())
-        
     async def stop(self):
         """Stop the mission execution service"""
         self._running = False
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
         
         # Cancel all active execution tasks
+        for execution in self.active_executions.values():
+            self._cancel_timeout(execution)
         for task in self.execution_tasks.values():
             task.cancel()
             
@@ -93,6 +112,12 @@ class MissionExecutionService:
             )
             
             self.active_executions[mission_id] = execution
+            self._subscribe()
+            
+            # Stuck executions are stopped when their time is up, without polling
+            execution.timeout_handle = asyncio.get_running_loop().call_later(
+                settings.MAX_MISSION_DURATION, self._on_execution_timeout, mission_id
+            )
             
             # Start execution task
             execution_task = asyncio.create_task(self._execute_mission(mission_id))
@@ -131,6 +156,7 @@ class MissionExecutionService:
                     db.commit()
             finally:
                 db.close()
+            self._publish_state(execution, MissionStatus.PAUSED)
 
             logger.info(f"Mission {mission_id} paused")
             return True
@@ -165,6 +191,7 @@ class MissionExecutionService:
                     db.commit()
             finally:
                 db.close()
+            self._publish_state(execution, MissionStatus.ACTIVE)
 
             logger.info(f"Mission {mission_id} resumed")
             return True
@@ -201,8 +228,10 @@ class MissionExecutionService:
                     db.commit()
             finally:
                 db.close()
+            self._publish_state(execution, MissionStatus.COMPLETED)
 
             # Clean up execution
+            self._cancel_timeout(execution)
             if mission_id in self.execution_tasks:
                 self.execution_tasks[mission_id].cancel()
                 del self.execution_tasks[mission_id]
@@ -224,7 +253,8 @@ class MissionExecutionService:
                 return False
             
             execution = self.active_executions[mission_id]
-            execution.phase = ExecutionPhase.EMERGENCY
+            self._set_phase(execution, ExecutionPhase.EMERGENCY)
+            self._cancel_timeout(execution)
             
             # Emergency stop all assigned drones
             for drone_id in execution.assigned_drones:
@@ -244,6 +274,7 @@ class MissionExecutionService:
                     db.commit()
             finally:
                 db.close()
+            self._publish_state(execution, MissionStatus.CANCELLED)
 
             logger.warning(f"Mission {mission_id} emergency stopped")
             return True
@@ -259,9 +290,7 @@ class MissionExecutionService:
         
         execution = self.active_executions[mission_id]
         
-        # Calculate overall progress
-        total_coverage = sum(execution.search_progress.values())
-        avg_coverage = total_coverage / len(execution.search_progress) if execution.search_progress else 0
+        self._flush_coverage(execution)
         
         return {
             "mission_id": mission_id,
@@ -270,11 +299,19 @@ class MissionExecutionService:
             "estimated_completion": execution.estimated_completion.isoformat() if execution.estimated_completion else None,
             "assigned_drones": execution.assigned_drones,
             "search_progress": execution.search_progress,
-            "overall_coverage": avg_coverage,
+            "overall_coverage": self._overall_coverage(execution),
             "discoveries_count": len(execution.discoveries),
             "status_updates": execution.status_updates[-10:]  # Last 10 updates
         }
     
+    def get_coverage_gaps(self, mission_id: str, min_area_m2: float = 0.0, limit: int = 10) -> List[Dict]:
+        """Largest uncovered parts of the search area, for re-tasking drones"""
+        execution = self.active_executions.get(mission_id)
+        if not execution or not execution.coverage:
+            return []
+        self._flush_coverage(execution)
+        return execution.coverage.find_gaps(min_area_m2=min_area_m2, limit=limit)
+    
     async def _execute_mission(self, mission_id: str):
         """Execute a mission (main execution loop)"""
         try:
@@ -305,7 +342,7 @@ class MissionExecutionService:
     async def _planning_phase(self, mission_id: str):
         """Planning phase - assign drones and create search pattern"""
         execution = self.active_executions[mission_id]
-        execution.phase = ExecutionPhase.PLANNING
+        self._set_phase(execution, ExecutionPhase.PLANNING)
         
         logger.info(f"Mission {mission_id} - Planning phase started")
         
@@ -337,15 +374,17 @@ class MissionExecutionService:
             # Update mission status
             mission.status = MissionStatus.ACTIVE
             mission.start_time = datetime.utcnow()
+            execution.time_limit_minutes = mission.time_limit_minutes
             db.commit()
         finally:
             db.close()
 
         execution.start_time = datetime.utcnow()
+        self._publish_state(execution, MissionStatus.ACTIVE)
         
         # Estimate completion time
-        if mission.time_limit_minutes:
-            execution.estimated_completion = datetime.utcnow() + timedelta(minutes=mission.time_limit_minutes)
+        if execution.time_limit_minutes:
+            execution.estimated_completion = execution.start_time + timedelta(minutes=execution.time_limit_minutes)
         
         self._add_status_update(execution, "Planning completed", f"Assigned {assigned_count} drones")
         logger.info(f"Mission {mission_id} - Planning completed with {assigned_count} drones")
@@ -353,7 +392,7 @@ class MissionExecutionService:
     async def _preparation_phase(self, mission_id: str):
         """Preparation phase - prepare drones and systems"""
         execution = self.active_executions[mission_id]
-        execution.phase = ExecutionPhase.PREPARATION
+        self._set_phase(execution, ExecutionPhase.PREPARATION)
         
         logger.info(f"Mission {mission_id} - Preparation phase started")
         
@@ -389,10 +428,22 @@ class MissionExecutionService:
     async def _search_phase(self, mission_id: str):
         """Search phase - execute search pattern"""
         execution = self.active_executions[mission_id]
-        execution.phase = ExecutionPhase.SEARCH
+        self._set_phase(execution, ExecutionPhase.SEARCH)
         
         logger.info(f"Mission {mission_id} - Search phase started")
         
+        # Coverage is stamped from the drones' telemetry footprints
+        db = SessionLocal()
+        try:
+            mission = db.query(Mission).filter(Mission.id == mission_id).first()
+            if mission:
+                execution.coverage = self._create_coverage_grid(mission)
+                execution.search_altitude = mission.search_altitude or mission.altitude
+        finally:
+            db.close()
+        if execution.coverage is None:
+            logger.warning(f"Mission {mission_id} has no search area - coverage cannot be tracked")
+        
         # Start search for all drones
         for drone_id in execution.assigned_drones:
             await drone_manager.send_command(DroneCommand(
@@ -401,74 +452,56 @@ class MissionExecutionService:
                 priority=1
             ))
         
-        # Monitor search progress
-        search_start_time = datetime.utcnow()
-        while execution.phase == ExecutionPhase.SEARCH:
-            await asyncio.sleep(30)  # Check progress every 30 seconds
-            
-            # Update search progress (simulated)
-            for drone_id in execution.assigned_drones:
-                drone_status = drone_manager.get_drone_status(drone_id)
-                if drone_status and drone_status["status"] == "mission":
-                    # Simulate progress based on time elapsed
-                    elapsed_minutes = (datetime.utcnow() - search_start_time).total_seconds() / 60
-                    progress = min(elapsed_minutes * 2, 100)  # 2% per minute
-                    execution.search_progress[drone_id] = progress
-            
-            # Check if search should continue
-            db = SessionLocal()
-            try:
-                mission = db.query(Mission).filter(Mission.id == mission_id).first()
-                if mission:
-                    # Check time limit
-                    if mission.time_limit_minutes:
-                        elapsed = (datetime.utcnow() - execution.start_time).total_seconds() / 60
-                        if elapsed >= mission.time_limit_minutes:
-                            logger.info(f"Mission {mission_id} - Time limit reached")
-                            break
-                    
-                    # Check area coverage
-                    total_coverage = sum(execution.search_progress.values())
-                    avg_coverage = total_coverage / len(execution.search_progress)
-                    if avg_coverage >= 95:  # 95% coverage threshold
-                        logger.info(f"Mission {mission_id} - Search area coverage completed")
-                        break
-            finally:
-                db.close()
-
-            # Check for discoveries
-            db = SessionLocal()
-            try:
-                discoveries = db.query(Discovery).filter(
-                    Discovery.mission_id == mission_id,
-                    Discovery.timestamp >= execution.start_time
-                ).all()
-
-                for discovery in discoveries:
-                    if discovery.id not in execution.discoveries:
-                        execution.discoveries.append(discovery.id)
-                        self._add_status_update(
-                            execution,
-                            "Discovery found",
-                            f"Found {discovery.type} with {discovery.confidence*100:.1f}% confidence"
-                        )
-            finally:
-                db.close()
+        await self._monitor_search(execution)
         
-        self._add_status_update(execution, "Search completed", f"Covered {sum(execution.search_progress.values())/len(execution.search_progress):.1f}% of area")
+        self._flush_coverage(execution)
+        self._add_status_update(execution, "Search completed", f"Covered {self._overall_coverage(execution):.1f}% of area")
         logger.info(f"Mission {mission_id} - Search phase completed")
     
+    async def _monitor_search(self, execution: MissionExecution):
+        """Wait until the search should end"""
+        # Discoveries, drone status and telemetry arrive as events; the loop only
+        # wakes for them, to flush coverage and at the time limit
+        deadline = None
+        if execution.time_limit_minutes:
+            deadline = execution.start_time + timedelta(minutes=execution.time_limit_minutes)
+        while execution.phase == ExecutionPhase.SEARCH:
+            timeout = settings.MISSION_MONITOR_INTERVAL
+            if deadline:
+                timeout = min(timeout, max(0.0, (deadline - datetime.utcnow()).total_seconds()))
+            try:
+                await asyncio.wait_for(execution.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            execution.wakeup.clear()
+            
+            # Stamp the telemetry received since the last flush
+            self._flush_coverage(execution)
+            
+            if execution.stop_requested:
+                logger.info(f"Mission {execution.mission_id} - Mission ended externally")
+                break
+            if deadline and datetime.utcnow() >= deadline:
+                logger.info(f"Mission {execution.mission_id} - Time limit reached")
+                break
+            if self._overall_coverage(execution) >= 95:  # 95% coverage threshold
+                logger.info(f"Mission {execution.mission_id} - Search area coverage completed")
+                break
+            if execution.assigned_drones and execution.lost_drones >= set(execution.assigned_drones):
+                logger.warning(f"Mission {execution.mission_id} - No drones left searching")
+                break
+    
     async def _investigation_phase(self, mission_id: str):
         """Investigation phase - investigate discoveries"""
         execution = self.active_executions[mission_id]
-        execution.phase = ExecutionPhase.INVESTIGATION
+        self._set_phase(execution, ExecutionPhase.INVESTIGATION)
         
         logger.info(f"Mission {mission_id} - Investigation phase started")
         
         # For each discovery, send drones for closer investigation
         db = SessionLocal()
         try:
-            discoveries = db.query(Discovery).filter(Discovery.id.in_(execution.discoveries)).all()
+            discoveries = db.query(Discovery).filter(Discovery.id.in_(list(execution.discoveries))).all()
 
             for discovery in discoveries:
                 # Find closest drone
@@ -480,7 +513,7 @@ class MissionExecutionService:
                     if drone_status:
                         # Calculate distance (simplified)
                         drone_pos = drone_status["position"]
-                        discovery_pos = {"latitude": discovery.position_latitude, "longitude": discovery.position_longitude}
+                        discovery_pos = {"latitude": discovery.latitude, "longitude": discovery.longitude}
                         distance = self._calculate_distance(drone_pos, discovery_pos)
                         
                         if distance < min_distance:
@@ -493,8 +526,8 @@ class MissionExecutionService:
                         drone_id=closest_drone,
                         command_type=DroneCommandType.CHANGE_HEADING,
                         parameters={
-                            "target_latitude": discovery.position_latitude,
-                            "target_longitude": discovery.position_longitude
+                            "target_latitude": discovery.latitude,
+                            "target_longitude": discovery.longitude
                         },
                         priority=2
                     ))
@@ -502,7 +535,7 @@ class MissionExecutionService:
                     self._add_status_update(
                         execution,
                         "Investigation started",
-                        f"Drone {closest_drone} investigating {discovery.type}"
+                        f"Drone {closest_drone} investigating {discovery.discovery_type}"
                     )
                     
                     # Wait for investigation
@@ -516,7 +549,7 @@ class MissionExecutionService:
     async def _completion_phase(self, mission_id: str):
         """Completion phase - finalize mission"""
         execution = self.active_executions[mission_id]
-        execution.phase = ExecutionPhase.COMPLETION
+        self._set_phase(execution, ExecutionPhase.COMPLETION)
         
         logger.info(f"Mission {mission_id} - Completion phase started")
         
@@ -540,13 +573,15 @@ class MissionExecutionService:
                 mission.end_time = datetime.utcnow()
 
                 # Calculate final statistics
-                total_coverage = sum(execution.search_progress.values())
-                mission.area_covered = total_coverage / len(execution.search_progress) if execution.search_progress else 0
+                self._flush_coverage(execution)
+                mission.area_covered = self._overall_coverage(execution)
                 mission.discoveries_found = len(execution.discoveries)
 
                 db.commit()
         finally:
             db.close()
+        self._cancel_timeout(execution)
+        self._publish_state(execution, MissionStatus.COMPLETED)
 
         self._add_status_update(execution, "Mission completed", f"Found {len(execution.discoveries)} discoveries")
         logger.info(f"Mission {mission_id} - Mission completed successfully")
@@ -557,6 +592,7 @@ class MissionExecutionService:
             # Emergency stop all drones
             if mission_id in self.active_executions:
                 execution = self.active_executions[mission_id]
+                self._cancel_timeout(execution)
                 for drone_id in execution.assigned_drones:
                     await drone_manager.send_command(DroneCommand(
                         drone_id=drone_id,
@@ -574,6 +610,8 @@ class MissionExecutionService:
                     db.commit()
             finally:
                 db.close()
+            event_bus.publish(MISSION_STATE, {"status": MissionStatus.CANCELLED.value, "error": error_message},
+                              mission_id=mission_id, source=SOURCE)
 
             # Clean up execution
             if mission_id in self.execution_tasks:
@@ -588,23 +626,121 @@ class MissionExecutionService:
         except Exception as e:
             logger.error(f"Failed to handle execution error for mission {mission_id}: {e}")
     
-    async def _monitor_executions(self):
-        """Background task to monitor all executions"""
-        while self._running:
-            try:
-                for mission_id, execution in list(self.active_executions.items()):
-                    # Check for stuck executions
-                    if execution.start_time:
-                        elapsed = datetime.utcnow() - execution.start_time
-                        if elapsed.total_seconds() > 3600:  # 1 hour timeout
-                            logger.warning(f"Mission {mission_id} execution timeout")
-                            await self.emergency_stop_mission(mission_id)
-                
-                await asyncio.sleep(60)  # Check every minute
-                
-            except Exception as e:
-                logger.error(f"Error monitoring executions: {e}")
-                await asyncio.sleep(60)
+    def _subscribe(self):
+        """React to mission events as they are published instead of polling for them"""
+        if self._unsubscribe:
+            return
+        self._unsubscribe = [
+            event_bus.subscribe(DISCOVERY_CREATED, self._on_discovery),
+            event_bus.subscribe(TELEMETRY, self._on_telemetry),
+            event_bus.subscribe(DRONE_STATUS, self._on_drone_status),
+            event_bus.subscribe(MISSION_STATE, self._on_mission_state),
+        ]
+    
+    def _on_execution_timeout(self, mission_id: str):
+        """Stop an execution that has run past MAX_MISSION_DURATION"""
+        execution = self.active_executions.get(mission_id)
+        if execution:
+            execution.timeout_handle = None
+            logger.warning(f"Mission {mission_id} execution timeout")
+            asyncio.create_task(self.emergency_stop_mission(mission_id))
+    
+    def _cancel_timeout(self, execution: MissionExecution):
+        if execution.timeout_handle:
+            execution.timeout_handle.cancel()
+            execution.timeout_handle = None
+    
+    def _on_discovery(self, event: Event):
+        """Record a new discovery for its mission"""
+        execution = self.active_executions.get(event.mission_id)
+        if not execution or execution.phase in (ExecutionPhase.COMPLETION, ExecutionPhase.EMERGENCY):
+            return
+        discovery = event.data
+        if discovery["id"] in execution.discoveries:
+            return
+        execution.discoveries.add(discovery["id"])
+        confidence = discovery.get("confidence") or 0.0
+        self._add_status_update(
+            execution,
+            "Discovery found",
+            f"Found {discovery.get('discovery_type')} with {confidence*100:.1f}% confidence"
+        )
+    
+    def _on_drone_status(self, event: Event):
+        """Track which assigned drones are still searching"""
+        execution = self.active_executions.get(event.mission_id)
+        if not execution or event.drone_id not in execution.assigned_drones:
+            return
+        status = event.data["status"]
+        if status in SEARCHING_STATUSES:
+            execution.lost_drones.discard(event.drone_id)
+        elif event.drone_id not in execution.lost_drones:
+            execution.lost_drones.add(event.drone_id)
+            self._add_status_update(execution, "Drone stopped searching", f"Drone {event.drone_id} is {status}")
+            execution.wakeup.set()
+    
+    def _on_mission_state(self, event: Event):
+        """End the search when the mission is completed or cancelled by someone else"""
+        if event.source == SOURCE:
+            return
+        execution = self.active_executions.get(event.mission_id)
+        terminal = (MissionStatus.COMPLETED.value, MissionStatus.CANCELLED.value, MissionStatus.ABORTED.value)
+        if execution and event.data.get("status") in terminal:
+            execution.stop_requested = True
+            execution.wakeup.set()
+    
+    def _create_coverage_grid(self, mission: Mission) -> Optional[CoverageGrid]:
+        """Coverage grid over the mission's search polygon, or a square around its centre"""
+        try:
+            polygon = polygon_from_search_area(mission.search_area)
+            if polygon is None and mission.center_lat is not None and mission.center_lng is not None and mission.radius:
+                dlat = mission.radius / 111320
+                dlng = mission.radius / (111320 * math.cos(math.radians(mission.center_lat)))
+                polygon = [
+                    (mission.center_lat - dlat, mission.center_lng - dlng), (mission.center_lat - dlat, mission.center_lng + dlng),
+                    (mission.center_lat + dlat, mission.center_lng + dlng), (mission.center_lat + dlat, mission.center_lng - dlng),
+                ]
+            if polygon is None:
+                return None
+            return CoverageGrid(polygon, resolution_m=settings.COVERAGE_RESOLUTION_M)
+        except Exception as e:
+            logger.error(f"Failed to build coverage grid for mission {mission.id}: {e}")
+            return None
+    
+    def _on_telemetry(self, event: Event):
+        """Buffer telemetry from drones searching an active mission"""
+        execution = self.active_executions.get(event.mission_id)
+        if execution and execution.coverage and execution.phase == ExecutionPhase.SEARCH:
+            execution.pending_telemetry.append(event.data)
+    
+    def _flush_coverage(self, execution: MissionExecution):
+        """Stamp buffered telemetry in one batch per drone and credit each drone's new coverage"""
+        if not execution.coverage or not execution.pending_telemetry:
+            return
+        samples, execution.pending_telemetry = execution.pending_telemetry, []
+        by_drone: Dict[str, List[TelemetryData]] = {}
+        for sample in samples:
+            by_drone.setdefault(sample.drone_id, []).append(sample)
+        
+        coverage = execution.coverage
+        default_altitude = execution.search_altitude or settings.DEFAULT_SEARCH_ALTITUDE
+        for drone_id, drone_samples in by_drone.items():
+            points = [position_coordinates(sample.position, default_altitude) for sample in drone_samples]
+            points = [point for point in points if point is not None]
+            if not points:
+                continue
+            lats, lngs, altitudes = zip(*points)
+            new_cells = coverage.stamp_telemetry(lats, lngs, altitudes, settings.COVERAGE_CAMERA_FOV)
+            if coverage.area_cells:
+                execution.search_progress[drone_id] = (
+                    execution.search_progress.get(drone_id, 0.0) + 100.0 * new_cells / coverage.area_cells
+                )
+    
+    def _overall_coverage(self, execution: MissionExecution) -> float:
+        """Percent of the search area seen by any drone"""
+        if execution.coverage:
+            return execution.coverage.coverage_percent
+        return sum(execution.search_progress.values()) / len(execution.search_progress) if execution.search_progress else 0.0
     
     def _add_status_update(self, execution: MissionExecution, status: str, details: str):
         """Add status update to execution"""
@@ -614,6 +750,17 @@ class MissionExecutionService:
             "details": details
         }
         execution.status_updates.append(update)
+        event_bus.publish(MISSION_STATE, {"phase": execution.phase.value, "update": update},
+                          mission_id=execution.mission_id, source=SOURCE)
+    
+    def _set_phase(self, execution: MissionExecution, phase: ExecutionPhase):
+        execution.phase = phase
+        execution.wakeup.set()
+        event_bus.publish(MISSION_STATE, {"phase": phase.value}, mission_id=execution.mission_id, source=SOURCE)
+    
+    def _publish_state(self, execution: MissionExecution, status: MissionStatus):
+        event_bus.publish(MISSION_STATE, {"phase": execution.phase.value, "status": status.value},
+                          mission_id=execution.mission_id, source=SOURCE)
     
     def _calculate_distance(self, pos1: Dict, pos2: Dict) -> float:
         """Calculate distance between two positions (simplified)"""
@@ -0,0 +1,632 @@
+"""
+Mission export for SAR Mission Commander
+Streams a mission's drone tracks, discoveries and centre as GeoJSON, CSV,
+Parquet or FlatGeobuf, reading telemetry a chunk at a time
+
+Each encoder is a generator of bytes over a MissionSource, so an export never
+holds more than EXPORT_CHUNK_ROWS telemetry rows and their encoding at once.
+stream_export drives it from a worker thread as an async generator for
+StreamingResponse. Tracks can be simplified with Douglas-Peucker on the way
+through: each chunk is simplified on its own, anchored on the last point kept
+from the one before, so the error bound holds across chunk boundaries too.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..core.config import settings
+from ..core.query import M_PER_DEG
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "geojson": ("application/geo+json", "geojson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "flatgeobuf": ("application/flatgeobuf", "fgb"),
+}
+
+TRACK_COLUMNS = ("timestamp", "latitude", "longitude", "altitude", "battery", "signal")
+DISCOVERY_COLUMNS = ("discovery_type", "confidence", "priority", "latitude", "longitude", "discovered_at")
+
+
+class ExportError(ValueError):
+    """An export that cannot be produced, e.g. an unknown format"""
+
+
+@dataclass
+class TrackChunk:
+    drone_id: str
+    columns: Dict[str, np.ndarray]  # TRACK_COLUMNS; timestamps as datetime64[us]
+    first: bool  # starts this drone's track
+
+    def __len__(self):
+        return len(self.columns["latitude"])
+
+
+@dataclass
+class MissionSource:
+    """What an export reads; tracks come ordered by drone, then time"""
+    mission: Callable[[], Dict[str, Any]]  # name, center_lat, center_lng
+    tracks: Callable[[], Iterator[TrackChunk]]
+    discoveries: Callable[[], Iterable[Dict[str, Any]]]  # DISCOVERY_COLUMNS
+
+
+# ------------------------------------------------------------- simplification
+
+def douglas_peucker_rank(x: np.ndarray, y: np.ndarray, floor: float = 0.0) -> np.ndarray:
+    """Tolerance below which Douglas-Peucker keeps each point; the ends rank infinite
+
+    A point survives a tolerance when its own split distance and those of
+    every split above it exceed it, so ``rank > tolerance`` is the
+    Douglas-Peucker mask for any tolerance at or above ``floor``, and one pass
+    serves them all. Segments are split a level of the recursion at a time,
+    every segment of a level in the same few array operations; segments whose
+    farthest point is within ``floor`` are not split further.
+    """
+    n = len(x)
+    rank = np.zeros(n)
+    if n == 0:
+        return rank
+    rank[0] = rank[-1] = np.inf
+    starts, ends, limits = np.array([0]), np.array([n - 1]), np.array([np.inf])
+    while len(starts):
+        counts = ends - starts - 1
+        inner = counts > 0
+        starts, ends, limits, counts = starts[inner], ends[inner], limits[inner], counts[inner]
+        if not len(starts):
+            break
+        offsets = np.cumsum(counts) - counts
+        segment = np.repeat(np.arange(len(starts)), counts)
+        points = np.arange(counts.sum()) - offsets[segment] + starts[segment] + 1
+        dx, dy = x[ends] - x[starts], y[ends] - y[starts]
+        norm = np.hypot(dx, dy)
+        px, py = x[points] - x[starts][segment], y[points] - y[starts][segment]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist = np.where(norm[segment] == 0, np.hypot(px, py),
+                            np.abs(px * dy[segment] - py * dx[segment]) / norm[segment])
+        farthest = np.maximum.reduceat(dist, offsets)
+        # The first point at each segment's maximum, as argmax would pick
+        candidates = np.flatnonzero(dist == farthest[segment])
+        first = np.ones(len(candidates), dtype=bool)
+        first[1:] = segment[candidates[1:]] != segment[candidates[:-1]]
+        splits = points[candidates[first]]
+        split = farthest > floor
+        splits, level = splits[split], np.minimum(farthest, limits)[split]
+        rank[splits] = level
+        starts, ends = np.concatenate((starts[split], splits)), np.concatenate((splits, ends[split]))
+        limits = np.concatenate((level, level))
+    return rank
+
+
+def douglas_peucker(x: np.ndarray, y: np.ndarray, tolerance: float) -> np.ndarray:
+    """Mask of the points Douglas-Peucker keeps at tolerance (in the units of x and y)
+
+    The ends are always kept.
+    """
+    if tolerance <= 0 or len(x) < 3:
+        return np.ones(len(x), dtype=bool)
+    return douglas_peucker_rank(x, y, tolerance) > tolerance
+
+
+def simplify_tracks(chunks: Iterable[TrackChunk], tolerance_m: float) -> Iterator[TrackChunk]:
+    """Drop track points within tolerance_m of the simplified line"""
+    anchor = None  # (lat, lng) of the last point kept, which the next chunk starts from
+    for chunk in chunks:
+        if tolerance_m <= 0 or not len(chunk):
+            yield chunk
+            continue
+        lats, lngs = chunk.columns["latitude"], chunk.columns["longitude"]
+        if not chunk.first and anchor is not None:
+            lats, lngs = np.concatenate(([anchor[0]], lats)), np.concatenate(([anchor[1]], lngs))
+        x = (lngs - lngs[0]) * (M_PER_DEG * np.cos(np.radians(lats[0])))
+        y = (lats - lats[0]) * M_PER_DEG
+        keep = douglas_peucker(x, y, tolerance_m)
+        if len(lats) > len(chunk):
+            keep = keep[1:]
+        anchor = (lats[-1], lngs[-1])
+        yield TrackChunk(chunk.drone_id, {name: values[keep] for name, values in chunk.columns.items()},
+                         chunk.first)
+
+
+# -------------------------------------------------------------------- sources
+
+def _datetimes(values: Sequence[Any]) -> np.ndarray:
+    if any(isinstance(value, str) for value in values[:1]):  # ISO strings, possibly with offsets
+        return pd.to_datetime(list(values), utc=True, errors="coerce").tz_localize(None).to_numpy("datetime64[us]")
+    return pd.DatetimeIndex(values).as_unit("us").to_numpy()
+
+
+def _floats(values: Sequence[Any]) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def database_source(session_factory, mission_id: int, chunk_rows: Optional[int] = None) -> MissionSource:
+    """A mission read from the database: telemetry in keyset pages of chunk_rows per drone"""
+    from sqlalchemy import and_, or_, select
+
+    from ..models import Discovery, Drone, Mission, TelemetryData
+
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+
+    def mission():
+        with session_factory() as db:
+            row = db.query(Mission.name, Mission.center_lat, Mission.center_lng).filter(Mission.id == mission_id).first()
+        return {"name": row.name, "center_lat": row.center_lat, "center_lng": row.center_lng} if row else {}
+
+    def tracks():
+        with session_factory() as db:
+            drones = (db.query(TelemetryData.drone_id, Drone.drone_id)
+                      .join(Drone, Drone.id == TelemetryData.drone_id)
+                      .filter(TelemetryData.mission_id == mission_id)
+                      .distinct().order_by(TelemetryData.drone_id).all())
+            columns = (TelemetryData.timestamp, TelemetryData.id, TelemetryData.latitude, TelemetryData.longitude,
+                       TelemetryData.altitude, TelemetryData.battery_percentage, TelemetryData.signal_strength)
+            for drone_pk, drone_name in drones:
+                last = None
+                while True:
+                    query = select(*columns).where(TelemetryData.mission_id == mission_id,
+                                                   TelemetryData.drone_id == drone_pk)
+                    if last is not None:
+                        query = query.where(or_(TelemetryData.timestamp > last[0],
+                                                and_(TelemetryData.timestamp == last[0], TelemetryData.id > last[1])))
+                    # On the connection, so rows come back as plain tuples without ORM loading
+                    rows = db.connection().execute(
+                        query.order_by(TelemetryData.timestamp, TelemetryData.id).limit(chunk_rows)).all()
+                    if not rows:
+                        break
+                    timestamps, ids, lats, lngs, alts, battery, signal = zip(*rows)
+                    yield TrackChunk(drone_name or str(drone_pk), {
+                        "timestamp": _datetimes(timestamps),
+                        "latitude": np.array(lats, dtype=np.float64),
+                        "longitude": np.array(lngs, dtype=np.float64),
+                        "altitude": _floats(alts),
+                        "battery": _floats(battery),
+                        "signal": _floats(signal),
+                    }, last is None)
+                    last = (timestamps[-1], ids[-1])
+                    if len(rows) < chunk_rows:
+                        break
+
+    def discoveries():
+        with session_factory() as db:
+            rows = (db.query(*(getattr(Discovery, name) for name in DISCOVERY_COLUMNS))
+                    .filter(Discovery.mission_id == mission_id).order_by(Discovery.discovered_at, Discovery.id)
+                    .yield_per(chunk_rows))
+            for row in rows:
+                yield dict(zip(DISCOVERY_COLUMNS, row))
+
+    return MissionSource(mission, tracks, discoveries)
+
+
+def records_source(mission_data: Dict[str, Any], telemetry_data: List[Dict[str, Any]],
+                   discoveries: Optional[List[Dict[str, Any]]] = None,
+                   chunk_rows: Optional[int] = None) -> MissionSource:
+    """A mission given as the dicts SARMappingUtils works with (lat/lng telemetry, position discoveries)"""
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+
+    def tracks():
+        by_drone: Dict[str, List[Dict[str, Any]]] = {}
+        for point in telemetry_data or []:
+            by_drone.setdefault(str(point.get('drone_id', 'unknown')), []).append(point)
+        for drone_id, points in by_drone.items():
+            for start in range(0, len(points), chunk_rows):
+                page = points[start:start + chunk_rows]
+                yield TrackChunk(drone_id, {
+                    "timestamp": _datetimes([p.get('timestamp') for p in page]),
+                    "latitude": _floats([p['lat'] for p in page]),
+                    "longitude": _floats([p['lng'] for p in page]),
+                    "altitude": _floats([p.get('alt', p.get('altitude')) for p in page]),
+                    "battery": _floats([p.get('battery_level') for p in page]),
+                    "signal": _floats([p.get('signal_strength') for p in page]),
+                }, start == 0)
+
+    def discovery_rows():
+        for d in discoveries or []:
+            yield {
+                "discovery_type": d.get('discovery_type', 'Unknown'),
+                "confidence": d.get('confidence', 0),
+                "priority": d.get('priority', 'Unknown'),
+                "latitude": d['position']['lat'],
+                "longitude": d['position']['lng'],
+                "discovered_at": d.get('discovered_at') or d.get('timestamp'),
+            }
+
+    return MissionSource(lambda: mission_data, tracks, discovery_rows)
+
+
+# ------------------------------------------------------------------- encoders
+
+def _iso(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _timestamps_iso(values: np.ndarray) -> List[Optional[str]]:
+    text = np.datetime_as_string(values, unit="ms")
+    return [None if t == "NaT" else t for t in text.tolist()]
+
+
+def _json_default(value):
+    if isinstance(value, (np.floating, np.integer)):
+        return value.item()
+    return _iso(value)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=_json_default)
+
+
+def _mission_center(mission: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if mission.get('center_lat') is None or mission.get('center_lng') is None:
+        return None
+    name = mission.get('name', 'Unknown')
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [mission['center_lng'], mission['center_lat']]},
+        "properties": {"type": "mission_center", "name": name, "description": f"Mission center for {name}"},
+    }
+
+
+def _discovery_feature(d: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [d['longitude'], d['latitude']]},
+        "properties": {
+            "type": "discovery",
+            "discovery_type": d.get('discovery_type', 'Unknown'),
+            "confidence": d.get('confidence', 0),
+            "priority": d.get('priority', 'Unknown'),
+            "discovered_at": _iso(d.get('discovered_at')),
+            "description": f"Discovery of {d.get('discovery_type', 'Unknown')}",
+        },
+    }
+
+
+def encode_geojson(source: MissionSource, tracks: Iterable[TrackChunk]) -> Iterator[bytes]:
+    """A FeatureCollection; each drone's track is one LineString, written a chunk at a time"""
+    yield b'{"type":"FeatureCollection","features":['
+    separator = ""
+    center = _mission_center(source.mission())
+    if center:
+        yield _dumps(center).encode()
+        separator = ","
+    open_track = False
+    for chunk in tracks:
+        parts = []
+        if chunk.first:
+            if open_track:
+                parts.append("]}}")
+            properties = {"type": "drone_track", "drone_id": chunk.drone_id,
+                          "description": f"Flight track for drone {chunk.drone_id}"}
+            parts.append(f'{separator}{{"type":"Feature","properties":{_dumps(properties)},'
+                         f'"geometry":{{"type":"LineString","coordinates":[')
+            separator = ","
+            open_track = True
+        elif len(chunk):
+            parts.append(",")
+        if len(chunk):
+            coordinates = np.column_stack((chunk.columns["longitude"], chunk.columns["latitude"]))
+            parts.append(_dumps(coordinates.tolist())[1:-1])
+        yield "".join(parts).encode()
+    if open_track:
+        yield b"]}}"
+    for discovery in source.discoveries():
+        yield f"{separator}{_dumps(_discovery_feature(discovery))}".encode()
+        separator = ","
+    yield b"]}"
+
+
+def encode_csv(source: MissionSource, tracks: Iterable[TrackChunk]) -> Iterator[bytes]:
+    """Telemetry rows, then discovery rows, in the two sections export_mission_data always wrote"""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    out.write("=== TELEMETRY DATA ===\n")
+    writer.writerow(("drone_id",) + TRACK_COLUMNS)
+    yield out.getvalue().encode()
+    out.seek(0)
+    out.truncate()
+    for chunk in tracks:
+        columns = chunk.columns
+        writer.writerows(zip(
+            [chunk.drone_id] * len(chunk), _timestamps_iso(columns["timestamp"]),
+            *(np.where(np.isnan(columns[name]), None, columns[name]).tolist() for name in TRACK_COLUMNS[1:])
+        ))
+        yield out.getvalue().encode()
+        out.seek(0)
+        out.truncate()
+    out.write("\n\n=== DISCOVERIES DATA ===\n")
+    writer.writerow(DISCOVERY_COLUMNS)
+    for i, discovery in enumerate(source.discoveries(), 1):
+        writer.writerow([_iso(discovery.get(name)) if name == "discovered_at" else discovery.get(name)
+                         for name in DISCOVERY_COLUMNS])
+        if i % settings.EXPORT_CHUNK_ROWS == 0:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue().encode()
+
+
+class _ParquetSink(io.RawIOBase):
+    """Where the Parquet writer writes; take() hands back what arrived since the last call"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def encode_parquet(source: MissionSource, tracks: Iterable[TrackChunk]) -> Iterator[bytes]:
+    """One row group per telemetry chunk, then one for the discoveries; one row per point"""
+    schema = pa.schema([
+        ("record", pa.string()), ("drone_id", pa.string()), ("timestamp", pa.timestamp("us")),
+        ("latitude", pa.float64()), ("longitude", pa.float64()), ("altitude", pa.float64()),
+        ("battery", pa.float64()), ("signal", pa.float64()),
+        ("discovery_type", pa.string()), ("confidence", pa.float64()), ("priority", pa.string()),
+    ])
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    for chunk in tracks:
+        n = len(chunk)
+        if not n:
+            continue
+        columns = chunk.columns
+        writer.write_table(pa.table({
+            "record": pa.array(["track"] * n), "drone_id": pa.array([chunk.drone_id] * n),
+            "timestamp": pa.array(columns["timestamp"]),
+            **{name: pa.array(columns[name], from_pandas=True) for name in TRACK_COLUMNS[1:]},
+            "discovery_type": pa.nulls(n, pa.string()), "confidence": pa.nulls(n, pa.float64()),
+            "priority": pa.nulls(n, pa.string()),
+        }, schema=schema))
+        yield sink.take()
+    discoveries = list(source.discoveries())
+    if discoveries:
+        n = len(discoveries)
+        writer.write_table(pa.table({
+            "record": pa.array(["discovery"] * n), "drone_id": pa.nulls(n, pa.string()),
+            "timestamp": pa.array([d.get('discovered_at') for d in discoveries], pa.timestamp("us")),
+            "latitude": pa.array([d['latitude'] for d in discoveries], pa.float64()),
+            "longitude": pa.array([d['longitude'] for d in discoveries], pa.float64()),
+            "altitude": pa.nulls(n, pa.float64()), "battery": pa.nulls(n, pa.float64()),
+            "signal": pa.nulls(n, pa.float64()),
+            "discovery_type": pa.array([d.get('discovery_type') for d in discoveries], pa.string()),
+            "confidence": pa.array([d.get('confidence') for d in discoveries], pa.float64()),
+            "priority": pa.array([None if d.get('priority') is None else str(d['priority'])
+                                  for d in discoveries], pa.string()),
+        }, schema=schema))
+    writer.close()
+    yield sink.take()
+
+
+# ---------------------------------------------------------------- FlatGeobuf
+
+FGB_MAGIC = b"fgb\x03fgb\x00"
+FGB_POINT, FGB_LINESTRING = 1, 2
+FGB_INT, FGB_ULONG, FGB_DOUBLE, FGB_STRING, FGB_DATETIME = 5, 8, 10, 11, 13
+# (name, FlatGeobuf column type) in property order
+FGB_COLUMNS = (
+    ("type", FGB_STRING), ("drone_id", FGB_STRING), ("name", FGB_STRING), ("discovery_type", FGB_STRING),
+    ("confidence", FGB_DOUBLE), ("priority", FGB_STRING), ("start_time", FGB_DATETIME),
+    ("end_time", FGB_DATETIME), ("points", FGB_ULONG),
+)
+_FGB_INDEX = {name: (i, kind) for i, (name, kind) in enumerate(FGB_COLUMNS)}
+
+
+def _flatbuffer(fields) -> bytes:
+    """A size-prefixed FlatBuffer holding one table
+
+    Just enough of the format for FlatGeobuf headers and features, written
+    front to back: each table is followed by its vtable and then by the
+    strings, vectors and tables it refers to, so every offset points forward.
+    fields are (slot, kind, value) with kind a struct code for scalars,
+    "str", "vec:<code>" (value packed bytes), "table" or "tables".
+    """
+    buf = bytearray(8)  # size prefix, root offset
+
+    def pad(align, extra=0):
+        buf.extend(b"\0" * (-(len(buf) + extra) % align))
+
+    def table(table_fields):
+        pad(4)
+        start = len(buf)
+        buf.extend(b"\0\0\0\0")
+        slots, refs = {}, []
+        for slot, kind, value in table_fields:
+            if value is None:
+                continue
+            if len(kind) == 1:
+                pad(struct.calcsize(kind))
+                slots[slot] = len(buf) - start
+                buf.extend(struct.pack("<" + kind, value))
+            else:
+                pad(4)
+                slots[slot] = len(buf) - start
+                refs.append((len(buf), kind, value))
+                buf.extend(b"\0\0\0\0")
+        size = len(buf) - start
+        pad(2)
+        vtable = len(buf)
+        count = max(slots) + 1 if slots else 0
+        buf.extend(struct.pack(f"<HH{count}H", 4 + 2 * count, size, *(slots.get(i, 0) for i in range(count))))
+        struct.pack_into("<i", buf, start, start - vtable)
+        for position, kind, value in refs:
+            struct.pack_into("<I", buf, position, child(kind, value) - position)
+        return start
+
+    def child(kind, value):
+        if kind == "table":
+            return table(value)
+        if kind == "tables":
+            pad(4)
+            start = len(buf)
+            buf.extend(struct.pack("<I", len(value)) + b"\0\0\0\0" * len(value))
+            for i, item in enumerate(value):
+                position = start + 4 + 4 * i
+                struct.pack_into("<I", buf, position, table(item) - position)
+            return start
+        if kind == "str":
+            data = value.encode()
+            pad(4)
+            start = len(buf)
+            buf.extend(struct.pack("<I", len(data)) + data + b"\0")
+            return start
+        code = kind[4:]
+        size = struct.calcsize(code)
+        pad(max(size, 4), 4)  # the elements, after the length, aligned to their size
+        start = len(buf)
+        buf.extend(struct.pack("<I", len(value) // size) + value)
+        return start
+
+    root = table(fields)
+    struct.pack_into("<I", buf, 4, root - 4)
+    struct.pack_into("<I", buf, 0, len(buf) - 4)
+    return bytes(buf)
+
+
+def _fgb_properties(values: Dict[str, Any]) -> bytes:
+    out = bytearray()
+    for name, value in values.items():
+        if value is None:
+            continue
+        index, kind = _FGB_INDEX[name]
+        out += struct.pack("<H", index)
+        if kind == FGB_DOUBLE:
+            out += struct.pack("<d", float(value))
+        elif kind == FGB_ULONG:
+            out += struct.pack("<Q", int(value))
+        else:
+            data = (_iso(value) if kind == FGB_DATETIME else str(value)).encode()
+            out += struct.pack("<I", len(data)) + data
+    return bytes(out)
+
+
+def _fgb_feature(geometry_type: int, lngs: np.ndarray, lats: np.ndarray, properties: Dict[str, Any]) -> bytes:
+    xy = np.column_stack((lngs, lats)).astype("<f8").tobytes()
+    return _flatbuffer([
+        (0, "table", [(1, "vec:d", xy), (6, "B", geometry_type)]),
+        (1, "vec:B", _fgb_properties(properties)),
+    ])
+
+
+def encode_flatgeobuf(source: MissionSource, tracks: Iterable[TrackChunk]) -> Iterator[bytes]:
+    """FlatGeobuf without a spatial index, so features can be written as they come
+
+    Tracks become one LineString per chunk; consecutive pieces of a drone's
+    track share their end points.
+    """
+    mission = source.mission()
+    columns = [[(0, "str", name), (1, "B", kind)] for name, kind in FGB_COLUMNS]
+    header = _flatbuffer([
+        (0, "str", mission.get('name') or "mission"),
+        (2, "B", 0),  # mixed geometry types
+        (7, "tables", columns),
+        (8, "Q", 0),  # feature count unknown while streaming
+        (9, "H", 0),  # no spatial index
+        (10, "table", [(0, "str", "EPSG"), (1, "i", 4326)]),
+    ])
+    yield FGB_MAGIC + header
+    center = _mission_center(mission)
+    if center:
+        lng, lat = center["geometry"]["coordinates"]
+        yield _fgb_feature(FGB_POINT, np.array([lng]), np.array([lat]),
+                           {"type": "mission_center", "name": mission.get('name')})
+    previous = None  # last point of the drone's previous piece, which this piece starts from
+    for chunk in tracks:
+        if not len(chunk):
+            continue
+        lngs, lats = chunk.columns["longitude"], chunk.columns["latitude"]
+        if not chunk.first and previous is not None:
+            lngs, lats = np.concatenate(([previous[0]], lngs)), np.concatenate(([previous[1]], lats))
+        previous = (lngs[-1], lats[-1])
+        times = _timestamps_iso(chunk.columns["timestamp"][[0, -1]])
+        yield _fgb_feature(FGB_LINESTRING if len(lngs) > 1 else FGB_POINT, lngs, lats, {
+            "type": "drone_track", "drone_id": chunk.drone_id, "start_time": times[0], "end_time": times[1],
+            "points": len(lngs),
+        })
+    for d in source.discoveries():
+        yield _fgb_feature(FGB_POINT, np.array([d['longitude']]), np.array([d['latitude']]), {
+            "type": "discovery", "discovery_type": d.get('discovery_type'), "confidence": d.get('confidence'),
+            "priority": d.get('priority'), "start_time": d.get('discovered_at'),
+        })
+
+
+ENCODERS = {
+    "geojson": encode_geojson,
+    "csv": encode_csv,
+    "parquet": encode_parquet,
+    "flatgeobuf": encode_flatgeobuf,
+}
+
+
+# -------------------------------------------------------------------- driving
+
+def export_chunks(source: MissionSource, format: str, tolerance_m: float = 0.0) -> Iterator[bytes]:
+    """The export as a generator of byte chunks"""
+    if format not in ENCODERS:
+        raise ExportError(f"Unsupported format: {format}")
+    if format == "parquet" and not PYARROW_AVAILABLE:
+        raise ExportError("Parquet export needs pyarrow")
+    if tolerance_m < 0:
+        raise ExportError("tolerance_m must not be negative")
+    return ENCODERS[format](source, simplify_tracks(source.tracks(), tolerance_m))
+
+
+def stream_export(source: MissionSource, format: str, tolerance_m: float = 0.0) -> AsyncIterator[bytes]:
+    """The export as an async generator for StreamingResponse
+
+    Reading, simplifying and encoding each chunk run in a worker thread, so
+    the event loop only passes bytes along. Errors in the arguments are
+    raised here rather than once the response has started.
+    """
+    chunks = export_chunks(source, format, tolerance_m)
+
+    async def stream():
+        try:
+            while True:
+                data = await asyncio.to_thread(next, chunks, None)
+                if data is None:
+                    return
+                if data:
+                    yield data
+        finally:
+            try:
+                chunks.close()
+            except ValueError:
+                pass  # still running in its thread after a disconnect; it closes when collected
+
+    return stream()
@@ -4,6 +4,7 @@ from datetime import datetime
 import asyncio
 import math
 from app.core.config import settings
+from app.services.weather_service import weather_service
 
 logger = logging.getLogger(__name__)
 
@@ -175,6 +176,9 @@ Be specific about coordinates when possible."""
             # Generate coordinate grid
             coordinates = await self._generate_coordinates(params)
             
+            # Warm the weather grid along the planned route
+            weather_service.schedule_prefetch(coordinates)
+            
             # Calculate mission parameters
             duration = self._estimate_duration(coordinates, params)
             search_pattern = params.get('search_pattern', 'grid')
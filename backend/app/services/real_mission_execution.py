@@ -12,6 +12,7 @@ import json
 from ..communication.drone_connection_hub import drone_connection_hub
 from ..communication.drone_registry import DroneStatus, drone_registry
 from ..core.database import SessionLocal
+from ..core.event_bus import event_bus, Event, DISCOVERY_CREATED
 from ..models.mission import Mission
 from ..models.drone import Drone
 from ..utils.logging import get_logger
@@ -37,25 +38,20 @@ class RealMissionExecutionEngine:
     def __init__(self):
         self.active_executions: Dict[str, MissionExecutionStatus] = {}
         self._running = False
-        self._monitor_task = None
+        self._unsubscribe = None
         
     async def start(self):
         """Start the mission execution engine"""
         self._running = True
+        self._unsubscribe = event_bus.subscribe(DISCOVERY_CREATED, self._on_discovery)
         logger.info("Real Mission Execution Engine started")
-        
-        # Start monitoring task
-        self._monitor_task = asyncio.create_task(self._monitor_executions())
     
     async def stop(self):
         """Stop the mission execution engine"""
         self._running = False
-        if self._monitor_task:
-            self._monitor_task.cancel()
-            try:
-                await self._monitor_task
-            except asyncio.CancelledError:
-                pass
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
         logger.info("Real Mission Execution Engine stopped")
     
     async def execute_mission(self, mission_id: str, mission_data: Dict[str, Any]) -> bool:
@@ -423,44 +419,31 @@ class RealMissionExecutionEngine:
             logger.error(f"Error aborting mission {mission_id}: {e}")
             return False
     
-    async def _monitor_executions(self):
-        """Monitor active mission executions"""
-        while self._running:
-            try:
-                for mission_id, execution_status in list(self.active_executions.items()):
-                    if execution_status.status == "executing":
-                        # Check drone status
-                        active_count = 0
-                        for drone_id in execution_status.active_drones:
-                            drone_info = drone_registry.get_drone(drone_id)
-                            if drone_info and drone_info.status in [DroneStatus.FLYING, DroneStatus.CONNECTED]:
-                                active_count += 1
-                        
-                        # Update progress based on active drones
-                        if execution_status.start_time:
-                            elapsed = datetime.utcnow() - execution_status.start_time
-                            estimated_duration = timedelta(minutes=30)  # Default 30 minutes
-                            
-                            if elapsed < estimated_duration:
-                                time_progress = (elapsed.total_seconds() / estimated_duration.total_seconds()) * 100
-                                execution_status.progress_percentage = min(time_progress, 95.0)
-                
-                await asyncio.sleep(5)  # Check every 5 seconds
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error monitoring executions: {e}")
-                await asyncio.sleep(5)
+    def _on_discovery(self, event: Event):
+        execution_status = self.active_executions.get(event.mission_id)
+        if execution_status:
+            execution_status.discoveries_count += 1
+    
+    def _update_progress(self, execution_status: MissionExecutionStatus):
+        """Time-based progress estimate while executing, computed when status is read"""
+        if execution_status.status == "executing" and execution_status.start_time:
+            elapsed = datetime.utcnow() - execution_status.start_time
+            estimated_duration = timedelta(minutes=30)  # Default 30 minutes
+            time_progress = min(elapsed / estimated_duration * 100, 95.0)
+            # Never move progress backwards past a completed phase
+            execution_status.progress_percentage = max(execution_status.progress_percentage, time_progress)
     
     def get_execution_status(self, mission_id: str) -> Optional[Dict[str, Any]]:
         """Get execution status for a mission"""
         if mission_id in self.active_executions:
+            self._update_progress(self.active_executions[mission_id])
             return asdict(self.active_executions[mission_id])
         return None
     
     def get_all_execution_status(self) -> Dict[str, Dict[str, Any]]:
         """Get execution status for all missions"""
+        for execution_status in self.active_executions.values():
+            self._update_progress(execution_status)
         return {
             mission_id: asdict(execution_status)
             for mission_id, execution_status in self.active_executions.items()
@@ -5,14 +5,18 @@ Comprehensive compliance checking for drone operations across different jurisdic
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import json
 import math
 
+import numpy as np
+
+from ..core.config import settings
 from ..utils.logging import get_logger
+from .airspace import Geofence, GeofenceIndex, bounds_to_polygon, geofences_from_geojson
 
 logger = get_logger(__name__)
 
@@ -95,18 +99,116 @@ class ComplianceViolation:
     resolved_at: Optional[datetime] = None
     resolution_notes: Optional[str] = None
 
+@dataclass
+class ComplianceBatchResult:
+    """Outcome of checking a telemetry batch against all applicable rules"""
+    mission_id: str
+    total_checks: int
+    compliant_checks: int
+    non_compliant_checks: int
+    jurisdictions: List[Jurisdiction]
+    checks: List[ComplianceCheck] = field(default_factory=list)
+
+# Telemetry columns read by the rule checks and their defaults when absent
+TELEMETRY_DEFAULTS = {
+    'speed_mph': 0.0,
+    'flight_time_minutes': 0.0,
+    'nearest_person_distance_ft': 100.0,
+    'wind_speed_mph': 0.0,
+    'visibility_miles': 10.0,
+}
+
+COMPLIANCE_LEVELS = list(ComplianceLevel)
+COMPLIANT = COMPLIANCE_LEVELS.index(ComplianceLevel.COMPLIANT)
+NON_COMPLIANT = COMPLIANCE_LEVELS.index(ComplianceLevel.NON_COMPLIANT)
+UNKNOWN_RESULT = COMPLIANCE_LEVELS.index(ComplianceLevel.UNKNOWN)
+
+class ComplianceHistory:
+    """Bounded columnar ring of compliance check outcomes
+
+    Mission, drone and rule ids are interned to integer codes; once
+    ``capacity`` rows are written the oldest rows are overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.missions = np.zeros(capacity, dtype=np.int32)
+        self.drones = np.zeros(capacity, dtype=np.int32)
+        self.rules = np.zeros(capacity, dtype=np.int32)
+        self.results = np.zeros(capacity, dtype=np.int8)
+        self.locations = np.zeros((capacity, 3), dtype=np.float64)
+        self.written = 0
+        self._codes: Dict[str, Dict[str, int]] = {'mission': {}, 'drone': {}, 'rule': {}}
+        self._names: Dict[str, List[str]] = {kind: [] for kind in self._codes}
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    def intern(self, kind: str, name: str) -> int:
+        codes = self._codes[kind]
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(self._names[kind])
+            self._names[kind].append(name)
+        return code
+
+    def code(self, kind: str, name: str) -> Optional[int]:
+        return self._codes[kind].get(name)
+
+    def name(self, kind: str, code: int) -> str:
+        return self._names[kind][code]
+
+    def append(self, timestamp: float, mission_id: str, rule_id: str, drone_codes: np.ndarray,
+               results: np.ndarray, locations: np.ndarray):
+        """Record one rule's outcome for a batch of drones"""
+        n = len(results)
+        if n > self.capacity:
+            drone_codes, results, locations = drone_codes[-self.capacity:], results[-self.capacity:], locations[-self.capacity:]
+            self.written += n - self.capacity
+            n = self.capacity
+        rows = (self.written + np.arange(n)) % self.capacity
+        self.timestamps[rows] = timestamp
+        self.missions[rows] = self.intern('mission', mission_id)
+        self.rules[rows] = self.intern('rule', rule_id)
+        self.drones[rows] = drone_codes
+        self.results[rows] = results
+        self.locations[rows] = locations
+        self.written += n
+
+    def rows_for_mission(self, mission_id: str) -> np.ndarray:
+        """Row indices of a mission's retained checks, oldest first"""
+        code = self.code('mission', mission_id)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        order = (self.written + np.arange(len(self))) % self.capacity if self.written > self.capacity \
+            else np.arange(len(self))
+        return order[self.missions[order] == code]
+
 class RegulatoryComplianceService:
     """Regulatory compliance service for SAR operations"""
     
-    def __init__(self):
+    def __init__(self, history_size: Optional[int] = None):
         self.compliance_rules = {}
-        self.compliance_history = []
+        self.compliance_history = ComplianceHistory(history_size or settings.COMPLIANCE_HISTORY_SIZE)
         self.active_violations = {}
         self.jurisdiction_detector = JurisdictionDetector()
+        self.geofence_index = GeofenceIndex([])
         
         # Initialize compliance rules for different jurisdictions
         self._initialize_compliance_rules()
         
+        if settings.GEOFENCE_GEOJSON_PATH:
+            try:
+                self.load_geofences(geofences_from_geojson(settings.GEOFENCE_GEOJSON_PATH))
+            except Exception as e:
+                logger.error(f"Error loading geofences from {settings.GEOFENCE_GEOJSON_PATH}: {e}")
+        
+    def load_geofences(self, fences: Sequence[Geofence]):
+        """Replace the no-fly / restricted airspace geofences"""
+        self.geofence_index = GeofenceIndex(fences)
+        logger.info(f"Indexed {len(fences)} airspace geofences")
+        
     def _initialize_compliance_rules(self):
         """Initialize compliance rules for different jurisdictions"""
         
@@ -125,6 +227,9 @@ class RegulatoryComplianceService:
         # Australia CASA Rules
         self._add_australia_rules()
         
+        # Geofenced airspace, enforced in every jurisdiction
+        self._add_airspace_rules()
+        
         logger.info(f"Initialized {len(self.compliance_rules)} compliance rules")
     
     def _add_faa_rules(self):
@@ -296,6 +401,19 @@ class RegulatoryComplianceService:
             auto_enforcement=True
         )
     
+    def _add_airspace_rules(self):
+        """Add geofence rules; rules registered under UNKNOWN apply everywhere"""
+        
+        self._add_rule(
+            rule_id="airspace_no_fly_zone",
+            rule_type=ComplianceRuleType.NO_FLY_ZONE,
+            jurisdiction=Jurisdiction.UNKNOWN,
+            description="No flight inside no-fly or restricted airspace",
+            parameters={"fence_types": ["no_fly_zone", "restricted"]},
+            severity=ViolationSeverity.HIGH,
+            auto_enforcement=True
+        )
+    
     def _add_rule(self, rule_id: str, rule_type: ComplianceRule, jurisdiction: Jurisdiction,
                   description: str, parameters: Dict[str, Any], severity: ViolationSeverity,
                   auto_enforcement: bool):
@@ -317,210 +435,183 @@ class RegulatoryComplianceService:
                              location: Tuple[float, float, float],
                              mission_parameters: Dict[str, Any]) -> List[ComplianceCheck]:
         """Check compliance for a mission at a specific location"""
+        result = await self.check_compliance_batch(
+            mission_id, [drone_id], [location], mission_parameters, include_compliant=True
+        )
+        return result.checks
+    
+    async def check_compliance_batch(self, mission_id: str, drone_ids: Sequence[str],
+                                     locations: Sequence[Tuple[float, float, float]],
+                                     telemetry: Optional[Dict[str, Any]] = None,
+                                     include_compliant: bool = False) -> ComplianceBatchResult:
+        """Check a telemetry batch against every applicable rule in one vectorized pass
+        
+        ``locations`` holds one (lat, lng, alt) row per drone; each ``telemetry``
+        value is a scalar shared by the batch or an array with one entry per drone.
+        Only non-compliant and unknown checks are materialized unless
+        ``include_compliant`` is set; every outcome goes to the history ring.
+        """
         try:
-            # Detect jurisdiction
-            jurisdiction = await self.jurisdiction_detector.detect_jurisdiction(location)
-            
-            # Get applicable rules for jurisdiction
-            applicable_rules = self._get_applicable_rules(jurisdiction)
-            
-            compliance_checks = []
-            
-            # Perform compliance checks
-            for rule in applicable_rules:
-                check = await self._perform_compliance_check(
-                    rule, mission_id, drone_id, location, mission_parameters
-                )
-                compliance_checks.append(check)
+            telemetry = telemetry or {}
+            locations = np.asarray(locations, dtype=np.float64).reshape(-1, 3)
+            n = len(locations)
+            lats, lngs, alts = locations[:, 0], locations[:, 1], locations[:, 2]
+            columns = {
+                name: np.broadcast_to(np.asarray(telemetry.get(name, default), dtype=np.float64), (n,))
+                for name, default in TELEMETRY_DEFAULTS.items()
+            }
+            shared_parameters = all(np.ndim(value) == 0 for value in telemetry.values())
+            
+            codes = self.jurisdiction_detector.detect_jurisdictions(lats, lngs)
+            present = np.unique(codes)
+            jurisdictions = [JurisdictionDetector.JURISDICTIONS[code] for code in present]
+            
+            timestamp = datetime.now()
+            drone_codes = np.array([self.compliance_history.intern('drone', d) for d in drone_ids], dtype=np.int32)
+            fence_hits = None
+            checks = []
+            total = compliant = non_compliant = 0
+            
+            for rule in self.compliance_rules.values():
+                rule_code = JurisdictionDetector.JURISDICTIONS.index(rule.jurisdiction)
+                if rule.jurisdiction == Jurisdiction.UNKNOWN:
+                    rows = np.arange(n)
+                elif rule_code in present:
+                    rows = np.flatnonzero(codes == rule_code)
+                else:
+                    continue
                 
-                # Record compliance history
-                self.compliance_history.append(check)
+                if rule.rule_type == ComplianceRuleType.NO_FLY_ZONE and fence_hits is None:
+                    fence_hits = self._geofence_hits(lats, lngs, alts, rule)
+                violated = self._evaluate_rule(rule, rows, alts, columns, fence_hits)
+                results = np.full(len(rows), UNKNOWN_RESULT, dtype=np.int8) if violated is None \
+                    else np.where(violated, NON_COMPLIANT, COMPLIANT).astype(np.int8)
+                self.compliance_history.append(timestamp.timestamp(), mission_id, rule.rule_id,
+                                               drone_codes[rows], results, locations[rows])
                 
-                # Handle violations
-                if check.result == ComplianceLevel.NON_COMPLIANT:
-                    await self._handle_compliance_violation(check)
-            
-            logger.info(f"Completed {len(compliance_checks)} compliance checks for mission {mission_id}")
-            return compliance_checks
-            
-        except Exception as e:
-            logger.error(f"Error checking compliance: {e}")
-            return []
-    
-    async def _perform_compliance_check(self, rule: ComplianceRule, mission_id: str,
-                                      drone_id: str, location: Tuple[float, float, float],
-                                      mission_parameters: Dict[str, Any]) -> ComplianceCheck:
-        """Perform a specific compliance check"""
-        try:
-            check_id = f"check_{rule.rule_id}_{int(datetime.now().timestamp())}"
-            
-            # Perform rule-specific check
-            if rule.rule_type == ComplianceRuleType.ALTITUDE_LIMIT:
-                result, violation_details, recommended_action = await self._check_altitude_compliance(
-                    rule, location, mission_parameters
-                )
-            elif rule.rule_type == ComplianceRuleType.SPEED_LIMIT:
-                result, violation_details, recommended_action = await self._check_speed_compliance(
-                    rule, mission_parameters
-                )
-            elif rule.rule_type == ComplianceRuleType.DISTANCE_FROM_PEOPLE:
-                result, violation_details, recommended_action = await self._check_distance_compliance(
-                    rule, location, mission_parameters
-                )
-            elif rule.rule_type == ComplianceRuleType.WEATHER_RESTRICTIONS:
-                result, violation_details, recommended_action = await self._check_weather_compliance(
-                    rule, location, mission_parameters
-                )
-            elif rule.rule_type == ComplianceRuleType.FLIGHT_TIME_LIMIT:
-                result, violation_details, recommended_action = await self._check_flight_time_compliance(
-                    rule, mission_parameters
-                )
-            else:
-                result = ComplianceLevel.UNKNOWN
-                violation_details = "Rule type not implemented"
-                recommended_action = "Manual review required"
-            
-            return ComplianceCheck(
-                check_id=check_id,
-                rule=rule,
-                mission_id=mission_id,
-                drone_id=drone_id,
-                timestamp=datetime.now(),
-                location=location,
-                parameters=mission_parameters,
-                result=result,
-                violation_details=violation_details,
-                recommended_action=recommended_action
-            )
+                total += len(rows)
+                compliant += int(np.count_nonzero(results == COMPLIANT))
+                non_compliant += int(np.count_nonzero(results == NON_COMPLIANT))
+                
+                reported = np.arange(len(rows)) if include_compliant else np.flatnonzero(results != COMPLIANT)
+                for i, code in zip(rows[reported].tolist(), results[reported].tolist()):
+                    level = COMPLIANCE_LEVELS[code]
+                    if level == ComplianceLevel.NON_COMPLIANT:
+                        details, action = self._describe_violation(rule, i, alts, columns, fence_hits)
+                    elif level == ComplianceLevel.UNKNOWN:
+                        details, action = "Rule type not implemented", "Manual review required"
+                    else:
+                        details = action = None
+                    checks.append(ComplianceCheck(
+                        check_id=f"check_{rule.rule_id}_{drone_ids[i]}_{int(timestamp.timestamp())}",
+                        rule=rule,
+                        mission_id=mission_id,
+                        drone_id=drone_ids[i],
+                        timestamp=timestamp,
+                        location=tuple(locations[i].tolist()),
+                        parameters=telemetry if shared_parameters else {name: float(col[i]) for name, col in columns.items()},
+                        result=level,
+                        violation_details=details,
+                        recommended_action=action
+                    ))
+            
+            # Handle violations
+            violations = [check for check in checks if check.result == ComplianceLevel.NON_COMPLIANT]
+            if violations:
+                await asyncio.gather(*(self._handle_compliance_violation(check) for check in violations))
             
-        except Exception as e:
-            logger.error(f"Error performing compliance check for rule {rule.rule_id}: {e}")
-            return ComplianceCheck(
-                check_id=f"check_{rule.rule_id}_error_{int(datetime.now().timestamp())}",
-                rule=rule,
+            logger.info(f"Completed {total} compliance checks for {n} drones in mission {mission_id}")
+            return ComplianceBatchResult(
                 mission_id=mission_id,
-                drone_id=drone_id,
-                timestamp=datetime.now(),
-                location=location,
-                parameters=mission_parameters,
-                result=ComplianceLevel.UNKNOWN,
-                violation_details=f"Error during check: {e}",
-                recommended_action="Manual review required"
+                total_checks=total,
+                compliant_checks=compliant,
+                non_compliant_checks=non_compliant,
+                jurisdictions=jurisdictions,
+                checks=checks
             )
-    
-    async def _check_altitude_compliance(self, rule: ComplianceRule, 
-                                       location: Tuple[float, float, float],
-                                       mission_parameters: Dict[str, Any]) -> Tuple[ComplianceLevel, str, str]:
-        """Check altitude compliance"""
-        try:
-            altitude_ft = location[2] * 3.28084  # Convert meters to feet
-            max_altitude = rule.parameters.get('max_altitude_ft', 400)
             
-            if altitude_ft > max_altitude:
-                violation_details = f"Altitude {altitude_ft:.1f} ft exceeds limit of {max_altitude} ft"
-                recommended_action = f"Reduce altitude to maximum {max_altitude} ft"
-                return ComplianceLevel.NON_COMPLIANT, violation_details, recommended_action
-            else:
-                return ComplianceLevel.COMPLIANT, None, None
-                
         except Exception as e:
-            logger.error(f"Error checking altitude compliance: {e}")
-            return ComplianceLevel.UNKNOWN, f"Error checking altitude: {e}", "Manual review required"
+            logger.error(f"Error checking compliance: {e}")
+            return ComplianceBatchResult(mission_id, 0, 0, 0, [])
     
-    async def _check_speed_compliance(self, rule: ComplianceRule,
-                                    mission_parameters: Dict[str, Any]) -> Tuple[ComplianceLevel, str, str]:
-        """Check speed compliance"""
-        try:
-            speed_mph = mission_parameters.get('speed_mph', 0)
-            max_speed = rule.parameters.get('max_speed_mph', 100)
-            
-            if speed_mph > max_speed:
-                violation_details = f"Speed {speed_mph:.1f} mph exceeds limit of {max_speed} mph"
-                recommended_action = f"Reduce speed to maximum {max_speed} mph"
-                return ComplianceLevel.NON_COMPLIANT, violation_details, recommended_action
-            else:
-                return ComplianceLevel.COMPLIANT, None, None
-                
-        except Exception as e:
-            logger.error(f"Error checking speed compliance: {e}")
-            return ComplianceLevel.UNKNOWN, f"Error checking speed: {e}", "Manual review required"
+    def _geofence_hits(self, lats: np.ndarray, lngs: np.ndarray, alts: np.ndarray,
+                       rule: ComplianceRule) -> np.ndarray:
+        """Index of the first geofence of the rule's types containing each point, or -1"""
+        hits = np.full(len(lats), -1, dtype=np.int64)
+        fence_types = set(rule.parameters.get('fence_types', ['no_fly_zone']))
+        points, fences = self.geofence_index.query_points(lats, lngs, altitudes=alts)
+        if len(points):
+            typed = np.isin(self.geofence_index.fence_types[fences], list(fence_types))
+            points, fences = points[typed], fences[typed]
+            first = np.full(len(lats), len(self.geofence_index), dtype=np.int64)
+            np.minimum.at(first, points, fences)
+            hits = np.where(first < len(self.geofence_index), first, -1)
+        return hits
     
-    async def _check_distance_compliance(self, rule: ComplianceRule,
-                                       location: Tuple[float, float, float],
-                                       mission_parameters: Dict[str, Any]) -> Tuple[ComplianceLevel, str, str]:
-        """Check distance from people compliance"""
-        try:
-            min_distance_ft = rule.parameters.get('min_distance_ft', 25)
-            
+    def _evaluate_rule(self, rule: ComplianceRule, rows: np.ndarray, alts: np.ndarray,
+                       columns: Dict[str, np.ndarray],
+                       fence_hits: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Violation mask of a rule over the given rows; None if the rule type is not implemented"""
+        params = rule.parameters
+        if rule.rule_type == ComplianceRuleType.ALTITUDE_LIMIT:
+            return alts[rows] * 3.28084 > params.get('max_altitude_ft', 400)
+        if rule.rule_type == ComplianceRuleType.SPEED_LIMIT:
+            return columns['speed_mph'][rows] > params.get('max_speed_mph', 100)
+        if rule.rule_type == ComplianceRuleType.DISTANCE_FROM_PEOPLE:
             # In real implementation, this would check actual distance to people
-            # For now, assume compliance if no people detected nearby
-            nearest_person_distance = mission_parameters.get('nearest_person_distance_ft', 100)
-            
-            if nearest_person_distance < min_distance_ft:
-                violation_details = f"Distance to nearest person {nearest_person_distance:.1f} ft is less than required {min_distance_ft} ft"
-                recommended_action = f"Maintain minimum distance of {min_distance_ft} ft from people"
-                return ComplianceLevel.NON_COMPLIANT, violation_details, recommended_action
-            else:
-                return ComplianceLevel.COMPLIANT, None, None
-                
-        except Exception as e:
-            logger.error(f"Error checking distance compliance: {e}")
-            return ComplianceLevel.UNKNOWN, f"Error checking distance: {e}", "Manual review required"
+            return columns['nearest_person_distance_ft'][rows] < params.get('min_distance_ft', 25)
+        if rule.rule_type == ComplianceRuleType.WEATHER_RESTRICTIONS:
+            return ((columns['wind_speed_mph'][rows] > params.get('max_wind_speed_mph', 25)) |
+                    (columns['visibility_miles'][rows] < params.get('min_visibility_miles', 3)))
+        if rule.rule_type == ComplianceRuleType.FLIGHT_TIME_LIMIT:
+            return columns['flight_time_minutes'][rows] > params.get('max_flight_time_minutes', 30)
+        if rule.rule_type == ComplianceRuleType.NO_FLY_ZONE:
+            return fence_hits[rows] >= 0
+        return None
     
-    async def _check_weather_compliance(self, rule: ComplianceRule,
-                                      location: Tuple[float, float, float],
-                                      mission_parameters: Dict[str, Any]) -> Tuple[ComplianceLevel, str, str]:
-        """Check weather compliance"""
-        try:
-            max_wind_speed = rule.parameters.get('max_wind_speed_mph', 25)
-            min_visibility = rule.parameters.get('min_visibility_miles', 3)
-            
-            current_wind_speed = mission_parameters.get('wind_speed_mph', 0)
-            current_visibility = mission_parameters.get('visibility_miles', 10)
-            
+    def _describe_violation(self, rule: ComplianceRule, i: int, alts: np.ndarray,
+                            columns: Dict[str, np.ndarray],
+                            fence_hits: Optional[np.ndarray]) -> Tuple[str, str]:
+        """Violation details and recommended action for drone row ``i``"""
+        params = rule.parameters
+        if rule.rule_type == ComplianceRuleType.ALTITUDE_LIMIT:
+            max_altitude = params.get('max_altitude_ft', 400)
+            return (f"Altitude {alts[i] * 3.28084:.1f} ft exceeds limit of {max_altitude} ft",
+                    f"Reduce altitude to maximum {max_altitude} ft")
+        if rule.rule_type == ComplianceRuleType.SPEED_LIMIT:
+            max_speed = params.get('max_speed_mph', 100)
+            return (f"Speed {columns['speed_mph'][i]:.1f} mph exceeds limit of {max_speed} mph",
+                    f"Reduce speed to maximum {max_speed} mph")
+        if rule.rule_type == ComplianceRuleType.DISTANCE_FROM_PEOPLE:
+            min_distance_ft = params.get('min_distance_ft', 25)
+            return (f"Distance to nearest person {columns['nearest_person_distance_ft'][i]:.1f} ft "
+                    f"is less than required {min_distance_ft} ft",
+                    f"Maintain minimum distance of {min_distance_ft} ft from people")
+        if rule.rule_type == ComplianceRuleType.WEATHER_RESTRICTIONS:
+            max_wind_speed = params.get('max_wind_speed_mph', 25)
+            min_visibility = params.get('min_visibility_miles', 3)
             violations = []
-            
-            if current_wind_speed > max_wind_speed:
-                violations.append(f"Wind speed {current_wind_speed:.1f} mph exceeds limit of {max_wind_speed} mph")
-            
-            if current_visibility < min_visibility:
-                violations.append(f"Visibility {current_visibility:.1f} miles is below minimum of {min_visibility} miles")
-            
-            if violations:
-                violation_details = "; ".join(violations)
-                recommended_action = "Postpone flight until weather conditions improve"
-                return ComplianceLevel.NON_COMPLIANT, violation_details, recommended_action
-            else:
-                return ComplianceLevel.COMPLIANT, None, None
-                
-        except Exception as e:
-            logger.error(f"Error checking weather compliance: {e}")
-            return ComplianceLevel.UNKNOWN, f"Error checking weather: {e}", "Manual review required"
-    
-    async def _check_flight_time_compliance(self, rule: ComplianceRule,
-                                          mission_parameters: Dict[str, Any]) -> Tuple[ComplianceLevel, str, str]:
-        """Check flight time compliance"""
-        try:
-            max_flight_time = rule.parameters.get('max_flight_time_minutes', 30)
-            current_flight_time = mission_parameters.get('flight_time_minutes', 0)
-            
-            if current_flight_time > max_flight_time:
-                violation_details = f"Flight time {current_flight_time:.1f} minutes exceeds limit of {max_flight_time} minutes"
-                recommended_action = f"Land immediately or return to base"
-                return ComplianceLevel.NON_COMPLIANT, violation_details, recommended_action
-            else:
-                return ComplianceLevel.COMPLIANT, None, None
-                
-        except Exception as e:
-            logger.error(f"Error checking flight time compliance: {e}")
-            return ComplianceLevel.UNKNOWN, f"Error checking flight time: {e}", "Manual review required"
+            if columns['wind_speed_mph'][i] > max_wind_speed:
+                violations.append(f"Wind speed {columns['wind_speed_mph'][i]:.1f} mph exceeds limit of {max_wind_speed} mph")
+            if columns['visibility_miles'][i] < min_visibility:
+                violations.append(f"Visibility {columns['visibility_miles'][i]:.1f} miles is below minimum of {min_visibility} miles")
+            return "; ".join(violations), "Postpone flight until weather conditions improve"
+        if rule.rule_type == ComplianceRuleType.FLIGHT_TIME_LIMIT:
+            max_flight_time = params.get('max_flight_time_minutes', 30)
+            return (f"Flight time {columns['flight_time_minutes'][i]:.1f} minutes exceeds limit of {max_flight_time} minutes",
+                    "Land immediately or return to base")
+        if rule.rule_type == ComplianceRuleType.NO_FLY_ZONE:
+            fence = self.geofence_index.fences[fence_hits[i]]
+            return (f"Inside {fence.fence_type.replace('_', ' ')} '{fence.name}'",
+                    "Leave the restricted airspace and return to base")
+        return f"Violation of {rule.description}", "Manual review required"
     
     def _get_applicable_rules(self, jurisdiction: Jurisdiction) -> List[ComplianceRule]:
         """Get compliance rules applicable to a jurisdiction"""
         applicable_rules = []
         
         for rule in self.compliance_rules.values():
-            if rule.jurisdiction == jurisdiction:
+            if rule.jurisdiction in (jurisdiction, Jurisdiction.UNKNOWN):
                 applicable_rules.append(rule)
         
         return applicable_rules
@@ -629,11 +720,12 @@ class RegulatoryComplianceService:
             return False
     
     def get_compliance_summary(self, mission_id: str) -> Dict[str, Any]:
-        """Get compliance summary for a mission"""
+        """Get compliance summary for a mission (over the retained history)"""
         try:
-            mission_checks = [check for check in self.compliance_history if check.mission_id == mission_id]
+            history = self.compliance_history
+            rows = history.rows_for_mission(mission_id)
             
-            if not mission_checks:
+            if not len(rows):
                 return {
                     'mission_id': mission_id,
                     'total_checks': 0,
@@ -644,16 +736,20 @@ class RegulatoryComplianceService:
                     'jurisdictions': []
                 }
             
-            compliant_checks = len([check for check in mission_checks if check.result == ComplianceLevel.COMPLIANT])
-            non_compliant_checks = len([check for check in mission_checks if check.result == ComplianceLevel.NON_COMPLIANT])
-            compliance_rate = (compliant_checks / len(mission_checks)) * 100
+            results = history.results[rows]
+            compliant_checks = int(np.count_nonzero(results == COMPLIANT))
+            non_compliant_checks = int(np.count_nonzero(results == NON_COMPLIANT))
+            compliance_rate = (compliant_checks / len(rows)) * 100
             
-            jurisdictions = list(set([check.rule.jurisdiction.value for check in mission_checks]))
+            rule_ids = [history.name('rule', code) for code in np.unique(history.rules[rows])]
+            jurisdictions = list(set([self.compliance_rules[rule_id].jurisdiction.value
+                                      for rule_id in rule_ids if rule_id in self.compliance_rules
+                                      and self.compliance_rules[rule_id].jurisdiction != Jurisdiction.UNKNOWN]))
             active_violations = len([v for v in self.active_violations.values() if v.mission_id == mission_id])
             
             return {
                 'mission_id': mission_id,
-                'total_checks': len(mission_checks),
+                'total_checks': len(rows),
                 'compliant_checks': compliant_checks,
                 'non_compliant_checks': non_compliant_checks,
                 'compliance_rate': compliance_rate,
@@ -668,8 +764,10 @@ class RegulatoryComplianceService:
 class JurisdictionDetector:
     """Detect regulatory jurisdiction based on location"""
     
+    JURISDICTIONS = list(Jurisdiction)
+    
     def __init__(self):
-        # Simplified jurisdiction boundaries (in real implementation, use proper GIS data)
+        # Simplified default boundaries; load_boundaries() replaces them with GIS polygons
         self.jurisdiction_boundaries = {
             Jurisdiction.USA_FAA: {
                 'name': 'United States',
@@ -714,21 +812,48 @@ class JurisdictionDetector:
                 }
             }
         }
+        
+        self.set_boundaries([
+            (jurisdiction, Geofence(
+                fence_id=jurisdiction.value,
+                name=boundary['name'],
+                polygon=bounds_to_polygon(boundary['bounds']),
+                fence_type="jurisdiction"
+            ))
+            for jurisdiction, boundary in self.jurisdiction_boundaries.items()
+        ])
+    
+    def set_boundaries(self, boundaries: Sequence[Tuple[Jurisdiction, Geofence]]):
+        """Replace the boundary polygons; earlier entries win where boundaries overlap"""
+        self.boundaries = list(boundaries)
+        self.index = GeofenceIndex([fence for _, fence in self.boundaries])
+        self._codes = np.array(
+            [self.JURISDICTIONS.index(jurisdiction) for jurisdiction, _ in self.boundaries] +
+            [self.JURISDICTIONS.index(Jurisdiction.UNKNOWN)],
+            dtype=np.int64
+        )
+    
+    def load_boundaries(self, geojson: Any):
+        """Load jurisdiction polygons from GeoJSON features with a ``jurisdiction`` property"""
+        fences = geofences_from_geojson(geojson, default_type="jurisdiction")
+        self.set_boundaries([
+            (Jurisdiction(fence.properties['jurisdiction']), fence)
+            for fence in fences if fence.properties.get('jurisdiction')
+        ])
+        logger.info(f"Loaded {len(self.boundaries)} jurisdiction boundaries")
+    
+    def detect_jurisdictions(self, lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+        """Jurisdiction codes (indices into JURISDICTIONS) for a batch of points"""
+        first = np.full(len(lats), len(self.boundaries), dtype=np.int64)
+        points, fences = self.index.query_points(lats, lngs)
+        np.minimum.at(first, points, fences)
+        return self._codes[first]
     
     async def detect_jurisdiction(self, location: Tuple[float, float, float]) -> Jurisdiction:
         """Detect jurisdiction based on location coordinates"""
         try:
             lat, lng, alt = location
-            
-            for jurisdiction, bounds in self.jurisdiction_boundaries.items():
-                bounds_data = bounds['bounds']
-                
-                if (bounds_data['south'] <= lat <= bounds_data['north'] and
-                    bounds_data['west'] <= lng <= bounds_data['east']):
-                    return jurisdiction
-            
-            # Default to unknown if no jurisdiction matches
-            return Jurisdiction.UNKNOWN
+            return self.JURISDICTIONS[self.detect_jurisdictions([lat], [lng])[0]]
             
         except Exception as e:
             logger.error(f"Error detecting jurisdiction: {e}")
@@ -5,6 +5,8 @@ from enum import Enum
 import numpy as np
 from datetime import datetime
 
+from .coverage_grid import CoverageGrid
+
 logger = logging.getLogger(__name__)
 
 class SearchPattern(Enum):
@@ -412,9 +414,6 @@ class SearchAlgorithms:
         if not waypoints:
             return {"coverage_percent": 0, "area_covered_km2": 0}
         
-        # Calculate total area covered
-        total_area_km2 = len(waypoints) * math.pi * (search_radius_m / 1000) ** 2
-        
         # Calculate bounding box
         lats = [wp['lat'] for wp in waypoints]
         lons = [wp['lon'] for wp in waypoints]
@@ -431,8 +430,17 @@ class SearchAlgorithms:
         lon_km = lon_diff * 111 * math.cos(math.radians((lat_min + lat_max) / 2))
         bounding_area_km2 = lat_km * lon_km
         
-        # Calculate coverage percentage
-        coverage_percent = min(100, (total_area_km2 / bounding_area_km2) * 100) if bounding_area_km2 > 0 else 0
+        # Rasterize the search circles over the bounding box so overlaps count once
+        total_area_km2 = 0.0
+        coverage_percent = 0.0
+        if bounding_area_km2 > 0:
+            resolution_m = max(search_radius_m / 5, math.sqrt(bounding_area_km2 * 1e6 / 4e6), 0.1)
+            grid = CoverageGrid.from_bounds(
+                {"south": lat_min, "north": lat_max, "west": lon_min, "east": lon_max}, resolution_m
+            )
+            grid.stamp(lats, lons, search_radius_m)
+            total_area_km2 = grid.covered_cells * grid.cell_area_m2 / 1e6
+            coverage_percent = grid.coverage_percent
         
         return {
             "coverage_percent": coverage_percent,
@@ -88,8 +88,16 @@ class SARStreamProcessor:
         self.anomaly_detectors = {}
         self.performance_monitors = {}
         
-        # Initialize components
-        asyncio.create_task(self._initialize_components())
+        # Kafka/Redis connections are opened by start() (or the first publish),
+        # never from the constructor
+        self._init_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Connect to Kafka and Redis and start the consumers (idempotent)"""
+        if self._init_task is None:
+            self._init_task = asyncio.get_running_loop().create_task(self._initialize_components())
+        await self._init_task
+        self.is_running = True
     
     async def _initialize_components(self):
         """Initialize Kafka and Redis connections with production settings"""
@@ -158,6 +166,7 @@ class SARStreamProcessor:
     async def publish_message(self, message: StreamMessage) -> bool:
         """Publish message to appropriate Kafka topic with error handling"""
         try:
+            await self.start()
             topic_name = f"sar_{message.stream_type.value}"
             
             # Prepare message data
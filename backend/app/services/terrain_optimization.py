@@ -15,14 +15,17 @@ import math
 try:
     from scipy import ndimage
     from scipy.spatial.distance import cdist
+    from scipy.spatial import cKDTree
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
     # Mock scipy functions
     def ndimage(*args, **kwargs): return None
     def cdist(*args, **kwargs): return None
+    cKDTree = None
 
 from ..utils.logging import get_logger
+from .dem_tile_store import DEMTileStore, get_dem_store
 
 logger = get_logger(__name__)
 
@@ -73,12 +76,63 @@ class CoverageCell:
     optimal_altitude_m: float
     coverage_radius_m: float
 
+# Terrain types as compact integer codes for columnar storage
+TERRAIN_TYPES = list(TerrainType)
+TERRAIN_TYPE_CODES = {terrain_type: code for code, terrain_type in enumerate(TERRAIN_TYPES)}
+
+# DEM classification thresholds: slope in degrees, relief (3x3 max-min) in metres
+DEM_HILLY_SLOPE_DEG = 10.0
+DEM_MOUNTAINOUS_SLOPE_DEG = 25.0
+DEM_HILLY_RELIEF_M = 20.0
+DEM_MOUNTAINOUS_RELIEF_M = 60.0
+
+# Structured-array layout for coverage cells (one row per cell, no per-cell objects)
+COVERAGE_CELL_DTYPE = np.dtype([
+    ('cell_i', np.int32),
+    ('cell_j', np.int32),
+    ('center_lat', np.float64),
+    ('center_lng', np.float64),
+    ('elevation_m', np.float32),
+    ('terrain_type', np.uint8),
+    ('visibility_score', np.float32),
+    ('accessibility_score', np.float32),
+    ('priority_score', np.float32),
+    ('coverage_probability', np.float32),
+    ('search_difficulty', np.float32),
+    ('optimal_altitude_m', np.float32),
+    ('coverage_radius_m', np.float32),
+    ('assigned_drone', np.int16),
+])
+
+def coverage_cells_to_list(cells: np.ndarray) -> List[CoverageCell]:
+    """Materialize structured coverage cells as CoverageCell objects (for serialization)"""
+    result = []
+    for row in cells.tolist():
+        cell = CoverageCell(
+            cell_id=f"cell_{row[0]}_{row[1]}",
+            center_lat=row[2],
+            center_lng=row[3],
+            elevation_m=row[4],
+            terrain_type=TERRAIN_TYPES[row[5]],
+            visibility_score=row[6],
+            accessibility_score=row[7],
+            priority_score=row[8],
+            coverage_probability=row[9],
+            search_difficulty=row[10],
+            optimal_altitude_m=row[11],
+            coverage_radius_m=row[12]
+        )
+        if row[13] >= 0:
+            setattr(cell, 'assigned_drone', row[13])
+        result.append(cell)
+    return result
+
 @dataclass
 class TerrainOptimization:
     """Terrain optimization result"""
     optimization_id: str
     strategy: CoverageStrategy
-    coverage_cells: List[CoverageCell]
+    coverage_cells: np.ndarray  # COVERAGE_CELL_DTYPE rows
     total_coverage_percentage: float
     efficiency_score: float
     terrain_adaptation_score: float
@@ -98,11 +152,133 @@ class SearchZone:
     priority_areas: List[Dict[str, Any]]
     obstacles: List[Dict[str, Any]]
     accessibility_constraints: List[Dict[str, Any]]
+    terrain_version: int = 0  # bump after editing terrain_data in place
+
+class TerrainIndex:
+    """Columnar terrain samples with batched nearest-neighbour lookup
+
+    Samples are held as NumPy columns. Lookups use a scipy KD-tree when
+    available and a uniform grid-bucket search otherwise; both measure
+    distance in raw lat/lng degrees.
+    """
+    
+    def __init__(self, terrain_data: List[TerrainData]):
+        count = len(terrain_data)
+        self.size = count
+        self.latitude = np.fromiter((td.latitude for td in terrain_data), dtype=np.float64, count=count)
+        self.longitude = np.fromiter((td.longitude for td in terrain_data), dtype=np.float64, count=count)
+        self.elevation_m = np.fromiter((td.elevation_m for td in terrain_data), dtype=np.float32, count=count)
+        self.slope_degrees = np.fromiter((td.slope_degrees for td in terrain_data), dtype=np.float32, count=count)
+        self.roughness = np.fromiter((td.roughness for td in terrain_data), dtype=np.float32, count=count)
+        self.visibility_factor = np.fromiter((td.visibility_factor for td in terrain_data), dtype=np.float32, count=count)
+        self.accessibility_factor = np.fromiter((td.accessibility_factor for td in terrain_data), dtype=np.float32, count=count)
+        self.terrain_type = np.fromiter((TERRAIN_TYPE_CODES[td.terrain_type] for td in terrain_data), dtype=np.uint8, count=count)
+        self._build_lookup()
+    
+    @classmethod
+    def from_arrays(cls, latitude: np.ndarray, longitude: np.ndarray, elevation_m: np.ndarray,
+                    slope_degrees: np.ndarray, roughness: np.ndarray, visibility_factor: np.ndarray,
+                    accessibility_factor: np.ndarray, terrain_type: np.ndarray) -> "TerrainIndex":
+        """Build an index directly from columns (e.g. DEM samples)"""
+        index = cls.__new__(cls)
+        index.size = len(latitude)
+        index.latitude = np.asarray(latitude, dtype=np.float64)
+        index.longitude = np.asarray(longitude, dtype=np.float64)
+        index.elevation_m = np.asarray(elevation_m, dtype=np.float32)
+        index.slope_degrees = np.asarray(slope_degrees, dtype=np.float32)
+        index.roughness = np.asarray(roughness, dtype=np.float32)
+        index.visibility_factor = np.asarray(visibility_factor, dtype=np.float32)
+        index.accessibility_factor = np.asarray(accessibility_factor, dtype=np.float32)
+        index.terrain_type = np.asarray(terrain_type, dtype=np.uint8)
+        index._build_lookup()
+        return index
+    
+    def _build_lookup(self):
+        self._tree = None
+        self._buckets = None
+        if self.size and SCIPY_AVAILABLE:
+            self._tree = cKDTree(np.column_stack([self.latitude, self.longitude]))
+        elif self.size:
+            self._build_buckets()
+    
+    def nearest(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Index of the closest terrain sample for every query point"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        if self._tree is not None:
+            _, indices = self._tree.query(np.column_stack([lats, lngs]))
+            return indices.astype(np.int64)
+        return self._bucket_nearest(lats, lngs)
+    
+    def _build_buckets(self):
+        lat_min, lng_min = self.latitude.min(), self.longitude.min()
+        extent = max(self.latitude.max() - lat_min, self.longitude.max() - lng_min, 1e-9)
+        # Roughly a couple of samples per bucket for uniformly spread data
+        bucket_size = extent / max(1.0, math.sqrt(self.size / 2.0))
+        keys_lat = ((self.latitude - lat_min) // bucket_size).astype(np.int64)
+        keys_lng = ((self.longitude - lng_min) // bucket_size).astype(np.int64)
+        order = np.lexsort((keys_lng, keys_lat))
+        keys = np.stack([keys_lat[order], keys_lng[order]], axis=1)
+        unique_keys, starts = np.unique(keys, axis=0, return_index=True)
+        ends = np.append(starts[1:], len(order))
+        self._buckets = {
+            (int(key[0]), int(key[1])): order[start:end]
+            for key, start, end in zip(unique_keys, starts, ends)
+        }
+        self._bucket_origin = (lat_min, lng_min)
+        self._bucket_size = bucket_size
+    
+    def _bucket_nearest(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        result = np.full(lats.shape[0], -1, dtype=np.int64)
+        lat_min, lng_min = self._bucket_origin
+        size = self._bucket_size
+        q_lat = np.floor((lats - lat_min) / size).astype(np.int64)
+        q_lng = np.floor((lngs - lng_min) / size).astype(np.int64)
+        
+        # Resolve queries bucket by bucket against their 3x3 neighbourhood; a hit
+        # within one bucket width is provably the global nearest
+        query_keys, inverse = np.unique(np.stack([q_lat, q_lng], axis=1), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        query_order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[query_order], np.arange(len(query_keys) + 1))
+        unresolved = []
+        for k, (key_lat, key_lng) in enumerate(query_keys.tolist()):
+            members = query_order[bounds[k]:bounds[k + 1]]
+            candidates = [
+                self._buckets[(key_lat + d_lat, key_lng + d_lng)]
+                for d_lat in (-1, 0, 1) for d_lng in (-1, 0, 1)
+                if (key_lat + d_lat, key_lng + d_lng) in self._buckets
+            ]
+            if not candidates:
+                unresolved.append(members)
+                continue
+            candidates = np.concatenate(candidates)
+            d2 = ((lats[members, None] - self.latitude[candidates]) ** 2 +
+                  (lngs[members, None] - self.longitude[candidates]) ** 2)
+            best = d2.argmin(axis=1)
+            best_d2 = d2[np.arange(len(members)), best]
+            resolved = best_d2 <= size * size
+            result[members[resolved]] = candidates[best[resolved]]
+            if not resolved.all():
+                unresolved.append(members[~resolved])
+        
+        # Sparse regions: exact brute force in chunks
+        if unresolved:
+            remaining = np.concatenate(unresolved)
+            chunk = max(1, 4_000_000 // max(self.size, 1))
+            for start in range(0, len(remaining), chunk):
+                members = remaining[start:start + chunk]
+                d2 = ((lats[members, None] - self.latitude) ** 2 +
+                      (lngs[members, None] - self.longitude) ** 2)
+                result[members] = d2.argmin(axis=1)
+        return result
 
 class TerrainOptimizationEngine:
     """Advanced terrain optimization engine for SAR operations"""
     
-    def __init__(self):
+    def __init__(self, cell_size_km: float = 0.5, dem_store: Optional[DEMTileStore] = None):
+        self.cell_size_km = cell_size_km
+        self.dem_store = dem_store
         self.terrain_cache = {}
         self.elevation_data = {}
         self.terrain_analysis_cache = {}
@@ -159,6 +335,20 @@ class TerrainOptimizationEngine:
             }
         }
         
+        # Per-terrain-type parameters as arrays indexed by terrain type code
+        self._type_altitude_m = np.array(
+            [self.terrain_parameters[t]['optimal_altitude_m'] for t in TERRAIN_TYPES], dtype=np.float32
+        )
+        self._type_radius_m = np.array(
+            [self.terrain_parameters[t]['coverage_radius_m'] for t in TERRAIN_TYPES], dtype=np.float32
+        )
+        self._type_visibility = np.array(
+            [self.terrain_parameters[t]['visibility_factor'] for t in TERRAIN_TYPES], dtype=np.float32
+        )
+        self._type_accessibility = np.array(
+            [self.terrain_parameters[t]['accessibility_factor'] for t in TERRAIN_TYPES], dtype=np.float32
+        )
+        
         # Coverage optimization weights
         self.optimization_weights = {
             'coverage_completeness': 0.4,
@@ -224,44 +414,67 @@ class TerrainOptimizationEngine:
             logger.error(f"Error optimizing coverage: {e}")
             raise
     
+    def _get_terrain_index(self, search_zone: SearchZone, terrain_data: Optional[List[TerrainData]] = None) -> TerrainIndex:
+        """Columnar terrain index for a zone, rebuilt when its terrain list or terrain_version changes
+        
+        The entry holds the list itself, so it is compared by identity and its
+        id cannot be reused by another list. Hashing the samples instead would
+        cost as much as rebuilding the index.
+        """
+        terrain_data = search_zone.terrain_data if terrain_data is None else terrain_data
+        version = (search_zone.terrain_version, len(terrain_data))
+        cached = self.terrain_cache.get(search_zone.zone_id)
+        if cached is not None and cached[0] is terrain_data and cached[1] == version:
+            return cached[2]
+        index = TerrainIndex(terrain_data)
+        self.terrain_cache[search_zone.zone_id] = (terrain_data, version, index)
+        return index
+    
     async def _analyze_terrain_characteristics(self, search_zone: SearchZone) -> Dict[str, Any]:
         """Analyze terrain characteristics for optimization"""
         try:
             terrain_data = search_zone.terrain_data
             
-            if not terrain_data:
-                # Generate mock terrain data if none provided
-                terrain_data = await self._generate_mock_terrain_data(search_zone)
-            
-            # Calculate terrain statistics
-            elevations = [td.elevation_m for td in terrain_data]
-            slopes = [td.slope_degrees for td in terrain_data]
-            roughness_values = [td.roughness for td in terrain_data]
+            dem = self._dem_for_zone(search_zone)
+            if not terrain_data and dem is not None:
+                index = self._sample_dem_terrain(search_zone, dem)
+            else:
+                if not terrain_data:
+                    # Generate mock terrain data if none provided
+                    terrain_data = await self._generate_mock_terrain_data(search_zone)
+                index = TerrainIndex(terrain_data) if terrain_data is not search_zone.terrain_data else self._get_terrain_index(search_zone)
+            if index.size == 0:
+                return {
+                    'terrain_complexity': 0.0,
+                    'elevation_range': (0, 0),
+                    'average_slope': 0,
+                    'terrain_type_distribution': {},
+                    'average_visibility': 0.5,
+                    'average_accessibility': 0.5,
+                    'dominant_terrain_type': TerrainType.FLAT
+                }
             
             # Terrain type distribution
-            terrain_type_counts = {}
-            for td in terrain_data:
-                terrain_type_counts[td.terrain_type] = terrain_type_counts.get(td.terrain_type, 0) + 1
+            type_counts = np.bincount(index.terrain_type, minlength=len(TERRAIN_TYPES))
+            terrain_type_counts = {
+                TERRAIN_TYPES[code]: int(count) for code, count in enumerate(type_counts) if count
+            }
             
             # Calculate terrain complexity
-            elevation_variance = np.var(elevations) if elevations else 0
-            slope_variance = np.var(slopes) if slopes else 0
-            roughness_variance = np.var(roughness_values) if roughness_values else 0
+            elevation_variance = float(np.var(index.elevation_m))
+            slope_variance = float(np.var(index.slope_degrees))
+            roughness_variance = float(np.var(index.roughness))
             
             terrain_complexity = (elevation_variance / 1000 + slope_variance / 100 + roughness_variance) / 3
             
-            # Calculate average visibility and accessibility
-            avg_visibility = np.mean([td.visibility_factor for td in terrain_data]) if terrain_data else 0.5
-            avg_accessibility = np.mean([td.accessibility_factor for td in terrain_data]) if terrain_data else 0.5
-            
             return {
                 'terrain_complexity': terrain_complexity,
-                'elevation_range': (min(elevations), max(elevations)) if elevations else (0, 0),
-                'average_slope': np.mean(slopes) if slopes else 0,
+                'elevation_range': (float(index.elevation_m.min()), float(index.elevation_m.max())),
+                'average_slope': float(np.mean(index.slope_degrees)),
                 'terrain_type_distribution': terrain_type_counts,
-                'average_visibility': avg_visibility,
-                'average_accessibility': avg_accessibility,
-                'dominant_terrain_type': max(terrain_type_counts.items(), key=lambda x: x[1])[0] if terrain_type_counts else TerrainType.FLAT
+                'average_visibility': float(np.mean(index.visibility_factor)),
+                'average_accessibility': float(np.mean(index.accessibility_factor)),
+                'dominant_terrain_type': TERRAIN_TYPES[int(type_counts.argmax())]
             }
             
         except Exception as e:
@@ -270,73 +483,52 @@ class TerrainOptimizationEngine:
     
     async def _generate_terrain_adaptive_coverage(self, search_zone: SearchZone, 
                                                 drone_count: int,
-                                                terrain_analysis: Dict[str, Any]) -> List[CoverageCell]:
-        """Generate terrain-adaptive coverage cells"""
+                                                terrain_analysis: Dict[str, Any]) -> np.ndarray:
+        """Generate terrain-adaptive coverage cells as a structured array"""
         try:
-            cells = []
-            cell_size_km = 0.5  # 500m grid cells
+            cell_size_km = self.cell_size_km
+            km_per_deg_lng = 111 * math.cos(math.radians(search_zone.center_lat))
             
-            # Calculate number of cells needed
-            zone_width_km = search_zone.bounds['east'] - search_zone.bounds['west']
-            zone_height_km = search_zone.bounds['north'] - search_zone.bounds['south']
-            
-            # Convert to approximate km (rough conversion)
-            zone_width_km *= 111 * math.cos(math.radians(search_zone.center_lat))
-            zone_height_km *= 111
+            # Calculate number of cells needed (rough degree-to-km conversion)
+            zone_width_km = (search_zone.bounds['east'] - search_zone.bounds['west']) * km_per_deg_lng
+            zone_height_km = (search_zone.bounds['north'] - search_zone.bounds['south']) * 111
             
             num_cells_x = int(zone_width_km / cell_size_km)
             num_cells_y = int(zone_height_km / cell_size_km)
+            if num_cells_x <= 0 or num_cells_y <= 0:
+                return np.zeros(0, dtype=COVERAGE_CELL_DTYPE)
+            
+            # Cell centres for the whole grid: i steps east-west, j steps north-south
+            cell_i, cell_j = np.meshgrid(
+                np.arange(num_cells_x, dtype=np.int32), np.arange(num_cells_y, dtype=np.int32), indexing='ij'
+            )
+            cell_i, cell_j = cell_i.ravel(), cell_j.ravel()
+            cells = np.zeros(cell_i.shape[0], dtype=COVERAGE_CELL_DTYPE)
+            cells['cell_i'] = cell_i
+            cells['cell_j'] = cell_j
+            cells['center_lng'] = search_zone.center_lng + (cell_i - num_cells_x / 2) * cell_size_km / km_per_deg_lng
+            cells['center_lat'] = search_zone.center_lat + (cell_j - num_cells_y / 2) * cell_size_km / 111
+            cells['assigned_drone'] = -1
+            
+            # Terrain for every cell in one batched nearest-neighbour query
+            self._assign_cell_terrain(cells, search_zone)
+            
+            visibility = cells['visibility_score']
+            accessibility = cells['accessibility_score']
+            
+            # Priority score based on terrain difficulty and potential for finding targets
+            cells['priority_score'] = self._calculate_priority_scores(cells, search_zone.priority_areas)
             
-            # Generate cells based on terrain characteristics
-            for i in range(num_cells_x):
-                for j in range(num_cells_y):
-                    # Calculate cell center coordinates
-                    lat_offset = (i - num_cells_x / 2) * cell_size_km / 111
-                    lng_offset = (j - num_cells_y / 2) * cell_size_km / (111 * math.cos(math.radians(search_zone.center_lat)))
-                    
-                    cell_lat = search_zone.center_lat + lat_offset
-                    cell_lng = search_zone.center_lng + lng_offset
-                    
-                    # Get terrain data for this cell
-                    cell_terrain = await self._get_terrain_for_cell(cell_lat, cell_lng, search_zone.terrain_data)
-                    
-                    # Calculate cell parameters based on terrain
-                    visibility_score = cell_terrain.visibility_factor
-                    accessibility_score = cell_terrain.accessibility_factor
-                    
-                    # Priority score based on terrain difficulty and potential for finding targets
-                    priority_score = self._calculate_priority_score(cell_terrain, search_zone.priority_areas, cell_lat, cell_lng)
-                    
-                    # Coverage probability based on terrain visibility
-                    coverage_probability = visibility_score * 0.8 + accessibility_score * 0.2
-                    
-                    # Search difficulty based on terrain complexity
-                    search_difficulty = 1.0 - (visibility_score * 0.6 + accessibility_score * 0.4)
-                    
-                    # Optimal altitude and coverage radius based on terrain type
-                    terrain_params = self.terrain_parameters[cell_terrain.terrain_type]
-                    optimal_altitude = terrain_params['optimal_altitude_m']
-                    coverage_radius = terrain_params['coverage_radius_m']
-                    
-                    # Adjust based on elevation
-                    optimal_altitude = max(optimal_altitude, cell_terrain.elevation_m + 50)  # Minimum 50m above terrain
-                    
-                    cell = CoverageCell(
-                        cell_id=f"cell_{i}_{j}",
-                        center_lat=cell_lat,
-                        center_lng=cell_lng,
-                        elevation_m=cell_terrain.elevation_m,
-                        terrain_type=cell_terrain.terrain_type,
-                        visibility_score=visibility_score,
-                        accessibility_score=accessibility_score,
-                        priority_score=priority_score,
-                        coverage_probability=coverage_probability,
-                        search_difficulty=search_difficulty,
-                        optimal_altitude_m=optimal_altitude,
-                        coverage_radius_m=coverage_radius
-                    )
-                    
-                    cells.append(cell)
+            # Coverage probability based on terrain visibility
+            cells['coverage_probability'] = visibility * 0.8 + accessibility * 0.2
+            
+            # Search difficulty based on terrain complexity
+            cells['search_difficulty'] = 1.0 - (visibility * 0.6 + accessibility * 0.4)
+            
+            # Optimal altitude and coverage radius based on terrain type, minimum 50m above terrain
+            codes = cells['terrain_type']
+            cells['optimal_altitude_m'] = np.maximum(self._type_altitude_m[codes], cells['elevation_m'] + 50)
+            cells['coverage_radius_m'] = self._type_radius_m[codes]
             
             # Optimize cell distribution for drone count
             if drone_count > 1:
@@ -346,122 +538,112 @@ class TerrainOptimizationEngine:
             
         except Exception as e:
             logger.error(f"Error generating terrain adaptive coverage: {e}")
-            return []
+            return np.zeros(0, dtype=COVERAGE_CELL_DTYPE)
     
-    async def _get_terrain_for_cell(self, lat: float, lng: float, 
-                                  terrain_data: List[TerrainData]) -> TerrainData:
-        """Get terrain data for a specific cell location"""
-        try:
-            # Find closest terrain data point
-            min_distance = float('inf')
-            closest_terrain = None
-            
-            for td in terrain_data:
-                distance = math.sqrt((td.latitude - lat)**2 + (td.longitude - lng)**2)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_terrain = td
-            
-            if closest_terrain:
-                return closest_terrain
-            else:
-                # Return default terrain data if none found
-                return TerrainData(
-                    latitude=lat,
-                    longitude=lng,
-                    elevation_m=100.0,
-                    slope_degrees=5.0,
-                    aspect_degrees=0.0,
-                    roughness=0.1,
-                    vegetation_density=0.3,
-                    visibility_factor=0.7,
-                    accessibility_factor=0.6,
-                    terrain_type=TerrainType.FLAT
-                )
-                
-        except Exception as e:
-            logger.error(f"Error getting terrain for cell: {e}")
-            return TerrainData(
-                latitude=lat, longitude=lng, elevation_m=100.0,
-                slope_degrees=5.0, aspect_degrees=0.0, roughness=0.1,
-                vegetation_density=0.3, visibility_factor=0.7,
-                accessibility_factor=0.6, terrain_type=TerrainType.FLAT
-            )
+    def _dem_for_zone(self, search_zone: SearchZone) -> Optional[DEMTileStore]:
+        """The configured DEM store when it covers the whole zone"""
+        dem = self.dem_store if self.dem_store is not None else get_dem_store()
+        if dem is not None and dem.covers(search_zone.bounds):
+            return dem
+        return None
     
-    def _calculate_priority_score(self, terrain: TerrainData, priority_areas: List[Dict[str, Any]], 
-                                lat: float, lng: float) -> float:
-        """Calculate priority score for a cell based on terrain and priority areas"""
-        try:
-            base_score = 0.5  # Default priority
-            
-            # Adjust based on terrain difficulty (higher difficulty = higher priority)
-            terrain_difficulty = 1.0 - (terrain.visibility_factor * 0.6 + terrain.accessibility_factor * 0.4)
-            base_score += terrain_difficulty * 0.3
-            
-            # Check if cell is in priority area
-            for priority_area in priority_areas:
-                if self._point_in_area(lat, lng, priority_area):
-                    priority_multiplier = priority_area.get('priority_multiplier', 2.0)
-                    base_score *= priority_multiplier
-                    break
-            
-            return min(base_score, 1.0)  # Cap at 1.0
-            
-        except Exception as e:
-            logger.error(f"Error calculating priority score: {e}")
-            return 0.5
+    def _classify_dem_terrain(self, slope: np.ndarray, roughness: np.ndarray) -> np.ndarray:
+        """Terrain type codes from DEM slope (degrees) and local relief (m)"""
+        codes = np.full(slope.shape, TERRAIN_TYPE_CODES[TerrainType.FLAT], dtype=np.uint8)
+        codes[(slope > DEM_HILLY_SLOPE_DEG) | (roughness > DEM_HILLY_RELIEF_M)] = TERRAIN_TYPE_CODES[TerrainType.HILLY]
+        codes[(slope > DEM_MOUNTAINOUS_SLOPE_DEG) | (roughness > DEM_MOUNTAINOUS_RELIEF_M)] = TERRAIN_TYPE_CODES[TerrainType.MOUNTAINOUS]
+        return codes
     
-    def _point_in_area(self, lat: float, lng: float, area: Dict[str, Any]) -> bool:
-        """Check if point is within a priority area"""
-        try:
-            bounds = area.get('bounds', {})
+    def _sample_dem_terrain(self, search_zone: SearchZone, dem: DEMTileStore, samples_per_side: int = 64) -> TerrainIndex:
+        """Terrain index from a regular grid of DEM samples over the zone"""
+        bounds = search_zone.bounds
+        lats, lngs = np.meshgrid(
+            np.linspace(bounds['south'], bounds['north'], samples_per_side),
+            np.linspace(bounds['west'], bounds['east'], samples_per_side),
+            indexing='ij'
+        )
+        lats, lngs = lats.ravel(), lngs.ravel()
+        zone_size_m = (bounds['north'] - bounds['south']) * 111000 / samples_per_side
+        level = dem.level_for_resolution(zone_size_m, search_zone.center_lat)
+        samples = dem.sample_bands(lats, lngs, level=level)
+        valid = ~np.isnan(samples['elevation'])
+        slope = np.nan_to_num(samples['slope'][valid])
+        relief = np.nan_to_num(samples['roughness'][valid])
+        codes = self._classify_dem_terrain(slope, relief)
+        return TerrainIndex.from_arrays(
+            lats[valid], lngs[valid], samples['elevation'][valid], slope,
+            np.clip(relief / DEM_MOUNTAINOUS_RELIEF_M, 0.0, 1.0),
+            self._type_visibility[codes], self._type_accessibility[codes], codes
+        )
+    
+    def _assign_cell_terrain(self, cells: np.ndarray, search_zone: SearchZone):
+        """Fill elevation, terrain type, visibility and accessibility from the DEM or closest terrain sample"""
+        dem = self._dem_for_zone(search_zone)
+        if dem is not None:
+            level = dem.level_for_resolution(self.cell_size_km * 1000, search_zone.center_lat)
+            samples = dem.sample_bands(cells['center_lat'], cells['center_lng'], level=level)
+            codes = self._classify_dem_terrain(samples['slope'], samples['roughness'])
+            cells['elevation_m'] = samples['elevation']
+            cells['terrain_type'] = codes
+            cells['visibility_score'] = self._type_visibility[codes]
+            cells['accessibility_score'] = self._type_accessibility[codes]
+            missing = np.isnan(samples['elevation'])
+            if missing.any():
+                # DEM holes fall back to point samples / defaults
+                subset = cells[missing]
+                self._assign_cell_terrain_from_samples(subset, search_zone)
+                cells[missing] = subset
+            return
+        self._assign_cell_terrain_from_samples(cells, search_zone)
+    
+    def _assign_cell_terrain_from_samples(self, cells: np.ndarray, search_zone: SearchZone):
+        index = self._get_terrain_index(search_zone)
+        if index.size == 0:
+            # Default terrain when no data is available
+            cells['elevation_m'] = 100.0
+            cells['terrain_type'] = TERRAIN_TYPE_CODES[TerrainType.FLAT]
+            cells['visibility_score'] = 0.7
+            cells['accessibility_score'] = 0.6
+            return
+        
+        nearest = index.nearest(cells['center_lat'], cells['center_lng'])
+        cells['elevation_m'] = index.elevation_m[nearest]
+        cells['terrain_type'] = index.terrain_type[nearest]
+        cells['visibility_score'] = index.visibility_factor[nearest]
+        cells['accessibility_score'] = index.accessibility_factor[nearest]
+    
+    def _calculate_priority_scores(self, cells: np.ndarray, priority_areas: List[Dict[str, Any]]) -> np.ndarray:
+        """Calculate priority scores for all cells based on terrain and priority areas"""
+        # Adjust based on terrain difficulty (higher difficulty = higher priority)
+        terrain_difficulty = 1.0 - (cells['visibility_score'] * 0.6 + cells['accessibility_score'] * 0.4)
+        scores = 0.5 + terrain_difficulty * 0.3
+        
+        # The first priority area containing a cell sets its multiplier
+        unmatched = np.ones(len(cells), dtype=bool)
+        lat, lng = cells['center_lat'], cells['center_lng']
+        for priority_area in priority_areas:
+            bounds = priority_area.get('bounds', {})
             if not bounds:
-                return False
-            
-            return (bounds.get('south', -90) <= lat <= bounds.get('north', 90) and
-                    bounds.get('west', -180) <= lng <= bounds.get('east', 180))
-            
-        except Exception as e:
-            logger.error(f"Error checking point in area: {e}")
-            return False
+                continue
+            inside = unmatched & (
+                (bounds.get('south', -90) <= lat) & (lat <= bounds.get('north', 90)) &
+                (bounds.get('west', -180) <= lng) & (lng <= bounds.get('east', 180))
+            )
+            scores[inside] *= priority_area.get('priority_multiplier', 2.0)
+            unmatched &= ~inside
+        
+        return np.minimum(scores, 1.0)  # Cap at 1.0
     
-    async def _optimize_cell_distribution(self, cells: List[CoverageCell], drone_count: int) -> List[CoverageCell]:
+    async def _optimize_cell_distribution(self, cells: np.ndarray, drone_count: int) -> np.ndarray:
         """Optimize cell distribution for multiple drones"""
         try:
             if drone_count <= 1:
                 return cells
             
-            # Sort cells by priority score
-            sorted_cells = sorted(cells, key=lambda c: c.priority_score, reverse=True)
-            
-            # Distribute cells among drones
-            cells_per_drone = len(sorted_cells) // drone_count
-            optimized_cells = []
-            
-            for i, cell in enumerate(sorted_cells):
-                # Assign drone based on priority and load balancing
-                assigned_drone = i % drone_count
-                
-                # Create a copy of the cell with drone assignment
-                optimized_cell = CoverageCell(
-                    cell_id=cell.cell_id,
-                    center_lat=cell.center_lat,
-                    center_lng=cell.center_lng,
-                    elevation_m=cell.elevation_m,
-                    terrain_type=cell.terrain_type,
-                    visibility_score=cell.visibility_score,
-                    accessibility_score=cell.accessibility_score,
-                    priority_score=cell.priority_score,
-                    coverage_probability=cell.coverage_probability,
-                    search_difficulty=cell.search_difficulty,
-                    optimal_altitude_m=cell.optimal_altitude_m,
-                    coverage_radius_m=cell.coverage_radius_m
-                )
-                
-                # Add drone assignment metadata
-                setattr(optimized_cell, 'assigned_drone', assigned_drone)
-                
-                optimized_cells.append(optimized_cell)
+            # Sort cells by priority score (stable, highest first) and round-robin across drones
+            order = np.argsort(-cells['priority_score'], kind='stable')
+            optimized_cells = cells[order]
+            optimized_cells['assigned_drone'] = np.arange(len(optimized_cells)) % drone_count
             
             return optimized_cells
             
@@ -469,55 +651,33 @@ class TerrainOptimizationEngine:
             logger.error(f"Error optimizing cell distribution: {e}")
             return cells
     
-    async def _optimize_cell_parameters(self, cells: List[CoverageCell], 
-                                      terrain_analysis: Dict[str, Any]) -> List[CoverageCell]:
+    async def _optimize_cell_parameters(self, cells: np.ndarray, 
+                                      terrain_analysis: Dict[str, Any]) -> np.ndarray:
         """Optimize individual cell parameters based on terrain analysis"""
         try:
-            optimized_cells = []
+            optimized_cells = cells.copy()
             
-            for cell in cells:
-                # Adjust coverage radius based on terrain complexity
-                terrain_complexity = terrain_analysis.get('terrain_complexity', 0.5)
-                complexity_factor = 1.0 - (terrain_complexity * 0.3)  # Reduce radius for complex terrain
-                
-                optimized_radius = cell.coverage_radius_m * complexity_factor
-                
-                # Adjust optimal altitude based on elevation variance
-                elevation_range = terrain_analysis.get('elevation_range', (0, 0))
-                elevation_variance = elevation_range[1] - elevation_range[0]
-                
-                if elevation_variance > 200:  # High elevation variance
-                    altitude_adjustment = elevation_variance * 0.1
-                    optimized_altitude = max(cell.optimal_altitude_m + altitude_adjustment, cell.elevation_m + 50)
-                else:
-                    optimized_altitude = cell.optimal_altitude_m
-                
-                # Adjust coverage probability based on terrain analysis
-                avg_visibility = terrain_analysis.get('average_visibility', 0.7)
-                visibility_adjustment = (avg_visibility - 0.7) * 0.2  # Adjust based on average
-                optimized_probability = max(0.1, min(1.0, cell.coverage_probability + visibility_adjustment))
-                
-                # Create optimized cell
-                optimized_cell = CoverageCell(
-                    cell_id=cell.cell_id,
-                    center_lat=cell.center_lat,
-                    center_lng=cell.center_lng,
-                    elevation_m=cell.elevation_m,
-                    terrain_type=cell.terrain_type,
-                    visibility_score=cell.visibility_score,
-                    accessibility_score=cell.accessibility_score,
-                    priority_score=cell.priority_score,
-                    coverage_probability=optimized_probability,
-                    search_difficulty=cell.search_difficulty,
-                    optimal_altitude_m=optimized_altitude,
-                    coverage_radius_m=optimized_radius
+            # Adjust coverage radius based on terrain complexity
+            terrain_complexity = terrain_analysis.get('terrain_complexity', 0.5)
+            complexity_factor = 1.0 - (terrain_complexity * 0.3)  # Reduce radius for complex terrain
+            optimized_cells['coverage_radius_m'] = cells['coverage_radius_m'] * complexity_factor
+            
+            # Adjust optimal altitude based on elevation variance
+            elevation_range = terrain_analysis.get('elevation_range', (0, 0))
+            elevation_variance = elevation_range[1] - elevation_range[0]
+            
+            if elevation_variance > 200:  # High elevation variance
+                altitude_adjustment = elevation_variance * 0.1
+                optimized_cells['optimal_altitude_m'] = np.maximum(
+                    cells['optimal_altitude_m'] + altitude_adjustment, cells['elevation_m'] + 50
                 )
-                
-                # Copy any additional attributes
-                if hasattr(cell, 'assigned_drone'):
-                    setattr(optimized_cell, 'assigned_drone', cell.assigned_drone)
-                
-                optimized_cells.append(optimized_cell)
+            
+            # Adjust coverage probability based on terrain analysis
+            avg_visibility = terrain_analysis.get('average_visibility', 0.7)
+            visibility_adjustment = (avg_visibility - 0.7) * 0.2  # Adjust based on average
+            optimized_cells['coverage_probability'] = np.clip(
+                cells['coverage_probability'] + visibility_adjustment, 0.1, 1.0
+            )
             
             return optimized_cells
             
@@ -525,25 +685,18 @@ class TerrainOptimizationEngine:
             logger.error(f"Error optimizing cell parameters: {e}")
             return cells
     
-    async def _calculate_total_coverage(self, cells: List[CoverageCell], search_zone: SearchZone) -> float:
+    async def _calculate_total_coverage(self, cells: np.ndarray, search_zone: SearchZone) -> float:
         """Calculate total coverage percentage"""
         try:
-            if not cells:
+            if len(cells) == 0:
                 return 0.0
             
-            # Calculate total area covered by all cells
-            total_covered_area = 0.0
-            
-            for cell in cells:
-                cell_area = math.pi * (cell.coverage_radius_m / 1000) ** 2  # Convert to km²
-                weighted_area = cell_area * cell.coverage_probability
-                total_covered_area += weighted_area
-            
-            # Calculate search zone area
-            zone_area_km2 = search_zone.area_km2
+            # Total area covered by all cells, weighted by coverage probability (km²)
+            cell_areas = math.pi * (cells['coverage_radius_m'].astype(np.float64) / 1000) ** 2
+            total_covered_area = float(np.sum(cell_areas * cells['coverage_probability']))
             
             # Calculate coverage percentage
-            coverage_percentage = min(100.0, (total_covered_area / zone_area_km2) * 100)
+            coverage_percentage = min(100.0, (total_covered_area / search_zone.area_km2) * 100)
             
             return coverage_percentage
             
@@ -551,21 +704,17 @@ class TerrainOptimizationEngine:
             logger.error(f"Error calculating total coverage: {e}")
             return 0.0
     
-    async def _calculate_efficiency_score(self, cells: List[CoverageCell], search_zone: SearchZone) -> float:
+    async def _calculate_efficiency_score(self, cells: np.ndarray, search_zone: SearchZone) -> float:
         """Calculate efficiency score (0-1, higher is better)"""
         try:
-            if not cells:
+            if len(cells) == 0:
                 return 0.0
             
-            # Calculate total distance traveled
-            total_distance = 0.0
-            
-            for i in range(len(cells) - 1):
-                cell1 = cells[i]
-                cell2 = cells[i + 1]
-                distance = self._calculate_distance(cell1.center_lat, cell1.center_lng, 
-                                                  cell2.center_lat, cell2.center_lng)
-                total_distance += distance
+            # Calculate total distance traveled between consecutive cells
+            total_distance = float(np.sum(self._calculate_distances(
+                cells['center_lat'][:-1], cells['center_lng'][:-1],
+                cells['center_lat'][1:], cells['center_lng'][1:]
+            )))
             
             # Calculate coverage per distance ratio
             total_coverage = await self._calculate_total_coverage(cells, search_zone)
@@ -584,64 +733,52 @@ class TerrainOptimizationEngine:
             logger.error(f"Error calculating efficiency score: {e}")
             return 0.0
     
-    async def _calculate_terrain_adaptation_score(self, cells: List[CoverageCell], 
+    async def _calculate_terrain_adaptation_score(self, cells: np.ndarray, 
                                                 terrain_analysis: Dict[str, Any]) -> float:
         """Calculate terrain adaptation score"""
         try:
-            if not cells:
+            if len(cells) == 0:
                 return 0.0
             
-            total_adaptation_score = 0.0
+            codes = cells['terrain_type']
             
-            for cell in cells:
-                # Score based on how well cell parameters adapt to terrain
-                terrain_params = self.terrain_parameters[cell.terrain_type]
-                
-                # Check if altitude is appropriate for terrain
-                altitude_score = 1.0 - abs(cell.optimal_altitude_m - terrain_params['optimal_altitude_m']) / 100.0
-                altitude_score = max(0.0, min(1.0, altitude_score))
-                
-                # Check if coverage radius is appropriate for terrain
-                radius_score = 1.0 - abs(cell.coverage_radius_m - terrain_params['coverage_radius_m']) / 200.0
-                radius_score = max(0.0, min(1.0, radius_score))
-                
-                # Check if coverage probability accounts for terrain visibility
-                visibility_score = abs(cell.coverage_probability - cell.visibility_score) / cell.visibility_score
-                visibility_score = max(0.0, min(1.0, 1.0 - visibility_score))
-                
-                cell_adaptation_score = (altitude_score + radius_score + visibility_score) / 3.0
-                total_adaptation_score += cell_adaptation_score
+            # Check if altitude is appropriate for terrain
+            altitude_score = np.clip(1.0 - np.abs(cells['optimal_altitude_m'] - self._type_altitude_m[codes]) / 100.0, 0.0, 1.0)
             
-            average_adaptation_score = total_adaptation_score / len(cells)
+            # Check if coverage radius is appropriate for terrain
+            radius_score = np.clip(1.0 - np.abs(cells['coverage_radius_m'] - self._type_radius_m[codes]) / 200.0, 0.0, 1.0)
             
-            return average_adaptation_score
+            # Check if coverage probability accounts for terrain visibility
+            visibility = cells['visibility_score']
+            with np.errstate(divide='ignore', invalid='ignore'):
+                visibility_error = np.abs(cells['coverage_probability'] - visibility) / visibility
+            visibility_score = np.where(visibility > 0, np.clip(1.0 - visibility_error, 0.0, 1.0), 0.0)
+            
+            cell_adaptation_scores = (altitude_score + radius_score + visibility_score) / 3.0
+            
+            return float(np.mean(cell_adaptation_scores))
             
         except Exception as e:
             logger.error(f"Error calculating terrain adaptation score: {e}")
             return 0.0
     
-    async def _determine_optimal_altitude(self, cells: List[CoverageCell]) -> float:
+    async def _determine_optimal_altitude(self, cells: np.ndarray) -> float:
         """Determine optimal altitude for the mission"""
         try:
-            if not cells:
+            if len(cells) == 0:
                 return 100.0  # Default altitude
             
             # Calculate weighted average altitude based on coverage probability and priority
-            total_weight = 0.0
-            weighted_altitude = 0.0
-            
-            for cell in cells:
-                weight = cell.coverage_probability * cell.priority_score
-                weighted_altitude += cell.optimal_altitude_m * weight
-                total_weight += weight
+            weights = cells['coverage_probability'].astype(np.float64) * cells['priority_score']
+            total_weight = float(np.sum(weights))
             
             if total_weight > 0:
-                optimal_altitude = weighted_altitude / total_weight
+                optimal_altitude = float(np.sum(cells['optimal_altitude_m'] * weights)) / total_weight
             else:
-                optimal_altitude = np.mean([cell.optimal_altitude_m for cell in cells])
+                optimal_altitude = float(np.mean(cells['optimal_altitude_m']))
             
             # Ensure minimum altitude above highest terrain
-            max_elevation = max([cell.elevation_m for cell in cells]) if cells else 0
+            max_elevation = float(cells['elevation_m'].max())
             optimal_altitude = max(optimal_altitude, max_elevation + 50)
             
             return optimal_altitude
@@ -650,20 +787,15 @@ class TerrainOptimizationEngine:
             logger.error(f"Error determining optimal altitude: {e}")
             return 100.0
     
-    async def _estimate_search_time(self, cells: List[CoverageCell], drone_count: int) -> float:
+    async def _estimate_search_time(self, cells: np.ndarray, drone_count: int) -> float:
         """Estimate total search time in hours"""
         try:
-            if not cells:
+            if len(cells) == 0:
                 return 0.0
             
-            # Calculate time per cell based on search difficulty
-            total_time_minutes = 0.0
-            
-            for cell in cells:
-                base_time_per_cell = 5.0  # 5 minutes per cell
-                difficulty_multiplier = 1.0 + cell.search_difficulty  # 1.0 to 2.0
-                cell_time = base_time_per_cell * difficulty_multiplier
-                total_time_minutes += cell_time
+            # 5 minutes per cell, scaled 1.0-2.0x by search difficulty
+            base_time_per_cell = 5.0
+            total_time_minutes = float(np.sum(base_time_per_cell * (1.0 + cells['search_difficulty'].astype(np.float64))))
             
             # Divide by drone count for parallel search
             total_time_minutes /= drone_count
@@ -677,7 +809,7 @@ class TerrainOptimizationEngine:
             logger.error(f"Error estimating search time: {e}")
             return 1.0
     
-    async def _estimate_battery_consumption(self, cells: List[CoverageCell], search_time_hours: float) -> float:
+    async def _estimate_battery_consumption(self, cells: np.ndarray, search_time_hours: float) -> float:
         """Estimate battery consumption in Wh"""
         try:
             # Base power consumption
@@ -718,6 +850,16 @@ class TerrainOptimizationEngine:
             logger.error(f"Error calculating distance: {e}")
             return 0.0
     
+    def _calculate_distances(self, lat1: np.ndarray, lng1: np.ndarray,
+                             lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+        """Vectorized haversine distances in meters"""
+        R = 6371000  # Earth radius in meters
+        lat1_rad, lat2_rad = np.radians(lat1), np.radians(lat2)
+        delta_lat = lat2_rad - lat1_rad
+        delta_lng = np.radians(lng2 - lng1)
+        a = np.sin(delta_lat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lng / 2) ** 2
+        return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
     async def _generate_mock_terrain_data(self, search_zone: SearchZone) -> List[TerrainData]:
         """Generate mock terrain data for testing"""
         try:
@@ -771,22 +913,22 @@ class TerrainOptimizationEngine:
             return []
     
     # Additional coverage strategies (simplified implementations)
-    async def _generate_uniform_coverage(self, search_zone: SearchZone, drone_count: int) -> List[CoverageCell]:
+    async def _generate_uniform_coverage(self, search_zone: SearchZone, drone_count: int) -> np.ndarray:
         """Generate uniform coverage cells"""
         # Simplified implementation - would generate regular grid
         return await self._generate_terrain_adaptive_coverage(search_zone, drone_count, {})
     
-    async def _generate_priority_coverage(self, search_zone: SearchZone, drone_count: int) -> List[CoverageCell]:
+    async def _generate_priority_coverage(self, search_zone: SearchZone, drone_count: int) -> np.ndarray:
         """Generate priority-based coverage cells"""
         # Simplified implementation - would focus on priority areas
         return await self._generate_terrain_adaptive_coverage(search_zone, drone_count, {})
     
-    async def _generate_risk_based_coverage(self, search_zone: SearchZone, drone_count: int) -> List[CoverageCell]:
+    async def _generate_risk_based_coverage(self, search_zone: SearchZone, drone_count: int) -> np.ndarray:
         """Generate risk-based coverage cells"""
         # Simplified implementation - would focus on high-risk areas
         return await self._generate_terrain_adaptive_coverage(search_zone, drone_count, {})
     
-    async def _generate_efficiency_optimized_coverage(self, search_zone: SearchZone, drone_count: int) -> List[CoverageCell]:
+    async def _generate_efficiency_optimized_coverage(self, search_zone: SearchZone, drone_count: int) -> np.ndarray:
         """Generate efficiency-optimized coverage cells"""
         # Simplified implementation - would optimize for maximum efficiency
         return await self._generate_terrain_adaptive_coverage(search_zone, drone_count, {})
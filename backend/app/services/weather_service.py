@@ -4,20 +4,31 @@ Real-time weather data integration for flight planning and safety
 """
 
 import asyncio
-import aiohttp
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 import json
 import math
 
+import numpy as np
+
 from ..utils.logging import get_logger
 from ..core.config import settings
 
+if TYPE_CHECKING:
+    import aiohttp
+
 logger = get_logger(__name__)
 
+def _client_session() -> "aiohttp.ClientSession":
+    # aiohttp is imported on the first upstream call rather than at app startup
+    import aiohttp
+    return aiohttp.ClientSession()
+
 class WeatherCondition(Enum):
     CLEAR = "clear"
     PARTLY_CLOUDY = "partly_cloudy"
@@ -84,15 +95,74 @@ class FlightRestriction:
     valid_until: Optional[datetime] = None
     recommended_action: str = ""
 
+# Interpolated weather fields; wind direction is carried as (u, v) components
+FIELD_NAMES = (
+    'temperature_celsius', 'humidity_percent', 'pressure_hpa', 'visibility_km',
+    'cloud_cover_percent', 'wind_speed_ms', 'wind_u_ms', 'wind_v_ms', 'wind_gusts_ms',
+    'precipitation_mm', 'precipitation_probability',
+)
+
+@dataclass
+class WeatherTile:
+    """Observation and forecast time series at one weather grid node"""
+    key: Tuple[int, int]
+    times: np.ndarray  # epoch seconds, ascending
+    values: np.ndarray  # (len(times), len(FIELD_NAMES))
+    conditions: List[WeatherCondition]
+    descriptions: List[str]
+    fetched_at: float
+
+    @classmethod
+    def from_series(cls, key: Tuple[int, int], series: List[WeatherData], fetched_at: float) -> "WeatherTile":
+        series = sorted(series, key=lambda w: w.timestamp)
+        values = np.empty((len(series), len(FIELD_NAMES)))
+        for row, w in enumerate(series):
+            direction = math.radians(w.wind_direction_degrees)
+            values[row] = (
+                w.temperature_celsius, w.humidity_percent, w.pressure_hpa, w.visibility_km,
+                w.cloud_cover_percent, w.wind_speed_ms,
+                -w.wind_speed_ms * math.sin(direction), -w.wind_speed_ms * math.cos(direction),
+                w.wind_gusts_ms, w.precipitation_mm, w.precipitation_probability,
+            )
+        return cls(
+            key=key,
+            times=np.array([w.timestamp.timestamp() for w in series]),
+            values=values,
+            conditions=[w.condition for w in series],
+            descriptions=[w.description for w in series],
+            fetched_at=fetched_at,
+        )
+
+    def at(self, t: float) -> np.ndarray:
+        """Fields linearly interpolated in time, held constant outside the series"""
+        if t <= self.times[0]:
+            return self.values[0]
+        if t >= self.times[-1]:
+            return self.values[-1]
+        k = int(np.searchsorted(self.times, t))
+        w = (t - self.times[k - 1]) / (self.times[k] - self.times[k - 1])
+        return self.values[k - 1] * (1 - w) + self.values[k] * w
+
+    def nearest(self, t: float) -> int:
+        return int(np.argmin(np.abs(self.times - t)))
+
 class WeatherService:
-    """Weather service for SAR mission planning"""
+    """Weather service for SAR mission planning
+
+    Weather is cached as a field on a coarse grid (``WEATHER_GRID_DEG``):
+    each node holds the provider's observation and forecast series, and any
+    point and time is interpolated bilinearly between the four surrounding
+    nodes and linearly between forecast steps. Nodes expire after a TTL and
+    are evicted LRU; concurrent requests for a node share one upstream fetch.
+    """
     
     def __init__(self):
         self.api_keys = {
-            'openweather': getattr(settings, 'OPENWEATHER_API_KEY', None),
+            'openweather': settings.OPENWEATHER_API_KEY,
             'weather_api': getattr(settings, 'WEATHER_API_KEY', None),
             'noaa': getattr(settings, 'NOAA_API_KEY', None)
         }
+        self.openweather_url = settings.OPENWEATHER_BASE_URL
         
         # Weather thresholds for flight safety
         self.safety_thresholds = {
@@ -105,40 +175,56 @@ class WeatherService:
             'max_temperature_celsius': 40.0   # 40°C maximum
         }
         
-        # Cache for weather data
-        self.weather_cache = {}
-        self.cache_duration = 300  # 5 minutes
+        # Gridded weather cache: node (row, col) -> WeatherTile, in LRU order
+        self.grid_deg = settings.WEATHER_GRID_DEG
+        self.weather_cache: "OrderedDict[Tuple[int, int], WeatherTile]" = OrderedDict()
+        self.cache_duration = settings.WEATHER_TILE_TTL_SECONDS
+        self.max_cached_tiles = settings.WEATHER_CACHE_MAX_TILES
+        self.clock = time.monotonic
+        self._inflight: Dict[Tuple[int, int], asyncio.Future] = {}
+        self._prefetch_tasks = set()
+        self.cache_stats = {
+            'hits': 0, 'misses': 0, 'coalesced': 0, 'evicted': 0,
+            'prefetched_tiles': 0, 'upstream_calls': 0,
+        }
         
     async def get_current_weather(self, latitude: float, longitude: float) -> WeatherData:
         """Get current weather conditions for a specific location"""
+        return await self.get_weather(latitude, longitude)
+    
+    async def get_weather(self, latitude: float, longitude: float,
+                          when: Optional[datetime] = None) -> WeatherData:
+        """Weather at a point and time, interpolated from the cached grid"""
         try:
-            cache_key = f"{latitude:.4f}_{longitude:.4f}_current"
-            
-            # Check cache first
-            if cache_key in self.weather_cache:
-                cached_data, timestamp = self.weather_cache[cache_key]
-                if (datetime.now() - timestamp).seconds < self.cache_duration:
-                    return cached_data
-            
-            # Fetch from multiple sources for redundancy
-            weather_data = None
+            t = (when or datetime.now()).timestamp()
+            fields, tiles, nearest = await self._sample(np.array([latitude]), np.array([longitude]), t)
+            values = dict(zip(FIELD_NAMES, fields[0].tolist()))
+            tile = tiles[nearest[0]]
+            step = tile.nearest(t)
             
-            if self.api_keys['openweather']:
-                weather_data = await self._fetch_openweather_data(latitude, longitude)
-            
-            if not weather_data and self.api_keys['weather_api']:
-                weather_data = await self._fetch_weather_api_data(latitude, longitude)
-            
-            if not weather_data:
-                # Fallback to mock data for development
-                weather_data = self._generate_mock_weather_data(latitude, longitude)
+            weather_data = WeatherData(
+                latitude=latitude,
+                longitude=longitude,
+                timestamp=datetime.fromtimestamp(t),
+                temperature_celsius=values['temperature_celsius'],
+                humidity_percent=values['humidity_percent'],
+                pressure_hpa=values['pressure_hpa'],
+                visibility_km=values['visibility_km'],
+                cloud_cover_percent=values['cloud_cover_percent'],
+                wind_speed_ms=values['wind_speed_ms'],
+                wind_direction_degrees=math.degrees(math.atan2(-values['wind_u_ms'], -values['wind_v_ms'])) % 360,
+                wind_gusts_ms=values['wind_gusts_ms'],
+                precipitation_mm=values['precipitation_mm'],
+                precipitation_probability=values['precipitation_probability'],
+                condition=tile.conditions[step],
+                description=tile.descriptions[step],
+                flight_safety=FlightSafety.SAFE,
+                safety_reasons=[]
+            )
             
             # Assess flight safety
             weather_data.flight_safety, weather_data.safety_reasons = self._assess_flight_safety(weather_data)
             
-            # Cache the result
-            self.weather_cache[cache_key] = (weather_data, datetime.now())
-            
             return weather_data
             
         except Exception as e:
@@ -146,6 +232,134 @@ class WeatherService:
             # Return safe default weather data
             return self._generate_safe_weather_data(latitude, longitude)
     
+    async def sample_weather_field(self, latitudes: Any, longitudes: Any,
+                                   when: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Interpolated weather fields for a batch of points, e.g. a whole fleet"""
+        t = (when or datetime.now()).timestamp()
+        fields, _, _ = await self._sample(np.atleast_1d(np.asarray(latitudes, dtype=np.float64)),
+                                          np.atleast_1d(np.asarray(longitudes, dtype=np.float64)), t)
+        return {name: fields[:, k] for k, name in enumerate(FIELD_NAMES)}
+    
+    async def _sample(self, lats: np.ndarray, lngs: np.ndarray,
+                      t: float) -> Tuple[np.ndarray, Dict[Tuple[int, int], WeatherTile], List[Tuple[int, int]]]:
+        """Bilinear interpolation between grid nodes; returns fields, tiles and each point's nearest node"""
+        gy, gx = lats / self.grid_deg, lngs / self.grid_deg
+        rows, cols = np.floor(gy).astype(np.int64), np.floor(gx).astype(np.int64)
+        fy, fx = gy - rows, gx - cols
+        corners = (
+            (0, 0, (1 - fy) * (1 - fx)), (1, 0, fy * (1 - fx)),
+            (0, 1, (1 - fy) * fx), (1, 1, fy * fx),
+        )
+        
+        keys = sorted({
+            (int(r) + dr, int(c) + dc)
+            for dr, dc, weight in corners
+            for r, c in zip(rows[weight > 0], cols[weight > 0])
+        })
+        tiles = dict(zip(keys, await asyncio.gather(*(self._get_tile(key) for key in keys))))
+        node_values = {key: tile.at(t) for key, tile in tiles.items()}
+        
+        fields = np.zeros((len(lats), len(FIELD_NAMES)))
+        for dr, dc, weight in corners:
+            members = np.flatnonzero(weight > 0)
+            if len(members):
+                corner = np.array([node_values[(int(rows[i]) + dr, int(cols[i]) + dc)] for i in members])
+                fields[members] += weight[members, None] * corner
+        nearest = [(int(r), int(c)) for r, c in zip(np.rint(gy).astype(np.int64), np.rint(gx).astype(np.int64))]
+        return fields, tiles, nearest
+    
+    def _node_position(self, key: Tuple[int, int]) -> Tuple[float, float]:
+        return key[0] * self.grid_deg, key[1] * self.grid_deg
+    
+    def _is_fresh(self, key: Tuple[int, int]) -> bool:
+        tile = self.weather_cache.get(key)
+        return tile is not None and self.clock() - tile.fetched_at < self.cache_duration
+    
+    async def _get_tile(self, key: Tuple[int, int]) -> WeatherTile:
+        """Cached grid node, fetched at most once concurrently (single flight)"""
+        if self._is_fresh(key):
+            self.weather_cache.move_to_end(key)
+            self.cache_stats['hits'] += 1
+            return self.weather_cache[key]
+        
+        future = self._inflight.get(key)
+        if future is None:
+            self.cache_stats['misses'] += 1
+            future = self._inflight[key] = asyncio.ensure_future(self._load_tile(key))
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.cache_stats['coalesced'] += 1
+        return await asyncio.shield(future)
+    
+    async def _load_tile(self, key: Tuple[int, int]) -> WeatherTile:
+        """Fetch a node's weather series upstream and cache it"""
+        latitude, longitude = self._node_position(key)
+        series = None
+        
+        # Fetch from multiple sources for redundancy
+        if self.api_keys['openweather']:
+            series = await self._fetch_openweather_series(latitude, longitude)
+        
+        if not series and self.api_keys['weather_api']:
+            current = await self._fetch_weather_api_data(latitude, longitude)
+            series = [current] if current else None
+        
+        if not series:
+            # Fallback to mock data for development
+            series = [self._generate_mock_weather_data(latitude, longitude)]
+        
+        now = self.clock()
+        tile = WeatherTile.from_series(key, series, now)
+        self.weather_cache[key] = tile
+        self.weather_cache.move_to_end(key)
+        
+        # Evict expired nodes, then least recently used beyond the size bound
+        expired = [k for k, cached in self.weather_cache.items() if now - cached.fetched_at >= self.cache_duration]
+        for k in expired:
+            del self.weather_cache[k]
+        while len(self.weather_cache) > self.max_cached_tiles:
+            self.weather_cache.popitem(last=False)
+            self.cache_stats['evicted'] += 1
+        self.cache_stats['evicted'] += len(expired)
+        return tile
+    
+    async def prefetch_route(self, waypoints: Iterable[Any], max_concurrency: int = 8) -> int:
+        """Load the grid nodes around every waypoint of a planned route; returns nodes fetched"""
+        keys = set()
+        for waypoint in waypoints:
+            if isinstance(waypoint, dict):
+                latitude, longitude = waypoint['lat'], waypoint.get('lng', waypoint.get('lon'))
+            else:
+                latitude, longitude = waypoint[0], waypoint[1]
+            row, col = math.floor(latitude / self.grid_deg), math.floor(longitude / self.grid_deg)
+            keys.update(((row, col), (row + 1, col), (row, col + 1), (row + 1, col + 1)))
+        
+        missing = [key for key in sorted(keys) if not self._is_fresh(key)][:self.max_cached_tiles]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def load(key):
+            async with semaphore:
+                await self._get_tile(key)
+        
+        await asyncio.gather(*(load(key) for key in missing))
+        self.cache_stats['prefetched_tiles'] += len(missing)
+        return len(missing)
+    
+    def schedule_prefetch(self, waypoints: Iterable[Any]) -> Optional[asyncio.Task]:
+        """Prefetch a planned route's weather in the background"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        task = loop.create_task(self.prefetch_route(list(waypoints)))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+        return task
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Weather grid cache counters"""
+        return {**self.cache_stats, 'cached_tiles': len(self.weather_cache), 'inflight': len(self._inflight)}
+    
     def _assess_flight_safety(self, weather_data: WeatherData) -> Tuple[FlightSafety, List[str]]:
         """Assess flight safety based on weather conditions"""
         safety_reasons = []
@@ -233,49 +447,73 @@ class WeatherService:
     async def _fetch_openweather_data(self, latitude: float, longitude: float) -> Optional[WeatherData]:
         """Fetch weather data from OpenWeather API"""
         try:
-            url = "http://api.openweathermap.org/data/2.5/weather"
-            params = {
-                'lat': latitude,
-                'lon': longitude,
-                'appid': self.api_keys['openweather'],
-                'units': 'metric'
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Parse OpenWeather data
-                        weather_data = WeatherData(
-                            latitude=latitude,
-                            longitude=longitude,
-                            timestamp=datetime.now(),
-                            temperature_celsius=data['main']['temp'],
-                            humidity_percent=data['main']['humidity'],
-                            pressure_hpa=data['main']['pressure'],
-                            visibility_km=data.get('visibility', 10000) / 1000,
-                            cloud_cover_percent=data['clouds']['all'],
-                            wind_speed_ms=data['wind']['speed'],
-                            wind_direction_degrees=data['wind'].get('deg', 0),
-                            wind_gusts_ms=data['wind'].get('gust', 0),
-                            precipitation_mm=data.get('rain', {}).get('1h', 0),
-                            precipitation_probability=0,  # Not provided in current weather
-                            condition=self._map_weather_condition(data['weather'][0]['main']),
-                            description=data['weather'][0]['description'],
-                            flight_safety=FlightSafety.SAFE,  # Will be calculated later
-                            safety_reasons=[]
-                        )
-                        
-                        return weather_data
-                    else:
-                        logger.warning(f"OpenWeather API returned status {response.status}")
-                        return None
+            async with _client_session() as session:
+                data = await self._openweather_get(session, "weather", latitude, longitude)
+            return self._parse_openweather(data, latitude, longitude, datetime.now()) if data else None
                         
         except Exception as e:
             logger.error(f"Error fetching OpenWeather data: {e}")
             return None
     
+    async def _fetch_openweather_series(self, latitude: float, longitude: float) -> Optional[List[WeatherData]]:
+        """Current conditions plus the 3-hourly forecast from OpenWeather"""
+        try:
+            async with _client_session() as session:
+                current, forecast = await asyncio.gather(
+                    self._openweather_get(session, "weather", latitude, longitude),
+                    self._openweather_get(session, "forecast", latitude, longitude)
+                )
+            
+            series = []
+            if current:
+                series.append(self._parse_openweather(current, latitude, longitude, datetime.now()))
+            for item in (forecast or {}).get('list', []):
+                series.append(self._parse_openweather(item, latitude, longitude, datetime.fromtimestamp(item['dt'])))
+            return series or None
+            
+        except Exception as e:
+            logger.error(f"Error fetching OpenWeather data: {e}")
+            return None
+    
+    async def _openweather_get(self, session: "aiohttp.ClientSession", endpoint: str,
+                               latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        params = {
+            'lat': latitude,
+            'lon': longitude,
+            'appid': self.api_keys['openweather'],
+            'units': 'metric'
+        }
+        self.cache_stats['upstream_calls'] += 1
+        async with session.get(f"{self.openweather_url}/{endpoint}", params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            logger.warning(f"OpenWeather API returned status {response.status}")
+            return None
+    
+    def _parse_openweather(self, data: Dict[str, Any], latitude: float, longitude: float,
+                           timestamp: datetime) -> WeatherData:
+        """Parse an OpenWeather current-weather or forecast entry"""
+        rain = data.get('rain', {})
+        return WeatherData(
+            latitude=latitude,
+            longitude=longitude,
+            timestamp=timestamp,
+            temperature_celsius=data['main']['temp'],
+            humidity_percent=data['main']['humidity'],
+            pressure_hpa=data['main']['pressure'],
+            visibility_km=data.get('visibility', 10000) / 1000,
+            cloud_cover_percent=data['clouds']['all'],
+            wind_speed_ms=data['wind']['speed'],
+            wind_direction_degrees=data['wind'].get('deg', 0),
+            wind_gusts_ms=data['wind'].get('gust', 0),
+            precipitation_mm=rain.get('1h', rain.get('3h', 0) / 3),
+            precipitation_probability=data.get('pop', 0) * 100,  # Forecast entries only
+            condition=self._map_weather_condition(data['weather'][0]['main']),
+            description=data['weather'][0]['description'],
+            flight_safety=FlightSafety.SAFE,  # Will be calculated later
+            safety_reasons=[]
+        )
+    
     async def _fetch_weather_api_data(self, latitude: float, longitude: float) -> Optional[WeatherData]:
         """Fetch weather data from WeatherAPI.com"""
         try:
@@ -286,7 +524,8 @@ class WeatherService:
                 'aqi': 'no'
             }
             
-            async with aiohttp.ClientSession() as session:
+            self.cache_stats['upstream_calls'] += 1
+            async with _client_session() as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
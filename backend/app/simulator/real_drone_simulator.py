@@ -18,6 +18,9 @@ import random
 
 logger = logging.getLogger(__name__)
 
+MAX_RIGID_BODY_DT = 0.05  # longer steps are flown as a point mass along the waypoints
+CRUISE_SPEED_FRACTION = 0.6  # of max_speed, for point-mass steps
+
 class DroneState(Enum):
     """Drone operational states"""
     IDLE = "idle"
@@ -348,8 +351,8 @@ class RealDroneSimulator:
         
         return R_z @ R_y @ R_x
     
-    def _update_battery_consumption(self, forces: np.ndarray, moments: np.ndarray):
-        """Update battery consumption based on power requirements"""
+    def _update_battery_consumption(self, forces: np.ndarray, moments: np.ndarray, dt: Optional[float] = None):
+        """Update battery consumption based on power requirements over dt (default self.dt)"""
         # Calculate power required for thrust
         thrust_power = abs(forces[2]) * math.sqrt(forces[0]**2 + forces[1]**2 + forces[2]**2) / self.physics.motor_efficiency
         
@@ -363,14 +366,17 @@ class RealDroneSimulator:
         self.current_draw = total_power / self.battery_voltage
         
         # Update battery level
-        energy_consumed = total_power * self.dt / 3600  # Wh
+        if dt is None:
+            dt = self.dt
+        energy_consumed = total_power * dt / 3600  # Wh
+        self.total_energy_consumed += energy_consumed
         self.battery_level -= (energy_consumed / self.physics.battery_capacity) * 100
         
         # Update battery voltage (simplified model)
         self.battery_voltage = self.physics.battery_voltage * (self.battery_level / 100) * 0.8 + self.physics.battery_voltage * 0.2
         
         # Update temperature
-        self.temperature += (total_power * 0.001) * self.dt
+        self.temperature += (total_power * 0.001) * dt
         
         # Update motor RPM
         for i in range(self.physics.rotor_count):
@@ -468,17 +474,109 @@ class RealDroneSimulator:
         
         return telemetry
     
+    def reset(self):
+        """Return to the initial landed state at the origin with a full battery"""
+        self.position = DronePosition(0, 0, 0, 0, 0, 0)
+        self.velocity = DroneVelocity(0, 0, 0, 0, 0, 0)
+        self.battery_level = 100.0
+        self.battery_voltage = self.physics.battery_voltage
+        self.current_draw = 0.0
+        self.motor_rpm = [0.0] * self.physics.rotor_count
+        self.temperature = 25.0
+        self.signal_strength = 100.0
+        self.state = DroneState.IDLE
+        self.flight_time = 0.0
+        self.distance_traveled = 0.0
+        self.target_position = DronePosition(0, 0, 0, 0, 0, 0)
+        self.target_velocity = DroneVelocity(0, 0, 0, 0, 0, 0)
+    
+    def cruise_step(self, waypoints: List[Tuple[float, float, float]], current_waypoint: int,
+                    dt: float) -> Tuple[DroneTelemetry, int]:
+        """Fly dt seconds along the waypoints as a point mass; returns telemetry and the next waypoint
+
+        For steps too long to integrate the rigid-body model: the drone holds
+        CRUISE_SPEED_FRACTION of max_speed through the air, the wind adds to
+        its ground speed along the leg, and the battery is charged once for
+        the thrust that balances weight and drag at that airspeed.
+        """
+        airspeed = self.physics.max_speed * CRUISE_SPEED_FRACTION
+        wind_x = self.environment.wind_speed * math.cos(self.environment.wind_direction)
+        wind_y = self.environment.wind_speed * math.sin(self.environment.wind_direction)
+        remaining_time = dt
+        heading_x, heading_y = 0.0, 0.0
+        moved = 0.0
+        while remaining_time > 0 and current_waypoint < len(waypoints):
+            target_x, target_y, target_z = waypoints[current_waypoint]
+            dx, dy, dz = target_x - self.position.x, target_y - self.position.y, target_z - self.position.z
+            distance = math.sqrt(dx**2 + dy**2 + dz**2)
+            if distance < 1e-9:
+                current_waypoint += 1
+                continue
+            heading_x, heading_y = dx / distance, dy / distance
+            ground_speed = max(airspeed + wind_x * heading_x + wind_y * heading_y, 0.1 * airspeed)
+            leg_time = distance / ground_speed
+            if leg_time <= remaining_time:
+                # Reach the waypoint and carry on to the next one
+                self.position.x, self.position.y, self.position.z = target_x, target_y, target_z
+                moved += distance
+                remaining_time -= leg_time
+                current_waypoint += 1
+            else:
+                fraction = remaining_time / leg_time
+                self.position.x += dx * fraction
+                self.position.y += dy * fraction
+                self.position.z += dz * fraction
+                moved += distance * fraction
+                remaining_time = 0.0
+        flown = dt - remaining_time
+        if flown <= 0:
+            return self.get_telemetry(), current_waypoint
+
+        ground_speed = moved / flown
+        self.velocity = DroneVelocity(ground_speed * heading_x, ground_speed * heading_y, 0, 0, 0, 0)
+        self.position.yaw = math.atan2(heading_y, heading_x)
+        air_x, air_y = self.velocity.vx - wind_x, self.velocity.vy - wind_y
+        drag = 0.5 * self.air_density * (air_x**2 + air_y**2) * self.physics.drag_coefficient * self.physics.frontal_area
+        self.throttle = min(1.0, math.hypot(drag, self.physics.mass * self.gravity) / self.physics.max_thrust)
+        self._update_battery_consumption(np.array([drag, 0.0, self.physics.mass * self.gravity]), np.zeros(3), flown)
+
+        self.flight_time += flown
+        self.total_flight_time += flown
+        self.distance_traveled += moved
+        self.total_distance += moved
+        distance_from_base = math.sqrt(self.position.x**2 + self.position.y**2)
+        self.signal_strength = max(10, 100 - (distance_from_base / 1000) * 50)
+        self.gps_accuracy = 2.0 + (self.environment.visibility / 10000) * 3.0
+        self.state = DroneState.SEARCHING
+        return self.get_telemetry(), current_waypoint
+
     async def simulate_mission(self, waypoints: List[Tuple[float, float, float]], 
-                             duration: float = 3600) -> List[DroneTelemetry]:
-        """Simulate a complete mission with waypoints"""
+                             duration: float = 3600,
+                             max_steps: Optional[int] = None,
+                             yield_every: int = 100) -> List[DroneTelemetry]:
+        """Simulate a complete mission with waypoints
+        
+        ``duration`` is simulated flight time in seconds. With ``max_steps``
+        the step is lengthened to ``duration / max_steps`` when needed, so the
+        whole mission is always simulated; steps longer than
+        MAX_RIGID_BODY_DT are flown with cruise_step. The event loop is
+        yielded to every ``yield_every`` steps.
+        """
         telemetry_log = []
         current_waypoint = 0
         
-        start_time = time.time()
-        
-        while time.time() - start_time < duration and current_waypoint < len(waypoints):
-            # Set target position
-            if current_waypoint < len(waypoints):
+        dt = self.dt
+        if max_steps:
+            dt = max(dt, duration / max_steps)
+        end_time = self.flight_time + duration
+        steps = 0
+        
+        while self.flight_time < end_time - 1e-9 and current_waypoint < len(waypoints):
+            step = min(dt, end_time - self.flight_time)
+            if step > MAX_RIGID_BODY_DT:
+                telemetry, current_waypoint = self.cruise_step(waypoints, current_waypoint, step)
+            else:
+                # Set target position
                 target_x, target_y, target_z = waypoints[current_waypoint]
                 self.set_target_position(target_x, target_y, target_z)
                 
@@ -491,10 +589,11 @@ class RealDroneSimulator:
                 
                 if distance_to_target < 5.0:  # 5 meter tolerance
                     current_waypoint += 1
-            
-            # Simulate step
-            telemetry = await self.simulate_step()
+                
+                # Simulate step
+                telemetry = await self.simulate_step(step)
             telemetry_log.append(telemetry)
+            steps += 1
             
             # Check for emergency conditions
             if self.battery_level < 15:
@@ -505,8 +604,9 @@ class RealDroneSimulator:
                 self.state = DroneState.EMERGENCY
                 break
             
-            # Small delay to prevent overwhelming the system
-            await asyncio.sleep(0.001)
+            # Let other tasks run without sleeping on every step
+            if steps % yield_every == 0:
+                await asyncio.sleep(0)
         
         return telemetry_log
     
@@ -13,6 +13,10 @@ from datetime import datetime
 import json
 import logging
 
+from ..services.coverage_grid import CoverageGrid, polygon_from_search_area
+from ..services.map_tiles import simplify_for_zoom
+from ..services.mission_export import export_chunks, records_source
+
 logger = logging.getLogger(__name__)
 
 class SARMappingUtils:
@@ -21,6 +25,7 @@ class SARMappingUtils:
     def __init__(self):
         self.default_center = [47.3769, 8.5417]  # Zurich, Switzerland
         self.default_zoom = 10
+        self.track_detail_zoom = 16  # figure tracks keep the points that show at this zoom
         
     def create_mission_map(self, 
                           mission_data: Dict[str, Any],
@@ -184,6 +189,12 @@ class SARMappingUtils:
                 lats = [point['lat'] for point in track_data]
                 lons = [point['lng'] for point in track_data]
                 
+                # Only the points that still show at street zoom; the tile
+                # endpoints serve full detail for what is on screen
+                keep = simplify_for_zoom(lats, lons, self.track_detail_zoom)
+                lats = np.asarray(lats)[keep].tolist()
+                lons = np.asarray(lons)[keep].tolist()
+                
                 # Add track line
                 fig.add_trace(go.Scattermapbox(
                     lat=lats,
@@ -323,79 +334,37 @@ class SARMappingUtils:
     
     def calculate_search_coverage(self, 
                                  search_area: List[Dict[str, float]],
-                                 drone_tracks: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
-        """Calculate search coverage metrics"""
+                                 drone_tracks: Dict[str, List[Dict[str, Any]]],
+                                 swath_width_m: float = 100.0,
+                                 resolution_m: float = 2.0) -> Dict[str, Any]:
+        """Calculate search coverage metrics by rasterizing the tracks' swaths over the area"""
         
         try:
-            # Calculate total search area
-            total_area = self._calculate_polygon_area(search_area)
+            grid = CoverageGrid(polygon_from_search_area(search_area), resolution_m)
             
-            # Calculate covered area by drone tracks
-            covered_area = 0
+            # Overlapping passes and tracks are only counted once
             for drone_id, track in drone_tracks.items():
-                drone_covered = self._calculate_track_coverage(track)
-                covered_area += drone_covered
+                if track:
+                    grid.stamp_track([point['lat'] for point in track],
+                                     [point['lng'] for point in track], swath_width_m / 2)
             
-            # Calculate coverage percentage
-            coverage_percentage = (covered_area / total_area * 100) if total_area > 0 else 0
+            total_area = grid.area_cells * grid.cell_area_m2 / 1e6
+            covered_area = grid.covered_cells * grid.cell_area_m2 / 1e6
+            coverage_percentage = grid.coverage_percent
             
             return {
                 "total_area_km2": total_area,
                 "covered_area_km2": covered_area,
                 "coverage_percentage": coverage_percentage,
                 "remaining_area_km2": total_area - covered_area,
-                "efficiency_score": min(coverage_percentage, 100)
+                "efficiency_score": min(coverage_percentage, 100),
+                "gaps": grid.find_gaps(limit=10)
             }
             
         except Exception as e:
             logger.error(f"Failed to calculate search coverage: {e}")
             return {"error": str(e)}
     
-    def _calculate_polygon_area(self, coordinates: List[Dict[str, float]]) -> float:
-        """Calculate polygon area using shoelace formula"""
-        
-        if len(coordinates) < 3:
-            return 0.0
-        
-        # Convert to numpy array
-        coords = np.array([[coord['lat'], coord['lng']] for coord in coordinates])
-        
-        # Shoelace formula
-        x = coords[:, 1]  # longitude
-        y = coords[:, 0]  # latitude
-        
-        area = 0.5 * abs(sum(x[i] * y[i + 1] - x[i + 1] * y[i] for i in range(-1, len(x) - 1)))
-        
-        # Convert to km² (rough approximation)
-        area_km2 = area * (111 * 111)  # 1 degree ≈ 111 km
-        
-        return area_km2
-    
-    def _calculate_track_coverage(self, track: List[Dict[str, Any]]) -> float:
-        """Calculate area covered by drone track"""
-        
-        if len(track) < 2:
-            return 0.0
-        
-        # Assume drone has a search swath width of 100m
-        swath_width = 0.1  # km
-        
-        total_distance = 0
-        for i in range(len(track) - 1):
-            point1 = track[i]
-            point2 = track[i + 1]
-            
-            distance = self._calculate_distance(
-                point1['lat'], point1['lng'],
-                point2['lat'], point2['lng']
-            )
-            total_distance += distance
-        
-        # Calculate covered area
-        covered_area = total_distance * swath_width / 1000  # Convert to km²
-        
-        return covered_area
-    
     def _calculate_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
         """Calculate distance between two points in km"""
         
@@ -418,101 +387,24 @@ class SARMappingUtils:
                            mission_data: Dict[str, Any],
                            telemetry_data: List[Dict[str, Any]],
                            discoveries: List[Dict[str, Any]] = None,
-                           format: str = "geojson") -> str:
-        """Export mission data in various formats"""
+                           format: str = "geojson",
+                           tolerance_m: float = 0.0) -> str:
+        """Export mission data in various formats
+
+        Built by the streaming encoders in services/mission_export.py; use
+        stream_export there with database_source to export without loading
+        the telemetry first.
+        """
         
         try:
-            if format == "geojson":
-                return self._export_as_geojson(mission_data, telemetry_data, discoveries)
-            elif format == "csv":
-                return self._export_as_csv(telemetry_data, discoveries)
-            else:
+            if format not in ("geojson", "csv"):
                 raise ValueError(f"Unsupported format: {format}")
+            source = records_source(mission_data, telemetry_data, discoveries)
+            return b"".join(export_chunks(source, format, tolerance_m)).decode()
                 
         except Exception as e:
             logger.error(f"Failed to export mission data: {e}")
             return json.dumps({"error": str(e)})
-    
-    def _export_as_geojson(self, 
-                          mission_data: Dict[str, Any],
-                          telemetry_data: List[Dict[str, Any]],
-                          discoveries: List[Dict[str, Any]] = None) -> str:
-        """Export mission data as GeoJSON"""
-        
-        geojson = {
-            "type": "FeatureCollection",
-            "features": []
-        }
-        
-        # Add mission center
-        if mission_data.get('center_lat') and mission_data.get('center_lng'):
-            geojson["features"].append({
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [mission_data['center_lng'], mission_data['center_lat']]
-                },
-                "properties": {
-                    "type": "mission_center",
-                    "name": mission_data.get('name', 'Unknown'),
-                    "description": f"Mission center for {mission_data.get('name', 'Unknown')}"
-                }
-            })
-        
-        # Add drone tracks
-        drone_tracks = self._group_telemetry_by_drone(telemetry_data)
-        for drone_id, track in drone_tracks.items():
-            coordinates = [[point['lng'], point['lat']] for point in track]
-            
-            geojson["features"].append({
-                "type": "Feature",
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": coordinates
-                },
-                "properties": {
-                    "type": "drone_track",
-                    "drone_id": drone_id,
-                    "description": f"Flight track for drone {drone_id}"
-                }
-            })
-        
-        # Add discoveries
-        if discoveries:
-            for discovery in discoveries:
-                geojson["features"].append({
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [discovery['position']['lng'], discovery['position']['lat']]
-                    },
-                    "properties": {
-                        "type": "discovery",
-                        "discovery_type": discovery.get('discovery_type', 'Unknown'),
-                        "confidence": discovery.get('confidence', 0),
-                        "priority": discovery.get('priority', 'Unknown'),
-                        "description": f"Discovery of {discovery.get('discovery_type', 'Unknown')}"
-                    }
-                })
-        
-        return json.dumps(geojson, indent=2)
-    
-    def _export_as_csv(self, 
-                      telemetry_data: List[Dict[str, Any]],
-                      discoveries: List[Dict[str, Any]] = None) -> str:
-        """Export mission data as CSV"""
-        
-        # Export telemetry data
-        telemetry_df = pd.DataFrame(telemetry_data)
-        telemetry_csv = telemetry_df.to_csv(index=False)
-        
-        # Export discoveries data
-        discoveries_csv = ""
-        if discoveries:
-            discoveries_df = pd.DataFrame(discoveries)
-            discoveries_csv = discoveries_df.to_csv(index=False)
-        
-        return f"=== TELEMETRY DATA ===\n{telemetry_csv}\n\n=== DISCOVERIES DATA ===\n{discoveries_csv}"
 
 # Global mapping utilities instance
 mapping_utils = SARMappingUtils()
@@ -0,0 +1,5 @@
+"""
+Standalone performance benchmarks for SAR backend subsystems.
+
+Run from the backend directory, e.g. ``python -m benchmarks.bench_rag_retrieval``.
+"""
@@ -0,0 +1,99 @@
+"""
+Batch inference benchmark: mission-outcome predictions/sec by batch size.
+
+Trains (or loads) the RealMLModels bundle into a temporary registry and
+issues concurrent predict_mission_outcome calls. The micro-batcher's batch
+size cap is swept from 1 to 1,024; each batch is one StandardScaler
+transform plus one predict_proba and one predict call per model. The
+single-row row is the previous path: a per-request feature vector and
+two single-row model calls, awaited one request at a time.
+
+    python -m benchmarks.bench_batch_inference --requests 2048
+"""
+import argparse
+import asyncio
+import logging
+import random
+import shutil
+import tempfile
+import time
+import warnings
+from dataclasses import asdict
+
+import numpy as np
+
+from app.ai.model_registry import ModelRegistry
+from app.ai.real_ml_models import (
+    MissionFeatures,
+    RealMLModels,
+    build_feature_vector,
+)
+
+
+def random_missions(count, rng):
+    return [
+        MissionFeatures(
+            mission_type=rng.choice(["search", "rescue", "recovery", "reconnaissance", "delivery"]),
+            terrain_type=rng.choice(["mountain", "forest", "urban", "water", "desert", "plains"]),
+            weather_condition=rng.choice(["clear", "cloudy", "rainy", "stormy", "foggy", "windy"]),
+            area_size=rng.uniform(2, 200), duration_hours=rng.uniform(1, 16), num_drones=rng.randint(1, 10),
+            target_urgency=rng.randint(1, 5), time_of_day=rng.randint(0, 23), season=rng.randint(0, 3),
+            wind_speed=rng.uniform(0, 50), visibility=rng.uniform(0.1, 50), temperature=rng.uniform(-20, 40),
+            humidity=rng.uniform(20, 100), battery_reserve=rng.uniform(20, 100),
+            communication_range=rng.uniform(1, 50), search_density=rng.choice(["low", "medium", "high"]),
+            search_pattern=rng.choice(["grid", "spiral", "sector", "lawnmower"]),
+            altitude=rng.randint(30, 150), speed=rng.uniform(2, 15),
+        )
+        for _ in range(count)
+    ]
+
+
+def single_row(models, features):
+    """The previous per-request path."""
+    row = asdict(features)
+    outcome = models.models['mission_outcome'].predict_proba(
+        models.scalers['mission_outcome'].transform(np.array([build_feature_vector(row, 'mission_outcome')]))
+    )[0]
+    duration = models.models['duration_prediction'].predict(
+        models.scalers['duration_prediction'].transform(np.array([build_feature_vector(row, 'duration_prediction')]))
+    )[0]
+    return outcome, duration
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    root = tempfile.mkdtemp(prefix="model_registry_")
+    try:
+        models = RealMLModels(registry=ModelRegistry(root))
+        await models.initialize()
+        missions = random_missions(args.requests, random.Random(0))
+
+        count = min(args.requests, args.single_row_requests)
+        start = time.perf_counter()
+        for features in missions[:count]:
+            single_row(models, features)
+        elapsed = time.perf_counter() - start
+        print(f"{'single-row':>12}: {count / elapsed:10,.0f} predictions/s")
+
+        batch_size = 1
+        while batch_size <= args.max_batch:
+            count = min(args.requests, max(args.single_row_requests, 4 * batch_size))
+            models._outcome_batcher.max_batch_size = batch_size
+            await models.predict_mission_outcomes(missions[:batch_size])  # warm up
+            start = time.perf_counter()
+            await models.predict_mission_outcomes(missions[:count])
+            elapsed = time.perf_counter() - start
+            print(f"{f'batch {batch_size}':>12}: {count / elapsed:10,.0f} predictions/s "
+                  f"({elapsed / count * 1e6:8.1f} us each over {count} requests)")
+            batch_size *= 2
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=4096)
+    parser.add_argument("--single-row-requests", type=int, default=256)
+    parser.add_argument("--max-batch", type=int, default=1024)
+    asyncio.run(main(parser.parse_args()))
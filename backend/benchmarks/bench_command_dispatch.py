@@ -0,0 +1,157 @@
+"""
+Command dispatch benchmark: commands/sec and enqueue-to-send latency for a 500-drone fleet.
+
+Each send waits --link-ms to simulate the radio link. "steady" offers
+--offered routine commands/s across the fleet for --seconds, with a
+RETURN_HOME (priority 3) burst to every drone halfway through; latencies
+are enqueue to send, and "unsent" is what was still queued --grace seconds
+after the offered load ended. "burst" queues --burst commands up front and
+reports the drain rate. "previous" is DroneManager's old queue: one global
+list re-sorted on every enqueue, one command popped every 100 ms.
+"dispatcher" is CommandDispatcher at the configured rate cap; "uncapped"
+is the same without the cap.
+
+    python -m benchmarks.bench_command_dispatch --drones 500 --offered 150 --seconds 6
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import numpy as np
+
+from app.services.command_dispatcher import CommandDispatcher
+from app.services.drone_manager import DroneCommand, DroneCommandType
+
+ROUTINE = [
+    DroneCommandType.UPDATE_ALTITUDE, DroneCommandType.CHANGE_HEADING,
+    DroneCommandType.START_MISSION, DroneCommandType.ENABLE_AUTONOMOUS,
+]
+
+
+class PreviousQueue:
+    """DroneManager's queue before the dispatcher"""
+
+    def __init__(self, sender):
+        self.sender = sender
+        self.command_queue = []
+        self._task = None
+
+    def submit(self, command):
+        self.command_queue.append(command)
+        self.command_queue.sort(key=lambda x: x.priority, reverse=True)
+
+    async def _run(self):
+        while True:
+            if self.command_queue:
+                await self.sender(self.command_queue.pop(0))
+            await asyncio.sleep(0.1)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def pending(self):
+        return len(self.command_queue)
+
+
+class Dispatcher(CommandDispatcher):
+    def pending(self):
+        return sum(1 for record in self.records.values() if record.state == "queued")
+
+
+class Recorder:
+    def __init__(self, link_ms):
+        self.link = link_ms / 1000
+        self.enqueued = {}
+        self.routine, self.emergency = [], []
+
+    async def send(self, command):
+        latency = time.perf_counter() - self.enqueued.pop(id(command))
+        (self.emergency if command.priority >= 3 else self.routine).append(latency)
+        await asyncio.sleep(self.link)
+        return True
+
+    def submit(self, queue, command):
+        self.enqueued[id(command)] = time.perf_counter()
+        queue.submit(command)
+
+
+def build(mode, recorder, rate):
+    if mode == "previous":
+        return PreviousQueue(recorder.send)
+    return Dispatcher(recorder.send, rate_limit=0 if mode == "uncapped" else rate)
+
+
+async def steady(mode, args):
+    recorder = Recorder(args.link_ms)
+    queue = build(mode, recorder, args.rate)
+    rng = random.Random(0)
+    drones = [f"drone{i}" for i in range(args.drones)]
+    await queue.start()
+    start = time.perf_counter()
+    offered, burst_done = 0, False
+    while (elapsed := time.perf_counter() - start) < args.seconds:
+        while offered < elapsed * args.offered:
+            recorder.submit(queue, DroneCommand(rng.choice(drones), rng.choice(ROUTINE), {"value": offered}))
+            offered += 1
+        if not burst_done and elapsed >= args.seconds / 2:
+            for drone_id in drones:
+                recorder.submit(queue, DroneCommand(drone_id, DroneCommandType.RETURN_HOME, priority=3))
+            burst_done = True
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(args.grace)
+    elapsed = time.perf_counter() - start
+    await queue.stop()
+    sent = len(recorder.routine) + len(recorder.emergency)
+    return sent / elapsed, recorder, queue.pending()
+
+
+async def burst(mode, args):
+    recorder = Recorder(args.link_ms)
+    queue = build(mode, recorder, args.rate)
+    for i in range(args.burst):
+        recorder.submit(queue, DroneCommand(f"drone{i % args.drones}", ROUTINE[(i // args.drones) % len(ROUTINE)],
+                                            {"value": i}))
+    await queue.start()
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    while queue.pending() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    await queue.stop()
+    return len(recorder.routine) / elapsed, queue.pending()
+
+
+def p(samples, q):
+    return f"{np.percentile(samples, q) * 1000:9.1f}" if samples else "      n/a"
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    print(f"steady: {args.drones} drones, {args.offered:.0f} routine commands/s offered for {args.seconds:.0f} s, "
+          f"{args.drones} emergency RTLs halfway, link {args.link_ms:.0f} ms, rate cap {args.rate:.0f}/s")
+    for mode in ("previous", "dispatcher", "uncapped"):
+        rate, recorder, unsent = await steady(mode, args)
+        print(f"{mode:>10}: {rate:8,.1f} cmds/s sent, routine p50/p99 {p(recorder.routine, 50)} /"
+              f"{p(recorder.routine, 99)} ms, emergency p99 {p(recorder.emergency, 99)} ms, {unsent:,} unsent")
+    print(f"burst: {args.burst:,} commands queued up front")
+    for mode in ("previous", "dispatcher", "uncapped"):
+        rate, unsent = await burst(mode, args)
+        print(f"{mode:>10}: {rate:8,.1f} cmds/s drained, {unsent:,} still queued")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drones", type=int, default=500)
+    parser.add_argument("--offered", type=float, default=150.0)
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--grace", type=float, default=2.0)
+    parser.add_argument("--burst", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=200.0)
+    parser.add_argument("--link-ms", type=float, default=20.0)
+    asyncio.run(main(parser.parse_args()))
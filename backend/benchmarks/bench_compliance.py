@@ -0,0 +1,135 @@
+"""
+Compliance benchmark: checks/sec for a drone fleet against 50k geofences.
+
+Synthetic no-fly polygons (200-800 m across) are scattered over the
+continental US and a fleet reports positions there. The per-drone loop is
+the previous check_compliance path (linear jurisdiction scan, one awaited
+check per rule, unbounded history list) plus a linear bounding-box and
+ray-casting scan over the geofences; it runs on a sample of drones and is
+reported as a rate. The batch path indexes the geofences once and checks
+the whole fleet per call. Auto-enforcement is switched off on the rules so
+the simulated 100 ms enforcement commands do not dominate either path.
+
+    python -m benchmarks.bench_compliance --drones 1000 --fences 50000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from app.services.airspace import Geofence
+from app.services.regulatory_compliance import (
+    ComplianceRuleType,
+    RegulatoryComplianceService,
+)
+
+
+def synthetic_fences(count, rng):
+    fences = []
+    for k in range(count):
+        lat, lng = rng.uniform([25.0, -124.0], [49.0, -67.0])
+        angles = np.sort(rng.uniform(0, 2 * np.pi, rng.integers(5, 13)))
+        radius = rng.uniform(0.001, 0.004, len(angles))
+        polygon = list(zip(lat + radius * np.sin(angles), lng + radius * np.cos(angles)))
+        fences.append(Geofence(f"nfz_{k}", f"zone {k}", polygon, ceiling_m=150.0))
+    return fences
+
+
+def point_in_polygon(lat, lng, polygon):
+    inside = False
+    for (y1, x1), (y2, x2) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (y1 > lat) != (y2 > lat) and lng < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+async def per_drone_loop(service, fences, fence_bounds, drone_ids, locations, telemetry, history):
+    """The previous per-drone path with a linear geofence scan."""
+    detector = service.jurisdiction_detector
+    checks = 0
+    for i, drone_id in enumerate(drone_ids):
+        lat, lng, alt = locations[i]
+        params = {name: float(values[i]) for name, values in telemetry.items()}
+        jurisdiction = None
+        for candidate, boundary in detector.jurisdiction_boundaries.items():
+            b = boundary['bounds']
+            if b['south'] <= lat <= b['north'] and b['west'] <= lng <= b['east']:
+                jurisdiction = candidate
+                break
+        for rule in service.compliance_rules.values():
+            if rule.jurisdiction != jurisdiction:
+                continue
+            await asyncio.sleep(0)  # one awaited rule check
+            if rule.rule_type == ComplianceRuleType.ALTITUDE_LIMIT:
+                ok = alt * 3.28084 <= rule.parameters.get('max_altitude_ft', 400)
+            elif rule.rule_type == ComplianceRuleType.SPEED_LIMIT:
+                ok = params['speed_mph'] <= rule.parameters.get('max_speed_mph', 100)
+            else:
+                ok = True
+            history.append((rule.rule_id, drone_id, ok))
+            checks += 1
+        inside = None
+        for k, (south, west, north, east) in enumerate(fence_bounds):
+            if south <= lat <= north and west <= lng <= east and point_in_polygon(lat, lng, fences[k].polygon):
+                inside = k
+                break
+        history.append(("airspace_no_fly_zone", drone_id, inside is None))
+        checks += 1
+    return checks
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    rng = np.random.default_rng(0)
+    fences = synthetic_fences(args.fences, rng)
+    drone_ids = [f"drone_{i:04d}" for i in range(args.drones)]
+    locations = np.column_stack([
+        rng.uniform(25.0, 49.0, args.drones), rng.uniform(-124.0, -67.0, args.drones),
+        rng.uniform(30.0, 140.0, args.drones),
+    ])
+    # Put a few drones inside geofences
+    for i, fence in zip(range(0, args.drones, 50), fences):
+        locations[i, :2] = np.mean(fence.polygon, axis=0)
+    telemetry = {
+        'speed_mph': rng.uniform(5.0, 40.0, args.drones),
+        'flight_time_minutes': rng.uniform(0.0, 25.0, args.drones),
+        'wind_speed_mph': np.full(args.drones, 8.0),
+    }
+
+    service = RegulatoryComplianceService()
+    for rule in service.compliance_rules.values():
+        rule.auto_enforcement = False
+
+    start = time.perf_counter()
+    service.load_geofences(fences)
+    print(f"indexed {args.fences} geofences in {time.perf_counter() - start:.2f}s")
+
+    fence_bounds = [(min(p[0] for p in f.polygon), min(p[1] for p in f.polygon),
+                     max(p[0] for p in f.polygon), max(p[1] for p in f.polygon)) for f in fences]
+    sample = min(args.sample, args.drones)
+    start = time.perf_counter()
+    checks = await per_drone_loop(service, fences, fence_bounds, drone_ids[:sample], locations[:sample],
+                                  telemetry, [])
+    elapsed = time.perf_counter() - start
+    print(f"{'per-drone loop':>16}: {checks / elapsed:12,.0f} checks/s  {sample / elapsed:10,.0f} drones/s "
+          f"(sampled {sample} drones, {args.drones / sample * elapsed:.2f}s per fleet update)")
+
+    await service.check_compliance_batch("warmup", drone_ids, locations, telemetry)
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        result = await service.check_compliance_batch("bench", drone_ids, locations, telemetry)
+    elapsed = (time.perf_counter() - start) / args.repeats
+    print(f"{'batch':>16}: {result.total_checks / elapsed:12,.0f} checks/s  {args.drones / elapsed:10,.0f} drones/s "
+          f"({elapsed * 1000:.1f} ms per fleet update, {result.non_compliant_checks} violations)")
+    print(f"{'':>16}  history rows retained: {len(service.compliance_history)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drones", type=int, default=1000)
+    parser.add_argument("--fences", type=int, default=50000)
+    parser.add_argument("--sample", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,95 @@
+"""
+DEM tile store sampling benchmark: 1M points over a ~10 GB synthetic tile set.
+
+Writes a synthetic float32 elevation raster as 1024x1024 memory-mappable
+tiles (elevation band only, no overviews), then samples random points
+across the whole raster and clustered points inside one ~50 km
+region, cold (fresh store, nothing mapped) and warm (tiles in the LRU).
+The baseline reads every touched tile fully with np.load per query batch.
+
+    python -m benchmarks.bench_dem_sampling --size-gb 10 --points 1000000
+"""
+import argparse
+import math
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.dem_tile_store import DEMTileStore
+
+TILE = 1024
+
+
+def build(root: str, size_gb: float) -> DEMTileStore:
+    tiles_per_side = max(1, int(math.sqrt(size_gb * 1e9 / (TILE * TILE * 4))))
+    pixels = tiles_per_side * TILE
+    store = DEMTileStore.create(root, 40.0, -110.0, 1 / 3600, pixels, pixels, TILE)
+    y, x = np.mgrid[0:TILE, 0:TILE].astype(np.float32)
+    base = 50.0 * np.sin(x / 97.0) * np.cos(y / 131.0)
+    for ty in range(tiles_per_side):
+        for tx in range(tiles_per_side):
+            store.write_tile("elevation", ty, tx, base + (ty * tiles_per_side + tx) % 3000)
+    return store
+
+
+def baseline_sample(store: DEMTileStore, lats, lngs):
+    """Read each touched tile completely into memory, then index it."""
+    info = store.manifest.levels[0]
+    rows = np.floor((store.manifest.origin_lat - lats) / info.cell_size_deg).astype(np.int64)
+    cols = np.floor((lngs - store.manifest.origin_lng) / info.cell_size_deg).astype(np.int64)
+    out = np.empty(len(lats), dtype=np.float32)
+    tile_ids = (rows // TILE) * info.tiles_x + cols // TILE
+    for tile_id in np.unique(tile_ids):
+        members = np.flatnonzero(tile_ids == tile_id)
+        ty, tx = divmod(int(tile_id), info.tiles_x)
+        tile = np.load(store._tile_path(0, "elevation", ty, tx))
+        out[members] = tile[rows[members] - ty * TILE, cols[members] - tx * TILE]
+    return out
+
+
+def timed(label, fn, points):
+    start = time.perf_counter()
+    values = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>34}: {elapsed:7.3f}s  {points / elapsed / 1e6:6.2f} M points/s")
+    return values
+
+
+def main(args):
+    root = tempfile.mkdtemp(prefix="dem_bench_", dir=args.dir)
+    try:
+        start = time.perf_counter()
+        store = build(root, args.size_gb)
+        bounds = store.bounds
+        info = store.manifest.levels[0]
+        print(f"built {info.tiles_x * info.tiles_y} tiles ({info.rows}x{info.cols} px, "
+              f"{info.tiles_x * info.tiles_y * TILE * TILE * 4 / 1e9:.1f} GB) in {time.perf_counter() - start:.1f}s")
+
+        rng = np.random.default_rng(0)
+        lats = rng.uniform(bounds["south"], bounds["north"], args.points)
+        lngs = rng.uniform(bounds["west"], bounds["east"], args.points)
+        # Regional cluster: ~50 x 60 km straddling six tiles
+        c_lats = bounds["north"] - 0.05 - rng.random(args.points) * 0.45
+        c_lngs = bounds["west"] + 0.05 + rng.random(args.points) * 0.57
+
+        for name, qlats, qlngs in (("uniform", lats, lngs), ("clustered", c_lats, c_lngs)):
+            cold = DEMTileStore(root, max_open_tiles=args.open_tiles)
+            values = timed(f"{name} mmap cold", lambda: cold.sample(qlats, qlngs), args.points)
+            timed(f"{name} mmap warm", lambda: cold.sample(qlats, qlngs), args.points)
+            expected = timed(f"{name} full-tile np.load", lambda: baseline_sample(cold, qlats, qlngs), args.points)
+            assert np.array_equal(values, expected)
+            print(f"{'':>34}  {cold.get_stats()}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-gb", type=float, default=10.0)
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--open-tiles", type=int, default=256)
+    parser.add_argument("--dir", default=None, help="where to write the tiles (default: system temp)")
+    main(parser.parse_args())
@@ -0,0 +1,139 @@
+"""
+Discovery query benchmark: page latency for deep pages, viewport and radius queries over 1,000,000 discoveries.
+
+A temporary SQLite database holds --discoveries discoveries spread over a
+100 x 100 km area and 180 days, from 500 missions. "previous" is the old
+endpoint: OFFSET pages of full ORM rows converted to dicts, and for spatial
+questions the same page with plain latitude/longitude range filters, which
+no index serves. "keyset" is get_discoveries as it is now: cursor pages,
+geocell-indexed boxes and radii (a 60 km viewport holds a third of the
+table, so it pages by the time index instead), and sparse fields where
+noted. Each figure is the median of --repeats calls to the endpoint
+function.
+
+    python -m benchmarks.bench_discovery_queries --discoveries 1000000 --repeats 20
+"""
+import argparse
+import logging
+import math
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_discovery_queries_")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_DIR}/discoveries.db"
+
+from fastapi import Response  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.api.api_v1.endpoints.discoveries import get_discoveries  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.query import encode_cursor, geocells  # noqa: E402
+from app.models import Discovery, Drone, Mission  # noqa: E402
+
+LAT0, LNG0 = 37.0, -122.0
+M = 111320.0
+LNG_M = M * math.cos(math.radians(LAT0))
+T_END = datetime(2026, 6, 1)
+DEFAULTS = dict(cursor=None, skip=0, limit=100, mission_id=None, verified=None, priority_filter=None,
+                discovery_type=None, bbox=None, lat=None, lng=None, radius_m=None, since=None, until=None,
+                fields=None)
+
+
+def populate(args):
+    rng = np.random.default_rng(args.seed)
+    with engine.begin() as conn:
+        conn.execute(insert(Drone), [{"drone_id": f"d{i}", "name": f"Drone {i}"} for i in range(1, 51)])
+        conn.execute(insert(Mission), [{"mission_id": f"m{i}", "name": f"Mission {i}"} for i in range(1, 501)])
+        chunk = 100000
+        for start in range(0, args.discoveries, chunk):
+            n = min(chunk, args.discoveries - start)
+            lats = LAT0 + rng.uniform(0, 100000, n) / M
+            lngs = LNG0 + rng.uniform(0, 100000, n) / LNG_M
+            seconds = rng.uniform(0, 180 * 86400, n)
+            cells = geocells(lats, lngs).tolist()
+            conn.execute(insert(Discovery), [
+                {"mission_id": int(rng.integers(1, 501)), "drone_id": int(rng.integers(1, 51)),
+                 "latitude": float(lat), "longitude": float(lng), "altitude": 50.0, "geocell": cell,
+                 "discovery_type": "person", "confidence": float(c), "priority": 1,
+                 "discovered_at": T_END - timedelta(seconds=float(s))}
+                for lat, lng, cell, c, s in zip(lats, lngs, cells, rng.random(n), seconds)
+            ])
+
+
+def previous_page(db, skip=0, limit=100, south=None, west=None, north=None, east=None, since=None):
+    query = db.query(Discovery)
+    if south is not None:
+        query = query.filter(Discovery.latitude.between(south, north), Discovery.longitude.between(west, east))
+    if since:
+        query = query.filter(Discovery.discovered_at >= since)
+    rows = query.order_by(Discovery.discovered_at.desc()).offset(skip).limit(limit).all()
+    return [row.to_dict() for row in rows]
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return np.median(samples) * 1000, len(result)
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    Base.metadata.create_all(engine)
+    start = time.perf_counter()
+    populate(args)
+    print(f"{args.discoveries:,} discoveries, 100 x 100 km, 180 days, populated in {time.perf_counter() - start:.1f} s")
+
+    with SessionLocal() as db:
+        def keyset(**params):
+            return lambda: get_discoveries(response=Response(), db=db, **{**DEFAULTS, **params})
+
+        def report(name, previous, current):
+            (prev_ms, prev_rows), (cur_ms, cur_rows) = previous, current
+            print(f"{name:>26}: previous {prev_ms:9.2f} ms ({prev_rows:3d} rows), keyset {cur_ms:7.2f} ms "
+                  f"({cur_rows:3d} rows), {prev_ms / cur_ms:7.1f}x")
+
+        order = (Discovery.discovered_at.desc(), Discovery.id.desc())
+        for depth in (0, 10000, 100000, args.discoveries - 1000):
+            cursor = None
+            if depth:
+                row = db.query(Discovery.discovered_at, Discovery.id).order_by(*order).offset(depth - 1).first()
+                cursor = encode_cursor(row.discovered_at, row.id)
+            report(f"page at row {depth:,}", timed(lambda: previous_page(db, skip=depth), args.repeats),
+                   timed(keyset(cursor=cursor), args.repeats))
+
+        since = T_END - timedelta(days=7)
+        centre_lat, centre_lng = LAT0 + 50000 / M, LNG0 + 50000 / LNG_M
+        d_lat, d_lng = 2000 / M, 2000 / LNG_M
+        box = (centre_lat - d_lat, centre_lng - d_lng, centre_lat + d_lat, centre_lng + d_lng)
+        bbox = f"{box[1]},{box[0]},{box[3]},{box[2]}"
+        report("4 km viewport", timed(lambda: previous_page(db, south=box[0], west=box[1], north=box[2],
+                                                            east=box[3]), args.repeats),
+               timed(keyset(bbox=bbox), args.repeats))
+        report("4 km viewport, last 7 days", timed(lambda: previous_page(db, south=box[0], west=box[1], north=box[2],
+                                                                         east=box[3], since=since), args.repeats),
+               timed(keyset(bbox=bbox, since=since), args.repeats))
+        report("2 km radius", timed(lambda: previous_page(db, south=box[0], west=box[1], north=box[2],
+                                                          east=box[3]), args.repeats),
+               timed(keyset(lat=centre_lat, lng=centre_lng, radius_m=2000.0), args.repeats))
+        d_lat, d_lng = 30000 / M, 30000 / LNG_M
+        wide = (centre_lat - d_lat, centre_lng - d_lng, centre_lat + d_lat, centre_lng + d_lng)
+        report("60 km viewport", timed(lambda: previous_page(db, south=wide[0], west=wide[1], north=wide[2],
+                                                             east=wide[3]), args.repeats),
+               timed(keyset(bbox=f"{wide[1]},{wide[0]},{wide[3]},{wide[2]}"), args.repeats))
+        report("1000 rows, sparse fields", timed(lambda: previous_page(db, limit=1000), args.repeats),
+               timed(keyset(limit=1000, fields="id,latitude,longitude,discovery_type,discovered_at"), args.repeats))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--discoveries", type=int, default=1000000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
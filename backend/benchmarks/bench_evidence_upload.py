@@ -0,0 +1,150 @@
+"""
+Evidence upload benchmark: peak memory, throughput and event-loop stalls for 20 concurrent 500 MB uploads.
+
+Each mode runs in its own process so its peak RSS is its own. "previous"
+reads every request body into memory and writes it with one blocking call,
+as the old upload_evidence did with await file.read(); since that needs the
+sum of all bodies in RAM at once it runs at --previous-size-mb per upload.
+"streaming" sends the same uploads through the resumable PUT endpoint into
+an EvidenceStore. Clients stream distinct generated content in 1 MiB
+chunks over an in-process ASGI transport; loop lag is the worst delay seen
+by a 10 ms ticker on the server's event loop.
+
+    python -m benchmarks.bench_evidence_upload --uploads 20 --size-mb 500 --previous-size-mb 100
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+CHUNK = 1 << 20
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _body(index, size):
+    block = bytearray(os.urandom(CHUNK))
+    for offset in range(0, size, CHUNK):
+        block[:16] = index.to_bytes(8, "little") + offset.to_bytes(8, "little")  # distinct content per upload
+        yield bytes(block[:min(CHUNK, size - offset)])
+        await asyncio.sleep(0)  # let other uploads in between chunks, as a network would
+
+
+async def _loop_lag(stop):
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+def previous_app(directory):
+    from fastapi import FastAPI, Request
+
+    app = FastAPI()
+
+    @app.put("/upload/{index}")
+    async def upload(index: int, request: Request):
+        content = await request.body()
+        with open(os.path.join(directory, f"{index}.bin"), "wb") as f:
+            f.write(content)
+        return {"file_size": len(content)}
+
+    return app, None
+
+
+def streaming_app(directory):
+    from fastapi import FastAPI
+
+    from app.api.api_v1.endpoints import discoveries
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import Discovery, Drone, Mission
+    from app.services.evidence_store import EvidenceStore, get_evidence_store
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add_all([Drone(drone_id="d1", name="d1"), Mission(mission_id="m1", name="m1")])
+        db.flush()
+        db.add(Discovery(mission_id=1, drone_id=1, latitude=0.0, longitude=0.0, discovery_type="person",
+                         confidence=1.0))
+        db.commit()
+    store = EvidenceStore(os.path.join(directory, "evidence"), thumbnail_workers=0)
+    app = FastAPI()
+    app.include_router(discoveries.router, prefix="/discoveries")
+    app.dependency_overrides[get_evidence_store] = lambda: store
+    return app, store
+
+
+async def run_mode(args):
+    import httpx
+
+    logging.disable(logging.WARNING)
+    directory = os.environ["BENCH_DIR"]
+    size = (args.size_mb if args.mode == "streaming" else args.previous_size_mb) << 20
+    app, store = (streaming_app if args.mode == "streaming" else previous_app)(directory)
+    baseline = _peak_rss_mb()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        async def upload(index):
+            if store is None:
+                response = await client.put(f"/upload/{index}", content=_body(index, size))
+            else:
+                created = await client.post("/discoveries/1/evidence/uploads", json={
+                    "filename": f"{index}.bin", "content_type": "application/octet-stream", "size": size})
+                url = f"/discoveries/1/evidence/uploads/{created.json()['upload_id']}"
+                response = await client.put(url, content=_body(index, size))
+            assert response.json()["file_size"] == size, response.text
+
+        stop = asyncio.Event()
+        lag = asyncio.create_task(_loop_lag(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(i) for i in range(args.uploads)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        worst_lag = await lag
+    print(json.dumps({"size": size, "elapsed": elapsed, "baseline_mb": baseline, "peak_mb": _peak_rss_mb(),
+                      "lag_ms": worst_lag * 1000}))
+
+
+def main(args):
+    for mode in ("previous", "streaming"):
+        directory = tempfile.mkdtemp(prefix="bench_evidence_upload_")
+        env = {**os.environ, "BENCH_DIR": directory, "DATABASE_URL": f"sqlite:///{directory}/sar.db"}
+        try:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_evidence_upload", "--mode", mode,
+                 "--uploads", str(args.uploads), "--size-mb", str(args.size_mb),
+                 "--previous-size-mb", str(args.previous_size_mb)],
+                env=env, check=True, capture_output=True, text=True).stdout
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        result = json.loads(output.strip().splitlines()[-1])
+        total_mb = args.uploads * result["size"] / (1 << 20)
+        print(f"{mode:>9}: {args.uploads} x {result['size'] >> 20} MB in {result['elapsed']:6.1f} s "
+              f"({total_mb / result['elapsed']:6.1f} MB/s), peak RSS {result['peak_mb']:7.0f} MB "
+              f"({result['peak_mb'] - result['baseline_mb']:+7.0f} MB over idle), "
+              f"worst loop lag {result['lag_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--size-mb", type=int, default=500)
+    parser.add_argument("--previous-size-mb", type=int, default=100)
+    parser.add_argument("--mode", choices=("previous", "streaming"))
+    args = parser.parse_args()
+    if args.mode:
+        asyncio.run(run_mode(args))
+    else:
+        main(args)
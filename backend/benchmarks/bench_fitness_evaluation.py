@@ -0,0 +1,135 @@
+"""
+Fitness evaluation benchmark: wall-clock per generation and final fitness.
+
+Runs optimize_search_pattern twice on real physics rollouts. The "current"
+run restores the previous behaviour: every unevaluated individual gets a
+rollout bounded by wall-clock time (1 ms sleep per step) on pooled
+simulators that are never reset, so it can only afford a 7 s mission. The
+new run uses the memoized, surrogate-screened FitnessEvaluator with
+step-budgeted rollouts that fly the whole --hours mission. Both winners are
+then re-scored with the same fresh whole-mission rollout, and the spread of
+that score over a random population shows whether it separates patterns.
+
+    python -m benchmarks.bench_fitness_evaluation --population 12 --generations 5
+"""
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import sys
+import time
+import types
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ai_innovations'))
+
+from real_genetic_optimizer import (  # noqa: E402
+    RealGeneticSearchOptimizer,
+    SearchEnvironment,
+    SearchPattern,
+)
+from app.simulator.real_drone_simulator import RealDroneSimulator, DEFAULT_DRONE_PHYSICS, DroneState  # noqa: E402
+
+
+def environment(hours):
+    return SearchEnvironment(
+        terrain_type="forest", weather_conditions={"visibility": 8000, "wind_speed": 6}, search_area_size=2.0,
+        target_type="person", urgency_level=3, num_drones=4, mission_duration=hours,
+    )
+
+
+async def wall_clock_simulate_mission(self, waypoints, duration=3600, max_steps=None, yield_every=100):
+    """The previous loop: bounded by time.time() and sleeping 1 ms per step."""
+    telemetry_log = []
+    current_waypoint = 0
+    start_time = time.time()
+    while time.time() - start_time < duration and current_waypoint < len(waypoints):
+        target_x, target_y, target_z = waypoints[current_waypoint]
+        self.set_target_position(target_x, target_y, target_z)
+        if math.dist((self.position.x, self.position.y, self.position.z), (target_x, target_y, target_z)) < 5.0:
+            current_waypoint += 1
+        telemetry_log.append(await self.simulate_step())
+        if self.battery_level < 15 or self.signal_strength < 20:
+            self.state = DroneState.EMERGENCY
+            break
+        await asyncio.sleep(0.001)
+    return telemetry_log
+
+
+def current_optimizer(args):
+    optimizer = RealGeneticSearchOptimizer(args.population, args.generations)
+    for i in range(args.population):
+        simulator = RealDroneSimulator(f"drone_{i:03d}", DEFAULT_DRONE_PHYSICS)
+        simulator.simulate_mission = types.MethodType(wall_clock_simulate_mission, simulator)
+        simulator.reset = lambda: None
+        optimizer.simulator_pool.append(simulator)
+
+    async def evaluate_population(patterns, environment):
+        return [await optimizer._simulate_fitness(pattern, environment) for pattern in patterns]
+
+    optimizer.fitness_evaluator.evaluate_population = evaluate_population
+    return optimizer
+
+
+def new_optimizer(args):
+    optimizer = RealGeneticSearchOptimizer(args.population, args.generations)
+    optimizer.simulation_step_budget = args.step_budget
+    optimizer.fitness_evaluator.min_training_samples = args.min_training
+    return optimizer
+
+
+async def timed_run(label, optimizer, run_environment, judge, judge_environment):
+    random.seed(0)
+    generation_times = []
+    original = optimizer.evolve_population
+
+    async def evolve_population(population, environment):
+        generation_times.append(time.perf_counter())
+        return await original(population, environment)
+
+    optimizer.evolve_population = evolve_population
+    start = time.perf_counter()
+    best = await optimizer.optimize_search_pattern(run_environment)
+    end = time.perf_counter()
+    marks = [start] + generation_times + [end]
+    per_generation = [b - a for a, b in zip(marks[1:], marks[2:])]
+
+    rescored = SearchPattern(best.pattern_type, dict(best.parameters))
+    fitness = await judge._simulate_fitness(rescored, judge_environment)
+    print(f"{label:>10}: initial population {marks[1] - marks[0]:6.1f}s, "
+          f"{sum(per_generation) / len(per_generation):6.2f}s/generation, "
+          f"total {end - start:6.1f}s, best {best.pattern_type} reported {best.fitness_score:.4f} "
+          f"re-scored {fitness:.4f}")
+    return optimizer
+
+
+async def main(args):
+    logging.disable(logging.ERROR)
+    judge = new_optimizer(args)
+    mission = environment(args.hours)
+    await timed_run("current", current_optimizer(args), environment(0.002), judge, mission)
+    optimizer = await timed_run("new", new_optimizer(args), mission, judge, mission)
+    print(f"{'':>10}  {optimizer.fitness_evaluator.get_stats()}")
+
+    random.seed(1)
+    population = judge.generate_initial_population()
+    start = time.perf_counter()
+    scores = np.array([await judge._simulate_fitness(pattern, mission) for pattern in population])
+    rollout = (time.perf_counter() - start) / len(population)
+    flight = np.array([(await judge.run_simulation(pattern, mission)).total_flight_time for pattern in population])
+    print(f"{'spread':>10}: {len(population)} random patterns over {args.hours:g} h, fitness "
+          f"{scores.min():.4f}-{scores.max():.4f} (std {scores.std():.4f}), flight time "
+          f"{flight.min():.0f}-{flight.max():.0f}s, {rollout * 1000:.1f} ms/rollout")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--population", type=int, default=12)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--step-budget", type=int, default=500)
+    parser.add_argument("--min-training", type=int, default=12)
+    asyncio.run(main(parser.parse_args()))
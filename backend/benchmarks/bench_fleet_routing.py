@@ -0,0 +1,96 @@
+"""
+Fleet routing benchmark: makespan and solve time for assigning 5,000 search waypoints to 20 drones.
+
+The waypoints are a row-by-row grid, as AdaptivePlanner generates them.
+The fleet is mixed: cruise speeds of 8-15 m/s, 20-40 minute batteries
+charged to 50-100%, 1280-3840 px cameras (longer imaging with fewer
+pixels), launched from --bases bases across the middle of the area. Every plan is
+timed with the same model: depot legs, per-waypoint imaging and a return
+to base for a battery swap whenever the reserve would be touched.
+"previous" is the planner's old equal-count chunks in list order;
+"construction" is the Hilbert tour split by makespan; the budgets are the
+full solver with 2-opt and re-splitting.
+
+    python -m benchmarks.bench_fleet_routing --drones 20 --waypoints 5000 --spacing 60 --budgets 0.5 1 2
+"""
+import argparse
+import logging
+import math
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.adaptive_planner import AdaptivePlanner, DroneCapabilities, MissionContext, OptimizationConstraints
+from app.services.fleet_routing import FleetRouter
+
+LAT0, LNG0 = 37.0, -122.0
+M = 111320.0
+
+
+def scenario(args):
+    rng = np.random.default_rng(args.seed)
+    side = int(math.ceil(math.sqrt(args.waypoints)))
+    step = args.spacing / M
+    waypoints = [{'lat': LAT0 + (i // side) * step, 'lng': LNG0 + (i % side) * step / math.cos(math.radians(LAT0)),
+                  'altitude': 50.0, 'type': 'search', 'order': i} for i in range(args.waypoints)]
+    extent = side * args.spacing
+    bases = [(LAT0 + extent / 2 / M, LNG0 + extent * f / (M * math.cos(math.radians(LAT0))))
+             for f in np.linspace(0.2, 0.8, args.bases)]
+    drones = []
+    for i in range(args.drones):
+        width = int(rng.choice([1280, 1920, 3840]))
+        base = bases[i % len(bases)]
+        drones.append(DroneCapabilities(
+            drone_id=f"drone{i}", max_flight_time=int(rng.integers(20, 41)), max_altitude=120.0, max_speed=18.0,
+            cruise_speed=float(rng.uniform(8, 15)), battery_capacity=float(rng.uniform(50, 100)),
+            camera_resolution=(width, width * 9 // 16), gimbal_stabilization=True, obstacle_avoidance=True,
+            weather_resistance="moderate", home_lat=base[0], home_lng=base[1]))
+    constraints = OptimizationConstraints(min_battery_reserve=20.0)
+    context = MissionContext("bench", "person", (extent / 1000) ** 2, "rural", "day", {}, "high", drones, constraints)
+    return waypoints, drones, context
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    waypoints, drones, context = scenario(args)
+    planner = AdaptivePlanner()
+    router = FleetRouter.from_waypoints(waypoints)
+    routing_drones = [planner._routing_drone(d, context, (router.lat0, router.lng0)) for d in drones]
+    print(f"{len(drones)} drones from {args.bases} bases, {len(waypoints):,} waypoints at {args.spacing:.0f} m, "
+          f"{settings.PLANNER_BATTERY_SWAP_S:.0f} s battery swaps")
+
+    def report(name, routes, elapsed):
+        makespan = max(route.duration_s for route in routes)
+        distance = sum(route.distance_m for route in routes) / 1000
+        sorties = sum(len(route.sorties) for route in routes)
+        print(f"{name:>12}: makespan {makespan / 60:7.1f} min, {distance:8.1f} km flown, {sorties:3d} sorties, "
+              f"solved in {elapsed * 1000:8.1f} ms")
+        return makespan
+
+    # Previous: equal-count chunks in list order; routed with the same model so it pays for battery swaps too
+    start = time.perf_counter()
+    chunks = np.array_split(np.arange(len(waypoints)), len(drones))
+    elapsed = time.perf_counter() - start
+    router.solve(routing_drones, time_budget_s=0)  # sets up the drones for _route
+    previous = report("previous", [router._route(d, chunk) for d, chunk in enumerate(chunks)], elapsed)
+
+    result = router.solve(routing_drones, time_budget_s=0)
+    print(f"{'construction':>12}: makespan {result.construction_makespan_s / 60:7.1f} min, "
+          f"solved in {result.solve_time_s * 1000:8.1f} ms")
+    for budget in args.budgets:
+        result = router.solve(routing_drones, time_budget_s=budget)
+        makespan = report(f"{budget:g} s budget", result.routes, result.solve_time_s)
+        print(f"{'':>12}  {result.iterations} iterations, {result.stats['two_opt_moves']:,} 2-opt moves, "
+              f"{result.stats['order_swaps']} order swaps, {previous / makespan:.2f}x shorter than previous")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drones", type=int, default=20)
+    parser.add_argument("--waypoints", type=int, default=5000)
+    parser.add_argument("--spacing", type=float, default=60.0)
+    parser.add_argument("--bases", type=int, default=3)
+    parser.add_argument("--budgets", type=float, nargs="+", default=[0.5, 1.0, 2.0])
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,142 @@
+"""
+Genetic optimizer benchmark: wall-clock and best fitness at equal evaluations on simulator rollouts.
+
+Every optimizer scores patterns with the same objective as the baseline
+optimizer: a whole-mission RealDroneSimulator rollout through
+_simulate_fitness. The "previous" run is optimize_search_pattern evaluating
+one SearchPattern at a time. The island model evolves array-encoded
+populations with --population split evenly across --islands, so every run
+spends the same number of rollouts per generation; it runs in-process, with
+islands evolved in worker processes, and with a process-pool objective. The
+number of rollouts each run actually spent is counted and reported, and
+every winner is re-scored with a fresh rollout.
+
+    python -m benchmarks.bench_genetic_optimizer --population 40 --generations 20 --seeds 3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ai_innovations'))
+
+from real_genetic_optimizer import (  # noqa: E402
+    PATTERN_TYPES,
+    RealGeneticSearchOptimizer,
+    SearchEnvironment,
+    SearchPattern,
+    ProcessPoolFitness,
+    _genes_to_parameters,
+)
+
+ENVIRONMENT = SearchEnvironment(
+    terrain_type="forest", weather_conditions={"visibility": 8000, "wind_speed": 6}, search_area_size=2.0,
+    target_type="person", urgency_level=3, num_drones=4, mission_duration=1.0,
+)
+
+_rollout_optimizer = None
+
+
+def simulated_fitness(pattern, environment):
+    """The baseline objective, a simulator rollout; one optimizer per process"""
+    global _rollout_optimizer
+    if _rollout_optimizer is None:
+        logging.disable(logging.ERROR)
+        _rollout_optimizer = RealGeneticSearchOptimizer(1, 1)
+    return asyncio.run(_rollout_optimizer._simulate_fitness(pattern, environment))
+
+
+class SimulatedPopulationFitness:
+    """Population fitness for the island model: one rollout per individual, counted"""
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.evaluations = 0
+
+    def __call__(self, codes, genes):
+        self.evaluations += len(codes)
+        return np.array([
+            simulated_fitness(SearchPattern(PATTERN_TYPES[code], _genes_to_parameters(code, row)), self.environment)
+            for code, row in zip(codes.tolist(), genes)
+        ])
+
+
+async def run_previous(args, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    optimizer = RealGeneticSearchOptimizer(args.population, args.generations)
+    optimizer.elite_size = args.islands  # as many elites as the islands keep in total
+    evaluations = 0
+
+    async def evaluate_population(patterns, environment):
+        nonlocal evaluations
+        evaluations += len(patterns)
+        return [await optimizer._simulate_fitness(pattern, environment) for pattern in patterns]
+
+    optimizer.fitness_evaluator.evaluate_population = evaluate_population
+    start = time.perf_counter()
+    best = await optimizer.optimize_search_pattern(ENVIRONMENT)
+    return time.perf_counter() - start, evaluations, best
+
+
+async def run_islands(args, seed, workers, fitness_fn):
+    optimizer = RealGeneticSearchOptimizer(args.population // args.islands, args.generations)
+    optimizer.elite_size = 1
+    start = time.perf_counter()
+    best = await optimizer.optimize_search_pattern_parallel(
+        ENVIRONMENT, fitness_fn=fitness_fn, islands=args.islands, seed=seed, workers=workers,
+        patience=args.generations,
+    )
+    elapsed = time.perf_counter() - start
+    # Initial population plus every non-elite child of every generation
+    generations = len(optimizer.fitness_history)
+    evaluations = args.islands * (optimizer.population_size + generations * (optimizer.population_size - optimizer.elite_size))
+    return elapsed, evaluations, best
+
+
+def report(label, runs):
+    elapsed = np.array([r[0] for r in runs])
+    evaluations = np.array([r[1] for r in runs])
+    reported = np.array([r[2].fitness_score for r in runs])
+    rescored = np.array([simulated_fitness(SearchPattern(r[2].pattern_type, dict(r[2].parameters)), ENVIRONMENT)
+                         for r in runs])
+    print(f"{label:>28}: {elapsed.mean():7.1f} s/run  {evaluations.mean():6.0f} rollouts "
+          f"({np.sum(evaluations) / np.sum(elapsed):6.1f}/s)  best reported {reported.mean():.4f} "
+          f"re-scored {rescored.mean():.4f} (min {rescored.min():.4f})")
+
+
+def main(args):
+    logging.disable(logging.ERROR)
+    seeds = range(args.seeds)
+    report("previous (per-pattern)", [asyncio.run(run_previous(args, s)) for s in seeds])
+
+    runs, counted = [], 0
+    for s in seeds:
+        fitness_fn = SimulatedPopulationFitness(ENVIRONMENT)
+        runs.append(asyncio.run(run_islands(args, s, 1, fitness_fn)))
+        counted += fitness_fn.evaluations
+    assert counted == sum(r[1] for r in runs)
+    report(f"islands x{args.islands}, in-process", runs)
+
+    workers = os.cpu_count() or 1
+    report(f"islands x{args.islands}, {workers} procs",
+           [asyncio.run(run_islands(args, s, workers, SimulatedPopulationFitness(ENVIRONMENT))) for s in seeds])
+    pool = ProcessPoolFitness(simulated_fitness, ENVIRONMENT, max_workers=workers, chunksize=1)
+    try:
+        report(f"islands x{args.islands}, pool objective", [asyncio.run(run_islands(args, s, 1, pool)) for s in seeds])
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--population", type=int, default=40)
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--islands", type=int, default=4)
+    parser.add_argument("--seeds", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,153 @@
+"""
+Connection hub benchmark: command and telemetry dispatch cost with 1,000 connections.
+
+Links are in-memory connections that encode with the binary wire codec, so
+the numbers are routing and bookkeeping cost, not network I/O. "previous" is
+the hub's old lookup: a startswith() scan over every connection ID per
+command and per telemetry message, with len(str(payload)) as the byte count.
+"indexed" uses the drone -> links and link -> drone tables. Half of the
+drones also have a LoRa backup link.
+
+    python -m benchmarks.bench_hub_dispatch --connections 1000 --messages 20000
+"""
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from app.communication.drone_connection_hub import ConnectionMetrics, DroneConnectionHub
+from app.communication.drone_registry import (
+    DroneCapabilities, DroneConnectionType, DroneInfo, DroneRegistry, DroneStatus,
+)
+from app.communication.protocols.base_connection import (
+    BaseConnection, ConnectionConfig, ConnectionStatus, TelemetryMessage,
+)
+from app.communication.protocols.wire_codec import WireCodec
+
+
+class MemoryLink(BaseConnection):
+    def __init__(self, connection_id):
+        super().__init__(connection_id, ConnectionConfig(host="127.0.0.1", port=0))
+        self.codec = WireCodec("binary")
+        self.status = ConnectionStatus.CONNECTED
+
+    async def connect(self):
+        return True
+
+    async def disconnect(self):
+        return True
+
+    async def send_message(self, message):
+        self.codec.encode(message)
+        return True
+
+    async def receive_message(self):
+        return None
+
+
+def drone_info(drone_id, link_type):
+    capabilities = DroneCapabilities(30, 15.0, 120.0, 0.5, "4K", True, True, False, True, True, 5000.0, 5000.0, [])
+    return DroneInfo(
+        drone_id=drone_id, name=drone_id, model="x", manufacturer="y", firmware_version="1",
+        serial_number=drone_id, capabilities=capabilities, connection_type=link_type, connection_params={},
+        status=DroneStatus.CONNECTED, last_seen=datetime.utcnow(), battery_level=100.0,
+        position={"lat": 0.0, "lon": 0.0, "alt": 0.0}, heading=0.0, speed=0.0, signal_strength=0.0,
+    )
+
+
+class PreviousHub(DroneConnectionHub):
+    """The lookups and byte estimate the hub used before the routing tables"""
+
+    def _get_connection_by_drone_id(self, drone_id):
+        for connection_id, connection in self.connections.items():
+            if connection_id.startswith(drone_id):
+                return connection
+        return None
+
+    def _get_connection_id_by_drone_id(self, drone_id):
+        for connection_id in self.connections.keys():
+            if connection_id.startswith(drone_id):
+                return connection_id
+        return None
+
+    async def send_command(self, drone_id, command_type, parameters, priority=1):
+        connection = self._get_connection_by_drone_id(drone_id)
+        if not connection:
+            return False
+        success = await connection.send_command(drone_id, command_type, parameters, priority)
+        if success:
+            connection_id = self._get_connection_id_by_drone_id(drone_id)
+            if connection_id and connection_id in self.connection_metrics:
+                self.connection_metrics[connection_id].messages_sent += 1
+                self.connection_metrics[connection_id].last_message_time = datetime.utcnow()
+        return success
+
+    async def _handle_telemetry(self, message, connection_id=None):
+        connection_id = self._get_connection_id_by_drone_id(message.drone_id)
+        if connection_id and connection_id in self.connection_metrics:
+            metrics = self.connection_metrics[connection_id]
+            metrics.messages_received += 1
+            metrics.last_message_time = datetime.utcnow()
+            metrics.bytes_received += len(str(message.payload))
+
+
+def build(cls, connections, registry_path):
+    hub = cls()
+    hub.registry = DroneRegistry(persist_path=registry_path)
+    drones = []
+    index = 0
+    while len(hub.connections) < connections:
+        drone_id = f"drone{index}"
+        drones.append(drone_id)
+        link_types = [DroneConnectionType.WIFI]
+        if index % 2 and len(hub.connections) + 2 <= connections:
+            link_types.append(DroneConnectionType.LORA)
+        for link_type in link_types:
+            connection_id = f"{drone_id}_{link_type.value}"
+            hub.connections[connection_id] = MemoryLink(drone_id)
+            hub.connection_metrics[connection_id] = ConnectionMetrics(
+                connection_id=connection_id, drone_id=drone_id, connection_type=link_type,
+                link_priority=hub.link_preference[link_type],
+            )
+            hub._add_link(drone_info(drone_id, link_type), connection_id)
+        index += 1
+    return hub, drones
+
+
+async def measure(hub, drones, messages, rng):
+    targets = [rng.choice(drones) for _ in range(messages)]
+    start = time.perf_counter()
+    for drone_id in targets:
+        await hub.send_command(drone_id, "goto", {"lat": 1.0, "lon": 2.0})
+    command_us = (time.perf_counter() - start) / messages * 1e6
+
+    telemetry = [
+        TelemetryMessage(message_id=f"t{i}", drone_id=drone_id, payload={"position": {"lat": 1.0, "lon": 2.0}},
+                         position={"lat": 1.0, "lon": 2.0, "alt": 3.0}, timestamp=datetime.utcnow())
+        for i, drone_id in enumerate(targets)
+    ]
+    start = time.perf_counter()
+    for message in telemetry:
+        await hub._handle_telemetry(message)
+    telemetry_us = (time.perf_counter() - start) / messages * 1e6
+    return command_us, telemetry_us
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, cls in (("previous", PreviousHub), ("indexed", DroneConnectionHub)):
+            hub, drones = build(cls, args.connections, f"{tmp}/{name}.json")
+            command_us, telemetry_us = await measure(hub, drones, args.messages, random.Random(0))
+            print(f"{name:>9}: {len(hub.connections):,} connections / {len(drones):,} drones, "
+                  f"send_command {command_us:8.1f} us, telemetry dispatch {telemetry_us:8.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=20000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,165 @@
+"""
+Knowledge graph query benchmark at ~1M nodes.
+
+Builds a synthetic graph (mission, outcome and two lesson nodes per mission)
+and compares the previous full node/edge scans with the indexed, aggregate-
+backed queries. Also times snapshot save/load.
+
+    python -m benchmarks.bench_knowledge_graph --missions 250000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.ai.knowledge_graph import (
+    SARKnowledgeGraph,
+    GraphNode,
+    GraphRelationship,
+    GraphQuery,
+    NodeType,
+    RelationshipType,
+)
+
+TERRAINS = ["forest", "mountain", "urban", "water", "desert", "grassland"]
+PATTERNS = ["grid", "spiral", "sector", "lawnmower"]
+CONDITIONS = ["clear", "rain", "fog", "wind"]
+
+
+def node(node_id, node_type, properties, now):
+    return GraphNode(node_id=node_id, node_type=node_type, properties=properties,
+                     confidence=0.8, created_at=now, last_updated=now)
+
+
+def edge(source, target, rel_type, strength, now):
+    return GraphRelationship(
+        relationship_id=f"{source}_{rel_type.value}_{target}", source_node_id=source, target_node_id=target,
+        relationship_type=rel_type, strength=strength, confidence=0.8, evidence=[], evidence_count=1,
+        created_at=now, last_verified=now,
+    )
+
+
+def build(graph: SARKnowledgeGraph, missions: int):
+    rng = np.random.default_rng(0)
+    now = datetime.utcnow()
+    for terrain in TERRAINS:
+        graph._index_node(node(f"terrain_{terrain}", NodeType.TERRAIN, {"terrain_type": terrain}, now))
+    for pattern in PATTERNS:
+        graph._index_node(node(f"pattern_{pattern}", NodeType.PATTERN, {"pattern_type": pattern}, now))
+
+    success = rng.beta(5, 2, size=missions)
+    for i in range(missions):
+        terrain, pattern = TERRAINS[i % 6], PATTERNS[(i // 6) % 4]
+        mission_id, outcome_id = f"mission_{i}", f"outcome_{i}"
+        graph._index_node(node(mission_id, NodeType.MISSION, {
+            "mission_id": str(i), "mission_type": "search", "terrain_type": terrain, "search_pattern": pattern,
+            "weather_conditions": {"condition": CONDITIONS[i % 4], "wind_speed": float(i % 15)},
+            "success_rate": float(success[i]), "drone_count": 1 + i % 8,
+        }, now))
+        graph._index_node(node(outcome_id, NodeType.OUTCOME, {"mission_id": str(i), "success_rate": float(success[i])}, now))
+        for lesson in range(2):
+            graph._index_node(node(f"lesson_{i}_{lesson}", NodeType.LESSON, {"lesson_text": "keep spare batteries"}, now))
+            graph._index_relationship(edge(mission_id, f"lesson_{i}_{lesson}", RelationshipType.LEADS_TO, 1.0, now))
+        graph._index_relationship(edge(mission_id, f"terrain_{terrain}", RelationshipType.REQUIRES, 1.0, now))
+        graph._index_relationship(edge(mission_id, f"pattern_{pattern}", RelationshipType.REQUIRES, 1.0, now))
+        graph._index_relationship(edge(mission_id, outcome_id, RelationshipType.LEADS_TO, 1.0, now))
+        graph._index_relationship(edge(f"pattern_{pattern}", outcome_id, RelationshipType.INFLUENCES, float(success[i]), now))
+        graph._index_relationship(edge(f"terrain_{terrain}", outcome_id, RelationshipType.INFLUENCES, 0.5 + success[i] / 2, now))
+
+
+def legacy_find_patterns(graph, constraints):
+    """The pre-index implementation: scan every node, recompute effectiveness per mission."""
+    results = []
+    g = graph.memory_graph
+    for node_id, data in g.nodes(data=True):
+        if data.get("node_type") == "mission" and graph._matches_constraints(data, constraints):
+            patterns, outcomes = [], []
+            for neighbor in g.successors(node_id):
+                kind = g.nodes[neighbor].get("node_type")
+                if kind == "pattern":
+                    patterns.append(neighbor)
+                elif kind == "outcome":
+                    outcomes.append(neighbor)
+            for pattern_id in patterns:
+                # Mean success of the mission's outcomes, as the old _calculate_pattern_effectiveness did
+                effectiveness = sum(g.nodes[o].get("success_rate", 0.0) for o in outcomes) / len(outcomes) if outcomes else 0.0
+                if effectiveness > 0.7:
+                    results.append((pattern_id, effectiveness))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results[:10]
+
+
+def legacy_find_optimizations(graph):
+    count = 0
+    g = graph.memory_graph
+    for source_id, target_id, data in g.edges(data=True):
+        if g.nodes[target_id].get("node_type") == "outcome":
+            for predecessor in g.predecessors(target_id):
+                count += 1
+    return count
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(samples))
+
+
+async def main(args):
+    graph = SARKnowledgeGraph(connect=False)
+    start = time.perf_counter()
+    build(graph, args.missions)
+    print(f"built {len(graph.node_cache)} nodes / {len(graph.relationship_cache)} edges "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    def q(query_type, **constraints):
+        return GraphQuery(query_type, [], [], [], constraints)
+
+    cases = [
+        ("find_patterns terrain", q("find_patterns", terrain_type="forest"), {"terrain_type": "forest"}),
+        ("find_patterns terrain+weather", q("find_patterns", terrain_type="forest", weather_conditions={"condition": "rain"}),
+         {"terrain_type": "forest", "weather_conditions": {"condition": "rain"}}),
+        ("find_patterns + drone_count", q("find_patterns", terrain_type="urban", drone_count=3),
+         {"terrain_type": "urban", "drone_count": 3}),
+    ]
+    for label, query, constraints in cases:
+        legacy = timed(lambda: legacy_find_patterns(graph, constraints), 1)
+        indexed = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await graph.query_knowledge(query)
+            indexed.append((time.perf_counter() - start) * 1000.0)
+        print(f"{label:>30}: legacy {legacy:10.1f} ms   indexed {np.median(indexed):8.3f} ms")
+
+    legacy = timed(lambda: legacy_find_optimizations(graph), 1)
+    start = time.perf_counter()
+    await graph.query_knowledge(q("find_optimizations"))
+    print(f"{'find_optimizations':>30}: legacy {legacy:10.1f} ms   indexed "
+          f"{(time.perf_counter() - start) * 1000.0:8.3f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "kg.snapshot")
+        start = time.perf_counter()
+        await graph.save_snapshot(path)
+        saved = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+        del graph
+        restored = SARKnowledgeGraph(connect=False, snapshot_path=path)
+        start = time.perf_counter()
+        await restored.ensure_ready()
+        print(f"snapshot: {size_mb:.0f} MB, save {saved:.1f}s, load {time.perf_counter() - start:.1f}s "
+              f"({len(restored.node_cache)} nodes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--missions", type=int, default=250000, help="4 nodes per mission")
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
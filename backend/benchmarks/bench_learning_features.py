@@ -0,0 +1,156 @@
+"""
+Learning data benchmark: background cycle cost and training time with 100,000 historical missions.
+
+A temporary SQLite database holds --missions missions updated over the past
+30 days (--recent of them in the last 24 hours), each with 1-3 drones and
+about one discovery for every two missions. "previous" is the old cycle:
+re-read every mission of the last 24 hours, load each mission's drones and
+discoveries with their own queries, append data points to an ever-growing
+list and filter it once per model. "incremental" is LearningSystem: the first
+cycle backfills the feature store, after which each cycle reads only the
+--changed missions touched since the last one, in eager-loaded pages, and
+models train on memory-mapped slices. Queries are every statement issued
+during the cycle.
+
+    python -m benchmarks.bench_learning_features --missions 100000 --recent 3000 --changed 50 --cycles 5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_learning_features_")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_DIR}/missions.db"
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Discovery, Drone, Mission, MissionDrone  # noqa: E402
+from app.services.feature_store import FeatureStore  # noqa: E402
+from app.services.learning_system import FEATURE_COLUMNS, LearningSystem, PerformanceMetric  # noqa: E402
+
+QUERIES = [0]
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    QUERIES[0] += 1
+
+
+def populate(args, rng):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Drone), [{"drone_id": f"d{i}", "name": f"Drone {i}", "battery_capacity": 100.0,
+                                      "battery_level": rng.uniform(20, 90), "cruise_speed": rng.uniform(8, 15)}
+                                     for i in range(1, 21)])
+        missions, assignments, discoveries = [], [], []
+        for i in range(1, args.missions + 1):
+            age = rng.uniform(0, 24) if i > args.missions - args.recent else rng.uniform(24, 720)
+            updated_at = now - timedelta(hours=age)
+            missions.append({"id": i, "mission_id": f"m{i}", "name": f"Mission {i}", "priority": rng.randint(1, 5),
+                             "radius": rng.uniform(200, 2000), "altitude": 50.0, "area_covered": rng.uniform(0, 5),
+                             "search_pattern": "lawnmower", "weather_conditions": {"terrain_type": "forest"},
+                             "created_at": updated_at - timedelta(hours=rng.uniform(0.5, 4)), "updated_at": updated_at})
+            for drone in rng.sample(range(1, 21), rng.randint(1, 3)):
+                assignments.append({"mission_id": i, "drone_id": drone})
+            if rng.random() < 0.5:
+                discoveries.append({"mission_id": i, "drone_id": rng.randint(1, 20), "latitude": 0.0,
+                                    "longitude": 0.0, "discovery_type": "person", "confidence": rng.random()})
+        conn.execute(insert(Mission), missions)
+        conn.execute(insert(MissionDrone), assignments)
+        conn.execute(insert(Discovery), discoveries)
+
+
+def touch_missions(args, rng):
+    """Missions changing between cycles: progress updates and a few new discoveries"""
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        for mission_id in rng.sample(range(1, args.missions + 1), args.changed):
+            db.query(Mission).filter(Mission.id == mission_id).update(
+                {"area_covered": rng.uniform(0, 5), "updated_at": now})
+        for mission_id in rng.sample(range(1, args.missions + 1), max(1, args.changed // 5)):
+            db.add(Discovery(mission_id=mission_id, drone_id=1, latitude=0.0, longitude=0.0,
+                             discovery_type="vehicle", confidence=rng.random()))
+        db.commit()
+
+
+def previous_cycle(system, learning_data):
+    """The old collection: every mission of the last 24 hours, with per-mission lazy loads"""
+    with SessionLocal() as db:
+        missions = db.query(Mission).filter(Mission.updated_at >= datetime.utcnow() - timedelta(hours=24)).all()
+        for mission in missions:
+            learning_data.append((PerformanceMetric.MISSION_EFFICIENCY, system._mission_efficiency_row(mission)))
+            for assignment in mission.drone_assignments:
+                learning_data.append((PerformanceMetric.BATTERY_OPTIMIZATION, system._battery_row(mission, assignment.drone)))
+                learning_data.append((PerformanceMetric.FLIGHT_PATH_OPTIMIZATION,
+                                      system._flight_path_row(mission, assignment.drone)))
+            for discovery in db.query(Discovery).filter(Discovery.mission_id == mission.id).all():
+                learning_data.append((PerformanceMetric.DISCOVERY_ACCURACY, system._discovery_row(mission, discovery)))
+
+
+def previous_training(learning_data):
+    for metric in FEATURE_COLUMNS:
+        training_data = [row for kind, row in learning_data if kind.value == metric]
+        np.mean([output for _, _, output in training_data[-50:]])
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    rng = random.Random(args.seed)
+    Base.metadata.create_all(engine)
+    start = time.perf_counter()
+    populate(args, rng)
+    print(f"{args.missions:,} missions ({args.recent:,} in the last 24 h), {args.changed} changed per cycle, "
+          f"populated in {time.perf_counter() - start:.1f} s")
+
+    system = LearningSystem(FeatureStore(os.path.join(DB_DIR, "features"), FEATURE_COLUMNS), SessionLocal)
+    await system._load_existing_models()
+
+    def report(name, elapsed, queries, rows, train):
+        print(f"{name:>22}: cycle {elapsed * 1000:9.1f} ms, {queries:6,} queries, {rows:9,} rows held, "
+              f"training {train * 1000:7.2f} ms")
+
+    # Previous: the same cycles, the list only ever grows
+    learning_data = []
+    for cycle in range(args.cycles):
+        QUERIES[0] = 0
+        start = time.perf_counter()
+        previous_cycle(system, learning_data)
+        elapsed, queries = time.perf_counter() - start, QUERIES[0]
+        start = time.perf_counter()
+        previous_training(learning_data)
+        report(f"previous cycle {cycle + 1}", elapsed, queries, len(learning_data), time.perf_counter() - start)
+
+    store = system.feature_store
+    for cycle in range(args.cycles):
+        if cycle:
+            touch_missions(args, rng)
+        QUERIES[0] = 0
+        start = time.perf_counter()
+        await system._collect_learning_data()
+        elapsed, queries = time.perf_counter() - start, QUERIES[0]
+        for model in system.learning_models.values():
+            model.last_trained = datetime.utcnow() - timedelta(days=2)
+        start = time.perf_counter()
+        await system._update_learning_models()
+        name = "incremental backfill" if cycle == 0 else f"incremental cycle {cycle + 1}"
+        report(name, elapsed, queries, sum(store.rows(metric) for metric in FEATURE_COLUMNS),
+               time.perf_counter() - start)
+    stats = store.get_stats()["partitions"]
+    print(f"{'':>22}  {sum(p['rows'] - p['valid_rows'] for p in stats.values()):,} replaced rows kept on disk")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--missions", type=int, default=100000)
+    parser.add_argument("--recent", type=int, default=3000)
+    parser.add_argument("--changed", type=int, default=50)
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
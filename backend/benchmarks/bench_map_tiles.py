@@ -0,0 +1,194 @@
+"""
+Map tile benchmark: tile latency and payload against whole-figure rendering for a 6-hour, 30-drone mission.
+
+--drones drones fly lawnmower sweeps over their own strips for --hours at
+1 Hz with GPS jitter. "figure" is the dashboard's old path: group every
+telemetry dict by drone and serialise the Scattermapbox figure
+_create_plotly_map builds, every point of every track, as its JSON (plotly
+is not needed; its own validation would only add to the time). "tiles"
+loads the same mission into MissionTiles, then renders the tiles a
+1920x1080 dashboard sees at each zoom, cold and again from the cache, and
+follows a minute of live telemetry: after each second's points only the
+visible tiles whose version changed are sent again.
+
+    python -m benchmarks.bench_map_tiles --drones 30 --hours 6
+"""
+import argparse
+import json
+import logging
+import math
+import resource
+import time
+
+import numpy as np
+
+LAT0, LNG0 = 37.0, -122.0
+M = 111320.0
+SPEED = 5.0  # m/s
+LEG_M = 1000.0
+SPACING_M = 40.0
+VIEW_W, VIEW_H = 1920, 1080
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def sweep(drone, seconds, rng):
+    """(lat, lng) of one drone's lawnmower sweep over its own 1 km strip"""
+    t = np.arange(seconds)
+    leg_s = int(LEG_M / SPEED)
+    leg = t // leg_s
+    along = np.where(leg % 2 == 0, t % leg_s, leg_s - 1 - t % leg_s) * SPEED
+    row, col = divmod(drone, 6)
+    lat = LAT0 + (row * 5000.0 + leg * SPACING_M + rng.normal(0, 1.0, seconds)) / M
+    lng = LNG0 + (col * 1200.0 + along + rng.normal(0, 1.0, seconds)) / (M * math.cos(math.radians(LAT0)))
+    return lat, lng
+
+
+def figure_json(mission, telemetry, discoveries):
+    """The figure _create_plotly_map builds, as the JSON plotly would send"""
+    tracks = {}
+    for point in telemetry:
+        tracks.setdefault(point['drone_id'], []).append(point)
+    data = [{"type": "scattermapbox", "lat": [mission["center_lat"]], "lon": [mission["center_lng"]],
+             "mode": "markers", "marker": {"size": 15, "color": "blue", "symbol": "home"},
+             "text": ["Mission Center"], "name": "Mission Center", "showlegend": True}]
+    colors = ['red', 'green', 'orange', 'purple', 'darkred']
+    for i, (drone_id, track) in enumerate(tracks.items()):
+        color = colors[i % len(colors)]
+        data.append({"type": "scattermapbox", "lat": [p['lat'] for p in track], "lon": [p['lng'] for p in track],
+                     "mode": "lines", "line": {"color": color, "width": 3}, "name": f"Drone {drone_id}",
+                     "showlegend": True})
+        data.append({"type": "scattermapbox", "lat": [track[-1]['lat']], "lon": [track[-1]['lng']],
+                     "mode": "markers", "marker": {"size": 12, "color": color, "symbol": "circle"},
+                     "text": [f"Drone {drone_id}<br>Battery: {track[-1].get('battery_level', 'N/A')}%"],
+                     "name": f"Drone {drone_id} Current", "showlegend": False})
+    data.append({"type": "scattermapbox", "lat": [d['position']['lat'] for d in discoveries],
+                 "lon": [d['position']['lng'] for d in discoveries], "mode": "markers",
+                 "marker": {"size": 15, "color": [d['confidence'] for d in discoveries], "colorscale": "RdYlGn",
+                            "colorbar": {"title": {"text": "Confidence"}}, "symbol": "triangle-up"},
+                 "text": [f"{d['discovery_type']}<br>Confidence: {d['confidence']:.2f}" for d in discoveries],
+                 "name": "Discoveries", "showlegend": True})
+    layout = {"title": {"text": "SAR Mission Real-time Map"}, "height": 600, "showlegend": True,
+              "mapbox": {"style": "open-street-map", "center": {"lat": LAT0, "lon": LNG0}, "zoom": 10}}
+    return json.dumps({"data": data, "layout": layout}).encode()
+
+
+def visible_tiles(z, centre_x, centre_y):
+    """Tiles a VIEW_W x VIEW_H viewport centred on a world position touches"""
+    scale, half_w, half_h = 1 << z, VIEW_W / 2 / 256, VIEW_H / 2 / 256
+    cx, cy = centre_x * scale, centre_y * scale
+    return [(x, y) for x in range(int(math.floor(cx - half_w)), int(math.floor(cx + half_w)) + 1)
+            for y in range(int(math.floor(cy - half_h)), int(math.floor(cy + half_h)) + 1)]
+
+
+def main(args):
+    from app.services.map_tiles import MapTileService, MissionTiles, simplify_for_zoom, to_world
+    from app.services.mission_export import MissionSource, TrackChunk
+
+    logging.disable(logging.WARNING)
+    rng = np.random.default_rng(args.seed)
+    seconds = int(args.hours * 3600)
+    live = 60
+    t0 = np.datetime64("2026-06-01T00:00:00", "us")
+    times = t0 + np.arange(seconds + live) * np.timedelta64(1, "s")
+    tracks = {f"d{i}": sweep(i, seconds + live, rng) for i in range(args.drones)}
+    discoveries = [{"position": {"lat": float(lat[j]), "lng": float(lng[j])}, "discovery_type": "person",
+                    "confidence": float(rng.random())}
+                   for lat, lng in tracks.values() for j in rng.integers(0, seconds, 5)]
+    mission = {"name": "bench", "center_lat": LAT0, "center_lng": LNG0}
+    points = args.drones * seconds
+    print(f"{points:,} points from {args.drones} drones over {args.hours:g} h, {len(discoveries)} discoveries")
+
+    # Tiles: build the pyramid from history, as the tile endpoint does on first request
+    def source():
+        def chunks():
+            for drone_id, (lat, lng) in tracks.items():
+                for begin in range(0, seconds, 50000):
+                    end = min(begin + 50000, seconds)
+                    n = end - begin
+                    yield TrackChunk(drone_id, {"timestamp": times[begin:end], "latitude": lat[begin:end],
+                                                "longitude": lng[begin:end], "altitude": np.full(n, 50.0),
+                                                "battery": np.full(n, 80.0), "signal": np.full(n, np.nan)}, begin == 0)
+        return MissionSource(lambda: mission, chunks, lambda: [
+            {"latitude": d["position"]["lat"], "longitude": d["position"]["lng"], "discovery_type": "person",
+             "confidence": d["confidence"]} for d in discoveries])
+
+    service = MapTileService(min_zoom=args.min_zoom, max_zoom=args.max_zoom, cache_size=100000)
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    layer = service.mission("bench", source)
+    print(f"{'tile index':>22}: {time.perf_counter() - start:9.2f} s to load, zooms {args.min_zoom}-{args.max_zoom}, "
+          f"{sum(len(t.kept[z]) for t in layer.drones.values() for z in layer.zooms):,} vertices, "
+          f"peak RSS {_peak_rss_mb() - baseline:+.0f} MB")
+
+    # Previous path: the whole figure for every dashboard refresh
+    telemetry = [{"drone_id": drone_id, "lat": a, "lng": o, "battery_level": 80.0}
+                 for drone_id, (lat, lng) in tracks.items()
+                 for a, o in zip(lat[:seconds].tolist(), lng[:seconds].tolist())]
+    start = time.perf_counter()
+    figure = figure_json(mission, telemetry, discoveries)
+    elapsed = time.perf_counter() - start
+    print(f"{'figure':>22}: {elapsed * 1000:9.1f} ms, {len(figure) / 1e6:8.2f} MB per refresh")
+    start = time.perf_counter()
+    simplified = []
+    for drone_id, (lat, lng) in tracks.items():
+        keep = simplify_for_zoom(lat[:seconds], lng[:seconds], 16)
+        simplified += [{"drone_id": drone_id, "lat": a, "lng": o, "battery_level": 80.0}
+                       for a, o in zip(lat[:seconds][keep].tolist(), lng[:seconds][keep].tolist())]
+    figure = figure_json(mission, simplified, discoveries)
+    elapsed = time.perf_counter() - start
+    print(f"{'figure (simplified)':>22}: {elapsed * 1000:9.1f} ms, {len(figure) / 1e6:8.2f} MB per refresh "
+          f"({len(simplified):,} points at zoom 16)")
+    del telemetry, simplified, figure
+
+    # A viewport over the middle of the search at each zoom
+    all_x = np.concatenate([to_world(lat, lng)[0] for lat, lng in tracks.values()])
+    all_y = np.concatenate([to_world(lat, lng)[1] for lat, lng in tracks.values()])
+    centre = (float(np.median(all_x)), float(np.median(all_y)))
+    for z in range(args.min_zoom, args.max_zoom + 1, 2):
+        tiles = visible_tiles(z, *centre)
+        start = time.perf_counter()
+        size = sum(len(service.tile("bench", z, x, y, source)[1]) for x, y in tiles)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for x, y in tiles:
+            service.tile("bench", z, x, y, source)
+        warm = time.perf_counter() - start
+        print(f"{f'zoom {z} viewport':>22}: {len(tiles):3d} tiles, cold {cold * 1000:8.1f} ms "
+              f"({cold / len(tiles) * 1000:6.2f} ms/tile), cached {warm * 1000:6.2f} ms, {size / 1e3:8.1f} kB")
+
+    # A minute of live telemetry; each second the dashboard refetches what changed
+    z = args.live_zoom
+    tiles = visible_tiles(z, *centre)
+    etags = {tile: service.tile("bench", z, *tile, source)[0] for tile in tiles}
+    ingest, refresh, sent, changed = 0.0, 0.0, 0, 0
+    for second in range(seconds, seconds + live):
+        start = time.perf_counter()
+        for drone_id, (lat, lng) in tracks.items():
+            service.add_points("bench", drone_id, lat[second:second + 1], lng[second:second + 1],
+                               times[second:second + 1], [80.0])
+        ingest += time.perf_counter() - start
+        start = time.perf_counter()
+        for tile in tiles:
+            etag, body = service.tile("bench", z, *tile, source)
+            if etag != etags[tile]:
+                etags[tile] = etag
+                sent += len(body)
+                changed += 1
+        refresh += time.perf_counter() - start
+    print(f"{f'live, zoom {z}':>22}: {args.drones} points/s ingested in {ingest / live * 1000:.2f} ms, "
+          f"{changed / live:.1f} of {len(tiles)} tiles changed per second, refresh {refresh / live * 1000:.1f} ms, "
+          f"{sent / live / 1e3:.1f} kB/s sent")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drones", type=int, default=30)
+    parser.add_argument("--hours", type=float, default=6.0)
+    parser.add_argument("--min-zoom", type=int, default=10)
+    parser.add_argument("--max-zoom", type=int, default=18)
+    parser.add_argument("--live-zoom", type=int, default=14)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
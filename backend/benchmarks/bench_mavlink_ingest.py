@@ -0,0 +1,114 @@
+"""
+MAVLink ingest benchmark: event-loop load from a simulated 10-vehicle x 50 Hz UDP stream.
+
+A separate process plays the vehicles with pymavlink. Each vehicle sends
+GLOBAL_POSITION_INT, ATTITUDE and RAW_IMU at --rate Hz, plus HEARTBEAT and
+SYS_STATUS at 1 Hz, over local UDP. "previous" converts every message in
+the reader thread and schedules one run_coroutine_threadsafe per message;
+it is given the right loop, which the old get_event_loop() call in the
+thread did not find. "batched" is MAVLinkConnection's path: type filtering
+and per-vehicle rate caps in the thread, then one wakeup per drained batch.
+"batched-uncapped" is the same without rate caps. A 5 ms ticker measures
+event-loop lag.
+
+    python -m benchmarks.bench_mavlink_ingest --vehicles 10 --rate 50 --seconds 5
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import socket
+import time
+
+import numpy as np
+
+from app.communication.protocols.mavlink_connection import MAVLinkConnection, MAVLinkConnectionConfig
+
+
+def simulate(port, vehicles, rate_hz, stop):
+    from pymavlink import mavutil
+    link = mavutil.mavlink_connection(f"udpout:127.0.0.1:{port}", source_system=1)
+    tick = 0
+    next_tick = time.perf_counter()
+    while not stop.is_set():
+        for system_id in range(1, vehicles + 1):
+            link.mav.srcSystem = system_id
+            link.mav.global_position_int_send(tick, 377749000 + tick, -1224194000, 80000, 50000, 100, 0, 0, 9000)
+            link.mav.attitude_send(tick, 0.01, 0.02, 1.5, 0, 0, 0)
+            link.mav.raw_imu_send(tick, 1, 2, 3, 4, 5, 6, 7, 8, 9)
+            if tick % rate_hz == 0:
+                link.mav.heartbeat_send(2, 3, 0, 0, 4)
+                link.mav.sys_status_send(0, 0, 0, 500, 12600, 1500, 87, 0, 0, 0, 0, 0, 0)
+        tick += 1
+        next_tick += 1.0 / rate_hz
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+
+class CountingConnection(MAVLinkConnection):
+    handled = 0
+
+    async def _handle_message(self, message):
+        self.handled += 1
+        await super()._handle_message(message)
+
+
+class PreviousConnection(CountingConnection):
+    def _process_mavlink_messages(self):
+        while not self._reader_stop.is_set() and self.mav:
+            msg = self.mav.recv_match(blocking=True, timeout=1.0)
+            if msg:
+                drone_message = self._convert_mavlink_message(msg)
+                if drone_message:
+                    self.ingest_stats["wakeups"] += 1
+                    asyncio.run_coroutine_threadsafe(self._handle_message(drone_message), self._loop)
+
+
+async def measure(cls, config, seconds):
+    connection = cls("bench", config)
+    assert await connection.connect(), "no heartbeat from simulator"
+    await connection.start()
+    lags = []
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    deadline = wall_start + seconds
+    while time.perf_counter() < deadline:
+        before = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append(time.perf_counter() - before - 0.005)
+    cpu = (time.process_time() - cpu_start) / seconds
+    handled, wakeups = connection.handled, connection.ingest_stats["wakeups"]
+    await connection.stop()
+    return handled / seconds, wakeups / seconds, cpu, np.percentile(lags, 99) * 1000
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    stop = multiprocessing.Event()
+    simulator = multiprocessing.Process(target=simulate, args=(port, args.vehicles, args.rate, stop), daemon=True)
+    simulator.start()
+    try:
+        sent = args.vehicles * args.rate * 3 + args.vehicles * 2
+        print(f"simulator: {args.vehicles} vehicles, ~{sent:,} messages/s")
+        modes = [
+            ("previous", PreviousConnection, {}),
+            ("batched", CountingConnection, {}),
+            ("batched-uncapped", CountingConnection, {"max_rate_hz": {}}),
+        ]
+        for name, cls, overrides in modes:
+            config = MAVLinkConnectionConfig(host="127.0.0.1", port=port, connection_type="udp", **overrides)
+            handled, wakeups, cpu, lag = await measure(cls, config, args.seconds)
+            print(f"{name:>17}: {handled:7,.0f} msgs/s handled, {wakeups:7,.0f} loop wakeups/s, "
+                  f"CPU {cpu:5.1%}, loop lag p99 {lag:6.2f} ms")
+    finally:
+        stop.set()
+        simulator.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vehicles", type=int, default=10)
+    parser.add_argument("--rate", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    asyncio.run(main(parser.parse_args()))
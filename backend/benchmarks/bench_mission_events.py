@@ -0,0 +1,189 @@
+"""
+Mission monitoring benchmark: discovery-insert-to-status-update latency and DB queries per minute per active mission.
+
+--missions missions are in the search phase against a temporary SQLite
+database. For --seconds, discoveries are inserted at random times across
+the missions, each followed by the DISCOVERY_CREATED event the discoveries
+endpoint publishes. Latency is from the insert's commit to the "Discovery
+found" status update on the mission. "previous" is the old search loop:
+wake every --poll-interval seconds, query the mission for its time limit,
+re-query every discovery since the start and de-duplicate against a list.
+"events" is MissionExecutionService reacting to the bus; its loop still
+wakes every MISSION_MONITOR_INTERVAL to flush coverage, without touching
+the database. Queries counted are the SELECTs issued while monitoring.
+
+    python -m benchmarks.bench_mission_events --missions 20 --discoveries 200 --seconds 90 --poll-interval 30
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_mission_events_")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_DIR}/missions.db"
+
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.event_bus import event_bus, DISCOVERY_CREATED, MISSION_STATE  # noqa: E402
+from app.models import Discovery, Mission  # noqa: E402
+from app.services.mission_execution import ExecutionPhase, MissionExecution, MissionExecutionService  # noqa: E402
+
+SELECTS = [0]
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT"):
+        SELECTS[0] += 1
+
+
+def create_missions(count):
+    db = SessionLocal()
+    try:
+        missions = [Mission(mission_id=f"bench-{i}-{time.time_ns()}", name=f"Mission {i}", status="active",
+                            time_limit_minutes=600) for i in range(count)]
+        db.add_all(missions)
+        db.commit()
+        return [str(mission.id) for mission in missions]
+    finally:
+        db.close()
+
+
+def insert_discovery(mission_id, rng, committed):
+    """Insert a discovery and announce it as the discoveries endpoint does, noting the commit time"""
+    db = SessionLocal()
+    try:
+        discovery = Discovery(mission_id=int(mission_id), drone_id=1, discovery_type="person",
+                              confidence=rng.uniform(0.5, 1.0), latitude=37.0, longitude=-122.0)
+        db.add(discovery)
+        db.commit()
+        committed[discovery.id] = time.perf_counter()
+        event_bus.publish(DISCOVERY_CREATED, {
+            "id": discovery.id, "discovery_type": discovery.discovery_type, "confidence": discovery.confidence,
+            "latitude": discovery.latitude, "longitude": discovery.longitude,
+        }, mission_id=mission_id, source="api")
+    finally:
+        db.close()
+
+
+class PreviousMonitor:
+    """MissionExecutionService's search loop before the event bus"""
+
+    def __init__(self, poll_interval, on_update):
+        self.poll_interval = poll_interval
+        self.on_update = on_update
+
+    async def run(self, mission_id, execution):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            db = SessionLocal()
+            try:
+                mission = db.query(Mission).filter(Mission.id == mission_id).first()
+                if mission and mission.time_limit_minutes:
+                    elapsed = (datetime.utcnow() - execution.start_time).total_seconds() / 60
+                    if elapsed >= mission.time_limit_minutes:
+                        break
+            finally:
+                db.close()
+            db = SessionLocal()
+            try:
+                discoveries = db.query(Discovery).filter(
+                    Discovery.mission_id == mission_id,
+                    Discovery.discovered_at >= execution.start_time
+                ).all()
+                for discovery in discoveries:
+                    if discovery.id not in execution.discoveries:
+                        execution.discoveries.append(discovery.id)
+                        self.on_update(discovery.id)
+            finally:
+                db.close()
+
+
+async def run(mode, args):
+    mission_ids = create_missions(args.missions)
+    start_time = datetime.utcnow()
+    committed, latencies = {}, []
+
+    def on_update(discovery_id):
+        latencies.append(time.perf_counter() - committed.pop(discovery_id))
+
+    if mode == "previous":
+        monitor = PreviousMonitor(args.poll_interval, on_update)
+        tasks = [asyncio.create_task(monitor.run(mission_id, MissionExecution(
+            mission_id=mission_id, phase=ExecutionPhase.SEARCH, start_time=start_time, discoveries=[])))
+            for mission_id in mission_ids]
+        unsubscribe = lambda: None
+    else:
+        service = MissionExecutionService()
+        await service.start()
+        executions = []
+        for mission_id in mission_ids:
+            execution = MissionExecution(mission_id=mission_id, phase=ExecutionPhase.SEARCH,
+                                         start_time=start_time, time_limit_minutes=600)
+            service.active_executions[mission_id] = execution
+            executions.append(execution)
+        tasks = [asyncio.create_task(service._monitor_search(execution)) for execution in executions]
+        last_seen = {}
+
+        def on_state(event):
+            update = event.data.get("update")
+            if update and update["status"] == "Discovery found":
+                execution = service.active_executions[event.mission_id]
+                new = execution.discoveries - last_seen.setdefault(event.mission_id, set())
+                last_seen[event.mission_id] |= new
+                for discovery_id in new:
+                    on_update(discovery_id)
+        unsubscribe = event_bus.subscribe(MISSION_STATE, on_state)
+
+    rng = random.Random(0)
+    schedule = sorted(rng.uniform(0, args.seconds - args.poll_interval) for _ in range(args.discoveries))
+    SELECTS[0] = 0
+    start = time.perf_counter()
+    insert_selects = 0
+    for at in schedule:
+        await asyncio.sleep(max(0.0, start + at - time.perf_counter()))
+        before = SELECTS[0]
+        insert_discovery(rng.choice(mission_ids), rng, committed)
+        insert_selects += SELECTS[0] - before
+    await asyncio.sleep(max(0.0, start + args.seconds - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    monitor_selects = SELECTS[0] - insert_selects
+
+    unsubscribe()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if mode == "events":
+        await service.stop()
+    return latencies, len(committed), monitor_selects / (elapsed / 60) / args.missions
+
+
+def ms(samples, q):
+    return f"{np.percentile(samples, q) * 1000:10.2f}" if samples else "       n/a"
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    Base.metadata.create_all(engine)
+    print(f"{args.missions} missions searching, {args.discoveries} discoveries over {args.seconds:.0f} s, "
+          f"previous poll interval {args.poll_interval:.0f} s")
+    for mode in ("previous", "events"):
+        latencies, missed, queries = await run(mode, args)
+        print(f"{mode:>10}: insert-to-status p50/p99/max {ms(latencies, 50)} /{ms(latencies, 99)} /"
+              f"{ms(latencies, 100)} ms, {missed} not seen, {queries:6.2f} DB queries/min per mission")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--missions", type=int, default=20)
+    parser.add_argument("--discoveries", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=90.0)
+    parser.add_argument("--poll-interval", type=float, default=30.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,177 @@
+"""
+Mission export benchmark: peak memory, time to first byte and total time exporting a 10,000,000-point mission.
+
+A temporary SQLite database holds one mission with --points telemetry points
+from 30 drones flying lawnmower sweeps at 10 Hz, and a second one with
+--previous-points. Every export runs in its own process so its peak RSS is
+its own. "previous" is the old path: load the mission's telemetry as ORM rows,
+turn them into dicts and build the whole document (GeoJSON with indent=2, or
+CSV through a DataFrame) before the first byte goes out; it runs on the
+smaller mission because the large one does not fit in memory that way.
+"streaming" is stream_export over database_source, consumed as fast as it
+comes, at --tolerance-m 0 (every point) and with Douglas-Peucker tracks.
+
+    python -m benchmarks.bench_mission_export --points 10000000 --previous-points 1000000 --tolerance-m 1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+DRONES = 30
+LAT0, LNG0 = 37.0, -122.0
+M = 111320.0
+T0 = np.datetime64("2026-06-01T00:00:00", "us")
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def populate(args):
+    from sqlalchemy import insert
+
+    from app.core.database import Base, engine
+    from app.models import Discovery, Drone, Mission, TelemetryData
+
+    rng = np.random.default_rng(args.seed)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Drone), [{"drone_id": f"d{i}", "name": f"Drone {i}"} for i in range(1, DRONES + 1)])
+        conn.execute(insert(Mission), [{"mission_id": f"m{i}", "name": f"Mission {i}", "center_lat": LAT0,
+                                        "center_lng": LNG0} for i in (1, 2)])
+        for mission, points in ((1, args.points), (2, args.previous_points)):
+            per_drone = points // DRONES
+            for drone in range(1, DRONES + 1):
+                t = np.arange(per_drone)
+                leg = (t // 600) % 2  # 60 s legs at 2 m/s, 40 m apart
+                along = np.where(leg == 0, t % 600, 599 - t % 600) * 0.2
+                lat = LAT0 + ((t // 600) * 40.0 + rng.normal(0, 0.5, per_drone)) / M
+                lng = LNG0 + (drone * 1500.0 + along + rng.normal(0, 0.5, per_drone)) / (M * 0.7986)
+                times = (T0 + t * np.timedelta64(100, "ms")).astype(datetime)
+                battery = 100.0 - 80.0 * t / per_drone
+                for start in range(0, per_drone, 100000):
+                    end = min(start + 100000, per_drone)
+                    conn.execute(insert(TelemetryData), [
+                        {"drone_id": drone, "mission_id": mission, "latitude": a, "longitude": o, "altitude": 50.0,
+                         "battery_percentage": b, "signal_strength": 90, "timestamp": ts}
+                        for a, o, b, ts in zip(lat[start:end].tolist(), lng[start:end].tolist(),
+                                               battery[start:end].tolist(), times[start:end].tolist())
+                    ])
+            conn.execute(insert(Discovery), [
+                {"mission_id": mission, "drone_id": int(rng.integers(1, DRONES + 1)), "latitude": LAT0,
+                 "longitude": LNG0, "discovery_type": "person", "confidence": float(rng.random()), "priority": 2}
+                for _ in range(200)
+            ])
+
+
+def previous_export(fmt):
+    """The old path: every row in memory, then the whole document, then the first byte"""
+    import pandas as pd
+
+    from app.core.database import SessionLocal
+    from app.models import Discovery, Mission, TelemetryData
+
+    with SessionLocal() as db:
+        mission = db.query(Mission).filter(Mission.id == 2).first()
+        telemetry = [{"drone_id": t.drone_id, "lat": t.latitude, "lng": t.longitude, "altitude": t.altitude,
+                      "battery_level": t.battery_percentage, "signal_strength": t.signal_strength,
+                      "timestamp": t.timestamp.isoformat()}
+                     for t in db.query(TelemetryData).filter(TelemetryData.mission_id == 2).all()]
+        discoveries = [{"position": {"lat": d.latitude, "lng": d.longitude}, "discovery_type": d.discovery_type,
+                        "confidence": d.confidence, "priority": d.priority}
+                       for d in db.query(Discovery).filter(Discovery.mission_id == 2).all()]
+    if fmt == "csv":
+        discoveries_csv = pd.DataFrame(discoveries).to_csv(index=False)
+        return f"=== TELEMETRY DATA ===\n{pd.DataFrame(telemetry).to_csv(index=False)}\n\n" \
+               f"=== DISCOVERIES DATA ===\n{discoveries_csv}"
+    tracks = {}
+    for point in telemetry:
+        tracks.setdefault(point['drone_id'], []).append(point)
+    features = [{"type": "Feature", "geometry": {"type": "Point", "coordinates": [mission.center_lng, mission.center_lat]},
+                 "properties": {"type": "mission_center", "name": mission.name}}]
+    features += [{"type": "Feature", "geometry": {"type": "LineString",
+                                                  "coordinates": [[p['lng'], p['lat']] for p in track]},
+                  "properties": {"type": "drone_track", "drone_id": drone_id}} for drone_id, track in tracks.items()]
+    features += [{"type": "Feature", "geometry": {"type": "Point", "coordinates": [d['position']['lng'], d['position']['lat']]},
+                  "properties": {"type": "discovery", "discovery_type": d['discovery_type']}} for d in discoveries]
+    return json.dumps({"type": "FeatureCollection", "features": features}, indent=2)
+
+
+async def run_mode(args):
+    logging.disable(logging.WARNING)
+    import pandas  # noqa: F401  (imports are not part of the timings)
+
+    from app.core.database import SessionLocal
+    from app.services.mission_export import database_source, stream_export
+
+    mode, fmt = args.mode.split(":")
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "previous":
+        document = previous_export(fmt).encode()
+        first = time.perf_counter() - start
+        size = len(document)
+        del document
+    else:
+        first, size = None, 0
+        async for data in stream_export(database_source(SessionLocal, 1), fmt, args.tolerance_m if mode == "simplified" else 0.0):
+            if first is None:
+                first = time.perf_counter() - start
+            size += len(data)
+    print(json.dumps({"first": first, "elapsed": time.perf_counter() - start, "bytes": size,
+                      "baseline_mb": baseline, "peak_mb": _peak_rss_mb()}))
+
+
+def main(args):
+    from app.services.mission_export import PYARROW_AVAILABLE
+
+    logging.disable(logging.WARNING)
+    start = time.perf_counter()
+    populate(args)
+    print(f"{args.points:,} + {args.previous_points:,} points from {DRONES} drones, "
+          f"populated in {time.perf_counter() - start:.1f} s")
+
+    modes = ["previous:geojson", "previous:csv", "streaming:geojson", "streaming:csv", "streaming:flatgeobuf",
+             "simplified:geojson", "simplified:flatgeobuf"]
+    if PYARROW_AVAILABLE:
+        modes.insert(5, "streaming:parquet")
+    for mode in modes:
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_mission_export", "--mode", mode,
+                                 "--tolerance-m", str(args.tolerance_m)],
+                                env=os.environ, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        points = args.previous_points if mode.startswith("previous") else args.points
+        name = f"{mode} ({args.tolerance_m:g} m)" if mode.startswith("simplified") else mode
+        print(f"{name:>28}: {points:>10,} points, first byte {result['first'] * 1000:9.1f} ms, "
+              f"total {result['elapsed']:6.1f} s, {result['bytes'] / 1e6:8.1f} MB out, "
+              f"peak RSS {result['peak_mb']:6.0f} MB ({result['peak_mb'] - result['baseline_mb']:+6.0f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=10000000)
+    parser.add_argument("--previous-points", type=int, default=1000000)
+    parser.add_argument("--tolerance-m", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode")
+    args = parser.parse_args()
+    if args.mode:
+        asyncio.run(run_mode(args))
+    else:
+        db_dir = tempfile.mkdtemp(prefix="bench_mission_export_")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_dir}/telemetry.db"
+        try:
+            main(args)
+        finally:
+            shutil.rmtree(db_dir, ignore_errors=True)
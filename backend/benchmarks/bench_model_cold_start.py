@@ -0,0 +1,93 @@
+"""
+Model cold-start benchmark: time until RealMLModels can serve a prediction.
+
+The previous initialize regenerated the synthetic missions and fitted all
+five models on the event loop at every start. With the registry, the first
+start trains once in a worker process and publishes the bundle; every later
+start loads the checksummed artifact lazily. A 10 ms ticker task measures
+how long the event loop is blocked during each start.
+
+    python -m benchmarks.bench_model_cold_start --starts 5
+"""
+import argparse
+import asyncio
+import logging
+import shutil
+import tempfile
+import time
+import warnings
+
+from app.ai.model_registry import ModelRegistry
+from app.ai.real_ml_models import MissionFeatures, RealMLModels
+
+MISSION = MissionFeatures(
+    mission_type="search", terrain_type="forest", weather_condition="clear",
+    area_size=20.0, duration_hours=4.0, num_drones=5, target_urgency=3,
+    time_of_day=12, season=1, wind_speed=10.0, visibility=10.0, temperature=20.0,
+    humidity=60.0, battery_reserve=80.0, communication_range=10.0,
+    search_density="medium", search_pattern="grid", altitude=60, speed=8.0,
+)
+
+
+async def timed_start(start):
+    """Seconds until the first prediction, and the worst event-loop stall."""
+    stalls = [0.0]
+    running = True
+
+    async def ticker():
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            stalls[0] = max(stalls[0], now - last - 0.01)
+            last = now
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    began = time.perf_counter()
+    models = await start()
+    prediction = await models.predict_mission_outcome(MISSION)
+    elapsed = time.perf_counter() - began
+    running = False
+    await tick_task
+    assert prediction.confidence > 0.5, "prediction fell back"
+    return elapsed, stalls[0]
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    root = tempfile.mkdtemp(prefix="model_registry_")
+    try:
+        async def legacy():
+            models = RealMLModels()
+            await models._train_models()  # the previous initialize body
+            return models
+
+        async def registry_start():
+            models = RealMLModels(registry=ModelRegistry(root))
+            await models.initialize()
+            return models
+
+        rows = []
+        for _ in range(args.starts):
+            rows.append(await timed_start(legacy))
+        print(f"{'train on start':>22}: {sum(r[0] for r in rows) / len(rows):7.3f}s to first prediction, "
+              f"event loop blocked up to {max(r[1] for r in rows) * 1000:7.0f} ms")
+
+        elapsed, stall = await timed_start(registry_start)
+        print(f"{'registry, first start':>22}: {elapsed:7.3f}s to first prediction, "
+              f"event loop blocked up to {stall * 1000:7.0f} ms (trained in worker process)")
+
+        rows = [await timed_start(registry_start) for _ in range(args.starts)]
+        mean = sum(r[0] for r in rows) / len(rows)
+        print(f"{'registry, later starts':>22}: {mean:7.3f}s to first prediction, "
+              f"event loop blocked up to {max(r[1] for r in rows) * 1000:7.0f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--starts", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,164 @@
+"""
+RAG retrieval benchmark: queries/sec and p99 latency at 100k documents.
+
+Compares the previous retrieval path (synchronous encode per query, sequential
+per-collection search, relevance scoring over ``str(payload)``) with the
+in-process engine (cached batched encoding in a worker thread, concurrent
+collection fan-out, precomputed token sets).
+
+    python -m benchmarks.bench_rag_retrieval --documents 100000 --queries 2000
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.ai.vector_index import (
+    LocalVectorIndex,
+    PointStruct,
+    BatchedEmbeddingEncoder,
+    EmbeddingCache,
+    tokenize,
+    HNSWLIB_AVAILABLE,
+)
+
+DIM = 384
+COLLECTIONS = [f"sar_collection_{i}" for i in range(8)]
+TERRAINS = ["forest", "mountain", "urban", "water", "desert"]
+PATTERNS = ["grid", "spiral", "sector", "parallel"]
+
+
+class SyntheticModel:
+    """Stand-in for SentenceTransformer with a realistic per-call cost."""
+
+    def __init__(self, dim: int = DIM, cost_ms: float = 4.0):
+        self.dim = dim
+        self.cost_ms = cost_ms
+        self._projection = np.random.default_rng(7).normal(size=(256, dim)).astype(np.float32)
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        time.sleep(self.cost_ms / 1000.0)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in text.lower().split():
+                out[i] += self._projection[hash(token) % 256]
+        return out[0] if single else out
+
+
+def build_index(documents: int, hnsw_threshold: int) -> LocalVectorIndex:
+    rng = np.random.default_rng(0)
+    index = LocalVectorIndex(hnsw_threshold=hnsw_threshold)
+    for name in COLLECTIONS:
+        index.create_collection(name, vectors_config={"size": DIM})
+    per_collection = documents // len(COLLECTIONS)
+    for c, name in enumerate(COLLECTIONS):
+        vectors = rng.normal(size=(per_collection, DIM)).astype(np.float32)
+        points = []
+        for i in range(per_collection):
+            doc_id = f"{c}-{i}"
+            payload = {
+                "id": doc_id,
+                "terrain_type": TERRAINS[i % len(TERRAINS)],
+                "search_pattern": PATTERNS[i % len(PATTERNS)],
+                "lessons_learned": f"mission {i} in {TERRAINS[i % len(TERRAINS)]} used {PATTERNS[i % len(PATTERNS)]}",
+                "confidence_score": 0.8,
+                "sample_size": 3,
+            }
+            points.append(PointStruct(id=doc_id, vector=vectors[i], payload=payload))
+        index.upsert(name, points)
+    return index
+
+
+def make_queries(count: int, distinct: int):
+    rng = np.random.default_rng(1)
+    base = [
+        f"best {PATTERNS[i % 4]} pattern for {TERRAINS[i % 5]} missions lesson {i}"
+        for i in range(distinct)
+    ]
+    return [base[i] for i in rng.integers(0, distinct, size=count)]
+
+
+def legacy_score(query, payload):
+    query_terms = set(query.lower().split())
+    document_text = str(payload).lower()
+    return sum(1 for term in query_terms if term in document_text) / max(len(query_terms), 1)
+
+
+async def run_legacy(index, model, queries, limit):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        embedding = model.encode(query)
+        for name in COLLECTIONS:
+            for hit in index.search(name, embedding, limit=limit):
+                legacy_score(query, hit.payload)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_engine(index, encoder, queries, limit, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(query):
+        async with semaphore:
+            start = time.perf_counter()
+            embedding = await encoder.encode(query)
+            results = await asyncio.gather(*(
+                asyncio.to_thread(index.search, name, embedding, limit) for name in COLLECTIONS
+            ))
+            terms = tokenize(query)
+            for hits in results:
+                for hit in hits:
+                    len(terms & hit.tokens) / max(len(terms), 1)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(q) for q in queries))
+    return latencies
+
+
+def report(label, latencies, wall):
+    ms = np.asarray(latencies) * 1000.0
+    print(f"{label:>8}: {len(ms) / wall:8.1f} q/s  p50 {np.percentile(ms, 50):7.2f} ms  "
+          f"p99 {np.percentile(ms, 99):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=500, help="distinct query strings")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--hnsw-threshold", type=int, default=10000)
+    args = parser.parse_args()
+
+    model = SyntheticModel()
+    queries = make_queries(args.queries, args.distinct)
+
+    # Legacy path: exact scan, as with an unindexed Qdrant segment below full_scan_threshold
+    exact = build_index(args.documents, hnsw_threshold=2 ** 62)
+    start = time.perf_counter()
+    legacy = asyncio.run(run_legacy(exact, model, queries, args.limit))
+    report("legacy", legacy, time.perf_counter() - start)
+    del exact
+
+    start = time.perf_counter()
+    index = build_index(args.documents, hnsw_threshold=args.hnsw_threshold)
+    for name in COLLECTIONS:
+        index.search(name, np.ones(DIM), limit=1)  # build HNSW graphs before timing
+    print(f"indexed {args.documents} documents in {time.perf_counter() - start:.1f}s "
+          f"(hnswlib={'yes' if HNSWLIB_AVAILABLE else 'no'})")
+
+    encoder = BatchedEmbeddingEncoder(model, cache=EmbeddingCache())
+    start = time.perf_counter()
+    engine = asyncio.run(run_engine(index, encoder, queries, args.limit, args.concurrency))
+    report("engine", engine, time.perf_counter() - start)
+    print(f"embedding cache: {encoder.cache.get_stats()}  batches: {encoder.batches_encoded}")
+
+
+if __name__ == "__main__":
+    main()
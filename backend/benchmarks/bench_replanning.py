@@ -0,0 +1,134 @@
+"""
+Replanning benchmark: incremental plan repair versus replanning from scratch for a 50-drone mission.
+
+A --waypoints grid at --spacing metres is routed for a mixed --drones fleet
+from 5 bases, then every drone is put part-way through its route with a
+partly drained battery. For each kind of change, --trials random events are
+applied with AdaptivePlanner.replan_mission ("incremental") and compared
+with "full": optimize_mission_plan from scratch for the same fleet and an
+area of the same size, as every change required before (drones based at
+the area's centre). The makespan change is against the remaining work as it
+was being flown before the event.
+
+    python -m benchmarks.bench_replanning --drones 50 --waypoints 5000 --trials 10
+"""
+import argparse
+import asyncio
+import dataclasses
+import logging
+import math
+import time
+
+import numpy as np
+
+from app.services.adaptive_planner import (
+    AdaptivePlanner, DroneCapabilities, MissionContext, OptimizationConstraints, OptimizationStrategy,
+    PlanChange, PlanChangeType
+)
+
+LAT0, LNG0 = 37.0, -122.0
+M = 111320.0
+LNG_M = M * math.cos(math.radians(LAT0))
+
+
+def make_drone(rng, drone_id, base):
+    width = int(rng.choice([1280, 1920, 3840]))
+    return DroneCapabilities(
+        drone_id=drone_id, max_flight_time=int(rng.integers(25, 41)), max_altitude=120.0, max_speed=18.0,
+        cruise_speed=float(rng.uniform(8, 15)), battery_capacity=100.0, camera_resolution=(width, width * 9 // 16),
+        gimbal_stabilization=True, obstacle_avoidance=True, weather_resistance="moderate",
+        home_lat=base[0], home_lng=base[1])
+
+
+async def scenario(args, planner, rng):
+    side = int(math.ceil(math.sqrt(args.waypoints)))
+    waypoints = [{'lat': LAT0 + (i // side) * args.spacing / M, 'lng': LNG0 + (i % side) * args.spacing / LNG_M,
+                  'altitude': 50.0, 'type': 'search', 'order': i} for i in range(args.waypoints)]
+    extent = side * args.spacing
+    bases = [(LAT0 + extent / 2 / M, LNG0 + extent * f / LNG_M) for f in np.linspace(0.1, 0.9, 5)]
+    drones = [make_drone(rng, f"drone{i}", bases[i % len(bases)]) for i in range(args.drones)]
+    context = MissionContext("bench", "person", (extent / 1000) ** 2, "rural", "day", {}, "high", drones,
+                             OptimizationConstraints(min_battery_reserve=20.0))
+    assignments = await planner._assign_drones_to_areas(drones, waypoints, context)
+    plan = {'mission_id': "bench", 'waypoints': waypoints, 'drone_assignments': assignments, 'optimal_altitude': 50.0}
+
+    # Everyone is part-way through their route, where their last waypoint was
+    completed, states = {}, {}
+    for assignment in assignments:
+        search = [wp for wp in assignment['assigned_waypoints'] if wp['type'] == 'search']
+        done = int(len(search) * rng.uniform(0.2, 0.4))
+        completed[assignment['drone_id']] = done
+        if done:
+            states[assignment['drone_id']] = {'lat': search[done - 1]['lat'], 'lng': search[done - 1]['lng'],
+                                              'battery': float(rng.uniform(40, 90))}
+    return plan, context, completed, states, extent, bases
+
+
+def random_change(kind, rng, plan, extent, bases, k):
+    if kind == PlanChangeType.DRONE_LOST:
+        return PlanChange(kind, drone_id=str(rng.choice([a['drone_id'] for a in plan['drone_assignments']])))
+    if kind == PlanChangeType.DRONE_ADDED:
+        return PlanChange(kind, drone=make_drone(rng, f"new{k}", bases[int(rng.integers(len(bases)))]))
+    y, x = rng.uniform(0, extent - 500, size=2)
+    bounds = {'south': LAT0 + y / M, 'north': LAT0 + (y + 500) / M,
+              'west': LNG0 + x / LNG_M, 'east': LNG0 + (x + 500) / LNG_M}
+    return PlanChange(kind, bounds=bounds, spacing_m=100.0)
+
+
+def ms(samples, q):
+    return f"{np.percentile(samples, q) * 1000:8.1f}"
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    rng = np.random.default_rng(args.seed)
+    planner = AdaptivePlanner()
+    plan, context, completed, states, extent, bases = await scenario(args, planner, rng)
+    remaining = sum(len([wp for wp in a['assigned_waypoints'] if wp['type'] == 'search']) - completed[a['drone_id']]
+                    for a in plan['drone_assignments'])
+    print(f"{args.drones} drones, {args.waypoints:,} waypoints at {args.spacing:.0f} m, "
+          f"{remaining:,} left to fly, {args.trials} events per change")
+
+    # Full: the whole pipeline again for an area yielding about as many waypoints as are left
+    full_drones = [dataclasses.replace(d, home_lat=None, home_lng=None) for d in context.available_drones]
+    full_context = MissionContext("bench", "person", (math.sqrt(remaining) / 2) ** 2, "rural", "day", {}, "high",
+                                  full_drones, context.constraints)
+    full = []
+    for _ in range(max(1, args.trials // 5)):
+        start = time.perf_counter()
+        result = await planner.optimize_mission_plan(full_context, OptimizationStrategy.TIME_EFFICIENT)
+        full.append(time.perf_counter() - start)
+        assert result.success, result.recommendations
+    print(f"{'full':>14}: p50 {ms(full, 50)} ms, p95 {ms(full, 95)} ms")
+
+    # The remaining work as flown: a zone far from the area changes nothing
+    far = {'south': LAT0 - 0.2, 'north': LAT0 - 0.1, 'west': LNG0 - 0.2, 'east': LNG0 - 0.1}
+    before = await planner.replan_mission(plan, context, PlanChange(PlanChangeType.NO_FLY_ZONE, bounds=far),
+                                          completed, states)
+    before_s = max(a['estimated_duration'] for a in before.optimized_plan['drone_assignments'])
+
+    for kind in PlanChangeType:
+        times, windows, changed, makespans = [], [], [], []
+        for k in range(args.trials):
+            change = random_change(kind, rng, plan, extent, bases, k)
+            start = time.perf_counter()
+            result = await planner.replan_mission(plan, context, change, completed, states)
+            times.append(time.perf_counter() - start)
+            assert result.success, result.message
+            windows.append(result.diff['repair_window'])
+            changed.append(len(result.diff['changed_drones']) + len(result.diff['added_drones']))
+            makespans.append(result.estimated_duration)
+        print(f"{kind.value:>14}: p50 {ms(times, 50)} ms, p95 {ms(times, 95)} ms, "
+              f"{np.mean(changed):4.1f} drones changed (window {np.mean(windows):4.1f}), "
+              f"makespan {(np.mean(makespans) / before_s - 1) * 100:+5.1f}%, "
+              f"{np.median(full) / np.median(times):4.0f}x faster than full")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drones", type=int, default=50)
+    parser.add_argument("--waypoints", type=int, default=5000)
+    parser.add_argument("--spacing", type=float, default=60.0)
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
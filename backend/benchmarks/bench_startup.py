@@ -0,0 +1,86 @@
+"""
+Startup benchmark: seconds from interpreter start to a healthy /health.
+
+Each run is a fresh interpreter against a temporary SQLite database with
+AI disabled. It imports app.main, runs the lifespan startup through
+Starlette's TestClient and requests /health. The eager row imports every
+endpoint module and heavy subsystem module up front, like the previous
+router did. Modules that cannot import in this environment are skipped and
+listed. The lazy row is the
+current app; its per-module and per-step profile is printed below it.
+The floor row imports only the web/ORM frameworks every variant needs.
+
+    python -m benchmarks.bench_startup --runs 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+CHILD = r"""
+import time
+started = time.perf_counter()
+import importlib, json, sys
+eager = sys.argv[1] == "eager"
+skipped = []
+if eager:
+    from app.api.api_v1.api import ROUTERS
+    from app.core.lazy import HEAVY_SUBSYSTEMS
+    modules = ["app.api.api_v1.endpoints." + spec.module for spec in ROUTERS]
+    modules += [subsystem._target.partition(":")[0] for subsystem in HEAVY_SUBSYSTEMS.values()]
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            skipped.append(name.rsplit(".", 1)[-1])
+from fastapi.testclient import TestClient
+if sys.argv[1] == "floor":
+    import sqlalchemy.ext.asyncio, sqlalchemy.orm, numpy
+    print(json.dumps({"ready": time.perf_counter() - started, "status": 0, "skipped": [],
+                      "modules": len(sys.modules), "profile": None}))
+    raise SystemExit
+from app.main import app
+with TestClient(app) as client:
+    response = client.get("/health")
+    ready = time.perf_counter() - started
+    profile = client.get("/health/startup").json()
+print(json.dumps({"ready": ready, "status": response.status_code, "skipped": skipped,
+                  "modules": len(sys.modules), "profile": profile}))
+"""
+
+
+def run(mode, env):
+    out = subprocess.run([sys.executable, "-c", CHILD, mode], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=backend, AI_ENABLED="false", LOG_LEVEL="WARNING",
+                   DATABASE_URL=f"sqlite:///{tmp}/bench.db")
+        for mode in ("floor", "eager", "lazy"):
+            results = [run(mode, env) for _ in range(args.runs)]
+            best = min(results, key=lambda r: r["ready"])
+            if mode == "floor":
+                print(f"{mode:>6}: fastapi, sqlalchemy and numpy alone import in {best['ready']:.2f}s")
+                continue
+            note = f", skipped {', '.join(best['skipped'])}" if best["skipped"] else ""
+            print(f"{mode:>6}: /health {best['status']} after {best['ready']:.2f}s "
+                  f"(best of {args.runs}), {best['modules']} modules loaded{note}")
+
+        profile = best["profile"]
+        for entry in profile["imports"][:args.top]:
+            print(f"{'':>8}import {entry['module']:<45} {entry['seconds'] * 1000:7.0f} ms "
+                  f"{entry['new_modules']:5d} modules")
+        for entry in profile["lifespan_steps"]:
+            print(f"{'':>8}step   {entry['step']:<45} {entry['seconds'] * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    main(parser.parse_args())
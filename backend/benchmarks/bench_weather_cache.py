@@ -0,0 +1,143 @@
+"""
+Weather cache benchmark: upstream provider calls for a 100-drone mission.
+
+A local fake OpenWeather provider (20 ms latency) serves current weather
+and forecasts and counts requests. Each drone flies a lawnmower strip of a
+10 x 10 km area at 10 m/s and asks for the weather at its position every
+tick of simulated time. The previous cache keys on the exact 4-decimal
+position with a 5-minute TTL, so a moving drone misses nearly every time;
+the gridded field prefetches the mission route and interpolates.
+
+    python -m benchmarks.bench_weather_cache --drones 100 --minutes 30 --tick 10
+"""
+import argparse
+import asyncio
+import logging
+import math
+import time
+
+from aiohttp import web
+
+from app.services.weather_service import WeatherService
+
+
+async def start_provider(latency):
+    calls = {"count": 0}
+
+    def entry(request, dt):
+        lat, lon = float(request.query["lat"]), float(request.query["lon"])
+        return {
+            "dt": int(dt),
+            "main": {"temp": 15 + lat % 1, "humidity": 60, "pressure": 1012},
+            "visibility": 10000, "clouds": {"all": 30},
+            "wind": {"speed": 5 + lon % 1, "deg": 200},
+            "weather": [{"main": "Clouds", "description": "scattered clouds"}],
+        }
+
+    async def current(request):
+        calls["count"] += 1
+        await asyncio.sleep(latency)
+        return web.json_response(entry(request, time.time()))
+
+    async def forecast(request):
+        calls["count"] += 1
+        await asyncio.sleep(latency)
+        return web.json_response({"list": [entry(request, time.time() + 10800 * k) for k in range(8)]})
+
+    app = web.Application()
+    app.router.add_get("/weather", current)
+    app.router.add_get("/forecast", forecast)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, calls
+
+
+def drone_routes(drones, origin=(39.70, -105.30), size_km=10.0):
+    """One lawnmower strip per drone: (lat, lng) waypoints."""
+    deg_lat = size_km / 111.0
+    deg_lng = size_km / (111.0 * math.cos(math.radians(origin[0])))
+    strip = deg_lat / drones
+    routes = []
+    for d in range(drones):
+        south = origin[0] + d * strip
+        routes.append([(south, origin[1]), (south, origin[1] + deg_lng),
+                       (south + strip, origin[1] + deg_lng), (south + strip, origin[1])])
+    return routes
+
+
+def position(route, distance_m):
+    for (lat1, lng1), (lat2, lng2) in zip(route, route[1:] + route[:1]):
+        leg = math.hypot((lat2 - lat1) * 111_000, (lng2 - lng1) * 111_000 * math.cos(math.radians(lat1)))
+        if distance_m <= leg:
+            f = distance_m / leg
+            return lat1 + f * (lat2 - lat1), lng1 + f * (lng2 - lng1)
+        distance_m -= leg
+    return position(route, distance_m)
+
+
+class LegacyCache:
+    """The previous policy: exact 4-decimal key, 5 minute TTL, no eviction."""
+
+    def __init__(self, service, clock):
+        self.service, self.clock, self.cache = service, clock, {}
+
+    async def get_current_weather(self, lat, lng):
+        key = f"{lat:.4f}_{lng:.4f}_current"
+        if key in self.cache and self.clock() - self.cache[key][1] < 300:
+            return self.cache[key][0]
+        data = await self.service._fetch_openweather_data(lat, lng)
+        self.cache[key] = (data, self.clock())
+        return data
+
+
+async def fly(lookup, routes, args, sim):
+    start = time.perf_counter()
+    for tick in range(int(args.minutes * 60 / args.tick)):
+        sim["t"] = tick * args.tick
+        distance = args.speed * sim["t"]
+        await asyncio.gather(*(lookup(*position(route, distance)) for route in routes))
+    return time.perf_counter() - start
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    runner, calls = await start_provider(args.latency)
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    routes = drone_routes(args.drones)
+    lookups = args.drones * int(args.minutes * 60 / args.tick)
+
+    try:
+        sim = {"t": 0.0}
+        service = WeatherService()
+        service.api_keys["openweather"], service.openweather_url = "bench", url
+        legacy = LegacyCache(service, lambda: sim["t"])
+        elapsed = await fly(legacy.get_current_weather, routes, args, sim)
+        legacy_calls = calls["count"]
+        print(f"{'exact-key cache':>16}: {legacy_calls:7d} upstream calls for {lookups} lookups "
+              f"({elapsed:.1f}s), {len(legacy.cache)} entries never evicted")
+
+        calls["count"] = 0
+        sim = {"t": 0.0}
+        service = WeatherService()
+        service.api_keys["openweather"], service.openweather_url = "bench", url
+        service.clock = lambda: sim["t"]
+        await service.prefetch_route([p for route in routes for p in route])
+        prefetch_calls = calls["count"]
+        elapsed = await fly(service.get_current_weather, routes, args, sim)
+        print(f"{'gridded field':>16}: {calls['count']:7d} upstream calls for {lookups} lookups "
+              f"({elapsed:.1f}s), {prefetch_calls} of them from route prefetch")
+        print(f"{'':>16}  {legacy_calls / max(1, calls['count']):.0f}x fewer upstream calls; {service.get_cache_stats()}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drones", type=int, default=100)
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--tick", type=float, default=10, help="seconds of simulated time between lookups")
+    parser.add_argument("--speed", type=float, default=10.0, help="drone ground speed, m/s")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake provider latency, s")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,110 @@
+"""
+WiFi framing benchmark: sustained telemetry frames/sec per TCP link over loopback.
+
+A fake drone accepts the handshake and then writes length-prefixed binary
+telemetry frames as fast as the socket takes them. "previous" is the old
+receive path: read(4)/read(n) for one frame per loop iteration, then a
+10 ms sleep. "framed" is WiFiConnection's processing loop, which waits on
+the socket and hands every complete buffered frame to the handlers in one
+batch.
+
+    python -m benchmarks.bench_wifi_framing --seconds 3 --links 1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import struct
+import time
+from datetime import datetime
+
+from app.communication.protocols.base_connection import TelemetryMessage
+from app.communication.protocols.wifi_connection import WiFiConnection, WiFiConnectionConfig
+from app.communication.protocols.wire_codec import BINARY_CODEC, WireCodec
+
+
+def telemetry_frames(count):
+    codec = WireCodec("binary", delta=True)
+    frames = []
+    for i in range(count):
+        data = codec.encode(TelemetryMessage(
+            message_id=f"tel-{i}", drone_id="drone-1", timestamp=datetime(2025, 5, 1),
+            position={"lat": 37.0 + i * 1e-6, "lon": -122.0, "alt": 50.0 + i % 7},
+            battery_level=90.0 - i * 1e-4, speed=12.0, heading=90.0,
+        ))
+        frames.append(struct.pack("!I", len(data)) + data)
+    return b"".join(frames)
+
+
+async def fake_drone(reader, writer, chunk):
+    (length,) = struct.unpack("!I", await reader.readexactly(4))
+    await reader.readexactly(length)
+    reply = json.dumps({"status": "accepted", "codec": BINARY_CODEC}).encode()
+    writer.write(struct.pack("!I", len(reply)) + reply)
+    try:
+        while True:
+            writer.write(chunk)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        writer.close()
+
+
+async def previous_loop(connection, counter, stop):
+    """The receive path before framing: one frame per iteration plus a 10 ms sleep"""
+    reader = connection.reader
+    while not stop.is_set():
+        header = await reader.read(4)
+        if len(header) == 4:
+            data = await reader.read(struct.unpack("!I", header)[0])
+            if connection._deserialize_message(data):
+                counter[0] += 1
+        await asyncio.sleep(0.01)
+
+
+async def run(mode, port, seconds):
+    connection = WiFiConnection("drone-1", WiFiConnectionConfig(host="127.0.0.1", port=port, protocol="tcp"))
+    assert await connection.connect()
+    counter, batches = [0], [0]
+
+    async def on_batch(messages):
+        counter[0] += len(messages)
+        batches[0] += 1
+
+    stop = asyncio.Event()
+    if mode == "previous":
+        task = asyncio.create_task(previous_loop(connection, counter, stop))
+    else:
+        connection.register_message_batch_callback(on_batch)
+        await connection.start()
+    start = time.perf_counter()
+    await asyncio.sleep(seconds)
+    elapsed = time.perf_counter() - start
+    received = counter[0]
+    if mode == "previous":
+        stop.set()
+        task.cancel()
+        await connection.disconnect()
+    else:
+        await connection.stop()
+    return received / elapsed, received / max(batches[0], 1) if mode == "framed" else 1.0
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    chunk = telemetry_frames(1000)
+    server = await asyncio.start_server(lambda r, w: fake_drone(r, w, chunk), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        for mode in ("previous", "framed"):
+            results = await asyncio.gather(*(run(mode, port, args.seconds) for _ in range(args.links)))
+            rate = sum(r[0] for r in results) / args.links
+            batch = sum(r[1] for r in results) / args.links
+            print(f"{mode:>9}: {rate:12,.0f} frames/s per link ({args.links} link(s)), "
+                  f"{batch:7.1f} frames per handler batch")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--links", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,107 @@
+"""
+Wire codec benchmark: encode/decode ns and bytes per message by wire format.
+
+A stream of telemetry frames from several drones (position, altitude and
+battery change every frame; the other sensors drift slowly) and a stream of
+commands are encoded and decoded with each format. "json" is the format the
+WiFi and WebSocket connections sent before (ISO timestamps, full keys),
+"lora-json" the shortened LoRa one; "binary" sends keyframes only and
+"binary+delta" adds per-drone delta frames (keyframe every 20 frames, or 5
+as configured for LoRa and UDP).
+
+    python -m benchmarks.bench_wire_codec --messages 20000
+"""
+import argparse
+import logging
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app.communication.protocols.base_connection import CommandMessage, TelemetryMessage
+from app.communication.protocols.wire_codec import LORA_JSON, WireCodec
+
+FORMATS = {
+    "json": lambda: WireCodec("json"),
+    "lora-json": lambda: WireCodec("json", dialect=LORA_JSON),
+    "binary": lambda: WireCodec("binary"),
+    "binary+delta": lambda: WireCodec("binary", delta=True, keyframe_interval=20),
+    "binary+delta/5": lambda: WireCodec("binary", delta=True, keyframe_interval=5),
+}
+
+
+def telemetry_stream(count, drones, rng):
+    start = datetime(2025, 5, 1, 12)
+    messages = []
+    for i in range(count):
+        drone = i % drones
+        t = i // drones
+        messages.append(TelemetryMessage(
+            message_id=f"tel_{drone}_{t}",
+            drone_id=f"drone_{drone:02d}",
+            timestamp=start + timedelta(seconds=t * 0.2),
+            position={"lat": 37.77 + 1e-5 * t + drone * 1e-3, "lon": -122.42 + 1e-5 * t * math.cos(drone),
+                      "alt": 80.0 + rng.uniform(-0.5, 0.5)},
+            battery_level=round(100 - t * 0.01, 2),
+            speed=12.0,
+            heading=float(90 * (drone % 4)),
+            signal_strength=float(-60 - (t // 50) % 5),
+            gps_accuracy=1.5,
+            temperature=18.0 + (t // 100) * 0.5,
+            humidity=55.0,
+            wind_speed=4.0,
+        ))
+    return messages
+
+
+def command_stream(count, rng):
+    commands = ["goto", "return_to_home", "adjust_altitude", "investigate_discovery", "hover"]
+    return [
+        CommandMessage(
+            message_id=str(uuid.UUID(int=rng.getrandbits(128))),
+            drone_id=f"drone_{i % 10:02d}",
+            timestamp=datetime(2025, 5, 1, 12) + timedelta(seconds=i),
+            command_type=rng.choice(commands),
+            parameters={"lat": round(37.77 + rng.random() / 100, 6), "lon": round(-122.42 + rng.random() / 100, 6),
+                        "altitude": rng.choice([40, 60, 80])},
+            priority=rng.choice([1, 2, 3]),
+            response_required=True,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(make_codec, messages):
+    sender, receiver = make_codec(), make_codec()
+    start = time.perf_counter_ns()
+    frames = [sender.encode(message) for message in messages]
+    encode_ns = (time.perf_counter_ns() - start) / len(messages)
+    start = time.perf_counter_ns()
+    decoded = [receiver.decode(frame) for frame in frames]
+    decode_ns = (time.perf_counter_ns() - start) / len(messages)
+    assert all(message is not None for message in decoded)
+    return encode_ns, decode_ns, sum(map(len, frames)) / len(frames)
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    rng = random.Random(0)
+    streams = {
+        "telemetry": telemetry_stream(args.messages, args.drones, rng),
+        "command": command_stream(args.messages, rng),
+    }
+    print(f"{'stream':>10} {'format':>15} {'encode ns':>10} {'decode ns':>10} {'bytes/msg':>10}")
+    for stream, messages in streams.items():
+        for name, make_codec in FORMATS.items():
+            if stream == "command" and "delta" in name:
+                continue  # deltas apply to telemetry only
+            encode_ns, decode_ns, size = measure(make_codec, messages)
+            print(f"{stream:>10} {name:>15} {encode_ns:10,.0f} {decode_ns:10,.0f} {size:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--drones", type=int, default=10)
+    main(parser.parse_args())
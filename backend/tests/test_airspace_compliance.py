@@ -0,0 +1,104 @@
+# backend/tests/test_airspace_compliance.py
+import numpy as np
+import pytest
+
+from app.services import airspace
+from app.services.airspace import Geofence, GeofenceIndex, geofences_from_geojson
+from app.services.area_calculator import AreaCalculator
+from app.services.regulatory_compliance import (
+    ComplianceLevel,
+    Jurisdiction,
+    RegulatoryComplianceService,
+)
+
+
+def square(lat, lng, half):
+    return [(lat - half, lng - half), (lat - half, lng + half), (lat + half, lng + half), (lat + half, lng - half)]
+
+
+def random_fences(count, seed=0):
+    rng = np.random.default_rng(seed)
+    fences = []
+    for k in range(count):
+        lat, lng = rng.uniform([30, -110], [45, -80])
+        angles = np.sort(rng.uniform(0, 2 * np.pi, rng.integers(4, 10)))
+        radius = rng.uniform(0.01, 0.2, len(angles))
+        polygon = list(zip(lat + radius * np.sin(angles), lng + radius * np.cos(angles)))
+        fences.append(Geofence(str(k), f"zone {k}", polygon, floor_m=0.0, ceiling_m=60.0 if k % 3 else 500.0))
+    return fences
+
+
+@pytest.mark.timeout(180)
+def test_rtree_fallback_matches_shapely(monkeypatch):
+    fences = random_fences(3000)
+    rng = np.random.default_rng(1)
+    lats, lngs = rng.uniform(30, 45, 5000), rng.uniform(-110, -80, 5000)
+    alts = rng.uniform(0, 120, 5000)
+
+    results = []
+    for available in (True, False):
+        monkeypatch.setattr(airspace, "SHAPELY_AVAILABLE", available)
+        index = GeofenceIndex(fences)
+        points, hits = index.query_points(lats, lngs, altitudes=alts)
+        area = [f.fence_id for f in index.query_polygon(square(37.5, -95.0, 1.0))]
+        results.append((set(zip(points.tolist(), hits.tolist())), area))
+
+    assert results[0] == results[1]
+    assert len(results[0][0]) > 0 and len(results[0][1]) > 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_batch_compliance_matches_scalar_and_bounds_history():
+    service = RegulatoryComplianceService(history_size=20)
+    service.load_geofences(geofences_from_geojson({
+        "type": "FeatureCollection",
+        "features": [{
+            "type": "Feature",
+            "properties": {"id": "kord", "name": "O'Hare", "type": "no_fly_zone", "ceiling_m": 120},
+            "geometry": {"type": "Polygon", "coordinates": [[
+                [-88.0, 41.9], [-87.8, 41.9], [-87.8, 42.1], [-88.0, 42.1], [-88.0, 41.9],
+            ]]},
+        }],
+    }))
+
+    locations = [(42.0, -87.9, 50.0), (42.0, -87.9, 200.0), (50.0, 10.0, 100.0), (0.0, 0.0, 10.0)]
+    speeds = np.array([10.0, 110.0, 70.0, 10.0])
+    batch = await service.check_compliance_batch("m1", ["a", "b", "c", "d"], locations,
+                                                 {"speed_mph": speeds, "wind_speed_mph": 5.0},
+                                                 include_compliant=True)
+
+    for i, drone_id in enumerate("abcd"):
+        scalar = await service.check_compliance("m1", drone_id, locations[i],
+                                                {"speed_mph": speeds[i], "wind_speed_mph": 5.0})
+        batched = [c for c in batch.checks if c.drone_id == drone_id]
+        assert [(c.rule.rule_id, c.result, c.violation_details) for c in scalar] == \
+            [(c.rule.rule_id, c.result, c.violation_details) for c in batched]
+
+    violations = {(c.drone_id, c.rule.rule_id) for c in batch.checks if c.result == ComplianceLevel.NON_COMPLIANT}
+    assert violations == {
+        ("a", "airspace_no_fly_zone"),  # inside the fence, below its ceiling
+        ("b", "faa_altitude_400ft"), ("b", "faa_speed_100mph"),
+        ("c", "easa_speed_60mph"),
+    }
+    assert set(batch.jurisdictions) == {Jurisdiction.USA_FAA, Jurisdiction.EU_EASA, Jurisdiction.UNKNOWN}
+
+    assert service.compliance_history.written == 34  # 17 checks per pass, kept in a 20-row ring
+    summary = service.get_compliance_summary("m1")
+    assert summary["total_checks"] == 20
+    assert set(summary["jurisdictions"]) <= {"usa_faa", "eu_easa"}
+
+
+@pytest.mark.timeout(180)
+def test_validate_search_area_uses_polygons():
+    area = AreaCalculator.calculate_area_bounds(40.0, -100.0, 4.0)
+    # Bounding box overlaps, the triangle itself does not
+    triangle = [(40.01, -99.97), (40.03, -99.97), (40.03, -99.99)]
+    bounds = {"north": 40.03, "south": 40.01, "east": -99.97, "west": -99.99}
+    assert "Search area overlaps with Wedge" in AreaCalculator.validate_search_area(
+        area, [{"type": "no_fly_zone", "name": "Wedge", "bounds": bounds}])
+    assert not any("Wedge" in w for w in AreaCalculator.validate_search_area(
+        area, [{"type": "no_fly_zone", "name": "Wedge", "polygon": triangle}]))
+
+    index = GeofenceIndex([Geofence("nfz", "Dam", square(40.0, -100.0, 0.001))])
+    assert "Search area overlaps with Dam" in AreaCalculator.validate_search_area(area, [], geofences=index)
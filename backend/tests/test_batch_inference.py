@@ -0,0 +1,67 @@
+# backend/tests/test_batch_inference.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.ai.batch_inference import MicroBatcher, encode_column
+from app.ai.model_registry import ModelRegistry
+from app.ai.real_ml_models import MissionFeatures, RealMLModels
+
+
+def mission(k):
+    return MissionFeatures(
+        mission_type=["search", "rescue", "recovery"][k % 3],
+        terrain_type=["forest", "mountain", "urban", "water"][k % 4],
+        weather_condition=["clear", "rainy", "foggy"][k % 3],
+        area_size=5.0 + 3 * k, duration_hours=2.0 + k % 5, num_drones=1 + k % 8, target_urgency=1 + k % 5,
+        time_of_day=k % 24, season=k % 4, wind_speed=float(k % 40), visibility=1.0 + k % 30,
+        temperature=-5.0 + k % 35, humidity=30.0 + k % 60, battery_reserve=30.0 + k % 70,
+        communication_range=2.0 + k % 20, search_density=["low", "medium", "high"][k % 3],
+        search_pattern=["grid", "spiral", "sector", "lawnmower"][k % 4], altitude=40 + k % 80, speed=3.0 + k % 10,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_micro_batcher_coalesces_and_propagates_errors():
+    batches = []
+
+    def square(rows):
+        batches.append(len(rows))
+        if any(row < 0 for row in rows):
+            raise ValueError("negative input")
+        return [row * row for row in rows]
+
+    batcher = MicroBatcher(square, max_batch_size=16, max_wait_ms=20.0)
+    results = await batcher.submit_many(list(range(40)))
+    assert results == [k * k for k in range(40)]
+    assert batches == [16, 16, 8]
+    assert batcher.get_stats()["mean_batch"] == pytest.approx(40 / 3)
+
+    ok, bad = await asyncio.gather(batcher.submit(3), batcher.submit(-1), return_exceptions=True)
+    assert isinstance(ok, ValueError) and isinstance(bad, ValueError)  # shared batch, shared failure
+    assert await batcher.submit(5) == 25
+    await batcher.close()
+
+    codes = encode_column(["b", "z", "a"], np.array(["a", "b"]))
+    assert codes.tolist() == [1.0, 0.0, 0.0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_batched_predictions_match_single_row(tmp_path):
+    models = RealMLModels(registry=ModelRegistry(str(tmp_path)))
+    await models.initialize()
+    missions = [mission(k) for k in range(64)]
+
+    batched = await models.predict_mission_outcomes(missions)
+    stats = models.get_inference_stats()
+    assert stats["requests"] == 64 and stats["batches"] < 64
+
+    for features, prediction in zip(missions[:8], batched[:8]):
+        single = await models.predict_mission_outcome(features)
+        assert prediction.confidence == single.confidence == 0.8
+        assert prediction.estimated_duration == pytest.approx(single.estimated_duration)
+        for outcome, probability in single.outcome_probability.items():
+            assert prediction.outcome_probability[outcome] == pytest.approx(probability)
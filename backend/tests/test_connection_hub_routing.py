@@ -0,0 +1,155 @@
+# backend/tests/test_connection_hub_routing.py
+from datetime import datetime
+
+import pytest
+
+from app.communication.drone_connection_hub import DroneConnectionHub
+from app.communication.drone_registry import (
+    DroneCapabilities, DroneConnectionType, DroneInfo, DroneRegistry, DroneStatus,
+)
+from app.communication.protocols.base_connection import (
+    BaseConnection, ConnectionConfig, ConnectionStatus, TelemetryMessage,
+)
+from app.communication.protocols.wire_codec import WireCodec
+
+
+class FakeLink(BaseConnection):
+    """In-memory link that encodes what it sends with a real codec"""
+
+    def __init__(self, connection_id, config):
+        super().__init__(connection_id, config)
+        self.codec = WireCodec("binary")
+        self.sent = []
+        self.fail = False
+
+    async def connect(self):
+        self.status = ConnectionStatus.CONNECTED
+        return True
+
+    async def disconnect(self):
+        self.status = ConnectionStatus.DISCONNECTED
+        return True
+
+    async def send_message(self, message):
+        if self.fail:
+            return False
+        self.codec.encode(message)
+        self.sent.append(message)
+        return True
+
+    async def receive_message(self):
+        return None
+
+
+def _drone(drone_id, connection_type, **params):
+    capabilities = DroneCapabilities(30, 15.0, 120.0, 0.5, "4K", True, True, False, True, True, 5000.0, 5000.0, [])
+    return DroneInfo(
+        drone_id=drone_id, name=drone_id, model="x", manufacturer="y", firmware_version="1",
+        serial_number=drone_id, capabilities=capabilities, connection_type=connection_type,
+        connection_params={"host": "127.0.0.1", "port": 1, **params}, status=DroneStatus.DISCONNECTED,
+        last_seen=datetime.utcnow(), battery_level=100.0, position={"lat": 0.0, "lon": 0.0, "alt": 0.0},
+        heading=0.0, speed=0.0, signal_strength=0.0,
+    )
+
+
+def _hub(tmp_path):
+    hub = DroneConnectionHub()
+    hub.registry = DroneRegistry(persist_path=str(tmp_path / "registry.json"))
+    hub.links = {}
+
+    async def create_connection(drone_info):
+        link = FakeLink(drone_info.drone_id, ConnectionConfig(host="127.0.0.1", port=1))
+        hub.links[f"{drone_info.drone_id}_{drone_info.connection_type.value}"] = link
+        return link
+
+    hub._create_connection = create_connection
+    return hub
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_routing_is_exact_not_prefix(tmp_path):
+    hub = _hub(tmp_path)
+    for drone_id in ("drone10", "drone1"):
+        assert await hub.connect_drone(_drone(drone_id, DroneConnectionType.WIFI))
+
+    assert await hub.send_command("drone1", "hover", {})
+    assert [m.drone_id for m in hub.links["drone1_wifi"].sent] == ["drone1"]
+    assert hub.links["drone10_wifi"].sent == []
+    assert await hub.send_command("drone2", "hover", {}) is False
+    await hub.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_redundant_links_prefer_wifi_and_fail_over(tmp_path):
+    hub = _hub(tmp_path)
+    assert hub.registry.register_drone(_drone("d1", DroneConnectionType.LORA))
+    assert await hub.connect_drone(_drone("d1", DroneConnectionType.LORA))
+    assert await hub.connect_drone(_drone("d1", DroneConnectionType.WIFI))
+    wifi, lora = hub.links["d1_wifi"], hub.links["d1_lora"]
+    assert hub.get_connection_ids("d1") == ["d1_wifi", "d1_lora"]
+
+    assert await hub.send_command("d1", "goto", {"lat": 1.0})
+    assert len(wifi.sent) == 1 and lora.sent == []
+
+    # The preferred link rejects the send: the command goes out over LoRa
+    wifi.fail = True
+    assert await hub.send_command("d1", "goto", {"lat": 2.0})
+    assert len(lora.sent) == 1 and hub.failovers == 1
+    assert hub.connection_metrics["d1_wifi"].send_failures == 1
+
+    # The preferred link drops: routing moves to LoRa and the drone stays connected
+    wifi.status = ConnectionStatus.DISCONNECTED
+    await hub._handle_link_status_change("d1_wifi", "d1", ConnectionStatus.DISCONNECTED)
+    assert hub.get_connection_status("d1")["active_link"] == "d1_lora"
+    assert hub.registry.get_drone("d1").status != DroneStatus.DISCONNECTED
+
+    # Exact byte counts come from the link's codec
+    assert hub.get_connection_status("d1")["links"]["d1_lora"]["metrics"]["bytes_sent"] == \
+        lora.codec.stats["bytes_encoded"] > 0
+
+    assert await hub.disconnect_drone("d1_lora")
+    assert hub.get_connection_ids("d1") == ["d1_wifi"]
+    assert await hub.disconnect_drone("d1_wifi")
+    assert hub.drone_links == {} and hub.connection_drones == {}
+    assert hub.registry.get_drone("d1").status == DroneStatus.DISCONNECTED
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_monitor_reopens_the_link_that_dropped(tmp_path):
+    hub = _hub(tmp_path)
+    hub.reconnect_delay = 0
+    # The registry only knows the primary link
+    assert hub.registry.register_drone(_drone("d1", DroneConnectionType.WIFI))
+    assert await hub.connect_drone(_drone("d1", DroneConnectionType.WIFI))
+    assert await hub.connect_drone(_drone("d1", DroneConnectionType.LORA))
+    dropped = hub.links["d1_lora"]
+
+    dropped.status = ConnectionStatus.DISCONNECTED
+    await hub._reconnect_lost_links()
+    assert hub.get_connection_ids("d1") == ["d1_wifi", "d1_lora"]
+    assert hub.links["d1_lora"] is not dropped and hub.connections["d1_lora"].status == ConnectionStatus.CONNECTED
+    assert hub.connection_drones["d1_lora"].connection_type == DroneConnectionType.LORA
+    await hub.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_telemetry_counts_decoded_bytes_on_its_link(tmp_path):
+    hub = _hub(tmp_path)
+    assert hub.registry.register_drone(_drone("d1", DroneConnectionType.WIFI))
+    assert await hub.connect_drone(_drone("d1", DroneConnectionType.WIFI))
+    link = hub.links["d1_wifi"]
+
+    frame = WireCodec("binary").encode(TelemetryMessage(
+        message_id="t1", drone_id="d1", timestamp=datetime.utcnow(),
+        position={"lat": 37.0, "lon": -122.0, "alt": 40.0}, battery_level=77.0,
+    ))
+    await link._handle_messages([link.codec.decode(frame)])
+
+    metrics = hub.connection_metrics["d1_wifi"]
+    assert metrics.messages_received == 1 and metrics.bytes_received == len(frame)
+    assert hub.registry.get_drone("d1").battery_level == 77.0
+    await hub.stop()
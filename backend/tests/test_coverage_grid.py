@@ -0,0 +1,114 @@
+# backend/tests/test_coverage_grid.py
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services.coverage_grid import CoverageGrid, polygon_from_search_area
+from app.services.drone_manager import TelemetryData, drone_manager
+from app.services.mission_execution import ExecutionPhase, MissionExecution, MissionExecutionService
+
+M = 111320.0
+
+
+def _dense_inside(grid, polygon):
+    """Brute-force even-odd test of every cell centre"""
+    rows, cols = np.mgrid[0:grid.rows, 0:grid.cols] + 0.5
+    ys, xs = grid._to_cells([p[0] for p in polygon], [p[1] for p in polygon])
+    ys, xs = np.append(ys, ys[0]), np.append(xs, xs[0])
+    y, x = rows.ravel()[:, None], cols.ravel()[:, None]
+    straddles = (ys[:-1] > y) != (ys[1:] > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = xs[:-1] + (y - ys[:-1]) * (xs[1:] - xs[:-1]) / (ys[1:] - ys[:-1])
+    return (np.count_nonzero(straddles & (x < crossing), axis=1) % 2 == 1).reshape(grid.rows, grid.cols), rows, cols
+
+
+@pytest.mark.timeout(180)
+def test_polygon_and_footprint_counts_are_exact():
+    rng = np.random.default_rng(3)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, 15))
+    radii = rng.uniform(150, 400, 15)
+    polygon = [(r * math.sin(a) / M, r * math.cos(a) / M) for a, r in zip(angles, radii)]
+    grid = CoverageGrid(polygon, resolution_m=2.0, tile_m=20)
+    inside, rows, cols = _dense_inside(grid, polygon)
+    assert grid.area_cells == inside.sum()
+
+    lats, lngs = rng.uniform(-400, 400, 200) / M, rng.uniform(-400, 400, 200) / M
+    altitudes = rng.uniform(10, 60, 200)
+    new = grid.stamp_telemetry(lats, lngs, altitudes)
+
+    covered = np.zeros_like(inside)
+    ys, xs = grid._to_cells(lats, lngs)
+    for y, x, altitude in zip(np.floor(ys), np.floor(xs), altitudes):
+        radius = round(altitude * math.tan(math.radians(30)) / 2.0)
+        covered |= (rows - 0.5 - y) ** 2 + (cols - 0.5 - x) ** 2 <= radius * radius
+    assert new == grid.covered_cells == (covered & inside).sum()
+    assert grid.coverage_percent == pytest.approx(100 * (covered & inside).sum() / inside.sum())
+    # Stamping the same footprints again adds nothing
+    assert grid.stamp_telemetry(lats, lngs, altitudes) == 0
+    # Only tiles under footprints are allocated
+    assert grid.get_stats()["tiles_allocated"] < grid.tile_rows * grid.tile_cols
+
+
+@pytest.mark.timeout(180)
+def test_gaps_point_at_the_unflown_part():
+    # 1 km x 200 m strip; the western 600 m is flown in two passes
+    bounds = {"south": 0.0, "north": 200 / M, "west": 0.0, "east": 1000 / M}
+    grid = CoverageGrid(polygon_from_search_area(bounds), resolution_m=1.0)
+    for y in (50, 150):
+        grid.stamp_track([y / M, y / M], [0.0, 600 / M], radius_m=55)
+    # 600 m of swath plus the footprints' round ends past x = 600 m
+    caps = 2 * (math.pi * 55 ** 2 / 2) / (1000 * 200) * 100
+    assert grid.coverage_percent == pytest.approx(60 + caps, abs=1)
+
+    gaps = grid.find_gaps()
+    assert len(gaps) == 1
+    gap = gaps[0]
+    assert gap["uncovered_area_m2"] == pytest.approx(grid.area_cells - grid.covered_cells, rel=0.05)
+    assert 750 < gap["center"]["lng"] * M < 850
+    assert gap["bounds"]["west"] * M >= 590 and gap["bounds"]["east"] * M == pytest.approx(1000, abs=1)
+
+
+@pytest.mark.timeout(180)
+def test_search_area_formats():
+    ring = [(1.0, 2.0), (1.0, 3.0), (2.0, 3.0)]
+    geojson = {"type": "Polygon", "coordinates": [[[2.0, 1.0], [3.0, 1.0], [3.0, 2.0], [2.0, 1.0]]]}
+    assert polygon_from_search_area(geojson)[:3] == ring
+    assert polygon_from_search_area({"type": "Feature", "geometry": geojson})[:3] == ring
+    assert polygon_from_search_area({"coordinates": [[list(p) for p in ring]]}) == ring
+    assert polygon_from_search_area([{"lat": 1.0, "lng": 2.0}, {"lat": 1.0, "lon": 3.0}, {"lat": 2.0, "lng": 3.0}]) == ring
+    assert polygon_from_search_area(None) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_mission_progress_comes_from_telemetry_footprints():
+    service = MissionExecutionService()
+    grid = CoverageGrid.from_bounds({"south": 0.0, "north": 100 / M, "west": 0.0, "east": 400 / M})
+    execution = MissionExecution(mission_id="m1", phase=ExecutionPhase.SEARCH, coverage=grid, search_altitude=40.0)
+    service.active_executions["m1"] = execution
+
+    await service.start()  # coverage is fed by the service's own TELEMETRY subscription
+    try:
+        for drone_id, lng in (("d1", 50), ("d2", 250)):
+            await drone_manager.register_drone(drone_id, {})
+            drone_manager.mission_assignments[drone_id] = "m1"
+            for step in range(10):
+                await drone_manager.update_telemetry(drone_id, TelemetryData(
+                    drone_id=drone_id, timestamp=datetime.utcnow(),
+                    position={"lat": 50 / M, "lon": (lng + step * 10) / M},  # no altitude: mission altitude
+                    battery_level=90.0, speed=10.0, heading=90.0, signal_strength=1.0, gps_accuracy=1.0,
+                ))
+        assert len(execution.pending_telemetry) == 20
+
+        status = await service.get_execution_status("m1")
+        assert execution.pending_telemetry == []
+        assert 0 < status["overall_coverage"] < 100
+        assert sum(status["search_progress"].values()) == pytest.approx(status["overall_coverage"])
+        assert status["search_progress"]["d1"] == pytest.approx(status["search_progress"]["d2"], rel=0.05)
+        assert service.get_coverage_gaps("m1")
+    finally:
+        await service.stop()
+        for drone_id in ("d1", "d2"):
+            await drone_manager.unregister_drone(drone_id)
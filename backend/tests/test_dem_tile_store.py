@@ -0,0 +1,97 @@
+# backend/tests/test_dem_tile_store.py
+import os
+
+import numpy as np
+import pytest
+
+from app.services.dem_tile_store import DEMTileStore, ingest_array, ingest_ascii_grid
+from app.services.terrain_optimization import (
+    TerrainOptimizationEngine,
+    SearchZone,
+    TerrainType,
+    TERRAIN_TYPE_CODES,
+)
+
+ORIGIN_LAT, ORIGIN_LNG, CELL = 37.5, -122.0, 0.001
+
+
+def synthetic_dem(rows=300, cols=260):
+    # Flat plain in the west, steep ridge in the east
+    y, x = np.mgrid[0:rows, 0:cols].astype(np.float32)
+    return np.where(x < cols / 2, 100.0, 100.0 + (x - cols / 2) * 60.0).astype(np.float32) + y * 0.1
+
+
+@pytest.mark.timeout(180)
+def test_ingest_sample_and_zero_copy_window(temp_dir):
+    elevation = synthetic_dem()
+    store = ingest_array(elevation, os.path.join(temp_dir, "dem"), ORIGIN_LAT, ORIGIN_LNG, CELL, tile_size=64)
+
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, elevation.shape[0], 5000)
+    cols = rng.integers(0, elevation.shape[1], 5000)
+    lats = ORIGIN_LAT - (rows + 0.5) * CELL
+    lngs = ORIGIN_LNG + (cols + 0.5) * CELL
+    np.testing.assert_allclose(store.sample(lats, lngs), elevation[rows, cols])
+
+    # Outside the raster -> NaN
+    assert np.isnan(store.sample([ORIGIN_LAT + 1.0], [ORIGIN_LNG])).all()
+
+    inside = store.window("elevation", 10, 10, 20, 20)
+    assert isinstance(inside.base, np.memmap) or isinstance(inside, np.memmap)
+    np.testing.assert_allclose(inside, elevation[10:30, 10:30])
+    spanning = store.window("elevation", 50, 50, 40, 40)
+    np.testing.assert_allclose(spanning, elevation[50:90, 50:90])
+
+    slope = store.window("slope", 100, 0, 10, 100)
+    ridge = store.window("slope", 100, 140, 10, 100)
+    assert np.nanmax(slope) < 1.0 and np.nanmin(ridge) > 5.0
+
+    # Overview pixel is the mean of its 2x2 children
+    assert len(store.manifest.levels) > 1
+    np.testing.assert_allclose(store.window("elevation", 3, 4, 1, 1, level=1)[0, 0],
+                               elevation[6:8, 8:10].mean(), rtol=1e-5)
+
+    # Reopening reads the same data and the LRU stays bounded
+    reopened = DEMTileStore(store.root, max_open_tiles=4)
+    np.testing.assert_allclose(reopened.sample(lats, lngs), elevation[rows, cols])
+    assert reopened.get_stats()["open_tiles"] <= 4
+
+
+@pytest.mark.timeout(180)
+def test_ascii_grid_matches_array_ingest(temp_dir):
+    elevation = synthetic_dem(70, 90)
+    elevation[5, 5] = -9999
+    path = os.path.join(temp_dir, "dem.asc")
+    with open(path, "w") as f:
+        f.write(f"ncols {elevation.shape[1]}\nnrows {elevation.shape[0]}\n")
+        f.write(f"xllcorner {ORIGIN_LNG}\nyllcorner {ORIGIN_LAT - elevation.shape[0] * CELL}\n")
+        f.write(f"cellsize {CELL}\nNODATA_value -9999\n")
+        np.savetxt(f, elevation, fmt="%.3f")
+
+    store = ingest_ascii_grid(path, os.path.join(temp_dir, "asc"), tile_size=32)
+    grid = store.window("elevation", 0, 0, elevation.shape[0], elevation.shape[1])
+    assert np.isnan(grid[5, 5])
+    elevation[5, 5] = np.nan
+    np.testing.assert_allclose(grid, elevation, rtol=1e-5)
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_terrain_engine_uses_dem(temp_dir):
+    elevation = synthetic_dem()
+    store = ingest_array(elevation, os.path.join(temp_dir, "dem"), ORIGIN_LAT, ORIGIN_LNG, CELL, tile_size=64)
+    engine = TerrainOptimizationEngine(cell_size_km=0.05, dem_store=store)
+    zone = SearchZone(
+        zone_id="dem", bounds={"north": 37.49, "south": 37.22, "east": -121.75, "west": -121.99},
+        center_lat=37.355, center_lng=-121.87, area_km2=630.0, terrain_data=[],
+        priority_areas=[], obstacles=[], accessibility_constraints=[],
+    )
+    result = await engine.optimize_coverage(zone, drone_count=1)
+
+    cells = result.coverage_cells
+    west = cells[cells["center_lng"] < ORIGIN_LNG + 0.1]
+    east = cells[cells["center_lng"] > ORIGIN_LNG + 0.15]
+    assert np.all(west["terrain_type"] == TERRAIN_TYPE_CODES[TerrainType.FLAT])
+    assert np.all(east["terrain_type"] == TERRAIN_TYPE_CODES[TerrainType.MOUNTAINOUS])
+    assert east["elevation_m"].mean() > west["elevation_m"].mean() + 500
+    assert np.all(cells["optimal_altitude_m"] >= cells["elevation_m"] + 50 - 1e-3)
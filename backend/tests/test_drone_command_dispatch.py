@@ -0,0 +1,141 @@
+# backend/tests/test_drone_command_dispatch.py
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.drone import DroneStatus
+from app.services.command_dispatcher import CommandDispatcher
+from app.services.drone_manager import DroneCommand, DroneCommandType, DroneManager
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_emergencies_jump_the_fleet_and_stale_commands_are_superseded():
+    sent = []
+
+    async def sender(command):
+        sent.append((command.drone_id, command.command_type, (command.parameters or {}).get("alt")))
+        return True
+
+    dispatcher = CommandDispatcher(sender, concurrency=1, rate_limit=0)
+    for i in range(50):
+        dispatcher.submit(DroneCommand(f"d{i}", DroneCommandType.CHANGE_HEADING))
+    # Two altitude updates for d0: only the newer one goes out
+    first = dispatcher.submit(DroneCommand("d0", DroneCommandType.UPDATE_ALTITUDE, {"alt": 40}))
+    dispatcher.submit(DroneCommand("d0", DroneCommandType.UPDATE_ALTITUDE, {"alt": 60}))
+    dispatcher.submit(DroneCommand("d49", DroneCommandType.RETURN_HOME, priority=3))
+    # Already past its deadline: never sent
+    expired = dispatcher.submit(DroneCommand("d7", DroneCommandType.LAND,
+                                             deadline=datetime.utcnow() - timedelta(seconds=1)))
+
+    await dispatcher.start()
+    while dispatcher.records:
+        await asyncio.sleep(0.01)
+    await dispatcher.stop()
+
+    assert sent[0] == ("d49", DroneCommandType.RETURN_HOME, None)
+    assert [s for s in sent if s[1] == DroneCommandType.UPDATE_ALTITUDE] == [("d0", DroneCommandType.UPDATE_ALTITUDE, 60)]
+    assert dispatcher.get_command(first)["state"] == "superseded"
+    assert dispatcher.get_command(expired)["state"] == "expired"
+    metrics = dispatcher.get_metrics()
+    assert metrics["acked"] == 52 and metrics["superseded"] == 1 and metrics["expired"] == 1
+    assert metrics["queue_latency_ms"]["p99"] is not None
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_unacknowledged_commands_are_retried_then_failed():
+    attempts = []
+
+    async def sender(command):
+        attempts.append(command.command_id)
+        return True
+
+    dispatcher = CommandDispatcher(sender, rate_limit=0, ack_timeout=0.05, max_retries=2, retry_backoff=0.02)
+    await dispatcher.start()
+    acked = dispatcher.submit(DroneCommand("d1", DroneCommandType.LAND))
+    lost = dispatcher.submit(DroneCommand("d2", DroneCommandType.LAND))
+    # Routine commands to one drone go one at a time: this waits for d1's ack
+    queued = dispatcher.submit(DroneCommand("d1", DroneCommandType.CHANGE_HEADING))
+    await asyncio.sleep(0.02)
+    assert dispatcher.get_command(queued)["state"] == "queued"
+    assert dispatcher.acknowledge(acked)
+
+    while dispatcher.records:
+        await asyncio.sleep(0.01)
+        for command_id in list(dispatcher.records):
+            if command_id == queued:
+                dispatcher.acknowledge(command_id)
+    await dispatcher.stop()
+
+    assert dispatcher.get_command(acked)["state"] == "acked"
+    assert dispatcher.get_command(acked)["ack_latency_ms"] is not None
+    status = dispatcher.get_command(lost)
+    assert status["state"] == "failed" and status["attempts"] == 3
+    assert attempts.count(lost) == 3 and dispatcher.get_metrics()["retried"] == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_retries_back_off_and_hold_the_drones_later_commands():
+    sent = []
+
+    async def sender(command):
+        sent.append((command.command_type, asyncio.get_running_loop().time()))
+        # Landing fails three times
+        return command.command_type != DroneCommandType.LAND or [s[0] for s in sent].count(DroneCommandType.LAND) > 3
+
+    dispatcher = CommandDispatcher(sender, rate_limit=0, max_retries=3, retry_backoff=0.1, retry_backoff_max=0.15)
+    land = dispatcher.submit(DroneCommand("d1", DroneCommandType.LAND))
+    heading = dispatcher.submit(DroneCommand("d1", DroneCommandType.CHANGE_HEADING))
+    other = dispatcher.submit(DroneCommand("d2", DroneCommandType.CHANGE_HEADING))
+    await dispatcher.start()
+    while dispatcher.records:
+        await asyncio.sleep(0.01)
+    await dispatcher.stop()
+
+    # Other drones are not held up; this drone's next command waits behind the retries
+    assert [s[0] for s in sent] == [DroneCommandType.LAND, DroneCommandType.CHANGE_HEADING] + \
+        [DroneCommandType.LAND] * 3 + [DroneCommandType.CHANGE_HEADING]
+    land_times = [t for command_type, t in sent if command_type == DroneCommandType.LAND]
+    gaps = [b - a for a, b in zip(land_times, land_times[1:])]
+    assert gaps[0] >= 0.09 and gaps[1] >= 0.14 and gaps[2] >= 0.14
+    assert dispatcher.get_command(land)["attempts"] == 4
+    assert all(dispatcher.get_command(c)["state"] == "acked" for c in (land, heading, other))
+
+    # A retry that could only go out after the deadline expires instead
+    dispatcher = CommandDispatcher(lambda command: asyncio.sleep(0, False), rate_limit=0, retry_backoff=1.0)
+    doomed = dispatcher.submit(DroneCommand("d1", DroneCommandType.LAND,
+                                            deadline=datetime.utcnow() + timedelta(seconds=0.5)))
+    await dispatcher.start()
+    while dispatcher.records:
+        await asyncio.sleep(0.01)
+    await dispatcher.stop()
+    status = dispatcher.get_command(doomed)
+    assert status["state"] == "expired" and status["attempts"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_drone_manager_dispatches_concurrently():
+    manager = DroneManager()
+    for i in range(200):
+        await manager.register_drone(f"d{i}", {})
+    await manager.start()
+    try:
+        for i in range(200):
+            assert await manager.send_command(DroneCommand(f"d{i}", DroneCommandType.START_MISSION))
+        assert await manager.emergency_stop_all()
+        # The old loop sent one command per 100 ms; this would take 20 s
+        for _ in range(300):
+            if not manager.command_queue and not manager.dispatcher.records:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await manager.stop()
+
+    assert manager.command_queue == []
+    assert all(drone["status"] == DroneStatus.ERROR for drone in manager.get_all_drones())
+    metrics = manager.get_command_metrics()
+    assert metrics["acked"] == 200 and metrics["cancelled"] == 200
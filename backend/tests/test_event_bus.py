@@ -0,0 +1,97 @@
+# backend/tests/test_event_bus.py
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.core.event_bus import EventBus, Event, event_bus, DISCOVERY_CREATED, DRONE_STATUS, MISSION_STATE
+from app.services.drone_manager import DroneManager
+from app.services.mission_execution import ExecutionPhase, MissionExecution, MissionExecutionService
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_handlers_run_on_publish_and_failures_are_isolated():
+    bus = EventBus()
+    seen, seen_async, everything = [], [], []
+
+    async def slow(event):
+        await asyncio.sleep(0)
+        seen_async.append(event.data)
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe("a", broken)
+    unsubscribe = bus.subscribe("a", lambda event: seen.append(event.data))
+    bus.subscribe("a", slow)
+    bus.subscribe("*", lambda event: everything.append(event.topic))
+
+    event = bus.publish("a", 1, mission_id=7)
+    assert seen == [1] and event.mission_id == "7"
+    await asyncio.sleep(0.01)
+    assert seen_async == [1]
+    assert bus.stats["handler_errors"] == 1
+
+    unsubscribe()
+    bus.publish("a", 2)
+    bus.publish("b", 3)
+    assert seen == [1] and everything == ["a", "a", "b"]
+    assert Event.from_json(event.to_json()).data == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_drone_status_changes_are_published_once():
+    manager = DroneManager()
+    events = []
+    unsubscribe = event_bus.subscribe(DRONE_STATUS, events.append)
+    try:
+        await manager.register_drone("d1", {})
+        await manager.assign_mission("d1", "m1")
+        await manager.assign_mission("d1", "m1")  # already on a mission: no change
+        await manager.unassign_mission("d1")
+    finally:
+        unsubscribe()
+    assert [(e.data["status"], e.mission_id) for e in events] == [("mission", "m1"), ("idle", "m1")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_search_reacts_to_events_without_polling():
+    service = MissionExecutionService()
+    service._subscribe()
+    execution = MissionExecution(mission_id="42", phase=ExecutionPhase.SEARCH, start_time=datetime.utcnow(),
+                                 assigned_drones=["d1", "d2"])
+    service.active_executions["42"] = execution
+    states = []
+    unsubscribe = event_bus.subscribe(MISSION_STATE, states.append)
+    try:
+        # A discovery is recorded as soon as it is published, and only once
+        for _ in range(2):
+            event_bus.publish(DISCOVERY_CREATED, {"id": 5, "discovery_type": "person", "confidence": 0.9},
+                              mission_id=42)
+        assert execution.discoveries == {5}
+        assert execution.status_updates[-1]["details"] == "Found person with 90.0% confidence"
+        assert states[-1].data["update"]["status"] == "Discovery found"
+
+        # The search ends when the last drone stops searching, not at the next poll
+        monitor = asyncio.create_task(service._monitor_search(execution))
+        await asyncio.sleep(0.01)
+        event_bus.publish(DRONE_STATUS, {"status": "returning"}, mission_id=42, drone_id="d1")
+        event_bus.publish(DRONE_STATUS, {"status": "mission"}, mission_id=42, drone_id="d1")
+        event_bus.publish(DRONE_STATUS, {"status": "error"}, mission_id=42, drone_id="d2")
+        await asyncio.sleep(0.01)
+        assert not monitor.done()
+        event_bus.publish(DRONE_STATUS, {"status": "error"}, mission_id=42, drone_id="d1")
+        await asyncio.wait_for(monitor, 0.5)
+        assert execution.lost_drones == {"d1", "d2"}
+
+        # An operator ending the mission elsewhere stops the loop too
+        execution.lost_drones.clear()
+        monitor = asyncio.create_task(service._monitor_search(execution))
+        event_bus.publish(MISSION_STATE, {"status": "completed"}, mission_id=42, source="api")
+        await asyncio.wait_for(monitor, 0.5)
+    finally:
+        unsubscribe()
+        await service.stop()
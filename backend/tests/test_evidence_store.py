@@ -0,0 +1,152 @@
+# backend/tests/test_evidence_store.py
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.api_v1.endpoints import discoveries
+from app.core.database import Base, get_sync_db
+from app.models import Discovery, Drone, EvidenceFile, Mission
+from app.services.evidence_store import EvidenceStore, UploadError, get_evidence_store
+
+PAYLOAD = os.urandom(300000)
+
+
+def _client(tmp_path, store):
+    engine = create_engine(f"sqlite:///{tmp_path}/sar.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with session_factory() as db:
+        db.add(Drone(drone_id="d0", name="d0"))
+        db.add(Mission(mission_id="m0", name="m0"))
+        db.flush()
+        db.add(Discovery(mission_id=1, drone_id=1, latitude=37.0, longitude=-122.0, discovery_type="person",
+                         confidence=0.9))
+        db.commit()
+
+    def override():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(discoveries.router, prefix="/discoveries")
+    app.dependency_overrides[get_sync_db] = override
+    app.dependency_overrides[get_evidence_store] = lambda: store
+    return TestClient(app), session_factory
+
+
+async def _chunks(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.mark.timeout(180)
+@pytest.mark.asyncio
+async def test_streamed_uploads_are_hashed_and_stored_once(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence"), chunk_size=65536, thumbnail_workers=0)
+    first = await store.store_stream(1, "a.bin", None, _chunks(PAYLOAD, 7000))
+    second = await store.store_stream(1, "b.bin", None, _chunks(PAYLOAD, 50000))
+
+    assert first.sha256 == second.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+    assert (first.deduplicated, second.deduplicated) == (False, True)
+    with open(first.path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert store.get_stats()["open_uploads"] == 0
+
+    small = EvidenceStore(str(tmp_path / "small"), chunk_size=65536, max_upload_bytes=100000)
+    with pytest.raises(UploadError) as error:
+        await small.store_stream(1, "big.bin", None, _chunks(PAYLOAD, 65536))
+    assert error.value.status == 413
+    assert os.listdir(tmp_path / "small" / "uploads") == []
+
+
+@pytest.mark.timeout(180)
+@pytest.mark.asyncio
+async def test_upload_resumes_from_disk_after_a_restart(tmp_path):
+    root = str(tmp_path / "evidence")
+    store = EvidenceStore(root, chunk_size=65536)
+    session = store.create_upload(1, "clip.mp4", "video/mp4", len(PAYLOAD))
+    await store.append(session, 0, _chunks(PAYLOAD[:120000], 10000))
+
+    restarted = EvidenceStore(root, chunk_size=65536)
+    resumed = restarted.get_upload(session.upload_id)
+    assert (resumed.offset, resumed.size, resumed.filename) == (120000, len(PAYLOAD), "clip.mp4")
+    with pytest.raises(UploadError) as error:
+        await restarted.append(resumed, 100000, _chunks(PAYLOAD[100000:], 10000))
+    assert error.value.status == 409
+
+    await restarted.append(resumed, 120000, _chunks(PAYLOAD[120000:], 10000))
+    stored = await restarted.finish(resumed)
+    assert stored.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+    assert restarted.stats["resumed"] == 1
+    assert restarted.get_upload(session.upload_id) is None
+
+
+@pytest.mark.timeout(180)
+@pytest.mark.asyncio
+async def test_abandoned_uploads_expire_on_a_timer(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence"), chunk_size=65536, thumbnail_workers=0)
+    stale = store.create_upload(1, "stale.bin", None, len(PAYLOAD))
+    await store.append(stale, 0, _chunks(PAYLOAD[:1000], 1000))
+    fresh = store.create_upload(1, "fresh.bin", None, len(PAYLOAD))
+    assert store._locks == {}  # held only while a request writes
+    day_ago = os.path.getmtime(store._upload_path(stale.upload_id, "part")) - 86400
+    os.utime(store._upload_path(stale.upload_id, "part"), (day_ago, day_ago))
+    # Left behind by a crash: a session whose bytes never made it to disk
+    orphan = store.create_upload(1, "orphan.bin", None)
+    os.remove(store._upload_path(orphan.upload_id, "part"))
+
+    store.start_expiry(max_age_s=3600, interval_s=0.05)
+    for _ in range(100):
+        if store.get_upload(stale.upload_id) is None:
+            break
+        await asyncio.sleep(0.05)
+    assert store.get_upload(stale.upload_id) is None and store.get_upload(fresh.upload_id) is not None
+    assert sorted(os.listdir(tmp_path / "evidence" / "uploads")) == [f"{fresh.upload_id}.json", f"{fresh.upload_id}.part"]
+    assert set(store._hashers) == {fresh.upload_id}
+
+    await store.close()
+    assert store._expiry_task is None
+
+
+@pytest.mark.timeout(180)
+def test_resumable_upload_endpoints_and_ranged_download(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence"), chunk_size=65536, thumbnail_workers=0)
+    client, session_factory = _client(tmp_path, store)
+
+    created = client.post("/discoveries/1/evidence/uploads",
+                          json={"filename": "thermal.png", "content_type": "image/png", "size": len(PAYLOAD)})
+    assert created.status_code == 201
+    upload_id = created.json()["upload_id"]
+    url = f"/discoveries/1/evidence/uploads/{upload_id}"
+
+    part = client.put(url, content=PAYLOAD[:100000], headers={"Content-Range": f"bytes 0-99999/{len(PAYLOAD)}"})
+    assert part.json()["offset"] == 100000
+    # A retry of a range the server already has is refused with the offset to resume from
+    retry = client.put(url, content=PAYLOAD[:100000], headers={"Content-Range": f"bytes 0-99999/{len(PAYLOAD)}"})
+    assert retry.status_code == 409 and retry.headers["Upload-Offset"] == "100000"
+    assert client.get(url).json()["offset"] == 100000
+
+    end = len(PAYLOAD) - 1
+    done = client.put(url, content=PAYLOAD[100000:], headers={"Content-Range": f"bytes 100000-{end}/{len(PAYLOAD)}"})
+    assert done.status_code == 200
+    evidence = done.json()
+    assert evidence["sha256"] == hashlib.sha256(PAYLOAD).hexdigest()
+    assert evidence["file_size"] == len(PAYLOAD) and client.get(url).status_code == 404
+
+    content = client.get(f"/discoveries/evidence/{evidence['id']}/content", headers={"Range": "bytes=1000-1999"})
+    assert content.status_code == 206 and content.content == PAYLOAD[1000:2000]
+
+    # The multipart endpoint streams into the same store, so the same file is kept once
+    again = client.post("/discoveries/1/evidence", files={"file": ("copy.png", PAYLOAD, "image/png")})
+    assert again.json()["deduplicated"] is True
+    with session_factory() as db:
+        rows = db.query(EvidenceFile).all()
+        assert [row.original_filename for row in rows] == ["thermal.png", "copy.png"]
+        assert rows[0].file_path == rows[1].file_path
+        assert db.get(Discovery, 1).image_url == again.json()["content_url"]
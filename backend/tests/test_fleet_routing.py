@@ -0,0 +1,84 @@
+# backend/tests/test_fleet_routing.py
+import math
+
+import numpy as np
+import pytest
+
+from app.services.adaptive_planner import AdaptivePlanner, DroneCapabilities, MissionContext, OptimizationConstraints
+from app.services.fleet_routing import FleetRouter, RoutingDrone
+
+M = 111320.0
+
+
+def _grid(side_m, step_m):
+    ticks = np.arange(0, side_m, step_m)
+    ys, xs = np.meshgrid(ticks, ticks, indexing="ij")
+    return ys.ravel() / M, xs.ravel() / M
+
+
+@pytest.mark.timeout(180)
+def test_battery_limit_forces_return_to_base_sorties():
+    lats, lngs = _grid(2000, 100)
+    router = FleetRouter(lats, lngs)
+    drone = RoutingDrone("d1", 0.0, 0.0, speed_mps=10.0, endurance_s=900.0, first_endurance_s=300.0,
+                         dwell_s=2.0, turnaround_s=120.0)
+    result = router.solve([drone], time_budget_s=0.5)
+
+    route = result.routes[0]
+    assert sorted(route.order.tolist()) == list(range(len(lats)))
+    assert len(route.sorties) > 3
+    assert route.sortie_times_s[0] <= 300.0
+    assert max(route.sortie_times_s) <= 900.0
+    assert route.duration_s == pytest.approx(sum(route.sortie_times_s) + 120.0 * (len(route.sorties) - 1))
+    assert result.makespan_s <= result.construction_makespan_s
+
+
+@pytest.mark.timeout(180)
+def test_faster_drones_take_more_and_beat_equal_chunks():
+    lats, lngs = _grid(3000, 100)
+    drones = [RoutingDrone(f"d{i}", 0.0, i * 1000 / M, speed_mps=speed, endurance_s=1e6, dwell_s=1.0)
+              for i, speed in enumerate((5.0, 10.0, 20.0))]
+    router = FleetRouter(lats, lngs)
+    result = router.solve(drones, time_budget_s=1.0)
+
+    counts = [len(route.order) for route in result.routes]
+    assert sum(counts) == len(lats) and counts[0] < counts[1] < counts[2]
+    times = [route.duration_s for route in result.routes]
+    assert max(times) / min(times) < 1.1
+
+    # Equal-count chunks in list order, as the planner used to assign them
+    router._drones = drones
+    chunks = np.array_split(np.arange(len(lats)), len(drones))
+    baseline = max(router._route(d, chunk).duration_s for d, chunk in enumerate(chunks))
+    assert result.makespan_s < 0.75 * baseline
+
+
+@pytest.mark.timeout(180)
+def test_out_of_range_waypoints_are_reported():
+    lats = np.array([0.0, 0.0, 0.0])
+    lngs = np.array([100, 200, 50000]) / M
+    result = FleetRouter(lats, lngs).solve([RoutingDrone("d1", 0.0, 0.0, 10.0, 600.0)], time_budget_s=0.2)
+    assert result.unassigned.tolist() == [2]
+    assert sorted(result.routes[0].order.tolist()) == [0, 1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_planner_assignments_include_return_to_base_legs():
+    planner = AdaptivePlanner()
+    lats, lngs = _grid(3000, 150)
+    waypoints = [{'lat': 37 + lat, 'lng': -122 + lng / math.cos(math.radians(37)), 'altitude': 50.0,
+                  'type': 'search', 'order': i} for i, (lat, lng) in enumerate(zip(lats, lngs))]
+    drones = [DroneCapabilities(f"d{i}", 10, 120.0, 15.0, 10.0, 100.0 - 40 * i, (1920, 1080), True, False,
+                                "moderate") for i in range(2)]  # based at the area's centre
+    constraints = OptimizationConstraints(min_battery_reserve=20.0)
+    context = MissionContext("m1", "person", 9.0, "rural", "day", {}, "high", drones, constraints)
+
+    assignments = await planner._assign_drones_to_areas(drones, waypoints, context)
+
+    searched = [wp['order'] for a in assignments for wp in a['assigned_waypoints'] if wp['type'] == 'search']
+    assert sorted(searched) == list(range(len(waypoints)))
+    for assignment in assignments:
+        legs = [wp for wp in assignment['assigned_waypoints'] if wp['type'] == 'return_to_base']
+        assert len(legs) == assignment['sorties'] - 1 > 0
+        assert assignment['battery_usage'] <= 100 - constraints.min_battery_reserve + 1e-9
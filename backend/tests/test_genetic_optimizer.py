@@ -0,0 +1,151 @@
+# backend/tests/test_genetic_optimizer.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ai_innovations'))
+
+from real_genetic_optimizer import (  # noqa: E402
+    RealGeneticSearchOptimizer,
+    FitnessEvaluator,
+    SearchEnvironment,
+    SearchPattern,
+    PatternFitnessModel,
+    GeneticOperators,
+    PATTERN_PARAMETERS,
+    PATTERN_TYPES,
+    analytic_pattern_fitness,
+)
+from app.simulator.real_drone_simulator import RealDroneSimulator, DEFAULT_DRONE_PHYSICS  # noqa: E402
+
+
+def environment():
+    return SearchEnvironment(
+        terrain_type="forest",
+        weather_conditions={"visibility": 8000, "wind_speed": 6},
+        search_area_size=2.0,
+        target_type="person",
+        urgency_level=3,
+        num_drones=4,
+        mission_duration=1.0,
+    )
+
+
+@pytest.mark.timeout(180)
+def test_vectorized_fitness_matches_scalar():
+    env = environment()
+    operators = GeneticOperators()
+    codes, genes = operators.random_population(np.random.default_rng(0), 200)
+    batch = PatternFitnessModel(env)(codes, genes)
+    for i in range(0, 200, 17):
+        names = PATTERN_PARAMETERS[PATTERN_TYPES[codes[i]]]
+        pattern = SearchPattern(PATTERN_TYPES[codes[i]], dict(zip(names, genes[i].tolist())))
+        assert analytic_pattern_fitness(pattern, env) == pytest.approx(batch[i])
+    assert np.all((batch >= 0) & (batch <= 1))
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_island_optimizer_is_deterministic_and_stops_early():
+    env = environment()
+    runs = []
+    for workers in (1, 2):
+        optimizer = RealGeneticSearchOptimizer(population_size=30, generations=200)
+        best = await optimizer.optimize_search_pattern_parallel(env, islands=3, seed=42, patience=10,
+                                                               workers=workers)
+        runs.append((best, optimizer.fitness_history))
+
+    (first, history), (second, _) = runs
+    assert first.pattern_type == second.pattern_type
+    assert first.parameters == second.parameters
+    assert first.fitness_score == pytest.approx(second.fitness_score)
+    assert len(history) < 200  # converged before the generation cap
+    assert np.all(np.diff(history) >= 0)
+
+    random_best = PatternFitnessModel(env)(*GeneticOperators().random_population(np.random.default_rng(1), 30)).max()
+    assert first.fitness_score >= random_best
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_fitness_evaluator_memoizes_and_screens():
+    env = environment()
+    calls = []
+
+    async def rollout(pattern, environment):
+        calls.append(pattern)
+        pattern.fitness_score = analytic_pattern_fitness(pattern, environment)
+        return pattern.fitness_score
+
+    evaluator = FitnessEvaluator(rollout, screen_fraction=0.25, min_training_samples=20)
+    grid = SearchPattern("grid", {"spacing": 40.0, "angle": 10.0, "overlap": 0.2})
+    near = SearchPattern("grid", {"spacing": 40.001, "angle": 10.0, "overlap": 0.2})
+    other = SearchPattern("grid", {"spacing": 80.0, "angle": 10.0, "overlap": 0.2})
+    await evaluator.evaluate_population([grid, near, other], env)
+    assert len(calls) == 2 and near.fitness_score == grid.fitness_score
+
+    # Warm up the surrogate on full rollouts, then only the top quarter is simulated
+    operators = GeneticOperators()
+    codes, genes = operators.random_population(np.random.default_rng(3), 60)
+
+    def patterns(codes, genes):
+        return [SearchPattern(PATTERN_TYPES[c], dict(zip(PATTERN_PARAMETERS[PATTERN_TYPES[c]], g.tolist())))
+                for c, g in zip(codes, genes)]
+    evaluator.screen_fraction = 1.0
+    await evaluator.evaluate_population(patterns(codes[:30], genes[:30]), env)
+    evaluator.screen_fraction = 0.25
+    calls.clear()
+    batch = patterns(codes[30:], genes[30:])
+    await evaluator.evaluate_population(batch, env)
+    assert len(calls) == 8 and evaluator.get_stats()["surrogate_screened"] == 22
+
+    # The truly best candidate is among those simulated
+    truth = np.array([analytic_pattern_fitness(p, env) for p in batch])
+    simulated = {id(p) for p in calls}
+    assert truth.max() in [truth[i] for i, p in enumerate(batch) if id(p) in simulated]
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_simulate_mission_uses_simulated_time_budget():
+    simulator = RealDroneSimulator("drone_test", DEFAULT_DRONE_PHYSICS)
+    # A step budget lengthens the step so the whole mission is flown, as a point mass
+    square = [(500.0, 0.0, 50.0), (500.0, 500.0, 50.0), (0.0, 500.0, 50.0), (0.0, 0.0, 50.0)] * 3
+    telemetry = await simulator.simulate_mission(square, duration=600, max_steps=40)
+    assert len(telemetry) == 40 and simulator.flight_time == pytest.approx(600)
+    assert simulator.distance_traveled == pytest.approx(600 * 0.6 * DEFAULT_DRONE_PHYSICS.max_speed, rel=0.01)
+    # The battery is charged once per step, not once per ODE evaluation
+    drained = (100 - simulator.battery_level) / 100 * DEFAULT_DRONE_PHYSICS.battery_capacity
+    assert drained == pytest.approx(sum(t.power_consumption for t in telemetry) * 15 / 3600, rel=0.05)
+    # The rollout ends with the route, however long the mission
+    simulator.reset()
+    telemetry = await simulator.simulate_mission([(500.0, 0.0, 50.0)], duration=3600, max_steps=40)
+    assert len(telemetry) == 1 and telemetry[-1].position.x == pytest.approx(500.0)
+    assert telemetry[-1].flight_time < 90
+
+    simulator.reset()
+    telemetry = await simulator.simulate_mission([(500.0, 0.0, 50.0)], duration=0.1)
+    assert len(telemetry) == 10  # 0.1 s of simulated flight at dt=0.01
+
+    simulator.reset()
+    assert simulator.flight_time == 0.0 and simulator.battery_level == 100.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_rollouts_cover_the_whole_mission_and_separate_patterns():
+    optimizer = RealGeneticSearchOptimizer(population_size=4, generations=1)
+    env = environment()
+    wide = await optimizer.run_simulation(SearchPattern("lawnmower", {"strip_width": 50, "overlap": 0.1}), env)
+    tight = await optimizer.run_simulation(SearchPattern("spiral", {"radius_step": 25, "max_radius": 200}), env)
+    # Flown for minutes of simulated time, not the first seconds
+    assert wide.total_flight_time > 300 and wide.energy_consumed > 10
+    assert wide.coverage_percentage > 2 * tight.coverage_percentage
+    assert tight.total_flight_time < wide.total_flight_time
+    # Many short legs per step (this used to spin on the leftover fraction of a leg)
+    sector = await optimizer.run_simulation(
+        SearchPattern("sector", {"sector_count": 10, "sector_angle": 50.0, "search_radius": 275.0}), env
+    )
+    assert sector.total_flight_time > 0
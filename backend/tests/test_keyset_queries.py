@@ -0,0 +1,165 @@
+# backend/tests/test_keyset_queries.py
+import math
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.api.api_v1 import dependencies
+from app.api.api_v1.endpoints import discoveries, missions
+from app.core.database import Base, get_sync_db
+from app.core.query import KEYSET_INDEXES, cell_filter, cell_ranges, ensure_geocells, geocell, spatial_time_key
+from app.models import Discovery, Drone, Mission, MissionDrone
+
+LAT0, LNG0 = 37.0, -122.0
+M = 111320.0
+T0 = datetime(2026, 1, 1)
+
+
+def _client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/sar.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def override():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(discoveries.router, prefix="/discoveries")
+    app.include_router(missions.router, prefix="/missions")
+    app.dependency_overrides[get_sync_db] = override
+    app.dependency_overrides[dependencies.get_db] = override
+    return TestClient(app), engine, session_factory
+
+
+def _seed(session_factory):
+    """A 10 x 10 grid of discoveries 200 m apart, one a minute, and three missions"""
+    with session_factory() as db:
+        drones = [Drone(drone_id=f"d{i}", name=f"d{i}") for i in range(2)]
+        db.add_all(drones)
+        db.flush()
+        for i in range(3):
+            db.add(Mission(mission_id=f"m{i}", name=f"m{i}", center_lat=LAT0 + i * 0.1, center_lng=LNG0,
+                           created_at=T0 + timedelta(hours=i)))
+        db.flush()
+        db.add_all([MissionDrone(mission_id=1, drone_id=drone.id) for drone in drones])
+        for i in range(100):
+            lat = LAT0 + (i // 10) * 200 / M
+            lng = LNG0 + (i % 10) * 200 / (M * math.cos(math.radians(LAT0)))
+            db.add(Discovery(mission_id=1 + i % 2, drone_id=drones[0].id, latitude=lat, longitude=lng,
+                             discovery_type="person", confidence=0.5, discovered_at=T0 + timedelta(minutes=i)))
+        db.commit()
+
+
+@pytest.mark.timeout(180)
+def test_cursor_pages_cover_every_discovery_once_newest_first(tmp_path):
+    client, _, session_factory = _client(tmp_path)
+    _seed(session_factory)
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/discoveries/", params={"limit": 30, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == list(range(100, 0, -1))
+
+    # Offsets still work for old clients, and bad cursors are client errors
+    assert [row["id"] for row in client.get("/discoveries/", params={"skip": 95}).json()] == [5, 4, 3, 2, 1]
+    assert client.get("/discoveries/", params={"cursor": "nope"}).status_code == 400
+
+
+@pytest.mark.timeout(180)
+def test_spatial_time_and_field_filters(tmp_path):
+    client, _, session_factory = _client(tmp_path)
+    _seed(session_factory)
+
+    # 450 m around the first corner of the grid: everything up to (2, 1) cells away, but not (2, 2) at 566 m
+    near = client.get("/discoveries/", params={"lat": LAT0, "lng": LNG0, "radius_m": 450,
+                                               "fields": "id,latitude,longitude"}).json()
+    assert sorted(row["id"] for row in near) == [1, 2, 3, 11, 12, 13, 21, 22]
+    assert set(near[0]) == {"id", "latitude", "longitude"}
+
+    lng_m = M * math.cos(math.radians(LAT0))
+    bbox = f"{LNG0 + 300 / lng_m},{LAT0 + 700 / M},{LNG0 + 700 / lng_m},{LAT0 + 900 / M}"
+    boxed = client.get("/discoveries/", params={"bbox": bbox, "since": (T0 + timedelta(minutes=40)).isoformat(),
+                                                "fields": "id"}).json()
+    assert sorted(row["id"] for row in boxed) == [43, 44]
+    assert client.get("/discoveries/", params={"fields": "id,bogus"}).status_code == 400
+
+    response = client.get("/missions/", params={"bbox": f"{LNG0 - 0.01},{LAT0 + 0.05},{LNG0 + 0.01},{LAT0 + 0.3}",
+                                                "fields": "mission_id,center"})
+    assert response.json() == [{"mission_id": "m2", "center": {"lat": LAT0 + 0.2, "lng": LNG0}},
+                               {"mission_id": "m1", "center": {"lat": LAT0 + 0.1, "lng": LNG0}}]
+
+
+def _pages(client, params):
+    seen, cursor = [], None
+    while True:
+        response = client.get("/discoveries/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+@pytest.mark.timeout(180)
+def test_wide_boxes_page_by_the_time_index_and_rows_without_a_time_are_skipped(tmp_path):
+    client, engine, session_factory = _client(tmp_path)
+    _seed(session_factory)
+
+    lng_m = M * math.cos(math.radians(LAT0))
+    with session_factory() as db:
+        def key(north_m, east_m, limit):
+            cells = cell_filter(Discovery.geocell, LAT0 - 1 / M, LNG0 - 1 / lng_m, LAT0 + north_m / M,
+                                LNG0 + east_m / lng_m)
+            return spatial_time_key(db, cells, Discovery.discovered_at, Discovery.id, limit)
+
+        # 100 rows: the cell ranges win while they hold fewer than sqrt(limit * 100)
+        assert key(2000, 2000, 5) is Discovery.discovered_at
+        assert key(250, 250, 5) is not Discovery.discovered_at
+        assert key(2000, 2000, 1000) is not Discovery.discovered_at
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE discoveries SET discovered_at = NULL WHERE id IN (50, 100)"))
+    expected = [i for i in range(99, 0, -1) if i != 50]
+    assert _pages(client, {"limit": 30}) == expected
+    everywhere = f"{LNG0 - 0.1},{LAT0 - 0.1},{LNG0 + 0.1},{LAT0 + 0.1}"
+    assert _pages(client, {"limit": 7, "bbox": everywhere}) == expected
+    assert _pages(client, {"limit": 7, "lat": LAT0, "lng": LNG0, "radius_m": 250}) == [11, 2, 1]
+
+
+@pytest.mark.timeout(180)
+def test_cell_cover_and_geocell_backfill(tmp_path):
+    south, west, north, east = 37.0, -122.01, 37.02, -121.99
+    ranges = cell_ranges(south, west, north, east)
+    assert len(ranges) <= 64 and all(lo <= hi for lo, hi in ranges)
+    for lat, lng in [(south, west), (north, east), (37.01, -122.0)]:
+        cell = geocell(lat, lng)
+        assert any(lo <= cell <= hi for lo, hi in ranges)
+
+    client, engine, session_factory = _client(tmp_path)
+    _seed(session_factory)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE discoveries SET geocell = NULL"))
+        for name in KEYSET_INDEXES:  # as in a database from before the keyset indexes
+            conn.execute(text(f"DROP INDEX {name}"))
+        ensure_geocells(conn)
+        assert conn.execute(text("SELECT COUNT(*) FROM discoveries WHERE geocell IS NULL")).scalar() == 0
+        inspector = inspect(conn)
+        for name, (table, columns) in KEYSET_INDEXES.items():
+            index, = [index for index in inspector.get_indexes(table) if index["name"] == name]
+            declared, = [index for index in Base.metadata.tables[table].indexes if index.name == name]
+            assert ", ".join(index["column_names"]) == columns == ", ".join(c.name for c in declared.columns)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    mission = client.get("/missions/m0").json()
+    assert len(mission["assigned_drones"]) == 2 and len(statements) <= 3
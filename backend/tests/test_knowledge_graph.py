@@ -0,0 +1,133 @@
+# backend/tests/test_knowledge_graph.py
+import json
+
+import pytest
+
+from app.ai.knowledge_graph import SARKnowledgeGraph, GraphQuery, NodeType, SNAPSHOT_FORMAT_VERSION
+
+
+def make_query(query_type, **constraints):
+    return GraphQuery(
+        query_type=query_type,
+        source_node_types=[],
+        target_node_types=[],
+        relationship_types=[],
+        constraints=constraints,
+    )
+
+
+async def populate(graph):
+    missions = [
+        ("m1", "forest", "grid", 0.9, "clear"),
+        ("m2", "forest", "grid", 0.8, "rain"),
+        ("m3", "forest", "spiral", 0.2, "clear"),
+        ("m4", "urban", "spiral", 0.95, "clear"),
+    ]
+    for mission_id, terrain, pattern, success, condition in missions:
+        await graph.add_mission_knowledge(
+            {
+                "mission_id": mission_id,
+                "mission_type": "search",
+                "terrain_type": terrain,
+                "search_pattern": pattern,
+                "weather_conditions": {"condition": condition},
+            },
+            {"success_rate": success, "efficiency_score": success},
+            [],
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_indexes_and_pattern_aggregates():
+    graph = SARKnowledgeGraph(connect=False)
+    await populate(graph)
+
+    assert graph.nodes_by_type[NodeType.MISSION.value] == {"mission_m1", "mission_m2", "mission_m3", "mission_m4"}
+    assert graph.mission_index["terrain_type"]["forest"] == {"mission_m1", "mission_m2", "mission_m3"}
+
+    forest = await graph.query_knowledge(make_query("find_patterns", terrain_type="forest"))
+    assert [r["pattern_type"] for r in forest] == ["grid"]
+    assert forest[0]["effectiveness"] == pytest.approx(0.85)
+    assert forest[0]["mission_count"] == 2
+
+    # Nested weather constraint uses the weather index; non-indexed keys fall back to a scan
+    clear = await graph.query_knowledge(make_query("find_patterns", weather_conditions={"condition": "clear"}))
+    assert {r["pattern_type"] for r in clear} == {"grid"}
+    scanned = await graph.query_knowledge(make_query("find_patterns", terrain_type="urban", drone_count=1))
+    assert [r["pattern_type"] for r in scanned] == ["spiral"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_missions_without_an_attribute_match_any_value_of_it():
+    graph = SARKnowledgeGraph(connect=False)
+    await populate(graph)
+    # No weather condition recorded: matches every weather constraint, as _matches_constraints does
+    for mission_id, weather in (("m5", {}), ("m6", {"visibility": 9000})):
+        await graph.add_mission_knowledge(
+            {"mission_id": mission_id, "mission_type": "search", "terrain_type": "forest",
+             "search_pattern": "spiral", "weather_conditions": weather},
+            {"success_rate": 1.0}, [],
+        )
+    for constraints in ({"weather_conditions": {"condition": "rain"}},
+                        {"weather_conditions": {"condition": "rain"}, "drone_count": 1}):
+        rain = await graph.query_knowledge(make_query("find_patterns", **constraints))
+        assert {r["pattern_type"]: r["mission_count"] for r in rain} == {"grid": 1, "spiral": 2}
+    forest = await graph.query_knowledge(make_query("find_patterns", terrain_type="forest",
+                                                    weather_conditions={"condition": "clear"}))
+    spiral = next(r for r in forest if r["pattern_type"] == "spiral")
+    assert spiral["mission_count"] == 3 and spiral["effectiveness"] == pytest.approx(2.2 / 3)
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_readding_mission_replaces_its_contribution():
+    graph = SARKnowledgeGraph(connect=False)
+    await populate(graph)
+    await graph.add_mission_knowledge(
+        {"mission_id": "m3", "mission_type": "search", "terrain_type": "forest",
+         "search_pattern": "spiral", "weather_conditions": {"condition": "clear"}},
+        {"success_rate": 1.0},
+        [],
+    )
+    forest = await graph.query_knowledge(make_query("find_patterns", terrain_type="forest"))
+    assert {r["pattern_type"] for r in forest} == {"grid", "spiral"}
+    assert sum(a.count for a in graph.pattern_aggregates.values()) == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_optimization_opportunities_ranked_incrementally():
+    graph = SARKnowledgeGraph(connect=False)
+    await populate(graph)
+
+    results = await graph.query_knowledge(make_query("find_optimizations"))
+    by_type = {}
+    for r in results:
+        by_type.setdefault(r["factor_type"], []).append(r)
+
+    # The weakest mission has the largest improvement potential
+    assert by_type["mission"][0]["factor"] == "mission_m3"
+    assert by_type["mission"][0]["optimization_potential"] == pytest.approx(0.8)
+    assert all(r["optimization_potential"] > 0.3 for r in results)
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_snapshot_round_trip(temp_dir):
+    graph = SARKnowledgeGraph(connect=False)
+    await populate(graph)
+    path = await graph.save_snapshot(str(temp_dir / "kg.snapshot"))
+
+    restored = SARKnowledgeGraph(connect=False, snapshot_path=path)
+    patterns = await restored.query_knowledge(make_query("find_patterns", terrain_type="forest"))
+
+    assert len(restored.node_cache) == len(graph.node_cache)
+    assert len(restored.relationship_cache) == len(graph.relationship_cache)
+    assert [r["pattern_type"] for r in patterns] == ["grid"]
+    node = graph.node_cache["mission_m1"]
+    assert restored.node_cache["mission_m1"].created_at == node.created_at
+    assert restored.node_cache["mission_m1"].properties == node.properties
+    with open(path) as f:  # plain JSON, nothing executed on load
+        assert json.load(f)["version"] == SNAPSHOT_FORMAT_VERSION
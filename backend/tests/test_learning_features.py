@@ -0,0 +1,129 @@
+# backend/tests/test_learning_features.py
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Discovery, Drone, Mission, MissionDrone
+from app.services.feature_store import FeatureStore
+from app.services.learning_system import FEATURE_COLUMNS, LearningSystem, PerformanceMetric
+
+EFFICIENCY = PerformanceMetric.MISSION_EFFICIENCY.value
+BATTERY = PerformanceMetric.BATTERY_OPTIMIZATION.value
+DISCOVERY = PerformanceMetric.DISCOVERY_ACCURACY.value
+
+
+def _database(path):
+    engine = create_engine(f"sqlite:///{path}/missions.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine, autoflush=False)
+
+
+def _seed(session_factory, missions=30):
+    start = datetime.utcnow() - timedelta(days=3)
+    with session_factory() as db:
+        drones = [Drone(drone_id=f"d{i}", name=f"d{i}", battery_capacity=100.0, battery_level=60.0, cruise_speed=12.0)
+                  for i in range(3)]
+        db.add_all(drones)
+        db.flush()
+        for i in range(missions):
+            mission = Mission(mission_id=f"m{i}", name=f"m{i}", radius=500.0, altitude=40.0, priority=1 + i % 5,
+                              weather_conditions={"terrain_type": "forest"}, area_covered=0.5,
+                              created_at=start + timedelta(minutes=i), updated_at=start + timedelta(minutes=i, hours=1))
+            db.add(mission)
+            db.flush()
+            for drone in drones[:1 + i % 3]:
+                db.add(MissionDrone(mission_id=mission.id, drone_id=drone.id))
+            if i % 2:
+                db.add(Discovery(mission_id=mission.id, drone_id=drones[0].id, latitude=0.0, longitude=0.0,
+                                 discovery_type="person", confidence=0.8))
+        db.commit()
+
+
+def _system(tmp_path, session_factory):
+    return LearningSystem(FeatureStore(str(tmp_path / "features"), FEATURE_COLUMNS), session_factory)
+
+
+@pytest.mark.timeout(180)
+def test_each_cycle_reads_only_changed_missions_in_batched_queries(tmp_path, monkeypatch):
+    engine, session_factory = _database(tmp_path)
+    _seed(session_factory)
+    system = _system(tmp_path, session_factory)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert system._collect_since_watermarks() == 30
+    # One page of missions plus one eager load per relationship, not one per mission
+    assert len(statements) < 12
+    assert system.feature_store.rows(EFFICIENCY) == 30
+    assert system.feature_store.rows(BATTERY) == sum(1 + i % 3 for i in range(30))
+    assert system.feature_store.rows(DISCOVERY) == 15
+
+    statements.clear()
+    assert system._collect_since_watermarks() == 0
+    assert len(statements) <= 2 and system.feature_store.rows(EFFICIENCY) == 30
+
+    # A changed mission replaces its rows; a new discovery pulls in its mission too
+    with session_factory() as db:
+        changed = db.query(Mission).filter_by(mission_id="m4").one()
+        changed.area_covered = 2.0
+        changed.updated_at = datetime.utcnow()
+        touched = db.query(Mission).filter_by(mission_id="m6").one()
+        db.add(Discovery(mission_id=touched.id, drone_id=1, latitude=0.0, longitude=0.0, discovery_type="vehicle", confidence=0.4))
+        db.commit()
+        changed_ids = [changed.id, touched.id]
+    assert system._collect_since_watermarks() == 2
+    store = system.feature_store
+    assert store.rows(EFFICIENCY) == 30 and store.rows(DISCOVERY) == 16
+    data = store.slice(EFFICIENCY)
+    assert sorted(data.missions.tolist()) == list(range(1, 31))
+    assert data.missions[-2:].tolist() == changed_ids
+
+
+@pytest.mark.timeout(180)
+def test_store_slices_are_memory_mapped_and_survive_interrupted_appends(tmp_path):
+    root = str(tmp_path / "store")
+    store = FeatureStore(root, {"m": ["a", "b"]})
+    store.append("m", np.arange(8.0).reshape(4, 2), [1, 2, 3, 4], [0, 0, 0, 0], missions=[1, 1, 2, 3])
+    store.commit({"missions": 3})
+
+    data = store.slice("m", last=2)
+    assert isinstance(data.features.base, np.memmap) or isinstance(data.features, np.memmap)
+    assert data.outputs.tolist() == [3.0, 4.0] and data.column("b").tolist() == [5.0, 7.0]
+
+    store.append("m", np.ones((1, 2)), [9], [0], missions=[1], replaces=[1])
+    store.commit()
+    assert store.rows("m") == 3 and store.slice("m").outputs.tolist() == [3.0, 4.0, 9.0]
+
+    # Rows appended but never committed are gone after reopening
+    store.append("m", np.ones((2, 2)), [7, 7], [0, 0], missions=[5, 5])
+    reopened = FeatureStore(root, {"m": ["a", "b"]})
+    assert reopened.rows("m") == 3 and reopened.watermarks == {"missions": 3}
+    assert reopened.slice("m").outputs.tolist() == [3.0, 4.0, 9.0]
+    with pytest.raises(ValueError):
+        FeatureStore(root, {"m": ["a"]}).rows("m")
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_models_train_on_the_newest_stored_rows(tmp_path):
+    _, session_factory = _database(tmp_path)
+    _seed(session_factory, missions=80)
+    system = _system(tmp_path, session_factory)
+    await system._load_existing_models()
+    for model in system.learning_models.values():
+        model.last_trained = datetime.utcnow() - timedelta(days=2)
+
+    await system._collect_learning_data()
+    await system._update_learning_models()
+
+    trained = {m.metric_type.value: m.training_data_count for m in system.learning_models.values()}
+    assert trained[EFFICIENCY] == 80
+    summary = await system.get_learning_data_summary()
+    assert summary["data_by_metric"][EFFICIENCY] == 80 and summary["recent_data_points"] == 0
+
+    await system.reset_learning_models()
+    assert system.feature_store.rows(EFFICIENCY) == 0 and system.feature_store.watermarks == {}
@@ -0,0 +1,202 @@
+# backend/tests/test_map_tiles.py
+import json
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.api_v1 import dependencies
+from app.api.api_v1.endpoints import missions
+from app.core.event_bus import event_bus, DISCOVERY_CREATED, TELEMETRY
+from app.models import Drone, Mission, TelemetryData
+from app.services.coverage_grid import CoverageGrid
+from app.services.drone_manager import TelemetryData as Telemetry
+from app.services.map_tiles import (
+    EXTENT, TAIL_POINTS, MapTileService, MissionTiles, TileError, pixel_tolerance, to_world
+)
+
+LAT0, LNG0 = 37.0, -122.0
+M = 111320.0
+T0 = datetime(2026, 1, 1)
+
+
+def _track(n, seed):
+    """A lawnmower sweep with GPS jitter, one point a second"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    leg = (t // 50) % 2
+    along = np.where(leg == 0, t % 50, 49 - t % 50) * 5.0
+    lat = LAT0 + ((t // 50) * 20.0 + rng.normal(0, 0.3, n)) / M
+    lng = LNG0 + (along + rng.normal(0, 0.3, n)) / (M * math.cos(math.radians(LAT0)))
+    return lat, lng
+
+
+def _decode(line, z, x, y):
+    """World positions of a tile line"""
+    coords = np.cumsum(np.array(line).reshape(-1, 2), axis=0) / EXTENT
+    return (coords[:, 0] + x) / (1 << z), (coords[:, 1] + y) / (1 << z)
+
+
+def _tiles_of(wx, wy, z):
+    return set(zip(np.floor(wx * (1 << z)).astype(int).tolist(), np.floor(wy * (1 << z)).astype(int).tolist()))
+
+
+def _worst_pixels(wx, wy, lines):
+    """Largest distance, in pixels, from a point to the nearest drawn segment"""
+    segments = np.concatenate([np.stack([lx[:-1], ly[:-1], lx[1:], ly[1:]], axis=1) for lx, ly in lines])
+    ax, ay, bx, by = segments.T
+    dx, dy = bx - ax, by - ay
+    length2 = np.maximum(dx * dx + dy * dy, 1e-30)
+    worst = 0.0
+    for px, py in zip(wx, wy):
+        u = np.clip(((px - ax) * dx + (py - ay) * dy) / length2, 0, 1)
+        worst = max(worst, float(np.min(np.hypot(ax + u * dx - px, ay + u * dy - py))))
+    return worst
+
+
+@pytest.mark.timeout(180)
+def test_tiles_draw_every_track_within_a_pixel_as_points_arrive():
+    lat, lng = _track(1000, seed=1)
+    times = np.datetime64("2026-01-01T00:00:00", "us") + np.arange(1000) * np.timedelta64(1, "s")
+    layer = MissionTiles(14, 18)
+    layer.add_points("alpha", lat[:600], lng[:600], times[:600])
+    for i in range(600, 1000):  # then live, a point at a time
+        layer.add_points("alpha", lat[i:i + 1], lng[i:i + 1], times[i:i + 1], [80.0])
+    assert layer.add_points("alpha", lat[:10], lng[:10], times[:10]) == 0  # replayed history is dropped
+
+    wx, wy = to_world(lat, lng)
+    for z in (14, 16, 18):
+        lines = []
+        for x, y in _tiles_of(wx, wy, z):
+            tile = layer.render(z, x, y)
+            lines += [_decode(line, z, x, y) for track in tile["tracks"] for line in track["lines"]]
+        # Rounding to the tile grid adds at most half a tile unit to the simplification's pixel
+        assert _worst_pixels(wx, wy, lines) / pixel_tolerance(z) <= 1.0 + 256 / EXTENT
+        kept = len(layer.drones["alpha"].kept[z])
+        assert kept < {14: 80, 16: 100, 18: 600}[z]
+    assert len(layer.drones["alpha"]) - 1 - layer.drones["alpha"].anchor < TAIL_POINTS
+
+    # Only the tiles a new point lands in change
+    z, last = 16, (wx[-1], wy[-1])
+    here = (int(last[0] * (1 << z)), int(last[1] * (1 << z)))
+    versions = {tile: layer.version(z, *tile) for tile in _tiles_of(wx, wy, z)}
+    layer.add_points("alpha", [lat[-1] + 1e-6], [lng[-1]], [times[-1] + np.timedelta64(1, "s")], [79.0])
+    assert layer.version(z, *here) > versions[here]
+    assert all(layer.version(z, *tile) == v for tile, v in versions.items() if tile != here)
+    marker = layer.render(z, *here)["positions"]
+    assert marker[0]["drone_id"] == "alpha" and marker[0]["battery"] == 79.0
+
+
+@pytest.mark.timeout(180)
+def test_discoveries_cluster_and_coverage_is_sampled():
+    layer = MissionTiles(12, 18)
+    for i in range(5):
+        layer.add_discovery({"id": i, "latitude": LAT0 + i * 2e-5, "longitude": LNG0, "discovery_type": "person",
+                             "confidence": 0.5 + i / 10})
+    assert not layer.add_discovery({"id": 4, "latitude": LAT0, "longitude": LNG0})
+    wx, wy = to_world([LAT0], [LNG0])
+
+    x, y = int(wx[0] * (1 << 12)), int(wy[0] * (1 << 12))
+    cluster, = layer.render(12, x, y)["discoveries"]
+    assert cluster["count"] == 5 and cluster["id"] == 4 and cluster["confidence"] == pytest.approx(0.9)
+    x, y = int(wx[0] * (1 << 18)), int(wy[0] * (1 << 18))
+    assert sum(d["count"] for d in layer.render(18, x, y)["discoveries"]) == 5
+
+    grid = CoverageGrid.from_bounds({"north": LAT0 + 0.01, "south": LAT0, "east": LNG0 + 0.01, "west": LNG0})
+    lat, lng = _track(200, seed=2)
+    grid.stamp_track(lat, lng, 15.0)
+    wx, wy = to_world(lat, lng)
+    z = 16
+    x, y = int(wx[0] * (1 << z)), int(wy[0] * (1 << z))
+    rows = layer.render(z, x, y, grid)["coverage"]["rows"]
+    assert len(rows) == 32 and any(rows)
+    # The cell under the first track point is covered
+    col = int((wx[0] * (1 << z) - x) * 32)
+    row = int((wy[0] * (1 << z) - y) * 32)
+    assert rows[row] >> col & 1
+    assert "coverage" not in layer.render(z, x + 40, y, grid)
+
+
+def _client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/sar.db", connect_args={"check_same_thread": False})
+    from app.core.database import Base
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    lat, lng = _track(300, seed=3)
+    with session_factory() as db:
+        db.add(Drone(drone_id="alpha", name="alpha"))
+        db.add(Mission(mission_id="m1", name="Ridge search", center_lat=LAT0, center_lng=LNG0))
+        db.flush()
+        for i in range(300):
+            db.add(TelemetryData(drone_id=1, mission_id=1, latitude=float(lat[i]), longitude=float(lng[i]),
+                                 altitude=50.0, battery_percentage=90.0, timestamp=T0 + timedelta(seconds=i)))
+        db.commit()
+
+    def override():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(missions.router, prefix="/missions")
+    app.dependency_overrides[dependencies.get_db] = override
+    return TestClient(app), lat, lng
+
+
+@pytest.mark.timeout(180)
+def test_tile_endpoint_caches_and_follows_live_telemetry(tmp_path, monkeypatch):
+    service = MapTileService(min_zoom=10, max_zoom=18, cache_size=64)
+    monkeypatch.setattr(missions, "map_tile_service", service)
+    client, lat, lng = _client(tmp_path)
+    try:
+        tileset = client.get("/missions/m1/tiles").json()
+        assert (tileset["minzoom"], tileset["maxzoom"]) == (10, 18)
+        assert tileset["bounds"]["south"] == pytest.approx(lat.min())
+        assert tileset["tiles"][0].endswith("/missions/m1/tiles/{z}/{x}/{y}")
+
+        wx, wy = to_world(lat, lng)
+        z = 17
+        x, y = int(wx[-1] * (1 << z)), int(wy[-1] * (1 << z))
+        first = client.get(f"/missions/m1/tiles/{z}/{x}/{y}")
+        assert first.status_code == 200 and first.headers["content-type"] == "application/json"
+        tile = json.loads(first.content)
+        assert tile["tracks"][0]["drone_id"] == "alpha" and tile["positions"][0]["battery"] == 90.0
+        assert client.get(f"/missions/m1/tiles/{z}/{x}/{y}",
+                          headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+        assert service.get_stats()["hits"] == 1
+
+        # Live telemetry for the mission (events carry its database id) moves the marker
+        event_bus.publish(TELEMETRY, Telemetry(
+            drone_id="alpha", timestamp=T0 + timedelta(seconds=300), position={"lat": lat[-1], "lon": lng[-1], "alt": 50},
+            battery_level=42.0, speed=5.0, heading=0.0, signal_strength=90, gps_accuracy=1.0
+        ), mission_id=1, drone_id="alpha")
+        event_bus.publish(DISCOVERY_CREATED, {"id": 7, "discovery_type": "person", "confidence": 0.9,
+                                              "latitude": lat[-1], "longitude": lng[-1]}, mission_id=1)
+        second = client.get(f"/missions/m1/tiles/{z}/{x}/{y}", headers={"If-None-Match": first.headers["etag"]})
+        assert second.status_code == 200 and second.headers["etag"] != first.headers["etag"]
+        tile = json.loads(second.content)
+        assert tile["positions"][0]["battery"] == 42.0 and tile["discoveries"][0]["id"] == 7
+
+        # Positions keyed latitude/longitude (DroneManager's own spelling) move it too; ones without
+        # coordinates are skipped
+        errors = event_bus.stats["handler_errors"]
+        for position in ({"latitude": lat[-1], "longitude": lng[-1], "altitude": 50}, {"altitude": 50}):
+            event_bus.publish(TELEMETRY, Telemetry(
+                drone_id="alpha", timestamp=T0 + timedelta(seconds=301), position=position,
+                battery_level=41.0, speed=5.0, heading=0.0, signal_strength=90, gps_accuracy=1.0
+            ), mission_id=1, drone_id="alpha")
+        assert event_bus.stats["handler_errors"] == errors
+        tile = json.loads(client.get(f"/missions/m1/tiles/{z}/{x}/{y}").content)
+        assert tile["positions"][0]["battery"] == 41.0
+
+        assert client.get("/missions/m1/tiles/5/0/0").status_code == 400
+        assert client.get(f"/missions/m1/tiles/{z}/{1 << z}/0").status_code == 400
+        assert client.get("/missions/missing/tiles/12/0/0").status_code == 404
+        with pytest.raises(TileError):
+            service.tile("1", 19, 0, 0, loader=None)
+    finally:
+        service.close()
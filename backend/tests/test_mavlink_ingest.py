@@ -0,0 +1,105 @@
+# backend/tests/test_mavlink_ingest.py
+import asyncio
+import socket
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from pymavlink import mavutil
+
+from app.communication.protocols.base_connection import DroneMessage
+from app.communication.protocols.mavlink_connection import MAVLinkConnection, MAVLinkConnectionConfig
+
+
+def _free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _simulate(port, vehicles, rate_hz, stop):
+    """Vehicles 1..n: 50 Hz position/attitude/IMU, 5 Hz heartbeat and status"""
+    link = mavutil.mavlink_connection(f"udpout:127.0.0.1:{port}", source_system=1)
+    tick = 0
+    while not stop.is_set():
+        for system_id in range(1, vehicles + 1):
+            link.mav.srcSystem = system_id
+            link.mav.global_position_int_send(tick, 377749000 + tick, -1224194000, 80000, 50000, 100, 0, 0, 9000)
+            link.mav.attitude_send(tick, 0.01, 0.02, 1.5, 0, 0, 0)
+            link.mav.raw_imu_send(tick, 1, 2, 3, 4, 5, 6, 7, 8, 9)
+            if tick % (rate_hz // 5) == 0:
+                link.mav.heartbeat_send(2, 3, 0, 0, 4)
+                link.mav.sys_status_send(0, 0, 0, 500, 12600, 1500, 87, 0, 0, 0, 0, 0, 0)
+        tick += 1
+        time.sleep(1.0 / rate_hz)
+    link.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_reader_thread_filters_rate_limits_and_hands_over_batches():
+    port = _free_udp_port()
+    stop = threading.Event()
+    sender = threading.Thread(target=_simulate, args=(port, 3, 50, stop), daemon=True)
+    sender.start()
+
+    config = MAVLinkConnectionConfig(host="127.0.0.1", port=port, connection_type="udp", timeout=5.0)
+    connection = MAVLinkConnection("mav-link", config)
+    batches = []
+
+    async def on_batch(messages):
+        batches.append(messages)
+
+    connection.register_message_batch_callback(on_batch)
+    try:
+        assert await connection.connect()
+        await connection.start()
+        await asyncio.sleep(2.0)
+    finally:
+        await connection.stop()
+        stop.set()
+        sender.join()
+
+    messages = [message for batch in batches for message in batch]
+    stats = connection.get_connection_info()["ingest"]
+    assert {message.message_type for message in messages} <= {"telemetry", "attitude", "system_status"}
+    assert stats["filtered"] > 0 and stats["rate_limited"] > 0
+    # 10 Hz cap per vehicle on positions, against 50 Hz sent
+    positions = [message for message in messages if message.message_type == "telemetry"]
+    assert {message.drone_id for message in positions} == {"1", "2", "3"}
+    assert len(positions) <= 3 * 10 * 2.5
+    # One wakeup per drained batch, not one per message
+    assert stats["wakeups"] <= stats["batches"] + 1
+    assert stats["forwarded"] == len(messages) + len(connection._inbox)
+    assert not connection._mavlink_thread
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_commands_count_the_bytes_written():
+    port = _free_udp_port()
+    stop = threading.Event()
+    sender = threading.Thread(target=_simulate, args=(port, 1, 50, stop), daemon=True)
+    sender.start()
+
+    config = MAVLinkConnectionConfig(host="127.0.0.1", port=port, connection_type="udp", timeout=5.0)
+    connection = MAVLinkConnection("mav-link", config)
+    try:
+        assert await connection.connect()
+        assert connection.get_traffic()["bytes_sent"] == 0
+        message = DroneMessage(message_id="c1", drone_id="1", message_type="command",
+                               payload={"command_type": "takeoff", "parameters": {"altitude": 20.0}},
+                               timestamp=datetime.utcnow())
+        assert await connection.send_message(message)
+        assert await connection.send_message(message)
+    finally:
+        await connection.stop()
+        stop.set()
+        sender.join()
+
+    # Two COMMAND_LONGs: 33 payload bytes and 8 bytes of MAVLink 1 framing each
+    # (MAVLink 2 trims trailing zeros and frames with 12)
+    traffic = connection.get_traffic()
+    assert traffic["bytes_sent"] % 2 == 0 and 2 * 12 < traffic["bytes_sent"] <= 2 * (12 + 33)
+    assert traffic["bytes_received"] > 0
@@ -0,0 +1,232 @@
+# backend/tests/test_mission_export.py
+import csv
+import io
+import json
+import math
+import struct
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.api_v1 import dependencies
+from app.api.api_v1.endpoints import missions
+from app.core.config import settings
+from app.models import Discovery, Drone, Mission, TelemetryData
+from app.services.mission_export import (
+    FGB_COLUMNS, FGB_MAGIC, TrackChunk, douglas_peucker, export_chunks, records_source, simplify_tracks
+)
+
+LAT0, LNG0 = 37.0, -122.0
+M = 111320.0
+T0 = datetime(2026, 1, 1)
+
+
+def _track(n, seed):
+    """A lawnmower sweep with GPS jitter, one point a second"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    leg = (t // 50) % 2
+    along = np.where(leg == 0, t % 50, 49 - t % 50) * 5.0
+    across = (t // 50) * 20.0
+    lat = LAT0 + (across + rng.normal(0, 0.3, n)) / M
+    lng = LNG0 + (along + rng.normal(0, 0.3, n)) / (M * math.cos(math.radians(LAT0)))
+    return lat, lng
+
+
+def _deviation_m(lat, lng, kept_lat, kept_lng):
+    """Largest distance from an original point to the simplified polyline"""
+    scale = M * math.cos(math.radians(LAT0))
+    px, py = (lng - LNG0) * scale, (lat - LAT0) * M
+    qx, qy = (kept_lng - LNG0) * scale, (kept_lat - LAT0) * M
+    ax, ay, bx, by = qx[:-1], qy[:-1], qx[1:], qy[1:]
+    dx, dy = bx - ax, by - ay
+    length2 = np.maximum(dx * dx + dy * dy, 1e-12)
+    worst = 0.0
+    for x, y in zip(px, py):
+        u = np.clip(((x - ax) * dx + (y - ay) * dy) / length2, 0, 1)
+        worst = max(worst, float(np.min(np.hypot(ax + u * dx - x, ay + u * dy - y))))
+    return worst
+
+
+def _chunks(lat, lng, size):
+    for start in range(0, len(lat), size):
+        n = len(lat[start:start + size])
+        yield TrackChunk("d1", {"timestamp": np.full(n, np.datetime64("2026-01-01T00:00:00", "us")),
+                                "latitude": lat[start:start + size], "longitude": lng[start:start + size],
+                                "altitude": np.full(n, 50.0), "battery": np.full(n, np.nan),
+                                "signal": np.full(n, np.nan)}, start == 0)
+
+
+@pytest.mark.timeout(180)
+def test_chunked_simplification_stays_within_tolerance():
+    x = np.array([0.0, 1.0, 2.0, 3.0, 4.0])
+    assert douglas_peucker(x, np.array([0.0, 0.1, 0.0, 5.0, 0.0]), 0.5).tolist() == [True, False, True, True, True]
+
+    lat, lng = _track(3000, seed=1)
+    whole = next(simplify_tracks(_chunks(lat, lng, 3000), 2.0))
+    pieces = list(simplify_tracks(_chunks(lat, lng, 400), 2.0))
+    kept_lat = np.concatenate([p.columns["latitude"] for p in pieces])
+    kept_lng = np.concatenate([p.columns["longitude"] for p in pieces])
+
+    # Corners of the sweep survive, the jitter along each leg does not
+    assert 120 <= len(kept_lat) < 300 and len(kept_lat) <= 1.2 * len(whole)
+    assert (kept_lat[0], kept_lat[-1]) == (lat[0], lat[-1])
+    assert _deviation_m(lat, lng, kept_lat, kept_lng) <= 2.0
+    assert list(simplify_tracks(_chunks(lat, lng, 400), 0.0))[3].columns["latitude"].tolist() == lat[1200:1600].tolist()
+
+
+def _client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/sar.db", connect_args={"check_same_thread": False})
+    from app.core.database import Base
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with session_factory() as db:
+        db.add_all([Drone(drone_id="alpha", name="alpha"), Drone(drone_id="bravo", name="bravo")])
+        db.add(Mission(mission_id="m1", name="Ridge search", center_lat=LAT0, center_lng=LNG0))
+        db.flush()
+        for drone in (1, 2):
+            lat, lng = _track(120, seed=drone)
+            # Stored out of order; the export reads each track back in time order
+            for i in reversed(range(120)):
+                db.add(TelemetryData(drone_id=drone, mission_id=1, latitude=float(lat[i]), longitude=float(lng[i]),
+                                     altitude=50.0, battery_percentage=100.0 - i / 10,
+                                     timestamp=T0 + timedelta(seconds=i)))
+        db.add(Discovery(mission_id=1, drone_id=2, latitude=LAT0, longitude=LNG0, discovery_type="person",
+                         confidence=0.8, priority=1, discovered_at=T0 + timedelta(seconds=30)))
+        db.commit()
+
+    def override():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(missions.router, prefix="/missions")
+    app.dependency_overrides[dependencies.get_db] = override
+    return TestClient(app)
+
+
+def _read_flatgeobuf(data):
+    """Decode the tables our writer produces, independently of it"""
+    assert data[:8] == FGB_MAGIC
+
+    def table(buf, pos):
+        vtable = pos - struct.unpack_from("<i", buf, pos)[0]
+        vsize = struct.unpack_from("<H", buf, vtable)[0]
+
+        def field(slot, fmt=None):
+            if 4 + 2 * slot >= vsize:
+                return None
+            offset = struct.unpack_from("<H", buf, vtable + 4 + 2 * slot)[0]
+            if not offset:
+                return None
+            if fmt:
+                return struct.unpack_from("<" + fmt, buf, pos + offset)[0]
+            return pos + offset + struct.unpack_from("<I", buf, pos + offset)[0]
+        return field
+
+    def vector(buf, pos, fmt):
+        n = struct.unpack_from("<I", buf, pos)[0]
+        size = struct.calcsize(fmt)
+        assert (pos + 4) % size == 0
+        return struct.unpack_from(f"<{n}{fmt}", buf, pos + 4)
+
+    def string(buf, pos):
+        return bytes(vector(buf, pos, "B")).decode()
+
+    def sized(offset):
+        size = struct.unpack_from("<I", data, offset)[0]
+        buf = data[offset:offset + 4 + size]
+        return buf, 4 + struct.unpack_from("<I", buf, 4)[0], offset + 4 + size
+
+    buf, root, offset = sized(8)
+    header = table(buf, root)
+    assert header(9, "H") == 0 and header(2, "B") == 0
+    columns_pos, names = header(7), []
+    for i in range(struct.unpack_from("<I", buf, columns_pos)[0]):
+        slot = columns_pos + 4 + 4 * i
+        names.append(string(buf, table(buf, slot + struct.unpack_from("<I", buf, slot)[0])(0)))
+    assert names == [name for name, _ in FGB_COLUMNS]
+    crs = table(buf, header(10))
+    assert (string(buf, crs(0)), crs(1, "i")) == ("EPSG", 4326)
+
+    features = []
+    while offset < len(data):
+        buf, root, offset = sized(offset)
+        feature = table(buf, root)
+        geometry = table(buf, feature(0))
+        xy = vector(buf, geometry(1), "d")
+        props, raw, i = {}, bytes(vector(buf, feature(1), "B")), 0
+        while i < len(raw):
+            index = struct.unpack_from("<H", raw, i)[0]
+            name, kind = FGB_COLUMNS[index]
+            i += 2
+            if kind == 10:
+                props[name] = struct.unpack_from("<d", raw, i)[0]
+                i += 8
+            elif kind == 8:
+                props[name] = struct.unpack_from("<Q", raw, i)[0]
+                i += 8
+            else:
+                length = struct.unpack_from("<I", raw, i)[0]
+                props[name] = raw[i + 4:i + 4 + length].decode()
+                i += 4 + length
+        features.append((geometry(6, "B"), list(zip(xy[::2], xy[1::2])), props))
+    return features
+
+
+@pytest.mark.timeout(180)
+def test_export_endpoint_streams_every_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_ROWS", 25)
+    client = _client(tmp_path)
+    lat, lng = _track(120, seed=1)
+
+    response = client.get("/missions/m1/export")
+    assert response.headers["content-type"] == "application/geo+json"
+    features = json.loads(response.content)["features"]
+    assert [f["properties"]["type"] for f in features] == ["mission_center", "drone_track", "drone_track", "discovery"]
+    assert features[1]["properties"]["drone_id"] == "alpha"
+    assert features[1]["geometry"]["coordinates"] == [[x, y] for x, y in zip(lng.tolist(), lat.tolist())]
+
+    simplified = json.loads(client.get("/missions/m1/export?tolerance_m=2").content)["features"]
+    kept = np.array(simplified[1]["geometry"]["coordinates"])
+    assert 5 < len(kept) < 40
+    assert _deviation_m(lat, lng, kept[:, 1], kept[:, 0]) <= 2.0
+
+    text = client.get("/missions/m1/export?format=csv").text
+    telemetry, discoveries = text.split("\n\n=== DISCOVERIES DATA ===\n")
+    rows = list(csv.DictReader(io.StringIO(telemetry.split("\n", 1)[1])))
+    assert len(rows) == 240 and rows[0]["drone_id"] == "alpha" and rows[0]["timestamp"] == "2026-01-01T00:00:00.000"
+    assert float(rows[1]["battery"]) == pytest.approx(99.9) and rows[0]["signal"] == ""
+    assert list(csv.DictReader(io.StringIO(discoveries)))[0]["discovery_type"] == "person"
+
+    fgb = _read_flatgeobuf(client.get("/missions/m1/export?format=flatgeobuf").content)
+    assert fgb[0][0] == 1 and fgb[0][2]["type"] == "mission_center"
+    alpha = [f for f in fgb if f[2].get("drone_id") == "alpha"]
+    assert len(alpha) == 5  # 120 points in chunks of 25
+    points = alpha[0][1] + [p for _, coords, _ in alpha[1:] for p in coords[1:]]  # pieces share their ends
+    assert points == list(zip(lng.tolist(), lat.tolist()))
+    assert alpha[0][2]["end_time"] == "2026-01-01T00:00:24.000" and alpha[1][2]["points"] == 26
+    assert fgb[-1][2] == {"type": "discovery", "discovery_type": "person", "confidence": 0.8, "priority": "1",
+                          "start_time": "2026-01-01T00:00:30"}
+
+    assert client.get("/missions/m1/export?format=shapefile").status_code == 400
+    assert client.get("/missions/missing/export").status_code == 404
+
+
+@pytest.mark.timeout(180)
+def test_records_export_keeps_the_old_layout():
+    telemetry = [{"drone_id": "d1", "lat": LAT0 + i * 1e-4, "lng": LNG0, "timestamp": f"2026-01-01T00:00:0{i}Z",
+                  "battery_level": 90} for i in range(3)]
+    discoveries = [{"position": {"lat": LAT0, "lng": LNG0}, "discovery_type": "vehicle", "confidence": 0.5}]
+    source = records_source({"name": "m", "center_lat": LAT0, "center_lng": LNG0}, telemetry, discoveries)
+    collection = json.loads(b"".join(export_chunks(source, "geojson")))
+    assert collection["features"][1]["geometry"]["coordinates"][2] == [LNG0, LAT0 + 2e-4]
+    assert collection["features"][2]["properties"]["discovery_type"] == "vehicle"
+    text = b"".join(export_chunks(source, "csv")).decode()
+    assert text.startswith("=== TELEMETRY DATA ===\ndrone_id,timestamp,")
+    assert "d1,2026-01-01T00:00:02.000," in text
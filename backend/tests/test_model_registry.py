@@ -0,0 +1,76 @@
+# backend/tests/test_model_registry.py
+import os
+
+import numpy as np
+import pytest
+
+from app.ai.model_registry import ModelIntegrityError, ModelRegistry
+from app.ai.real_ml_models import MODEL_BUNDLE, MissionFeatures, RealMLModels
+
+
+def mission():
+    return MissionFeatures(
+        mission_type="search", terrain_type="forest", weather_condition="clear",
+        area_size=20.0, duration_hours=4.0, num_drones=5, target_urgency=3,
+        time_of_day=12, season=1, wind_speed=10.0, visibility=10.0, temperature=20.0,
+        humidity=60.0, battery_reserve=80.0, communication_range=10.0,
+        search_density="medium", search_pattern="grid", altitude=60, speed=8.0,
+    )
+
+
+@pytest.mark.timeout(180)
+def test_versions_checksums_and_activation(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    weights = np.arange(100_000, dtype=np.float64)
+
+    v1 = registry.publish("detector", {"weights": weights}, metadata={"note": "first"}, version="v1")
+    v2 = registry.publish("detector", {"weights": weights * 2}, version="v2")
+    assert registry.versions("detector") == ["v1", "v2"]
+    assert registry.current_version("detector") == v2
+
+    artifact, manifest = registry.load("detector")
+    assert isinstance(artifact["weights"], np.memmap)  # large arrays are memory-mapped
+    assert artifact["weights"][10] == 20.0 and manifest.version == "v2"
+
+    registry.activate("detector", v1)
+    artifact, manifest = registry.load("detector")
+    assert artifact["weights"][10] == 10.0 and manifest.metadata == {"note": "first"}
+
+    # Corruption on disk is caught before the artifact is unpickled
+    with open(os.path.join(str(tmp_path), "detector", "v2", "artifact.joblib"), "r+b") as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(b"\xff" * 8)
+    with pytest.raises(ModelIntegrityError):
+        registry.load("detector", "v2")
+
+    assert registry.prune("detector", keep=0) == ["v2"]
+    assert registry.versions("detector") == ["v1"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_lazy_load_background_training_and_hot_swap(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+
+    # Nothing published yet: the first initialize trains in a worker process
+    trainer = RealMLModels(registry=registry)
+    assert not trainer.is_trained
+    await trainer.initialize()
+    first = trainer.model_version
+    assert registry.versions(MODEL_BUNDLE) == [first]
+
+    # A second instance loads the published bundle instead of retraining
+    server = RealMLModels(registry=registry)
+    prediction = await server.predict_mission_outcome(mission())
+    assert server.model_version == first and registry.versions(MODEL_BUNDLE) == [first]
+    assert prediction.confidence == 0.8  # not the fallback prediction
+    assert sum(prediction.outcome_probability.values()) == pytest.approx(1.0)
+    assert (await server.health_check())["training_samples"] == 1000
+
+    # Retraining publishes a new version; a running instance swaps it in on reload
+    second = await trainer.retrain()
+    assert second != first and registry.current_version(MODEL_BUNDLE) == second
+    assert await server.reload_if_updated()
+    assert server.model_version == second
+    assert not await server.reload_if_updated()
+    assert (await server.predict_mission_outcome(mission())).confidence == 0.8
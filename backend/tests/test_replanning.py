@@ -0,0 +1,123 @@
+# backend/tests/test_replanning.py
+import math
+
+import numpy as np
+import pytest
+
+from app.services.adaptive_planner import (
+    AdaptivePlanner, DroneCapabilities, MissionContext, OptimizationConstraints, PlanChange, PlanChangeType
+)
+from app.services.fleet_routing import FleetRouter, RoutingDrone
+
+M = 111320.0
+LAT0, LNG0 = 37.0, -122.0
+
+
+def _drone(drone_id, speed=10.0):
+    return DroneCapabilities(drone_id, 30, 120.0, 15.0, speed, 100.0, (1920, 1080), True, False, "moderate",
+                             home_lat=LAT0 + 1500 / M, home_lng=LNG0 + 1500 / (M * math.cos(math.radians(LAT0))))
+
+
+async def _plan(planner, drone_count=6):
+    ticks = np.arange(0, 3000, 100)
+    waypoints = [{'lat': LAT0 + y / M, 'lng': LNG0 + x / (M * math.cos(math.radians(LAT0))), 'altitude': 50.0,
+                  'type': 'search', 'order': i}
+                 for i, (y, x) in enumerate((y, x) for y in ticks for x in ticks)]
+    drones = [_drone(f"d{i}", 8.0 + i) for i in range(drone_count)]
+    context = MissionContext("m1", "person", 9.0, "rural", "day", {}, "high", drones,
+                             OptimizationConstraints(min_battery_reserve=20.0))
+    assignments = await planner._assign_drones_to_areas(drones, waypoints, context)
+    return {'waypoints': waypoints, 'drone_assignments': assignments, 'optimal_altitude': 50.0}, context
+
+
+def _search(assignment):
+    return [wp for wp in assignment['assigned_waypoints'] if wp['type'] == 'search']
+
+
+def _key(wp):
+    return (round(wp['lat'], 9), round(wp['lng'], 9))
+
+
+@pytest.mark.timeout(180)
+def test_repair_only_touches_drones_near_the_lost_one():
+    ticks = np.arange(0, 4000, 100)
+    ys, xs = np.meshgrid(ticks, ticks, indexing="ij")
+    lats, lngs = ys.ravel() / M, xs.ravel() / M
+    drones = [RoutingDrone(f"d{i}", 2000 / M, 2000 / M, 10.0, 1e6, dwell_s=1.0) for i in range(24)]
+    router = FleetRouter(lats, lngs)
+    routes = [route.order for route in router.solve(drones, time_budget_s=0.5).routes]
+
+    lost = 5
+    result = FleetRouter(lats, lngs).repair(drones[:lost] + drones[lost + 1:], routes[:lost] + routes[lost + 1:],
+                                            pending=routes[lost], time_budget_s=0.5)
+
+    flown = np.concatenate([route.order for route in result.routes])
+    assert sorted(flown.tolist()) == list(range(len(lats)))
+    kept = [np.array_equal(old, new.order) for old, new in zip(routes[:lost] + routes[lost + 1:], result.routes)]
+    assert sum(kept) >= len(kept) - result.stats["window"] and result.stats["window"] < len(kept)
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_lost_drone_hands_its_remaining_waypoints_to_neighbours():
+    planner = AdaptivePlanner()
+    plan, context = await _plan(planner)
+    completed = {a['drone_id']: 10 for a in plan['drone_assignments']}
+    lost = plan['drone_assignments'][2]
+
+    result = await planner.replan_mission(plan, context, PlanChange(PlanChangeType.DRONE_LOST, drone_id=lost['drone_id']),
+                                          completed=completed)
+
+    assert result.success and result.diff['removed_drones'] == [lost['drone_id']]
+    remaining = [_key(wp) for a in plan['drone_assignments'] for wp in _search(a)[10:]]
+    replanned = [_key(wp) for a in result.optimized_plan['drone_assignments'] for wp in _search(a)]
+    assert sorted(replanned) == sorted(remaining)
+    handed_over = {_key(wp) for wp in _search(lost)[10:]}
+    received = {_key(wp) for change in result.diff['changed_drones'].values() for wp in change['added_waypoints']}
+    assert handed_over <= received
+    for assignment in result.optimized_plan['drone_assignments']:
+        if assignment['drone_id'] in result.diff['unchanged_drones']:
+            before = next(a for a in plan['drone_assignments'] if a['drone_id'] == assignment['drone_id'])
+            assert [_key(wp) for wp in _search(assignment)] == [_key(wp) for wp in _search(before)[10:]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_priority_area_is_flown_first_and_no_fly_zone_is_dropped():
+    planner = AdaptivePlanner()
+    plan, context = await _plan(planner)
+    lng_m = M * math.cos(math.radians(LAT0))
+    bounds = {'south': LAT0 + 3500 / M, 'north': LAT0 + 3800 / M, 'west': LNG0 + 500 / lng_m, 'east': LNG0 + 800 / lng_m}
+
+    result = await planner.replan_mission(plan, context, PlanChange(PlanChangeType.PRIORITY_AREA, bounds=bounds))
+    assert result.success
+    priority = [wp for a in result.optimized_plan['drone_assignments'] for wp in _search(a) if wp.get('priority')]
+    assert len(priority) == 16
+    for assignment in result.optimized_plan['drone_assignments']:
+        flags = [bool(wp.get('priority')) for wp in _search(assignment)]
+        assert flags == sorted(flags, reverse=True)
+
+    zone = {'south': LAT0 - 1 / M, 'north': LAT0 + 950 / M, 'west': LNG0 - 1 / lng_m, 'east': LNG0 + 950 / lng_m}
+    result = await planner.replan_mission(plan, context, PlanChange(PlanChangeType.NO_FLY_ZONE, bounds=zone))
+    assert result.success and len(result.diff['dropped_waypoints']) == 100
+    for assignment in result.optimized_plan['drone_assignments']:
+        assert all(wp['lat'] > zone['north'] or wp['lng'] > zone['east'] for wp in _search(assignment))
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_added_drone_takes_over_part_of_the_work():
+    planner = AdaptivePlanner()
+    plan, context = await _plan(planner, drone_count=3)
+    new = _drone("new", speed=14.0)
+
+    result = await planner.replan_mission(plan, context, PlanChange(PlanChangeType.DRONE_ADDED, drone=new),
+                                          drone_states={'d0': {'lat': LAT0, 'lng': LNG0, 'battery': 60.0}})
+
+    assert result.success and result.diff['added_drones'] == ["new"]
+    assert _search({'assigned_waypoints': result.diff['new_assignments']["new"]})
+    before = max(a['estimated_duration'] for a in plan['drone_assignments'])
+    assert result.estimated_duration <= before
+
+    missing = await planner.replan_mission(plan, context, PlanChange(PlanChangeType.DRONE_LOST, drone_id="nope"))
+    assert not missing.success and "not in the plan" in missing.message
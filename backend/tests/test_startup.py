@@ -0,0 +1,93 @@
+# backend/tests/test_startup.py
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+
+from app.ai.knowledge_graph import SARKnowledgeGraph
+from app.api.api_v1.api import RouterSpec, build_api_router
+from app.core.lazy import LazyObject
+from app.core.startup_profiler import startup_profiler
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys
+from fastapi.testclient import TestClient
+from app.main import app
+with TestClient(app) as client:
+    health = client.get("/health")
+    profile = client.get("/health/startup").json()
+heavy = ["app.api.api_v1.endpoints.ai", "app.ai.rag_system", "app.ai.real_ml_models",
+         "app.ai.real_computer_vision", "sklearn", "aiohttp"]
+print(json.dumps({"health": health.status_code, "loaded": [m for m in heavy if m in sys.modules],
+                  "profile": profile}))
+"""
+
+
+@pytest.mark.timeout(180)
+def test_app_starts_without_heavy_subsystems(tmp_path):
+    env = dict(os.environ, PYTHONPATH=BACKEND, AI_ENABLED="false", LOG_LEVEL="WARNING",
+               DATABASE_URL=f"sqlite:///{tmp_path}/startup.db")
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env, cwd=str(tmp_path),
+                         capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+
+    assert result["health"] == 200
+    assert result["loaded"] == []
+    profile = result["profile"]
+    imported = {entry["module"] for entry in profile["imports"]}
+    assert "app.api.api_v1.endpoints.missions" in imported
+    assert "app.api.api_v1.endpoints.ai" not in imported
+    assert [step["step"] for step in profile["lifespan_steps"]][:2] == ["database init", "database health check"]
+    assert profile["ready_after_seconds"] is not None
+    assert profile["subsystems"]["ml_models"]["loaded"] is False
+
+
+@pytest.mark.timeout(180)
+def test_router_flags_and_missing_modules(monkeypatch):
+    config = SimpleNamespace(DISABLED_ROUTERS=["weather"], AI_ENABLED=False, FLAG_ON=True)
+    real_import = startup_profiler.import_module
+
+    def import_module(name):
+        if name.endswith(".video"):
+            raise ModuleNotFoundError("No module named 'cv2'", name="cv2")
+        return real_import(name)
+
+    monkeypatch.setattr(startup_profiler, "import_module", import_module)
+    routers = [
+        RouterSpec("weather", "/weather", ["weather"]),
+        RouterSpec("video", "/video", ["video"]),  # optional dependency missing: skipped, not fatal
+        RouterSpec("also_missing", "/y", ["y"], flag="AI_ENABLED"),  # never imported
+        RouterSpec("tasks", "/tasks", ["tasks"], flag="FLAG_ON"),
+    ]
+    app = FastAPI()
+    app.include_router(build_api_router(config, routers))
+    paths = set(app.openapi()["paths"])
+    assert paths and all(path.startswith("/tasks") for path in paths)
+
+    # A module of the app itself that fails to import is a bug, not an optional router
+    with pytest.raises(ModuleNotFoundError):
+        build_api_router(config, [RouterSpec("not_a_module", "/x", ["x"])])
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_constructors_do_no_io_and_lazy_objects_resolve_once():
+    graph = SARKnowledgeGraph(connect=False)
+    assert graph._init_task is None  # nothing scheduled from inside a running loop
+    await graph.ensure_ready()
+    assert graph._init_task is not None
+
+    calls = []
+    lazy = LazyObject("unused", factory=lambda: calls.append(1) or SimpleNamespace(value=42))
+    assert not lazy.loaded and calls == []
+    assert await lazy.warm() is lazy.get()
+    assert lazy.value == 42 and calls == [1]
+    await asyncio.gather(*(lazy.warm() for _ in range(5)))
+    assert calls == [1]
@@ -0,0 +1,127 @@
+# backend/tests/test_terrain_optimization.py
+import numpy as np
+import pytest
+
+from app.services import terrain_optimization as terrain
+from app.services.terrain_optimization import (
+    TerrainOptimizationEngine,
+    TerrainIndex,
+    TerrainData,
+    TerrainType,
+    SearchZone,
+    CoverageStrategy,
+    COVERAGE_CELL_DTYPE,
+    coverage_cells_to_list,
+)
+
+
+def random_terrain(n, seed=0):
+    rng = np.random.default_rng(seed)
+    types = list(TerrainType)
+    return [
+        TerrainData(
+            latitude=float(37.0 + rng.random() * 0.5),
+            longitude=float(-122.0 + rng.random() * 0.5),
+            elevation_m=float(rng.random() * 300),
+            slope_degrees=float(rng.random() * 30),
+            aspect_degrees=0.0,
+            roughness=float(rng.random()),
+            vegetation_density=0.3,
+            visibility_factor=float(0.2 + rng.random() * 0.8),
+            accessibility_factor=float(0.1 + rng.random() * 0.9),
+            terrain_type=types[i % len(types)],
+        )
+        for i in range(n)
+    ]
+
+
+def brute_force_nearest(terrain_data, lats, lngs):
+    pts = np.array([[td.latitude, td.longitude] for td in terrain_data])
+    d2 = (lats[:, None] - pts[:, 0]) ** 2 + (lngs[:, None] - pts[:, 1]) ** 2
+    return d2.argmin(axis=1)
+
+
+@pytest.mark.timeout(180)
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_terrain_index_matches_linear_scan(monkeypatch, use_scipy):
+    if use_scipy and not terrain.SCIPY_AVAILABLE:
+        pytest.skip("scipy not installed")
+    monkeypatch.setattr(terrain, "SCIPY_AVAILABLE", use_scipy)
+
+    # Dense cluster plus a sparse tail exercises both bucket and brute-force paths
+    data = random_terrain(400)
+    data.append(TerrainData(39.0, -120.0, 10.0, 1.0, 0.0, 0.1, 0.3, 0.9, 0.9, TerrainType.WATER))
+    index = TerrainIndex(data)
+
+    rng = np.random.default_rng(2)
+    lats = 36.8 + rng.random(2000) * 2.5
+    lngs = -122.2 + rng.random(2000) * 2.5
+    found = index.nearest(lats, lngs)
+    expected = brute_force_nearest(data, lats, lngs)
+
+    pts = np.array([[td.latitude, td.longitude] for td in data])
+    d_found = np.hypot(lats - pts[found, 0], lngs - pts[found, 1])
+    d_expected = np.hypot(lats - pts[expected, 0], lngs - pts[expected, 1])
+    np.testing.assert_allclose(d_found, d_expected)
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_optimize_coverage_returns_structured_cells():
+    engine = TerrainOptimizationEngine(cell_size_km=0.5)
+    zone = SearchZone(
+        zone_id="z1",
+        bounds={"north": 37.5, "south": 37.0, "east": -121.5, "west": -122.0},
+        center_lat=37.25,
+        center_lng=-121.75,
+        area_km2=55.0 * 44.0,
+        terrain_data=random_terrain(300),
+        priority_areas=[{"bounds": {"north": 37.3, "south": 37.2, "east": -121.7, "west": -121.8},
+                         "priority_multiplier": 3.0}],
+        obstacles=[],
+        accessibility_constraints=[],
+    )
+    result = await engine.optimize_coverage(zone, drone_count=4, strategy=CoverageStrategy.TERRAIN_ADAPTIVE)
+
+    cells = result.coverage_cells
+    assert cells.dtype == COVERAGE_CELL_DTYPE
+    assert len(cells) > 1000
+    assert set(np.unique(cells["assigned_drone"])) == {0, 1, 2, 3}
+    assert np.all(np.diff(cells["priority_score"]) <= 0)  # priority order
+    assert np.all(cells["optimal_altitude_m"] >= cells["elevation_m"] + 50 - 1e-3)
+    assert zone.bounds["west"] - 0.01 <= cells["center_lng"].min() <= cells["center_lng"].max() <= zone.bounds["east"] + 0.01
+    assert 0.0 < result.total_coverage_percentage <= 100.0
+
+    first = coverage_cells_to_list(cells[:3])
+    assert first[0].cell_id.startswith("cell_") and isinstance(first[0].terrain_type, TerrainType)
+    assert hasattr(first[0], "assigned_drone")
+
+
+@pytest.mark.timeout(180)
+def test_terrain_index_is_rebuilt_when_samples_change():
+    engine = TerrainOptimizationEngine(cell_size_km=0.5)
+    data = random_terrain(50)
+    zone = SearchZone(
+        zone_id="z1",
+        bounds={"north": 37.5, "south": 37.0, "east": -122.0, "west": -122.5},
+        center_lat=37.25,
+        center_lng=-122.25,
+        area_km2=44.0 * 55.0,
+        terrain_data=data,
+        priority_areas=[],
+        obstacles=[],
+        accessibility_constraints=[],
+    )
+    index = engine._get_terrain_index(zone)
+    assert engine._get_terrain_index(zone) is index
+    # Edits in place are announced by bumping the version
+    data[0].elevation_m += 500
+    zone.terrain_version += 1
+    edited = engine._get_terrain_index(zone)
+    assert edited is not index and edited.elevation_m[0] == pytest.approx(data[0].elevation_m)
+    data.append(random_terrain(1, seed=1)[0])
+    assert engine._get_terrain_index(zone).size == 51
+    # A new list is a new index, even one that reuses a freed list's id
+    for seed in range(2, 6):
+        zone.terrain_data = random_terrain(50, seed=seed)
+        assert engine._get_terrain_index(zone).latitude[0] == zone.terrain_data[0].latitude
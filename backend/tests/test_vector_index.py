@@ -0,0 +1,100 @@
+# backend/tests/test_vector_index.py
+import asyncio
+import numpy as np
+import pytest
+
+from app.ai.vector_index import (
+    LocalVectorIndex,
+    PointStruct,
+    EmbeddingCache,
+    BatchedEmbeddingEncoder,
+    tokenize,
+)
+
+
+class CountingModel:
+    """Deterministic fake embedding model that records each batch it encodes."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.batches = []
+
+    def encode(self, texts):
+        self.batches.append(list(texts))
+        out = []
+        for text in texts:
+            rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+            out.append(rng.normal(size=self.dim))
+        return np.asarray(out)
+
+
+@pytest.mark.timeout(180)
+def test_local_index_matches_brute_force():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 16)).astype(np.float32)
+    index = LocalVectorIndex()
+    index.create_collection("c", vectors_config={"size": 16})
+    index.upsert("c", [PointStruct(id=f"d{i}", vector=v, payload={"id": f"d{i}", "terrain_type": "forest"}) for i, v in enumerate(vectors)])
+
+    query = rng.normal(size=16)
+    hits = index.search("c", query, limit=5)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:5]
+    assert [h.id for h in hits] == [f"d{i}" for i in expected]
+    assert hits[0].score >= hits[-1].score
+    assert "forest" in hits[0].tokens
+    assert index.get_collection("c").points_count == 500
+
+    # Threshold cuts the ranked list and duplicate collections are rejected like Qdrant
+    assert all(h.score >= 0.5 for h in index.search("c", query, limit=50, score_threshold=0.5))
+    with pytest.raises(ValueError, match="already exists"):
+        index.create_collection("c", vectors_config={"size": 16})
+
+
+@pytest.mark.timeout(180)
+def test_upsert_replaces_existing_point():
+    index = LocalVectorIndex()
+    index.create_collection("c", vectors_config={"size": 2})
+    index.upsert("c", [PointStruct(id="a", vector=[1, 0], payload={"v": 1})])
+    index.upsert("c", [PointStruct(id="a", vector=[0, 1], payload={"v": 2})])
+
+    hits = index.search("c", [0, 1], limit=3)
+    assert len(hits) == 1 and hits[0].payload == {"v": 2}
+    assert hits[0].score == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_encoder_batches_and_caches():
+    model = CountingModel()
+    encoder = BatchedEmbeddingEncoder(model, cache=EmbeddingCache(max_entries=100), max_wait_ms=5)
+
+    texts = ["forest search", "urban search", "forest search", "water rescue"]
+    first = await encoder.encode_many(texts)
+
+    # One model call, duplicate text encoded once
+    assert len(model.batches) == 1
+    assert sorted(model.batches[0]) == ["forest search", "urban search", "water rescue"]
+    assert np.array_equal(first[0], first[2])
+
+    again = await encoder.encode("forest search")
+    assert len(model.batches) == 1
+    assert np.array_equal(again, first[0])
+    assert encoder.cache.get_stats()["hits"] >= 1
+
+
+@pytest.mark.timeout(180)
+def test_embedding_cache_evicts_lru():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", np.zeros(1))
+    cache.put("b", np.zeros(1))
+    cache.get("a")
+    cache.put("c", np.zeros(1))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and len(cache) == 2
+
+
+@pytest.mark.timeout(180)
+def test_tokenize_payload():
+    assert tokenize({"terrain_type": "Forest", "note": "grid-search"}) >= {"forest", "grid", "search"}
@@ -0,0 +1,103 @@
+# backend/tests/test_weather_field.py
+import asyncio
+import contextlib
+import time
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+from app.services.weather_service import WeatherService
+
+T0 = 1_800_000_000  # forecast base time (epoch seconds)
+
+
+def temperature(lat, lon, t):
+    """Linear in space and time, so interpolation must reproduce it exactly."""
+    return 10.0 + 100.0 * (lat - 40.0) + 20.0 * (lon + 105.0) + (t - T0) / 3600.0
+
+
+def entry(lat, lon, t):
+    return {
+        "dt": int(t),
+        "main": {"temp": temperature(lat, lon, t), "humidity": 50, "pressure": 1010},
+        "visibility": 10000,
+        "clouds": {"all": 20},
+        "wind": {"speed": 4.0, "deg": 270},
+        "weather": [{"main": "Clear", "description": "clear sky"}],
+    }
+
+
+@contextlib.asynccontextmanager
+async def fake_provider():
+    calls = []
+
+    async def current(request):
+        calls.append("weather")
+        await asyncio.sleep(0.01)
+        return web.json_response(entry(float(request.query["lat"]), float(request.query["lon"]), T0 - 7200))
+
+    async def forecast(request):
+        calls.append("forecast")
+        await asyncio.sleep(0.01)
+        lat, lon = float(request.query["lat"]), float(request.query["lon"])
+        return web.json_response({"list": [entry(lat, lon, T0 + 3 * 3600 * k) for k in range(8)]})
+
+    app = web.Application()
+    app.router.add_get("/weather", current)
+    app.router.add_get("/forecast", forecast)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    service = WeatherService()
+    service.api_keys["openweather"] = "test"
+    service.openweather_url = f"http://127.0.0.1:{port}"
+    try:
+        yield service, calls
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_interpolates_and_deduplicates_upstream_calls():
+    async with fake_provider() as (service, calls):
+        when = datetime.fromtimestamp(T0 + 5400)
+
+        # 50 concurrent lookups inside one grid cell share four node fetches
+        points = [(40.01 + 0.0007 * i, -104.99 + 0.0005 * i) for i in range(50)]
+        results = await asyncio.gather(*(service.get_weather(lat, lon, when) for lat, lon in points))
+        assert len(calls) == 8  # 4 nodes x (current + forecast)
+        assert service.get_cache_stats()["coalesced"] > 0
+
+        for (lat, lon), weather in zip(points, results):
+            assert weather.temperature_celsius == pytest.approx(temperature(lat, lon, T0 + 5400))
+            assert weather.wind_direction_degrees == pytest.approx(270.0)
+
+        fields = await service.sample_weather_field([p[0] for p in points], [p[1] for p in points], when)
+        assert fields["temperature_celsius"][3] == pytest.approx(results[3].temperature_celsius)
+        assert len(calls) == 8
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_route_prefetch_ttl_and_lru():
+    async with fake_provider() as (service, calls):
+        route = [{"lat": 40.0 + 0.01 * k, "lng": -105.0 + 0.02 * k} for k in range(30)]
+        fetched = await service.prefetch_route(route)
+        assert fetched == len(service.weather_cache) and len(calls) == 2 * fetched
+
+        before = len(calls)
+        for waypoint in route:
+            await service.get_current_weather(waypoint["lat"], waypoint["lng"])
+        assert len(calls) == before  # served from the prefetched grid
+
+        # Expired nodes are refetched; the cache never exceeds its bound
+        service.clock = lambda: time.monotonic() + service.cache_duration + 1
+        service.max_cached_tiles = 4
+        await service.get_current_weather(40.02, -104.98)
+        assert len(calls) == before + 8
+        assert len(service.weather_cache) == 4
@@ -0,0 +1,146 @@
+# backend/tests/test_wifi_framing.py
+import asyncio
+import contextlib
+import json
+import struct
+from datetime import datetime
+
+import pytest
+
+from app.communication.protocols.base_connection import ConnectionStatus, TelemetryMessage
+from app.communication.protocols.wifi_connection import WiFiConnection, WiFiConnectionConfig
+from app.communication.protocols.wire_codec import BINARY_CODEC, WireCodec
+
+
+def _frames(count):
+    codec = WireCodec("binary")
+    return [
+        struct.pack("!I", len(data)) + data
+        for data in (
+            codec.encode(TelemetryMessage(
+                message_id=f"tel-{i}", drone_id="drone-1", timestamp=datetime(2025, 5, 1),
+                position={"lat": 37.0 + i * 1e-5, "lon": -122.0, "alt": 50.0}, battery_level=90.0,
+            ))
+            for i in range(count)
+        )
+    ]
+
+
+@contextlib.asynccontextmanager
+async def _drone_link(send):
+    """A fake drone that accepts the handshake and then runs send(writer)"""
+    async def handle(reader, writer):
+        (length,) = struct.unpack("!I", await reader.readexactly(4))
+        await reader.readexactly(length)
+        reply = json.dumps({"status": "accepted", "codec": BINARY_CODEC}).encode()
+        writer.write(struct.pack("!I", len(reply)) + reply)
+        await writer.drain()
+        await send(writer)
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    config = WiFiConnectionConfig(host="127.0.0.1", port=port, protocol="tcp", retry_attempts=0)
+    connection = WiFiConnection("drone-1", config)
+    batches = []
+
+    async def on_batch(messages):
+        batches.append([message.message_id for message in messages])
+
+    connection.register_message_batch_callback(on_batch)
+    async with server:
+        assert await connection.connect()
+        await connection.start()
+        try:
+            yield connection, batches
+        finally:
+            await connection.stop()
+
+
+async def _wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_frames_split_across_tiny_writes_are_reassembled():
+    stream = b"".join(_frames(200))
+
+    async def send(writer):
+        for start in range(0, len(stream), 7):
+            writer.write(stream[start:start + 7])
+            await writer.drain()
+        await asyncio.sleep(1)
+
+    async with _drone_link(send) as (connection, batches):
+        await _wait_for(lambda: sum(map(len, batches)) == 200)
+    received = [message_id for batch in batches for message_id in batch]
+    assert received == [f"tel-{i}" for i in range(200)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_buffered_frames_are_delivered_as_one_batch():
+    async def send(writer):
+        writer.write(b"".join(_frames(500)))
+        await writer.drain()
+        await asyncio.sleep(1)
+
+    async with _drone_link(send) as (connection, batches):
+        await _wait_for(lambda: sum(map(len, batches)) == 500)
+    # One wakeup per socket read rather than one per frame (and no 10 ms sleeps)
+    assert len(batches) < 20
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_peer_close_mid_frame_marks_the_link_lost():
+    async def send(writer):
+        writer.write(_frames(1)[0][:-3])
+        await writer.drain()
+        writer.close()
+
+    async with _drone_link(send) as (connection, batches):
+        await _wait_for(lambda: connection.status == ConnectionStatus.FAILED)
+    assert batches == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_udp_socket_error_marks_the_link_lost():
+    class Drone(asyncio.DatagramProtocol):
+        def connection_made(self, transport):
+            self.transport = transport
+
+        def datagram_received(self, data, addr):
+            if json.loads(data).get("type") == "handshake":
+                self.transport.sendto(json.dumps({"status": "accepted", "codec": BINARY_CODEC}).encode(), addr)
+                for frame in _frames(3):
+                    self.transport.sendto(frame[4:], addr)
+
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(Drone, local_addr=("127.0.0.1", 0))
+    port = transport.get_extra_info("sockname")[1]
+    connection = WiFiConnection("drone-1", WiFiConnectionConfig(host="127.0.0.1", port=port, protocol="udp",
+                                                                retry_attempts=0))
+    batches = []
+
+    async def on_batch(messages):
+        batches.append([message.message_id for message in messages])
+
+    connection.register_message_batch_callback(on_batch)
+    try:
+        assert await connection.connect()
+        await connection.start()
+        await _wait_for(lambda: sum(map(len, batches)) == 3)
+        # The drone goes away: the ICMP port unreachable fails the pending receive
+        transport.close()
+        await asyncio.sleep(0.05)
+        connection.socket.connect(("127.0.0.1", port))
+        connection.socket.send(b"ping")
+        await _wait_for(lambda: connection.status == ConnectionStatus.FAILED)
+    finally:
+        await connection.stop()
+        transport.close()
@@ -0,0 +1,131 @@
+# backend/tests/test_wire_codec.py
+import asyncio
+import json
+import struct
+from datetime import datetime
+
+import pytest
+
+from app.communication.protocols.base_connection import CommandMessage, DroneMessage, TelemetryMessage
+from app.communication.protocols.wifi_connection import WiFiConnection, WiFiConnectionConfig
+from app.communication.protocols.wire_codec import (
+    BINARY_CODEC, LORA_JSON, WIRE_VERSION, WireCodec,
+)
+
+
+def _telemetry(battery=90.0, drone_id="drone-1"):
+    return TelemetryMessage(
+        message_id="tel-1", drone_id=drone_id, timestamp=datetime(2025, 5, 1, 12, 0, 0, 250000),
+        position={"lat": 37.7749123, "lon": -122.4194456, "alt": 120.0}, battery_level=battery,
+        speed=12.5, heading=270.0, signal_strength=-61.0, gps_accuracy=1.5, temperature=18.0,
+    )
+
+
+@pytest.mark.timeout(180)
+def test_binary_round_trip_for_every_message_kind():
+    sender, receiver = WireCodec("binary"), WireCodec("auto")
+
+    telemetry = receiver.decode(sender.encode(_telemetry()))
+    assert isinstance(telemetry, TelemetryMessage)
+    assert telemetry.position == {"lat": 37.7749123, "lon": -122.4194456, "alt": 120.0}
+    assert telemetry.timestamp == datetime(2025, 5, 1, 12, 0, 0, 250000)
+    assert (telemetry.battery_level, telemetry.heading, telemetry.humidity) == (90.0, 270.0, None)
+
+    command = CommandMessage(
+        message_id="cmd-1", drone_id="drone-1", timestamp=datetime(2025, 5, 1), priority=3,
+        response_required=True, command_type="return_to_home", parameters={"altitude": 60},
+    )
+    custom = CommandMessage(message_id="cmd-2", drone_id="drone-1", timestamp=None,
+                            command_type="drop_beacon", parameters={})
+    for original in (command, custom):
+        decoded = receiver.decode(sender.encode(original))
+        assert decoded == original
+
+    status = DroneMessage("m-1", "drone-1", "status", {"mode": "AUTO"}, datetime(2025, 5, 1), priority=2)
+    assert receiver.decode(sender.encode(status)) == status
+    # A binary frame from the peer switches an auto codec to binary
+    assert receiver.binary and receiver.encode(status)[0] == WIRE_VERSION
+
+
+@pytest.mark.timeout(180)
+def test_delta_frames_are_small_and_resync_after_loss():
+    sender, receiver = WireCodec("binary", delta=True, keyframe_interval=4), WireCodec()
+    keyframe = sender.encode(_telemetry(90.0))
+    deltas = [sender.encode(_telemetry(90.0 - i)) for i in range(1, 4)]
+    assert len(deltas[0]) < len(keyframe) // 2
+
+    assert receiver.decode(keyframe).battery_level == 90.0
+    assert receiver.decode(deltas[0]).battery_level == 89.0
+    # deltas[1] is lost: the next delta has no base and is dropped
+    assert receiver.decode(deltas[2]) is None
+    assert receiver.stats["dropped_deltas"] == 1
+    # ...until the next keyframe
+    resync = receiver.decode(sender.encode(_telemetry(80.0)))
+    assert resync.battery_level == 80.0 and resync.position["alt"] == 120.0
+
+
+@pytest.mark.timeout(180)
+def test_json_fallback_does_not_advance_the_delta_sequence():
+    sender, receiver = WireCodec("binary", delta=True, keyframe_interval=8), WireCodec()
+    assert receiver.decode(sender.encode(_telemetry(90.0))).battery_level == 90.0
+    # The prefix cannot carry this priority, so the frame goes out as JSON
+    unencodable = _telemetry(89.0)
+    unencodable.priority = 99
+    fallback = sender.encode(unencodable)
+    assert fallback[0] != WIRE_VERSION and sender.stats["json_frames"] == 1
+    assert receiver.decode(fallback).battery_level == 89.0
+    # The next delta is based on the last binary frame, which the receiver has
+    delta = sender.encode(_telemetry(88.0))
+    assert receiver.decode(delta).battery_level == 88.0
+    assert receiver.stats["dropped_deltas"] == 0 and sender.stats["delta_frames"] == 1
+
+
+@pytest.mark.timeout(180)
+def test_json_fallback_dialects_stay_compatible():
+    legacy = json.loads(WireCodec("json").encode(_telemetry()))
+    assert legacy["timestamp"] == "2025-05-01T12:00:00.250000" and legacy["battery_level"] == 90.0
+
+    lora = WireCodec("json", dialect=LORA_JSON)
+    frame = json.loads(lora.encode(_telemetry()))
+    assert set(frame) == {"id", "drone", "type", "data", "time", "pri", "pos", "bat", "spd", "hdg"}
+    assert lora.decode(lora.encode(_telemetry())).battery_level == 90.0
+
+    # Binary layout limits fall back to JSON per message
+    long_id = _telemetry(drone_id="d" * 300)
+    assert WireCodec("binary").encode(long_id)[:1] == b"{"
+    assert WireCodec().decode(b"\x09garbage") is None
+
+
+async def _fake_drone(reader, writer, frames):
+    async def read_frame():
+        (length,) = struct.unpack("!I", await reader.readexactly(4))
+        return await reader.readexactly(length)
+
+    def write_frame(data):
+        writer.write(struct.pack("!I", len(data)) + data)
+
+    handshake = json.loads(await read_frame())
+    codec = BINARY_CODEC if BINARY_CODEC in handshake["codecs"] else "json"
+    write_frame(json.dumps({"status": "accepted", "codec": codec}).encode())
+    await writer.drain()
+    frames.append(await read_frame())
+    write_frame(WireCodec("binary", delta=True).encode(_telemetry()))
+    await writer.drain()
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(180)
+async def test_wifi_connection_negotiates_binary_over_tcp():
+    frames = []
+    server = await asyncio.start_server(lambda r, w: _fake_drone(r, w, frames), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        connection = WiFiConnection("drone-1", WiFiConnectionConfig(host="127.0.0.1", port=port, protocol="tcp"))
+        assert await connection.connect()
+        assert await connection.send_command("drone-1", "takeoff", {"altitude": 30})
+        received = await connection.receive_message()
+        await connection.disconnect()
+
+    assert frames[0][0] == WIRE_VERSION
+    assert received.position["lat"] == 37.7749123
+    assert connection.get_connection_info()["wire"]["format"] == BINARY_CODEC